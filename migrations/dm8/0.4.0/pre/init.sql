@@ -0,0 +1,742 @@
+-- ================================================================
+-- Sandbox Control Plane Database Schema for DM8 (达梦数据库)
+-- Version: 0.4.0
+-- Database: adp
+--
+-- 数据表命名规范:
+-- - 表名: t_{module}_{entity} (小写 + 下划线)
+-- - 字段名: f_{field_name} (小写 + 下划线)
+-- - 时间戳: BIGINT (毫秒级时间戳)
+-- - 索引名: t_{table}_idx_{field} / t_{table}_uk_{field}
+--
+-- DM8 特性说明:
+-- - CLUSTER PRIMARY KEY: 聚簇主键
+-- - VARCHAR(N CHAR): 字符单位长度
+-- - TEXT/CLOB: 大文本类型
+-- - 触发器: 实现 updated_at 自动更新
+-- - 索引: 按 USER_INDEXES 检查后创建，脚本可在已升级实例上重复执行
+-- - 升级新增列的索引与注释: 在 Upgrade 段加列之后创建
+--
+-- 表说明:
+-- - t_sandbox_session: 沙箱会话管理表
+-- - t_sandbox_execution: 代码执行记录表
+-- - t_sandbox_execution_payload: 执行代码与输出表（执行记录的冷数据）
+-- - t_sandbox_execution_archive: 执行归档索引表（已迁入 S3 的执行位置）
+-- - t_sandbox_execution_dispatch: 执行分发队列表（执行 API 与执行器之间）
+-- - t_sandbox_cache_version: 进程内缓存版本表（跨副本失效）
+-- - t_sandbox_leader_lease: 主节点租约表（后台任务单实例执行）
+-- - t_sandbox_workspace_manifest: workspace 文件清单状态表（最近对账时间）
+-- - t_sandbox_workspace_file: workspace 文件清单表（文件列表与计数）
+-- - t_sandbox_template: 沙箱模板定义表
+-- - t_sandbox_runtime_node: 运行时节点注册表
+-- ================================================================
+
+USE adp;
+
+-- ================================================================
+-- Table: t_sandbox_template
+-- ================================================================
+-- 沙箱模板定义表（基础表，被 session 引用，先创建）
+CREATE TABLE IF NOT EXISTS t_sandbox_template
+(
+    f_id                  VARCHAR(40 CHAR)  NOT NULL,
+    f_name                VARCHAR(128 CHAR) NOT NULL,
+    f_description         VARCHAR(500 CHAR) NOT NULL DEFAULT '',
+    f_image_url           VARCHAR(512 CHAR) NOT NULL,
+    f_base_image          VARCHAR(256 CHAR) NOT NULL DEFAULT '',
+    f_runtime_type        VARCHAR(30 CHAR)  NOT NULL,
+    f_default_cpu_cores   DECIMAL(3,1)     NOT NULL DEFAULT 0.5,
+    f_default_memory_mb   INT              NOT NULL DEFAULT 512,
+    f_default_disk_mb     INT              NOT NULL DEFAULT 1024,
+    f_default_timeout_sec INT              NOT NULL DEFAULT 300,
+    f_pre_installed_packages CLOB          NOT NULL,
+    f_default_env_vars    CLOB             NOT NULL,
+    f_security_context    CLOB             NOT NULL,
+    f_is_active           TINYINT          NOT NULL DEFAULT 1,
+    f_created_at          BIGINT           NOT NULL DEFAULT 0,
+    f_created_by          VARCHAR(40 CHAR) NOT NULL DEFAULT '',
+    f_updated_at          BIGINT           NOT NULL DEFAULT 0,
+    f_updated_by          VARCHAR(40 CHAR) NOT NULL DEFAULT '',
+    f_deleted_at          BIGINT           NOT NULL DEFAULT 0,
+    f_deleted_by          VARCHAR(36 CHAR) NOT NULL DEFAULT '',
+    CLUSTER PRIMARY KEY (f_id)
+);
+
+-- Comments for t_sandbox_template
+COMMENT ON TABLE t_sandbox_template IS '沙箱模板定义表';
+COMMENT ON COLUMN t_sandbox_template.f_id IS '模板唯一标识符';
+COMMENT ON COLUMN t_sandbox_template.f_name IS '模板名称';
+COMMENT ON COLUMN t_sandbox_template.f_description IS '模板描述';
+COMMENT ON COLUMN t_sandbox_template.f_image_url IS '容器镜像URL';
+COMMENT ON COLUMN t_sandbox_template.f_base_image IS '基础镜像';
+COMMENT ON COLUMN t_sandbox_template.f_runtime_type IS '运行时类型(python3.11,nodejs20,java17,go1.21)';
+COMMENT ON COLUMN t_sandbox_template.f_default_cpu_cores IS '默认CPU核数';
+COMMENT ON COLUMN t_sandbox_template.f_default_memory_mb IS '默认内存MB';
+COMMENT ON COLUMN t_sandbox_template.f_default_disk_mb IS '默认磁盘MB';
+COMMENT ON COLUMN t_sandbox_template.f_default_timeout_sec IS '默认超时秒数';
+COMMENT ON COLUMN t_sandbox_template.f_pre_installed_packages IS '预装包列表JSON';
+COMMENT ON COLUMN t_sandbox_template.f_default_env_vars IS '默认环境变量JSON';
+COMMENT ON COLUMN t_sandbox_template.f_security_context IS '安全策略JSON';
+COMMENT ON COLUMN t_sandbox_template.f_is_active IS '是否激活(0:否,1:是)';
+COMMENT ON COLUMN t_sandbox_template.f_created_at IS '创建时间(毫秒时间戳)';
+COMMENT ON COLUMN t_sandbox_template.f_created_by IS '创建人';
+COMMENT ON COLUMN t_sandbox_template.f_updated_at IS '更新时间(毫秒时间戳)';
+COMMENT ON COLUMN t_sandbox_template.f_updated_by IS '更新人';
+COMMENT ON COLUMN t_sandbox_template.f_deleted_at IS '删除时间(毫秒时间戳,0:未删除)';
+COMMENT ON COLUMN t_sandbox_template.f_deleted_by IS '删除人';
+
+-- Indexes for t_sandbox_template
+DECLARE
+    v_count INT;
+BEGIN
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_TEMPLATE_UK_NAME_DELETED_AT';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE UNIQUE INDEX t_sandbox_template_uk_name_deleted_at ON t_sandbox_template(f_name, f_deleted_at)';
+    END IF;
+
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_TEMPLATE_IDX_RUNTIME_TYPE';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX t_sandbox_template_idx_runtime_type ON t_sandbox_template(f_runtime_type)';
+    END IF;
+
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_TEMPLATE_IDX_IS_ACTIVE';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX t_sandbox_template_idx_is_active ON t_sandbox_template(f_is_active)';
+    END IF;
+
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_TEMPLATE_IDX_CREATED_AT';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX t_sandbox_template_idx_created_at ON t_sandbox_template(f_created_at)';
+    END IF;
+
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_TEMPLATE_IDX_DELETED_AT';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX t_sandbox_template_idx_deleted_at ON t_sandbox_template(f_deleted_at)';
+    END IF;
+END;
+/
+
+-- ================================================================
+-- Table: t_sandbox_runtime_node
+-- ================================================================
+-- 运行时节点注册表
+CREATE TABLE IF NOT EXISTS t_sandbox_runtime_node
+(
+    f_node_id             VARCHAR(40 CHAR)  NOT NULL,
+    f_hostname            VARCHAR(128 CHAR) NOT NULL,
+    f_runtime_type        VARCHAR(20 CHAR)  NOT NULL,
+    f_ip_address          VARCHAR(45 CHAR)  NOT NULL,
+    f_api_endpoint        VARCHAR(512 CHAR) NOT NULL DEFAULT '',
+    f_status              VARCHAR(20 CHAR)  NOT NULL DEFAULT 'online',
+    f_total_cpu_cores     DECIMAL(5,1)     NOT NULL,
+    f_total_memory_mb     INT              NOT NULL,
+    f_allocated_cpu_cores DECIMAL(5,1)     NOT NULL DEFAULT 0.0,
+    f_allocated_memory_mb INT              NOT NULL DEFAULT 0,
+    f_running_containers  INT              NOT NULL DEFAULT 0,
+    f_max_containers      INT              NOT NULL,
+    f_cached_images       CLOB             NOT NULL,
+    f_labels              CLOB             NOT NULL,
+    f_last_heartbeat_at   BIGINT           NOT NULL DEFAULT 0,
+    f_created_at          BIGINT           NOT NULL DEFAULT 0,
+    f_created_by          VARCHAR(40 CHAR) NOT NULL DEFAULT '',
+    f_updated_at          BIGINT           NOT NULL DEFAULT 0,
+    f_updated_by          VARCHAR(40 CHAR) NOT NULL DEFAULT '',
+    f_deleted_at          BIGINT           NOT NULL DEFAULT 0,
+    f_deleted_by          VARCHAR(36 CHAR) NOT NULL DEFAULT '',
+    CLUSTER PRIMARY KEY (f_node_id)
+);
+
+-- Comments for t_sandbox_runtime_node
+COMMENT ON TABLE t_sandbox_runtime_node IS '运行时节点注册表';
+COMMENT ON COLUMN t_sandbox_runtime_node.f_node_id IS '节点唯一标识符';
+COMMENT ON COLUMN t_sandbox_runtime_node.f_hostname IS '主机名';
+COMMENT ON COLUMN t_sandbox_runtime_node.f_runtime_type IS '运行时类型(docker,kubernetes)';
+COMMENT ON COLUMN t_sandbox_runtime_node.f_ip_address IS 'IP地址(IPv4/IPv6)';
+COMMENT ON COLUMN t_sandbox_runtime_node.f_api_endpoint IS 'API端点URL';
+COMMENT ON COLUMN t_sandbox_runtime_node.f_status IS '节点状态(online,offline,draining,maintenance)';
+COMMENT ON COLUMN t_sandbox_runtime_node.f_total_cpu_cores IS '总CPU核数';
+COMMENT ON COLUMN t_sandbox_runtime_node.f_total_memory_mb IS '总内存MB';
+COMMENT ON COLUMN t_sandbox_runtime_node.f_allocated_cpu_cores IS '已分配CPU核数';
+COMMENT ON COLUMN t_sandbox_runtime_node.f_allocated_memory_mb IS '已分配内存MB';
+COMMENT ON COLUMN t_sandbox_runtime_node.f_running_containers IS '运行容器数';
+COMMENT ON COLUMN t_sandbox_runtime_node.f_max_containers IS '最大容器数';
+COMMENT ON COLUMN t_sandbox_runtime_node.f_cached_images IS '缓存镜像列表JSON';
+COMMENT ON COLUMN t_sandbox_runtime_node.f_labels IS '节点标签JSON';
+COMMENT ON COLUMN t_sandbox_runtime_node.f_last_heartbeat_at IS '最后心跳时间(毫秒时间戳)';
+COMMENT ON COLUMN t_sandbox_runtime_node.f_created_at IS '创建时间(毫秒时间戳)';
+COMMENT ON COLUMN t_sandbox_runtime_node.f_created_by IS '创建人';
+COMMENT ON COLUMN t_sandbox_runtime_node.f_updated_at IS '更新时间(毫秒时间戳)';
+COMMENT ON COLUMN t_sandbox_runtime_node.f_updated_by IS '更新人';
+COMMENT ON COLUMN t_sandbox_runtime_node.f_deleted_at IS '删除时间(毫秒时间戳,0:未删除)';
+COMMENT ON COLUMN t_sandbox_runtime_node.f_deleted_by IS '删除人';
+
+-- Indexes for t_sandbox_runtime_node
+DECLARE
+    v_count INT;
+BEGIN
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_RUNTIME_NODE_UK_HOSTNAME_DELETED_AT';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE UNIQUE INDEX t_sandbox_runtime_node_uk_hostname_deleted_at ON t_sandbox_runtime_node(f_hostname, f_deleted_at)';
+    END IF;
+
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_RUNTIME_NODE_IDX_STATUS';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX t_sandbox_runtime_node_idx_status ON t_sandbox_runtime_node(f_status)';
+    END IF;
+
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_RUNTIME_NODE_IDX_RUNTIME_TYPE';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX t_sandbox_runtime_node_idx_runtime_type ON t_sandbox_runtime_node(f_runtime_type)';
+    END IF;
+
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_RUNTIME_NODE_IDX_CREATED_AT';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX t_sandbox_runtime_node_idx_created_at ON t_sandbox_runtime_node(f_created_at)';
+    END IF;
+
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_RUNTIME_NODE_IDX_DELETED_AT';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX t_sandbox_runtime_node_idx_deleted_at ON t_sandbox_runtime_node(f_deleted_at)';
+    END IF;
+END;
+/
+
+-- ================================================================
+-- Table: t_sandbox_session
+-- ================================================================
+-- 沙箱会话管理表（含依赖安装支持）
+CREATE TABLE IF NOT EXISTS t_sandbox_session
+(
+    f_id                          VARCHAR(255 CHAR) NOT NULL,
+    f_template_id                 VARCHAR(40 CHAR)  NOT NULL,
+    f_status                      VARCHAR(20 CHAR)  NOT NULL DEFAULT 'creating',
+    f_runtime_type                VARCHAR(20 CHAR)  NOT NULL,
+    f_runtime_node                VARCHAR(128 CHAR) NOT NULL DEFAULT '',
+    f_container_id                VARCHAR(128 CHAR) NOT NULL DEFAULT '',
+    f_pod_name                    VARCHAR(128 CHAR) NOT NULL DEFAULT '',
+    f_workspace_path              VARCHAR(256 CHAR) NOT NULL DEFAULT '',
+    f_resources_cpu               VARCHAR(16 CHAR)  NOT NULL,
+    f_resources_memory            VARCHAR(16 CHAR)  NOT NULL,
+    f_resources_disk              VARCHAR(16 CHAR)  NOT NULL,
+    f_env_vars                    CLOB             NOT NULL,
+    f_timeout                     INT              NOT NULL DEFAULT 300,
+    f_last_activity_at            BIGINT           NOT NULL DEFAULT 0,
+    f_completed_at                BIGINT           NOT NULL DEFAULT 0,
+    f_python_package_index_url    VARCHAR(512 CHAR) NOT NULL DEFAULT 'https://pypi.org/simple/',
+
+    -- 依赖安装字段
+    f_requested_dependencies      CLOB             NOT NULL,
+    f_installed_dependencies      CLOB             NOT NULL,
+    f_dependency_install_status   VARCHAR(20 CHAR) NOT NULL DEFAULT 'pending',
+    f_dependency_install_error    CLOB             NOT NULL,
+    f_dependency_install_started_at   BIGINT       NOT NULL DEFAULT 0,
+    f_dependency_install_completed_at BIGINT       NOT NULL DEFAULT 0,
+
+    -- 执行分发队列
+    f_dispatch_seq                BIGINT           NOT NULL DEFAULT 0,
+
+    -- 审计字段
+    f_created_at                  BIGINT           NOT NULL DEFAULT 0,
+    f_created_by                  VARCHAR(40 CHAR) NOT NULL DEFAULT '',
+    f_updated_at                  BIGINT           NOT NULL DEFAULT 0,
+    f_updated_by                  VARCHAR(40 CHAR) NOT NULL DEFAULT '',
+    f_deleted_at                  BIGINT           NOT NULL DEFAULT 0,
+    f_deleted_by                  VARCHAR(36 CHAR) NOT NULL DEFAULT '',
+    CLUSTER PRIMARY KEY (f_id)
+);
+
+-- Comments for t_sandbox_session
+COMMENT ON TABLE t_sandbox_session IS '沙箱会话管理表';
+COMMENT ON COLUMN t_sandbox_session.f_id IS '会话唯一标识符';
+COMMENT ON COLUMN t_sandbox_session.f_template_id IS '模板ID引用';
+COMMENT ON COLUMN t_sandbox_session.f_status IS '会话状态(creating,running,completed,failed,timeout,terminated,hibernating,hibernated)';
+COMMENT ON COLUMN t_sandbox_session.f_runtime_type IS '运行时类型(python3.11,nodejs20,java17,go1.21)';
+COMMENT ON COLUMN t_sandbox_session.f_runtime_node IS '当前运行节点';
+COMMENT ON COLUMN t_sandbox_session.f_container_id IS '容器ID';
+COMMENT ON COLUMN t_sandbox_session.f_pod_name IS 'Pod名称';
+COMMENT ON COLUMN t_sandbox_session.f_workspace_path IS '工作区路径(S3)';
+COMMENT ON COLUMN t_sandbox_session.f_resources_cpu IS 'CPU分配(如:1,2)';
+COMMENT ON COLUMN t_sandbox_session.f_resources_memory IS '内存分配(如:512Mi,1Gi)';
+COMMENT ON COLUMN t_sandbox_session.f_resources_disk IS '磁盘分配(如:1Gi,10Gi)';
+COMMENT ON COLUMN t_sandbox_session.f_env_vars IS '环境变量JSON';
+COMMENT ON COLUMN t_sandbox_session.f_timeout IS '超时时间(秒)';
+COMMENT ON COLUMN t_sandbox_session.f_last_activity_at IS '最后活动时间(毫秒时间戳)';
+COMMENT ON COLUMN t_sandbox_session.f_completed_at IS '完成时间(毫秒时间戳,0:未完成)';
+COMMENT ON COLUMN t_sandbox_session.f_python_package_index_url IS 'Python软件包仓库地址';
+COMMENT ON COLUMN t_sandbox_session.f_requested_dependencies IS '请求的依赖包JSON';
+COMMENT ON COLUMN t_sandbox_session.f_installed_dependencies IS '已安装的依赖包JSON';
+COMMENT ON COLUMN t_sandbox_session.f_dependency_install_status IS '依赖安装状态(pending,installing,completed,failed)';
+COMMENT ON COLUMN t_sandbox_session.f_dependency_install_error IS '依赖安装错误信息';
+COMMENT ON COLUMN t_sandbox_session.f_dependency_install_started_at IS '依赖安装开始时间(毫秒时间戳)';
+COMMENT ON COLUMN t_sandbox_session.f_dependency_install_completed_at IS '依赖安装完成时间(毫秒时间戳)';
+COMMENT ON COLUMN t_sandbox_session.f_created_at IS '创建时间(毫秒时间戳)';
+COMMENT ON COLUMN t_sandbox_session.f_created_by IS '创建人';
+COMMENT ON COLUMN t_sandbox_session.f_updated_at IS '更新时间(毫秒时间戳)';
+COMMENT ON COLUMN t_sandbox_session.f_updated_by IS '更新人';
+COMMENT ON COLUMN t_sandbox_session.f_deleted_at IS '删除时间(毫秒时间戳,0:未删除)';
+COMMENT ON COLUMN t_sandbox_session.f_deleted_by IS '删除人';
+
+-- Indexes for t_sandbox_session
+DECLARE
+    v_count INT;
+BEGIN
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_SESSION_IDX_TEMPLATE_CREATED_AT';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX t_sandbox_session_idx_template_created_at ON t_sandbox_session(f_template_id, f_created_at, f_id)';
+    END IF;
+
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_SESSION_IDX_STATUS_CREATED_AT';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX t_sandbox_session_idx_status_created_at ON t_sandbox_session(f_status, f_created_at, f_id)';
+    END IF;
+
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_SESSION_IDX_STATUS_LAST_ACTIVITY_AT';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX t_sandbox_session_idx_status_last_activity_at ON t_sandbox_session(f_status, f_last_activity_at)';
+    END IF;
+
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_SESSION_IDX_RUNTIME_NODE_STATUS';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX t_sandbox_session_idx_runtime_node_status ON t_sandbox_session(f_runtime_node, f_status)';
+    END IF;
+
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_SESSION_IDX_CONTAINER_ID';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX t_sandbox_session_idx_container_id ON t_sandbox_session(f_container_id)';
+    END IF;
+
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_SESSION_IDX_DEPENDENCY_INSTALL_STATUS';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX t_sandbox_session_idx_dependency_install_status ON t_sandbox_session(f_dependency_install_status)';
+    END IF;
+
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_SESSION_IDX_CREATED_AT_ID';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX t_sandbox_session_idx_created_at_id ON t_sandbox_session(f_created_at, f_id)';
+    END IF;
+
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_SESSION_IDX_DELETED_AT';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX t_sandbox_session_idx_deleted_at ON t_sandbox_session(f_deleted_at)';
+    END IF;
+
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_SESSION_IDX_CREATED_BY';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX t_sandbox_session_idx_created_by ON t_sandbox_session(f_created_by)';
+    END IF;
+END;
+/
+
+-- ================================================================
+-- Table: t_sandbox_execution
+-- ================================================================
+-- 代码执行记录表
+CREATE TABLE IF NOT EXISTS t_sandbox_execution
+(
+    f_id              VARCHAR(40 CHAR)  NOT NULL,
+    f_session_id      VARCHAR(255 CHAR) NOT NULL,
+    f_status          VARCHAR(20 CHAR)  NOT NULL DEFAULT 'pending',
+    f_language        VARCHAR(32 CHAR)  NOT NULL,
+    f_entrypoint      VARCHAR(255 CHAR) NOT NULL DEFAULT '',
+    f_timeout_sec     INT               NOT NULL,
+    f_exit_code       INT               NOT NULL DEFAULT 0,
+    f_metrics         CLOB              NOT NULL,
+    f_error_message   CLOB              NOT NULL,
+    f_started_at      BIGINT            NOT NULL DEFAULT 0,
+    f_completed_at    BIGINT            NOT NULL DEFAULT 0,
+    f_last_heartbeat_at BIGINT          NOT NULL DEFAULT 0,
+
+    -- 审计字段
+    f_created_at      BIGINT            NOT NULL DEFAULT 0,
+    f_created_by      VARCHAR(40 CHAR)  NOT NULL DEFAULT '',
+    f_updated_at      BIGINT            NOT NULL DEFAULT 0,
+    f_updated_by      VARCHAR(40 CHAR)  NOT NULL DEFAULT '',
+    f_deleted_at      BIGINT            NOT NULL DEFAULT 0,
+    f_deleted_by      VARCHAR(36 CHAR)  NOT NULL DEFAULT '',
+    CLUSTER PRIMARY KEY (f_id)
+);
+
+-- Comments for t_sandbox_execution
+COMMENT ON TABLE t_sandbox_execution IS '代码执行记录表';
+COMMENT ON COLUMN t_sandbox_execution.f_id IS '执行唯一标识符';
+COMMENT ON COLUMN t_sandbox_execution.f_session_id IS '会话ID引用';
+COMMENT ON COLUMN t_sandbox_execution.f_status IS '执行状态(pending,running,completed,failed,timeout,crashed)';
+COMMENT ON COLUMN t_sandbox_execution.f_language IS '编程语言';
+COMMENT ON COLUMN t_sandbox_execution.f_entrypoint IS '入口函数';
+COMMENT ON COLUMN t_sandbox_execution.f_timeout_sec IS '超时时间(秒)';
+COMMENT ON COLUMN t_sandbox_execution.f_exit_code IS '退出码';
+COMMENT ON COLUMN t_sandbox_execution.f_metrics IS '性能指标JSON';
+COMMENT ON COLUMN t_sandbox_execution.f_error_message IS '错误信息';
+COMMENT ON COLUMN t_sandbox_execution.f_started_at IS '执行开始时间(毫秒时间戳)';
+COMMENT ON COLUMN t_sandbox_execution.f_completed_at IS '执行完成时间(毫秒时间戳)';
+COMMENT ON COLUMN t_sandbox_execution.f_created_at IS '创建时间(毫秒时间戳)';
+COMMENT ON COLUMN t_sandbox_execution.f_created_by IS '创建人';
+COMMENT ON COLUMN t_sandbox_execution.f_updated_at IS '更新时间(毫秒时间戳)';
+COMMENT ON COLUMN t_sandbox_execution.f_updated_by IS '更新人';
+COMMENT ON COLUMN t_sandbox_execution.f_deleted_at IS '删除时间(毫秒时间戳,0:未删除)';
+COMMENT ON COLUMN t_sandbox_execution.f_deleted_by IS '删除人';
+
+-- Indexes for t_sandbox_execution
+DECLARE
+    v_count INT;
+BEGIN
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_EXECUTION_IDX_SESSION_CREATED_AT';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX t_sandbox_execution_idx_session_created_at ON t_sandbox_execution(f_session_id, f_created_at, f_id)';
+    END IF;
+
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_EXECUTION_IDX_CREATED_AT_ID';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX t_sandbox_execution_idx_created_at_id ON t_sandbox_execution(f_created_at, f_id)';
+    END IF;
+
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_EXECUTION_IDX_DELETED_AT';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX t_sandbox_execution_idx_deleted_at ON t_sandbox_execution(f_deleted_at)';
+    END IF;
+
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_EXECUTION_IDX_CREATED_BY';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX t_sandbox_execution_idx_created_by ON t_sandbox_execution(f_created_by)';
+    END IF;
+END;
+/
+
+-- ================================================================
+-- Table: t_sandbox_execution_payload
+-- ================================================================
+-- 执行代码与输出表（与 t_sandbox_execution 一对一，状态查询不读取本表）
+CREATE TABLE IF NOT EXISTS t_sandbox_execution_payload
+(
+    f_execution_id    VARCHAR(40 CHAR)  NOT NULL,
+    f_code            CLOB              NOT NULL,
+    f_event_data      CLOB              NOT NULL,
+    f_return_value    CLOB              NOT NULL,
+    f_stdout          CLOB              NOT NULL,
+    f_stderr          CLOB              NOT NULL,
+
+    -- 审计字段
+    f_created_at      BIGINT            NOT NULL DEFAULT 0,
+    f_created_by      VARCHAR(40 CHAR)  NOT NULL DEFAULT '',
+    f_updated_at      BIGINT            NOT NULL DEFAULT 0,
+    f_updated_by      VARCHAR(40 CHAR)  NOT NULL DEFAULT '',
+    f_deleted_at      BIGINT            NOT NULL DEFAULT 0,
+    f_deleted_by      VARCHAR(36 CHAR)  NOT NULL DEFAULT '',
+    CLUSTER PRIMARY KEY (f_execution_id)
+);
+
+-- Comments for t_sandbox_execution_payload
+COMMENT ON TABLE t_sandbox_execution_payload IS '执行代码与输出表';
+COMMENT ON COLUMN t_sandbox_execution_payload.f_execution_id IS '执行ID引用';
+COMMENT ON COLUMN t_sandbox_execution_payload.f_code IS '源代码';
+COMMENT ON COLUMN t_sandbox_execution_payload.f_event_data IS '事件数据JSON';
+COMMENT ON COLUMN t_sandbox_execution_payload.f_return_value IS '返回值JSON';
+COMMENT ON COLUMN t_sandbox_execution_payload.f_stdout IS '标准输出';
+COMMENT ON COLUMN t_sandbox_execution_payload.f_stderr IS '标准错误';
+COMMENT ON COLUMN t_sandbox_execution_payload.f_created_at IS '创建时间(毫秒时间戳)';
+COMMENT ON COLUMN t_sandbox_execution_payload.f_created_by IS '创建人';
+COMMENT ON COLUMN t_sandbox_execution_payload.f_updated_at IS '更新时间(毫秒时间戳)';
+COMMENT ON COLUMN t_sandbox_execution_payload.f_updated_by IS '更新人';
+COMMENT ON COLUMN t_sandbox_execution_payload.f_deleted_at IS '删除时间(毫秒时间戳,0:未删除)';
+COMMENT ON COLUMN t_sandbox_execution_payload.f_deleted_by IS '删除人';
+
+-- ================================================================
+-- Table: t_sandbox_execution_archive
+-- ================================================================
+-- 执行归档索引表（超过保留期的执行以 gzip JSONL 归档到 S3）
+CREATE TABLE IF NOT EXISTS t_sandbox_execution_archive
+(
+    f_execution_id    VARCHAR(40 CHAR)  NOT NULL,
+    f_session_id      VARCHAR(255 CHAR) NOT NULL,
+    f_archive_path    VARCHAR(512 CHAR) NOT NULL,
+    f_created_at      BIGINT            NOT NULL DEFAULT 0,
+    f_archived_at     BIGINT            NOT NULL DEFAULT 0,
+    CLUSTER PRIMARY KEY (f_execution_id)
+);
+
+-- Comments for t_sandbox_execution_archive
+COMMENT ON TABLE t_sandbox_execution_archive IS '执行归档索引表';
+COMMENT ON COLUMN t_sandbox_execution_archive.f_execution_id IS '执行ID';
+COMMENT ON COLUMN t_sandbox_execution_archive.f_session_id IS '会话ID引用';
+COMMENT ON COLUMN t_sandbox_execution_archive.f_archive_path IS '归档文件S3路径';
+COMMENT ON COLUMN t_sandbox_execution_archive.f_created_at IS '执行创建时间(毫秒时间戳)';
+COMMENT ON COLUMN t_sandbox_execution_archive.f_archived_at IS '归档时间(毫秒时间戳)';
+
+-- Indexes for t_sandbox_execution_archive
+DECLARE
+    v_count INT;
+BEGIN
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_EXECUTION_ARCHIVE_IDX_SESSION_ID';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX t_sandbox_execution_archive_idx_session_id ON t_sandbox_execution_archive(f_session_id)';
+    END IF;
+END;
+/
+
+-- ================================================================
+-- Table: t_sandbox_execution_dispatch
+-- ================================================================
+-- 执行分发队列表（与执行记录同一事务写入，分发者以 FOR UPDATE SKIP LOCKED 认领，投递成功后删除）
+CREATE TABLE IF NOT EXISTS t_sandbox_execution_dispatch
+(
+    f_execution_id    VARCHAR(40 CHAR)  NOT NULL,
+    f_session_id      VARCHAR(255 CHAR) NOT NULL,
+    f_seq             BIGINT            NOT NULL,
+    f_status          VARCHAR(20 CHAR)  NOT NULL DEFAULT 'pending',
+    f_attempts        INT               NOT NULL DEFAULT 0,
+    f_last_error      TEXT              NOT NULL,
+    f_next_attempt_at BIGINT            NOT NULL DEFAULT 0,
+    f_lease_until     BIGINT            NOT NULL DEFAULT 0,
+    f_enqueued_at     BIGINT            NOT NULL DEFAULT 0,
+    CLUSTER PRIMARY KEY (f_execution_id)
+);
+
+-- Comments for t_sandbox_execution_dispatch
+COMMENT ON TABLE t_sandbox_execution_dispatch IS '执行分发队列表';
+COMMENT ON COLUMN t_sandbox_execution_dispatch.f_execution_id IS '执行ID';
+COMMENT ON COLUMN t_sandbox_execution_dispatch.f_session_id IS '会话ID引用';
+COMMENT ON COLUMN t_sandbox_execution_dispatch.f_seq IS '入队序号(会话内FIFO)';
+COMMENT ON COLUMN t_sandbox_execution_dispatch.f_status IS '状态(pending/claimed)';
+COMMENT ON COLUMN t_sandbox_execution_dispatch.f_attempts IS '已投递次数';
+COMMENT ON COLUMN t_sandbox_execution_dispatch.f_last_error IS '最近一次投递错误';
+COMMENT ON COLUMN t_sandbox_execution_dispatch.f_next_attempt_at IS '下次投递时间(毫秒时间戳)';
+COMMENT ON COLUMN t_sandbox_execution_dispatch.f_lease_until IS '认领租约到期时间(毫秒时间戳)';
+COMMENT ON COLUMN t_sandbox_execution_dispatch.f_enqueued_at IS '入队时间(毫秒时间戳)';
+
+-- Indexes for t_sandbox_execution_dispatch
+DECLARE
+    v_count INT;
+BEGIN
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_EXECUTION_DISPATCH_IDX_SESSION_SEQ';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX t_sandbox_execution_dispatch_idx_session_seq ON t_sandbox_execution_dispatch(f_session_id, f_seq)';
+    END IF;
+
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_EXECUTION_DISPATCH_IDX_NEXT_ATTEMPT_AT';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX t_sandbox_execution_dispatch_idx_next_attempt_at ON t_sandbox_execution_dispatch(f_next_attempt_at)';
+    END IF;
+END;
+/
+
+-- ================================================================
+-- Table: t_sandbox_cache_version
+-- ================================================================
+-- 进程内缓存版本表（写入方递增版本号，其他副本比对后失效本地缓存）
+CREATE TABLE IF NOT EXISTS t_sandbox_cache_version
+(
+    f_name            VARCHAR(64 CHAR)  NOT NULL,
+    f_version         BIGINT            NOT NULL DEFAULT 0,
+    f_updated_at      BIGINT            NOT NULL DEFAULT 0,
+    CLUSTER PRIMARY KEY (f_name)
+);
+
+-- Comments for t_sandbox_cache_version
+COMMENT ON TABLE t_sandbox_cache_version IS '进程内缓存版本表';
+COMMENT ON COLUMN t_sandbox_cache_version.f_name IS '缓存名称';
+COMMENT ON COLUMN t_sandbox_cache_version.f_version IS '版本号';
+COMMENT ON COLUMN t_sandbox_cache_version.f_updated_at IS '更新时间(毫秒时间戳)';
+
+MERGE INTO t_sandbox_cache_version t
+USING (SELECT 'template' AS f_name FROM DUAL) s
+ON (t.f_name = s.f_name)
+WHEN NOT MATCHED THEN INSERT (f_name, f_version, f_updated_at) VALUES ('template', 0, 0);
+
+-- ================================================================
+-- Table: t_sandbox_leader_lease
+-- ================================================================
+-- 主节点租约表（持有者周期性续约，租约过期后其他进程接管）
+CREATE TABLE IF NOT EXISTS t_sandbox_leader_lease
+(
+    f_name            VARCHAR(64 CHAR)  NOT NULL,
+    f_holder          VARCHAR(255 CHAR) NOT NULL DEFAULT '',
+    f_lease_until     BIGINT            NOT NULL DEFAULT 0,
+    f_updated_at      BIGINT            NOT NULL DEFAULT 0,
+    CLUSTER PRIMARY KEY (f_name)
+);
+
+-- Comments for t_sandbox_leader_lease
+COMMENT ON TABLE t_sandbox_leader_lease IS '主节点租约表';
+COMMENT ON COLUMN t_sandbox_leader_lease.f_name IS '选举范围';
+COMMENT ON COLUMN t_sandbox_leader_lease.f_holder IS '租约持有者(主机名:进程号:随机后缀)';
+COMMENT ON COLUMN t_sandbox_leader_lease.f_lease_until IS '租约到期时间(毫秒时间戳)';
+COMMENT ON COLUMN t_sandbox_leader_lease.f_updated_at IS '更新时间(毫秒时间戳)';
+
+MERGE INTO t_sandbox_leader_lease t
+USING (SELECT 'background_tasks' AS f_name FROM DUAL) s
+ON (t.f_name = s.f_name)
+WHEN NOT MATCHED THEN INSERT (f_name, f_holder, f_lease_until, f_updated_at) VALUES ('background_tasks', '', 0, 0);
+
+-- ================================================================
+-- Table: t_sandbox_workspace_manifest
+-- ================================================================
+-- workspace 文件清单状态表（f_reconciled_at 为最近一次与对象存储对账的时间，0 表示已过期）
+CREATE TABLE IF NOT EXISTS t_sandbox_workspace_manifest
+(
+    f_session_id      VARCHAR(255 CHAR) NOT NULL,
+    f_reconciled_at   BIGINT            NOT NULL DEFAULT 0,
+    f_updated_at      BIGINT            NOT NULL DEFAULT 0,
+    CLUSTER PRIMARY KEY (f_session_id)
+);
+
+-- Comments for t_sandbox_workspace_manifest
+COMMENT ON TABLE t_sandbox_workspace_manifest IS 'workspace文件清单状态表';
+COMMENT ON COLUMN t_sandbox_workspace_manifest.f_session_id IS '会话ID引用';
+COMMENT ON COLUMN t_sandbox_workspace_manifest.f_reconciled_at IS '最近对账时间(毫秒时间戳,0表示已过期)';
+COMMENT ON COLUMN t_sandbox_workspace_manifest.f_updated_at IS '更新时间(毫秒时间戳)';
+
+-- Indexes for t_sandbox_workspace_manifest
+DECLARE
+    v_count INT;
+BEGIN
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_WORKSPACE_MANIFEST_IDX_RECONCILED_AT';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX t_sandbox_workspace_manifest_idx_reconciled_at ON t_sandbox_workspace_manifest(f_reconciled_at)';
+    END IF;
+END;
+/
+
+-- ================================================================
+-- Table: t_sandbox_workspace_file
+-- ================================================================
+-- workspace 文件清单表（文件列表、前缀过滤与计数按主键范围查询）
+CREATE TABLE IF NOT EXISTS t_sandbox_workspace_file
+(
+    f_session_id      VARCHAR(255 CHAR) NOT NULL,
+    f_path            VARCHAR(512 CHAR) NOT NULL,
+    f_size            BIGINT            NOT NULL DEFAULT 0,
+    f_etag            VARCHAR(64 CHAR)  NOT NULL DEFAULT '',
+    f_modified_at     BIGINT            NOT NULL DEFAULT 0,
+    f_updated_at      BIGINT            NOT NULL DEFAULT 0,
+    CLUSTER PRIMARY KEY (f_session_id, f_path)
+);
+
+-- Comments for t_sandbox_workspace_file
+COMMENT ON TABLE t_sandbox_workspace_file IS 'workspace文件清单表';
+COMMENT ON COLUMN t_sandbox_workspace_file.f_session_id IS '会话ID引用';
+COMMENT ON COLUMN t_sandbox_workspace_file.f_path IS '相对于workspace根目录的路径';
+COMMENT ON COLUMN t_sandbox_workspace_file.f_size IS '文件大小(字节)';
+COMMENT ON COLUMN t_sandbox_workspace_file.f_etag IS '对象ETag(对账前可能为空)';
+COMMENT ON COLUMN t_sandbox_workspace_file.f_modified_at IS '文件修改时间(毫秒时间戳)';
+COMMENT ON COLUMN t_sandbox_workspace_file.f_updated_at IS '记录写入时间(毫秒时间戳)';
+
+-- ================================================================
+-- Triggers for ON UPDATE behavior (updated_at 自动更新)
+-- ================================================================
+
+-- Trigger for t_sandbox_template.updated_at
+CREATE OR REPLACE TRIGGER trg_t_sandbox_template_updated_at
+BEFORE UPDATE ON t_sandbox_template
+FOR EACH ROW
+BEGIN
+    NEW.f_updated_at := TIMESTAMPDIFF2(SECOND, '1970-01-01 00:00:00', SYSDATE) * 1000;
+END;
+/
+
+-- Trigger for t_sandbox_runtime_node.updated_at
+CREATE OR REPLACE TRIGGER trg_t_sandbox_runtime_node_updated_at
+BEFORE UPDATE ON t_sandbox_runtime_node
+FOR EACH ROW
+BEGIN
+    NEW.f_updated_at := TIMESTAMPDIFF2(SECOND, '1970-01-01 00:00:00', SYSDATE) * 1000;
+END;
+/
+
+-- Trigger for t_sandbox_session.updated_at
+CREATE OR REPLACE TRIGGER trg_t_sandbox_session_updated_at
+BEFORE UPDATE ON t_sandbox_session
+FOR EACH ROW
+BEGIN
+    NEW.f_updated_at := TIMESTAMPDIFF2(SECOND, '1970-01-01 00:00:00', SYSDATE) * 1000;
+END;
+/
+
+-- Trigger for t_sandbox_execution.updated_at
+CREATE OR REPLACE TRIGGER trg_t_sandbox_execution_updated_at
+BEFORE UPDATE ON t_sandbox_execution
+FOR EACH ROW
+BEGIN
+    NEW.f_updated_at := TIMESTAMPDIFF2(SECOND, '1970-01-01 00:00:00', SYSDATE) * 1000;
+END;
+/
+
+-- Trigger for t_sandbox_execution_payload.updated_at
+CREATE OR REPLACE TRIGGER trg_t_sandbox_execution_payload_updated_at
+BEFORE UPDATE ON t_sandbox_execution_payload
+FOR EACH ROW
+BEGIN
+    NEW.f_updated_at := TIMESTAMPDIFF2(SECOND, '1970-01-01 00:00:00', SYSDATE) * 1000;
+END;
+/
+
+-- ================================================================
+-- Upgrade from 0.3.0
+-- ================================================================
+-- 列表接口改为 (created_at, id) 键集分页，单列索引由复合索引替代
+DROP INDEX IF EXISTS t_sandbox_session_idx_created_at;
+DROP INDEX IF EXISTS t_sandbox_session_idx_status;
+DROP INDEX IF EXISTS t_sandbox_execution_idx_session_id;
+
+-- 索引审计：被复合索引覆盖的单列索引
+DROP INDEX IF EXISTS t_sandbox_session_idx_last_activity_at;
+DROP INDEX IF EXISTS t_sandbox_session_idx_runtime_node;
+DROP INDEX IF EXISTS t_sandbox_session_idx_template_id;
+DROP INDEX IF EXISTS t_sandbox_execution_idx_created_at;
+
+-- 执行记录冷热拆分：代码与输出迁移到 t_sandbox_execution_payload
+DECLARE
+    v_count INT;
+BEGIN
+    SELECT COUNT(*) INTO v_count FROM USER_TAB_COLUMNS
+    WHERE TABLE_NAME = 'T_SANDBOX_EXECUTION' AND COLUMN_NAME = 'F_CODE';
+    IF v_count > 0 THEN
+        EXECUTE IMMEDIATE 'INSERT INTO t_sandbox_execution_payload (
+            f_execution_id, f_code, f_event_data, f_return_value, f_stdout, f_stderr,
+            f_created_at, f_created_by, f_updated_at, f_updated_by, f_deleted_at, f_deleted_by)
+        SELECT f_id, f_code, f_event_data, f_return_value, f_stdout, f_stderr,
+            f_created_at, f_created_by, f_updated_at, f_updated_by, f_deleted_at, f_deleted_by
+        FROM t_sandbox_execution e
+        WHERE NOT EXISTS (
+            SELECT 1 FROM t_sandbox_execution_payload p WHERE p.f_execution_id = e.f_id)';
+        EXECUTE IMMEDIATE 'ALTER TABLE t_sandbox_execution DROP COLUMN f_code';
+        EXECUTE IMMEDIATE 'ALTER TABLE t_sandbox_execution DROP COLUMN f_event_data';
+        EXECUTE IMMEDIATE 'ALTER TABLE t_sandbox_execution DROP COLUMN f_return_value';
+        EXECUTE IMMEDIATE 'ALTER TABLE t_sandbox_execution DROP COLUMN f_stdout';
+        EXECUTE IMMEDIATE 'ALTER TABLE t_sandbox_execution DROP COLUMN f_stderr';
+    END IF;
+END;
+/
+
+-- 执行心跳：最后心跳时间批量写回，按 (状态, 心跳时间) 查找停止心跳的执行
+DECLARE
+    v_count INT;
+BEGIN
+    SELECT COUNT(*) INTO v_count FROM USER_TAB_COLUMNS
+    WHERE TABLE_NAME = 'T_SANDBOX_EXECUTION' AND COLUMN_NAME = 'F_LAST_HEARTBEAT_AT';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'ALTER TABLE t_sandbox_execution ADD f_last_heartbeat_at BIGINT DEFAULT 0 NOT NULL';
+    END IF;
+
+    SELECT COUNT(*) INTO v_count FROM USER_INDEXES WHERE INDEX_NAME = 'T_SANDBOX_EXECUTION_IDX_STATUS_LAST_HEARTBEAT_AT';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX t_sandbox_execution_idx_status_last_heartbeat_at ON t_sandbox_execution(f_status, f_last_heartbeat_at)';
+    END IF;
+END;
+/
+COMMENT ON COLUMN t_sandbox_execution.f_last_heartbeat_at IS '最后心跳时间(毫秒时间戳,0:未收到心跳)';
+DROP INDEX IF EXISTS t_sandbox_execution_idx_status;
+
+-- 执行分发队列：会话内入队序号由会话行上的计数器分配（入队事务中递增）
+DECLARE
+    v_count INT;
+BEGIN
+    SELECT COUNT(*) INTO v_count FROM USER_TAB_COLUMNS
+    WHERE TABLE_NAME = 'T_SANDBOX_SESSION' AND COLUMN_NAME = 'F_DISPATCH_SEQ';
+    IF v_count = 0 THEN
+        EXECUTE IMMEDIATE 'ALTER TABLE t_sandbox_session ADD f_dispatch_seq BIGINT DEFAULT 0 NOT NULL';
+    END IF;
+END;
+/
+COMMENT ON COLUMN t_sandbox_session.f_dispatch_seq IS '执行分发队列入队序号计数器';
+
+COMMIT;
@@ -0,0 +1,322 @@
+-- ================================================================
+-- Sandbox Control Plane Database Schema for MariaDB
+-- Version: 0.4.0
+-- Database: adp
+--
+-- 数据表命名规范:
+-- - 表名: t_{module}_{entity} (小写 + 下划线)
+-- - 字段名: f_{field_name} (小写 + 下划线)
+-- - 时间戳: BIGINT (毫秒级时间戳)
+-- - 索引名: t_{table}_idx_{field} / t_{table}_uk_{field}
+--
+-- 表说明:
+-- - t_sandbox_session: 沙箱会话管理表
+-- - t_sandbox_execution: 代码执行记录表
+-- - t_sandbox_execution_payload: 执行代码与输出表（执行记录的冷数据）
+-- - t_sandbox_execution_archive: 执行归档索引表（已迁入 S3 的执行位置）
+-- - t_sandbox_execution_dispatch: 执行分发队列表（执行 API 与执行器之间）
+-- - t_sandbox_cache_version: 进程内缓存版本表（跨副本失效）
+-- - t_sandbox_leader_lease: 主节点租约表（后台任务单实例执行）
+-- - t_sandbox_workspace_manifest: workspace 文件清单状态表（最近对账时间）
+-- - t_sandbox_workspace_file: workspace 文件清单表（文件列表与计数）
+-- - t_sandbox_template: 沙箱模板定义表
+-- - t_sandbox_runtime_node: 运行时节点注册表
+-- ================================================================
+
+USE adp;
+
+-- ================================================================
+-- Table: t_sandbox_template
+-- ================================================================
+-- 沙箱模板定义表（基础表，被 session 引用，先创建）
+CREATE TABLE IF NOT EXISTS `t_sandbox_template` (
+  `f_id` varchar(40) NOT NULL,
+  `f_name` varchar(128) NOT NULL,
+  `f_description` varchar(500) NOT NULL,
+  `f_image_url` varchar(512) NOT NULL,
+  `f_base_image` varchar(256) NOT NULL,
+  `f_runtime_type` varchar(30) NOT NULL,
+  `f_default_cpu_cores` decimal(3,1) NOT NULL,
+  `f_default_memory_mb` int(11) NOT NULL,
+  `f_default_disk_mb` int(11) NOT NULL,
+  `f_default_timeout_sec` int(11) NOT NULL,
+  `f_pre_installed_packages` text NOT NULL,
+  `f_default_env_vars` text NOT NULL,
+  `f_security_context` text NOT NULL,
+  `f_is_active` int(11) NOT NULL,
+  `f_created_at` bigint(20) NOT NULL,
+  `f_created_by` varchar(40) NOT NULL,
+  `f_updated_at` bigint(20) NOT NULL,
+  `f_updated_by` varchar(40) NOT NULL,
+  `f_deleted_at` bigint(20) NOT NULL,
+  `f_deleted_by` varchar(36) NOT NULL,
+  PRIMARY KEY (`f_id`),
+  UNIQUE KEY `t_sandbox_template_uk_name_deleted_at` (`f_name`,`f_deleted_at`),
+  KEY `t_sandbox_template_idx_runtime_type` (`f_runtime_type`),
+  KEY `t_sandbox_template_idx_is_active` (`f_is_active`),
+  KEY `t_sandbox_template_idx_created_at` (`f_created_at`),
+  KEY `t_sandbox_template_idx_deleted_at` (`f_deleted_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ================================================================
+-- Table: t_sandbox_runtime_node
+-- ================================================================
+-- 运行时节点注册表
+CREATE TABLE IF NOT EXISTS `t_sandbox_runtime_node` (
+  `f_node_id` varchar(40) NOT NULL,
+  `f_hostname` varchar(128) NOT NULL,
+  `f_runtime_type` varchar(20) NOT NULL,
+  `f_ip_address` varchar(45) NOT NULL,
+  `f_api_endpoint` varchar(512) NOT NULL,
+  `f_status` varchar(20) NOT NULL,
+  `f_total_cpu_cores` decimal(5,1) NOT NULL,
+  `f_total_memory_mb` int(11) NOT NULL,
+  `f_allocated_cpu_cores` decimal(5,1) NOT NULL,
+  `f_allocated_memory_mb` int(11) NOT NULL,
+  `f_running_containers` int(11) NOT NULL,
+  `f_max_containers` int(11) NOT NULL,
+  `f_cached_images` text NOT NULL,
+  `f_labels` text NOT NULL,
+  `f_last_heartbeat_at` bigint(20) NOT NULL,
+  `f_created_at` bigint(20) NOT NULL,
+  `f_created_by` varchar(40) NOT NULL,
+  `f_updated_at` bigint(20) NOT NULL,
+  `f_updated_by` varchar(40) NOT NULL,
+  `f_deleted_at` bigint(20) NOT NULL,
+  `f_deleted_by` varchar(36) NOT NULL,
+  PRIMARY KEY (`f_node_id`),
+  UNIQUE KEY `f_hostname` (`f_hostname`),
+  UNIQUE KEY `t_sandbox_runtime_node_uk_hostname_deleted_at` (`f_hostname`,`f_deleted_at`),
+  KEY `t_sandbox_runtime_node_idx_status` (`f_status`),
+  KEY `t_sandbox_runtime_node_idx_runtime_type` (`f_runtime_type`),
+  KEY `t_sandbox_runtime_node_idx_created_at` (`f_created_at`),
+  KEY `t_sandbox_runtime_node_idx_deleted_at` (`f_deleted_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ================================================================
+-- Table: t_sandbox_session
+-- ================================================================
+-- 沙箱会话管理表（含依赖安装支持）
+CREATE TABLE IF NOT EXISTS `t_sandbox_session` (
+  `f_id` varchar(255) NOT NULL,
+  `f_template_id` varchar(40) NOT NULL,
+  `f_status` varchar(20) NOT NULL,
+  `f_runtime_type` varchar(20) NOT NULL,
+  `f_runtime_node` varchar(128) NOT NULL,
+  `f_container_id` varchar(128) NOT NULL,
+  `f_pod_name` varchar(128) NOT NULL,
+  `f_workspace_path` varchar(256) NOT NULL,
+  `f_resources_cpu` varchar(16) NOT NULL,
+  `f_resources_memory` varchar(16) NOT NULL,
+  `f_resources_disk` varchar(16) NOT NULL,
+  `f_env_vars` text NOT NULL,
+  `f_timeout` int(11) NOT NULL,
+  `f_last_activity_at` bigint(20) NOT NULL,
+  `f_completed_at` bigint(20) NOT NULL,
+  `f_python_package_index_url` varchar(512) NOT NULL DEFAULT 'https://pypi.org/simple/',
+  `f_requested_dependencies` text NOT NULL,
+  `f_installed_dependencies` text NOT NULL,
+  `f_dependency_install_status` varchar(20) NOT NULL,
+  `f_dependency_install_error` text NOT NULL,
+  `f_dependency_install_started_at` bigint(20) NOT NULL,
+  `f_dependency_install_completed_at` bigint(20) NOT NULL,
+  `f_dispatch_seq` bigint(20) NOT NULL DEFAULT 0,
+  `f_created_at` bigint(20) NOT NULL,
+  `f_created_by` varchar(40) NOT NULL,
+  `f_updated_at` bigint(20) NOT NULL,
+  `f_updated_by` varchar(40) NOT NULL,
+  `f_deleted_at` bigint(20) NOT NULL,
+  `f_deleted_by` varchar(36) NOT NULL,
+  PRIMARY KEY (`f_id`),
+  KEY `t_sandbox_session_idx_status_last_activity_at` (`f_status`,`f_last_activity_at`),
+  KEY `t_sandbox_session_idx_dependency_install_status` (`f_dependency_install_status`),
+  KEY `t_sandbox_session_idx_created_by` (`f_created_by`),
+  KEY `t_sandbox_session_idx_created_at_id` (`f_created_at`,`f_id`),
+  KEY `t_sandbox_session_idx_template_created_at` (`f_template_id`,`f_created_at`,`f_id`),
+  KEY `t_sandbox_session_idx_deleted_at` (`f_deleted_at`),
+  KEY `t_sandbox_session_idx_status_created_at` (`f_status`,`f_created_at`,`f_id`),
+  KEY `t_sandbox_session_idx_runtime_node_status` (`f_runtime_node`,`f_status`),
+  KEY `t_sandbox_session_idx_container_id` (`f_container_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ================================================================
+-- Table: t_sandbox_execution
+-- ================================================================
+-- 代码执行记录表
+CREATE TABLE IF NOT EXISTS `t_sandbox_execution` (
+  `f_id` varchar(40) NOT NULL,
+  `f_session_id` varchar(255) NOT NULL,
+  `f_status` varchar(20) NOT NULL,
+  `f_language` varchar(32) NOT NULL,
+  `f_entrypoint` varchar(255) NOT NULL,
+  `f_timeout_sec` int(11) NOT NULL,
+  `f_exit_code` int(11) NOT NULL,
+  `f_metrics` text NOT NULL,
+  `f_error_message` text NOT NULL,
+  `f_started_at` bigint(20) NOT NULL,
+  `f_completed_at` bigint(20) NOT NULL,
+  `f_last_heartbeat_at` bigint(20) NOT NULL DEFAULT 0,
+  `f_created_at` bigint(20) NOT NULL,
+  `f_created_by` varchar(40) NOT NULL,
+  `f_updated_at` bigint(20) NOT NULL,
+  `f_updated_by` varchar(40) NOT NULL,
+  `f_deleted_at` bigint(20) NOT NULL,
+  `f_deleted_by` varchar(36) NOT NULL,
+  PRIMARY KEY (`f_id`),
+  KEY `t_sandbox_execution_idx_deleted_at` (`f_deleted_at`),
+  KEY `t_sandbox_execution_idx_created_by` (`f_created_by`),
+  KEY `t_sandbox_execution_idx_session_created_at` (`f_session_id`,`f_created_at`,`f_id`),
+  KEY `t_sandbox_execution_idx_status_last_heartbeat_at` (`f_status`,`f_last_heartbeat_at`),
+  KEY `t_sandbox_execution_idx_created_at_id` (`f_created_at`,`f_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS `t_sandbox_execution_payload` (
+  `f_execution_id` varchar(40) NOT NULL,
+  `f_code` text NOT NULL,
+  `f_event_data` text NOT NULL,
+  `f_return_value` text NOT NULL,
+  `f_stdout` text NOT NULL,
+  `f_stderr` text NOT NULL,
+  `f_created_at` bigint(20) NOT NULL,
+  `f_created_by` varchar(40) NOT NULL,
+  `f_updated_at` bigint(20) NOT NULL,
+  `f_updated_by` varchar(40) NOT NULL,
+  `f_deleted_at` bigint(20) NOT NULL,
+  `f_deleted_by` varchar(36) NOT NULL,
+  PRIMARY KEY (`f_execution_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS `t_sandbox_execution_archive` (
+  `f_execution_id` varchar(40) NOT NULL,
+  `f_session_id` varchar(255) NOT NULL,
+  `f_archive_path` varchar(512) NOT NULL,
+  `f_created_at` bigint(20) NOT NULL,
+  `f_archived_at` bigint(20) NOT NULL,
+  PRIMARY KEY (`f_execution_id`),
+  KEY `t_sandbox_execution_archive_idx_session_id` (`f_session_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ================================================================
+-- Table: t_sandbox_execution_dispatch
+-- ================================================================
+-- 执行分发队列表（与执行记录同一事务写入，分发者以 FOR UPDATE SKIP LOCKED 认领，投递成功后删除）
+CREATE TABLE IF NOT EXISTS `t_sandbox_execution_dispatch` (
+  `f_execution_id` varchar(40) NOT NULL,
+  `f_session_id` varchar(255) NOT NULL,
+  `f_seq` bigint(20) NOT NULL,
+  `f_status` varchar(20) NOT NULL DEFAULT 'pending',
+  `f_attempts` int(11) NOT NULL DEFAULT 0,
+  `f_last_error` text NOT NULL,
+  `f_next_attempt_at` bigint(20) NOT NULL DEFAULT 0,
+  `f_lease_until` bigint(20) NOT NULL DEFAULT 0,
+  `f_enqueued_at` bigint(20) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`f_execution_id`),
+  KEY `t_sandbox_execution_dispatch_idx_session_seq` (`f_session_id`,`f_seq`),
+  KEY `t_sandbox_execution_dispatch_idx_next_attempt_at` (`f_next_attempt_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ================================================================
+-- Table: t_sandbox_cache_version
+-- ================================================================
+-- 进程内缓存版本表（写入方递增版本号，其他副本比对后失效本地缓存）
+CREATE TABLE IF NOT EXISTS `t_sandbox_cache_version` (
+  `f_name` varchar(64) NOT NULL,
+  `f_version` bigint(20) NOT NULL DEFAULT 0,
+  `f_updated_at` bigint(20) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`f_name`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+INSERT IGNORE INTO `t_sandbox_cache_version` (`f_name`, `f_version`, `f_updated_at`) VALUES ('template', 0, 0);
+
+-- ================================================================
+-- Table: t_sandbox_leader_lease
+-- ================================================================
+-- 主节点租约表（持有者周期性续约，租约过期后其他进程接管）
+CREATE TABLE IF NOT EXISTS `t_sandbox_leader_lease` (
+  `f_name` varchar(64) NOT NULL,
+  `f_holder` varchar(255) NOT NULL DEFAULT '',
+  `f_lease_until` bigint(20) NOT NULL DEFAULT 0,
+  `f_updated_at` bigint(20) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`f_name`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+INSERT IGNORE INTO `t_sandbox_leader_lease` (`f_name`, `f_holder`, `f_lease_until`, `f_updated_at`) VALUES ('background_tasks', '', 0, 0);
+
+-- ================================================================
+-- Table: t_sandbox_workspace_manifest
+-- ================================================================
+-- workspace 文件清单状态表（f_reconciled_at 为最近一次与对象存储对账的时间，0 表示已过期）
+CREATE TABLE IF NOT EXISTS `t_sandbox_workspace_manifest` (
+  `f_session_id` varchar(255) NOT NULL,
+  `f_reconciled_at` bigint(20) NOT NULL DEFAULT 0,
+  `f_updated_at` bigint(20) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`f_session_id`),
+  KEY `t_sandbox_workspace_manifest_idx_reconciled_at` (`f_reconciled_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ================================================================
+-- Table: t_sandbox_workspace_file
+-- ================================================================
+-- workspace 文件清单表（文件列表、前缀过滤与计数按主键范围查询）
+CREATE TABLE IF NOT EXISTS `t_sandbox_workspace_file` (
+  `f_session_id` varchar(255) NOT NULL,
+  `f_path` varchar(512) NOT NULL,
+  `f_size` bigint(20) NOT NULL DEFAULT 0,
+  `f_etag` varchar(64) NOT NULL DEFAULT '',
+  `f_modified_at` bigint(20) NOT NULL DEFAULT 0,
+  `f_updated_at` bigint(20) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`f_session_id`,`f_path`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ================================================================
+-- Upgrade from 0.3.0
+-- ================================================================
+-- 列表接口改为 (created_at, id) 键集分页，单列索引由复合索引替代
+CREATE INDEX IF NOT EXISTS `t_sandbox_session_idx_created_at_id` ON `t_sandbox_session` (`f_created_at`, `f_id`);
+CREATE INDEX IF NOT EXISTS `t_sandbox_session_idx_status_created_at` ON `t_sandbox_session` (`f_status`, `f_created_at`, `f_id`);
+CREATE INDEX IF NOT EXISTS `t_sandbox_execution_idx_session_created_at` ON `t_sandbox_execution` (`f_session_id`, `f_created_at`, `f_id`);
+DROP INDEX IF EXISTS `t_sandbox_session_idx_created_at` ON `t_sandbox_session`;
+DROP INDEX IF EXISTS `t_sandbox_session_idx_status` ON `t_sandbox_session`;
+DROP INDEX IF EXISTS `t_sandbox_execution_idx_session_id` ON `t_sandbox_execution`;
+
+-- 索引审计：为热点查询补齐复合索引，被覆盖的单列索引随之删除
+CREATE INDEX IF NOT EXISTS `t_sandbox_session_idx_container_id` ON `t_sandbox_session` (`f_container_id`);
+CREATE INDEX IF NOT EXISTS `t_sandbox_session_idx_status_last_activity_at` ON `t_sandbox_session` (`f_status`, `f_last_activity_at`);
+CREATE INDEX IF NOT EXISTS `t_sandbox_session_idx_runtime_node_status` ON `t_sandbox_session` (`f_runtime_node`, `f_status`);
+CREATE INDEX IF NOT EXISTS `t_sandbox_session_idx_template_created_at` ON `t_sandbox_session` (`f_template_id`, `f_created_at`, `f_id`);
+CREATE INDEX IF NOT EXISTS `t_sandbox_execution_idx_created_at_id` ON `t_sandbox_execution` (`f_created_at`, `f_id`);
+DROP INDEX IF EXISTS `t_sandbox_session_idx_last_activity_at` ON `t_sandbox_session`;
+DROP INDEX IF EXISTS `t_sandbox_session_idx_runtime_node` ON `t_sandbox_session`;
+DROP INDEX IF EXISTS `t_sandbox_session_idx_template_id` ON `t_sandbox_session`;
+DROP INDEX IF EXISTS `t_sandbox_execution_idx_created_at` ON `t_sandbox_execution`;
+
+-- 执行记录冷热拆分：代码与输出迁移到 t_sandbox_execution_payload
+SET @has_execution_code := (
+  SELECT COUNT(*) FROM information_schema.COLUMNS
+  WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 't_sandbox_execution' AND COLUMN_NAME = 'f_code'
+);
+SET @split_execution_sql := IF(@has_execution_code > 0,
+  'INSERT IGNORE INTO `t_sandbox_execution_payload` (
+     `f_execution_id`, `f_code`, `f_event_data`, `f_return_value`, `f_stdout`, `f_stderr`,
+     `f_created_at`, `f_created_by`, `f_updated_at`, `f_updated_by`, `f_deleted_at`, `f_deleted_by`)
+   SELECT `f_id`, `f_code`, `f_event_data`, `f_return_value`, `f_stdout`, `f_stderr`,
+     `f_created_at`, `f_created_by`, `f_updated_at`, `f_updated_by`, `f_deleted_at`, `f_deleted_by`
+   FROM `t_sandbox_execution`',
+  'DO 0');
+PREPARE split_execution_stmt FROM @split_execution_sql;
+EXECUTE split_execution_stmt;
+DEALLOCATE PREPARE split_execution_stmt;
+ALTER TABLE `t_sandbox_execution`
+  DROP COLUMN IF EXISTS `f_code`,
+  DROP COLUMN IF EXISTS `f_event_data`,
+  DROP COLUMN IF EXISTS `f_return_value`,
+  DROP COLUMN IF EXISTS `f_stdout`,
+  DROP COLUMN IF EXISTS `f_stderr`;
+
+-- 执行心跳：最后心跳时间批量写回，按 (状态, 心跳时间) 查找停止心跳的执行
+ALTER TABLE `t_sandbox_execution` ADD COLUMN IF NOT EXISTS `f_last_heartbeat_at` bigint(20) NOT NULL DEFAULT 0 AFTER `f_completed_at`;
+CREATE INDEX IF NOT EXISTS `t_sandbox_execution_idx_status_last_heartbeat_at` ON `t_sandbox_execution` (`f_status`, `f_last_heartbeat_at`);
+DROP INDEX IF EXISTS `t_sandbox_execution_idx_status` ON `t_sandbox_execution`;
+
+-- 执行分发队列：会话内入队序号由会话行上的计数器分配（入队事务中递增）
+ALTER TABLE `t_sandbox_session` ADD COLUMN IF NOT EXISTS `f_dispatch_seq` bigint(20) NOT NULL DEFAULT 0 AFTER `f_dependency_install_completed_at`;
@@ -0,0 +1,207 @@
+"""
+S3 存储适配器基准测试
+
+对比 S3Storage（boto3 + asyncio.to_thread）与 AsyncS3Storage（httpx 连接池）
+在并发 PUT / HEAD / GET 下的吞吐与延迟。
+
+S3 由本地替身服务提供（Starlette + uvicorn 子进程，数据保存在内存中），
+可通过 --latency-ms 模拟网络等待；--threads 限制默认线程池大小，
+--blocking-callers 在测试期间持续占用线程池（每次阻塞 --blocking-ms），
+模拟与 K8s 客户端等其他 to_thread 调用方共享线程池时的竞争。
+
+使用方法（在 sandbox_control_plane 目录下）：
+    python scripts/benchmark_s3_storage.py --requests 2000 --concurrency 64 --latency-ms 5 --threads 8 --blocking-callers 6
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.infrastructure.storage.async_s3_storage import AsyncS3Storage  # noqa: E402
+from src.infrastructure.storage.s3_storage import S3Storage  # noqa: E402
+
+BUCKET = "benchmark"
+
+
+def create_s3_standin(latency: float) -> Starlette:
+    """创建内存中的 S3 替身，只实现基准测试用到的对象操作"""
+    objects = {}
+
+    async def bucket(request: Request) -> Response:
+        await asyncio.sleep(latency)
+        return Response(status_code=200)
+
+    async def obj(request: Request) -> Response:
+        await asyncio.sleep(latency)
+        key = request.path_params["key"]
+        if request.method == "PUT":
+            objects[key] = await request.body()
+            return Response(status_code=200, headers={"ETag": '"standin"'})
+        if request.method == "DELETE":
+            objects.pop(key, None)
+            return Response(status_code=204)
+        if key not in objects:
+            body = b"" if request.method == "HEAD" else b"<Error><Code>NoSuchKey</Code></Error>"
+            return Response(body, status_code=404)
+        headers = {
+            "ETag": '"standin"',
+            "Content-Length": str(len(objects[key])),
+            "Last-Modified": "Fri, 02 Jan 2026 03:04:05 GMT",
+        }
+        if request.method == "HEAD":
+            return Response(status_code=200, headers=headers)
+        return Response(objects[key], headers=headers, media_type="application/octet-stream")
+
+    return Starlette(routes=[
+        Route(f"/{BUCKET}", bucket, methods=["HEAD", "PUT"]),
+        Route(f"/{BUCKET}/{{key:path}}", obj, methods=["HEAD", "GET", "PUT", "DELETE"]),
+    ])
+
+
+def serve_standin(port: int, latency: float) -> None:
+    uvicorn.run(create_s3_standin(latency), host="127.0.0.1", port=port, log_level="warning")
+
+
+def start_standin(latency: float) -> str:
+    """在独立进程中启动 S3 替身（避免与被测适配器争用 GIL），返回端点 URL"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    multiprocessing.Process(target=serve_standin, args=(port, latency), daemon=True).start()
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def make_settings(endpoint: str, concurrency: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        s3_endpoint_url=endpoint,
+        s3_access_key_id="benchmark",
+        s3_secret_access_key="benchmark",
+        s3_region="us-east-1",
+        s3_bucket=BUCKET,
+        s3_max_connections=concurrency,
+        s3_connect_timeout_seconds=5.0,
+        s3_metadata_timeout_seconds=10.0,
+        s3_transfer_timeout_seconds=120.0,
+        s3_max_attempts=3,
+        s3_retry_base_delay_seconds=0.2,
+    )
+
+
+async def run_phase(name, operation, requests: int, concurrency: int) -> dict:
+    """以固定并发执行 requests 次操作，返回吞吐与延迟统计"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await operation(f"objects/{i % 1000}.bin")
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "phase": name,
+        "ops_per_s": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def benchmark(storage, args, payload: bytes) -> list:
+    await storage.initialize()
+    results = [
+        await run_phase("put", lambda path: storage.upload_file(path, payload), args.requests, args.concurrency),
+        await run_phase("head", storage.file_exists, args.requests, args.concurrency),
+        await run_phase("get", storage.download_file, args.requests, args.concurrency),
+    ]
+    if hasattr(storage, "close"):
+        await storage.close()
+    return results
+
+
+async def blocking_caller(seconds: float) -> None:
+    """模拟其他通过 to_thread 调用阻塞客户端的组件"""
+    while True:
+        await asyncio.to_thread(time.sleep, seconds)
+
+
+def run_adapter(name: str, factory, args, payload: bytes) -> list:
+    async def main():
+        if args.threads:
+            asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=args.threads))
+        blockers = [
+            asyncio.create_task(blocking_caller(args.blocking_ms / 1000))
+            for _ in range(args.blocking_callers)
+        ]
+        try:
+            return await benchmark(factory(), args, payload)
+        finally:
+            for task in blockers:
+                task.cancel()
+
+    results = asyncio.run(main())
+    for result in results:
+        result["adapter"] = name
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="每个阶段的请求数")
+    parser.add_argument("--concurrency", type=int, default=64, help="并发请求数")
+    parser.add_argument("--size", type=int, default=16 * 1024, help="对象大小（字节）")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="替身服务每个请求的模拟延迟")
+    parser.add_argument("--threads", type=int, default=0, help="默认线程池大小，0 表示使用 asyncio 默认值")
+    parser.add_argument("--blocking-callers", type=int, default=0, help="持续占用线程池的并发阻塞调用数")
+    parser.add_argument("--blocking-ms", type=float, default=50.0, help="每次阻塞调用的时长")
+    args = parser.parse_args()
+
+    endpoint = start_standin(args.latency_ms / 1000)
+    settings = make_settings(endpoint, args.concurrency)
+    payload = os.urandom(args.size)
+
+    results = []
+    with patch("src.infrastructure.storage.s3_storage.get_settings", return_value=settings), \
+            patch("src.infrastructure.storage.async_s3_storage.get_settings", return_value=settings):
+        results += run_adapter("boto3", S3Storage, args, payload)
+        results += run_adapter("async", AsyncS3Storage, args, payload)
+
+    print(
+        f"requests={args.requests} concurrency={args.concurrency} size={args.size}B "
+        f"latency={args.latency_ms}ms threads={args.threads or 'default'} "
+        f"blocking_callers={args.blocking_callers}"
+    )
+    print(f"{'adapter':<8} {'phase':<6} {'ops/s':>10} {'p50 ms':>10} {'p99 ms':>10}")
+    for r in results:
+        print(f"{r['adapter']:<8} {r['phase']:<6} {r['ops_per_s']:>10.1f} {r['p50_ms']:>10.2f} {r['p99_ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+上报执行结果命令
+
+定义 Executor 回调上报执行结果的命令对象。
+"""
+from dataclasses import asdict, dataclass, field
+from typing import Any, List, Literal, Optional
+
+ResultStatus = Literal["success", "failed", "timeout", "crashed"]
+
+VALID_RESULT_STATUSES = {"success", "failed", "timeout", "crashed"}
+
+
+@dataclass
+class ReportExecutionResultCommand:
+    """上报执行结果命令"""
+    execution_id: str
+    status: ResultStatus
+    exit_code: int
+    execution_time: float
+    stdout: str = ""
+    stderr: str = ""
+    return_value: Optional[Any] = None
+    metrics: Optional[dict] = None
+    artifacts: List[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        """初始化后验证"""
+        if self.status not in VALID_RESULT_STATUSES:
+            raise ValueError(f"Invalid status: {self.status}")
+
+    def to_dict(self) -> dict:
+        """序列化为字典（写入结果日志）"""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ReportExecutionResultCommand":
+        """从字典恢复（重放结果日志）"""
+        return cls(**data)
@@ -38,15 +38,15 @@ class ExecutionDTO:
     """执行数据传输对象"""
     id: str
     session_id: str
-    code: str
+    code: Optional[str]  # 未加载载荷时为 None
     language: str
     timeout: int  # 超时时间（秒）
     status: str
     exit_code: Optional[int] = None
     error_message: Optional[str] = None
     execution_time: Optional[float] = None
-    stdout: str = ""
-    stderr: str = ""
+    stdout: Optional[str] = ""
+    stderr: Optional[str] = ""
     artifacts: List[ArtifactDTO] = None
     retry_count: int = 0
     created_at: datetime = None
@@ -55,6 +55,7 @@ class ExecutionDTO:
     last_heartbeat_at: Optional[datetime] = None
     return_value: Optional[dict] = None  # handler 函数返回值
     metrics: Optional[dict] = None  # 性能指标
+    result_loaded: bool = True  # 是否加载了代码、输出与返回值
 
     def __post_init__(self):
         """初始化默认值"""
@@ -65,19 +66,25 @@ class ExecutionDTO:
 
     @classmethod
     def from_entity(cls, execution) -> "ExecutionDTO":
-        """从领域实体创建 DTO"""
+        """
+        从领域实体创建 DTO
+
+        实体未加载载荷（状态查询）时，code/stdout/stderr/return_value 置为 None，
+        以区分“未加载”与“输出为空”。
+        """
+        loaded = execution.payload_loaded
         return cls(
             id=execution.id,
             session_id=execution.session_id,
-            code=execution.code,
+            code=execution.code if loaded else None,
             language=execution.language,
             timeout=execution.timeout,
             status=execution.state.status.value,
             exit_code=execution.state.exit_code,
             error_message=execution.state.error_message,
             execution_time=execution.execution_time,
-            stdout=execution.stdout,
-            stderr=execution.stderr,
+            stdout=execution.stdout if loaded else None,
+            stderr=execution.stderr if loaded else None,
             artifacts=[
                 ArtifactDTO.from_entity(artifact)
                 for artifact in execution.artifacts
@@ -87,6 +94,7 @@ class ExecutionDTO:
             started_at=None,  # Not tracked in domain entity
             completed_at=execution.completed_at,
             last_heartbeat_at=execution.last_heartbeat_at,
-            return_value=execution.return_value,
+            return_value=execution.return_value if loaded else None,
             metrics=execution.metrics,
+            result_loaded=loaded,
         )
@@ -0,0 +1,53 @@
+"""
+文件数据传输对象
+
+用于应用层与接口层之间的数据传输。
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Optional, Tuple
+
+
+@dataclass
+class FileDownloadDTO:
+    """
+    文件下载数据传输对象
+
+    下载结果为以下之一：
+    - not_modified: 客户端缓存的 ETag 仍然有效，不返回内容
+    - presigned_url: 文件超过代理阈值，由客户端直接从对象存储下载
+    - range_not_satisfiable: 请求的区间超出文件大小
+    - stream: 按块读取的文件内容；content_range 不为空时只包含该区间
+    """
+    path: str
+    size: int
+    content_type: str
+    etag: Optional[str] = None
+    last_modified: Optional[datetime] = None
+    not_modified: bool = False
+    presigned_url: Optional[str] = None
+    range_not_satisfiable: bool = False
+    content_range: Optional[Tuple[int, int]] = None
+    stream: Optional[AsyncIterator[bytes]] = None
+
+    @property
+    def content_length(self) -> int:
+        """响应体字节数"""
+        if self.content_range:
+            start, end = self.content_range
+            return end - start + 1
+        return self.size
+
+
+@dataclass
+class FileArchiveDTO:
+    """
+    目录归档下载数据传输对象
+
+    stream 边读取文件边产出归档内容，响应开始前只完成了文件列表与大小校验。
+    """
+    filename: str
+    media_type: str
+    file_count: int
+    total_size: int
+    stream: AsyncIterator[bytes]
@@ -10,3 +10,4 @@ from dataclasses import dataclass
 class GetExecutionQuery:
     """获取执行查询"""
     execution_id: str
+    include_result: bool = True  # False 时只读取状态，不加载代码与输出
@@ -0,0 +1,217 @@
+"""
+执行归档服务
+
+负责将超过保留期的执行记录迁出 t_sandbox_execution：按会话写入 gzip 压缩的
+JSONL 归档文件到 S3，登记归档索引后分批删除，使热表及其索引保持较小规模。
+归档后的执行仍可通过 load_archived_execution 按 ID 读取。
+"""
+import gzip
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from src.domain.entities.execution import Execution
+from src.domain.repositories.execution_repository import IExecutionRepository
+from src.domain.services.storage import IStorageService
+from src.domain.value_objects.execution_status import ExecutionState, ExecutionStatus
+
+logger = logging.getLogger(__name__)
+
+# 归档文件根前缀（不放在会话 workspace 下，避免被挂载进容器或随 workspace 清理）
+ARCHIVE_PREFIX = "executions-archive"
+
+
+def session_archive_prefix(session_id: str) -> str:
+    """会话归档文件的 key 前缀（以 / 结尾，不会匹配 ID 以其开头的其他会话）"""
+    return f"{ARCHIVE_PREFIX}/{session_id}/"
+
+
+class ExecutionArchiveService:
+    """
+    执行归档服务
+
+    职责：
+    1. 定期查找创建时间早于保留期的已结束执行
+    2. 按会话分组写入 {ARCHIVE_PREFIX}/{session_id}/{首条创建时间}-{首条ID}.jsonl.gz
+    3. 写入成功后登记归档索引并删除执行记录（每批单独提交，避免长事务和大范围锁）
+    4. 按 ID 从归档文件读取执行
+
+    归档文件路径由批内首条执行确定，重试同一批会覆盖同一文件，不会产生重复归档。
+    """
+
+    def __init__(
+        self,
+        execution_repo: IExecutionRepository,
+        storage_service: IStorageService,
+        retention_days: int = -1,
+        batch_size: int = 500,
+        max_batches_per_run: int = 20,
+    ):
+        """
+        初始化执行归档服务
+
+        Args:
+            execution_repo: 执行仓储
+            storage_service: 存储服务（写入和读取归档文件）
+            retention_days: 执行记录保留天数，-1 表示禁用归档
+            batch_size: 每批归档的执行数量（同时是单条 DELETE 影响的最大行数）
+            max_batches_per_run: 单次任务最多处理的批数
+        """
+        self._execution_repo = execution_repo
+        self._storage_service = storage_service
+        self._retention = None if retention_days == -1 else timedelta(days=retention_days)
+        self._batch_size = batch_size
+        self._max_batches_per_run = max_batches_per_run
+
+    async def archive_expired_executions(self) -> Dict[str, int]:
+        """
+        归档过期执行
+
+        Returns:
+            dict: 统计信息
+                - batches: 处理的批数
+                - archived: 归档的执行数
+                - archive_files: 写入的归档文件数
+                - errors: 错误列表
+        """
+        stats = {
+            "batches": 0,
+            "archived": 0,
+            "archive_files": 0,
+            "errors": []
+        }
+
+        if self._retention is None:
+            return stats
+
+        cutoff = datetime.now() - self._retention
+
+        for _ in range(self._max_batches_per_run):
+            try:
+                executions = await self._execution_repo.find_archivable(cutoff, limit=self._batch_size)
+            except Exception as e:
+                logger.error(f"Failed to query archivable executions: {e}")
+                stats["errors"].append(str(e))
+                break
+
+            if not executions:
+                break
+
+            stats["batches"] += 1
+            for session_id, group in self._group_by_session(executions).items():
+                try:
+                    archive_path = await self._write_archive(session_id, group)
+                    await self._execution_repo.mark_archived(archive_path, group)
+                    await self._execution_repo.commit()
+                    stats["archived"] += len(group)
+                    stats["archive_files"] += 1
+                except Exception as e:
+                    logger.error(f"Failed to archive executions of session {session_id}: {e}")
+                    stats["errors"].append(f"{session_id}: {e}")
+
+            if stats["errors"] or len(executions) < self._batch_size:
+                break
+
+        if stats["archived"]:
+            logger.info(
+                f"Execution archive completed: archived={stats['archived']}, "
+                f"files={stats['archive_files']}, batches={stats['batches']}"
+            )
+
+        return stats
+
+    async def load_archived_execution(self, execution_id: str) -> Optional[Execution]:
+        """
+        从归档文件读取执行
+
+        Args:
+            execution_id: 执行 ID
+
+        Returns:
+            执行实体；未归档或归档文件中不存在时返回 None
+        """
+        archive_path = await self._execution_repo.find_archive_path(execution_id)
+        if not archive_path:
+            return None
+
+        content = gzip.decompress(await self._storage_service.download_file(archive_path))
+        for line in content.decode("utf-8").splitlines():
+            record = json.loads(line)
+            if record["id"] == execution_id:
+                return record_to_execution(record)
+
+        logger.warning(f"Execution {execution_id} not found in archive {archive_path}")
+        return None
+
+    @staticmethod
+    def _group_by_session(executions: List[Execution]) -> Dict[str, List[Execution]]:
+        groups: Dict[str, List[Execution]] = defaultdict(list)
+        for execution in executions:
+            groups[execution.session_id].append(execution)
+        return groups
+
+    async def _write_archive(self, session_id: str, executions: List[Execution]) -> str:
+        """写入单个会话的归档文件，返回归档路径"""
+        first = executions[0]
+        archive_path = (
+            f"{session_archive_prefix(session_id)}"
+            f"{int(first.created_at.timestamp() * 1000)}-{first.id}.jsonl.gz"
+        )
+        lines = "".join(
+            json.dumps(execution_to_record(execution), ensure_ascii=False) + "\n"
+            for execution in executions
+        )
+        await self._storage_service.upload_file(
+            archive_path,
+            gzip.compress(lines.encode("utf-8")),
+            content_type="application/gzip",
+        )
+        return archive_path
+
+
+def execution_to_record(execution: Execution) -> dict:
+    """执行实体 -> 归档 JSON 记录"""
+    return {
+        "id": execution.id,
+        "session_id": execution.session_id,
+        "code": execution.code,
+        "language": execution.language,
+        "timeout": execution.timeout,
+        "event_data": execution.event_data,
+        "status": execution.state.status.value,
+        "exit_code": execution.state.exit_code,
+        "error_message": execution.state.error_message,
+        "created_at": execution.created_at.isoformat(),
+        "completed_at": execution.completed_at.isoformat() if execution.completed_at else None,
+        "execution_time": execution.execution_time,
+        "stdout": execution.stdout,
+        "stderr": execution.stderr,
+        "return_value": execution.return_value,
+        "metrics": execution.metrics,
+    }
+
+
+def record_to_execution(record: dict) -> Execution:
+    """归档 JSON 记录 -> 执行实体"""
+    return Execution(
+        id=record["id"],
+        session_id=record["session_id"],
+        code=record["code"],
+        language=record["language"],
+        timeout=record["timeout"],
+        event_data=record.get("event_data"),
+        state=ExecutionState(
+            status=ExecutionStatus(record["status"]),
+            exit_code=record.get("exit_code"),
+            error_message=record.get("error_message"),
+        ),
+        created_at=datetime.fromisoformat(record["created_at"]),
+        completed_at=datetime.fromisoformat(record["completed_at"]) if record.get("completed_at") else None,
+        execution_time=record.get("execution_time"),
+        stdout=record.get("stdout", ""),
+        stderr=record.get("stderr", ""),
+        return_value=record.get("return_value"),
+        metrics=record.get("metrics"),
+    )
@@ -0,0 +1,220 @@
+"""
+执行分发服务
+
+从持久化分发队列认领执行并提交到容器内的执行器。
+执行 API 只负责在同一事务中写入执行记录与分发条目，调用执行器的耗时与失败都在这里处理。
+"""
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from src.domain.entities.execution import Execution
+from src.domain.entities.session import Session
+from src.domain.repositories.execution_dispatch_repository import IExecutionDispatchRepository
+from src.domain.repositories.execution_repository import IExecutionRepository
+from src.domain.repositories.session_repository import ISessionRepository
+from src.domain.services.scheduler import IScheduler
+from src.domain.value_objects.dispatch_entry import DispatchEntry
+from src.domain.value_objects.execution_request import ExecutionRequest
+from src.domain.value_objects.execution_status import ExecutionStatus
+from src.infrastructure.executors.errors import ExecutorValidationError
+
+logger = logging.getLogger(__name__)
+
+# 单条分发的结果
+DELIVERED = "delivered"
+RETRY = "retry"
+FAILED = "failed"
+DROPPED = "dropped"
+
+
+class ExecutionDispatchService:
+    """
+    执行分发服务
+
+    职责：
+    1. 认领到期的分发条目（每个会话只取队首，认领后立即提交）
+    2. 恢复冻结的容器并调用执行器（不持有数据库事务）
+    3. 成功后移除条目；可重试的失败按指数退避重新排队
+    4. 不可重试或超过最大次数的失败将执行标记为 FAILED，不再停留在 PENDING
+    5. 投递成功时写入首次心跳（PENDING → RUNNING），之后由心跳检测接管：
+       执行器收到请求却从未发送心跳的执行按投递时间判定超时
+
+    执行在投递前停留在 PENDING 的时长只受分发队列约束（同一会话按顺序投递），不参与心跳检测。
+
+    投递语义为至少一次：执行器已收到请求但响应超时时，重试会再次投递。
+    """
+
+    def __init__(
+        self,
+        dispatch_repo: IExecutionDispatchRepository,
+        execution_repo: IExecutionRepository,
+        session_repo: ISessionRepository,
+        scheduler: IScheduler,
+        max_attempts: int = 5,
+        retry_base_seconds: float = 1.0,
+        retry_max_seconds: float = 60.0,
+        lease_seconds: int = 120,
+    ):
+        """
+        初始化执行分发服务
+
+        Args:
+            dispatch_repo: 分发队列仓储
+            execution_repo: 执行仓储
+            session_repo: 会话仓储
+            scheduler: 调度器（恢复容器并调用执行器）
+            max_attempts: 最大投递次数
+            retry_base_seconds: 重试退避基数（秒），第 n 次失败后等待 base * 2^(n-1)
+            retry_max_seconds: 重试退避上限（秒）
+            lease_seconds: 认领租约（秒），分发者崩溃后条目在租约到期后可被重新认领
+        """
+        self._dispatch_repo = dispatch_repo
+        self._execution_repo = execution_repo
+        self._session_repo = session_repo
+        self._scheduler = scheduler
+        self._max_attempts = max_attempts
+        self._retry_base_seconds = retry_base_seconds
+        self._retry_max_seconds = retry_max_seconds
+        self._lease_seconds = lease_seconds
+
+    async def dispatch_due(self, limit: int = 50) -> Dict:
+        """
+        分发一批到期的执行
+
+        Returns:
+            dict: 统计信息
+                - claimed: 认领的条目数
+                - delivered / retried / failed / dropped: 各结果的条目数
+                - lag_seconds: 成功投递的条目从入队到投递的耗时列表
+        """
+        stats = {
+            "claimed": 0,
+            DELIVERED: 0,
+            "retried": 0,
+            FAILED: 0,
+            DROPPED: 0,
+            "lag_seconds": [],
+        }
+
+        entries = await self._dispatch_repo.claim_due(limit, self._lease_seconds)
+        await self._dispatch_repo.commit()
+        if not entries:
+            return stats
+        stats["claimed"] = len(entries)
+
+        executions = {
+            execution.id: execution
+            for execution in await self._execution_repo.find_by_ids([e.execution_id for e in entries])
+        }
+        sessions = {}
+        for entry in entries:
+            sessions[entry.session_id] = await self._session_repo.find_by_id(entry.session_id)
+
+        # 认领结果中每个会话至多一条，可以并发投递
+        results = await asyncio.gather(*(
+            self._deliver(entry, executions.get(entry.execution_id), sessions.get(entry.session_id))
+            for entry in entries
+        ))
+
+        finished: List[str] = []
+        delivered: Dict[str, datetime] = {}
+        failed_executions: List[Execution] = []
+        now = datetime.now()
+        for entry, (outcome, error) in zip(entries, results, strict=True):
+            if outcome == RETRY and entry.attempts >= self._max_attempts:
+                outcome, error = FAILED, f"gave up after {entry.attempts} attempts: {error}"
+
+            if outcome == RETRY:
+                await self._dispatch_repo.retry_later(
+                    entry.execution_id, now + self._backoff(entry.attempts), error
+                )
+                stats["retried"] += 1
+                logger.warning(
+                    f"Execution dispatch failed, will retry: execution_id={entry.execution_id}, "
+                    f"attempt={entry.attempts}, error={error}"
+                )
+                continue
+
+            finished.append(entry.execution_id)
+            stats[outcome] += 1
+            if outcome == DELIVERED:
+                delivered[entry.execution_id] = now
+                stats["lag_seconds"].append((now - entry.enqueued_at).total_seconds())
+            elif outcome == FAILED:
+                execution = executions[entry.execution_id]
+                execution.mark_failed(error_message=f"Dispatch failed: {error}")
+                failed_executions.append(execution)
+                logger.error(f"Execution dispatch failed: execution_id={entry.execution_id}, error={error}")
+
+        if delivered:
+            # 投递时间作为首次心跳：只更新仍为 PENDING / RUNNING 的行，已上报结果的执行不受影响
+            await self._execution_repo.touch_heartbeats(delivered)
+        if failed_executions:
+            # 条件写：期间已上报结果（到达终态）的执行不会被覆盖
+            await self._execution_repo.save_results(failed_executions)
+        await self._dispatch_repo.complete(finished)
+        await self._dispatch_repo.commit()
+
+        return stats
+
+    async def _deliver(
+        self,
+        entry: DispatchEntry,
+        execution: Optional[Execution],
+        session: Optional[Session],
+    ) -> Tuple[str, str]:
+        """投递单条执行，返回 (结果, 错误信息)"""
+        if execution is None:
+            # 执行已被删除（会话清理）
+            return DROPPED, ""
+        if execution.state.status != ExecutionStatus.PENDING:
+            return DROPPED, ""
+        if session is None or not session.is_active() or not session.container_id:
+            return FAILED, f"session {entry.session_id} is not active"
+
+        await self._resume_container(session)
+
+        execution_request = ExecutionRequest(
+            code=execution.code,
+            language=execution.language,
+            event=execution.event_data or {},
+            timeout=execution.timeout or 300,
+            env_vars=session.env_vars,
+            execution_id=execution.id,
+            session_id=session.id,
+        )
+        try:
+            await self._scheduler.execute(
+                session_id=session.id,
+                container_id=session.container_id,
+                execution_request=execution_request,
+            )
+        except ExecutorValidationError as e:
+            return FAILED, str(e)
+        except Exception as e:
+            return RETRY, str(e)
+
+        logger.info(
+            f"Execution dispatched: execution_id={execution.id}, session_id={session.id}, "
+            f"attempt={entry.attempts}"
+        )
+        return DELIVERED, ""
+
+    async def _resume_container(self, session: Session) -> None:
+        """
+        恢复被空闲冻结的容器，失败时交由后续分发暴露错误
+
+        入队时已记录会话活动而容器尚未恢复，不能按 last_activity_at 跳过状态查询。
+        """
+        try:
+            await self._scheduler.unpause_container(session.container_id)
+        except Exception as e:
+            logger.warning(f"Failed to resume paused container {session.container_id}: {e}")
+
+    def _backoff(self, attempts: int) -> timedelta:
+        """指数退避（带 ±20% 抖动，避免同时失败的条目同时重试）"""
+        delay = min(self._retry_base_seconds * (2 ** (attempts - 1)), self._retry_max_seconds)
+        return timedelta(seconds=delay * random.uniform(0.8, 1.2))
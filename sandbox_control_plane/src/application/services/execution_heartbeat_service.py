@@ -0,0 +1,115 @@
+"""
+执行心跳检测服务
+
+负责定期检测停止发送心跳的运行中执行，并将其标记为 crashed。
+这解决了 executor 进程或容器异常退出、结果永远不会上报时执行永久处于 running 状态的问题。
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from src.domain.entities.execution import Execution
+from src.domain.repositories.execution_repository import IExecutionRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutionHeartbeatService:
+    """
+    执行心跳检测服务
+
+    职责：
+    1. 查找数据库中最后心跳早于超时阈值的运行中执行
+    2. 用本实例内存中较新的心跳校正（心跳批量写回存在延迟）
+    3. 仍然超时的执行标记为 crashed，批量写入后通知调用方（唤醒同步等待者）
+
+    已写入终态结果的执行不会被覆盖（save_results 只更新未到终态的行）。
+    """
+
+    def __init__(
+        self,
+        execution_repo: IExecutionRepository,
+        heartbeat_timeout_seconds: int = 15,
+        last_seen: Optional[Callable[[str], Optional[datetime]]] = None,
+        on_crashed: Optional[Callable[[List[str]], None]] = None,
+        batch_size: int = 500,
+    ):
+        """
+        初始化执行心跳检测服务
+
+        Args:
+            execution_repo: 执行仓储
+            heartbeat_timeout_seconds: 心跳超时时间（秒）
+            last_seen: 查询内存中最后心跳时间的函数（通常为心跳跟踪器的 last_seen）
+            on_crashed: 标记崩溃并提交后的回调，参数为执行 ID 列表
+            batch_size: 每次检测最多处理的执行数
+        """
+        self._execution_repo = execution_repo
+        self._timeout_seconds = heartbeat_timeout_seconds
+        self._last_seen = last_seen
+        self._on_crashed = on_crashed
+        self._batch_size = batch_size
+
+    async def detect_stalled_executions(self) -> Dict:
+        """
+        检测并标记心跳超时的执行
+
+        Returns:
+            dict: 检测统计信息
+                - total_checked: 数据库中心跳超时的执行数
+                - still_alive: 内存中有较新心跳、未标记的执行数
+                - marked_crashed: 标记为 crashed 的执行数
+                - errors: 错误列表
+        """
+        stats = {
+            "total_checked": 0,
+            "still_alive": 0,
+            "marked_crashed": 0,
+            "errors": [],
+        }
+
+        try:
+            threshold = datetime.now() - timedelta(seconds=self._timeout_seconds)
+            candidates = await self._execution_repo.find_heartbeat_timeouts(threshold, limit=self._batch_size)
+            stats["total_checked"] = len(candidates)
+
+            stalled: List[Execution] = []
+            for execution in candidates:
+                self._apply_last_seen(execution)
+                if not execution.is_heartbeat_timeout(self._timeout_seconds):
+                    stats["still_alive"] += 1
+                    continue
+
+                silent_seconds = (datetime.now() - execution.last_heartbeat_at).total_seconds()
+                logger.warning(
+                    f"Execution {execution.id} stalled: no heartbeat for {silent_seconds:.0f}s "
+                    f"(timeout: {self._timeout_seconds}s), session={execution.session_id}"
+                )
+                execution.mark_crashed(
+                    error_message=f"No heartbeat from executor for {silent_seconds:.0f} seconds"
+                )
+                stalled.append(execution)
+
+            if stalled:
+                await self._execution_repo.save_results(stalled)
+                await self._execution_repo.commit()
+                stats["marked_crashed"] = len(stalled)
+                logger.info(f"Stalled executions marked as crashed: {len(stalled)}")
+
+                if self._on_crashed:
+                    self._on_crashed([execution.id for execution in stalled])
+
+        except Exception as e:
+            error_msg = f"Fatal error during execution heartbeat check: {e}"
+            logger.error(error_msg, exc_info=True)
+            stats["errors"].append(error_msg)
+
+        return stats
+
+    def _apply_last_seen(self, execution: Execution) -> None:
+        """内存中的心跳比数据库新时以内存为准"""
+        if not self._last_seen:
+            return
+        seen = self._last_seen(execution.id)
+        if seen and (execution.last_heartbeat_at is None or seen > execution.last_heartbeat_at):
+            execution.last_heartbeat_at = seen
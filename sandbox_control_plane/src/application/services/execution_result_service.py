@@ -0,0 +1,164 @@
+"""
+执行结果服务
+
+将 Executor 上报的执行结果应用到执行实体。一批结果共用一次查询、
+一次批量写入和一次提交，供回调接口和结果摄取队列使用。
+"""
+import logging
+from datetime import datetime
+from enum import Enum
+from typing import Dict, List, Optional
+
+from src.application.commands.report_execution_result import ReportExecutionResultCommand
+from src.domain.entities.execution import Execution
+from src.domain.repositories.execution_repository import IExecutionRepository
+from src.domain.repositories.workspace_manifest_repository import IWorkspaceManifestRepository
+from src.domain.value_objects.artifact import Artifact, ArtifactType
+from src.domain.value_objects.execution_status import ExecutionStatus
+
+logger = logging.getLogger(__name__)
+
+
+class ResultOutcome(str, Enum):
+    """单条结果的处理结果"""
+    RECORDED = "recorded"    # 首次上报，已写入
+    DUPLICATE = "duplicate"  # 执行已是终态（重复上报，或写入前已被其他实例写入终态）
+    NOT_FOUND = "not_found"  # 执行不存在
+    CONFLICT = "conflict"    # 状态转换不合法
+
+
+class ExecutionResultService:
+    """
+    执行结果服务
+
+    ## 状态映射
+    - `"success"` → `ExecutionStatus.COMPLETED`
+    - `"failed"` → `ExecutionStatus.FAILED`
+    - `"timeout"` → `ExecutionStatus.TIMEOUT`
+    - `"crashed"` → `ExecutionStatus.CRASHED`
+
+    ## 幂等性
+    逐条检查终态：已是终态的执行返回 DUPLICATE，不再写入。
+    同一批内同一执行的重复上报，第二条看到的是第一条应用后的状态。
+    读取后被其他实例抢先写入终态的执行，条件写入不会更新该行，同样返回 DUPLICATE。
+
+    ## workspace 文件清单
+    执行期间代码可能经 s3fs 写入 workspace（产物只是其中一部分），
+    记录结果时把所属会话的文件清单标记为过期，与结果在同一事务中提交。
+    """
+
+    def __init__(
+        self,
+        execution_repo: IExecutionRepository,
+        manifest_repo: Optional[IWorkspaceManifestRepository] = None,
+    ):
+        self._execution_repo = execution_repo
+        self._manifest_repo = manifest_repo
+
+    async def record_results(
+        self,
+        commands: List[ReportExecutionResultCommand],
+    ) -> List[ResultOutcome]:
+        """
+        批量记录执行结果
+
+        Args:
+            commands: 上报命令列表
+
+        Returns:
+            与 commands 一一对应的处理结果；返回时变更已提交
+        """
+        execution_ids = list(dict.fromkeys(command.execution_id for command in commands))
+        executions = {
+            execution.id: execution
+            for execution in await self._execution_repo.find_by_ids(execution_ids)
+        }
+
+        outcomes: List[ResultOutcome] = []
+        changed: Dict[str, Execution] = {}
+        for command in commands:
+            execution = executions.get(command.execution_id)
+            if execution is None:
+                outcomes.append(ResultOutcome.NOT_FOUND)
+                continue
+
+            if execution.is_terminal():
+                logger.info(
+                    f"Execution {execution.id} already in terminal state: {execution.state.status}"
+                )
+                outcomes.append(ResultOutcome.DUPLICATE)
+                continue
+
+            try:
+                apply_result(execution, command)
+            except ValueError as e:
+                logger.warning(f"Execution {execution.id} state conflict: {e}")
+                outcomes.append(ResultOutcome.CONFLICT)
+                continue
+
+            changed[execution.id] = execution
+            outcomes.append(ResultOutcome.RECORDED)
+
+        if changed:
+            written = set(await self._execution_repo.save_results(list(changed.values())))
+            skipped = changed.keys() - written
+            if skipped:
+                logger.info(f"Executions already finished by another writer: {sorted(skipped)}")
+                outcomes = [
+                    ResultOutcome.DUPLICATE
+                    if outcome == ResultOutcome.RECORDED and command.execution_id in skipped
+                    else outcome
+                    for command, outcome in zip(commands, outcomes, strict=True)
+                ]
+            if self._manifest_repo and written:
+                await self._manifest_repo.mark_stale(list(dict.fromkeys(
+                    execution.session_id for execution in changed.values() if execution.id in written
+                )))
+            await self._execution_repo.commit()
+            logger.info(f"Execution results recorded: {len(written)} executions")
+
+        return outcomes
+
+
+def apply_result(execution: Execution, command: ReportExecutionResultCommand) -> None:
+    """
+    将上报结果应用到执行实体
+
+    Raises:
+        ValueError: 状态转换不合法
+    """
+    # 根据领域规则，必须是 PENDING → RUNNING → COMPLETED/FAILED/TIMEOUT/CRASHED
+    # 但 executor 报告结果时可能已经完成了，所以自动处理这个转换
+    if execution.state.status == ExecutionStatus.PENDING:
+        execution.mark_running()
+
+    if command.status == "success":
+        now = datetime.now()
+        artifacts = [
+            Artifact(path=path, size=0, mime_type="", type=ArtifactType.ARTIFACT, created_at=now)
+            for path in command.artifacts
+        ]
+        execution.mark_completed(
+            stdout=command.stdout,
+            stderr=command.stderr,
+            exit_code=command.exit_code,
+            execution_time=command.execution_time,
+            artifacts=artifacts,
+            return_value=command.return_value,
+            metrics=command.metrics,
+        )
+
+    elif command.status == "failed":
+        # 使用 stderr 作为错误消息，同时保存 stdout 和 stderr
+        execution.mark_failed(
+            error_message=command.stderr if command.stderr else "Execution failed",
+            exit_code=command.exit_code,
+            stdout=command.stdout,
+            stderr=command.stderr,
+        )
+
+    elif command.status == "timeout":
+        execution.mark_timeout()
+
+    elif command.status == "crashed":
+        execution.mark_crashed()
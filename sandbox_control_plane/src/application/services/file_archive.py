@@ -0,0 +1,222 @@
+"""
+workspace 目录归档
+
+把 workspace 中的一组文件边读取边写成 zip 或 tar.gz 流，不在磁盘或内存中暂存整个归档：
+- 小文件由多个任务提前并发读取，预读总字节数受 prefetch_bytes 限制
+- 大文件轮到时按块流式读取
+- 归档条目始终按文件顺序写出，压缩在线程池中进行，不阻塞事件循环
+"""
+import asyncio
+import tarfile
+import time
+import zipfile
+import zlib
+from collections import deque
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Deque, List, Optional, Tuple
+
+from src.domain.value_objects.workspace_file import WorkspaceFile
+from src.shared.errors.domain import ConflictError
+
+# 归档格式 → (Content-Type, 文件扩展名)
+ARCHIVE_FORMATS = {
+    "zip": ("application/zip", ".zip"),
+    "tar.gz": ("application/gzip", ".tar.gz"),
+}
+
+# 超过该大小的文件不预读，轮到时流式读取
+PREFETCH_MAX_FILE_BYTES = 8 * 1024 * 1024
+
+# 输出缓冲达到该大小才产出，避免大量小文件产生过多的小响应块
+OUTPUT_CHUNK_BYTES = 256 * 1024
+
+
+class _Sink:
+    """zipfile 的输出目标：只追加到缓冲区，由调用方取走（不可 seek，zipfile 改用数据描述符）"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+class _ZipWriter:
+    """流式 zip 写入器（Deflate，超过 4GB 的条目使用 Zip64）"""
+
+    def __init__(self):
+        self._sink = _Sink()
+        self._zip = zipfile.ZipFile(self._sink, "w", compression=zipfile.ZIP_DEFLATED)
+        self._entry = None
+
+    def begin(self, name: str, size: int, modified_at: Optional[datetime]) -> bytes:
+        mtime = modified_at.timestamp() if modified_at else time.time()
+        info = zipfile.ZipInfo(name, date_time=time.localtime(max(mtime, 315532800))[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.file_size = size
+        info.external_attr = 0o644 << 16
+        self._entry = self._zip.open(info, "w", force_zip64=size >= zipfile.ZIP64_LIMIT)
+        return self._sink.take()
+
+    def write(self, data: bytes) -> bytes:
+        self._entry.write(data)
+        return self._sink.take()
+
+    def end(self) -> bytes:
+        self._entry.close()
+        self._entry = None
+        return self._sink.take()
+
+    def close(self) -> bytes:
+        self._zip.close()
+        return self._sink.take()
+
+
+class _TarGzWriter:
+    """流式 tar.gz 写入器（PAX 格式，支持长路径与非 ASCII 文件名）"""
+
+    def __init__(self):
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        self._offset = 0
+        self._name = ""
+        self._size = 0
+        self._written = 0
+
+    def begin(self, name: str, size: int, modified_at: Optional[datetime]) -> bytes:
+        info = tarfile.TarInfo(name)
+        info.size = size
+        info.mtime = int(modified_at.timestamp() if modified_at else time.time())
+        info.mode = 0o644
+        self._name, self._size, self._written = name, size, 0
+        return self._compress(info.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape"))
+
+    def write(self, data: bytes) -> bytes:
+        self._written += len(data)
+        return self._compress(data)
+
+    def end(self) -> bytes:
+        # tar 头中的大小已经写出，实际内容长度不一致时归档无法读取
+        if self._written != self._size:
+            raise ConflictError(
+                f"File changed while archiving: {self._name} "
+                f"(listed {self._size} bytes, read {self._written} bytes)"
+            )
+        return self._compress(bytes(-self._size % tarfile.BLOCKSIZE))
+
+    def close(self) -> bytes:
+        trailer = bytes(2 * tarfile.BLOCKSIZE)
+        trailer += bytes(-(self._offset + len(trailer)) % tarfile.RECORDSIZE)
+        return self._compress(trailer) + self._compressor.flush()
+
+    def _compress(self, data: bytes) -> bytes:
+        self._offset += len(data)
+        return self._compressor.compress(data)
+
+
+def _create_writer(archive_format: str):
+    return _ZipWriter() if archive_format == "zip" else _TarGzWriter()
+
+
+async def _single(content: bytes) -> AsyncIterator[bytes]:
+    yield content
+
+
+async def _iter_contents(
+    files: List[WorkspaceFile],
+    fetch: Callable[[WorkspaceFile], Awaitable[bytes]],
+    open_stream: Callable[[WorkspaceFile], Awaitable[AsyncIterator[bytes]]],
+    concurrency: int,
+    prefetch_bytes: int,
+) -> AsyncIterator[Tuple[WorkspaceFile, AsyncIterator[bytes]]]:
+    """
+    按顺序产出 (文件, 内容块迭代器)
+
+    窗口内最多 concurrency 个文件；其中小文件立即开始读取，已读取未写出的字节数不超过 prefetch_bytes
+    （窗口为空时放行单个文件）。大文件只占位，轮到时再打开流。
+    """
+    max_prefetch_file = min(PREFETCH_MAX_FILE_BYTES, prefetch_bytes)
+    window: Deque[Tuple[WorkspaceFile, Optional[asyncio.Task]]] = deque()
+    buffered = 0
+    next_index = 0
+
+    try:
+        while window or next_index < len(files):
+            while next_index < len(files) and len(window) < concurrency:
+                file = files[next_index]
+                if file.size > max_prefetch_file:
+                    window.append((file, None))
+                elif not window or buffered + file.size <= prefetch_bytes:
+                    window.append((file, asyncio.create_task(fetch(file))))
+                    buffered += file.size
+                else:
+                    break
+                next_index += 1
+
+            file, task = window.popleft()
+            if task is None:
+                yield file, await open_stream(file)
+            else:
+                content = await task
+                buffered -= file.size
+                yield file, _single(content)
+    finally:
+        for _, task in window:
+            if task is not None:
+                task.cancel()
+        await asyncio.gather(*(task for _, task in window if task is not None), return_exceptions=True)
+
+
+async def stream_archive(
+    files: List[WorkspaceFile],
+    archive_format: str,
+    fetch: Callable[[WorkspaceFile], Awaitable[bytes]],
+    open_stream: Callable[[WorkspaceFile], Awaitable[AsyncIterator[bytes]]],
+    strip_prefix: str = "",
+    concurrency: int = 8,
+    prefetch_bytes: int = 32 * 1024 * 1024,
+) -> AsyncIterator[bytes]:
+    """
+    把文件写成归档流
+
+    Args:
+        files: 要归档的文件（按此顺序写入）
+        archive_format: "zip" 或 "tar.gz"
+        fetch: 读取整个小文件
+        open_stream: 打开大文件的内容流
+        strip_prefix: 从文件路径中去掉的前缀，剩余部分作为归档内的条目名
+        concurrency: 同时读取的文件数
+        prefetch_bytes: 已读取未写出的小文件字节数上限
+
+    Returns:
+        归档内容块的异步迭代器；读取失败时抛出异常，归档被截断
+    """
+    writer = _create_writer(archive_format)
+    output = bytearray()
+
+    contents = _iter_contents(files, fetch, open_stream, max(1, concurrency), prefetch_bytes)
+    try:
+        async for file, chunks in contents:
+            output += writer.begin(file.path[len(strip_prefix):], file.size, file.modified_at)
+            async for chunk in chunks:
+                output += await asyncio.to_thread(writer.write, chunk)
+                if len(output) >= OUTPUT_CHUNK_BYTES:
+                    yield bytes(output)
+                    output.clear()
+            output += writer.end()
+            if len(output) >= OUTPUT_CHUNK_BYTES:
+                yield bytes(output)
+                output.clear()
+    finally:
+        await contents.aclose()
+
+    output += writer.close()
+    yield bytes(output)
@@ -0,0 +1,375 @@
+"""
+归档流式解析
+
+边接收请求体边解析 zip、tar 或 tar.gz 归档，逐个产出文件条目及其内容块，不在磁盘或内存中暂存整个归档：
+- 格式按开头的魔数识别，tar.gz 边读边解压
+- zip 按本地文件头顺序解析（不依赖末尾的中央目录），支持 Stored / Deflate 与 Zip64，并校验 CRC-32
+- tar 支持 ustar、GNU 长文件名与 PAX 扩展头；目录、链接与设备文件没有内容，直接跳过
+
+解压输出按块限长，压缩比异常高的归档不会一次性展开到内存中；需要整块读入的元数据头受
+MAX_METADATA_HEADER_BYTES 限制，总大小由调用方在读取内容时累计限制。
+"""
+import struct
+import tarfile
+import zlib
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Optional
+
+from src.shared.errors.domain import ValidationError
+
+# 单个内容块的最大字节数（解压输出同样按此限长）
+READ_CHUNK_BYTES = 256 * 1024
+
+# PAX 扩展头、GNU 长文件名等元数据整块读入内存，超过该大小的归档被拒绝
+MAX_METADATA_HEADER_BYTES = 1024 * 1024
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZIP_LOCAL_HEADER = b"PK\x03\x04"
+_ZIP_DATA_DESCRIPTOR = b"PK\x07\x08"
+# 文件条目之后的记录：中央目录、Zip64 结束记录及定位符、中央目录结束记录、数字签名
+_ZIP_TRAILER_SIGNATURES = {b"PK\x01\x02", b"PK\x06\x06", b"PK\x06\x07", b"PK\x05\x06", b"PK\x05\x05"}
+_ZIP_FLAG_ENCRYPTED = 0x1
+_ZIP_FLAG_DATA_DESCRIPTOR = 0x8
+_ZIP_FLAG_UTF8 = 0x800
+_ZIP_STORED = 0
+_ZIP_DEFLATED = 8
+_ZIP64_EXTRA_ID = 0x0001
+_ZIP64_MARKER = 0xFFFFFFFF
+
+_TAR_END_BLOCK = bytes(tarfile.BLOCKSIZE)
+_TAR_REGULAR_TYPES = {tarfile.REGTYPE, tarfile.AREGTYPE, tarfile.CONTTYPE}
+_TAR_METADATA_TYPES = {
+    tarfile.XHDTYPE, tarfile.SOLARIS_XHDTYPE, tarfile.XGLTYPE, tarfile.GNUTYPE_LONGNAME, tarfile.GNUTYPE_LONGLINK,
+}
+
+
+@dataclass
+class ArchiveMember:
+    """
+    归档中的普通文件
+
+    chunks 须在取下一个条目之前读取；未读完的内容在取下一个条目时被跳过。
+    """
+
+    name: str
+    chunks: AsyncIterator[bytes]
+
+
+def normalize_member_path(name: str) -> Optional[str]:
+    """
+    归档条目名转换为相对路径
+
+    反斜杠视为分隔符，去掉空段与 "." 段。绝对路径、盘符、包含 ".." 段或无法以 UTF-8 编码的名称
+    返回 None，由调用方拒绝（防止写到目标目录之外）。
+    """
+    if not name or "\0" in name:
+        return None
+    try:
+        name.encode("utf-8")
+    except UnicodeEncodeError:
+        return None
+
+    name = name.replace("\\", "/")
+    if name.startswith("/") or (len(name) >= 2 and name[1] == ":" and name[0].isalpha()):
+        return None
+
+    segments = [segment for segment in name.split("/") if segment not in ("", ".")]
+    if not segments or ".." in segments:
+        return None
+    return "/".join(segments)
+
+
+class _Reader:
+    """按字节数读取异步数据块流，多读的数据可以退回"""
+
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks.__aiter__()
+        self._buffer = bytearray()
+        self._eof = False
+
+    async def peek(self, size: int) -> bytes:
+        """查看接下来至多 size 字节，不消费"""
+        await self._fill(size)
+        return bytes(self._buffer[:size])
+
+    async def read_exact(self, size: int) -> bytes:
+        """读取恰好 size 字节，数据不足时视为归档被截断"""
+        await self._fill(size)
+        if len(self._buffer) < size:
+            raise ValidationError("Unexpected end of archive")
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    async def read_some(self, limit: int) -> bytes:
+        """读取至多 limit 字节，数据已读完时返回 b\"\" """
+        await self._fill(1)
+        data = bytes(self._buffer[:limit])
+        del self._buffer[:limit]
+        return data
+
+    def unread(self, data: bytes) -> None:
+        self._buffer[:0] = data
+
+    async def _fill(self, size: int) -> None:
+        while len(self._buffer) < size and not self._eof:
+            try:
+                self._buffer += await self._chunks.__anext__()
+            except StopAsyncIteration:
+                self._eof = True
+
+
+async def _read_fixed(reader: _Reader, size: int) -> AsyncIterator[bytes]:
+    """按块读取 size 字节"""
+    remaining = size
+    while remaining > 0:
+        data = await reader.read_some(min(remaining, READ_CHUNK_BYTES))
+        if not data:
+            raise ValidationError("Unexpected end of archive")
+        remaining -= len(data)
+        yield data
+
+
+async def _skip(reader: _Reader, size: int) -> None:
+    async for _ in _read_fixed(reader, size):
+        pass
+
+
+async def _inflate(reader: _Reader, wbits: int) -> AsyncIterator[bytes]:
+    """解压一个 Deflate / gzip 流直到其结束标记，多读的数据退回 reader"""
+    decompressor = zlib.decompressobj(wbits)
+    while not decompressor.eof:
+        data = await reader.read_some(READ_CHUNK_BYTES)
+        if not data:
+            raise ValidationError("Unexpected end of archive")
+
+        # 输出按块限长；输出达到上限时 zlib 内部可能仍有待输出的数据，继续取出
+        while True:
+            try:
+                output = decompressor.decompress(data, READ_CHUNK_BYTES)
+            except zlib.error as e:
+                raise ValidationError(f"Corrupted archive data: {e}")
+            if output:
+                yield output
+            data = decompressor.unconsumed_tail
+            if decompressor.eof or (not data and len(output) < READ_CHUNK_BYTES):
+                break
+
+    reader.unread(decompressor.unused_data)
+
+
+async def _gunzip(reader: _Reader) -> AsyncIterator[bytes]:
+    """解压 gzip 流（支持多个 gzip 成员首尾相接）"""
+    while await reader.peek(2) == _GZIP_MAGIC:
+        async for chunk in _inflate(reader, 16 + zlib.MAX_WBITS):
+            yield chunk
+
+
+def _decode_zip_name(raw: bytes, flags: int) -> str:
+    """未设置 UTF-8 标志的文件名先按 UTF-8 解码（多数工具如此写入），失败时按 CP437 解码"""
+    if not flags & _ZIP_FLAG_UTF8:
+        try:
+            return raw.decode("utf-8")
+        except UnicodeDecodeError:
+            return raw.decode("cp437")
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        raise ValidationError("Invalid UTF-8 file name in zip archive")
+
+
+def _zip64_sizes(extra: bytes, size: int, compressed_size: int) -> Optional[tuple]:
+    """
+    从 Zip64 扩展字段读取大小
+
+    Returns:
+        (size, compressed_size)；没有 Zip64 扩展字段时返回 None
+    """
+    offset = 0
+    while offset + 4 <= len(extra):
+        field_id, field_size = struct.unpack_from("<HH", extra, offset)
+        offset += 4
+        if field_id == _ZIP64_EXTRA_ID:
+            # 只有本地文件头中为 0xFFFFFFFF 的字段出现在扩展字段中，顺序固定为原始大小、压缩后大小
+            values = iter(struct.unpack_from(f"<{field_size // 8}Q", extra, offset))
+            if size == _ZIP64_MARKER:
+                size = next(values, size)
+            if compressed_size == _ZIP64_MARKER:
+                compressed_size = next(values, compressed_size)
+            return size, compressed_size
+        offset += field_size
+    return None
+
+
+async def _zip_entry_chunks(
+    reader: _Reader,
+    name: str,
+    flags: int,
+    method: int,
+    crc: int,
+    compressed_size: int,
+    size: int,
+    zip64: bool,
+) -> AsyncIterator[bytes]:
+    """读取 zip 条目内容，读完后读取数据描述符并校验 CRC-32 与大小"""
+    if method == _ZIP_STORED:
+        data = _read_fixed(reader, compressed_size)
+    else:
+        data = _inflate(reader, -zlib.MAX_WBITS)
+
+    actual_crc = 0
+    actual_size = 0
+    async for chunk in data:
+        actual_crc = zlib.crc32(chunk, actual_crc)
+        actual_size += len(chunk)
+        yield chunk
+
+    if flags & _ZIP_FLAG_DATA_DESCRIPTOR:
+        # 数据描述符的签名可选
+        if await reader.peek(4) == _ZIP_DATA_DESCRIPTOR:
+            await reader.read_exact(4)
+        if zip64:
+            crc, _, size = struct.unpack("<IQQ", await reader.read_exact(20))
+        else:
+            crc, _, size = struct.unpack("<III", await reader.read_exact(12))
+
+    if actual_crc != crc or actual_size != size:
+        raise ValidationError(f"Corrupted zip entry: {name}")
+
+
+async def _iter_zip(reader: _Reader) -> AsyncIterator[ArchiveMember]:
+    while True:
+        signature = await reader.read_exact(4)
+        if signature in _ZIP_TRAILER_SIGNATURES:
+            # 条目已全部读完，剩余的中央目录不再需要
+            return
+        if signature != _ZIP_LOCAL_HEADER:
+            raise ValidationError("Invalid zip archive: unexpected record signature")
+
+        _, flags, method, _, _, crc, compressed_size, size, name_length, extra_length = struct.unpack(
+            "<HHHHHIIIHH", await reader.read_exact(26)
+        )
+        name = _decode_zip_name(await reader.read_exact(name_length), flags)
+        sizes = _zip64_sizes(await reader.read_exact(extra_length), size, compressed_size)
+        if sizes is not None:
+            size, compressed_size = sizes
+
+        if flags & _ZIP_FLAG_ENCRYPTED:
+            raise ValidationError(f"Encrypted zip entries are not supported: {name}")
+        if method not in (_ZIP_STORED, _ZIP_DEFLATED):
+            raise ValidationError(f"Unsupported zip compression method {method}: {name}")
+        if method == _ZIP_STORED and flags & _ZIP_FLAG_DATA_DESCRIPTOR:
+            # 未压缩且大小写在内容之后的条目无法确定内容结束位置
+            raise ValidationError(f"Stored zip entries with data descriptor are not supported: {name}")
+
+        chunks = _zip_entry_chunks(
+            reader, name, flags, method, crc, compressed_size, size, zip64=sizes is not None
+        )
+        if not name.endswith("/"):
+            yield ArchiveMember(name=name, chunks=chunks)
+        # 跳过未读完的内容（以及目录条目）
+        async for _ in chunks:
+            pass
+
+
+def _parse_pax(data: bytes) -> Dict[str, str]:
+    """解析 PAX 扩展头记录（"<记录长度> <键>=<值>\\n"）"""
+    records = {}
+    offset = 0
+    try:
+        while offset < len(data) and data[offset] != 0:
+            space = data.index(b" ", offset)
+            length = int(data[offset:space])
+            if length <= space - offset:
+                raise ValueError(f"invalid record length {length}")
+            key, _, value = data[space + 1:offset + length - 1].partition(b"=")
+            records[key.decode("utf-8")] = value.decode("utf-8", "surrogateescape")
+            offset += length
+    except ValueError as e:
+        raise ValidationError(f"Invalid PAX header in tar archive: {e}")
+    return records
+
+
+async def _iter_tar(reader: _Reader) -> AsyncIterator[ArchiveMember]:
+    pax: Dict[str, str] = {}
+    long_name: Optional[str] = None
+
+    while True:
+        # 部分工具不写结束块，在块边界结束的流视为正常结束
+        if not await reader.peek(1):
+            return
+        block = await reader.read_exact(tarfile.BLOCKSIZE)
+        if block == _TAR_END_BLOCK:
+            return
+        try:
+            info = tarfile.TarInfo.frombuf(block, "utf-8", "surrogateescape")
+        except tarfile.HeaderError as e:
+            raise ValidationError(f"Invalid tar archive: {e}")
+
+        size = info.size
+        if info.type in _TAR_METADATA_TYPES and size > MAX_METADATA_HEADER_BYTES:
+            raise ValidationError(
+                f"Tar metadata header exceeds limit of {MAX_METADATA_HEADER_BYTES} bytes: {info.name}"
+            )
+        if info.type in (tarfile.XHDTYPE, tarfile.SOLARIS_XHDTYPE, tarfile.XGLTYPE):
+            data = await reader.read_exact(size + (-size % tarfile.BLOCKSIZE))
+            # 全局扩展头只包含默认值，忽略
+            if info.type != tarfile.XGLTYPE:
+                pax = _parse_pax(data[:size])
+            continue
+        if info.type in (tarfile.GNUTYPE_LONGNAME, tarfile.GNUTYPE_LONGLINK):
+            data = await reader.read_exact(size + (-size % tarfile.BLOCKSIZE))
+            if info.type == tarfile.GNUTYPE_LONGNAME:
+                long_name = data[:size].rstrip(b"\0").decode("utf-8", "surrogateescape")
+            continue
+        if info.type == tarfile.GNUTYPE_SPARSE:
+            raise ValidationError(f"Sparse files are not supported: {info.name}")
+
+        name = pax.get("path") or long_name or info.name
+        if "size" in pax:
+            try:
+                size = int(pax["size"])
+            except ValueError:
+                raise ValidationError(f"Invalid size in PAX header: {name}")
+        pax, long_name = {}, None
+
+        if info.type in _TAR_REGULAR_TYPES:
+            chunks = _read_fixed(reader, size)
+            if not name.endswith("/"):
+                yield ArchiveMember(name=name, chunks=chunks)
+            async for _ in chunks:
+                pass
+            await reader.read_exact(-size % tarfile.BLOCKSIZE)
+        elif info.type not in tarfile.SUPPORTED_TYPES:
+            # 未知类型按普通文件的方式跳过其内容
+            await _skip(reader, size + (-size % tarfile.BLOCKSIZE))
+        # 目录、链接、设备文件等没有内容块
+
+
+async def iter_archive(chunks: AsyncIterator[bytes]) -> AsyncIterator[ArchiveMember]:
+    """
+    逐个产出归档中的普通文件
+
+    Args:
+        chunks: 归档内容块（zip、tar 或 tar.gz，按内容识别）
+
+    Raises:
+        ValidationError: 归档为空、格式无法识别、数据损坏或被截断、包含不支持的条目
+    """
+    reader = _Reader(chunks)
+    head = await reader.peek(4)
+    if not head:
+        raise ValidationError("Empty archive")
+
+    if head == _ZIP_LOCAL_HEADER or head in _ZIP_TRAILER_SIGNATURES:
+        members = _iter_zip(reader)
+    elif head[:2] == _GZIP_MAGIC:
+        members = _iter_tar(_Reader(_gunzip(reader)))
+    else:
+        members = _iter_tar(reader)
+
+    try:
+        async for member in members:
+            yield member
+    finally:
+        await members.aclose()
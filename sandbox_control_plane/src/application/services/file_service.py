@@ -3,12 +3,133 @@
 
 编排文件上传下载相关的用例。
 """
-from typing import Dict, List, Any
+import asyncio
+import mimetypes
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
+from src.application.dtos.file_dto import FileArchiveDTO, FileDownloadDTO
+from src.application.services.file_archive import ARCHIVE_FORMATS, stream_archive
+from src.application.services.file_archive_reader import iter_archive, normalize_member_path
+from src.application.services.workspace_manifest_service import WorkspaceManifestService
+from src.domain.entities.session import Session
 from src.domain.repositories.session_repository import ISessionRepository
+from src.domain.services.scheduler import IScheduler
 from src.domain.services.storage import IStorageService
-from src.shared.errors.domain import NotFoundError, ValidationError
+from src.domain.value_objects.workspace_file import WorkspaceFile
+from src.infrastructure.logging import get_logger
+from src.shared.errors.domain import NotFoundError, ResourceLimitError, ValidationError
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_UPLOAD_BYTES = 100 * 1024 * 1024  # 100MB
+DEFAULT_PART_SIZE_BYTES = 8 * 1024 * 1024  # 8MB，S3 要求除最后一个分片外不小于 5MB
+DEFAULT_PART_CONCURRENCY = 4
+DEFAULT_PRESIGN_THRESHOLD_BYTES = 10 * 1024 * 1024  # 10MB
+DEFAULT_ARCHIVE_MAX_FILES = 10000
+DEFAULT_ARCHIVE_FETCH_CONCURRENCY = 8
+DEFAULT_ARCHIVE_PREFETCH_BYTES = 32 * 1024 * 1024  # 32MB
+DEFAULT_EXTRACT_MAX_BYTES = 1024 * 1024 * 1024  # 1GB
+DEFAULT_EXTRACT_CONCURRENCY = 8
+
+
+class _MultipartWriter:
+    """
+    流式分片写入器
+
+    把任意大小的数据块累积为固定大小的分片，通过存储服务的分片上传接口并发写入。
+    并发分片数达到上限时 write() 会等待空位，调用方因此暂停读取请求体（背压），
+    内存占用上限约为 (concurrency + 1) × part_size，与文件大小无关。
+    数据总量不足一个分片时不创建分片上传，close() 改为单次上传。
+    """
+
+    def __init__(
+        self,
+        storage_service: IStorageService,
+        s3_path: str,
+        content_type: str,
+        part_size: int,
+        concurrency: int,
+    ):
+        self._storage_service = storage_service
+        self._s3_path = s3_path
+        self._content_type = content_type
+        self._part_size = part_size
+        self._slots = asyncio.Semaphore(concurrency)
+        self._buffer = bytearray()
+        self._upload_id: Optional[str] = None
+        self._uploads: List[asyncio.Task] = []
+        self._parts: List[Dict] = []
+        self.size = 0
+
+    async def write(self, chunk: bytes) -> None:
+        """写入数据块，凑满分片即提交上传"""
+        self.size += len(chunk)
+        self._buffer += chunk
+        while len(self._buffer) >= self._part_size:
+            part = bytes(self._buffer[:self._part_size])
+            del self._buffer[:self._part_size]
+            await self._submit(part)
+
+    async def close(self) -> None:
+        """提交剩余数据，等待全部分片完成并合并为最终对象"""
+        if self._upload_id is None:
+            await self._storage_service.upload_file(
+                s3_path=self._s3_path,
+                content=bytes(self._buffer),
+                content_type=self._content_type,
+            )
+            return
+
+        if self._buffer:
+            await self._submit(bytes(self._buffer))
+            self._buffer.clear()
+
+        await asyncio.gather(*self._uploads)
+        await self._storage_service.complete_multipart_upload(self._s3_path, self._upload_id, self._parts)
+
+    async def abort(self) -> None:
+        """取消进行中的分片并释放已上传的分片"""
+        for task in self._uploads:
+            task.cancel()
+        await asyncio.gather(*self._uploads, return_exceptions=True)
+
+        if self._upload_id is None:
+            return
+        try:
+            await self._storage_service.abort_multipart_upload(self._s3_path, self._upload_id)
+        except Exception as e:
+            # 未取消的分片由存储桶生命周期规则清理
+            logger.warning(
+                "Failed to abort multipart upload",
+                s3_path=self._s3_path,
+                upload_id=self._upload_id,
+                error=str(e),
+            )
+
+    async def _submit(self, part: bytes) -> None:
+        if self._upload_id is None:
+            self._upload_id = await self._storage_service.create_multipart_upload(
+                self._s3_path, self._content_type
+            )
+
+        await self._slots.acquire()
+        # 已失败的分片尽早中断上传，而不是读完整个请求体
+        for task in self._uploads:
+            if task.done() and task.exception() is not None:
+                self._slots.release()
+                raise task.exception()
+
+        part_number = len(self._uploads) + 1
+        self._uploads.append(asyncio.create_task(self._upload_part(part_number, part)))
+
+    async def _upload_part(self, part_number: int, part: bytes) -> None:
+        try:
+            etag = await self._storage_service.upload_part(self._s3_path, self._upload_id, part_number, part)
+            self._parts.append({"part_number": part_number, "etag": etag})
+        finally:
+            self._slots.release()
 
 
 class FileService:
@@ -22,9 +143,54 @@ class FileService:
         self,
         session_repo: ISessionRepository,
         storage_service: IStorageService,
+        scheduler: Optional[IScheduler] = None,
+        activity_recorder: Optional[Callable[[str], None]] = None,
+        idle_pause_minutes: int = -1,
+        max_upload_bytes: int = DEFAULT_MAX_UPLOAD_BYTES,
+        part_size_bytes: int = DEFAULT_PART_SIZE_BYTES,
+        part_concurrency: int = DEFAULT_PART_CONCURRENCY,
+        presign_threshold_bytes: int = DEFAULT_PRESIGN_THRESHOLD_BYTES,
+        manifest: Optional[WorkspaceManifestService] = None,
+        archive_max_files: int = DEFAULT_ARCHIVE_MAX_FILES,
+        archive_max_bytes: int = -1,
+        archive_fetch_concurrency: int = DEFAULT_ARCHIVE_FETCH_CONCURRENCY,
+        archive_prefetch_bytes: int = DEFAULT_ARCHIVE_PREFETCH_BYTES,
+        extract_max_bytes: int = DEFAULT_EXTRACT_MAX_BYTES,
+        extract_concurrency: int = DEFAULT_EXTRACT_CONCURRENCY,
     ):
         self._session_repo = session_repo
         self._storage_service = storage_service
+        self._scheduler = scheduler
+        self._activity_recorder = activity_recorder
+        # 空闲冻结阈值（-1 表示禁用）：未超过阈值的会话跳过容器恢复
+        self._idle_pause_minutes = idle_pause_minutes
+        self._max_upload_bytes = max_upload_bytes
+        self._part_size = part_size_bytes
+        self._part_concurrency = part_concurrency
+        self._presign_threshold = presign_threshold_bytes
+        # workspace 文件清单：列表与计数查询数据库，不再逐次列出对象存储
+        self._manifest = manifest
+        self._archive_max_files = archive_max_files
+        self._archive_max_bytes = archive_max_bytes
+        self._archive_fetch_concurrency = archive_fetch_concurrency
+        self._archive_prefetch_bytes = archive_prefetch_bytes
+        self._extract_max_bytes = extract_max_bytes
+        self._extract_concurrency = extract_concurrency
+
+    @property
+    def max_upload_bytes(self) -> int:
+        """单个文件上传的最大字节数"""
+        return self._max_upload_bytes
+
+    @property
+    def extract_max_bytes(self) -> int:
+        """归档上传解压的请求体与解压后总字节数上限，-1 表示不限制"""
+        return self._extract_max_bytes
+
+    @property
+    def part_size_bytes(self) -> int:
+        """分片大小，也是可续传上传单个分片的最大字节数"""
+        return self._part_size
 
     async def upload_file(
         self,
@@ -42,6 +208,188 @@ class FileService:
         3. 上传到存储
         4. 返回文件路径
         """
+        session = await self._get_upload_session(session_id, path)
+
+        s3_path = f"{session.workspace_path}/{path}"
+        await self._storage_service.upload_file(
+            s3_path=s3_path,
+            content=content,
+            content_type=content_type
+        )
+        self._record_activity(session.id)
+        await self._record_upload(session.id, path, len(content))
+
+        return path
+
+    async def upload_file_stream(
+        self,
+        session_id: str,
+        path: str,
+        chunks: AsyncIterator[bytes],
+        content_type: str = "application/octet-stream"
+    ) -> Dict:
+        """
+        流式上传文件用例
+
+        先校验会话和路径，再逐块读取 chunks 并以分片上传写入存储，
+        不把整个文件读入内存。累计字节数超过上限时立即中断并取消分片上传。
+
+        Returns:
+            dict: path, size
+        """
+        session = await self._get_upload_session(session_id, path)
+
+        s3_path = f"{session.workspace_path}/{path}"
+        writer = _MultipartWriter(
+            self._storage_service,
+            s3_path,
+            content_type,
+            part_size=self._part_size,
+            concurrency=self._part_concurrency,
+        )
+        try:
+            async for chunk in chunks:
+                if writer.size + len(chunk) > self._max_upload_bytes:
+                    raise ResourceLimitError(
+                        f"File size exceeds limit of {self._max_upload_bytes} bytes"
+                    )
+                await writer.write(chunk)
+            await writer.close()
+        except BaseException:
+            await writer.abort()
+            raise
+
+        self._record_activity(session.id)
+        await self._record_upload(session.id, path, writer.size)
+        return {"path": path, "size": writer.size}
+
+    async def create_upload(
+        self,
+        session_id: str,
+        path: str,
+        content_type: str = "application/octet-stream"
+    ) -> Dict:
+        """
+        创建可续传上传用例
+
+        客户端按返回的 part_size 切分文件逐个上传分片，中断后可通过
+        list_upload_parts 查询已上传的分片，只补传缺失部分。
+
+        Returns:
+            dict: upload_id, path, part_size, max_size
+        """
+        session = await self._get_upload_session(session_id, path)
+
+        upload_id = await self._storage_service.create_multipart_upload(
+            f"{session.workspace_path}/{path}", content_type
+        )
+        logger.info("Created resumable upload", session_id=session_id, path=path, upload_id=upload_id)
+
+        return {
+            "upload_id": upload_id,
+            "path": path,
+            "part_size": self._part_size,
+            "max_size": self._max_upload_bytes,
+        }
+
+    async def upload_part(
+        self,
+        session_id: str,
+        path: str,
+        upload_id: str,
+        part_number: int,
+        chunks: AsyncIterator[bytes]
+    ) -> Dict:
+        """
+        上传可续传上传的单个分片
+
+        分片最大为 part_size，超过时立即中断读取。
+
+        Returns:
+            dict: part_number, etag, size
+        """
+        session = await self._get_upload_session(session_id, path)
+
+        content = bytearray()
+        async for chunk in chunks:
+            if len(content) + len(chunk) > self._part_size:
+                raise ResourceLimitError(f"Part size exceeds limit of {self._part_size} bytes")
+            content += chunk
+
+        etag = await self._storage_service.upload_part(
+            f"{session.workspace_path}/{path}", upload_id, part_number, bytes(content)
+        )
+        self._record_activity(session.id)
+
+        return {"part_number": part_number, "etag": etag, "size": len(content)}
+
+    async def list_upload_parts(self, session_id: str, path: str, upload_id: str) -> Dict:
+        """
+        查询可续传上传已上传的分片
+
+        Returns:
+            dict: upload_id, path, parts, size
+        """
+        session = await self._get_upload_session(session_id, path)
+
+        parts = await self._storage_service.list_parts(f"{session.workspace_path}/{path}", upload_id)
+
+        return {
+            "upload_id": upload_id,
+            "path": path,
+            "parts": parts,
+            "size": sum(part["size"] for part in parts),
+        }
+
+    async def complete_upload(self, session_id: str, path: str, upload_id: str) -> Dict:
+        """
+        完成可续传上传
+
+        按存储中实际已上传的分片合并，客户端无需回传 ETag。
+        合并后总大小超过上限时取消上传。
+
+        Returns:
+            dict: path, size
+        """
+        session = await self._get_upload_session(session_id, path)
+
+        s3_path = f"{session.workspace_path}/{path}"
+        parts = await self._storage_service.list_parts(s3_path, upload_id)
+        if not parts:
+            raise ValidationError(f"No parts uploaded: {upload_id}")
+
+        size = sum(part["size"] for part in parts)
+        if size > self._max_upload_bytes:
+            await self._storage_service.abort_multipart_upload(s3_path, upload_id)
+            raise ResourceLimitError(f"File size exceeds limit of {self._max_upload_bytes} bytes")
+
+        await self._storage_service.complete_multipart_upload(s3_path, upload_id, parts)
+        self._record_activity(session.id)
+        await self._record_upload(session.id, path, size)
+        logger.info(
+            "Completed resumable upload",
+            session_id=session_id,
+            path=path,
+            upload_id=upload_id,
+            parts=len(parts),
+            size=size,
+        )
+
+        return {"path": path, "size": size}
+
+    async def abort_upload(self, session_id: str, path: str, upload_id: str) -> None:
+        """取消可续传上传，释放已上传的分片"""
+        session = await self._get_upload_session(session_id, path)
+
+        await self._storage_service.abort_multipart_upload(f"{session.workspace_path}/{path}", upload_id)
+        logger.info("Aborted resumable upload", session_id=session_id, path=path, upload_id=upload_id)
+
+    async def _get_upload_session(self, session_id: str, path: str) -> Session:
+        """
+        校验上传目标并恢复容器
+
+        会话必须存在且运行中，路径必须为相对于工作区的非空路径。
+        """
         session = await self._session_repo.find_by_id(session_id)
         if not session:
             raise NotFoundError(f"Session not found: {session_id}")
@@ -52,52 +400,141 @@ class FileService:
         if not path or path.startswith("/"):
             raise ValidationError("Invalid file path")
 
-        s3_path = f"{session.workspace_path}/{path}"
-        await self._storage_service.upload_file(
-            s3_path=s3_path,
-            content=content,
-            content_type=content_type
-        )
-
-        return path
+        await self._resume_container(session)
+        return session
 
-    async def download_file(self, session_id: str, path: str) -> Dict:
+    async def download_file(
+        self,
+        session_id: str,
+        path: str,
+        if_none_match: Optional[List[str]] = None,
+        byte_range: Optional[Tuple[Optional[int], Optional[int]]] = None
+    ) -> FileDownloadDTO:
         """
         下载文件用例
 
         流程：
         1. 验证会话存在
-        2. 验证文件存在
-        3. 返回文件内容或预签名 URL
+        2. 一次 HEAD 取得文件大小、类型和 ETag（文件不存在时抛出 NotFoundError）
+        3. If-None-Match 命中当前 ETag 时返回 not_modified，不读取内容
+        4. 文件不小于预签名阈值时返回预签名 URL
+        5. 否则发起一次 GET（带区间时只读取该区间），返回按块读取的内容流
+
+        Args:
+            session_id: 会话 ID
+            path: 文件在工作区中的路径
+            if_none_match: 客户端缓存的 ETag 列表（不含引号），"*" 匹配任意 ETag
+            byte_range: 请求的字节区间 (start, end)，两端均含；
+                start 为空表示取最后 end 个字节，end 为空表示读到文件末尾
         """
         session = await self._session_repo.find_by_id(session_id)
         if not session:
             raise NotFoundError(f"Session not found: {session_id}")
 
+        await self._resume_container(session)
+
         s3_path = f"{session.workspace_path}/{path}"
-        file_exists = await self._storage_service.file_exists(s3_path)
-        if not file_exists:
+        try:
+            file_info = await self._storage_service.get_file_info(s3_path)
+        except NotFoundError:
             raise NotFoundError(f"File not found: {path}")
+        self._record_activity(session.id)
+
+        download = FileDownloadDTO(
+            path=path,
+            size=file_info["size"],
+            content_type=file_info.get("content_type") or "application/octet-stream",
+            etag=file_info.get("etag"),
+            last_modified=file_info.get("last_modified"),
+        )
 
-        file_info = await self._storage_service.get_file_info(s3_path)
-        file_size = file_info["size"]
+        if if_none_match and download.etag and ("*" in if_none_match or download.etag in if_none_match):
+            download.not_modified = True
+            return download
 
-        # 小文件（<10MB）直接返回内容，大文件返回预签名 URL
-        SMALL_FILE_THRESHOLD = 10 * 1024 * 1024  # 10MB
+        if 0 <= self._presign_threshold <= download.size:
+            download.presigned_url = await self._storage_service.generate_presigned_url(s3_path)
+            return download
 
-        if file_size < SMALL_FILE_THRESHOLD:
-            content = await self._storage_service.download_file(s3_path)
-            return {
-                "content": content,
-                "content_type": file_info.get("content_type", "application/octet-stream"),
-                "size": file_size,
-            }
+        if byte_range:
+            download.content_range = self._resolve_range(byte_range, download.size)
+            if download.content_range is None:
+                download.range_not_satisfiable = True
+                return download
 
-        presigned_url = await self._storage_service.generate_presigned_url(s3_path)
-        return {
-            "presigned_url": presigned_url,
-            "size": file_size,
-        }
+        start, end = download.content_range or (None, None)
+        download.stream = await self._storage_service.open_file_stream(
+            s3_path, start=start, end=end, etag=download.etag
+        )
+        return download
+
+    @staticmethod
+    def _resolve_range(
+        byte_range: Tuple[Optional[int], Optional[int]],
+        size: int
+    ) -> Optional[Tuple[int, int]]:
+        """把请求区间换算为文件内的 [start, end]，无法满足时返回 None"""
+        start, end = byte_range
+        if start is None:
+            # 后缀区间：最后 end 个字节
+            if not end or size == 0:
+                return None
+            return max(size - end, 0), size - 1
+
+        if start >= size or (end is not None and end < start):
+            return None
+        return start, size - 1 if end is None else min(end, size - 1)
+
+    async def _record_upload(self, session_id: str, path: str, size: int) -> None:
+        """把上传完成的文件写入 workspace 文件清单"""
+        if self._manifest:
+            await self._manifest.record_upload(session_id, path, size)
+
+    async def _record_uploads(self, session_id: str, files: Dict[str, int]) -> None:
+        """把一批上传完成的文件（路径 → 大小）写入 workspace 文件清单"""
+        if self._manifest and files:
+            now = datetime.now(timezone.utc)
+            await self._manifest.record_uploads(session_id, [
+                WorkspaceFile(path=path, size=size, modified_at=now) for path, size in files.items()
+            ])
+
+    def _record_activity(self, session_id: str) -> None:
+        """记录会话活动（写缓冲，不产生同步写库）"""
+        if self._activity_recorder:
+            self._activity_recorder(session_id)
+
+    async def _resume_container(self, session: Session) -> None:
+        """
+        恢复被空闲冻结的容器
+
+        容器内 s3fs 守护进程被冻结时无法感知或回写工作区变更，
+        因此文件读写前先恢复容器。列表查询只读 S3，不触发恢复。
+        会话活动经写缓冲延迟落库，last_activity_at 较新不代表容器未被冻结，
+        因此启用空闲冻结时总是查询容器状态。
+        """
+        if not self._scheduler or not session.container_id:
+            return
+        if self._idle_pause_minutes == -1:
+            return
+
+        try:
+            latency_ms = await self._scheduler.unpause_container(session.container_id)
+        except Exception as e:
+            logger.warning(
+                "Failed to resume paused container",
+                session_id=session.id,
+                container_id=session.container_id,
+                error=str(e),
+            )
+            return
+
+        if latency_ms is not None:
+            logger.info(
+                "Resumed paused container before file operation",
+                session_id=session.id,
+                container_id=session.container_id,
+                unpause_latency_ms=round(latency_ms, 2),
+            )
 
     async def list_files(
         self,
@@ -108,6 +545,8 @@ class FileService:
         """
         列出 session 下的文件
 
+        配置了 workspace 文件清单时从清单查询，否则（或清单不可用时）列出对象存储。
+
         Args:
             session_id: Session ID
             path: 可选，指定目录路径（相对于 workspace 根目录）
@@ -116,32 +555,303 @@ class FileService:
         Returns:
             文件列表，每个文件包含 name, size, modified_time, container_path 等
         """
+        session = await self._get_session(session_id)
+        files = await self._list_entries(session, self._normalize_prefix(path), limit)
+
+        return [
+            {
+                "name": file.path,
+                # 容器内挂载路径: /workspace/{relative_path}
+                "container_path": f"/workspace/{file.path}",
+                "size": file.size,
+                "modified_time": file.modified_at,
+                "etag": file.etag,
+            }
+            for file in files
+        ]
+
+    async def count_files(self, session_id: str, path: str = None) -> int:
+        """
+        统计 session 下路径以 path 开头的文件数
+
+        没有可用的清单时列出对象存储全部匹配的对象计数。
+        """
+        session = await self._get_session(session_id)
+        prefix = self._normalize_prefix(path)
+
+        if await self._manifest_ready(session):
+            return await self._manifest.count_files(session.id, prefix)
+        return len(await self._list_storage_files(session, prefix, limit=0))
+
+    async def open_archive(
+        self,
+        session_id: str,
+        path: Optional[str] = None,
+        archive_format: str = "zip",
+    ) -> FileArchiveDTO:
+        """
+        打包下载 workspace 目录
+
+        先列出目录下的文件并校验数量与总大小上限，返回边读取边生成归档的流；
+        小文件并发预读，归档条目按路径顺序写出，内存占用受预读上限约束。
+        条目名保留目录本身的名称（path 为 "out/results" 时为 "results/..."）。
+
+        Raises:
+            NotFoundError: 会话不存在或目录下没有文件
+            ValidationError: 不支持的归档格式
+            ResourceLimitError: 文件数或总大小超过上限
+        """
+        if archive_format not in ARCHIVE_FORMATS:
+            raise ValidationError(
+                f"Unsupported archive format: {archive_format}, expected one of {', '.join(ARCHIVE_FORMATS)}"
+            )
+
+        session = await self._get_session(session_id)
+        directory = self._normalize_prefix(path)
+        files = await self._list_entries(
+            session, f"{directory}/" if directory else "", self._archive_max_files + 1
+        )
+        if not files:
+            raise NotFoundError(f"No files under path: {directory or '/'}")
+        if len(files) > self._archive_max_files:
+            raise ResourceLimitError(f"Archive exceeds limit of {self._archive_max_files} files")
+
+        total_size = sum(file.size for file in files)
+        if 0 <= self._archive_max_bytes < total_size:
+            raise ResourceLimitError(f"Archive exceeds limit of {self._archive_max_bytes} bytes")
+
+        await self._resume_container(session)
+        self._record_activity(session.id)
+
+        workspace_path = session.workspace_path.rstrip("/")
+
+        async def fetch(file: WorkspaceFile) -> bytes:
+            return await self._storage_service.download_file(f"{workspace_path}/{file.path}")
+
+        async def open_stream(file: WorkspaceFile) -> AsyncIterator[bytes]:
+            return await self._storage_service.open_file_stream(f"{workspace_path}/{file.path}")
+
+        media_type, extension = ARCHIVE_FORMATS[archive_format]
+        logger.info(
+            "Streaming workspace archive",
+            session_id=session.id,
+            path=directory or "/",
+            format=archive_format,
+            files=len(files),
+            total_size=total_size,
+        )
+        return FileArchiveDTO(
+            filename=f"{directory.rsplit('/', 1)[-1] or session.id}{extension}",
+            media_type=media_type,
+            file_count=len(files),
+            total_size=total_size,
+            stream=stream_archive(
+                files,
+                archive_format,
+                fetch=fetch,
+                open_stream=open_stream,
+                strip_prefix=directory.rsplit("/", 1)[0] + "/" if "/" in directory else "",
+                concurrency=self._archive_fetch_concurrency,
+                prefetch_bytes=self._archive_prefetch_bytes,
+            ),
+        )
+
+    async def extract_archive(
+        self,
+        session_id: str,
+        chunks: AsyncIterator[bytes],
+        path: Optional[str] = None,
+    ) -> Dict:
+        """
+        上传归档并解压到 workspace 目录
+
+        边读取 chunks 边解析 zip、tar 或 tar.gz（按内容识别），每个文件以分片上传写入对象存储，
+        一次请求即可写入整个项目或数据集：
+        - 一个文件的内容读完后在后台完成上传，同时继续解析下一个文件，后台上传的文件数受 extract_concurrency 限制
+        - 大文件按分片并发上传，分片并发数达到上限时暂停读取（背压）
+        - 请求体或解压后的累计字节数超过 extract_max_bytes、文件数超过 archive_max_files 时立即中断
+        - 条目路径为绝对路径或包含 ".." 时拒绝整个归档；目录、链接等非普通文件被跳过
+        - 归档内重复的路径以最后一个条目为准
+
+        中断时取消并清理未完成的上传，已完成上传的文件保留。
+
+        Args:
+            session_id: 会话 ID
+            chunks: 归档内容块
+            path: 解压目标目录（相对于 workspace 根目录），不指定则解压到根目录
+
+        Returns:
+            dict: path, files（name, container_path, size）, count, total_size
+
+        Raises:
+            NotFoundError: 会话不存在
+            ValidationError: 会话未运行、目标目录无效、归档无法解析或包含不安全的路径
+            ResourceLimitError: 解压后总大小或文件数超过上限
+        """
+        directory = self._normalize_prefix(path)
+        if directory and normalize_member_path(directory) != directory:
+            raise ValidationError(f"Invalid target directory: {path}")
+
+        session = await self._get_session(session_id)
+        if not session.is_active():
+            raise ValidationError(f"Session is not active: {session_id}")
+        await self._resume_container(session)
+
+        workspace_path = session.workspace_path.rstrip("/")
+        slots = asyncio.Semaphore(max(1, self._extract_concurrency))
+        # 后台上传中（或已失败）的文件；上传成功后移除，不再持有其内容
+        pending: Dict[asyncio.Task, Tuple[str, _MultipartWriter]] = {}
+        files: Dict[str, int] = {}
+        extracted_bytes = 0
+        writer: Optional[_MultipartWriter] = None
+
+        async def finish(upload: _MultipartWriter) -> None:
+            try:
+                await upload.close()
+            finally:
+                slots.release()
+
+        def on_done(task: asyncio.Task) -> None:
+            if not task.cancelled() and task.exception() is None:
+                pending.pop(task, None)
+
+        try:
+            async for member in iter_archive(self._limit_archive_body(chunks)):
+                relative_path = normalize_member_path(member.name)
+                if relative_path is None:
+                    raise ValidationError(f"Unsafe path in archive: {member.name}")
+                target = f"{directory}/{relative_path}" if directory else relative_path
+                if target not in files and len(files) >= self._archive_max_files:
+                    raise ResourceLimitError(f"Archive exceeds limit of {self._archive_max_files} files")
+
+                for task, (pending_path, _) in list(pending.items()):
+                    if task.done():
+                        # 已失败的后台上传尽早中断，不再读取剩余的归档
+                        task.result()
+                    elif pending_path == target:
+                        # 同一路径的上一个条目先完成，保证后写入的内容生效
+                        await asyncio.wait([task])
+
+                writer = _MultipartWriter(
+                    self._storage_service,
+                    f"{workspace_path}/{target}",
+                    mimetypes.guess_type(relative_path)[0] or "application/octet-stream",
+                    part_size=self._part_size,
+                    concurrency=self._part_concurrency,
+                )
+                async for chunk in member.chunks:
+                    extracted_bytes += len(chunk)
+                    if 0 <= self._extract_max_bytes < extracted_bytes:
+                        raise ResourceLimitError(
+                            f"Extracted size exceeds limit of {self._extract_max_bytes} bytes"
+                        )
+                    await writer.write(chunk)
+
+                await slots.acquire()
+                task = asyncio.create_task(finish(writer))
+                pending[task] = (target, writer)
+                task.add_done_callback(on_done)
+                files[target] = writer.size
+                writer = None
+
+            await asyncio.gather(*pending)
+
+        except BaseException:
+            tasks = list(pending)
+            for task in tasks:
+                task.cancel()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            failed = [
+                pending[task][1] for task, result in zip(tasks, results, strict=True)
+                if isinstance(result, BaseException) and task in pending
+            ]
+            if writer is not None:
+                failed.append(writer)
+            await asyncio.gather(*(upload.abort() for upload in failed), return_exceptions=True)
+            raise
+
+        self._record_activity(session.id)
+        await self._record_uploads(session.id, files)
+
+        total_size = sum(files.values())
+        logger.info(
+            "Extracted archive into workspace",
+            session_id=session.id,
+            path=directory or "/",
+            files=len(files),
+            total_size=total_size,
+        )
+        return {
+            "path": directory,
+            "files": [
+                {"name": file_path, "container_path": f"/workspace/{file_path}", "size": size}
+                for file_path, size in files.items()
+            ],
+            "count": len(files),
+            "total_size": total_size,
+        }
+
+    async def _limit_archive_body(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """累计归档请求体字节数，超过 extract_max_bytes 时中断（元数据头等不计入解压输出的部分同样受限）"""
+        received = 0
+        async for chunk in chunks:
+            received += len(chunk)
+            if 0 <= self._extract_max_bytes < received:
+                raise ResourceLimitError(f"Archive size exceeds limit of {self._extract_max_bytes} bytes")
+            yield chunk
+
+    async def _get_session(self, session_id: str) -> Session:
         session = await self._session_repo.find_by_id(session_id)
         if not session:
             raise NotFoundError(f"Session not found: {session_id}")
+        return session
+
+    @staticmethod
+    def _normalize_prefix(path: Optional[str]) -> str:
+        """目录路径转换为相对于 workspace 根目录的路径前缀"""
+        return path.strip().strip("/") if path else ""
+
+    async def _manifest_ready(self, session: Session) -> bool:
+        """清单是否可用；清单出错时回退到列出对象存储"""
+        if not self._manifest:
+            return False
+        try:
+            return await self._manifest.ensure(session)
+        except Exception as e:
+            logger.warning("Workspace manifest unavailable", session_id=session.id, error=str(e))
+            return False
+
+    async def _list_entries(self, session: Session, prefix: str, limit: int) -> List[WorkspaceFile]:
+        """列出路径以 prefix 开头的文件：清单可用时查询清单，否则列出对象存储"""
+        if await self._manifest_ready(session):
+            return await self._manifest.list_files(session.id, prefix, limit)
+
+        return [
+            WorkspaceFile(
+                path=relative_path,
+                size=file["size"],
+                etag=file.get("etag"),
+                modified_at=file.get("last_modified"),
+            )
+            for relative_path, file in await self._list_storage_files(session, prefix, limit)
+        ]
+
+    async def _list_storage_files(self, session: Session, prefix: str, limit: int) -> List[Tuple[str, Dict]]:
+        """
+        直接列出对象存储
 
+        Returns:
+            (相对于 workspace 根目录的路径, 对象信息) 列表，不含目录标记
+        """
         # 解析 workspace_path，提取 S3 key 前缀
         # workspace_path 格式: s3://bucket/sessions/{session_id}/
         # S3 key 格式: sessions/{session_id}/...
         parsed = urlparse(session.workspace_path)
-        s3_key_prefix = parsed.path.lstrip("/")  # 去掉开头的 /，得到 "sessions/{session_id}/"
-
-        # 构建 S3 查询前缀
-        if path:
-            normalized_path = path.strip().strip("/")
-            if normalized_path:
-                # 确保 s3_key_prefix 以 / 结尾
-                base = s3_key_prefix.rstrip("/")
-                prefix = f"{base}/{normalized_path}"
-            else:
-                prefix = s3_key_prefix.rstrip("/")
-        else:
-            prefix = s3_key_prefix.rstrip("/")
+        s3_key_prefix = parsed.path.strip("/") + "/"  # 得到 "sessions/{session_id}/"
 
-        files = await self._storage_service.list_files(prefix, limit)
+        files = await self._storage_service.list_files(f"{s3_key_prefix}{prefix}", limit)
 
         result = []
-
         for file in files:
             key = file["key"]
 
@@ -149,7 +859,7 @@ class FileService:
             # key 格式: sessions/{session_id}/conversation-1231/uploads/temparea/test.csv
             # s3_key_prefix 格式: sessions/{session_id}/
             if key.startswith(s3_key_prefix):
-                relative_path = key[len(s3_key_prefix):].lstrip("/")
+                relative_path = key[len(s3_key_prefix):]
             else:
                 relative_path = key.lstrip("/")
 
@@ -157,15 +867,6 @@ class FileService:
             if not relative_path or relative_path.endswith("/"):
                 continue
 
-            # 容器内挂载路径: /workspace/{relative_path}
-            container_path = f"/workspace/{relative_path}"
-
-            result.append({
-                "name": relative_path,
-                "container_path": container_path,
-                "size": file["size"],
-                "modified_time": file.get("last_modified"),
-                "etag": file.get("etag")
-            })
+            result.append((relative_path, file))
 
         return result
@@ -0,0 +1,223 @@
+"""
+健康检查调度器
+
+为每个运行中的会话维护独立的下次检查时间（时间轮），取代固定周期的全量检查：
+- 新纳入的会话在一个基础间隔内随机错开，检查在时间上均匀分布
+- 检查间隔随最近活动、最近失败与容器存活时长自适应，并叠加抖动
+- 全局速率上限，到期过多时顺延到后续 tick，避免集中压向 Docker/K8s API
+"""
+import math
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional, Set
+
+from src.domain.entities.session import Session
+from src.shared.utils.timing_wheel import TimingWheel
+
+
+@dataclass
+class HealthCheckTarget:
+    """时间轮中的检查对象（会话的轻量快照）"""
+
+    session_id: str
+    container_id: str
+    container_since: Optional[datetime]
+    last_activity_at: Optional[datetime]
+    consecutive_failures: int = 0
+
+
+class HealthCheckScheduler:
+    """
+    健康检查调度器
+
+    下次检查间隔：
+    - 可疑（最近检查失败或刚恢复）：min_interval * 2^(n-1)，不超过 base_interval
+    - 容器刚启动（存活不足 young_container_seconds）：base_interval / 2
+    - 最近有活动（执行回调证明容器存活）：base_interval * 4
+    - 长时间无活动：base_interval * (1 + 空闲分钟数 / 10)
+    结果叠加 ±jitter_ratio 抖动，并限制在 [min_interval, max_interval]。
+    """
+
+    def __init__(
+        self,
+        base_interval_seconds: float = 30,
+        min_interval_seconds: float = 5,
+        max_interval_seconds: float = 300,
+        max_checks_per_second: float = -1,
+        jitter_ratio: float = 0.1,
+        rescan_interval_seconds: float = 60,
+        young_container_seconds: float = 300,
+        tick_seconds: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Callable[[], float] = random.random,
+    ):
+        """
+        初始化健康检查调度器
+
+        Args:
+            base_interval_seconds: 基础检查间隔（秒）
+            min_interval_seconds: 最短检查间隔（秒）
+            max_interval_seconds: 最长检查间隔（秒）
+            max_checks_per_second: 全局每秒检查数上限，-1 表示不限
+            jitter_ratio: 间隔抖动比例
+            rescan_interval_seconds: 与数据库重新对账会话集合的间隔（秒）
+            young_container_seconds: 视为刚启动容器的存活时长（秒）
+            tick_seconds: 时间轮精度（秒）
+            clock: 单调时钟
+            rng: [0, 1) 随机数生成器
+        """
+        self._base = base_interval_seconds
+        self._min = min_interval_seconds
+        self._max = max(max_interval_seconds, min_interval_seconds)
+        self._rate = max_checks_per_second
+        self._jitter = jitter_ratio
+        self._rescan_interval = rescan_interval_seconds
+        self._young_container = young_container_seconds
+        self._clock = clock
+        self._rng = rng
+
+        # 一圈覆盖最长间隔，定时项不跨圈
+        self._wheel = TimingWheel(
+            tick_seconds=tick_seconds,
+            slots=math.ceil(self._max / tick_seconds) + 1,
+            clock=clock,
+        )
+        self._targets: Dict[str, HealthCheckTarget] = {}
+        self._backlog: Deque[str] = deque()
+        self._tokens = 0.0
+        self._last_refill: Optional[float] = None
+        self._last_rescan: Optional[float] = None
+        self._seen: Optional[Set[str]] = None
+
+    # ============== 会话集合对账 ==============
+
+    def needs_rescan(self) -> bool:
+        """是否到了与数据库对账会话集合的时间"""
+        return self._last_rescan is None or self._clock() - self._last_rescan >= self._rescan_interval
+
+    def begin_rescan(self) -> None:
+        """开始一轮对账，之后对每个运行中的会话调用 track()，最后调用 finish_rescan()"""
+        self._seen = set()
+
+    def track(self, session: Session) -> None:
+        """纳入或刷新一个运行中的会话"""
+        if not session.container_id:
+            return
+        if self._seen is not None:
+            self._seen.add(session.id)
+
+        target = self._targets.get(session.id)
+        if target is None:
+            self._targets[session.id] = HealthCheckTarget(
+                session_id=session.id,
+                container_id=session.container_id,
+                container_since=session.created_at,
+                last_activity_at=session.last_activity_at,
+            )
+            # 新会话在一个基础间隔内随机错开首次检查
+            self._wheel.schedule(session.id, self._rng() * self._base)
+            return
+
+        target.last_activity_at = session.last_activity_at
+        if target.container_id != session.container_id:
+            target.container_id = session.container_id
+            target.container_since = datetime.now()
+            target.consecutive_failures = 0
+
+    def finish_rescan(self) -> int:
+        """结束对账，移除本轮未出现的会话，返回移除数量"""
+        seen, self._seen = self._seen or set(), None
+        self._last_rescan = self._clock()
+
+        stale = [session_id for session_id in self._targets if session_id not in seen]
+        for session_id in stale:
+            self.forget(session_id)
+        return len(stale)
+
+    def forget(self, session_id: str) -> None:
+        """不再检查该会话（已终止或已失败）"""
+        self._targets.pop(session_id, None)
+        self._wheel.cancel(session_id)
+
+    # ============== 调度 ==============
+
+    def due(self) -> List[HealthCheckTarget]:
+        """取出本次应检查的会话，超出速率上限的部分留到后续 tick"""
+        now = self._clock()
+        self._backlog.extend(self._wheel.advance(now))
+
+        if self._rate > 0:
+            # 令牌桶容量为 1 秒的配额，长时间未调用不会积攒成突发
+            if self._last_refill is None:
+                self._tokens = self._rate
+            else:
+                self._tokens = min(self._rate, self._tokens + (now - self._last_refill) * self._rate)
+            self._last_refill = now
+            budget = int(self._tokens)
+        else:
+            budget = len(self._backlog)
+
+        targets: List[HealthCheckTarget] = []
+        while self._backlog and len(targets) < budget:
+            target = self._targets.get(self._backlog.popleft())
+            if target is not None:
+                targets.append(target)
+
+        if self._rate > 0:
+            self._tokens -= len(targets)
+        return targets
+
+    def record_result(self, target: HealthCheckTarget, healthy: bool) -> float:
+        """
+        记录一次检查结果并安排下次检查
+
+        Args:
+            target: 检查对象
+            healthy: 检查通过；False 表示检查出错或容器刚被恢复，需要尽快复查
+
+        Returns:
+            距下次检查的秒数
+        """
+        if target.session_id not in self._targets:
+            return 0.0
+
+        target.consecutive_failures = 0 if healthy else target.consecutive_failures + 1
+        interval = self.next_interval(target)
+        self._wheel.schedule(target.session_id, interval)
+        return interval
+
+    def replace_container(self, target: HealthCheckTarget, container_id: str) -> None:
+        """容器被恢复（重建）后更新检查对象"""
+        target.container_id = container_id
+        target.container_since = datetime.now()
+
+    def next_interval(self, target: HealthCheckTarget, now: Optional[datetime] = None) -> float:
+        """计算下次检查间隔（秒，含抖动）"""
+        now = now or datetime.now()
+
+        if target.consecutive_failures:
+            interval = min(self._base, self._min * 2 ** (target.consecutive_failures - 1))
+        elif target.container_since and (now - target.container_since).total_seconds() < self._young_container:
+            interval = self._base / 2
+        else:
+            idle_seconds = (now - target.last_activity_at).total_seconds() if target.last_activity_at else math.inf
+            if idle_seconds < self._base * 2:
+                interval = self._base * 4
+            else:
+                interval = self._base * (1 + min(idle_seconds, 86400) / 600)
+
+        interval *= 1 + self._jitter * (2 * self._rng() - 1)
+        return min(self._max, max(self._min, interval))
+
+    @property
+    def tracked(self) -> int:
+        """纳入调度的会话数"""
+        return len(self._targets)
+
+    @property
+    def backlog(self) -> int:
+        """已到期但因速率上限顺延的检查数"""
+        return len(self._backlog)
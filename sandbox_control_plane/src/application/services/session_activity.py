@@ -0,0 +1,40 @@
+"""
+会话活动时间
+
+空闲冻结与休眠共用的最近活动时间判断。
+"""
+from datetime import datetime
+from typing import Optional
+
+from src.domain.entities.session import Session
+from src.domain.repositories.execution_repository import IExecutionRepository
+
+
+async def get_last_activity(
+    session: Session,
+    execution_repo: Optional[IExecutionRepository] = None,
+) -> Optional[datetime]:
+    """
+    获取会话最近活动时间，有未结束的执行时返回 None（视为活跃）
+
+    取 last_activity_at 与最近一次执行的完成 / 心跳 / 创建时间的较大者。
+    长时间执行期间不能按执行创建时间判断空闲，否则执行中途容器被冻结或销毁。
+
+    Args:
+        session: 会话
+        execution_repo: 执行仓储（可选，未配置时只看 last_activity_at）
+    """
+    last_activity = session.last_activity_at or session.created_at
+
+    if execution_repo:
+        if await execution_repo.has_active_executions(session.id):
+            return None
+
+        executions = await execution_repo.find_by_session_id(session.id, limit=1)
+        if executions:
+            latest = executions[0]
+            execution_activity = latest.completed_at or latest.last_heartbeat_at or latest.created_at
+            if execution_activity and (not last_activity or execution_activity > last_activity):
+                last_activity = execution_activity
+
+    return last_activity
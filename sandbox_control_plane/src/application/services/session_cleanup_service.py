@@ -3,11 +3,19 @@
 
 负责定期清理空闲会话和过期会话，自动销毁关联的容器和删除关联的文件。
 """
+import asyncio
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional
 from urllib.parse import urlparse
 
+from src.application.services.session_teardown_pipeline import (
+    SessionTeardownPipeline,
+    TeardownRequest,
+    TeardownResult,
+)
+from src.application.services.workspace_deletion_service import WorkspaceDeletionService
+from src.application.services.workspace_manifest_service import WorkspaceManifestService
 from src.domain.entities.session import Session, SessionStatus
 from src.domain.repositories.session_repository import ISessionRepository
 from src.domain.services.scheduler import IScheduler
@@ -21,11 +29,14 @@ class SessionCleanupService:
     会话清理服务
 
     职责：
-    1. 定期扫描空闲会话（基于 last_activity_at 字段）
-    2. 自动终止超时会话并销毁容器
+    1. 定期扫描空闲会话（基于 last_activity_at 字段，含休眠会话）
+    2. 自动终止超时会话并销毁容器（休眠会话没有容器，只删除 workspace）
     3. 定期扫描 FAILED/TIMEOUT 状态的孤立会话
     4. 清理会话关联的 S3 文件
 
+    一批待清理的会话交给拆除流水线并发拆除（停止容器、删除容器、删除文件），
+    每个会话拆除完成后立即标记为终止；容器删除重试耗尽的会话保持原状态，由下一轮清理重试。
+
     清理策略：
     - 空闲超时：30 分钟无活动（可配置，设为 -1 表示禁用空闲清理）
     - 最大生命周期：6 小时强制清理（可配置，设为 -1 表示禁用生命周期清理）
@@ -38,6 +49,11 @@ class SessionCleanupService:
         idle_timeout_minutes: int = 30,
         max_lifetime_hours: int = 6,
         storage_service: Optional[IStorageService] = None,
+        teardown_pipeline_factory: Optional[
+            Callable[..., SessionTeardownPipeline]
+        ] = None,
+        workspace_deleter: Optional[WorkspaceDeletionService] = None,
+        workspace_manifest: Optional[WorkspaceManifestService] = None,
     ):
         """
         初始化会话清理服务
@@ -48,10 +64,19 @@ class SessionCleanupService:
             idle_timeout_minutes: 空闲超时时间（分钟），-1 表示无限期（不清理空闲会话）
             max_lifetime_hours: 最大生命周期（小时），-1 表示无限期
             storage_service: 存储服务（可选，用于清理 S3 文件）
+            teardown_pipeline_factory: 按 (scheduler, storage_service, on_torn_down) 创建拆除流水线，
+                用于配置并发、限速与重试；默认使用流水线默认参数
+            workspace_deleter: workspace 后台删除服务（可选，删除中断后按删除标记续删）
+            workspace_manifest: workspace 文件清单服务（可选，会话终止时删除清单）
         """
         self._session_repo = session_repo
         self._scheduler = scheduler
         self._storage_service = storage_service
+        self._teardown_pipeline_factory = teardown_pipeline_factory or SessionTeardownPipeline
+        self._workspace_deleter = workspace_deleter
+        self._workspace_manifest = workspace_manifest
+        # 拆除并发完成，写回会话状态需串行（共享同一个数据库会话）
+        self._save_lock = asyncio.Lock()
         self._idle_timeout = None if idle_timeout_minutes == -1 else timedelta(minutes=idle_timeout_minutes)
         self._max_lifetime = None if max_lifetime_hours == -1 else timedelta(hours=max_lifetime_hours)
 
@@ -59,6 +84,8 @@ class SessionCleanupService:
         """
         清理空闲会话
 
+        运行中与休眠的会话均参与检查。
+
         清理策略：
         - 空闲超过阈值的会话自动销毁容器（如果 idle_timeout_minutes != -1）
         - 创建超过最大生命周期的会话强制销毁（如果 max_lifetime_hours != -1）
@@ -69,6 +96,7 @@ class SessionCleanupService:
                 - idle_cleaned: 空闲清理的会话数
                 - expired_cleaned: 过期清理的会话数
                 - errors: 错误列表
+                - teardown: 拆除流水线统计（耗时、吞吐、死信）
         """
         stats = {
             "total_checked": 0,
@@ -82,44 +110,42 @@ class SessionCleanupService:
             idle_threshold = now - self._idle_timeout if self._idle_timeout else None
             max_lifetime_threshold = now - self._max_lifetime if self._max_lifetime else None
 
-            # 查询所有活跃会话
-            active_sessions = await self._session_repo.find_by_status("running")
-            stats["total_checked"] = len(active_sessions)
-
             logger.info(
-                f"Starting session cleanup: checking {len(active_sessions)} active sessions, "
+                f"Starting session cleanup: "
                 f"idle_threshold={idle_threshold}, max_lifetime={max_lifetime_threshold}"
             )
 
-            for session in active_sessions:
-                try:
-                    # 检查是否超过最大生命周期（如果启用）
-                    if max_lifetime_threshold and session.created_at and session.created_at < max_lifetime_threshold:
-                        await self._cleanup_session(
-                            session,
-                            reason="max_lifetime_exceeded",
-                            detail=f"Session created at {session.created_at} exceeded max lifetime of {self._max_lifetime}"
-                        )
-                        stats["expired_cleaned"] += 1
-                        continue
-
-                    # 检查是否空闲超时（如果启用）
-                    # 使用 last_activity_at，如果不存在则使用 created_at
-                    if idle_threshold:
-                        last_activity = session.last_activity_at or session.created_at
-                        if last_activity and last_activity < idle_threshold:
-                            await self._cleanup_session(
+            # 逐页遍历运行中与休眠的会话，每页拆除完成后再取下一页
+            # （休眠会话没有容器，拆除时只删除 workspace 与依赖快照）
+            for status in ("running", "hibernated"):
+                async for page in self._session_repo.iter_by_status(status):
+                    stats["total_checked"] += len(page)
+
+                    requests: List[TeardownRequest] = []
+                    for session in page:
+                        # 检查是否超过最大生命周期（如果启用）
+                        if max_lifetime_threshold and session.created_at and session.created_at < max_lifetime_threshold:
+                            requests.append(TeardownRequest(
                                 session,
-                                reason="idle_timeout",
-                                detail=f"Session last activity at {last_activity} exceeded idle timeout of {self._idle_timeout}"
-                            )
-                            stats["idle_cleaned"] += 1
+                                reason="max_lifetime_exceeded",
+                                detail=f"Session created at {session.created_at} exceeded max lifetime of {self._max_lifetime}"
+                            ))
                             continue
 
-                except Exception as e:
-                    error_msg = f"Error cleaning session {session.id}: {e}"
-                    logger.error(error_msg, exc_info=True)
-                    stats["errors"].append(error_msg)
+                        # 检查是否空闲超时（如果启用）
+                        # 使用 last_activity_at，如果不存在则使用 created_at
+                        if idle_threshold:
+                            last_activity = session.last_activity_at or session.created_at
+                            if last_activity and last_activity < idle_threshold:
+                                requests.append(TeardownRequest(
+                                    session,
+                                    reason="idle_timeout",
+                                    detail=f"Session last activity at {last_activity} exceeded idle timeout of {self._idle_timeout}"
+                                ))
+
+                    cleaned = await self._teardown_sessions(requests, stats)
+                    stats["expired_cleaned"] += cleaned.get("max_lifetime_exceeded", 0)
+                    stats["idle_cleaned"] += cleaned.get("idle_timeout", 0)
 
             logger.info(
                 f"Session cleanup completed: "
@@ -149,27 +175,23 @@ class SessionCleanupService:
         }
 
         try:
-            # 查询失败和超时的会话
-            failed_sessions = await self._session_repo.find_by_status("failed")
-            timeout_sessions = await self._session_repo.find_by_status("timeout")
-            orphaned = failed_sessions + timeout_sessions
-
-            stats["total_checked"] = len(orphaned)
-
-            for session in orphaned:
-                # 只清理有 container_id 的会话
-                if session.container_id:
-                    try:
-                        await self._cleanup_session(
+            # 逐页遍历失败和超时的会话
+            for status in ("failed", "timeout"):
+                async for page in self._session_repo.iter_by_status(status):
+                    stats["total_checked"] += len(page)
+
+                    # 只清理有 container_id 的会话
+                    requests = [
+                        TeardownRequest(
                             session,
                             reason="orphaned_cleanup",
                             detail=f"Session in {session.status} status with container {session.container_id}"
                         )
-                        stats["cleaned"] += 1
-                    except Exception as e:
-                        error_msg = f"Error cleaning orphaned session {session.id}: {e}"
-                        logger.error(error_msg, exc_info=True)
-                        stats["errors"].append(error_msg)
+                        for session in page
+                        if session.container_id
+                    ]
+                    cleaned = await self._teardown_sessions(requests, stats)
+                    stats["cleaned"] += cleaned.get("orphaned_cleanup", 0)
 
             logger.info(
                 f"Orphaned session cleanup completed: "
@@ -220,7 +242,7 @@ class SessionCleanupService:
 
             # 构建删除前缀（包含存储桶路径）
             # 例如: s3://sandbox-workspace/sessions/sess_abc123/
-            delete_prefix = session.workspace_path.rstrip('/')
+            delete_prefix = session.workspace_path.rstrip('/') + '/'
 
             # 删除所有带该前缀的文件
             deleted_count = await self._storage_service.delete_prefix(delete_prefix)
@@ -239,48 +261,67 @@ class SessionCleanupService:
             )
             return 0
 
-    async def _cleanup_session(
-        self,
-        session: Session,
-        reason: str,
-        detail: str
-    ) -> None:
+    async def _teardown_sessions(self, requests: List[TeardownRequest], stats: Dict) -> Dict[str, int]:
         """
-        清理会话并销毁容器
+        通过拆除流水线拆除会话，并在每个会话拆除完成后标记为终止
 
-        Args:
-            session: 要清理的会话
-            reason: 清理原因
-            detail: 详细信息
+        Returns:
+            按清理原因统计的已终止会话数
         """
-        logger.info(
-            f"Cleaning up session {session.id}: "
-            f"reason={reason}, "
-            f"detail={detail}, "
-            f"container_id={session.container_id}"
-        )
+        cleaned: Dict[str, int] = {}
+        if not requests:
+            return cleaned
+
+        async def mark_terminated(result: TeardownResult) -> None:
+            session = result.request.session
+            if not result.container_removed:
+                stats["errors"].append(f"Error cleaning session {session.id}: {result.error}")
+                return
 
-        # 销毁容器（如果调度器支持且容器存在）
-        if session.container_id and hasattr(self._scheduler, 'destroy_container'):
             try:
-                await self._scheduler.destroy_container(
-                    container_id=session.container_id
-                )
-                logger.info(f"Destroyed container {session.container_id} for session {session.id}")
+                async with self._save_lock:
+                    session.mark_as_terminated()
+                    await self._session_repo.save(session)
+                    # 清单与会话共享数据库会话，同样在锁内写入
+                    if self._workspace_manifest:
+                        await self._workspace_manifest.forget(session.id)
             except Exception as e:
-                # 记录错误但不中断流程
-                logger.warning(
-                    f"Failed to destroy container {session.container_id} for session {session.id}: {e}"
-                )
-
-        # 删除 S3 文件（如果配置了存储服务）
-        await self.cleanup_session_files(session, reason)
-
-        # 标记会话为已终止
-        session.mark_as_terminated()
-        await self._session_repo.save(session)
-
-        logger.info(f"Session {session.id} marked as terminated")
+                error_msg = f"Error cleaning session {session.id}: {e}"
+                logger.error(error_msg, exc_info=True)
+                stats["errors"].append(error_msg)
+                return
+            cleaned[result.request.reason] = cleaned.get(result.request.reason, 0) + 1
+            logger.info(f"Session {session.id} marked as terminated")
+
+        pipeline = self._teardown_pipeline_factory(
+            scheduler=self._scheduler,
+            storage_service=self._storage_service,
+            on_torn_down=mark_terminated,
+            workspace_deleter=self._workspace_deleter,
+        )
+        self._merge_teardown_stats(stats, await pipeline.run(requests))
+        return cleaned
+
+    @staticmethod
+    def _merge_teardown_stats(stats: Dict, teardown_stats: Dict) -> None:
+        """累加逐页拆除的流水线统计到 stats["teardown"]"""
+        merged = stats.setdefault("teardown", {
+            "total": 0,
+            "torn_down": 0,
+            "files_deleted": 0,
+            "dead_lettered": [],
+            "duration_seconds": 0.0,
+            "throughput_per_second": 0.0,
+            "stage_seconds": {},
+        })
+        for key in ("total", "torn_down", "files_deleted"):
+            merged[key] += teardown_stats[key]
+        merged["dead_lettered"].extend(teardown_stats["dead_lettered"])
+        merged["duration_seconds"] = round(merged["duration_seconds"] + teardown_stats["duration_seconds"], 3)
+        for stage, seconds in teardown_stats["stage_seconds"].items():
+            merged["stage_seconds"][stage] = round(merged["stage_seconds"].get(stage, 0.0) + seconds, 3)
+        if merged["duration_seconds"] > 0:
+            merged["throughput_per_second"] = round(merged["total"] / merged["duration_seconds"], 2)
 
     async def cleanup_by_ids(self, session_ids: list[str]) -> Dict[str, int]:
         """
@@ -299,6 +340,7 @@ class SessionCleanupService:
             "errors": []
         }
 
+        requests: List[TeardownRequest] = []
         for session_id in session_ids:
             try:
                 session = await self._session_repo.find_by_id(session_id)
@@ -306,18 +348,20 @@ class SessionCleanupService:
                     stats["not_found"] += 1
                     continue
 
-                await self._cleanup_session(
+                requests.append(TeardownRequest(
                     session,
                     reason="manual_cleanup",
-                    detail=f"Manual cleanup requested"
-                )
-                stats["cleaned"] += 1
+                    detail="Manual cleanup requested"
+                ))
 
             except Exception as e:
                 error_msg = f"Error cleaning session {session_id}: {e}"
                 logger.error(error_msg, exc_info=True)
                 stats["errors"].append(error_msg)
 
+        cleaned = await self._teardown_sessions(requests, stats)
+        stats["cleaned"] = cleaned.get("manual_cleanup", 0)
+
         logger.info(
             f"Manual session cleanup completed: "
             f"total={stats['total']}, "
@@ -0,0 +1,189 @@
+"""
+会话休眠服务
+
+负责将长时间空闲的会话转入休眠：先以 running -> hibernating 的条件更新认领并提交，
+再快照已安装依赖到 workspace S3 前缀、销毁容器并标记为 hibernated。
+会话身份、workspace 与依赖元数据均保留，下一次执行时由 SessionService 在任意节点上恢复。
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from src.application.services.session_activity import get_last_activity
+from src.domain.entities.session import Session, SessionStatus
+from src.domain.repositories.execution_repository import IExecutionRepository
+from src.domain.repositories.session_repository import ISessionRepository
+from src.domain.services.scheduler import IScheduler
+from src.shared.errors.domain import ConflictError
+
+logger = logging.getLogger(__name__)
+
+
+class SessionHibernationService:
+    """
+    会话休眠服务
+
+    职责：
+    1. 定期扫描 running 状态的会话
+    2. 空闲超过 hibernate_after_minutes 的会话：认领 hibernating -> 快照依赖 -> 销毁容器 -> 标记 hibernated
+       （有未结束执行的会话视为活跃，不休眠；认领后再检查一次，期间新建的执行会让认领回滚）
+    3. 快照或销毁失败时回到 running 并保留容器，避免丢失依赖环境
+    4. 停留在 hibernating 超过休眠阈值的会话（上次休眠中途退出）重新执行休眠
+
+    与空闲冻结的区别：冻结只暂停进程，休眠会释放容器占用的全部内存。
+    """
+
+    def __init__(
+        self,
+        session_repo: ISessionRepository,
+        scheduler: IScheduler,
+        execution_repo: Optional[IExecutionRepository] = None,
+        hibernate_after_minutes: int = -1,
+    ):
+        """
+        初始化会话休眠服务
+
+        Args:
+            session_repo: 会话仓储
+            scheduler: 调度器（用于快照依赖与销毁容器）
+            execution_repo: 执行仓储（可选，用于获取最近一次执行时间）
+            hibernate_after_minutes: 休眠阈值（分钟），-1 表示禁用
+        """
+        self._session_repo = session_repo
+        self._scheduler = scheduler
+        self._execution_repo = execution_repo
+        self._hibernate_after = (
+            None if hibernate_after_minutes == -1 else timedelta(minutes=hibernate_after_minutes)
+        )
+
+    async def hibernate_idle_sessions(self) -> Dict[str, int]:
+        """
+        休眠空闲会话
+
+        Returns:
+            dict: 统计信息
+                - total_checked: 检查的会话数
+                - hibernated: 本次休眠的会话数
+                - errors: 错误列表
+        """
+        stats = {
+            "total_checked": 0,
+            "hibernated": 0,
+            "errors": []
+        }
+
+        if self._hibernate_after is None:
+            return stats
+
+        try:
+            idle_threshold = datetime.now() - self._hibernate_after
+
+            # 上次休眠中途退出（进程崩溃、主节点切换）的会话，认领已提交，直接续做
+            async for page in self._session_repo.iter_by_status(SessionStatus.HIBERNATING):
+                stats["total_checked"] += len(page)
+
+                for session in page:
+                    if session.updated_at and session.updated_at >= idle_threshold:
+                        continue
+                    try:
+                        if await self._release_container(session):
+                            stats["hibernated"] += 1
+                    except Exception as e:
+                        error_msg = f"Error resuming hibernation of session {session.id}: {e}"
+                        logger.error(error_msg, exc_info=True)
+                        stats["errors"].append(error_msg)
+
+            async for page in self._session_repo.iter_by_status(SessionStatus.RUNNING):
+                stats["total_checked"] += len(page)
+
+                for session in page:
+                    try:
+                        last_activity = await get_last_activity(session, self._execution_repo)
+                        if last_activity and last_activity < idle_threshold:
+                            if await self.hibernate_session(session):
+                                stats["hibernated"] += 1
+                    except Exception as e:
+                        error_msg = f"Error hibernating session {session.id}: {e}"
+                        logger.error(error_msg, exc_info=True)
+                        stats["errors"].append(error_msg)
+
+            if stats["hibernated"] > 0:
+                logger.info(
+                    f"Session hibernation completed: "
+                    f"checked={stats['total_checked']}, "
+                    f"hibernated={stats['hibernated']}"
+                )
+
+        except Exception as e:
+            error_msg = f"Fatal error during session hibernation: {e}"
+            logger.error(error_msg, exc_info=True)
+            stats["errors"].append(error_msg)
+
+        return stats
+
+    async def hibernate_session(self, session: Session) -> bool:
+        """
+        休眠单个会话
+
+        先以 running -> hibernating 的条件更新认领并立即提交：认领之后执行请求看到 hibernating
+        会被拒绝，不会再分发到即将销毁的容器；状态已被其他请求修改时抛出 ConflictError。
+
+        Args:
+            session: 运行中的会话
+
+        Returns:
+            是否已休眠（认领后发现新的执行时回滚认领，返回 False）
+        """
+        session.mark_as_hibernating()
+        try:
+            await self._session_repo.save(session)
+        except ConflictError as e:
+            raise ConflictError(f"Session changed before hibernation: {session.id}") from e
+        await self._session_repo.commit()
+
+        return await self._release_container(session)
+
+    async def _release_container(self, session: Session) -> bool:
+        """
+        已认领休眠的会话：快照依赖 -> 销毁容器 -> 标记 hibernated 并提交
+
+        认领前读到的会话状态可能已过期：认领后仍有未结束的执行时回滚认领；
+        任一步骤失败时同样回滚认领（容器保留），异常向上抛出。
+        """
+        container_id = session.container_id
+        try:
+            if self._execution_repo and await self._execution_repo.has_active_executions(session.id):
+                logger.info(f"Session {session.id} became active while hibernating, keeping container")
+                await self._abort_hibernation(session)
+                return False
+
+            if container_id:
+                # 被冻结的容器无法 exec，先恢复
+                await self._scheduler.unpause_container(container_id)
+
+                if session.requested_dependencies or session.installed_dependencies:
+                    await self._scheduler.snapshot_dependencies(container_id)
+
+                await self._scheduler.destroy_container(container_id)
+        except Exception:
+            await self._abort_hibernation(session)
+            raise
+
+        session.mark_as_hibernated()
+        await self._session_repo.save(session)
+        await self._session_repo.commit()
+
+        logger.info(
+            f"Session {session.id} hibernated: "
+            f"released container {container_id}, last_activity={session.last_activity_at}"
+        )
+        return True
+
+    async def _abort_hibernation(self, session: Session) -> None:
+        """休眠失败：回到 running 并提交，容器保留"""
+        try:
+            session.abort_hibernation()
+            await self._session_repo.save(session)
+            await self._session_repo.commit()
+        except Exception as e:
+            logger.error(f"Failed to reset session {session.id} after hibernation failure: {e}")
@@ -0,0 +1,110 @@
+"""
+会话空闲冻结服务
+
+负责定期暂停长时间无执行的会话容器（docker pause / cgroup freeze），
+让节点 CPU 回到活跃会话上；下一次执行或文件操作前由调用方透明恢复。
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from src.application.services.session_activity import get_last_activity
+from src.domain.entities.session import SessionStatus
+from src.domain.repositories.execution_repository import IExecutionRepository
+from src.domain.repositories.session_repository import ISessionRepository
+from src.domain.services.scheduler import IScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class SessionIdlePauseService:
+    """
+    会话空闲冻结服务
+
+    职责：
+    1. 定期扫描 running 状态的会话
+    2. 跳过有未结束执行的会话，其余以最近活动时间判断空闲
+       （last_activity_at 与最近一次执行的完成 / 心跳 / 创建时间的较大者）
+    3. 暂停空闲超过阈值的容器，保留进程与内存状态，不销毁容器
+
+    冻结策略：
+    - 空闲阈值：idle_pause_minutes（-1 表示禁用）
+    - 会话状态保持 running，暂停只是容器层面的状态
+    """
+
+    def __init__(
+        self,
+        session_repo: ISessionRepository,
+        scheduler: IScheduler,
+        execution_repo: Optional[IExecutionRepository] = None,
+        idle_pause_minutes: int = -1,
+    ):
+        """
+        初始化会话空闲冻结服务
+
+        Args:
+            session_repo: 会话仓储
+            scheduler: 调度器（用于暂停容器）
+            execution_repo: 执行仓储（可选，用于获取最近一次执行时间）
+            idle_pause_minutes: 空闲冻结阈值（分钟），-1 表示禁用
+        """
+        self._session_repo = session_repo
+        self._scheduler = scheduler
+        self._execution_repo = execution_repo
+        self._idle_pause = None if idle_pause_minutes == -1 else timedelta(minutes=idle_pause_minutes)
+
+    async def pause_idle_sessions(self) -> Dict[str, int]:
+        """
+        暂停空闲会话的容器
+
+        Returns:
+            dict: 统计信息
+                - total_checked: 检查的会话数
+                - paused: 本次暂停的容器数
+                - errors: 错误列表
+        """
+        stats = {
+            "total_checked": 0,
+            "paused": 0,
+            "errors": []
+        }
+
+        if self._idle_pause is None:
+            return stats
+
+        try:
+            idle_threshold = datetime.now() - self._idle_pause
+
+            async for page in self._session_repo.iter_by_status(SessionStatus.RUNNING):
+                stats["total_checked"] += len(page)
+
+                for session in page:
+                    if not session.container_id:
+                        continue
+                    try:
+                        last_activity = await get_last_activity(session, self._execution_repo)
+                        if last_activity and last_activity < idle_threshold:
+                            if await self._scheduler.pause_container(session.container_id):
+                                stats["paused"] += 1
+                                logger.info(
+                                    f"Paused idle session {session.id}: "
+                                    f"container_id={session.container_id}, last_activity={last_activity}"
+                                )
+                    except Exception as e:
+                        error_msg = f"Error pausing session {session.id}: {e}"
+                        logger.error(error_msg, exc_info=True)
+                        stats["errors"].append(error_msg)
+
+            if stats["paused"] > 0:
+                logger.info(
+                    f"Idle pause completed: "
+                    f"checked={stats['total_checked']}, "
+                    f"paused={stats['paused']}"
+                )
+
+        except Exception as e:
+            error_msg = f"Fatal error during idle pause: {e}"
+            logger.error(error_msg, exc_info=True)
+            stats["errors"].append(error_msg)
+
+        return stats
@@ -5,6 +5,8 @@
 """
 from typing import Callable, List, Optional
 from datetime import datetime, timedelta
+import asyncio
+import time
 import uuid
 
 from src.domain.entities.session import InstalledDependency, Session
@@ -13,8 +15,10 @@ from src.domain.entities.template import Template
 from src.domain.value_objects.resource_limit import ResourceLimit
 from src.domain.value_objects.execution_status import SessionStatus, ExecutionStatus
 from src.domain.value_objects.execution_request import ExecutionRequest
+from src.domain.value_objects.page_cursor import PageCursor
 from src.domain.repositories.session_repository import ISessionRepository
 from src.domain.repositories.execution_repository import IExecutionRepository
+from src.domain.repositories.execution_dispatch_repository import IExecutionDispatchRepository
 from src.domain.repositories.template_repository import ITemplateRepository
 from src.domain.services.scheduler import IScheduler, ScheduleRequest, RuntimeNode
 from src.domain.services.storage import IStorageService
@@ -26,9 +30,20 @@ from src.infrastructure.config.settings import get_settings
 from src.application.commands.execute_code import ExecuteCodeCommand
 from src.application.queries.get_session import GetSessionQuery
 from src.application.queries.get_execution import GetExecutionQuery
+from src.application.services.execution_archive_service import (
+    ExecutionArchiveService,
+    session_archive_prefix,
+)
+from src.application.services.session_teardown_pipeline import (
+    SessionTeardownPipeline,
+    TeardownRequest,
+    TeardownResult,
+)
+from src.application.services.workspace_deletion_service import WorkspaceDeletionService
+from src.application.services.workspace_manifest_service import WorkspaceManifestService
 from src.application.dtos.session_dto import SessionDTO
 from src.application.dtos.execution_dto import ExecutionDTO
-from src.shared.errors.domain import NotFoundError, ValidationError, ConflictError
+from src.shared.errors.domain import NotFoundError, ValidationError, ConflictError, NodeUnavailableError
 from src.infrastructure.executors import ExecutorClient
 from src.infrastructure.executors.errors import (
     ExecutorConnectionError,
@@ -40,6 +55,7 @@ from src.infrastructure.executors.errors import (
 from src.infrastructure.logging import get_logger
 from src.shared.utils.dependencies import (
     DEFAULT_PYTHON_PACKAGE_INDEX_URL,
+    VENV_SNAPSHOT_RELATIVE_PATH,
     normalize_python_package_index_url,
 )
 
@@ -62,6 +78,11 @@ class SessionService:
         storage_service: Optional[IStorageService] = None,
         executor_client: Optional[ExecutorClient] = None,
         initial_dependency_sync_scheduler: Optional[Callable[[str, int], None]] = None,
+        activity_recorder: Optional[Callable[[str], None]] = None,
+        dispatch_repo: Optional[IExecutionDispatchRepository] = None,
+        dispatch_notifier: Optional[Callable[[], None]] = None,
+        workspace_deleter: Optional[WorkspaceDeletionService] = None,
+        workspace_manifest: Optional[WorkspaceManifestService] = None,
     ):
         self._session_repo = session_repo
         self._execution_repo = execution_repo
@@ -70,6 +91,15 @@ class SessionService:
         self._storage_service = storage_service
         self._executor_client = executor_client or ExecutorClient()
         self._initial_dependency_sync_scheduler = initial_dependency_sync_scheduler
+        # 记录会话活动（写缓冲，由后台任务批量写回 last_activity_at）
+        self._activity_recorder = activity_recorder
+        # 执行分发队列：执行记录与分发条目同一事务提交，由分发者异步调用执行器
+        self._dispatch_repo = dispatch_repo
+        self._dispatch_notifier = dispatch_notifier
+        # workspace 后台删除：终止、删除会话时不等待文件删除完成，删除标记期间不允许复用会话 ID
+        self._workspace_deleter = workspace_deleter
+        # workspace 文件清单：workspace 删除时一并删除
+        self._workspace_manifest = workspace_manifest
 
     async def create_session(self, command: CreateSessionCommand) -> SessionDTO:
         """
@@ -105,6 +135,7 @@ class SessionService:
                     existing_status=existing_session.status.value,
                 )
                 raise ConflictError(f"Session ID already exists: {session_id}")
+            await self._ensure_workspace_not_deleting(session_id)
             logger.debug("Using manually specified session ID", session_id=session_id)
         else:
             # 自动生成会话 ID
@@ -367,50 +398,66 @@ class SessionService:
         status: Optional[str] = None,
         template_id: Optional[str] = None,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        include_total: bool = False,
     ) -> dict:
         """
         列出会话用例
 
+        推荐使用 cursor 翻页：按 (created_at, id) 键集分页，任意深度的翻页成本与首页相同。
+        offset 仅为兼容保留。
+
         Args:
             status: 会话状态筛选（可选）
             template_id: 模板 ID 筛选（可选）
             limit: 返回数量限制（1-200，默认 50）
-            offset: 偏移量（用于分页）
+            offset: 偏移量（用于分页，提供 cursor 时忽略）
+            cursor: 上一页返回的 next_cursor（可选）
+            include_total: 是否返回精确总数（默认返回估算值）
 
         Returns:
-            包含 items, total, limit, offset, has_more 的字典
+            包含 items, total, total_is_estimate, limit, offset, has_more, next_cursor 的字典
+
+        Raises:
+            ValueError: cursor 无效
         """
         # 验证 limit 范围
         limit = max(1, min(limit, 200))
         offset = max(0, offset)
+        after = PageCursor.decode(cursor) if cursor else None
+        if after is not None:
+            offset = 0
 
-        # 获取会话列表
+        # 多取一条用于判断是否有下一页
         sessions = await self._session_repo.find_sessions(
             status=status,
             template_id=template_id,
-            limit=limit,
-            offset=offset
+            limit=limit + 1,
+            offset=offset,
+            after=after,
         )
+        has_more = len(sessions) > limit
+        sessions = sessions[:limit]
 
-        # 获取总数
+        # 获取总数（默认估算，避免每页 COUNT(*)；不支持估算的数据库返回精确值）
         total = await self._session_repo.count_sessions(
             status=status,
-            template_id=template_id
+            template_id=template_id,
+            exact=include_total,
         )
 
         # 转换为 DTO
         items = [SessionDTO.from_entity(s) for s in sessions]
 
-        # 计算是否有更多数据
-        has_more = (offset + len(items)) < total
-
         return {
             "items": items,
-            "total": total,
+            "total": total.value,
+            "total_is_estimate": total.is_estimate,
             "limit": limit,
             "offset": offset,
-            "has_more": has_more
+            "has_more": has_more,
+            "next_cursor": _next_cursor(sessions) if has_more else None,
         }
 
     async def terminate_session(self, session_id: str) -> SessionDTO:
@@ -484,6 +531,7 @@ class SessionService:
 
         # 清理 S3 文件
         await self._cleanup_storage(session)
+        await self._cleanup_execution_archives(session)
 
         # 级联删除数据库记录（session + executions）
         await self._session_repo.delete(session_id)
@@ -507,18 +555,219 @@ class SessionService:
                 error=str(e),
             )
 
+    async def _restore_hibernated_session(self, session: Session) -> None:
+        """
+        从休眠恢复会话
+
+        在任意健康节点上重建容器，启动脚本优先从 workspace 中的依赖快照预热；
+        没有快照时回退到执行器依赖同步。等待执行器就绪后再继续分发。
+
+        创建容器前先以 hibernated -> creating 的条件更新认领恢复并立即提交，
+        并发请求（含其他实例）中只有一个会创建容器，其余返回 409。
+        容器创建后立即提交 container_id 再等待执行器就绪，进程在等待期间退出时容器仍可被找到并清理。
+        恢复失败时销毁新容器并回到 hibernated；依赖快照在恢复成功后才删除，失败可重试。
+        """
+        started = time.perf_counter()
+        logger.info("Restoring hibernated session", session_id=session.id)
+
+        template = await self._validate_template(session.template_id)
+        runtime_node = await self._scheduler.schedule(
+            ScheduleRequest(
+                template_id=session.template_id,
+                resource_limit=session.resource_limit,
+                session_id=session.id,
+            )
+        )
+        has_snapshot = await self._has_dependency_snapshot(session)
+
+        session.mark_as_restoring(runtime_node.id)
+        try:
+            await self._session_repo.save(session)
+        except ConflictError as e:
+            raise ConflictError(f"Session is being restored by another request: {session.id}") from e
+        await self._session_repo.commit()
+
+        try:
+            container_id = await self._scheduler.create_container_for_session(
+                session_id=session.id,
+                template_id=session.template_id,
+                image=template.image,
+                resource_limit=session.resource_limit,
+                env_vars=session.env_vars,
+                workspace_path=session.workspace_path,
+                node_id=runtime_node.id,
+                dependencies=[],
+            )
+            session.container_id = container_id
+            await self._session_repo.save(session)
+            await self._session_repo.commit()
+
+            await self._wait_for_executor_ready(session)
+            session.mark_as_running(runtime_node.id, container_id)
+            await self._session_repo.save(session)
+        except Exception:
+            await self._abort_restore(session)
+            raise
+
+        if has_snapshot:
+            await self._delete_dependency_snapshot(session)
+        if session.has_dependencies() and not has_snapshot:
+            await self._sync_session_dependencies(session, sync_mode="replace")
+
+        logger.info(
+            "Hibernated session restored",
+            session_id=session.id,
+            container_id=container_id,
+            runtime_node=runtime_node.id,
+            from_snapshot=has_snapshot,
+            restore_latency_ms=round((time.perf_counter() - started) * 1000, 2),
+        )
+
+    async def _abort_restore(self, session: Session) -> None:
+        """恢复失败：销毁已创建的容器，会话回到 hibernated 并提交"""
+        await self._destroy_container(session)
+        try:
+            session.abort_restore()
+            await self._session_repo.save(session)
+            await self._session_repo.commit()
+        except Exception as e:
+            logger.error(
+                "Failed to reset session after restore failure",
+                session_id=session.id,
+                error=str(e),
+            )
+
+    async def _delete_dependency_snapshot(self, session: Session) -> None:
+        """恢复成功后删除依赖快照，避免之后重建容器时用旧快照覆盖新安装的依赖"""
+        try:
+            await self._storage_service.delete_file(
+                f"{session.workspace_path}/{VENV_SNAPSHOT_RELATIVE_PATH}"
+            )
+        except Exception as e:
+            logger.warning(
+                "Failed to delete dependency snapshot",
+                session_id=session.id,
+                error=str(e),
+            )
+
+    async def _has_dependency_snapshot(self, session: Session) -> bool:
+        """检查 workspace 中是否存在休眠依赖快照"""
+        if not self._storage_service:
+            return False
+        try:
+            return await self._storage_service.file_exists(
+                f"{session.workspace_path}/{VENV_SNAPSHOT_RELATIVE_PATH}"
+            )
+        except Exception as e:
+            logger.warning(
+                "Failed to check dependency snapshot",
+                session_id=session.id,
+                error=str(e),
+            )
+            return False
+
+    async def _wait_for_executor_ready(self, session: Session) -> None:
+        """
+        轮询执行器健康检查，直到就绪或超时
+
+        Raises:
+            NodeUnavailableError: 超时仍未就绪（服务端原因，接口返回 503，客户端可重试）
+        """
+        timeout = get_settings().hibernate_restore_timeout_seconds
+        deadline = time.monotonic() + timeout
+        executor_url = await self._scheduler.get_executor_url(session.container_id)
+
+        while time.monotonic() < deadline:
+            try:
+                health = await self._executor_client.health_check(executor_url)
+                if health.status == "healthy":
+                    return
+            except (ExecutorConnectionError, ExecutorTimeoutError, ExecutorUnavailableError):
+                pass
+            await asyncio.sleep(0.5)
+
+        raise NodeUnavailableError(
+            f"Session restore timed out after {timeout}s: {session.id}"
+        )
+
+    async def _resume_container(self, session: Session) -> None:
+        """
+        恢复被空闲冻结的容器，失败时交由后续分发暴露错误
+
+        启用空闲冻结时每次分发前都查询容器状态：会话活动经写缓冲延迟落库，
+        冻结任务可能在缓冲刷新前冻结容器，刷新后的 last_activity_at 不能说明容器未被冻结。
+        """
+        if get_settings().idle_pause_minutes == -1:
+            return
+
+        try:
+            latency_ms = await self._scheduler.unpause_container(session.container_id)
+        except Exception as e:
+            logger.warning(
+                "Failed to resume paused container",
+                session_id=session.id,
+                container_id=session.container_id,
+                error=str(e),
+            )
+            return
+
+        if latency_ms is not None:
+            logger.info(
+                "Resumed paused container before dispatch",
+                session_id=session.id,
+                container_id=session.container_id,
+                unpause_latency_ms=round(latency_ms, 2),
+            )
+
+    async def _ensure_workspace_not_deleting(self, session_id: str) -> None:
+        """同 ID 会话的 workspace 仍在后台删除时拒绝创建，避免新文件被删除"""
+        if not self._workspace_deleter:
+            return
+
+        workspace_path = f"s3://{get_settings().s3_bucket}/sessions/{session_id}"
+        if await self._workspace_deleter.is_pending(workspace_path):
+            logger.warning(
+                "Workspace of previous session is still being deleted",
+                session_id=session_id,
+                workspace_path=workspace_path,
+            )
+            raise ConflictError(
+                f"Workspace of session {session_id} is still being deleted, retry later"
+            )
+
     async def _cleanup_storage(self, session: Session) -> None:
-        """清理会话的存储文件"""
+        """清理会话的存储文件（配置了后台删除时只写入删除标记并调度删除）"""
         if not self._storage_service or not session.workspace_path.startswith("s3://"):
             return
 
+        if self._workspace_manifest:
+            await self._workspace_manifest.forget(session.id)
+
+        if self._workspace_deleter:
+            try:
+                await self._workspace_deleter.schedule(session.workspace_path)
+                logger.info(
+                    "Scheduled S3 workspace deletion",
+                    session_id=session.id,
+                    workspace_path=session.workspace_path,
+                )
+                return
+            except Exception as e:
+                # 删除标记写入失败：同步删除，保证删除完成前不返回
+                logger.warning(
+                    "Failed to schedule workspace deletion, deleting inline",
+                    session_id=session.id,
+                    workspace_path=session.workspace_path,
+                    error=str(e),
+                )
+
         try:
             logger.info(
                 "Cleaning up S3 workspace files",
                 session_id=session.id,
                 workspace_path=session.workspace_path,
             )
-            deleted_count = await self._storage_service.delete_prefix(session.workspace_path)
+            deleted_count = await self._storage_service.delete_prefix(session.workspace_path.rstrip("/") + "/")
             logger.info(
                 "S3 files deleted",
                 session_id=session.id,
@@ -533,6 +782,28 @@ class SessionService:
                 error=str(e),
             )
 
+    async def _cleanup_execution_archives(self, session: Session) -> None:
+        """删除会话的执行归档文件（归档索引随执行记录级联删除）"""
+        if not self._storage_service:
+            return
+
+        prefix = session_archive_prefix(session.id)
+        try:
+            deleted_count = await self._storage_service.delete_prefix(prefix)
+            if deleted_count:
+                logger.info(
+                    "Execution archives deleted",
+                    session_id=session.id,
+                    deleted_count=deleted_count,
+                )
+        except Exception as e:
+            logger.warning(
+                "Failed to delete execution archives",
+                session_id=session.id,
+                prefix=prefix,
+                error=str(e),
+            )
+
     async def execute_code(self, command: ExecuteCodeCommand) -> ExecutionDTO:
         """
         执行代码用例
@@ -560,6 +831,13 @@ class SessionService:
             )
             raise NotFoundError(f"Session not found: {command.session_id}")
 
+        if session.is_hibernating():
+            # 休眠进行中，容器即将销毁；休眠完成后重试即可触发恢复
+            raise ConflictError(f"Session is hibernating, retry later: {command.session_id}")
+
+        if session.is_hibernated():
+            await self._restore_hibernated_session(session)
+
         if not session.is_active():
             logger.warning(
                 "Session is not active",
@@ -596,6 +874,9 @@ class SessionService:
             state=ExecutionState(status=ExecutionStatus.PENDING)
         )
 
+        if self._dispatch_repo:
+            return await self._enqueue_execution(session, execution)
+
         # 4. 保存到仓储
         await self._execution_repo.save(execution)
         logger.debug(
@@ -633,6 +914,9 @@ class SessionService:
             timeout=execution_request.timeout,
         )
 
+        # 空闲冻结的容器需先恢复再分发
+        await self._resume_container(session)
+
         # 通过调度器提交到执行器
         await self._scheduler.execute(
             session_id=session.id,
@@ -646,11 +930,55 @@ class SessionService:
             session_id=command.session_id,
         )
 
+        if self._activity_recorder:
+            self._activity_recorder(session.id)
+
+        return ExecutionDTO.from_entity(execution)
+
+    async def _enqueue_execution(self, session: Session, execution: Execution) -> ExecutionDTO:
+        """
+        将执行写入分发队列
+
+        执行记录与分发条目在同一事务中提交后即返回，
+        容器恢复与执行器调用由 ExecutionDispatchService 完成（失败重试，最终失败时标记 FAILED）。
+        """
+        if not session.container_id:
+            logger.error(
+                "Session has no container",
+                session_id=session.id,
+            )
+            raise ValidationError(f"Session has no container: {session.id}")
+
+        await self._execution_repo.save(execution)
+        await self._dispatch_repo.enqueue(execution.id, session.id)
+        await self._execution_repo.commit()
+
+        logger.info(
+            "Execution queued for dispatch",
+            execution_id=execution.id,
+            session_id=session.id,
+        )
+
+        if self._dispatch_notifier:
+            self._dispatch_notifier()
+        if self._activity_recorder:
+            self._activity_recorder(session.id)
+
         return ExecutionDTO.from_entity(execution)
 
     async def get_execution(self, query: GetExecutionQuery) -> ExecutionDTO:
         """获取执行详情用例"""
-        execution = await self._execution_repo.find_by_id(query.execution_id)
+        if query.include_result:
+            execution = await self._execution_repo.find_by_id(query.execution_id)
+        else:
+            execution = await self._execution_repo.find_by_id(
+                query.execution_id, include_payload=False
+            )
+        if not execution and self._storage_service:
+            # 超过保留期的执行已迁入 S3 归档
+            execution = await ExecutionArchiveService(
+                self._execution_repo, self._storage_service
+            ).load_archived_execution(query.execution_id)
         if not execution:
             raise NotFoundError(f"Execution not found: {query.execution_id}")
 
@@ -670,6 +998,46 @@ class SessionService:
 
         return [ExecutionDTO.from_entity(e) for e in executions]
 
+    async def list_executions_page(
+        self,
+        session_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+    ) -> dict:
+        """
+        分页列出会话的执行记录用例
+
+        按 (created_at, id) 键集分页，走 (session_id, created_at, id) 索引。
+
+        Returns:
+            包含 items, total, total_is_estimate, limit, has_more, next_cursor 的字典
+
+        Raises:
+            ValueError: cursor 无效
+        """
+        limit = max(1, min(limit, 200))
+        after = PageCursor.decode(cursor) if cursor else None
+
+        executions = await self._execution_repo.find_by_session_id(
+            session_id=session_id,
+            limit=limit + 1,
+            after=after,
+        )
+        has_more = len(executions) > limit
+        executions = executions[:limit]
+
+        total = await self._execution_repo.count_by_session_id(session_id, exact=include_total)
+
+        return {
+            "items": [ExecutionDTO.from_entity(e) for e in executions],
+            "total": total.value,
+            "total_is_estimate": total.is_estimate,
+            "limit": limit,
+            "has_more": has_more,
+            "next_cursor": _next_cursor(executions) if has_more else None,
+        }
+
     async def cleanup_idle_sessions(
         self,
         idle_threshold_minutes: int = 30,
@@ -686,36 +1054,41 @@ class SessionService:
         idle_sessions = await self._session_repo.find_idle_sessions(idle_threshold)
         expired_sessions = await self._session_repo.find_expired_sessions(max_lifetime)
 
-        all_to_cleanup = set(idle_sessions + expired_sessions)
+        all_to_cleanup = {session.id: session for session in idle_sessions + expired_sessions}
+        requests = [
+            TeardownRequest(session, reason="idle_or_expired")
+            for session in all_to_cleanup.values()
+            if session.is_active()
+        ]
         cleaned_count = 0
+        # 拆除并发进行，写回会话状态需串行（共享同一个数据库会话）
+        save_lock = asyncio.Lock()
+
+        async def mark_terminated(result: TeardownResult) -> None:
+            nonlocal cleaned_count
+            if not result.container_removed:
+                return
+            async with save_lock:
+                result.request.session.mark_as_terminated()
+                await self._session_repo.save(result.request.session)
+                if self._workspace_manifest:
+                    await self._workspace_manifest.forget(result.request.session.id)
+            cleaned_count += 1
 
-        for session in all_to_cleanup:
-            if await self._cleanup_session(session):
-                cleaned_count += 1
-
+        settings = get_settings()
+        pipeline = SessionTeardownPipeline(
+            scheduler=self._scheduler,
+            storage_service=self._storage_service,
+            concurrency=settings.session_teardown_concurrency,
+            storage_concurrency=settings.session_teardown_storage_concurrency,
+            rate_per_runtime=settings.session_teardown_rate_per_runtime,
+            max_attempts=settings.session_teardown_max_attempts,
+            on_torn_down=mark_terminated,
+            workspace_deleter=self._workspace_deleter,
+        )
+        await pipeline.run(requests)
         return cleaned_count
 
-    async def _cleanup_session(self, session: Session) -> bool:
-        """清理单个会话"""
-        if not session.is_active():
-            return False
-
-        # 销毁容器
-        if session.container_id and hasattr(self._scheduler, 'destroy_container'):
-            try:
-                await self._scheduler.destroy_container(container_id=session.container_id)
-            except Exception as e:
-                logger.warning(
-                    "Failed to destroy container during cleanup",
-                    session_id=session.id,
-                    container_id=session.container_id,
-                    error=str(e),
-                )
-
-        session.mark_as_terminated()
-        await self._session_repo.save(session)
-        return True
-
     async def _sync_session_dependencies(
         self,
         session: Session,
@@ -828,3 +1201,12 @@ class SessionService:
         timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
         unique = uuid.uuid4().hex[:8]
         return f"exec_{timestamp}_{unique}"
+
+
+def _next_cursor(records) -> str:
+    """以本页最后一条记录的 (created_at, id) 生成下一页游标"""
+    last = records[-1]
+    return PageCursor(
+        created_at_ms=round(last.created_at.timestamp() * 1000),
+        id=last.id,
+    ).encode()
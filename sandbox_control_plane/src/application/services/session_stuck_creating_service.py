@@ -63,40 +63,38 @@ class SessionStuckCreatingService:
             now = datetime.now()
             timeout_threshold = now - self._timeout
 
-            # 查询所有处于 creating 状态的会话
-            creating_sessions = await self._session_repo.find_by_status(SessionStatus.CREATING)
-            stats["total_checked"] = len(creating_sessions)
-
-            if creating_sessions:
+            # 逐页遍历所有处于 creating 状态的会话
+            async for page in self._session_repo.iter_by_status(SessionStatus.CREATING):
+                stats["total_checked"] += len(page)
                 logger.info(
-                    f"Checking {len(creating_sessions)} sessions in 'creating' status, "
+                    f"Checking {len(page)} sessions in 'creating' status, "
                     f"timeout_threshold={timeout_threshold.isoformat()}"
                 )
 
-            for session in creating_sessions:
-                try:
-                    # 检查是否创建时间超过阈值
-                    if session.created_at and session.created_at < timeout_threshold:
-                        await self._mark_session_as_failed(
-                            session,
-                            reason="creating_timeout",
-                            detail=f"Session stuck in 'creating' status for {(now - session.created_at).total_seconds():.0f} seconds "
-                                   f"(timeout: {self._timeout.total_seconds():.0f}s)"
-                        )
-                        stats["marked_failed"] += 1
-                    else:
-                        # 记录还未超时的会话（调试用）
-                        if session.created_at:
-                            time_in_creating = (now - session.created_at).total_seconds()
-                            logger.debug(
-                                f"Session {session.id} has been in 'creating' status for {time_in_creating:.0f}s "
-                                f"(timeout: {self._timeout.total_seconds():.0f}s)"
+                for session in page:
+                    try:
+                        # 检查是否创建时间超过阈值
+                        if session.created_at and session.created_at < timeout_threshold:
+                            await self._mark_session_as_failed(
+                                session,
+                                reason="creating_timeout",
+                                detail=f"Session stuck in 'creating' status for {(now - session.created_at).total_seconds():.0f} seconds "
+                                       f"(timeout: {self._timeout.total_seconds():.0f}s)"
                             )
-
-                except Exception as e:
-                    error_msg = f"Error processing session {session.id}: {e}"
-                    logger.error(error_msg, exc_info=True)
-                    stats["errors"].append(error_msg)
+                            stats["marked_failed"] += 1
+                        else:
+                            # 记录还未超时的会话（调试用）
+                            if session.created_at:
+                                time_in_creating = (now - session.created_at).total_seconds()
+                                logger.debug(
+                                    f"Session {session.id} has been in 'creating' status for {time_in_creating:.0f}s "
+                                    f"(timeout: {self._timeout.total_seconds():.0f}s)"
+                                )
+
+                    except Exception as e:
+                        error_msg = f"Error processing session {session.id}: {e}"
+                        logger.error(error_msg, exc_info=True)
+                        stats["errors"].append(error_msg)
 
             if stats["marked_failed"] > 0:
                 logger.info(
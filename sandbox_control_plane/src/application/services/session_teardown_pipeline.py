@@ -0,0 +1,280 @@
+"""
+会话拆除流水线
+
+批量拆除会话（空闲清理、过期清理、批量终止）时并发执行：
+停止容器、删除容器、删除 workspace 文件三个阶段各自限制并发，
+同一运行时节点上的容器操作按速率限制，失败按指数退避重试，重试耗尽的会话进入死信。
+配置了 workspace 后台删除服务时，workspace 阶段只写入删除标记并调度删除，
+删除中断由删除服务按标记续删。
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from src.application.services.workspace_deletion_service import WorkspaceDeletionService
+from src.domain.entities.session import Session
+from src.domain.services.scheduler import IScheduler
+from src.domain.services.storage import IStorageService
+
+logger = logging.getLogger(__name__)
+
+STAGE_STOP = "stop"
+STAGE_REMOVE = "remove"
+STAGE_WORKSPACE = "workspace"
+
+
+@dataclass
+class TeardownRequest:
+    """待拆除的会话"""
+
+    session: Session
+    reason: str
+    detail: str = ""
+
+
+@dataclass
+class TeardownResult:
+    """
+    单个会话的拆除结果
+
+    dead_letter 为重试耗尽的阶段：
+    - remove：容器未能删除，会话不应标记为终止（下一轮清理重新拆除）
+    - workspace：容器已删除，workspace 文件残留（记录前缀供人工清理）
+
+    workspace 交给后台删除服务时 files_deleted 为 0（删除在后台进行）。
+    """
+
+    request: TeardownRequest
+    files_deleted: int = 0
+    dead_letter: Optional[str] = None
+    error: str = ""
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def container_removed(self) -> bool:
+        return self.dead_letter != STAGE_REMOVE
+
+
+class _RateLimiter:
+    """按键限速：同一键相邻两次操作至少间隔 1/rate 秒（rate <= 0 表示不限速）"""
+
+    def __init__(self, rate_per_second: float):
+        self._interval = 1 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_slot: Dict[str, float] = {}
+
+    async def acquire(self, key: str) -> None:
+        if not self._interval:
+            return
+
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(key, now))
+        self._next_slot[key] = slot + self._interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class SessionTeardownPipeline:
+    """
+    会话拆除流水线
+
+    每个会话依次经过 stop → remove → workspace 三个阶段，不同会话处于不同阶段时并行推进：
+    - 容器阶段的并发上限为 concurrency，workspace 阶段为 storage_concurrency
+    - 容器操作按运行时节点（会话的 runtime_node，未知时为 runtime_type）限速
+    - 停止失败不阻塞删除（删除为强制删除）；删除失败时跳过 workspace 阶段
+    - 休眠会话没有容器，跳过停止与删除阶段，仍删除 workspace 并回调
+    - 每个会话完成后立即调用 on_torn_down（由调用方持久化状态），不等待整批结束
+    """
+
+    def __init__(
+        self,
+        scheduler: IScheduler,
+        storage_service: Optional[IStorageService] = None,
+        concurrency: int = 16,
+        storage_concurrency: int = 8,
+        rate_per_runtime: float = -1,
+        max_attempts: int = 3,
+        retry_base_seconds: float = 0.5,
+        stop_timeout: int = 10,
+        on_torn_down: Optional[Callable[[TeardownResult], Awaitable[None]]] = None,
+        workspace_deleter: Optional[WorkspaceDeletionService] = None,
+    ):
+        """
+        初始化会话拆除流水线
+
+        Args:
+            scheduler: 调度器（停止与删除容器）
+            storage_service: 存储服务（可选，删除 workspace 文件）
+            concurrency: 停止、删除阶段各自的并发上限
+            storage_concurrency: workspace 删除阶段的并发上限
+            rate_per_runtime: 每个运行时节点每秒的容器操作数上限，-1 表示不限速
+            max_attempts: 每个阶段的最大尝试次数
+            retry_base_seconds: 重试退避基数（秒），第 n 次失败后等待 base * 2^(n-1)
+            stop_timeout: 停止容器的优雅退出超时（秒）
+            on_torn_down: 单个会话拆除完成后的回调
+            workspace_deleter: workspace 后台删除服务（可选，未配置时同步按前缀删除）
+        """
+        self._scheduler = scheduler
+        self._storage_service = storage_service
+        self._stage_semaphores = {
+            STAGE_STOP: asyncio.Semaphore(concurrency),
+            STAGE_REMOVE: asyncio.Semaphore(concurrency),
+            STAGE_WORKSPACE: asyncio.Semaphore(storage_concurrency),
+        }
+        self._rate_limiter = _RateLimiter(rate_per_runtime)
+        self._max_attempts = max_attempts
+        self._retry_base_seconds = retry_base_seconds
+        self._stop_timeout = stop_timeout
+        self._on_torn_down = on_torn_down
+        self._workspace_deleter = workspace_deleter
+
+    async def run(self, requests: List[TeardownRequest]) -> Dict:
+        """
+        拆除一批会话
+
+        Returns:
+            dict: 统计信息
+                - total: 会话数
+                - torn_down: 容器已删除的会话数
+                - files_deleted: 删除的文件数
+                - dead_lettered: 重试耗尽的会话列表（session_id、stage、error）
+                - duration_seconds / throughput_per_second: 整批耗时与吞吐
+                - stage_seconds: 各阶段累计耗时
+        """
+        started = time.monotonic()
+        results = await asyncio.gather(*(self._teardown(request) for request in requests))
+        duration = time.monotonic() - started
+
+        stats = {
+            "total": len(requests),
+            "torn_down": sum(1 for result in results if result.container_removed),
+            "files_deleted": sum(result.files_deleted for result in results),
+            "dead_lettered": [
+                {
+                    "session_id": result.request.session.id,
+                    "stage": result.dead_letter,
+                    "error": result.error,
+                }
+                for result in results
+                if result.dead_letter
+            ],
+            "duration_seconds": round(duration, 3),
+            "throughput_per_second": round(len(requests) / duration, 2) if duration > 0 else 0.0,
+            "stage_seconds": {
+                stage: round(sum(result.stage_seconds.get(stage, 0.0) for result in results), 3)
+                for stage in (STAGE_STOP, STAGE_REMOVE, STAGE_WORKSPACE)
+            },
+        }
+
+        if requests:
+            logger.info(
+                f"Session teardown completed: total={stats['total']}, "
+                f"torn_down={stats['torn_down']}, dead_lettered={len(stats['dead_lettered'])}, "
+                f"duration={stats['duration_seconds']}s, "
+                f"throughput={stats['throughput_per_second']} sessions/s"
+            )
+        return stats
+
+    async def _teardown(self, request: TeardownRequest) -> TeardownResult:
+        session = request.session
+        result = TeardownResult(request=request)
+        runtime_key = session.runtime_node or session.runtime_type
+
+        logger.info(
+            f"Tearing down session {session.id}: reason={request.reason}, "
+            f"detail={request.detail}, container_id={session.container_id}"
+        )
+
+        if session.is_hibernated():
+            # 休眠会话的容器已在休眠时销毁，只删除 workspace（含依赖快照）
+            logger.info(f"Session {session.id} is hibernated, skipping container stages")
+        elif session.container_id:
+            container_id = session.container_id
+            try:
+                await self._run_stage(
+                    result, STAGE_STOP, runtime_key,
+                    lambda: self._scheduler.stop_container(container_id, timeout=self._stop_timeout),
+                )
+            except Exception as e:
+                # 删除为强制删除，停止失败不阻塞
+                logger.warning(f"Failed to stop container {container_id} for session {session.id}: {e}")
+
+            try:
+                await self._run_stage(
+                    result, STAGE_REMOVE, runtime_key,
+                    lambda: self._scheduler.remove_container(container_id),
+                )
+            except Exception as e:
+                result.dead_letter, result.error = STAGE_REMOVE, str(e)
+                logger.error(
+                    f"Dead-lettered session {session.id}: container {container_id} "
+                    f"not removed after {self._max_attempts} attempts: {e}"
+                )
+
+        if result.container_removed and self._storage_service and session.workspace_path:
+            workspace_path = session.workspace_path
+            try:
+                result.files_deleted = await self._run_stage(
+                    result, STAGE_WORKSPACE, None,
+                    lambda: self._delete_workspace(workspace_path),
+                ) or 0
+            except Exception as e:
+                result.dead_letter, result.error = STAGE_WORKSPACE, str(e)
+                logger.error(
+                    f"Dead-lettered session {session.id}: workspace {workspace_path} "
+                    f"not deleted after {self._max_attempts} attempts: {e}"
+                )
+
+        if self._on_torn_down:
+            try:
+                await self._on_torn_down(result)
+            except Exception as e:
+                result.error = result.error or str(e)
+                logger.error(f"Failed to record teardown of session {session.id}: {e}", exc_info=True)
+        return result
+
+    async def _delete_workspace(self, workspace_path: str) -> int:
+        """
+        删除 workspace 文件
+
+        配置了后台删除服务时写入删除标记并调度删除（返回 0）；
+        标记写入失败时回退为同步按前缀删除，返回删除的文件数。
+        """
+        if self._workspace_deleter:
+            try:
+                await self._workspace_deleter.schedule(workspace_path)
+                return 0
+            except Exception as e:
+                logger.warning(f"Failed to schedule deletion of workspace {workspace_path}, deleting inline: {e}")
+
+        # 以 / 结尾，不会匹配 ID 以其开头的其他会话
+        return await self._storage_service.delete_prefix(workspace_path.rstrip("/") + "/")
+
+    async def _run_stage(
+        self,
+        result: TeardownResult,
+        stage: str,
+        runtime_key: Optional[str],
+        operation: Callable[[], Awaitable],
+    ):
+        """在阶段并发上限与速率限制内执行操作，失败按指数退避重试"""
+        started = time.monotonic()
+        try:
+            for attempt in range(1, self._max_attempts + 1):
+                async with self._stage_semaphores[stage]:
+                    if runtime_key:
+                        await self._rate_limiter.acquire(runtime_key)
+                    try:
+                        return await operation()
+                    except Exception as e:
+                        if attempt >= self._max_attempts:
+                            raise
+                        logger.warning(
+                            f"Teardown stage {stage} failed for session {result.request.session.id} "
+                            f"(attempt {attempt}/{self._max_attempts}): {e}"
+                        )
+                # 退避期间释放并发名额
+                await asyncio.sleep(self._retry_base_seconds * (2 ** (attempt - 1)))
+        finally:
+            result.stage_seconds[stage] = time.monotonic() - started
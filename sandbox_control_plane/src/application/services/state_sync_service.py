@@ -5,6 +5,7 @@
 """
 from typing import Dict, List, Optional
 
+from src.application.services.health_check_scheduler import HealthCheckScheduler, HealthCheckTarget
 from src.domain.entities.session import Session, SessionStatus
 from src.domain.repositories.session_repository import ISessionRepository
 from src.infrastructure.container_scheduler.base import IContainerScheduler
@@ -32,11 +33,13 @@ class StateSyncService:
         container_scheduler: IContainerScheduler,
         scheduler=None,
         control_plane_url: str = "http://control-plane:8000",
+        health_check_scheduler: Optional[HealthCheckScheduler] = None,
     ):
         self._session_repo = session_repo
         self._container_scheduler = container_scheduler
         self._scheduler = scheduler
         self._control_plane_url = control_plane_url
+        self._health_check_scheduler = health_check_scheduler
 
     async def sync_on_startup(self) -> Dict[str, int]:
         """
@@ -57,19 +60,18 @@ class StateSyncService:
         }
 
         try:
-            running_sessions = await self._session_repo.find_by_status("running")
-            creating_sessions = await self._session_repo.find_by_status("creating")
-            active_sessions = running_sessions + creating_sessions
+            # 逐页处理，会话数量不受单次查询上限限制
+            for status in ("running", "creating"):
+                async for page in self._session_repo.iter_by_status(status):
+                    stats["total"] += len(page)
+                    logger.info("Syncing active sessions", status=status, count=len(page))
 
-            stats["total"] = len(active_sessions)
-            logger.info("Found active sessions to sync", count=len(active_sessions))
+                    for session in page:
+                        if not session.container_id:
+                            logger.warning("Session has no container_id, skipping", session_id=session.id)
+                            continue
 
-            for session in active_sessions:
-                if not session.container_id:
-                    logger.warning("Session has no container_id, skipping", session_id=session.id)
-                    continue
-
-                await self._check_and_recover_session(session, stats)
+                        await self._check_and_recover_session(session, stats)
 
             logger.info(
                 "State sync completed",
@@ -105,15 +107,15 @@ class StateSyncService:
         }
 
         try:
-            running_sessions = await self._session_repo.find_by_status("running")
-            logger.info("Checking running sessions", count=len(running_sessions))
+            async for page in self._session_repo.iter_by_status("running"):
+                logger.info("Checking running sessions", count=len(page))
 
-            for session in running_sessions:
-                if not session.container_id:
-                    continue
+                for session in page:
+                    if not session.container_id:
+                        continue
 
-                stats["checked"] += 1
-                await self._check_and_recover_session(session, stats)
+                    stats["checked"] += 1
+                    await self._check_and_recover_session(session, stats)
 
             if stats["checked"] > 0:
                 logger.info(
@@ -131,6 +133,106 @@ class StateSyncService:
 
         return stats
 
+    async def run_due_health_checks(self) -> Dict[str, int]:
+        """
+        按时间轮执行到期的健康检查（每个 tick 调用一次）
+
+        定期与数据库对账运行中的会话集合，每次只检查到期的会话，
+        检查结果决定该会话的下次检查时间。
+        """
+        health_scheduler = self._health_check_scheduler
+        if health_scheduler is None:
+            return await self.periodic_health_check()
+
+        stats = {
+            "checked": 0,
+            "healthy": 0,
+            "unhealthy": 0,
+            "recovered": 0,
+            "failed": 0,
+            "errors": []
+        }
+
+        try:
+            if health_scheduler.needs_rescan():
+                health_scheduler.begin_rescan()
+                async for page in self._session_repo.iter_by_status("running"):
+                    for session in page:
+                        health_scheduler.track(session)
+                removed = health_scheduler.finish_rescan()
+                logger.debug(
+                    "Health check targets rescanned",
+                    tracked=health_scheduler.tracked,
+                    removed=removed,
+                )
+
+            for target in health_scheduler.due():
+                stats["checked"] += 1
+                try:
+                    await self._check_target(target, stats)
+                except Exception as e:
+                    # 查询失败（API 超时等）视为可疑，缩短复查间隔
+                    error_msg = f"Error checking session {target.session_id}: {e}"
+                    logger.error(error_msg)
+                    stats["errors"].append(error_msg)
+                    health_scheduler.record_result(target, healthy=False)
+
+            if stats["checked"] > 0:
+                logger.debug(
+                    "Due health checks completed",
+                    checked=stats["checked"],
+                    healthy=stats["healthy"],
+                    unhealthy=stats["unhealthy"],
+                    recovered=stats["recovered"],
+                    failed=stats["failed"],
+                    backlog=health_scheduler.backlog,
+                )
+            if stats["unhealthy"] > 0:
+                logger.info(
+                    "Health check found unhealthy sessions",
+                    unhealthy=stats["unhealthy"],
+                    recovered=stats["recovered"],
+                    failed=stats["failed"],
+                )
+
+        except Exception as e:
+            logger.error("Fatal error during health check", error=str(e), exc_info=True)
+            stats["errors"].append(f"Fatal error: {e}")
+
+        return stats
+
+    async def _check_target(self, target: HealthCheckTarget, stats: Dict[str, int]) -> None:
+        """检查时间轮中的单个会话，并按结果安排下次检查"""
+        health_scheduler = self._health_check_scheduler
+        is_running = await self._container_scheduler.is_container_running(target.container_id)
+
+        if is_running:
+            stats["healthy"] += 1
+            health_scheduler.record_result(target, healthy=True)
+            return
+
+        stats["unhealthy"] += 1
+        logger.warning(
+            "Session container is unhealthy",
+            session_id=target.session_id,
+            container_id=target.container_id[:12],
+        )
+
+        session = await self._session_repo.find_by_id(target.session_id)
+        if session is None or session.status != SessionStatus.RUNNING:
+            # 会话已在别处终止，下次对账前不再检查
+            health_scheduler.forget(target.session_id)
+            return
+
+        if await self._attempt_recovery(session):
+            stats["recovered"] += 1
+            health_scheduler.replace_container(target, session.container_id)
+            # 刚恢复的容器尽快复查
+            health_scheduler.record_result(target, healthy=False)
+        else:
+            stats["failed"] += 1
+            health_scheduler.forget(target.session_id)
+
     async def _check_and_recover_session(self, session: Session, stats: Dict[str, int]) -> None:
         """检查单个会话的健康状态并尝试恢复"""
         try:
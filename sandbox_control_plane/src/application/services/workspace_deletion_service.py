@@ -0,0 +1,213 @@
+"""
+workspace 后台删除服务
+
+终止、删除会话时不等待 workspace 文件删除完成：
+1. 写入删除标记 s3://{bucket}/.workspace-tombstones/{workspace key}
+2. 在后台按前缀删除 workspace 文件，记录进度
+3. 删除完成后移除标记；重试耗尽时保留标记，由 resume_pending 定期重新删除
+
+标记存在期间 is_pending 返回 True，会话服务据此拒绝以相同 ID 创建会话，
+避免新会话的文件被尚未结束的删除清除。标记保存在对象存储中，对所有副本可见，进程重启后仍然有效。
+"""
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+from urllib.parse import urlparse
+
+from src.domain.services.storage import IStorageService
+
+logger = logging.getLogger(__name__)
+
+TOMBSTONE_PREFIX = ".workspace-tombstones"
+
+# 每删除该数量的对象记录一次进度日志
+PROGRESS_LOG_INTERVAL = 10_000
+
+
+def tombstone_path(workspace_path: str) -> str:
+    """workspace 对应的删除标记路径（与 workspace 同一 bucket，不在 workspace 前缀下）"""
+    parsed = urlparse(workspace_path)
+    return f"s3://{parsed.netloc}/{TOMBSTONE_PREFIX}/{parsed.path.strip('/')}"
+
+
+@dataclass
+class WorkspaceDeletion:
+    """进行中的 workspace 删除"""
+
+    workspace_path: str
+    attempt: int = 0
+    deleted: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    def to_dict(self) -> Dict:
+        return {
+            "workspace_path": self.workspace_path,
+            "attempt": self.attempt,
+            "deleted": self.deleted,
+            "elapsed_seconds": round(time.monotonic() - self.started_at, 3),
+        }
+
+
+class WorkspaceDeletionService:
+    """
+    workspace 后台删除服务（进程内单例）
+
+    同时进行的删除数受 max_concurrent 限制，超出的删除排队等待；
+    每个删除内部由存储服务并发提交 DeleteObjects 批次。
+    """
+
+    def __init__(
+        self,
+        storage_service: IStorageService,
+        bucket: str,
+        max_concurrent: int = 4,
+        max_attempts: int = 3,
+        retry_base_seconds: float = 1.0,
+        resume_after_seconds: int = 600,
+    ):
+        """
+        初始化 workspace 后台删除服务
+
+        Args:
+            storage_service: 存储服务
+            bucket: workspace 所在 bucket（扫描残留删除标记）
+            max_concurrent: 同时进行的删除数
+            max_attempts: 每次调度的最大尝试次数
+            retry_base_seconds: 重试退避基数（秒），第 n 次失败后等待 base * 2^(n-1)
+            resume_after_seconds: 删除标记写入超过该时间仍存在时，视为删除已中断
+        """
+        self._storage_service = storage_service
+        self._bucket = bucket
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._max_attempts = max_attempts
+        self._retry_base_seconds = retry_base_seconds
+        self._resume_after_seconds = resume_after_seconds
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._deletions: Dict[str, WorkspaceDeletion] = {}
+
+    async def schedule(self, workspace_path: str) -> None:
+        """
+        写入删除标记后在后台删除 workspace，立即返回
+
+        Raises:
+            Exception: 删除标记写入失败（调用方可改为同步删除）
+        """
+        if workspace_path in self._tasks:
+            return
+
+        marker = json.dumps({
+            "workspace_path": workspace_path,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }).encode()
+        await self._storage_service.upload_file(
+            tombstone_path(workspace_path), marker, content_type="application/json"
+        )
+        self._start(workspace_path)
+
+    async def is_pending(self, workspace_path: str) -> bool:
+        """workspace 是否仍在删除中（本进程或其他副本）"""
+        if workspace_path in self._tasks:
+            return True
+        return await self._storage_service.file_exists(tombstone_path(workspace_path))
+
+    def progress(self) -> List[Dict]:
+        """本进程内排队与进行中的删除"""
+        return [
+            self._deletions[path].to_dict() if path in self._deletions
+            else {"workspace_path": path, "attempt": 0, "deleted": 0, "elapsed_seconds": 0.0}
+            for path in self._tasks
+        ]
+
+    async def resume_pending(self) -> int:
+        """
+        重新删除残留删除标记对应的 workspace（进程在删除完成前退出或重试耗尽）
+
+        只处理写入时间超过 resume_after_seconds 的标记，避免与其他副本上仍在进行的删除重复；
+        即使重复，按前缀删除也是幂等的。
+
+        Returns:
+            重新调度的删除数
+        """
+        prefix = f"s3://{self._bucket}/{TOMBSTONE_PREFIX}/"
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self._resume_after_seconds)
+        resumed = 0
+
+        for item in await self._storage_service.list_files(prefix, limit=0):
+            workspace_path = f"s3://{self._bucket}/{item['key'][len(TOMBSTONE_PREFIX) + 1:]}"
+            last_modified = item.get("last_modified")
+            if last_modified is not None:
+                if last_modified.tzinfo is None:
+                    last_modified = last_modified.replace(tzinfo=timezone.utc)
+                if last_modified > cutoff:
+                    continue
+            if workspace_path in self._tasks:
+                continue
+            self._start(workspace_path)
+            resumed += 1
+
+        if resumed:
+            logger.info(f"Resumed {resumed} interrupted workspace deletions")
+        return resumed
+
+    async def stop(self) -> None:
+        """取消进行中的删除（删除标记保留，由 resume_pending 继续）"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _start(self, workspace_path: str) -> None:
+        task = asyncio.create_task(self._run(workspace_path))
+        self._tasks[workspace_path] = task
+        task.add_done_callback(lambda _: self._tasks.pop(workspace_path, None))
+
+    async def _run(self, workspace_path: str) -> None:
+        async with self._semaphore:
+            deletion = WorkspaceDeletion(workspace_path=workspace_path)
+            self._deletions[workspace_path] = deletion
+            try:
+                await self._delete(deletion)
+            except Exception as e:
+                logger.error(f"Failed to delete workspace {workspace_path}: {e}", exc_info=True)
+            finally:
+                self._deletions.pop(workspace_path, None)
+
+    async def _delete(self, deletion: WorkspaceDeletion) -> None:
+        workspace_path = deletion.workspace_path
+        prefix = workspace_path.rstrip("/") + "/"
+
+        def on_progress(deleted: int) -> None:
+            if deleted // PROGRESS_LOG_INTERVAL > deletion.deleted // PROGRESS_LOG_INTERVAL:
+                logger.info(
+                    f"Deleting workspace {workspace_path}: {deleted} files deleted "
+                    f"({time.monotonic() - deletion.started_at:.1f}s)"
+                )
+            deletion.deleted = deleted
+
+        for attempt in range(1, self._max_attempts + 1):
+            deletion.attempt = attempt
+            try:
+                deleted = await self._storage_service.delete_prefix(prefix, on_progress=on_progress)
+                break
+            except Exception as e:
+                if attempt >= self._max_attempts:
+                    logger.error(
+                        f"Workspace {workspace_path} not deleted after {attempt} attempts, "
+                        f"tombstone kept for resume: {e}"
+                    )
+                    return
+                logger.warning(
+                    f"Workspace deletion failed for {workspace_path} "
+                    f"(attempt {attempt}/{self._max_attempts}): {e}"
+                )
+                await asyncio.sleep(self._retry_base_seconds * (2 ** (attempt - 1)))
+
+        await self._storage_service.delete_file(tombstone_path(workspace_path))
+        logger.info(
+            f"Deleted workspace {workspace_path}: {deleted} files in "
+            f"{time.monotonic() - deletion.started_at:.1f}s"
+        )
@@ -0,0 +1,190 @@
+"""
+workspace 文件清单服务
+
+文件列表、前缀过滤与计数由数据库中的清单提供，不再每次分页列出对象存储：
+1. 首次列表（或清单过期）时列出一次 workspace 前缀，写入清单
+2. 通过控制平面上传的文件直接写入清单；会话清理时删除清单
+3. 执行器回报结果后清单标记为过期（代码可能经 s3fs 写入文件），下次使用前重新对账
+4. 后台任务定期与对象存储对账，发现其他途径写入或删除的文件
+
+只有 workspace 仍保留的会话使用清单；其他会话及清单不可用时回退到直接列出对象存储。
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from urllib.parse import urlparse
+
+from src.domain.entities.session import Session
+from src.domain.repositories.session_repository import ISessionRepository
+from src.domain.repositories.workspace_manifest_repository import IWorkspaceManifestRepository
+from src.domain.services.storage import IStorageService
+from src.domain.value_objects.execution_status import SessionStatus
+from src.domain.value_objects.workspace_file import MAX_INDEXED_PATH_LENGTH, WorkspaceFile
+
+logger = logging.getLogger(__name__)
+
+# workspace 文件仍保留的会话状态
+WORKSPACE_RETAINED_STATUSES = {
+    SessionStatus.CREATING,
+    SessionStatus.RUNNING,
+    SessionStatus.HIBERNATING,
+    SessionStatus.HIBERNATED,
+}
+
+
+def workspace_key_prefix(workspace_path: str) -> str:
+    """
+    workspace 下所有对象的 key 前缀
+
+    workspace_path 格式: s3://bucket/sessions/{session_id}，返回 "sessions/{session_id}/"；
+    以 / 结尾，不会匹配 ID 以其开头的其他会话。
+    """
+    return urlparse(workspace_path).path.strip("/") + "/"
+
+
+class WorkspaceManifestService:
+    """
+    workspace 文件清单服务
+
+    清单写入失败只记录日志，不影响上传等主流程；仓储在 SAVEPOINT 中写入，失败不污染请求事务。
+    上传记录失败时清单标记为过期，下次使用前重新对账；其余偏差由定期对账修正。
+    """
+
+    def __init__(
+        self,
+        manifest_repo: IWorkspaceManifestRepository,
+        storage_service: IStorageService,
+        session_repo: Optional[ISessionRepository] = None,
+    ):
+        self._manifest_repo = manifest_repo
+        self._storage_service = storage_service
+        self._session_repo = session_repo
+
+    async def ensure(self, session: Session) -> bool:
+        """
+        确保会话的清单可用
+
+        清单不存在、已过期或早于会话创建（同 ID 会话的旧清单）时重新对账。
+
+        Returns:
+            清单是否可用于列表；False 时调用方应直接列出对象存储
+        """
+        if session.status not in WORKSPACE_RETAINED_STATUSES:
+            return False
+
+        reconciled_at = await self._manifest_repo.get_reconciled_at(session.id)
+        if reconciled_at is not None and reconciled_at.timestamp() >= session.created_at.timestamp():
+            return True
+        return await self.reconcile(session)
+
+    async def list_files(self, session_id: str, prefix: str = "", limit: int = 1000) -> List[WorkspaceFile]:
+        """按路径顺序列出路径以 prefix 开头的文件"""
+        return await self._manifest_repo.list_files(session_id, prefix, limit)
+
+    async def count_files(self, session_id: str, prefix: str = "") -> int:
+        """统计路径以 prefix 开头的文件数"""
+        return await self._manifest_repo.count_files(session_id, prefix)
+
+    async def reconcile(self, session: Session) -> bool:
+        """
+        列出 workspace 前缀并替换清单
+
+        Returns:
+            是否建立了清单；workspace 中存在超长路径时删除清单并返回 False
+        """
+        key_prefix = workspace_key_prefix(session.workspace_path)
+        listed_at = datetime.now(timezone.utc)
+        objects = await self._storage_service.list_files(key_prefix, limit=0)
+
+        files = []
+        for obj in objects:
+            relative_path = obj["key"][len(key_prefix):]
+            # 过滤掉目录标记
+            if not relative_path or relative_path.endswith("/"):
+                continue
+            if len(relative_path) > MAX_INDEXED_PATH_LENGTH:
+                logger.info(
+                    f"Workspace of session {session.id} has paths longer than "
+                    f"{MAX_INDEXED_PATH_LENGTH} characters, manifest disabled"
+                )
+                await self.forget(session.id)
+                return False
+            files.append(WorkspaceFile(
+                path=relative_path,
+                size=obj["size"],
+                etag=obj.get("etag"),
+                modified_at=obj.get("last_modified"),
+            ))
+
+        await self._manifest_repo.replace_files(session.id, files, listed_at)
+        await self._manifest_repo.commit()
+        logger.debug(f"Reconciled workspace manifest of session {session.id}: {len(files)} files")
+        return True
+
+    async def record_upload(self, session_id: str, path: str, size: int) -> None:
+        """记录通过控制平面上传的文件"""
+        await self.record_uploads(session_id, [
+            WorkspaceFile(path=path, size=size, modified_at=datetime.now(timezone.utc)),
+        ])
+
+    async def record_uploads(self, session_id: str, files: List[WorkspaceFile]) -> None:
+        """批量记录通过控制平面上传的文件（如归档解压），一次提交"""
+        try:
+            if any(len(file.path) > MAX_INDEXED_PATH_LENGTH for file in files):
+                await self._manifest_repo.delete_session(session_id)
+            else:
+                await self._manifest_repo.upsert_files(session_id, files)
+            await self._manifest_repo.commit()
+        except Exception as e:
+            logger.warning(f"Failed to record upload in workspace manifest of session {session_id}: {e}")
+            await self._mark_stale(session_id)
+
+    async def forget(self, session_id: str) -> None:
+        """删除会话的清单（workspace 已删除或不再可索引）"""
+        try:
+            await self._manifest_repo.delete_session(session_id)
+            await self._manifest_repo.commit()
+        except Exception as e:
+            logger.warning(f"Failed to delete workspace manifest of session {session_id}: {e}")
+
+    async def _mark_stale(self, session_id: str) -> None:
+        """清单增量维护失败：标记过期，避免列表遗漏上传的文件"""
+        try:
+            await self._manifest_repo.mark_stale([session_id])
+            await self._manifest_repo.commit()
+        except Exception as e:
+            logger.warning(f"Failed to mark workspace manifest of session {session_id} stale: {e}")
+
+    async def reconcile_due(self, interval_seconds: int, batch_size: int = 100) -> dict:
+        """
+        对账超过 interval_seconds 未对账（或已过期）的清单
+
+        会话不存在或 workspace 已不保留时删除清单。
+
+        Returns:
+            dict: reconciled, forgotten, failed 数量
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=interval_seconds)
+        stats = {"reconciled": 0, "forgotten": 0, "failed": 0}
+
+        for session_id in await self._manifest_repo.find_due(cutoff, batch_size):
+            session = await self._session_repo.find_by_id(session_id)
+            if session is None or session.status not in WORKSPACE_RETAINED_STATUSES:
+                await self.forget(session_id)
+                stats["forgotten"] += 1
+                continue
+
+            try:
+                await self.reconcile(session)
+                stats["reconciled"] += 1
+            except Exception as e:
+                logger.warning(f"Failed to reconcile workspace manifest of session {session_id}: {e}")
+                stats["failed"] += 1
+
+        if stats["reconciled"] or stats["forgotten"] or stats["failed"]:
+            logger.info(
+                f"Workspace manifests reconciled: {stats['reconciled']}, "
+                f"forgotten: {stats['forgotten']}, failed: {stats['failed']}"
+            )
+        return stats
+
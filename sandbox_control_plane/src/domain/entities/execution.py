@@ -35,10 +35,12 @@ class Execution:
     # 新增字段：handler 返回值和性能指标
     return_value: dict | None = None  # handler 函数返回值（JSON 可序列化）
     metrics: dict | None = None  # 性能指标（JSON 对象）
+    # 是否加载了代码与输出等大字段（状态查询只加载状态与时间戳）
+    payload_loaded: bool = True
 
     def __post_init__(self):
         """初始化后验证"""
-        if not self.code:
+        if self.payload_loaded and not self.code:
             raise ValueError("code cannot be empty")
         if not self.language:
             raise ValueError("language cannot be empty")
@@ -102,9 +104,9 @@ class Execution:
         self.state = ExecutionState(status=ExecutionStatus.TIMEOUT)
         self.completed_at = datetime.now()
 
-    def mark_crashed(self) -> None:
+    def mark_crashed(self, error_message: str | None = None) -> None:
         """标记为崩溃（可重试）"""
-        self.state = ExecutionState(status=ExecutionStatus.CRASHED)
+        self.state = ExecutionState(status=ExecutionStatus.CRASHED, error_message=error_message)
 
     def update_heartbeat(self) -> None:
         """更新心跳时间"""
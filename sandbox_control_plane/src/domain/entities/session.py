@@ -5,7 +5,7 @@
 """
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import List, Optional, Set
 
 from src.domain.value_objects.resource_limit import ResourceLimit
 from src.domain.value_objects.execution_status import SessionStatus
@@ -66,6 +66,10 @@ class Session:
     dependency_install_started_at: datetime | None = None
     dependency_install_completed_at: datetime | None = None
 
+    # 变更跟踪（持久化用，不参与比较与展示）
+    _dirty_fields: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
+    _persisted_status: Optional[SessionStatus] = field(default=None, init=False, repr=False, compare=False)
+
     def __post_init__(self):
         """初始化后验证"""
         if self.timeout <= 0:
@@ -75,6 +79,32 @@ class Session:
         self.python_package_index_url = normalize_python_package_index_url(
             self.python_package_index_url
         )
+        self._dirty_fields.clear()
+
+    def __setattr__(self, name: str, value) -> None:
+        """记录公开字段的赋值，供仓储只写回变更列"""
+        super().__setattr__(name, value)
+        if not name.startswith("_"):
+            dirty_fields = self.__dict__.get("_dirty_fields")
+            if dirty_fields is not None:
+                dirty_fields.add(name)
+
+    # ============== 变更跟踪 ==============
+
+    @property
+    def dirty_fields(self) -> Set[str]:
+        """自上次持久化以来被赋值过的字段"""
+        return set(self._dirty_fields)
+
+    @property
+    def persisted_status(self) -> Optional[SessionStatus]:
+        """上次加载或保存时数据库中的状态（None 表示尚未持久化）"""
+        return self._persisted_status
+
+    def mark_persisted(self) -> None:
+        """与数据库同步后调用：清空变更集并记录当前状态"""
+        self._dirty_fields.clear()
+        self._persisted_status = self.status
 
     # ============== 领域行为 ==============
 
@@ -115,6 +145,54 @@ class Session:
         self.completed_at = datetime.now()
         self.updated_at = datetime.now()
 
+    def mark_as_hibernating(self) -> None:
+        """认领休眠：运行中 -> 休眠中（快照依赖与销毁容器期间不接受执行）"""
+        if self.status != SessionStatus.RUNNING:
+            raise ValueError(f"Cannot hibernate session from status: {self.status}")
+
+        self.status = SessionStatus.HIBERNATING
+        self.updated_at = datetime.now()
+
+    def mark_as_hibernated(self) -> None:
+        """标记会话为休眠（容器已销毁，保留会话身份与 workspace）"""
+        if self.status != SessionStatus.HIBERNATING:
+            raise ValueError(f"Cannot mark session as hibernated from status: {self.status}")
+
+        self.status = SessionStatus.HIBERNATED
+        self.container_id = None
+        self.pod_name = None
+        self.runtime_node = None
+        self.updated_at = datetime.now()
+
+    def abort_hibernation(self) -> None:
+        """休眠失败：回到运行中，容器保留"""
+        if self.status != SessionStatus.HIBERNATING:
+            raise ValueError(f"Cannot abort hibernation from status: {self.status}")
+
+        self.status = SessionStatus.RUNNING
+        self.updated_at = datetime.now()
+
+    def mark_as_restoring(self, runtime_node: str, container_id: Optional[str] = None) -> None:
+        """从休眠恢复：回到 creating 并绑定目标节点（容器创建后再绑定），等待执行器就绪"""
+        if self.status != SessionStatus.HIBERNATED:
+            raise ValueError(f"Cannot restore session from status: {self.status}")
+
+        self.status = SessionStatus.CREATING
+        self.runtime_node = runtime_node
+        self.container_id = container_id
+        self.updated_at = datetime.now()
+
+    def abort_restore(self) -> None:
+        """恢复失败：解绑容器并回到 hibernated，下一次执行可重新恢复"""
+        if self.status != SessionStatus.CREATING:
+            raise ValueError(f"Cannot abort restore from status: {self.status}")
+
+        self.status = SessionStatus.HIBERNATED
+        self.container_id = None
+        self.pod_name = None
+        self.runtime_node = None
+        self.updated_at = datetime.now()
+
     def update_last_activity(self) -> None:
         """更新最后活动时间"""
         self.last_activity_at = datetime.now()
@@ -129,6 +207,14 @@ class Session:
             SessionStatus.RUNNING
         }
 
+    def is_hibernating(self) -> bool:
+        """是否正在休眠（快照依赖与销毁容器进行中）"""
+        return self.status == SessionStatus.HIBERNATING
+
+    def is_hibernated(self) -> bool:
+        """是否处于休眠状态"""
+        return self.status == SessionStatus.HIBERNATED
+
     def is_terminated(self) -> bool:
         """是否已终止"""
         return self.status == SessionStatus.TERMINATED
@@ -0,0 +1,59 @@
+"""
+执行分发队列仓储接口
+
+定义执行分发队列持久化的抽象接口（Port）。
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List
+
+from src.domain.value_objects.dispatch_entry import DispatchEntry
+
+
+class IExecutionDispatchRepository(ABC):
+    """
+    执行分发队列仓储接口
+
+    这是领域层定义的 Port，由基础设施层实现 Adapter。
+    入队与执行记录在同一事务中提交；认领后的条目在租约期内不会被其他分发者取走。
+    """
+
+    @abstractmethod
+    async def enqueue(self, execution_id: str, session_id: str) -> None:
+        """将执行加入分发队列（随当前事务提交）"""
+        pass
+
+    @abstractmethod
+    async def claim_due(self, limit: int, lease_seconds: int) -> List[DispatchEntry]:
+        """
+        认领到期的条目
+
+        只返回各会话队首的条目（同一会话按入队顺序分发），
+        已被其他分发者锁定或租约未过期的条目被跳过。
+        """
+        pass
+
+    @abstractmethod
+    async def complete(self, execution_ids: List[str]) -> None:
+        """分发完成（或放弃分发），从队列移除"""
+        pass
+
+    @abstractmethod
+    async def retry_later(self, execution_id: str, next_attempt_at: datetime, error: str) -> None:
+        """释放认领，在 next_attempt_at 之后重试"""
+        pass
+
+    @abstractmethod
+    async def queue_stats(self) -> dict:
+        """
+        队列统计
+
+        Returns:
+            dict: depth 为队列长度，oldest_enqueued_at 为最早入队时间（队列为空时为 None）
+        """
+        pass
+
+    @abstractmethod
+    async def commit(self) -> None:
+        """Explicitly commit the transaction"""
+        pass
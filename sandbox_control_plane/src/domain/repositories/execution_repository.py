@@ -4,10 +4,12 @@
 定义执行记录持久化的抽象接口（Port）。
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 from src.domain.entities.execution import Execution
+from src.domain.value_objects.page_cursor import PageCursor
+from src.domain.value_objects.row_count import RowCount
 
 
 class IExecutionRepository(ABC):
@@ -27,17 +29,32 @@ class IExecutionRepository(ABC):
         pass
 
     @abstractmethod
-    async def find_by_id(self, execution_id: str) -> Optional[Execution]:
-        """根据 ID 查找执行记录"""
+    async def find_by_id(
+        self,
+        execution_id: str,
+        include_payload: bool = True,
+    ) -> Optional[Execution]:
+        """根据 ID 查找执行记录（include_payload=False 时不加载代码与输出）"""
         pass
 
     @abstractmethod
     async def find_by_session_id(
         self,
         session_id: str,
-        limit: int = 100
+        limit: int = 100,
+        after: Optional[PageCursor] = None,
     ) -> List[Execution]:
-        """根据会话 ID 查找执行记录"""
+        """根据会话 ID 查找执行记录（按 created_at, id 倒序，after 为键集分页游标）"""
+        pass
+
+    @abstractmethod
+    async def count_by_session_id(self, session_id: str, exact: bool = True) -> RowCount:
+        """统计会话的执行记录数量（exact=False 时允许返回估算值，is_estimate 标明是否为估算值）"""
+        pass
+
+    @abstractmethod
+    async def has_active_executions(self, session_id: str) -> bool:
+        """会话是否有未结束（pending / running）的执行"""
         pass
 
     @abstractmethod
@@ -60,9 +77,29 @@ class IExecutionRepository(ABC):
     @abstractmethod
     async def find_heartbeat_timeouts(
         self,
-        timeout_threshold: datetime
+        timeout_threshold: datetime,
+        limit: int = 500,
     ) -> List[Execution]:
-        """查找心跳超时的执行"""
+        """
+        查找最后心跳早于 timeout_threshold 的运行中执行（不含载荷）
+
+        待执行的记录不参与：投递前由分发队列负责，投递成功时分发服务写入首次心跳。
+        """
+        pass
+
+    @abstractmethod
+    async def touch_heartbeats(self, heartbeats: Dict[str, datetime]) -> int:
+        """
+        批量更新执行最后心跳时间
+
+        收到心跳的待执行记录同时标记为运行中；已结束或已崩溃的执行不更新。
+
+        Args:
+            heartbeats: 执行 ID -> 最后心跳时间
+
+        Returns:
+            实际更新的执行数量
+        """
         pass
 
     @abstractmethod
@@ -79,3 +116,44 @@ class IExecutionRepository(ABC):
     async def count_by_status(self, status: str) -> int:
         """统计指定状态的执行数量"""
         pass
+
+    @abstractmethod
+    async def find_archivable(
+        self,
+        created_before: datetime,
+        limit: int = 500,
+    ) -> List[Execution]:
+        """查找创建早于 created_before 的已结束执行（含载荷）"""
+        pass
+
+    @abstractmethod
+    async def mark_archived(self, archive_path: str, executions: List[Execution]) -> None:
+        """登记归档位置并从执行表删除这些执行"""
+        pass
+
+    @abstractmethod
+    async def find_archive_path(self, execution_id: str) -> Optional[str]:
+        """查找已归档执行所在的归档文件路径，未归档时返回 None"""
+        pass
+
+    async def find_by_ids(self, execution_ids: List[str]) -> List[Execution]:
+        """根据 ID 批量查找执行记录（含载荷，不存在的 ID 被忽略）"""
+        executions = []
+        for execution_id in execution_ids:
+            execution = await self.find_by_id(execution_id)
+            if execution:
+                executions.append(execution)
+        return executions
+
+    async def save_results(self, executions: List[Execution]) -> List[str]:
+        """
+        批量写入执行结果（状态、退出码、输出等）
+
+        默认逐条 save；SQL 实现合并为多行 UPDATE，并跳过已是终态的行。
+
+        Returns:
+            实际写入的执行 ID
+        """
+        for execution in executions:
+            await self.save(execution)
+        return [execution.id for execution in executions]
@@ -4,10 +4,12 @@
 定义会话持久化的抽象接口（Port）。
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional
 from datetime import datetime
 
 from src.domain.entities.session import Session
+from src.domain.value_objects.page_cursor import PageCursor
+from src.domain.value_objects.row_count import RowCount
 
 
 class ISessionRepository(ABC):
@@ -22,6 +24,10 @@ class ISessionRepository(ABC):
         """保存会话（创建或更新）"""
         pass
 
+    async def commit(self) -> None:
+        """Explicitly commit the transaction (optional - some repos may not implement this)"""
+        pass
+
     @abstractmethod
     async def find_by_id(self, session_id: str) -> Optional[Session]:
         """根据 ID 查找会话"""
@@ -41,6 +47,24 @@ class ISessionRepository(ABC):
         """根据状态查找会话"""
         pass
 
+    @abstractmethod
+    def iter_by_status(
+        self,
+        status: str,
+        page_size: int = 500
+    ) -> AsyncIterator[List[Session]]:
+        """
+        按状态分页遍历全部会话（供后台任务使用）
+
+        按 (created_at, id) 升序做键集分页，每次产出一页，内存占用与会话总数无关。
+        调用方在处理当前页时修改会话状态，不会导致后续页遗漏或重复。
+
+        Args:
+            status: 会话状态
+            page_size: 每页数量
+        """
+        pass
+
     @abstractmethod
     async def find_by_template(self, template_id: str) -> List[Session]:
         """根据模板 ID 查找会话"""
@@ -88,16 +112,20 @@ class ISessionRepository(ABC):
         status: Optional[str] = None,
         template_id: Optional[str] = None,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        after: Optional[PageCursor] = None,
     ) -> List[Session]:
         """
         查找会话列表（支持筛选和分页）
 
+        结果按 (created_at, id) 倒序。
+
         Args:
             status: 会话状态筛选（可选）
             template_id: 模板 ID 筛选（可选）
             limit: 返回数量限制（1-200，默认 50）
-            offset: 偏移量（用于分页）
+            offset: 偏移量（用于分页，提供 after 时忽略）
+            after: 键集分页游标（可选），返回该位置之后的记录
 
         Returns:
             会话列表
@@ -108,16 +136,31 @@ class ISessionRepository(ABC):
     async def count_sessions(
         self,
         status: Optional[str] = None,
-        template_id: Optional[str] = None
-    ) -> int:
+        template_id: Optional[str] = None,
+        exact: bool = True,
+    ) -> RowCount:
         """
         统计会话数量（支持筛选）
 
         Args:
             status: 会话状态筛选（可选）
             template_id: 模板 ID 筛选（可选）
+            exact: 是否精确计数；False 时允许返回估算值
+
+        Returns:
+            会话总数（is_estimate 标明是否为估算值）
+        """
+        pass
+
+    @abstractmethod
+    async def touch_last_activity(self, activity: Dict[str, datetime]) -> int:
+        """
+        批量更新会话最后活动时间
+
+        Args:
+            activity: 会话 ID -> 最后活动时间
 
         Returns:
-            会话总数
+            实际更新的会话数量
         """
         pass
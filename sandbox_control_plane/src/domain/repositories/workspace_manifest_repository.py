@@ -0,0 +1,74 @@
+"""
+workspace 文件清单仓储接口
+
+定义会话 workspace 文件清单持久化的抽象接口（Port）。
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional
+
+from src.domain.value_objects.workspace_file import WorkspaceFile
+
+
+class IWorkspaceManifestRepository(ABC):
+    """
+    workspace 文件清单仓储接口
+
+    这是领域层定义的 Port，由基础设施层实现 Adapter。
+    清单与对象存储对账后才可用于列表；上传、删除时增量维护，
+    执行器回报结果后标记为过期，下次使用前重新对账。
+    """
+
+    @abstractmethod
+    async def get_reconciled_at(self, session_id: str) -> Optional[datetime]:
+        """最近一次对账时间；清单不存在或已标记过期时返回 None"""
+        pass
+
+    @abstractmethod
+    async def list_files(self, session_id: str, prefix: str = "", limit: int = 1000) -> List[WorkspaceFile]:
+        """按路径顺序列出路径以 prefix 开头的文件"""
+        pass
+
+    @abstractmethod
+    async def count_files(self, session_id: str, prefix: str = "") -> int:
+        """统计路径以 prefix 开头的文件数"""
+        pass
+
+    @abstractmethod
+    async def upsert_files(self, session_id: str, files: List[WorkspaceFile]) -> None:
+        """新增或覆盖文件记录"""
+        pass
+
+    @abstractmethod
+    async def remove_files(self, session_id: str, paths: List[str]) -> None:
+        """删除文件记录"""
+        pass
+
+    @abstractmethod
+    async def replace_files(self, session_id: str, files: List[WorkspaceFile], listed_at: datetime) -> None:
+        """
+        以对象存储的列表结果替换清单，并把对账时间记为 listed_at
+
+        listed_at 为开始列表的时间：此后通过 upsert_files 写入的记录比列表结果更新，予以保留。
+        """
+        pass
+
+    @abstractmethod
+    async def mark_stale(self, session_ids: List[str]) -> None:
+        """标记清单过期（workspace 可能被绕过控制平面写入）"""
+        pass
+
+    @abstractmethod
+    async def find_due(self, reconciled_before: datetime, limit: int) -> List[str]:
+        """对账时间早于 reconciled_before（含已过期）的清单所属会话 ID"""
+        pass
+
+    @abstractmethod
+    async def delete_session(self, session_id: str) -> None:
+        """删除会话的清单"""
+        pass
+
+    @abstractmethod
+    async def commit(self) -> None:
+        """Explicitly commit the transaction"""
+        pass
@@ -103,3 +103,51 @@ class IScheduler(ABC):
             TimeoutError: 执行器响应超时
         """
         pass
+
+    async def stop_container(self, container_id: str, timeout: int = 10) -> None:
+        """
+        停止容器（会话拆除的第一阶段，进程优雅退出）
+
+        默认不区分停止与删除，由 remove_container 完成。
+        """
+        return None
+
+    async def remove_container(self, container_id: str) -> None:
+        """
+        强制删除容器（会话拆除的第二阶段，停止失败时同样可以删除）
+
+        默认不支持。
+        """
+        return None
+
+    async def pause_container(self, container_id: str) -> bool:
+        """
+        暂停空闲会话的容器（冻结进程，释放 CPU）
+
+        默认不支持暂停，调度器实现可覆盖。
+
+        Returns:
+            bool: 本次是否实际暂停了容器
+        """
+        return False
+
+    async def unpause_container(self, container_id: str) -> Optional[float]:
+        """
+        确保容器处于运行状态，若已暂停则恢复
+
+        Returns:
+            恢复耗时（毫秒）；容器未处于暂停状态时返回 None
+        """
+        return None
+
+    async def snapshot_dependencies(self, container_id: str) -> bool:
+        """
+        将容器内已安装的依赖目录快照到会话 workspace
+
+        用于会话休眠，恢复时新容器从快照预热而不是重新 pip 安装。
+        默认不支持快照。
+
+        Returns:
+            bool: 是否生成了快照
+        """
+        return False
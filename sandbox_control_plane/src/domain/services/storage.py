@@ -4,7 +4,7 @@
 定义存储的抽象接口，负责文件存储操作。
 """
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from typing import AsyncIterator, Callable, Dict, List, Optional
 
 
 class IStorageService(ABC):
@@ -32,6 +32,91 @@ class IStorageService(ABC):
         """
         pass
 
+    @abstractmethod
+    async def create_multipart_upload(
+        self,
+        s3_path: str,
+        content_type: str = "application/octet-stream"
+    ) -> str:
+        """
+        创建分片上传
+
+        Args:
+            s3_path: S3 对象路径
+            content_type: MIME 类型
+
+        Returns:
+            上传 ID
+        """
+        pass
+
+    @abstractmethod
+    async def upload_part(
+        self,
+        s3_path: str,
+        upload_id: str,
+        part_number: int,
+        content: bytes
+    ) -> str:
+        """
+        上传单个分片
+
+        除最后一个分片外，每个分片不能小于 5MB（S3 限制）。
+        重复上传同一分片号会覆盖之前的内容。
+
+        Args:
+            s3_path: S3 对象路径
+            upload_id: 上传 ID
+            part_number: 分片号（1-10000）
+            content: 分片内容
+
+        Returns:
+            分片 ETag
+        """
+        pass
+
+    @abstractmethod
+    async def list_parts(self, s3_path: str, upload_id: str) -> List[Dict]:
+        """
+        列出已上传的分片（用于断点续传）
+
+        Args:
+            s3_path: S3 对象路径
+            upload_id: 上传 ID
+
+        Returns:
+            按分片号排序的分片列表，每个分片包含 part_number, size, etag
+        """
+        pass
+
+    @abstractmethod
+    async def complete_multipart_upload(
+        self,
+        s3_path: str,
+        upload_id: str,
+        parts: List[Dict]
+    ) -> None:
+        """
+        完成分片上传，合并分片为最终对象
+
+        Args:
+            s3_path: S3 对象路径
+            upload_id: 上传 ID
+            parts: 分片列表，每个分片包含 part_number, etag
+        """
+        pass
+
+    @abstractmethod
+    async def abort_multipart_upload(self, s3_path: str, upload_id: str) -> None:
+        """
+        取消分片上传，释放已上传分片占用的存储
+
+        Args:
+            s3_path: S3 对象路径
+            upload_id: 上传 ID
+        """
+        pass
+
     @abstractmethod
     async def download_file(self, s3_path: str) -> bytes:
         """
@@ -67,7 +152,39 @@ class IStorageService(ABC):
             s3_path: S3 对象路径
 
         Returns:
-            文件信息字典，包含 size, content_type, last_modified 等
+            文件信息字典，包含 size, content_type, last_modified, etag
+
+        Raises:
+            NotFoundError: 文件不存在
+        """
+        pass
+
+    @abstractmethod
+    async def open_file_stream(
+        self,
+        s3_path: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        etag: Optional[str] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        打开文件内容流
+
+        立即发起读取请求（错误在返回前抛出），返回按块产出内容的异步迭代器，
+        内存占用与文件大小无关。
+
+        Args:
+            s3_path: S3 对象路径
+            start: 区间起始字节（含），为空表示读取整个文件
+            end: 区间结束字节（含），为空表示读到文件末尾
+            etag: 期望的 ETag，对象已被替换时抛出 ConflictError
+
+        Returns:
+            文件内容块的异步迭代器
+
+        Raises:
+            NotFoundError: 文件不存在
+            ConflictError: 对象 ETag 与期望不一致
         """
         pass
 
@@ -120,15 +237,20 @@ class IStorageService(ABC):
     @abstractmethod
     async def delete_prefix(
         self,
-        prefix: str
+        prefix: str,
+        on_progress: Optional[Callable[[int], None]] = None,
     ) -> int:
         """
         删除指定前缀的所有文件（用于会话清理）
 
         Args:
             prefix: S3 路径前缀（例如: "sessions/sess_abc123/"）
+            on_progress: 删除进度回调，参数为累计删除数
 
         Returns:
             删除的文件数量
+
+        Raises:
+            StorageError: 部分对象未删除（重新调用只删除剩余对象）
         """
         pass
@@ -3,18 +3,26 @@
 
 包含所有领域值对象。
 """
+from src.domain.value_objects.dispatch_entry import DispatchEntry
 from src.domain.value_objects.execution_request import ExecutionRequest
 from src.domain.value_objects.execution_status import (
     SessionStatus,
     ExecutionStatus,
     ExecutionState,
 )
+from src.domain.value_objects.page_cursor import PageCursor
 from src.domain.value_objects.resource_limit import ResourceLimit
+from src.domain.value_objects.row_count import RowCount
+from src.domain.value_objects.workspace_file import WorkspaceFile
 
 __all__ = [
+    "DispatchEntry",
     "ExecutionRequest",
     "SessionStatus",
     "ExecutionStatus",
     "ExecutionState",
+    "PageCursor",
     "ResourceLimit",
+    "RowCount",
+    "WorkspaceFile",
 ]
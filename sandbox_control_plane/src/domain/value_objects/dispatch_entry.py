@@ -0,0 +1,21 @@
+"""
+分发队列条目值对象
+
+表示一条等待分发到执行器的执行。
+"""
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass(frozen=True)
+class DispatchEntry:
+    """
+    分发队列条目值对象
+
+    同一会话的条目按入队顺序逐条分发；attempts 为包含本次在内的认领次数。
+    """
+
+    execution_id: str
+    session_id: str
+    attempts: int
+    enqueued_at: datetime
@@ -15,6 +15,8 @@ class SessionStatus(str, Enum):
     FAILED = "failed"
     TIMEOUT = "timeout"
     TERMINATED = "terminated"
+    HIBERNATING = "hibernating"  # 休眠中：快照依赖与销毁容器进行中，不接受执行
+    HIBERNATED = "hibernated"  # 容器已释放，workspace 与依赖快照保留，按需恢复
 
 
 class ExecutionStatus(str, Enum):
@@ -0,0 +1,49 @@
+"""
+分页游标值对象
+
+表示键集分页（keyset pagination）中上一页最后一条记录的位置。
+"""
+import base64
+import binascii
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class PageCursor:
+    """
+    分页游标值对象
+
+    列表按 (created_at, id) 倒序排列，下一页从严格小于该位置的记录开始，
+    因此任意深度的翻页成本都与首页相同。
+    """
+
+    created_at_ms: int
+    id: str
+
+    def __post_init__(self):
+        """验证游标"""
+        if self.created_at_ms < 0:
+            raise ValueError("created_at_ms cannot be negative")
+        if not self.id:
+            raise ValueError("id cannot be empty")
+
+    def encode(self) -> str:
+        """编码为对客户端不透明的字符串"""
+        raw = f"{self.created_at_ms}:{self.id}".encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, value: str) -> "PageCursor":
+        """
+        从客户端传回的字符串解码
+
+        Raises:
+            ValueError: 游标格式无效
+        """
+        try:
+            padded = value + "=" * (-len(value) % 4)
+            raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+            created_at_ms, cursor_id = raw.split(":", 1)
+            return cls(created_at_ms=int(created_at_ms), id=cursor_id)
+        except (binascii.Error, UnicodeError, ValueError) as e:
+            raise ValueError(f"invalid cursor: {value}") from e
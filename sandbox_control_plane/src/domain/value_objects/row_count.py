@@ -0,0 +1,19 @@
+"""
+行数值对象
+
+列表接口的总数：精确计数或优化器估算值。
+"""
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class RowCount:
+    """
+    行数值对象
+
+    is_estimate 为 True 表示来自优化器估算（EXPLAIN），而非 COUNT(*)；
+    请求估算但数据库不支持时回退到精确计数，is_estimate 为 False。
+    """
+
+    value: int
+    is_estimate: bool = False
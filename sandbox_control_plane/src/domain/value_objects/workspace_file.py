@@ -0,0 +1,25 @@
+"""
+workspace 文件值对象
+
+表示会话 workspace 文件清单中的一条记录。
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+# 清单可索引的最大路径长度（更长的路径所在 workspace 不建立清单）
+MAX_INDEXED_PATH_LENGTH = 512
+
+
+@dataclass(frozen=True)
+class WorkspaceFile:
+    """
+    workspace 文件值对象
+
+    path 为相对于 workspace 根目录的路径；etag 在与对象存储对账前可能为空。
+    """
+
+    path: str
+    size: int
+    etag: Optional[str] = None
+    modified_at: Optional[datetime] = None
@@ -3,7 +3,10 @@
 
 提供后台任务的启动、停止和生命周期管理。
 """
+from src.infrastructure.background_tasks.leader_election import LeaderElector
 from src.infrastructure.background_tasks.task_manager import (
+    OVERRUN_QUEUE,
+    OVERRUN_SKIP,
     BackgroundTask,
     BackgroundTaskManager,
 )
@@ -11,4 +14,7 @@ from src.infrastructure.background_tasks.task_manager import (
 __all__ = [
     "BackgroundTask",
     "BackgroundTaskManager",
+    "LeaderElector",
+    "OVERRUN_QUEUE",
+    "OVERRUN_SKIP",
 ]
@@ -0,0 +1,98 @@
+"""
+后台任务主节点选举
+
+基于数据库租约：所有副本的所有 worker 进程竞争同一行租约，
+持有者运行仅需单实例执行的后台任务（状态同步、会话清理等），其他进程跳过。
+持有者崩溃或失联时，租约到期后由其他进程接管。
+"""
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from src.infrastructure.metrics import (
+    BACKGROUND_TASK_LEADER,
+    BACKGROUND_TASK_LEADER_TRANSITIONS_TOTAL,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def default_holder_id() -> str:
+    """进程标识：主机名 + 进程号 + 随机后缀（进程号在容器内可能重复）"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LeaderElector:
+    """
+    主节点选举
+
+    - 每 renew_interval_seconds（租约的 1/3）续约一次
+    - 续约成功后的 lease_seconds / 2 内认为自己是主节点：
+      连续续约失败（数据库不可用）时先于租约到期主动让出，预留时钟偏差余量
+    - 正常关闭时释放租约，其他进程在下一次续约时立即接管
+    """
+
+    def __init__(
+        self,
+        acquire: Callable[[], Awaitable[bool]],
+        release: Callable[[], Awaitable[None]],
+        lease_seconds: int = 30,
+        holder_id: Optional[str] = None,
+    ):
+        """
+        Args:
+            acquire: 获取或续约租约，持有时返回 True
+            release: 释放租约
+            lease_seconds: 租约时长（秒）
+            holder_id: 进程标识（与 acquire/release 使用的标识一致）
+        """
+        self._acquire = acquire
+        self._release = release
+        self._lease_seconds = lease_seconds
+        self.holder_id = holder_id or default_holder_id()
+        self._valid_until = 0.0
+
+    @property
+    def renew_interval_seconds(self) -> int:
+        return max(1, self._lease_seconds // 3)
+
+    @property
+    def is_leader(self) -> bool:
+        return time.monotonic() < self._valid_until
+
+    async def renew(self) -> bool:
+        """获取或续约租约，返回续约后是否为主节点"""
+        was_leader = self.is_leader
+        started = time.monotonic()
+        try:
+            if await self._acquire():
+                self._valid_until = started + self._lease_seconds / 2
+            else:
+                # 租约由其他进程持有
+                self._valid_until = 0.0
+        except Exception as e:
+            # 无法确认：保持到本地有效期结束，期间续约恢复则不发生切换
+            logger.warning(f"Failed to renew background task lease: {e}")
+
+        if self.is_leader != was_leader:
+            transition = "acquired" if self.is_leader else "lost"
+            BACKGROUND_TASK_LEADER_TRANSITIONS_TOTAL.labels(transition=transition).inc()
+            logger.info(f"Background task lease {transition}: holder={self.holder_id}")
+        BACKGROUND_TASK_LEADER.set(1 if self.is_leader else 0)
+        return self.is_leader
+
+    async def release(self) -> None:
+        """释放租约（未持有时不操作）"""
+        if not self._valid_until:
+            return
+
+        self._valid_until = 0.0
+        BACKGROUND_TASK_LEADER.set(0)
+        try:
+            await self._release()
+            logger.info(f"Background task lease released: holder={self.holder_id}")
+        except Exception as e:
+            logger.warning(f"Failed to release background task lease: {e}")
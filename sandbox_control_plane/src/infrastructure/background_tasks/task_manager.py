@@ -2,28 +2,64 @@
 后台任务管理器
 
 管理周期性后台任务的启动和停止，支持优雅关闭。
+每个任务记录运行耗时、最近错误与超时运行（单次耗时超过执行间隔），
+并导出 Prometheus 指标，用于发现负载下落后的后台任务。
+
+任务状态与间隔都保存在进程内存中：每个 worker 进程各有一个管理器，
+运行时修改间隔与查看统计都只作用于当前进程。
 """
 import asyncio
 import logging
+import os
+import socket
+import time
 from contextlib import asynccontextmanager
-from typing import Callable, List, Optional
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+from src.infrastructure.metrics import (
+    BACKGROUND_TASK_DURATION_SECONDS,
+    BACKGROUND_TASK_LAG_SECONDS,
+    BACKGROUND_TASK_OVERRUNS_TOTAL,
+    BACKGROUND_TASK_RUNS_TOTAL,
+    BACKGROUND_TASK_SKIPPED_RUNS_TOTAL,
+)
+
+if TYPE_CHECKING:
+    from src.infrastructure.background_tasks.leader_election import LeaderElector
 
 logger = logging.getLogger(__name__)
 
+# 超时运行策略：跳过错过的执行点 / 结束后立即补跑一次（多个错过的执行点合并为一次）
+OVERRUN_SKIP = "skip"
+OVERRUN_QUEUE = "queue"
+OVERRUN_POLICIES = (OVERRUN_SKIP, OVERRUN_QUEUE)
+
+# 连续失败达到该次数时任务视为 failing
+FAILING_THRESHOLD = 3
+
 
 class BackgroundTask:
     """
     后台任务
 
     表示一个周期性运行的后台任务。
+
+    按固定频率调度：第 n 次执行计划在首次执行后 n * interval 秒开始。
+    单次耗时超过间隔时记为超时运行，错过的执行点按 overrun_policy 处理：
+    - skip：跳过错过的执行点，在下一个未来的执行点运行
+    - queue：当前运行结束后立即补跑一次
     """
 
     def __init__(
         self,
         name: str,
         func: Callable,
-        interval_seconds: int,
-        initial_delay_seconds: int = 0,
+        interval_seconds: float,
+        initial_delay_seconds: float = 0,
+        run_condition: Optional[Callable[[], bool]] = None,
+        overrun_policy: str = OVERRUN_SKIP,
+        behind_tolerance_seconds: float = 0,
     ):
         """
         初始化后台任务
@@ -33,15 +69,45 @@ class BackgroundTask:
             func: 异步函数，任务的实际执行逻辑
             interval_seconds: 执行间隔（秒）
             initial_delay_seconds: 首次执行前的延迟（秒）
+            run_condition: 每次执行前检查，返回 False 时跳过本轮（如非主节点）
+            overrun_policy: 超时运行策略，skip 或 queue
+            behind_tolerance_seconds: 耗时或延迟超过间隔多少秒以内仍不视为 behind
+                （间隔很短的推进型任务单次耗时超过间隔属于正常情况）
         """
+        if overrun_policy not in OVERRUN_POLICIES:
+            raise ValueError(f"Invalid overrun policy: {overrun_policy}")
+
         self.name = name
         self.func = func
         self.interval_seconds = interval_seconds
         self.initial_delay_seconds = initial_delay_seconds
+        self.run_condition = run_condition
+        self.overrun_policy = overrun_policy
+        self.behind_tolerance_seconds = behind_tolerance_seconds
         self._task: Optional[asyncio.Task] = None
         self._stop_event = asyncio.Event()
+        self._wake_event = asyncio.Event()
         self._running = False
 
+        # 运行统计
+        self.runs = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.overruns = 0
+        self.skipped_runs = 0
+        self.total_duration_seconds = 0.0
+        self.max_duration_seconds = 0.0
+        self.last_duration_seconds: Optional[float] = None
+        self.last_lag_seconds: Optional[float] = None
+        self.last_started_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.last_error_at: Optional[datetime] = None
+        self.in_progress = False
+        self.standby = False
+        self._last_start: Optional[float] = None
+        self._next_run: Optional[float] = None
+        self._sleeping = False
+
     async def start(self) -> None:
         """
         启动后台任务
@@ -67,6 +133,7 @@ class BackgroundTask:
             return
 
         self._stop_event.set()
+        self._wake_event.set()
         self._running = False
 
         try:
@@ -76,6 +143,23 @@ class BackgroundTask:
             logger.warning(f"Task {self.name} did not stop gracefully, cancelling")
             self._task.cancel()
 
+    def set_interval(self, interval_seconds: float) -> None:
+        """
+        修改执行间隔
+
+        立即生效：正在等待的任务按新间隔重新计算下次执行时间。
+        """
+        if interval_seconds <= 0:
+            raise ValueError("interval_seconds must be positive")
+
+        old = self.interval_seconds
+        self.interval_seconds = interval_seconds
+        # 运行中修改时由本轮结束后的调度使用新间隔；等待中修改时立即重算下次执行点
+        if self._sleeping and self._last_start is not None:
+            self._next_run = self._last_start + interval_seconds
+        self._wake_event.set()
+        logger.info(f"Background task {self.name} interval changed: {old}s -> {interval_seconds}s")
+
     async def _run(self) -> None:
         """
         任务运行循环
@@ -83,36 +167,33 @@ class BackgroundTask:
         执行流程：
         1. 等待初始延迟（如果配置）
         2. 循环执行：
-           - 执行任务函数
-           - 等待间隔或停止事件
+           - 执行任务函数并记录耗时
+           - 计算下次执行点（处理超时运行）
+           - 等待到下次执行点或停止事件
         """
         try:
             # 初始延迟
             if self.initial_delay_seconds > 0:
-                await asyncio.sleep(self.initial_delay_seconds)
+                if await self._sleep_until(time.monotonic() + self.initial_delay_seconds, follow_interval=False):
+                    return
 
             # 任务循环
+            self._next_run = time.monotonic()
             while not self._stop_event.is_set():
-                try:
-                    # 执行任务函数
-                    await self.func()
-                except Exception as e:
-                    logger.error(
-                        f"Error in background task {self.name}: {e}",
-                        exc_info=True,
-                    )
+                scheduled = self._next_run
+                started = time.monotonic()
+                lag = max(0.0, started - scheduled)
+                self._last_start = started
+                await self._execute(lag)
+
+                duration = time.monotonic() - started
+                if self.interval_seconds > 0 and duration > self.interval_seconds:
+                    self._record_overrun(duration)
+                self._schedule_next(scheduled)
 
                 # 等待间隔或停止事件
-                try:
-                    await asyncio.wait_for(
-                        self._stop_event.wait(),
-                        timeout=self.interval_seconds,
-                    )
-                    # 如果 wait_for 完成，说明停止事件被设置
+                if await self._sleep_until(self._next_run):
                     break
-                except asyncio.TimeoutError:
-                    # 超时，继续循环
-                    continue
 
         except asyncio.CancelledError:
             logger.info(f"Background task {self.name} was cancelled")
@@ -122,29 +203,175 @@ class BackgroundTask:
                 exc_info=True,
             )
 
+    async def _execute(self, lag: float) -> None:
+        """执行一次任务函数（不满足运行条件时跳过本轮）"""
+        if self.run_condition is not None and not self.run_condition():
+            self.standby = True
+            logger.debug(f"Skipping background task {self.name}: run condition not met")
+            return
+
+        self.standby = False
+        self.in_progress = True
+        self.last_started_at = datetime.now()
+        self.last_lag_seconds = lag
+        BACKGROUND_TASK_LAG_SECONDS.labels(task=self.name).set(lag)
+        start = time.perf_counter()
+        try:
+            await self.func()
+        except Exception as e:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            self.last_error_at = datetime.now()
+            BACKGROUND_TASK_RUNS_TOTAL.labels(task=self.name, outcome="error").inc()
+            logger.error(
+                f"Error in background task {self.name}: {e}",
+                exc_info=True,
+            )
+        else:
+            self.consecutive_failures = 0
+            BACKGROUND_TASK_RUNS_TOTAL.labels(task=self.name, outcome="success").inc()
+        finally:
+            duration = time.perf_counter() - start
+            self.in_progress = False
+            self.runs += 1
+            self.last_duration_seconds = duration
+            self.total_duration_seconds += duration
+            self.max_duration_seconds = max(self.max_duration_seconds, duration)
+            BACKGROUND_TASK_DURATION_SECONDS.labels(task=self.name).observe(duration)
+
+    def _record_overrun(self, duration: float) -> None:
+        self.overruns += 1
+        BACKGROUND_TASK_OVERRUNS_TOTAL.labels(task=self.name).inc()
+        logger.warning(
+            f"Background task {self.name} overran its interval: "
+            f"took {duration:.2f}s, interval {self.interval_seconds}s, policy {self.overrun_policy}"
+        )
+
+    def _schedule_next(self, scheduled: float) -> None:
+        """按固定频率计算下次执行点，错过的执行点按超时运行策略处理"""
+        now = time.monotonic()
+        self._next_run = scheduled + self.interval_seconds
+        if self._next_run > now or self.interval_seconds <= 0:
+            return
+
+        if self.overrun_policy == OVERRUN_QUEUE:
+            self._next_run = now
+            return
+
+        missed = int((now - self._next_run) // self.interval_seconds) + 1
+        self._next_run += missed * self.interval_seconds
+        self.skipped_runs += missed
+        BACKGROUND_TASK_SKIPPED_RUNS_TOTAL.labels(task=self.name).inc(missed)
+
+    async def _sleep_until(self, deadline: float, follow_interval: bool = True) -> bool:
+        """
+        等待到 deadline，返回是否收到停止事件
+
+        follow_interval 为 True 时，等待期间修改间隔会按新的下次执行点重新等待。
+        """
+        self._sleeping = follow_interval
+        try:
+            while not self._stop_event.is_set():
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    return False
+                self._wake_event.clear()
+                try:
+                    await asyncio.wait_for(self._wake_event.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    return self._stop_event.is_set()
+                if follow_interval:
+                    deadline = self._next_run
+            return True
+        finally:
+            self._sleeping = False
+
     @property
     def is_running(self) -> bool:
         """检查任务是否正在运行"""
         return self._running and self._task is not None and not self._task.done()
 
+    @property
+    def state(self) -> str:
+        """
+        任务健康状态
+
+        - stopped：任务循环未运行
+        - failing：连续失败达到 FAILING_THRESHOLD 次
+        - behind：最近一次运行超过执行间隔，或开始时间比计划晚一个间隔以上
+          （均加上 behind_tolerance_seconds 容差）
+        - standby：不满足运行条件（如非主节点）
+        - ok：正常
+        """
+        if not self.is_running:
+            return "stopped"
+        if self.consecutive_failures >= FAILING_THRESHOLD:
+            return "failing"
+        threshold = self.interval_seconds + self.behind_tolerance_seconds
+        if self.last_duration_seconds is not None and self.last_duration_seconds > threshold:
+            return "behind"
+        if self.last_lag_seconds is not None and self.last_lag_seconds > threshold:
+            return "behind"
+        if self.standby:
+            return "standby"
+        return "ok"
+
+    def stats(self) -> dict:
+        """任务配置与运行统计"""
+        return {
+            "state": self.state,
+            "running": self.is_running,
+            "in_progress": self.in_progress,
+            "interval_seconds": self.interval_seconds,
+            "overrun_policy": self.overrun_policy,
+            "behind_tolerance_seconds": self.behind_tolerance_seconds,
+            "runs": self.runs,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "overruns": self.overruns,
+            "skipped_runs": self.skipped_runs,
+            "last_started_at": self.last_started_at.isoformat() if self.last_started_at else None,
+            "last_duration_seconds": self.last_duration_seconds,
+            "avg_duration_seconds": self.total_duration_seconds / self.runs if self.runs else None,
+            "max_duration_seconds": self.max_duration_seconds if self.runs else None,
+            "last_lag_seconds": self.last_lag_seconds,
+            "last_error": self.last_error,
+            "last_error_at": self.last_error_at.isoformat() if self.last_error_at else None,
+        }
+
 
 class BackgroundTaskManager:
     """
     后台任务管理器
 
     管理多个后台任务的启动和停止。
+
+    配置了主节点选举时，注册为 leader_only 的任务只在持有租约的进程中执行，
+    租约续约作为一个普通后台任务运行，停止时释放租约。
     """
 
-    def __init__(self):
+    def __init__(self, leader_elector: Optional["LeaderElector"] = None):
         self._tasks: List[BackgroundTask] = []
         self._running = False
+        self._leader_elector = leader_elector
+
+        if leader_elector is not None:
+            self.register_task(
+                name="leader_election",
+                func=leader_elector.renew,
+                interval_seconds=leader_elector.renew_interval_seconds,
+            )
 
     def register_task(
         self,
         name: str,
         func: Callable,
-        interval_seconds: int,
-        initial_delay_seconds: int = 0,
+        interval_seconds: float,
+        initial_delay_seconds: float = 0,
+        leader_only: bool = False,
+        overrun_policy: str = OVERRUN_SKIP,
+        behind_tolerance_seconds: float = 0,
     ) -> None:
         """
         注册一个新的后台任务
@@ -154,17 +381,28 @@ class BackgroundTaskManager:
             func: 异步函数，任务的实际执行逻辑
             interval_seconds: 执行间隔（秒）
             initial_delay_seconds: 首次执行前的延迟（秒）
+            leader_only: 是否只在主节点执行（未配置选举时所有进程都执行）
+            overrun_policy: 单次运行超过间隔时的策略，skip 跳过错过的执行点，queue 结束后立即补跑
+            behind_tolerance_seconds: 判定任务落后（behind）时在间隔之上允许的容差（秒）
         """
+        run_condition = None
+        if leader_only and self._leader_elector is not None:
+            run_condition = self._is_leader
+
         task = BackgroundTask(
             name=name,
             func=func,
             interval_seconds=interval_seconds,
             initial_delay_seconds=initial_delay_seconds,
+            run_condition=run_condition,
+            overrun_policy=overrun_policy,
+            behind_tolerance_seconds=behind_tolerance_seconds,
         )
         self._tasks.append(task)
         logger.info(
             f"Registered background task: {name} "
-            f"(interval: {interval_seconds}s, delay: {initial_delay_seconds}s)"
+            f"(interval: {interval_seconds}s, delay: {initial_delay_seconds}s, overrun: {overrun_policy}"
+            f"{', leader only' if run_condition else ''})"
         )
 
     async def start_all(self) -> None:
@@ -199,6 +437,10 @@ class BackgroundTaskManager:
         tasks_to_stop = [task.stop() for task in self._tasks]
         await asyncio.gather(*tasks_to_stop, return_exceptions=True)
 
+        # 释放租约，其他进程无需等待租约到期即可接管
+        if self._leader_elector is not None:
+            await self._leader_elector.release()
+
         logger.info("Stopped all background tasks")
 
     @asynccontextmanager
@@ -218,6 +460,9 @@ class BackgroundTaskManager:
         finally:
             await self.stop_all()
 
+    def _is_leader(self) -> bool:
+        return self._leader_elector.is_leader
+
     @property
     def running(self) -> bool:
         """检查管理器是否正在运行"""
@@ -236,3 +481,69 @@ class BackgroundTaskManager:
             dict: 任务名称到运行状态的映射
         """
         return {task.name: task.is_running for task in self._tasks}
+
+    def get_task(self, name: str) -> BackgroundTask:
+        """
+        按名称获取任务
+
+        Raises:
+            KeyError: 任务不存在
+        """
+        for task in self._tasks:
+            if task.name == name:
+                return task
+        raise KeyError(name)
+
+    def set_interval(self, name: str, interval_seconds: float) -> None:
+        """
+        运行时修改任务执行间隔
+
+        只修改当前进程中的任务，不持久化；其他 worker 与副本保持原间隔。
+        leader_only 任务只在主节点进程上运行，要改变其实际执行频率须作用于主节点进程。
+
+        Raises:
+            KeyError: 任务不存在
+            ValueError: 间隔不是正数
+        """
+        self.get_task(name).set_interval(interval_seconds)
+
+    def get_task_stats(self) -> Dict[str, dict]:
+        """
+        获取所有任务的配置与运行统计
+
+        Returns:
+            dict: 任务名称到统计信息的映射（耗时、最近错误、超时运行次数等）
+        """
+        return {task.name: task.stats() for task in self._tasks}
+
+    def process_info(self) -> dict:
+        """
+        当前进程标识
+
+        任务统计与间隔修改都是进程级的，返回给调用方以区分作用于哪个进程。
+        leader 为 None 表示未配置主节点选举（所有进程都执行 leader_only 任务）。
+        """
+        return {
+            "hostname": socket.gethostname(),
+            "pid": os.getpid(),
+            "leader": self._leader_elector.is_leader if self._leader_elector is not None else None,
+        }
+
+    def health(self) -> dict:
+        """
+        后台任务健康汇总
+
+        有任务处于 failing、behind 或 stopped 状态时整体为 degraded。
+        只反映当前进程中的任务。
+        """
+        tasks = self.get_task_stats()
+        unhealthy = sorted(
+            name for name, stats in tasks.items()
+            if stats["state"] in ("failing", "behind", "stopped")
+        )
+        return {
+            "status": "degraded" if unhealthy else "healthy",
+            "unhealthy_tasks": unhealthy,
+            "process": self.process_info(),
+            "tasks": tasks,
+        }
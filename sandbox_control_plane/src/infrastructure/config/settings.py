@@ -9,6 +9,7 @@ from urllib.parse import quote_plus
 
 from pydantic import Field, field_validator, computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from sqlalchemy.engine import make_url
 
 
 class Settings(BaseSettings):
@@ -57,6 +58,17 @@ class Settings(BaseSettings):
     db_read_timeout: int | None = Field(default=None)  # 读超时
     db_write_timeout: int | None = Field(default=None)  # 写超时
 
+    # ============== 读写分离配置 ==============
+    # 配置 db_host_read 后，GET 请求的查询路由到从库。一致性约定：
+    # - 按 ID 查找：本进程写入后 db_read_sticky_seconds 内走主库，其他进程的写入在从库未命中时回主库重查，
+    #   刚创建的资源总能查到，但已存在资源的字段可能滞后至多 db_read_max_lag_seconds
+    # - 列表与键集分页（及其计数）：默认走主库，保证刚创建的资源出现在列表中；
+    #   开启 db_read_replica_lists 后走从库，刚写入的资源可能在至多 db_read_max_lag_seconds 内不出现
+    db_read_sticky_seconds: float = Field(default=5.0)  # 写入后该资源的读请求回主库的时间窗口（仅记录本进程的写入，按 ID 查找在从库未命中时回主库）
+    db_read_replica_lists: bool = Field(default=False)  # 列表与分页查询是否走从库（允许读到复制延迟内的旧列表）
+    db_read_max_lag_seconds: int = Field(default=10)  # 从库复制延迟超过该值时回退主库
+    db_read_health_check_interval_seconds: int = Field(default=15)  # 从库健康检查间隔
+
     @computed_field
     @property
     def effective_database_url(self) -> str:
@@ -96,12 +108,89 @@ class Settings(BaseSettings):
         # 否则使用默认的 database_url
         return self.database_url
 
+    @computed_field
+    @property
+    def effective_read_database_url(self) -> str | None:
+        """
+        计算从库连接 URL
+
+        与主库使用相同的账号和库名，仅替换主机和端口；未配置 db_host_read 时返回 None
+        """
+        if not self.db_host_read:
+            return None
+
+        url = make_url(self.effective_database_url)
+        url = url.set(host=self.db_host_read, port=self.db_port_read or url.port)
+        return url.render_as_string(hide_password=False)
+
     # ============== S3 配置 ==============
     s3_bucket: str = Field(default="sandbox-workspace")
     s3_region: str = Field(default="us-east-1")
     s3_access_key_id: str = Field(default="")
     s3_secret_access_key: str = Field(default="")
     s3_endpoint_url: str = Field(default="")
+    s3_client_backend: str = Field(
+        default="boto3",
+        description="S3 客户端实现：boto3（同步 SDK，经 asyncio.to_thread 在默认线程池执行）"
+                    "或 async（原生异步 HTTP，不占用线程池，连接池复用）",
+    )
+    s3_max_connections: int = Field(default=64, ge=1, description="async 客户端连接池上限（所有 S3 请求共享）")
+    s3_connect_timeout_seconds: float = Field(default=5.0, gt=0, description="async 客户端建立连接超时（秒）")
+    s3_metadata_timeout_seconds: float = Field(
+        default=10.0,
+        gt=0,
+        description="async 客户端元数据请求（HEAD、列表、删除、分片控制）的读写超时（秒）",
+    )
+    s3_transfer_timeout_seconds: float = Field(
+        default=120.0,
+        gt=0,
+        description="async 客户端对象内容上传下载的读写超时（秒），为两次网络读写之间的最长等待而非总时长",
+    )
+    s3_max_attempts: int = Field(default=3, ge=1, description="async 客户端遇到网络错误或 5xx 响应时的最大尝试次数（含首次）")
+    s3_retry_base_delay_seconds: float = Field(
+        default=0.2,
+        ge=0,
+        description="async 客户端重试退避基数（秒），第 n 次重试前等待约 base × 2^(n-1)，带随机抖动",
+    )
+    s3_delete_concurrency: int = Field(default=8, ge=1, le=64, description="按前缀删除时并发的 DeleteObjects 请求数（每批 1000 个对象）")
+    file_upload_max_bytes: int = Field(
+        default=100 * 1024 * 1024,
+        description="单个工作区文件上传的最大字节数，请求体按 Content-Length 预检并在读取过程中累计校验",
+    )
+    file_upload_part_size_bytes: int = Field(
+        default=8 * 1024 * 1024,
+        ge=5 * 1024 * 1024,
+        description="流式上传的 S3 分片大小（字节），S3 要求除最后一个分片外不小于 5MB；小于该值的文件直接单次上传",
+    )
+    file_upload_part_concurrency: int = Field(
+        default=4,
+        ge=1,
+        description="单个流式上传同时进行的分片上传数，单个上传占用内存约为 (并发数 + 1) × 分片大小",
+    )
+    file_download_presign_threshold_bytes: int = Field(
+        default=10 * 1024 * 1024,
+        description="文件下载重定向阈值（字节），不小于该大小的文件返回 307 重定向到预签名 URL，"
+                    "小于该大小的文件由控制平面流式代理；-1 表示禁用（始终流式代理）",
+    )
+    file_archive_max_files: int = Field(default=10000, ge=1, description="目录打包下载、归档上传解压的最大文件数")
+    file_archive_max_bytes: int = Field(default=-1, description="目录打包下载的最大总字节数（压缩前），-1 表示不限制")
+    file_archive_fetch_concurrency: int = Field(default=8, ge=1, le=64, description="目录打包下载时同时读取的文件数")
+    file_archive_prefetch_bytes: int = Field(
+        default=32 * 1024 * 1024,
+        ge=1024 * 1024,
+        description="目录打包下载时已预读、尚未写入归档的文件字节数上限，单个打包下载的内存占用约为该值",
+    )
+    file_archive_extract_max_bytes: int = Field(
+        default=1024 * 1024 * 1024,
+        description="归档上传的请求体与解压后的最大总字节数，请求体按 Content-Length 预检，"
+                    "读取过程中按请求体与解压输出分别累计校验；-1 表示不限制",
+    )
+    file_archive_extract_concurrency: int = Field(
+        default=8,
+        ge=1,
+        le=64,
+        description="归档上传解压时在后台同时上传的文件数，小文件内容在上传完成前暂存于内存",
+    )
 
     # ============== Docker 配置 ==============
     docker_host: str = Field(default="unix:///var/run/docker.sock")
@@ -125,6 +214,54 @@ class Settings(BaseSettings):
     max_lifetime_hours: int = Field(default=-1, ge=-1, description="最大生命周期（小时），-1 表示无限期")
     cleanup_interval_seconds: int = Field(default=300, ge=1)
     creating_timeout_seconds: int = Field(default=300, ge=30, description="会话创建超时时间（秒），超过此时间的 creating 状态会话将被标记为 failed")
+    idle_pause_minutes: int = Field(default=-1, ge=-1, description="空闲冻结阈值（分钟），超过此时间无执行的容器将被暂停，-1 表示禁用")
+    idle_pause_check_interval_seconds: int = Field(default=60, ge=1)
+    hibernate_after_minutes: int = Field(default=-1, ge=-1, description="休眠阈值（分钟），超过此时间无执行的会话将快照依赖并释放容器，-1 表示禁用")
+    hibernate_check_interval_seconds: int = Field(default=300, ge=1)
+    hibernate_restore_timeout_seconds: int = Field(default=120, ge=1, description="休眠会话恢复时等待执行器就绪的超时时间（秒）")
+    execution_retention_days: int = Field(default=-1, ge=-1, description="执行记录在数据库中的保留天数，超过后归档到 S3，-1 表示禁用归档")
+    execution_archive_batch_size: int = Field(default=500, ge=1, le=5000, description="每批归档并删除的执行数量")
+    execution_archive_interval_seconds: int = Field(default=3600, ge=1)
+    session_activity_flush_interval_seconds: int = Field(default=5, ge=1, description="会话最后活动时间的批量写回间隔（秒）")
+    session_activity_flush_batch_size: int = Field(default=500, ge=1, le=5000, description="单条批量 UPDATE 最多包含的会话数")
+    execution_result_linger_ms: int = Field(default=5, ge=0, le=1000, description="执行结果回调合并为一批写入的等待时间（毫秒）")
+    execution_result_batch_size: int = Field(default=200, ge=1, le=5000, description="单批写入的执行结果数量上限")
+    execution_result_journal_path: str = Field(default="", description="执行结果日志文件路径；配置后回调落盘即返回 202，为空时回调等待提交。多个 worker 可共用同一路径，各进程按文件锁占用 <路径>、<路径>.1 ... 槽位，放弃的结果写入 <槽位>.dead")
+    template_cache_ttl_seconds: int = Field(default=300, description="模板进程内缓存条目有效期（秒），-1 表示禁用缓存")
+    template_cache_version_check_interval_seconds: int = Field(default=5, ge=1, description="检查模板缓存版本号（其他副本写入模板）的间隔（秒）")
+    execution_dispatch_queue_enabled: bool = Field(default=True, description="执行请求写入持久化分发队列后立即返回，由后台分发者调用执行器")
+    execution_dispatch_workers: int = Field(default=2, ge=1, le=32, description="每个副本的并发分发循环数")
+    execution_dispatch_batch_size: int = Field(default=50, ge=1, le=1000, description="每个分发循环单次认领的条目数")
+    execution_dispatch_poll_interval_ms: int = Field(default=500, ge=10, description="分发队列为空时的轮询间隔（毫秒），本副本入队时立即唤醒")
+    execution_dispatch_max_attempts: int = Field(default=5, ge=1, description="投递执行器的最大尝试次数，超过后执行标记为 failed")
+    execution_dispatch_retry_base_seconds: float = Field(default=1.0, gt=0, description="投递失败重试的指数退避基数（秒）")
+    execution_dispatch_retry_max_seconds: float = Field(default=60.0, gt=0, description="投递失败重试的退避上限（秒）")
+    execution_dispatch_lease_seconds: int = Field(default=120, ge=10, description="分发条目认领租约（秒），分发者崩溃后租约到期的条目被重新认领")
+    execution_dispatch_stats_interval_seconds: int = Field(default=15, ge=1, description="刷新分发队列长度与最早条目等待时间指标的间隔（秒）")
+    leader_election_enabled: bool = Field(default=True, description="状态同步、会话清理等后台任务只在持有数据库租约的进程中执行")
+    leader_lease_seconds: int = Field(default=30, ge=6, description="后台任务租约时长（秒），持有者失联后最多经过该时长由其他进程接管")
+    session_teardown_concurrency: int = Field(default=16, ge=1, le=256, description="批量清理会话时并发停止、删除容器的上限")
+    session_teardown_storage_concurrency: int = Field(default=8, ge=1, le=256, description="批量清理会话时并发删除 workspace 文件的上限")
+    session_teardown_rate_per_runtime: float = Field(default=-1, description="每个运行时节点每秒的容器停止/删除次数上限，-1 表示不限速")
+    session_teardown_max_attempts: int = Field(default=3, ge=1, description="拆除各阶段的最大尝试次数，重试耗尽的会话记入死信（容器未删除的会话留待下一轮清理）")
+    workspace_delete_in_background: bool = Field(
+        default=True,
+        description="终止、删除会话时在后台删除 workspace 文件：先写入删除标记，删除完成前不允许以相同 ID 创建会话",
+    )
+    workspace_delete_max_concurrent: int = Field(default=4, ge=1, description="同时进行的后台 workspace 删除数")
+    workspace_delete_resume_interval_seconds: int = Field(
+        default=300,
+        description="扫描残留删除标记（进程在删除完成前退出）并重新删除的间隔（秒），-1 表示禁用",
+    )
+    workspace_manifest_enabled: bool = Field(
+        default=True,
+        description="文件列表与计数从数据库中的 workspace 文件清单查询，上传时维护，执行结果回报后重新对账（仅 SQL 模式）",
+    )
+    workspace_manifest_reconcile_interval_seconds: int = Field(
+        default=300,
+        description="workspace 文件清单与对象存储定期对账的间隔（秒），发现经 s3fs 等途径写入的文件，-1 表示禁用",
+    )
+    workspace_manifest_reconcile_batch_size: int = Field(default=100, ge=1, le=5000, description="每轮对账的会话数上限")
 
     # ============== 重试配置 ==============
     max_retry_attempts: int = Field(default=3)
@@ -140,8 +277,17 @@ class Settings(BaseSettings):
 
     # ============== 健康检查配置 ==============
     health_check_interval_seconds: int = Field(default=10)
+    health_check_adaptive_enabled: bool = Field(default=True, description="按会话自适应安排容器健康检查（时间轮），关闭时每 30 秒全量检查")
+    health_check_base_interval_seconds: int = Field(default=30, ge=1, description="自适应健康检查的基础间隔（秒）")
+    health_check_min_interval_seconds: int = Field(default=5, ge=1, description="可疑会话的最短复查间隔（秒）")
+    health_check_max_interval_seconds: int = Field(default=300, ge=1, description="长时间无活动会话的最长检查间隔（秒）")
+    health_check_max_per_second: float = Field(default=50, description="每秒容器健康检查数上限，-1 表示不限")
+    health_check_jitter_ratio: float = Field(default=0.1, ge=0, le=0.5, description="检查间隔随机抖动比例")
+    health_check_rescan_interval_seconds: int = Field(default=60, ge=1, description="与数据库对账运行中会话集合的间隔（秒）")
     heartbeat_interval_seconds: int = Field(default=5)
-    heartbeat_timeout_seconds: int = Field(default=15)
+    heartbeat_timeout_seconds: int = Field(default=15, ge=1, description="执行心跳超时时间（秒），超时的运行中执行标记为 crashed")
+    heartbeat_flush_interval_seconds: int = Field(default=5, ge=1, description="执行最后心跳时间的批量写回间隔（秒），应小于心跳超时")
+    heartbeat_check_interval_seconds: int = Field(default=10, description="停滞执行检测间隔（秒），-1 表示禁用")
 
     # ============== 日志配置 ==============
     log_level: str = Field(default="INFO")
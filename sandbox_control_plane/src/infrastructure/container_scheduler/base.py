@@ -5,7 +5,7 @@
 """
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 
 @dataclass
@@ -52,6 +52,9 @@ class IContainerScheduler(ABC):
     定义容器生命周期管理操作。
     """
 
+    # 运行时是否支持冻结容器；为 False 时调用方不调用 pause_container / unpause_container
+    supports_pause: bool = False
+
     @abstractmethod
     async def create_container(
         self,
@@ -84,7 +87,26 @@ class IContainerScheduler(ABC):
         container_id: str,
         force: bool = True
     ) -> None:
-        """删除容器"""
+        """删除容器（容器不存在视为已删除，其他错误抛出）"""
+        pass
+
+    @abstractmethod
+    async def pause_container(self, container_id: str) -> None:
+        """暂停容器（冻结 cgroup 中的全部进程，仅 supports_pause 为 True 时调用）"""
+        pass
+
+    @abstractmethod
+    async def unpause_container(self, container_id: str) -> None:
+        """恢复已暂停的容器（仅 supports_pause 为 True 时调用）"""
+        pass
+
+    @abstractmethod
+    async def exec_command(
+        self,
+        container_id: str,
+        command: List[str],
+    ) -> ContainerResult:
+        """在运行中的容器内以 root 执行命令"""
         pass
 
     @abstractmethod
@@ -25,10 +25,18 @@ from src.infrastructure.container_scheduler.base import (
 )
 from src.infrastructure.config.settings import get_settings
 from src.infrastructure.logging import get_logger
-from src.shared.utils.dependencies import format_dependencies_for_script, format_dependency_install_script_for_shell
+from src.shared.utils.dependencies import (
+    build_venv_snapshot_restore_script,
+    format_dependencies_for_script,
+    format_dependency_install_script_for_shell,
+)
 
 logger = get_logger(__name__)
 
+# exec 输出流结束后等待进程退出（取退出码）的轮询次数与间隔
+EXEC_EXIT_POLL_ATTEMPTS = 50
+EXEC_EXIT_POLL_INTERVAL_SECONDS = 0.1
+
 
 class DockerScheduler(IContainerScheduler):
     """
@@ -37,6 +45,8 @@ class DockerScheduler(IContainerScheduler):
     通过 Docker socket 或 TCP 连接 Docker daemon，管理容器生命周期。
     """
 
+    supports_pause = True
+
     def __init__(self, docker_url: str = "unix:///var/run/docker.sock"):
         """
         初始化 Docker 调度器
@@ -165,8 +175,8 @@ ln -s "$SESSION_PATH" /workspace
 # 5. 验证符号链接
 echo "Workspace symlink: $(ls -la /workspace)"
 
-# ========== ✅ 新增：安装依赖 ==========
-{dependency_install_script}
+# ========== ✅ 新增：安装依赖（存在休眠快照时优先从快照恢复） ==========
+{build_venv_snapshot_restore_script(dependency_install_script)}
 
 # 6. 使用 gosu 切换到 sandbox 用户运行 executor
 # 通过 bash -c 在 gosu 之后设置环境变量
@@ -577,14 +587,87 @@ exec python -m executor.interfaces.http.rest
         container_id: str,
         force: bool = True
     ) -> None:
-        """删除容器"""
+        """删除容器（容器不存在视为已删除，其他错误抛出）"""
         docker = await self._ensure_docker()
         try:
             container = docker.containers.container(container_id)
             await container.delete(force=force)
             logger.info(f"Removed container {container_id}")
         except DockerError as e:
-            logger.warning(f"Failed to remove container {container_id}: {e}")
+            if e.status == 404:
+                logger.warning(f"Container {container_id} not found")
+                return
+            logger.error(f"Failed to remove container {container_id}: {e}")
+            raise
+
+    async def pause_container(self, container_id: str) -> None:
+        """暂停容器（docker pause，基于 cgroup freezer）"""
+        docker = await self._ensure_docker()
+        try:
+            container = docker.containers.container(container_id)
+            await container.pause()
+            logger.info(f"Paused container {container_id}")
+        except DockerError as e:
+            logger.error(f"Failed to pause container {container_id}: {e}")
+            raise
+
+    async def unpause_container(self, container_id: str) -> None:
+        """恢复已暂停的容器（docker unpause）"""
+        docker = await self._ensure_docker()
+        try:
+            container = docker.containers.container(container_id)
+            await container.unpause()
+            logger.info(f"Unpaused container {container_id}")
+        except DockerError as e:
+            logger.error(f"Failed to unpause container {container_id}: {e}")
+            raise
+
+    async def exec_command(
+        self,
+        container_id: str,
+        command: List[str],
+    ) -> ContainerResult:
+        """在容器内以 root 执行命令（docker exec）并收集输出"""
+        docker = await self._ensure_docker()
+        try:
+            container = docker.containers.container(container_id)
+            exec_instance = await container.exec(cmd=command, user="root")
+
+            stdout_chunks: List[bytes] = []
+            stderr_chunks: List[bytes] = []
+            async with exec_instance.start(detach=False) as stream:
+                while True:
+                    message = await stream.read_out()
+                    if message is None:
+                        break
+                    if message.stream == 2:
+                        stderr_chunks.append(message.data)
+                    else:
+                        stdout_chunks.append(message.data)
+
+            # 输出流关闭时 exec 进程可能尚未退出（ExitCode 仍为 None），轮询到 Running 为 false
+            inspect = await exec_instance.inspect()
+            for _ in range(EXEC_EXIT_POLL_ATTEMPTS):
+                if not inspect.get("Running"):
+                    break
+                await asyncio.sleep(EXEC_EXIT_POLL_INTERVAL_SECONDS)
+                inspect = await exec_instance.inspect()
+
+            exit_code = inspect.get("ExitCode")
+            if exit_code is None:
+                # 取不到退出码不能视为成功（依赖快照据此决定是否销毁容器）
+                logger.error(f"Exec in container {container_id} has no exit code: {inspect}")
+                exit_code = -1
+
+            return ContainerResult(
+                status="completed" if exit_code == 0 else "failed",
+                stdout=b"".join(stdout_chunks).decode("utf-8", errors="replace"),
+                stderr=b"".join(stderr_chunks).decode("utf-8", errors="replace"),
+                exit_code=exit_code,
+            )
+        except DockerError as e:
+            logger.error(f"Failed to exec in container {container_id}: {e}")
+            raise
 
     async def get_container_status(self, container_id: str) -> ContainerInfo:
         """获取容器状态"""
@@ -632,7 +715,8 @@ exec python -m executor.interfaces.http.rest
         """
         try:
             container_info = await self.get_container_status(container_id)
-            return container_info.status == "running"
+            # 空闲冻结的容器进程仍然存活，不应被当作异常容器恢复
+            return container_info.status in ("running", "paused")
         except Exception as e:
             logger.warning(f"Failed to check container {container_id} status: {e}")
             return False
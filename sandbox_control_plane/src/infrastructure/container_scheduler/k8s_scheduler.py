@@ -48,7 +48,11 @@ from src.infrastructure.container_scheduler.base import (
 )
 from src.infrastructure.config.settings import get_settings
 from src.infrastructure.logging import get_logger
-from src.shared.utils.dependencies import format_dependencies_for_script, format_dependency_install_script_for_shell
+from src.shared.utils.dependencies import (
+    build_venv_snapshot_restore_script,
+    format_dependencies_for_script,
+    format_dependency_install_script_for_shell,
+)
 
 logger = get_logger(__name__)
 
@@ -324,12 +328,13 @@ ls -la /workspace/
 
 """
 
-            # 如果有依赖，安装依赖
+            # 如果有依赖，安装依赖（存在休眠快照时优先从快照恢复）
+            pip_install_script = ""
             if has_dependencies:
                 dependencies_json = config.labels.get("dependencies", "")
                 dependencies = json.loads(dependencies_json) if dependencies_json else []
                 _, deps_list = format_dependencies_for_script(dependencies)
-                mount_script += f"""
+                pip_install_script = f"""
 echo "📦 Installing dependencies..."
 VENV_DIR="/opt/sandbox-venv"
 mkdir -p $VENV_DIR
@@ -347,6 +352,7 @@ echo "✅ Dependencies installed"
 export PYTHONPATH="$VENV_DIR:/app:/workspace"
 export SANDBOX_VENV_PATH="$VENV_DIR"
 """
+            mount_script += build_venv_snapshot_restore_script(pip_install_script)
 
             # 启动 executor (前台) - 使用 gosu 切换到 sandbox 用户
             mount_script += """
@@ -565,6 +571,7 @@ exec gosu sandbox python -m executor.interfaces.http.rest
         删除 Pod
 
         使用 s3fs 方式时，无需清理 PVC，s3fs 挂载在 Pod 删除时自动清理。
+        Pod 不存在视为已删除，其他错误抛出。
 
         Args:
             container_id: Pod 名称
@@ -583,8 +590,9 @@ exec gosu sandbox python -m executor.interfaces.http.rest
         except ApiException as e:
             if e.status == 404:
                 logger.warning(f"Pod {container_id} not found")
-            else:
-                logger.warning(f"Failed to remove pod {container_id}: {e}")
+                return
+            logger.error(f"Failed to remove pod {container_id}: {e}")
+            raise
 
     async def get_container_status(self, container_id: str) -> ContainerInfo:
         """
@@ -672,6 +680,70 @@ exec gosu sandbox python -m executor.interfaces.http.rest
             logger.warning(f"Failed to check pod {container_id} status: {e}")
             return False
 
+    async def pause_container(self, container_id: str) -> None:
+        """Pod 不支持冻结（supports_pause 为 False，调用方不会调用）"""
+        raise NotImplementedError("K8sScheduler does not support pausing pods")
+
+    async def unpause_container(self, container_id: str) -> None:
+        """Pod 不支持冻结（supports_pause 为 False，调用方不会调用）"""
+        raise NotImplementedError("K8sScheduler does not support unpausing pods")
+
+    async def exec_command(
+        self,
+        container_id: str,
+        command: List[str],
+    ) -> ContainerResult:
+        """
+        在 executor 容器内执行命令（kubectl exec）
+
+        Args:
+            container_id: Pod 名称
+            command: 命令参数列表
+
+        Returns:
+            ContainerResult 对象
+        """
+        await self._ensure_connected()
+
+        def _exec() -> ContainerResult:
+            from kubernetes.stream import stream
+
+            resp = stream(
+                self._core_v1.connect_get_namespaced_pod_exec,
+                container_id,
+                self._namespace,
+                container="executor",
+                command=command,
+                stderr=True,
+                stdin=False,
+                stdout=True,
+                tty=False,
+                _preload_content=False,
+            )
+            stdout_chunks: List[str] = []
+            stderr_chunks: List[str] = []
+            while resp.is_open():
+                resp.update(timeout=1)
+                if resp.peek_stdout():
+                    stdout_chunks.append(resp.read_stdout())
+                if resp.peek_stderr():
+                    stderr_chunks.append(resp.read_stderr())
+            resp.close()
+
+            exit_code = resp.returncode or 0
+            return ContainerResult(
+                status="completed" if exit_code == 0 else "failed",
+                stdout="".join(stdout_chunks),
+                stderr="".join(stderr_chunks),
+                exit_code=exit_code,
+            )
+
+        try:
+            return await asyncio.to_thread(_exec)
+        except ApiException as e:
+            logger.error(f"Failed to exec in pod {container_id}: {e}")
+            raise
+
     async def get_container_logs(
         self,
         container_id: str,
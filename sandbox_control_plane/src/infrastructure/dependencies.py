@@ -6,14 +6,16 @@
 import asyncio
 import os
 import time
+import uuid
 from functools import lru_cache
 
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Request
 from src.infrastructure.logging import get_logger
 
 from src.application.services.session_service import SessionService
 from src.application.services.template_service import TemplateService
 from src.application.services.file_service import FileService
+from src.application.services.workspace_manifest_service import WorkspaceManifestService
 
 from src.domain.repositories.session_repository import ISessionRepository
 from src.domain.repositories.execution_repository import IExecutionRepository
@@ -22,6 +24,7 @@ from src.domain.services.scheduler import IScheduler, RuntimeNode
 from src.domain.services.storage import IStorageService
 from src.domain.value_objects.execution_request import ExecutionRequest
 from src.domain.value_objects.execution_status import SessionStatus
+from src.domain.value_objects.row_count import RowCount
 
 from src.infrastructure.persistence.database import db_manager
 from src.infrastructure.executors import ExecutorClient
@@ -86,6 +89,15 @@ class MockSessionRepository(ISessionRepository):
     async def find_expired_sessions(self, threshold):
         return []
 
+    async def touch_last_activity(self, activity) -> int:
+        updated = 0
+        for session_id, last_activity_at in activity.items():
+            session = self._sessions.get(session_id)
+            if session:
+                session.last_activity_at = last_activity_at
+                updated += 1
+        return updated
+
     async def delete(self, session_id: str) -> None:
         if session_id in self._sessions:
             del self._sessions[session_id]
@@ -113,20 +125,42 @@ class MockExecutionRepository(IExecutionRepository):
         """Mock commit - no-op"""
         pass
 
-    async def find_by_id(self, execution_id: str):
+    async def find_by_id(self, execution_id: str, include_payload: bool = True):
         return self._executions.get(execution_id)
 
-    async def find_by_session_id(self, session_id: str, limit: int = 100):
+    async def find_by_session_id(self, session_id: str, limit: int = 100, after=None):
         return [e for e in self._executions.values() if e.session_id == session_id][:limit]
 
+    async def count_by_session_id(self, session_id: str, exact: bool = True) -> RowCount:
+        return RowCount(len([e for e in self._executions.values() if e.session_id == session_id]))
+
+    async def has_active_executions(self, session_id: str) -> bool:
+        return any(
+            e.session_id == session_id and not e.is_terminal() for e in self._executions.values()
+        )
+
     async def find_by_status(self, status: str, limit: int = 100):
         return [e for e in self._executions.values() if e.status == status][:limit]
 
     async def find_crashed_executions(self, max_retry_count: int):
         return []
 
-    async def find_heartbeat_timeouts(self, timeout_threshold):
-        return []
+    async def find_heartbeat_timeouts(self, timeout_threshold, limit: int = 500):
+        return [
+            e for e in self._executions.values()
+            if e.is_running() and e.last_heartbeat_at and e.last_heartbeat_at < timeout_threshold
+        ][:limit]
+
+    async def touch_heartbeats(self, heartbeats) -> int:
+        updated = 0
+        for execution_id, at in heartbeats.items():
+            execution = self._executions.get(execution_id)
+            if execution and execution.state.status.value in ("pending", "running"):
+                if execution.state.status.value == "pending":
+                    execution.mark_running()
+                execution.last_heartbeat_at = at
+                updated += 1
+        return updated
 
     async def delete(self, execution_id: str) -> None:
         if execution_id in self._executions:
@@ -140,6 +174,16 @@ class MockExecutionRepository(IExecutionRepository):
     async def count_by_status(self, status: str) -> int:
         return sum(1 for e in self._executions.values() if e.status == status)
 
+    async def find_archivable(self, created_before, limit: int = 500):
+        return []
+
+    async def mark_archived(self, archive_path: str, executions) -> None:
+        for execution in executions:
+            self._executions.pop(execution.id, None)
+
+    async def find_archive_path(self, execution_id: str):
+        return None
+
 
 class MockTemplateRepository(ITemplateRepository):
     """Mock 模板仓储（用于开发测试）"""
@@ -322,12 +366,33 @@ class MockStorageService(IStorageService):
     async def download_file(self, s3_path: str) -> bytes:
         return b""
 
+    async def create_multipart_upload(self, s3_path: str, content_type: str = "application/octet-stream") -> str:
+        return f"mock-upload-{uuid.uuid4().hex}"
+
+    async def upload_part(self, s3_path: str, upload_id: str, part_number: int, content: bytes) -> str:
+        return f"mock-etag-{part_number}"
+
+    async def list_parts(self, s3_path: str, upload_id: str):
+        return []
+
+    async def complete_multipart_upload(self, s3_path: str, upload_id: str, parts) -> None:
+        pass
+
+    async def abort_multipart_upload(self, s3_path: str, upload_id: str) -> None:
+        pass
+
     async def file_exists(self, s3_path: str) -> bool:
         return False
 
     async def get_file_info(self, s3_path: str):
         return {"size": 0, "content_type": "application/octet-stream"}
 
+    async def open_file_stream(self, s3_path: str, start=None, end=None, etag=None):
+        async def _empty():
+            return
+            yield
+        return _empty()
+
     async def generate_presigned_url(self, s3_path: str, expiration_seconds: int = 3600) -> str:
         return f"http://localhost:9000/{s3_path}?presigned=true"
 
@@ -337,7 +402,7 @@ class MockStorageService(IStorageService):
     async def list_files(self, prefix: str, limit: int = 1000):
         return []
 
-    async def delete_prefix(self, prefix: str) -> int:
+    async def delete_prefix(self, prefix: str, on_progress=None) -> int:
         return 0
 
 
@@ -473,34 +538,89 @@ async def get_db_session():
         yield session
 
 
+_READ_ONLY_METHODS = {"GET", "HEAD"}
+
+
+async def get_read_router(request: Request):
+    """
+    获取请求级读路由器（FastAPI 依赖）
+
+    只有 GET/HEAD 请求会分配从库会话；写请求中的读取（读-改-写）始终走主库。
+    """
+    from src.infrastructure.persistence.read_routing import ReadRouter
+
+    if request.method not in _READ_ONLY_METHODS:
+        yield ReadRouter(db_manager)
+        return
+
+    async with db_manager.get_read_session() as read_session:
+        yield ReadRouter(db_manager, read_session)
+
+
 def get_execution_repository(
-    session = Depends(get_db_session)
+    session = Depends(get_db_session),
+    read_router = Depends(get_read_router),
 ) -> IExecutionRepository:
     """获取执行仓储（SQL 或 Mock）"""
     if USE_SQL_REPOSITORIES:
         from src.infrastructure.persistence.repositories.sql_execution_repository import SqlExecutionRepository
-        return SqlExecutionRepository(session)
+        return SqlExecutionRepository(session, read_router=read_router)
     return MockExecutionRepository()
 
 
 def get_session_repository(
     session = Depends(get_db_session),
-    execution_repo: IExecutionRepository = Depends(get_execution_repository)
+    execution_repo: IExecutionRepository = Depends(get_execution_repository),
+    read_router = Depends(get_read_router),
 ) -> ISessionRepository:
     """获取会话仓储（SQL 或 Mock）"""
     if USE_SQL_REPOSITORIES:
         from src.infrastructure.persistence.repositories.sql_session_repository import SqlSessionRepository
-        return SqlSessionRepository(session, execution_repo)
+        return SqlSessionRepository(session, execution_repo, read_router=read_router)
     return MockSessionRepository()
 
 
+# Template cache singleton (shared by request-scoped repositories and the version check task)
+_template_cache_singleton = None
+
+
+def get_template_cache():
+    """
+    获取模板进程内缓存
+
+    模板缓存有效期配置为 -1 时返回 None（禁用缓存）。
+    """
+    global _template_cache_singleton
+
+    ttl_seconds = get_settings().template_cache_ttl_seconds
+    if ttl_seconds == -1:
+        return None
+
+    if _template_cache_singleton is None:
+        from src.infrastructure.persistence.template_cache import TemplateCache
+        _template_cache_singleton = TemplateCache(ttl_seconds=ttl_seconds)
+    return _template_cache_singleton
+
+
 def get_template_repository(
     session = Depends(get_db_session)
 ) -> ITemplateRepository:
-    """获取模板仓储（SQL 或 Mock）"""
+    """获取模板仓储（SQL 或 Mock；SQL 模式下按 ID 读取走进程内缓存）"""
     if USE_SQL_REPOSITORIES:
         from src.infrastructure.persistence.repositories.sql_template_repository import SqlTemplateRepository
-        return SqlTemplateRepository(session)
+        template_repo = SqlTemplateRepository(session)
+
+        template_cache = get_template_cache()
+        if template_cache is None:
+            return template_repo
+
+        from src.infrastructure.persistence.repositories.cached_template_repository import CachedTemplateRepository
+        from src.infrastructure.persistence.template_cache import TEMPLATE_CACHE_NAME, bump_cache_version
+        return CachedTemplateRepository(
+            template_repo,
+            cache=template_cache,
+            version_bumper=lambda: bump_cache_version(session, TEMPLATE_CACHE_NAME),
+        )
     return MockTemplateRepository()
 
 
@@ -617,9 +737,15 @@ def get_storage_service():
 
     # 直接使用 S3
     if settings.s3_access_key_id:
-        from src.infrastructure.storage.s3_storage import S3Storage
-        _storage_service_singleton = S3Storage()
-        logger.info(f"Using S3 storage: endpoint={settings.s3_endpoint_url}")
+        if settings.s3_client_backend == "async":
+            from src.infrastructure.storage.async_s3_storage import AsyncS3Storage
+            _storage_service_singleton = AsyncS3Storage()
+        else:
+            from src.infrastructure.storage.s3_storage import S3Storage
+            _storage_service_singleton = S3Storage()
+        logger.info(
+            f"Using S3 storage: endpoint={settings.s3_endpoint_url}, client={settings.s3_client_backend}"
+        )
         return _storage_service_singleton
 
     # 降级到 Mock
@@ -628,6 +754,260 @@ def get_storage_service():
     return _storage_service_singleton
 
 
+# Workspace deletion service singleton (background deletions outlive the request)
+_workspace_deletion_service_singleton = None
+
+
+def get_workspace_deletion_service():
+    """
+    获取 workspace 后台删除服务
+
+    未启用后台删除（workspace_delete_in_background=false）时返回 None，会话服务同步删除。
+    """
+    global _workspace_deletion_service_singleton
+
+    settings = get_settings()
+    if not settings.workspace_delete_in_background:
+        return None
+    if _workspace_deletion_service_singleton is not None:
+        return _workspace_deletion_service_singleton
+
+    from src.application.services.workspace_deletion_service import WorkspaceDeletionService
+
+    _workspace_deletion_service_singleton = WorkspaceDeletionService(
+        storage_service=get_storage_service(),
+        bucket=settings.s3_bucket,
+        max_concurrent=settings.workspace_delete_max_concurrent,
+        max_attempts=settings.session_teardown_max_attempts,
+        resume_after_seconds=max(600, settings.workspace_delete_resume_interval_seconds * 2),
+    )
+    return _workspace_deletion_service_singleton
+
+
+# Session activity buffer singleton (shared by request-scoped services and the flush task)
+_session_activity_buffer_singleton = None
+
+
+def get_session_activity_buffer():
+    """
+    获取会话活动时间写缓冲
+
+    执行与文件接口只记录到内存，由 session_activity_flush 后台任务批量写回。
+    """
+    global _session_activity_buffer_singleton
+
+    if _session_activity_buffer_singleton is not None:
+        return _session_activity_buffer_singleton
+
+    from src.infrastructure.persistence.repositories.sql_session_repository import SqlSessionRepository
+    from src.infrastructure.persistence.session_activity_buffer import SessionActivityBuffer
+
+    async def write_activity(activity) -> int:
+        async with db_manager.get_session() as session:
+            return await SqlSessionRepository(session).touch_last_activity(activity)
+
+    _session_activity_buffer_singleton = SessionActivityBuffer(
+        writer=write_activity,
+        max_batch=get_settings().session_activity_flush_batch_size,
+    )
+    return _session_activity_buffer_singleton
+
+
+# Execution heartbeat tracker singleton (shared by the heartbeat endpoint, the flush task and the detector)
+_execution_heartbeat_tracker_singleton = None
+
+
+def get_execution_heartbeat_tracker():
+    """
+    获取执行心跳跟踪器
+
+    心跳接口只记录到内存，由 execution_heartbeat_flush 后台任务批量写回。
+    """
+    global _execution_heartbeat_tracker_singleton
+
+    if _execution_heartbeat_tracker_singleton is not None:
+        return _execution_heartbeat_tracker_singleton
+
+    from src.infrastructure.persistence.execution_heartbeat_tracker import ExecutionHeartbeatTracker
+    from src.infrastructure.persistence.repositories.sql_execution_repository import SqlExecutionRepository
+
+    async def write_heartbeats(heartbeats) -> int:
+        async with db_manager.get_session() as session:
+            return await SqlExecutionRepository(session).touch_heartbeats(heartbeats)
+
+    settings = get_settings()
+    _execution_heartbeat_tracker_singleton = ExecutionHeartbeatTracker(
+        writer=write_heartbeats,
+        retention_seconds=max(300, settings.heartbeat_timeout_seconds * 4),
+    )
+    return _execution_heartbeat_tracker_singleton
+
+
+# Execution result ingestor singleton (shared by the callback endpoint, sync execution and lifespan)
+_execution_result_ingestor_singleton = None
+
+
+def get_execution_result_ingestor():
+    """
+    获取执行结果摄取队列
+
+    Executor 回调放入队列，由批处理循环合并为多行写入后统一提交。
+    """
+    global _execution_result_ingestor_singleton
+
+    if _execution_result_ingestor_singleton is not None:
+        return _execution_result_ingestor_singleton
+
+    from src.application.services.execution_result_service import ExecutionResultService
+    from src.infrastructure.messaging.execution_result_ingestor import ExecutionResultIngestor
+    from src.infrastructure.messaging.result_journal import ResultJournal
+    from src.infrastructure.persistence.repositories.sql_execution_repository import SqlExecutionRepository
+
+    from src.infrastructure.persistence.repositories.sql_workspace_manifest_repository import (
+        SqlWorkspaceManifestRepository,
+    )
+
+    manifest_enabled = get_settings().workspace_manifest_enabled
+
+    async def record_results(commands):
+        async with db_manager.get_session() as session:
+            return await ExecutionResultService(
+                SqlExecutionRepository(session),
+                manifest_repo=SqlWorkspaceManifestRepository(session) if manifest_enabled else None,
+            ).record_results(commands)
+
+    settings = get_settings()
+    journal_path = settings.execution_result_journal_path
+    _execution_result_ingestor_singleton = ExecutionResultIngestor(
+        processor=record_results,
+        journal=ResultJournal(journal_path) if journal_path else None,
+        linger_ms=settings.execution_result_linger_ms,
+        max_batch=settings.execution_result_batch_size,
+    )
+    return _execution_result_ingestor_singleton
+
+
+# Leader elector singleton (one holder id per process)
+_leader_elector_singleton = None
+
+
+def get_leader_elector():
+    """
+    获取后台任务主节点选举
+
+    未启用选举或使用 Mock 仓储时返回 None（所有进程都执行后台任务）。
+    """
+    global _leader_elector_singleton
+
+    settings = get_settings()
+    if not (USE_SQL_REPOSITORIES and settings.leader_election_enabled):
+        return None
+
+    if _leader_elector_singleton is not None:
+        return _leader_elector_singleton
+
+    from src.infrastructure.background_tasks.leader_election import LeaderElector, default_holder_id
+    from src.infrastructure.persistence.leader_lease import (
+        BACKGROUND_TASKS_LEASE,
+        release_lease,
+        try_acquire_lease,
+    )
+
+    holder_id = default_holder_id()
+    lease_seconds = settings.leader_lease_seconds
+
+    async def acquire() -> bool:
+        async with db_manager.get_session() as session:
+            acquired = await try_acquire_lease(session, BACKGROUND_TASKS_LEASE, holder_id, lease_seconds)
+            await session.commit()
+            return acquired
+
+    async def release() -> None:
+        async with db_manager.get_session() as session:
+            await release_lease(session, BACKGROUND_TASKS_LEASE, holder_id)
+            await session.commit()
+
+    _leader_elector_singleton = LeaderElector(
+        acquire=acquire,
+        release=release,
+        lease_seconds=lease_seconds,
+        holder_id=holder_id,
+    )
+    return _leader_elector_singleton
+
+
+# Execution dispatcher singleton (woken by the execute endpoint, started in lifespan)
+_execution_dispatcher_singleton = None
+
+
+def get_execution_dispatcher():
+    """
+    获取执行分发者
+
+    执行接口把执行写入分发队列后唤醒分发者，由分发者恢复容器并调用执行器。
+    """
+    global _execution_dispatcher_singleton
+
+    if _execution_dispatcher_singleton is not None:
+        return _execution_dispatcher_singleton
+
+    from src.application.services.execution_dispatch_service import ExecutionDispatchService
+    from src.infrastructure.messaging.execution_dispatcher import ExecutionDispatcher
+    from src.infrastructure.persistence.repositories.sql_execution_dispatch_repository import (
+        SqlExecutionDispatchRepository,
+    )
+    from src.infrastructure.persistence.repositories.sql_execution_repository import SqlExecutionRepository
+    from src.infrastructure.persistence.repositories.sql_session_repository import SqlSessionRepository
+
+    settings = get_settings()
+
+    async def dispatch_due():
+        async with db_manager.get_session() as session:
+            execution_repo = SqlExecutionRepository(session)
+            service = ExecutionDispatchService(
+                dispatch_repo=SqlExecutionDispatchRepository(session),
+                execution_repo=execution_repo,
+                session_repo=SqlSessionRepository(session, execution_repo),
+                scheduler=_create_scheduler_service(runtime_node_repo=None, template_repo=None),
+                max_attempts=settings.execution_dispatch_max_attempts,
+                retry_base_seconds=settings.execution_dispatch_retry_base_seconds,
+                retry_max_seconds=settings.execution_dispatch_retry_max_seconds,
+                lease_seconds=settings.execution_dispatch_lease_seconds,
+            )
+            return await service.dispatch_due(limit=settings.execution_dispatch_batch_size)
+
+    _execution_dispatcher_singleton = ExecutionDispatcher(
+        run_pass=dispatch_due,
+        workers=settings.execution_dispatch_workers,
+        poll_interval_ms=settings.execution_dispatch_poll_interval_ms,
+    )
+    return _execution_dispatcher_singleton
+
+
+def get_execution_dispatch_repository(
+    session = Depends(get_db_session)
+):
+    """获取执行分发队列仓储（仅 SQL 模式且启用分发队列时；否则返回 None，执行接口直接调用执行器）"""
+    if USE_SQL_REPOSITORIES and get_settings().execution_dispatch_queue_enabled:
+        from src.infrastructure.persistence.repositories.sql_execution_dispatch_repository import (
+            SqlExecutionDispatchRepository,
+        )
+        return SqlExecutionDispatchRepository(session)
+    return None
+
+
+def get_workspace_manifest_repository(
+    session = Depends(get_db_session)
+):
+    """获取 workspace 文件清单仓储（仅 SQL 模式且启用清单时；否则返回 None，文件列表直接查询对象存储）"""
+    if USE_SQL_REPOSITORIES and get_settings().workspace_manifest_enabled:
+        from src.infrastructure.persistence.repositories.sql_workspace_manifest_repository import (
+            SqlWorkspaceManifestRepository,
+        )
+        return SqlWorkspaceManifestRepository(session)
+    return None
+
+
 def get_executor_client() -> ExecutorClient:
     """获取 ExecutorClient。"""
     return ExecutorClient(
@@ -644,6 +1024,8 @@ def get_session_service_db(
     scheduler: IScheduler = Depends(get_docker_scheduler_service),
     storage_service = Depends(get_storage_service),
     executor_client: ExecutorClient = Depends(get_executor_client),
+    dispatch_repo = Depends(get_execution_dispatch_repository),
+    manifest_repo = Depends(get_workspace_manifest_repository),
 ) -> SessionService:
     """获取会话服务（使用数据库仓储和 Docker 调度器）"""
     return SessionService(
@@ -654,6 +1036,13 @@ def get_session_service_db(
         storage_service=storage_service,
         executor_client=executor_client,
         initial_dependency_sync_scheduler=get_initial_dependency_sync_scheduler(),
+        activity_recorder=get_session_activity_buffer().touch,
+        dispatch_repo=dispatch_repo,
+        dispatch_notifier=get_execution_dispatcher().notify if dispatch_repo else None,
+        workspace_deleter=get_workspace_deletion_service(),
+        workspace_manifest=(
+            WorkspaceManifestService(manifest_repo, storage_service) if manifest_repo else None
+        ),
     )
 
 
@@ -818,11 +1207,28 @@ def get_template_service_db(
 def get_file_service_db(
     session_repo: ISessionRepository = Depends(get_session_repository),
     storage_service = Depends(get_storage_service),
+    scheduler: IScheduler = Depends(get_docker_scheduler_service),
+    manifest_repo = Depends(get_workspace_manifest_repository),
 ) -> FileService:
     """获取文件服务（使用数据库仓储）"""
+    settings = get_settings()
     return FileService(
         session_repo=session_repo,
         storage_service=storage_service,
+        scheduler=scheduler,
+        activity_recorder=get_session_activity_buffer().touch,
+        idle_pause_minutes=settings.idle_pause_minutes,
+        max_upload_bytes=settings.file_upload_max_bytes,
+        part_size_bytes=settings.file_upload_part_size_bytes,
+        part_concurrency=settings.file_upload_part_concurrency,
+        presign_threshold_bytes=settings.file_download_presign_threshold_bytes,
+        manifest=WorkspaceManifestService(manifest_repo, storage_service) if manifest_repo else None,
+        archive_max_files=settings.file_archive_max_files,
+        archive_max_bytes=settings.file_archive_max_bytes,
+        archive_fetch_concurrency=settings.file_archive_fetch_concurrency,
+        archive_prefetch_bytes=settings.file_archive_prefetch_bytes,
+        extract_max_bytes=settings.file_archive_extract_max_bytes,
+        extract_concurrency=settings.file_archive_extract_concurrency,
     )
 
 
@@ -842,7 +1248,7 @@ def _create_direct_session_repository(db_mgr):
     from src.infrastructure.persistence.models.session_model import SessionModel
     from src.domain.entities.session import Session, SessionStatus
     from src.domain.value_objects.resource_limit import ResourceLimit
-    from sqlalchemy import select
+    from sqlalchemy import and_, or_, select
 
     class DirectSessionRepository:
         """直接使用数据库的仓储，用于状态同步"""
@@ -850,65 +1256,69 @@ def _create_direct_session_repository(db_mgr):
         def __init__(self, db_mgr):
             self._db_mgr = db_mgr
 
+        @staticmethod
+        def _to_entity(model):
+            return Session(
+                id=model.f_id,
+                template_id=model.f_template_id,
+                status=SessionStatus(model.f_status),
+                resource_limit=ResourceLimit(
+                    cpu=model.f_resources_cpu,
+                    memory=model.f_resources_memory,
+                    disk=model.f_resources_disk,
+                    max_processes=128,
+                ),
+                workspace_path=model.f_workspace_path,
+                runtime_type=model.f_runtime_type,
+                runtime_node=model.f_runtime_node or None,
+                container_id=model.f_container_id or None,
+                pod_name=model.f_pod_name or None,
+                env_vars=model._parse_json(model.f_env_vars) or {},
+                timeout=model.f_timeout,
+                created_at=model._millis_to_datetime(model.f_created_at) or datetime.now(),
+                updated_at=model._millis_to_datetime(model.f_updated_at) or datetime.now(),
+                last_activity_at=model._millis_to_datetime(model.f_last_activity_at) or datetime.now(),
+            )
+
         async def find_by_status(self, status: str, limit: int = 100):
             """直接查询数据库"""
-            result = []
             async with self._db_mgr.get_session() as session:
                 stmt = select(SessionModel).filter(
                     SessionModel.f_status == status
                 ).limit(limit)
                 models_result = await session.execute(stmt)
-                for model in models_result.scalars():
-                    session_entity = Session(
-                        id=model.f_id,
-                        template_id=model.f_template_id,
-                        status=SessionStatus(model.f_status),
-                        resource_limit=ResourceLimit(
-                            cpu=model.f_resources_cpu,
-                            memory=model.f_resources_memory,
-                            disk=model.f_resources_disk,
-                            max_processes=128,
-                        ),
-                        workspace_path=model.f_workspace_path,
-                        runtime_type=model.f_runtime_type,
-                        runtime_node=model.f_runtime_node or None,
-                        container_id=model.f_container_id or None,
-                        pod_name=model.f_pod_name or None,
-                        env_vars=model._parse_json(model.f_env_vars) or {},
-                        timeout=model.f_timeout,
-                        created_at=model._millis_to_datetime(model.f_created_at) or datetime.now(),
-                        updated_at=model._millis_to_datetime(model.f_updated_at) or datetime.now(),
-                        last_activity_at=model._millis_to_datetime(model.f_last_activity_at) or datetime.now(),
-                    )
-                    result.append(session_entity)
-            return result
+                return [self._to_entity(model) for model in models_result.scalars()]
+
+        async def iter_by_status(self, status: str, page_size: int = 500):
+            """按 (f_created_at, f_id) 键集分页遍历，每页使用独立的数据库会话"""
+            after = None
+            while True:
+                async with self._db_mgr.get_session() as session:
+                    stmt = select(SessionModel).filter(SessionModel.f_status == status)
+                    if after is not None:
+                        stmt = stmt.filter(
+                            or_(
+                                SessionModel.f_created_at > after[0],
+                                and_(SessionModel.f_created_at == after[0], SessionModel.f_id > after[1]),
+                            )
+                        )
+                    stmt = stmt.order_by(SessionModel.f_created_at, SessionModel.f_id).limit(page_size)
+                    models = (await session.execute(stmt)).scalars().all()
+                    page = [self._to_entity(model) for model in models]
+
+                if not models:
+                    return
+                after = (models[-1].f_created_at, models[-1].f_id)
+                yield page
+                if len(models) < page_size:
+                    return
 
         async def find_by_id(self, session_id: str):
             """通过 ID 查找"""
             async with self._db_mgr.get_session() as session:
                 model = await session.get(SessionModel, session_id)
                 if model:
-                    return Session(
-                        id=model.f_id,
-                        template_id=model.f_template_id,
-                        status=SessionStatus(model.f_status),
-                        resource_limit=ResourceLimit(
-                            cpu=model.f_resources_cpu,
-                            memory=model.f_resources_memory,
-                            disk=model.f_resources_disk,
-                            max_processes=128,
-                        ),
-                        workspace_path=model.f_workspace_path,
-                        runtime_type=model.f_runtime_type,
-                        runtime_node=model.f_runtime_node or None,
-                        container_id=model.f_container_id or None,
-                        pod_name=model.f_pod_name or None,
-                        env_vars=model._parse_json(model.f_env_vars) or {},
-                        timeout=model.f_timeout,
-                        created_at=model._millis_to_datetime(model.f_created_at) or datetime.now(),
-                        updated_at=model._millis_to_datetime(model.f_updated_at) or datetime.now(),
-                        last_activity_at=model._millis_to_datetime(model.f_last_activity_at) or datetime.now(),
-                    )
+                    return self._to_entity(model)
                 return None
 
         async def save(self, session):
@@ -1000,9 +1410,23 @@ def get_state_sync_service():
     else:
         control_plane_url = settings.control_plane_url
 
+    health_check_scheduler = None
+    if settings.health_check_adaptive_enabled:
+        from src.application.services.health_check_scheduler import HealthCheckScheduler
+
+        health_check_scheduler = HealthCheckScheduler(
+            base_interval_seconds=settings.health_check_base_interval_seconds,
+            min_interval_seconds=settings.health_check_min_interval_seconds,
+            max_interval_seconds=settings.health_check_max_interval_seconds,
+            max_checks_per_second=settings.health_check_max_per_second,
+            jitter_ratio=settings.health_check_jitter_ratio,
+            rescan_interval_seconds=settings.health_check_rescan_interval_seconds,
+        )
+
     return StateSyncService(
         session_repo=session_repo,
         container_scheduler=container_scheduler,
         scheduler=scheduler,
         control_plane_url=control_plane_url,
+        health_check_scheduler=health_check_scheduler,
     )
@@ -0,0 +1,120 @@
+"""
+执行分发者
+
+后台循环从持久化分发队列认领执行并投递到执行器。
+执行 API 入队后调用 notify() 唤醒本实例的分发者；
+其他副本入队的条目在下一次轮询时被认领（认领使用 SKIP LOCKED，多副本互不阻塞）。
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from src.infrastructure.logging import get_logger
+from src.infrastructure.metrics import (
+    EXECUTION_DISPATCH_LAG_SECONDS,
+    EXECUTION_DISPATCH_OLDEST_AGE_SECONDS,
+    EXECUTION_DISPATCH_QUEUE_DEPTH,
+    EXECUTION_DISPATCH_TOTAL,
+)
+
+logger = get_logger(__name__)
+
+# 分发一批：在新的数据库会话中调用 ExecutionDispatchService.dispatch_due，返回统计信息
+DispatchPass = Callable[[], Awaitable[Dict]]
+
+_OUTCOMES = ("delivered", "retried", "failed", "dropped")
+
+
+class ExecutionDispatcher:
+    """
+    执行分发者
+
+    - workers 个循环并发认领（每个循环一次认领一批，批内并发投递）
+    - 认领到条目时立即进入下一轮，队列排空后等待 notify() 或轮询间隔
+    - 单轮异常只记录日志，条目的租约到期后会被重新认领
+    """
+
+    def __init__(
+        self,
+        run_pass: DispatchPass,
+        workers: int = 2,
+        poll_interval_ms: int = 500,
+    ):
+        """
+        Args:
+            run_pass: 分发一批的函数
+            workers: 并发分发循环数
+            poll_interval_ms: 队列为空时的轮询间隔（毫秒）
+        """
+        self._run_pass = run_pass
+        self._workers = workers
+        self._poll_interval = poll_interval_ms / 1000
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        """启动分发循环"""
+        if self._tasks:
+            return
+
+        self._stopping = False
+        self._tasks = [
+            asyncio.create_task(self._run(index)) for index in range(self._workers)
+        ]
+        logger.info("Execution dispatcher started", workers=self._workers)
+
+    async def stop(self) -> None:
+        """停止分发循环（正在进行的一轮会完成，未分发的条目留在队列中）"""
+        if not self._tasks:
+            return
+
+        self._stopping = True
+        self._wakeup.set()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Execution dispatcher stopped")
+
+    def notify(self) -> None:
+        """有新条目入队，唤醒等待中的分发循环"""
+        self._wakeup.set()
+
+    async def _run(self, index: int) -> None:
+        while not self._stopping:
+            # 先清除再认领：认领期间到达的 notify() 不会丢失
+            self._wakeup.clear()
+            claimed = 0
+            try:
+                stats = await self._run_pass()
+                claimed = stats.get("claimed", 0)
+                self._observe(stats)
+            except Exception as e:
+                logger.error("Execution dispatch pass failed", worker=index, error=str(e))
+
+            if claimed or self._stopping:
+                continue
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    @staticmethod
+    def _observe(stats: Dict) -> None:
+        for outcome in _OUTCOMES:
+            if stats.get(outcome):
+                EXECUTION_DISPATCH_TOTAL.labels(outcome=outcome).inc(stats[outcome])
+        for lag in stats.get("lag_seconds", []):
+            EXECUTION_DISPATCH_LAG_SECONDS.observe(lag)
+
+
+def record_queue_stats(stats: Dict, now: Optional[float] = None) -> None:
+    """把队列统计写入指标（由后台任务周期性调用）"""
+    EXECUTION_DISPATCH_QUEUE_DEPTH.set(stats.get("depth", 0))
+    oldest = stats.get("oldest_enqueued_at")
+    now = time.time() if now is None else now
+    EXECUTION_DISPATCH_OLDEST_AGE_SECONDS.set(max(0.0, now - oldest.timestamp()) if oldest else 0)
@@ -0,0 +1,307 @@
+"""
+执行结果摄取队列
+
+Executor 回调只把结果放入内存队列（配置了结果日志时先落盘），
+后台循环每隔几毫秒把积压的结果合并为一批：一次查询、一次多行写入、一次提交。
+一批执行同时结束时，回调不再各自占用一个数据库连接。
+"""
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from src.application.commands.report_execution_result import ReportExecutionResultCommand
+from src.application.services.execution_result_service import ResultOutcome
+from src.infrastructure.logging import get_logger
+from src.infrastructure.messaging.result_journal import ResultJournal
+from src.infrastructure.metrics import (
+    EXECUTION_RESULT_BATCH_SIZE,
+    EXECUTION_RESULT_FLUSH_FAILURES_TOTAL,
+    EXECUTION_RESULT_FLUSH_SECONDS,
+    EXECUTION_RESULT_QUEUE_DEPTH,
+)
+
+logger = get_logger(__name__)
+
+# 批处理函数：应用并提交一批结果，返回与输入一一对应的处理结果
+ResultProcessor = Callable[[List[ReportExecutionResultCommand]], Awaitable[List[ResultOutcome]]]
+
+
+@dataclass
+class _PendingResult:
+    command: ReportExecutionResultCommand
+    # 未使用结果日志时，回调请求等待该 future 得到处理结果
+    future: Optional[asyncio.Future] = None
+    # 结果日志中的记录序号（已落盘，处理成功后才从日志移除）
+    seq: Optional[int] = None
+    attempts: int = 0
+
+
+class ExecutionResultIngestor:
+    """
+    执行结果摄取队列
+
+    - 配置了结果日志：submit() 落盘后立即返回 None（接口返回 202），
+      提交失败的结果按 retry_delay_seconds 重试，最多 max_attempts 次，
+      仍失败时写入结果日志的死信文件后放弃
+    - 未配置结果日志：submit() 等待所在批次提交后返回处理结果（接口返回 201/200）
+    - 批次提交后唤醒 wait_for_result() 的等待者（同步执行接口据此提前结束轮询）
+    - stop() 之后（关闭期间）到达的结果不再入队，直接单条处理并返回处理结果
+
+    一批写入失败时退化为逐条处理，避免单条异常结果拖垮整批。
+    """
+
+    def __init__(
+        self,
+        processor: ResultProcessor,
+        journal: Optional[ResultJournal] = None,
+        linger_ms: int = 5,
+        max_batch: int = 200,
+        retry_delay_seconds: float = 1.0,
+        max_attempts: int = 5,
+        journal_compact_bytes: int = 8 * 1024 * 1024,
+    ):
+        """
+        Args:
+            processor: 批处理函数（通常在新的数据库会话中调用 ExecutionResultService）
+            journal: 结果日志，None 表示回调等待提交
+            linger_ms: 收到第一条结果后等待更多结果加入同一批的时间
+            max_batch: 单批最多包含的结果数
+            retry_delay_seconds: 已落盘结果提交失败后的重试间隔
+            max_attempts: 已落盘结果的最大尝试次数
+            journal_compact_bytes: 日志超过该大小时按未提交结果重写
+        """
+        self._processor = processor
+        self._journal = journal
+        self._linger = linger_ms / 1000
+        self._max_batch = max_batch
+        self._retry_delay = retry_delay_seconds
+        self._max_attempts = max_attempts
+        self._journal_compact_bytes = journal_compact_bytes
+
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        # stop() 已开始：批处理循环即将退出，新结果改为直接处理
+        self._stopped = False
+        self._seq = itertools.count()
+        # 已落盘但尚未提交的记录（日志压缩时保留）
+        self._journaled: Dict[int, dict] = {}
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+
+    @property
+    def durable(self) -> bool:
+        """submit() 返回前结果是否已落盘"""
+        return self._journal is not None
+
+    @property
+    def pending_count(self) -> int:
+        """已接收但尚未提交的结果数"""
+        return self._queue.qsize()
+
+    async def start(self) -> None:
+        """重放结果日志并启动批处理循环"""
+        if self._task is not None:
+            return
+        self._stopped = False
+
+        if self._journal:
+            replayed = 0
+            for record in self._journal.replay():
+                try:
+                    command = ReportExecutionResultCommand.from_dict(record)
+                except (TypeError, ValueError) as e:
+                    logger.warning("Skipping invalid result journal record", error=str(e))
+                    continue
+                seq = next(self._seq)
+                self._journaled[seq] = record
+                self._enqueue(_PendingResult(command=command, seq=seq))
+                replayed += 1
+            if replayed:
+                logger.info("Replaying execution result journal", results=replayed)
+
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """处理完队列中已有的结果后停止"""
+        if self._task is None:
+            return
+
+        # 先置位再放入结束标记：之后提交的结果不会排在标记之后无人处理
+        self._stopped = True
+        self._queue.put_nowait(None)
+        await self._task
+        self._task = None
+        if self._journal:
+            self._journal.close()
+
+    async def submit(self, command: ReportExecutionResultCommand) -> Optional[ResultOutcome]:
+        """
+        提交执行结果
+
+        Returns:
+            配置了结果日志时返回 None（已落盘，稍后提交）；否则返回提交后的处理结果。
+            已停止时直接处理，返回处理结果
+        """
+        if self._stopped:
+            return await self._process_inline(command)
+
+        if self._journal:
+            seq = next(self._seq)
+            record = command.to_dict()
+            # 先登记再落盘：落盘期间发生的日志压缩也会保留这条记录
+            self._journaled[seq] = record
+            try:
+                await self._journal.append(record)
+            except Exception:
+                self._journaled.pop(seq, None)
+                raise
+            self._enqueue(_PendingResult(command=command, seq=seq))
+            return None
+
+        future = asyncio.get_running_loop().create_future()
+        self._enqueue(_PendingResult(command=command, future=future))
+        return await future
+
+    async def _process_inline(self, command: ReportExecutionResultCommand) -> ResultOutcome:
+        """批处理循环已停止：单条处理并提交，失败时异常抛给回调请求"""
+        logger.info(
+            "Execution result ingestor stopped, processing result inline",
+            execution_id=command.execution_id,
+        )
+        outcomes = await self._processor([command])
+        self.notify({command.execution_id})
+        return outcomes[0]
+
+    async def wait_for_result(self, execution_id: str, timeout: float) -> bool:
+        """
+        等待执行结果提交
+
+        Returns:
+            timeout 内有该执行的结果提交时返回 True
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(execution_id, []).append(future)
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            waiters = self._waiters.get(execution_id)
+            if waiters and future in waiters:
+                waiters.remove(future)
+                if not waiters:
+                    del self._waiters[execution_id]
+
+    def notify(self, execution_ids) -> None:
+        """唤醒等待这些执行结果的同步请求（结果由批处理以外的途径写入时也需调用）"""
+        for execution_id in execution_ids:
+            for future in self._waiters.pop(execution_id, []):
+                if not future.done():
+                    future.set_result(None)
+
+    def _enqueue(self, item: _PendingResult) -> None:
+        self._queue.put_nowait(item)
+        EXECUTION_RESULT_QUEUE_DEPTH.set(self._queue.qsize())
+
+    async def _run(self) -> None:
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+
+            # 等待 linger 时间，让同时到达的结果进入同一批
+            await asyncio.sleep(self._linger)
+            batch = [item]
+            stopping = False
+            while len(batch) < self._max_batch and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            EXECUTION_RESULT_QUEUE_DEPTH.set(self._queue.qsize())
+
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                logger.error("Execution result batch crashed", results=len(batch), error=str(e))
+
+            if stopping:
+                return
+
+    async def _flush(self, batch: List[_PendingResult]) -> None:
+        start = time.perf_counter()
+        try:
+            outcomes = await self._processor([item.command for item in batch])
+        except Exception as e:
+            EXECUTION_RESULT_FLUSH_FAILURES_TOTAL.inc()
+            logger.warning("Failed to commit execution results", results=len(batch), error=str(e))
+            if len(batch) > 1:
+                for item in batch:
+                    await self._flush([item])
+            else:
+                await self._fail(batch[0], e)
+            return
+        finally:
+            EXECUTION_RESULT_FLUSH_SECONDS.observe(time.perf_counter() - start)
+
+        EXECUTION_RESULT_BATCH_SIZE.observe(len(batch))
+        for item, outcome in zip(batch, outcomes, strict=True):
+            if outcome in (ResultOutcome.NOT_FOUND, ResultOutcome.CONFLICT):
+                logger.warning(
+                    "Execution result rejected",
+                    execution_id=item.command.execution_id,
+                    outcome=outcome.value,
+                )
+            if item.future and not item.future.done():
+                item.future.set_result(outcome)
+            if item.seq is not None:
+                self._journaled.pop(item.seq, None)
+
+        self.notify({item.command.execution_id for item in batch})
+        await self._compact_journal()
+
+    async def _fail(self, item: _PendingResult, error: Exception) -> None:
+        if item.future:
+            if not item.future.done():
+                item.future.set_exception(error)
+            return
+
+        item.attempts += 1
+        if item.attempts >= self._max_attempts:
+            logger.error(
+                "Dropping execution result after repeated failures",
+                execution_id=item.command.execution_id,
+                attempts=item.attempts,
+                error=str(error),
+            )
+            record = self._journaled.pop(item.seq, None)
+            try:
+                await self._journal.dead_letter(
+                    record if record is not None else item.command.to_dict(),
+                    error=str(error),
+                    attempts=item.attempts,
+                )
+            except Exception as e:
+                logger.error(
+                    "Failed to dead-letter execution result",
+                    execution_id=item.command.execution_id,
+                    error=str(e),
+                )
+            return
+
+        asyncio.get_running_loop().call_later(self._retry_delay, self._enqueue, item)
+
+    async def _compact_journal(self) -> None:
+        """日志中的记录都已提交时清空；日志过大时只保留未提交的记录"""
+        if not self._journal:
+            return
+
+        size = self._journal.size()
+        if (not self._journaled and size) or size > self._journal_compact_bytes:
+            try:
+                await self._journal.rewrite(self._journaled.values())
+            except Exception as e:
+                logger.warning("Failed to compact execution result journal", error=str(e))
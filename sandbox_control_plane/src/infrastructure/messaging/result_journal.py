@@ -0,0 +1,204 @@
+"""
+执行结果日志
+
+追加写入的本地 JSONL 文件，回调接口在返回 202 之前把结果写入并 fsync，
+进程重启后重放尚未提交到数据库的结果。
+
+多个 worker 进程可以配置同一个路径：每个进程用文件锁独占一个槽位文件
+（第一个为配置的路径本身，其余为 <路径>.1、<路径>.2 ...），互不覆盖。
+进程退出后锁随之释放，重启的进程重新占用槽位并重放其中的记录；
+worker 数减少后无人占用的槽位由占用槽位的进程并入自己的日志。
+"""
+import asyncio
+import fcntl
+import json
+import os
+import re
+import time
+from itertools import count
+from pathlib import Path
+from typing import IO, Iterable, List, Optional, Tuple
+
+from src.infrastructure.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class ResultJournal:
+    """
+    执行结果日志
+
+    - append() 组提交：并发追加的记录合并为一次 write + fsync
+    - rewrite() 用仍未提交的记录原子替换日志文件（为空时即清空）
+    - replay() 启动时读取全部记录；末尾写了一半的行被忽略
+    - dead_letter() 把放弃提交的记录追加到 <槽位>.dead，供人工排查与补录
+
+    首次访问时占用槽位（见模块说明），close() 释放。
+    重放的记录可能已经提交过，依赖结果处理的幂等性（终态不再写入）。
+    """
+
+    def __init__(self, path: str):
+        self._base = Path(path)
+        self._path: Optional[Path] = None
+        self._lock_file: Optional[IO] = None
+        self._lock = asyncio.Lock()
+        self._buffer: List[Tuple[bytes, asyncio.Future]] = []
+        self._writer: Optional[asyncio.Task] = None
+
+    @property
+    def path(self) -> Path:
+        """本进程占用的槽位文件"""
+        if self._path is None:
+            self._claim()
+        return self._path
+
+    def size(self) -> int:
+        """日志文件大小（字节）"""
+        try:
+            return self.path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    async def append(self, record: dict) -> None:
+        """追加一条记录，返回时已落盘"""
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        future = asyncio.get_running_loop().create_future()
+        self._buffer.append((line, future))
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_pending())
+        await future
+
+    async def rewrite(self, records: Iterable[dict]) -> None:
+        """
+        用 records 原子替换日志内容
+
+        records 在持有写锁之后才读取（可传入字典的 values 视图），
+        保证替换时不会丢掉已落盘但尚未提交的记录。
+        """
+        async with self._lock:
+            data = b"".join(
+                (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+                for record in list(records)
+            )
+            await asyncio.to_thread(self._replace, data)
+
+    def replay(self) -> List[dict]:
+        """读取日志中的全部记录"""
+        path = self.path
+        if not path.exists():
+            return []
+
+        records = []
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    logger.warning("Skipping corrupt result journal line", path=str(path))
+        return records
+
+    async def dead_letter(self, record: dict, error: str, attempts: int) -> None:
+        """记录放弃提交的结果（追加到 <槽位>.dead 并 fsync）"""
+        entry = {
+            "dropped_at": int(time.time() * 1000),
+            "attempts": attempts,
+            "error": error,
+            "record": record,
+        }
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        dead_letter_path = self.path.with_name(self.path.name + ".dead")
+        await asyncio.to_thread(self._append_to, dead_letter_path, line)
+
+    def close(self) -> None:
+        """释放槽位，之后再次访问会重新占用"""
+        if self._lock_file is not None:
+            self._lock_file.close()
+        self._lock_file = None
+        self._path = None
+
+    def _claim(self) -> None:
+        """占用第一个未被锁定的槽位，并把无人占用的其他槽位并入"""
+        self._base.parent.mkdir(parents=True, exist_ok=True)
+        for index in count():
+            slot = self._slot_path(index)
+            lock_file = self._try_lock(slot)
+            if lock_file is not None:
+                self._path, self._lock_file = slot, lock_file
+                break
+
+        self._adopt_orphans()
+        logger.info("Claimed execution result journal", path=str(self._path))
+
+    def _adopt_orphans(self) -> None:
+        pattern = re.compile(re.escape(self._base.name) + r"(\.\d+)?")
+        for candidate in sorted(self._base.parent.glob(self._base.name + "*")):
+            if candidate == self._path or not pattern.fullmatch(candidate.name):
+                continue
+            lock_file = self._try_lock(candidate)
+            if lock_file is None:
+                continue
+            try:
+                data = candidate.read_bytes() if candidate.exists() else b""
+                if data:
+                    if not data.endswith(b"\n"):
+                        # 写了一半的末行单独成行，重放时作为损坏行跳过
+                        data += b"\n"
+                    self._append_to(self._path, data)
+                    logger.info(
+                        "Adopted orphaned execution result journal",
+                        path=str(candidate),
+                        bytes=len(data),
+                    )
+                candidate.unlink(missing_ok=True)
+            finally:
+                lock_file.close()
+
+    def _slot_path(self, index: int) -> Path:
+        return self._base if index == 0 else self._base.with_name(f"{self._base.name}.{index}")
+
+    @staticmethod
+    def _try_lock(slot: Path) -> Optional[IO]:
+        """非阻塞获取槽位的文件锁，已被其他进程（或本进程其他实例）持有时返回 None"""
+        lock_file = open(slot.with_name(slot.name + ".lock"), "a")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return None
+        return lock_file
+
+    async def _write_pending(self) -> None:
+        async with self._lock:
+            while self._buffer:
+                pending, self._buffer = self._buffer, []
+                try:
+                    await asyncio.to_thread(self._append, b"".join(line for line, _ in pending))
+                except Exception as e:
+                    for _, future in pending:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                for _, future in pending:
+                    if not future.done():
+                        future.set_result(None)
+
+    def _append(self, data: bytes) -> None:
+        self._append_to(self.path, data)
+
+    @staticmethod
+    def _append_to(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "ab") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _replace(self, data: bytes) -> None:
+        path = self.path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
@@ -0,0 +1,174 @@
+"""
+Prometheus 指标
+
+集中定义控制平面暴露的运行指标，通过 /metrics 端点导出。
+"""
+from prometheus_client import Counter, Gauge, Histogram
+
+# ============== 容器空闲冻结 ==============
+CONTAINER_PAUSE_TOTAL = Counter(
+    "sandbox_container_pause_total",
+    "Number of idle session containers paused",
+)
+
+CONTAINER_UNPAUSE_SECONDS = Histogram(
+    "sandbox_container_unpause_seconds",
+    "Latency of resuming a paused session container before dispatch",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+# ============== 会话活动时间写缓冲 ==============
+SESSION_ACTIVITY_FLUSH_TOTAL = Counter(
+    "sandbox_session_activity_flush_total",
+    "Number of bulk last-activity UPDATE statements issued",
+)
+
+SESSION_ACTIVITY_FLUSHED_SESSIONS_TOTAL = Counter(
+    "sandbox_session_activity_flushed_sessions_total",
+    "Number of session last-activity timestamps written back",
+)
+
+SESSION_ACTIVITY_FLUSH_SECONDS = Histogram(
+    "sandbox_session_activity_flush_seconds",
+    "Latency of one bulk last-activity UPDATE",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+SESSION_ACTIVITY_PENDING = Gauge(
+    "sandbox_session_activity_pending",
+    "Sessions with buffered activity not yet written back",
+)
+
+# ============== 执行心跳 ==============
+EXECUTION_HEARTBEATS_TOTAL = Counter(
+    "sandbox_execution_heartbeats_total",
+    "Number of execution heartbeats received",
+)
+
+EXECUTION_HEARTBEAT_FLUSH_SECONDS = Histogram(
+    "sandbox_execution_heartbeat_flush_seconds",
+    "Latency of one bulk last-heartbeat UPDATE",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+EXECUTION_HEARTBEAT_PENDING = Gauge(
+    "sandbox_execution_heartbeat_pending",
+    "Executions with buffered heartbeats not yet written back",
+)
+
+EXECUTION_STALLED_TOTAL = Counter(
+    "sandbox_execution_stalled_total",
+    "Number of executions marked crashed after their heartbeats stopped",
+)
+
+# ============== 执行结果摄取队列 ==============
+EXECUTION_RESULT_BATCH_SIZE = Histogram(
+    "sandbox_execution_result_batch_size",
+    "Number of executor result callbacks written in one batch",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 200, 500),
+)
+
+EXECUTION_RESULT_FLUSH_SECONDS = Histogram(
+    "sandbox_execution_result_flush_seconds",
+    "Latency of applying and committing one batch of execution results",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+EXECUTION_RESULT_FLUSH_FAILURES_TOTAL = Counter(
+    "sandbox_execution_result_flush_failures_total",
+    "Number of execution result batches that failed to commit",
+)
+
+EXECUTION_RESULT_QUEUE_DEPTH = Gauge(
+    "sandbox_execution_result_queue_depth",
+    "Execution results accepted but not yet committed",
+)
+
+# ============== 模板缓存 ==============
+TEMPLATE_CACHE_HITS_TOTAL = Counter(
+    "sandbox_template_cache_hits_total",
+    "Template lookups served from the in-process cache",
+)
+
+TEMPLATE_CACHE_MISSES_TOTAL = Counter(
+    "sandbox_template_cache_misses_total",
+    "Template lookups that fell through to the database",
+)
+
+TEMPLATE_CACHE_INVALIDATIONS_TOTAL = Counter(
+    "sandbox_template_cache_invalidations_total",
+    "Template cache invalidations",
+    ["reason"],
+)
+
+TEMPLATE_CACHE_SIZE = Gauge(
+    "sandbox_template_cache_size",
+    "Templates currently held in the in-process cache",
+)
+
+# ============== 执行分发队列 ==============
+EXECUTION_DISPATCH_TOTAL = Counter(
+    "sandbox_execution_dispatch_total",
+    "Execution dispatch attempts by outcome",
+    ["outcome"],
+)
+
+EXECUTION_DISPATCH_LAG_SECONDS = Histogram(
+    "sandbox_execution_dispatch_lag_seconds",
+    "Time from enqueue to successful delivery to the executor",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+
+EXECUTION_DISPATCH_QUEUE_DEPTH = Gauge(
+    "sandbox_execution_dispatch_queue_depth",
+    "Executions waiting in the dispatch queue (including claimed)",
+)
+
+EXECUTION_DISPATCH_OLDEST_AGE_SECONDS = Gauge(
+    "sandbox_execution_dispatch_oldest_age_seconds",
+    "Age of the oldest entry in the dispatch queue",
+)
+
+# ============== 后台任务主节点选举 ==============
+BACKGROUND_TASK_LEADER = Gauge(
+    "sandbox_background_task_leader",
+    "1 if this process holds the background task lease, else 0",
+)
+
+BACKGROUND_TASK_LEADER_TRANSITIONS_TOTAL = Counter(
+    "sandbox_background_task_leader_transitions_total",
+    "Background task lease acquisitions and losses",
+    ["transition"],
+)
+
+# ============== 后台任务 ==============
+BACKGROUND_TASK_DURATION_SECONDS = Histogram(
+    "sandbox_background_task_duration_seconds",
+    "Duration of one background task run",
+    labelnames=("task",),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+
+BACKGROUND_TASK_RUNS_TOTAL = Counter(
+    "sandbox_background_task_runs_total",
+    "Number of background task runs by outcome",
+    labelnames=("task", "outcome"),
+)
+
+BACKGROUND_TASK_OVERRUNS_TOTAL = Counter(
+    "sandbox_background_task_overruns_total",
+    "Number of background task runs that took longer than the task interval",
+    labelnames=("task",),
+)
+
+BACKGROUND_TASK_SKIPPED_RUNS_TOTAL = Counter(
+    "sandbox_background_task_skipped_runs_total",
+    "Number of scheduled background task runs dropped because the previous run overran",
+    labelnames=("task",),
+)
+
+BACKGROUND_TASK_LAG_SECONDS = Gauge(
+    "sandbox_background_task_lag_seconds",
+    "Delay between the scheduled and actual start of the latest background task run",
+    labelnames=("task",),
+)
@@ -3,8 +3,9 @@
 
 配置和管理 SQLAlchemy 异步引擎和会话。
 """
+import time
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Dict, Optional
 from urllib.parse import urlparse
 
 import aiomysql
@@ -30,7 +31,16 @@ logger = get_logger(__name__)
 from src.infrastructure.persistence.models.template_model import TemplateModel
 from src.infrastructure.persistence.models.session_model import SessionModel
 from src.infrastructure.persistence.models.execution_model import ExecutionModel
+from src.infrastructure.persistence.models.execution_payload_model import ExecutionPayloadModel
+from src.infrastructure.persistence.models.execution_archive_model import ExecutionArchiveModel
+from src.infrastructure.persistence.models.execution_dispatch_model import ExecutionDispatchModel
 from src.infrastructure.persistence.models.runtime_node_model import RuntimeNodeModel
+from src.infrastructure.persistence.models.cache_version_model import CacheVersionModel
+from src.infrastructure.persistence.models.leader_lease_model import LeaderLeaseModel
+from src.infrastructure.persistence.models.workspace_manifest_model import (
+    WorkspaceFileModel,
+    WorkspaceManifestModel,
+)
 
 
 class DatabaseManager:
@@ -43,6 +53,14 @@ class DatabaseManager:
     def __init__(self):
         self._engine: AsyncEngine | None = None
         self._session_factory: async_sessionmaker[AsyncSession] | None = None
+        # 读写分离：从库引擎与会话工厂（未配置从库时为 None）
+        self._read_engine: AsyncEngine | None = None
+        self._read_session_factory: async_sessionmaker[AsyncSession] | None = None
+        self._replica_healthy = False
+        # 资源 ID -> 最近一次写入时间（monotonic），用于读己之写；只记录本进程的写入
+        self._recent_writes: Dict[str, float] = {}
+        self._read_sticky_seconds = 0.0
+        self._replica_serves_lists = False
 
     async def ensure_database_exists(self) -> None:
         """
@@ -117,6 +135,146 @@ class DatabaseManager:
             expire_on_commit=False,
         )
 
+        read_url = settings.effective_read_database_url
+        if read_url:
+            read_pool_size = settings.db_max_read_connections or settings.db_pool_size
+            self._read_engine = create_async_engine(
+                read_url,
+                echo=settings.log_level == "DEBUG",
+                pool_size=read_pool_size,
+                max_overflow=settings.db_max_overflow,
+                pool_recycle=settings.db_pool_recycle,
+            )
+            self._read_session_factory = async_sessionmaker(
+                bind=self._read_engine,
+                class_=AsyncSession,
+                expire_on_commit=False,
+            )
+            self._replica_healthy = True
+            self._read_sticky_seconds = settings.db_read_sticky_seconds
+            self._replica_serves_lists = settings.db_read_replica_lists
+            logger.info(
+                "Read replica engine initialized",
+                host=settings.db_host_read,
+                pool_size=read_pool_size,
+            )
+
+    # ============== 读写分离 ==============
+
+    @property
+    def has_read_replica(self) -> bool:
+        """是否配置了从库"""
+        return self._read_session_factory is not None
+
+    @property
+    def replica_available(self) -> bool:
+        """从库是否可用于读请求"""
+        return self.has_read_replica and self._replica_healthy
+
+    @property
+    def replica_serves_lists(self) -> bool:
+        """列表与分页查询是否可以走从库（没有按 ID 的读己之写保证）"""
+        return self._replica_serves_lists
+
+    def mark_replica_unavailable(self, reason: str) -> None:
+        """标记从库不可用，读请求回退主库，直到下一次健康检查通过"""
+        if self._replica_healthy:
+            logger.warning("Read replica marked unavailable, falling back to primary", reason=reason)
+        self._replica_healthy = False
+
+    async def check_replica_health(self, max_lag_seconds: int) -> bool:
+        """
+        检查从库连通性与复制延迟
+
+        Args:
+            max_lag_seconds: 允许的最大复制延迟（秒）
+
+        Returns:
+            从库是否可用
+        """
+        if self._read_engine is None:
+            return False
+
+        try:
+            async with self._read_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                lag = await self._replica_lag_seconds(conn)
+        except Exception as e:
+            self.mark_replica_unavailable(f"health check failed: {e}")
+            return False
+
+        if lag is not None and lag > max_lag_seconds:
+            self.mark_replica_unavailable(f"replication lag {lag}s exceeds {max_lag_seconds}s")
+            return False
+
+        if not self._replica_healthy:
+            logger.info("Read replica recovered", lag_seconds=lag)
+        self._replica_healthy = True
+        return True
+
+    async def _replica_lag_seconds(self, conn) -> Optional[float]:
+        """
+        读取从库复制延迟
+
+        非 MariaDB/MySQL 或未开启复制（如读代理）时返回 None；
+        复制线程已停止时 Seconds_Behind_Master 为 NULL，视为无限延迟。
+        """
+        if self._read_engine.url.get_backend_name() != "mysql":
+            return None
+
+        result = await conn.execute(text("SHOW SLAVE STATUS"))
+        row = result.mappings().first()
+        if row is None:
+            return None
+        lag = row.get("Seconds_Behind_Master")
+        return float("inf") if lag is None else float(lag)
+
+    def note_write(self, *keys: str) -> None:
+        """
+        记录资源写入时间，窗口内对这些资源的读请求走主库
+
+        写入记录保存在进程内存中，只覆盖本进程的写入。写请求与随后的读请求
+        落到不同进程时，按 ID 的查找由 ReadRouter.fetch_by_id 在从库未命中后
+        回主库重查，保证刚创建的资源可见。
+        """
+        if not self.has_read_replica:
+            return
+        now = time.monotonic()
+        for key in keys:
+            if key:
+                self._recent_writes[key] = now
+        # 顺带清理过期条目，避免字典无限增长
+        if len(self._recent_writes) > 10000:
+            expire_before = now - self._read_sticky_seconds
+            self._recent_writes = {
+                k: t for k, t in self._recent_writes.items() if t >= expire_before
+            }
+
+    def is_recently_written(self, key: Optional[str]) -> bool:
+        """资源是否在读己之写窗口内被本进程写过（其他进程的写入不可见）"""
+        if not key:
+            return False
+        written_at = self._recent_writes.get(key)
+        return written_at is not None and time.monotonic() - written_at < self._read_sticky_seconds
+
+    @asynccontextmanager
+    async def get_read_session(self) -> AsyncGenerator[Optional[AsyncSession], None]:
+        """
+        获取从库会话（上下文管理器）
+
+        从库未配置或不可用时返回 None，调用方应使用主库。
+        只读会话不提交，退出时回滚以释放快照。
+        """
+        if not self.replica_available:
+            yield None
+            return
+
+        async with self._read_session_factory() as session:
+            try:
+                yield session
+            finally:
+                await session.rollback()
+
     async def create_tables(self) -> None:
         """创建所有数据库表"""
         if self._engine is None:
@@ -280,6 +438,8 @@ class DatabaseManager:
         """关闭数据库连接"""
         if self._engine:
             await self._engine.dispose()
+        if self._read_engine:
+            await self._read_engine.dispose()
 
 
 # 全局数据库管理器实例
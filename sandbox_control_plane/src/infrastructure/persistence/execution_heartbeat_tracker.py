@@ -0,0 +1,81 @@
+"""
+执行心跳跟踪器
+
+Executor 的心跳只在内存中记录最后心跳时间，由后台任务周期性地合并写回数据库，
+避免每次心跳产生一次 UPDATE。停滞检测优先使用内存中的时间，不受写回延迟影响。
+"""
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+
+from src.infrastructure.metrics import (
+    EXECUTION_HEARTBEAT_FLUSH_SECONDS,
+    EXECUTION_HEARTBEAT_PENDING,
+    EXECUTION_HEARTBEATS_TOTAL,
+)
+from src.infrastructure.persistence.write_behind_buffer import WriteBehindBuffer
+
+# 写回函数：接收 {execution_id: last_heartbeat_at}，返回实际更新的行数
+HeartbeatWriter = Callable[[Dict[str, datetime]], Awaitable[int]]
+
+
+class ExecutionHeartbeatTracker(WriteBehindBuffer):
+    """
+    执行心跳跟踪器
+
+    按执行 ID 合并的写缓冲，每批用一条批量 UPDATE 写回 last_heartbeat_at。
+    last_seen() 返回本实例最近一次收到的心跳，超过 retention_seconds 的记录在写回时清理。
+    """
+
+    def __init__(
+        self,
+        writer: HeartbeatWriter,
+        max_batch: int = 500,
+        retention_seconds: float = 300,
+    ):
+        """
+        Args:
+            writer: 写回函数（通常在新的数据库会话中调用仓储 touch_heartbeats）
+            max_batch: 单条 UPDATE 最多包含的执行数
+            retention_seconds: 最后心跳时间在内存中的保留时长（秒），应大于心跳超时
+        """
+        super().__init__(
+            writer,
+            max_batch=max_batch,
+            description="execution heartbeats",
+            pending_gauge=EXECUTION_HEARTBEAT_PENDING,
+            flush_seconds=EXECUTION_HEARTBEAT_FLUSH_SECONDS,
+        )
+        self._retention = timedelta(seconds=retention_seconds)
+        self._last_seen: Dict[str, datetime] = {}
+
+    def beat(self, execution_id: str, at: Optional[datetime] = None) -> None:
+        """记录一次心跳"""
+        at = at or datetime.now()
+        self.record(execution_id, at)
+        seen = self._last_seen.get(execution_id)
+        if seen is None or at > seen:
+            self._last_seen[execution_id] = at
+        EXECUTION_HEARTBEATS_TOTAL.inc()
+
+    def last_seen(self, execution_id: str) -> Optional[datetime]:
+        """本实例最近一次收到该执行心跳的时间"""
+        return self._last_seen.get(execution_id)
+
+    def forget(self, execution_ids: Iterable[str]) -> None:
+        """不再跟踪这些执行（已判定崩溃）"""
+        execution_ids = list(execution_ids)
+        self.discard(execution_ids)
+        for execution_id in execution_ids:
+            self._last_seen.pop(execution_id, None)
+
+    async def flush(self) -> int:
+        flushed = await super().flush()
+        self._prune()
+        return flushed
+
+    def _prune(self) -> None:
+        """清理长时间没有心跳的执行（已结束的执行不再发送心跳）"""
+        cutoff = datetime.now() - self._retention
+        stale = [execution_id for execution_id, at in self._last_seen.items() if at < cutoff]
+        for execution_id in stale:
+            del self._last_seen[execution_id]
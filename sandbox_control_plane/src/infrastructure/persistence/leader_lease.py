@@ -0,0 +1,66 @@
+"""
+主节点租约
+
+多个副本（以及每个副本内的多个 worker 进程）共享一行租约：
+持有者周期性续约，租约过期后任一进程可以接管。
+租约时间使用各进程的本地时钟（毫秒时间戳），租约时长需远大于副本间的时钟偏差。
+"""
+import time
+
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.infrastructure.persistence.models.leader_lease_model import LeaderLeaseModel
+
+# 后台任务（状态同步、会话清理等）的选举范围
+BACKGROUND_TASKS_LEASE = "background_tasks"
+
+
+async def try_acquire_lease(session: AsyncSession, name: str, holder: str, lease_seconds: int) -> bool:
+    """
+    获取或续约租约（在当前事务中，由调用方提交）
+
+    Returns:
+        holder 持有租约时返回 True（本来就持有，或原租约已过期被接管）
+    """
+    now_ms = int(time.time() * 1000)
+    lease = LeaderLeaseModel
+    result = await session.execute(
+        update(lease)
+        .where(
+            lease.f_name == name,
+            or_(lease.f_holder == holder, lease.f_lease_until < now_ms),
+        )
+        .values(f_holder=holder, f_lease_until=now_ms + lease_seconds * 1000, f_updated_at=now_ms)
+    )
+    if result.rowcount:
+        return True
+
+    existing = await session.execute(select(lease.f_name).where(lease.f_name == name))
+    if existing.scalar_one_or_none() is not None:
+        return False
+
+    # 租约行不存在（未执行初始化脚本）：抢先插入者获得租约
+    try:
+        async with session.begin_nested():
+            await session.execute(
+                insert(lease).values(
+                    f_name=name,
+                    f_holder=holder,
+                    f_lease_until=now_ms + lease_seconds * 1000,
+                    f_updated_at=now_ms,
+                )
+            )
+    except IntegrityError:
+        return False
+    return True
+
+
+async def release_lease(session: AsyncSession, name: str, holder: str) -> None:
+    """释放租约（仅当 holder 仍持有时），其他进程下一次续约即可接管"""
+    await session.execute(
+        update(LeaderLeaseModel)
+        .where(LeaderLeaseModel.f_name == name, LeaderLeaseModel.f_holder == holder)
+        .values(f_lease_until=0, f_updated_at=int(time.time() * 1000))
+    )
@@ -0,0 +1,22 @@
+"""
+缓存版本 ORM 模型
+
+每类进程内缓存一行版本号。写入方在同一事务中递增版本号，
+其他副本周期性读取版本号，发现变化即清空本地缓存。
+按照数据表命名规范: t_{module}_{entity}, f_{field_name}
+"""
+from sqlalchemy import Column, String, BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.infrastructure.persistence.database import Base
+
+
+class CacheVersionModel(Base):
+    """
+    缓存版本 ORM 模型 - t_sandbox_cache_version
+    """
+    __tablename__ = "t_sandbox_cache_version"
+
+    f_name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    f_version = Column(BigInteger, nullable=False, default=0)
+    f_updated_at = Column(BigInteger, nullable=False, default=0)
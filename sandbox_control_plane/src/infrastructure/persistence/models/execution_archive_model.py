@@ -0,0 +1,32 @@
+"""
+执行归档索引 ORM 模型
+
+记录已迁出 t_sandbox_execution 的执行所在的 S3 归档文件，
+使归档后的执行仍可按 ID 查询。
+按照数据表命名规范: t_{module}_{entity}, f_{field_name}
+"""
+from sqlalchemy import Column, String, BigInteger, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.infrastructure.persistence.database import Base
+
+
+class ExecutionArchiveModel(Base):
+    """
+    执行归档索引 ORM 模型 - t_sandbox_execution_archive
+
+    每条执行一行，只保存定位信息，行宽很小。
+    """
+    __tablename__ = "t_sandbox_execution_archive"
+
+    f_execution_id: Mapped[str] = mapped_column(String(40), primary_key=True)
+    f_session_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    f_archive_path: Mapped[str] = mapped_column(String(512), nullable=False)
+
+    # 执行原始创建时间与归档时间（毫秒时间戳）
+    f_created_at = Column(BigInteger, nullable=False, default=0)
+    f_archived_at = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("t_sandbox_execution_archive_idx_session_id", "f_session_id"),
+    )
@@ -0,0 +1,38 @@
+"""
+执行分发队列 ORM 模型
+
+执行 API 与执行器之间的持久化队列：执行记录与其分发条目在同一事务中写入，
+由分发者认领后调用执行器，成功后删除。
+按照数据表命名规范: t_{module}_{entity}, f_{field_name}
+"""
+from sqlalchemy import Column, String, Integer, BigInteger, Text, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.infrastructure.persistence.database import Base
+
+
+class ExecutionDispatchModel(Base):
+    """
+    执行分发队列 ORM 模型 - t_sandbox_execution_dispatch
+
+    f_seq 为入队序号（同一会话内单调递增，取自会话行上的计数器），用于会话内 FIFO。
+    f_status 为 pending（等待认领）或 claimed（已认领，f_lease_until 前不会被再次认领）。
+    """
+    __tablename__ = "t_sandbox_execution_dispatch"
+
+    f_execution_id: Mapped[str] = mapped_column(String(40), primary_key=True)
+    f_session_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    f_seq = Column(BigInteger, nullable=False)
+    f_status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
+    f_attempts = Column(Integer, nullable=False, default=0)
+    f_last_error = Column(Text, nullable=False, default="")
+
+    # 时间（毫秒时间戳）
+    f_next_attempt_at = Column(BigInteger, nullable=False, default=0)
+    f_lease_until = Column(BigInteger, nullable=False, default=0)
+    f_enqueued_at = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("t_sandbox_execution_dispatch_idx_session_seq", "f_session_id", "f_seq"),
+        Index("t_sandbox_execution_dispatch_idx_next_attempt_at", "f_next_attempt_at"),
+    )
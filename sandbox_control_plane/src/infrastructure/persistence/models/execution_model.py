@@ -29,17 +29,12 @@ class ExecutionModel(Base):
     # Status
     f_status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
 
-    # Code and execution
-    f_code = Column(Text, nullable=False, default="")
+    # Execution（代码、事件、返回值、stdout/stderr 在 t_sandbox_execution_payload）
     f_language: Mapped[str] = mapped_column(String(32), nullable=False)
     f_entrypoint: Mapped[str] = mapped_column(String(255), nullable=False, default="")
-    f_event_data = Column(Text, nullable=False, default="")
     f_timeout_sec = Column(Integer, nullable=False)
 
     # Results
-    f_return_value = Column(Text, nullable=False, default="")
-    f_stdout = Column(Text, nullable=False, default="")
-    f_stderr = Column(Text, nullable=False, default="")
     f_exit_code = Column(Integer, nullable=False, default=0)
     f_metrics = Column(Text, nullable=False, default="")
     f_error_message = Column(Text, nullable=False, default="")
@@ -47,6 +42,8 @@ class ExecutionModel(Base):
     # Timestamps (BIGINT - millisecond timestamps)
     f_started_at = Column(BigInteger, nullable=False, default=0)
     f_completed_at = Column(BigInteger, nullable=False, default=0)
+    # 最后心跳时间：由心跳跟踪器批量写回，0 表示尚未收到心跳
+    f_last_heartbeat_at = Column(BigInteger, nullable=False, default=0)
 
     # Audit fields
     f_created_at = Column(BigInteger, nullable=False, default=0)
@@ -58,25 +55,31 @@ class ExecutionModel(Base):
 
     # Indexes
     __table_args__ = (
-        Index("t_sandbox_execution_idx_session_id", "f_session_id"),
-        Index("t_sandbox_execution_idx_status", "f_status"),
-        Index("t_sandbox_execution_idx_created_at", "f_created_at"),
+        Index("t_sandbox_execution_idx_session_created_at", "f_session_id", "f_created_at", "f_id"),
+        Index("t_sandbox_execution_idx_status_last_heartbeat_at", "f_status", "f_last_heartbeat_at"),
+        Index("t_sandbox_execution_idx_created_at_id", "f_created_at", "f_id"),
         Index("t_sandbox_execution_idx_deleted_at", "f_deleted_at"),
         Index("t_sandbox_execution_idx_created_by", "f_created_by"),
     )
 
-    def to_entity(self):
-        """转换为领域实体"""
+    def to_entity(self, payload=None):
+        """
+        转换为领域实体
+
+        Args:
+            payload: 对应的 ExecutionPayloadModel；为 None 时只加载热字段，
+                实体的 payload_loaded 为 False，代码与输出字段为空
+        """
         from src.domain.entities.execution import Execution
         from src.domain.value_objects.execution_status import ExecutionStatus, ExecutionState
 
         return Execution(
             id=self.f_id,
             session_id=self.f_session_id,
-            code=self.f_code or "",
+            code=(payload.f_code or "") if payload else "",
             language=self.f_language,
             timeout=self.f_timeout_sec,
-            event_data=self._parse_json(self.f_event_data),
+            event_data=self._parse_json(payload.f_event_data) if payload else None,
             state=ExecutionState(
                 status=ExecutionStatus(self.f_status),
                 exit_code=self.f_exit_code,
@@ -85,18 +88,19 @@ class ExecutionModel(Base):
             created_at=self._millis_to_datetime(self.f_created_at) or datetime.now(),
             completed_at=self._millis_to_datetime(self.f_completed_at),
             execution_time=None,  # Can be calculated from started_at/completed_at
-            stdout=self.f_stdout or "",
-            stderr=self.f_stderr or "",
+            stdout=(payload.f_stdout or "") if payload else "",
+            stderr=(payload.f_stderr or "") if payload else "",
             artifacts=[],  # Loaded separately if needed
             retry_count=0,  # Not in database schema
-            last_heartbeat_at=None,  # Not in database schema
-            return_value=self._parse_json(self.f_return_value),
+            last_heartbeat_at=self._millis_to_datetime(self.f_last_heartbeat_at),
+            return_value=self._parse_json(payload.f_return_value) if payload else None,
             metrics=self._parse_json(self.f_metrics),
+            payload_loaded=payload is not None,
         )
 
     @classmethod
     def from_entity(cls, execution):
-        """从领域实体创建 ORM 模型"""
+        """从领域实体创建 ORM 模型（仅热字段，载荷见 ExecutionPayloadModel.from_entity）"""
         import json
         now_ms = int(datetime.now().timestamp() * 1000)
 
@@ -104,19 +108,15 @@ class ExecutionModel(Base):
             f_id=execution.id,
             f_session_id=execution.session_id,
             f_status=execution.state.status.value,
-            f_code=execution.code,
             f_language=execution.language,
             f_timeout_sec=execution.timeout,
             f_entrypoint="",
-            f_event_data=json.dumps(execution.event_data, ensure_ascii=False) if execution.event_data else "",
-            f_return_value=json.dumps(execution.return_value, ensure_ascii=False) if execution.return_value else "",
-            f_stdout=execution.stdout,
-            f_stderr=execution.stderr,
             f_exit_code=execution.state.exit_code or 0,
             f_metrics=json.dumps(execution.metrics, ensure_ascii=False) if execution.metrics else "",
             f_error_message=execution.state.error_message or "",
             f_started_at=0,
             f_completed_at=int(execution.completed_at.timestamp() * 1000) if execution.completed_at else 0,
+            f_last_heartbeat_at=int(execution.last_heartbeat_at.timestamp() * 1000) if execution.last_heartbeat_at else 0,
             # 审计字段
             f_created_at=int(execution.created_at.timestamp() * 1000) if execution.created_at else now_ms,
             f_created_by="",
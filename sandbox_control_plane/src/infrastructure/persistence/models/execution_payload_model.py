@@ -0,0 +1,66 @@
+"""
+执行载荷 ORM 模型
+
+t_sandbox_execution 的冷数据伴随表，保存代码、输入事件与执行输出等大字段。
+按照数据表命名规范: t_{module}_{entity}, f_{field_name}
+"""
+import json
+from datetime import datetime
+
+from sqlalchemy import Column, String, BigInteger, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.infrastructure.persistence.database import Base
+
+
+class ExecutionPayloadModel(Base):
+    """
+    执行载荷 ORM 模型 - t_sandbox_execution_payload
+
+    与 t_sandbox_execution 一对一（f_execution_id 即执行 ID）。
+    状态轮询只读取热表窄行，/result 与列表才关联本表。
+    """
+    __tablename__ = "t_sandbox_execution_payload"
+
+    f_execution_id: Mapped[str] = mapped_column(String(40), primary_key=True)
+
+    f_code = Column(Text, nullable=False, default="")
+    f_event_data = Column(Text, nullable=False, default="")
+    f_return_value = Column(Text, nullable=False, default="")
+    f_stdout = Column(Text, nullable=False, default="")
+    f_stderr = Column(Text, nullable=False, default="")
+
+    # Audit fields
+    f_created_at = Column(BigInteger, nullable=False, default=0)
+    f_created_by = Column(String(40), nullable=False, default="")
+    f_updated_at = Column(BigInteger, nullable=False, default=0)
+    f_updated_by = Column(String(40), nullable=False, default="")
+    f_deleted_at = Column(BigInteger, nullable=False, default=0)
+    f_deleted_by = Column(String(36), nullable=False, default="")
+
+    @classmethod
+    def from_entity(cls, execution):
+        """从领域实体创建 ORM 模型"""
+        now_ms = int(datetime.now().timestamp() * 1000)
+
+        return cls(
+            f_execution_id=execution.id,
+            **cls.column_values(execution),
+            f_created_at=int(execution.created_at.timestamp() * 1000) if execution.created_at else now_ms,
+            f_created_by="",
+            f_updated_at=now_ms,
+            f_updated_by="",
+            f_deleted_at=0,
+            f_deleted_by="",
+        )
+
+    @staticmethod
+    def column_values(execution) -> dict:
+        """实体载荷字段 -> 列值"""
+        return {
+            "f_code": execution.code,
+            "f_event_data": json.dumps(execution.event_data, ensure_ascii=False) if execution.event_data else "",
+            "f_return_value": json.dumps(execution.return_value, ensure_ascii=False) if execution.return_value else "",
+            "f_stdout": execution.stdout,
+            "f_stderr": execution.stderr,
+        }
@@ -0,0 +1,22 @@
+"""
+主节点租约 ORM 模型
+
+每个选举范围一行：持有者在租约到期前续约，租约过期后其他副本可接管。
+按照数据表命名规范: t_{module}_{entity}, f_{field_name}
+"""
+from sqlalchemy import Column, String, BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.infrastructure.persistence.database import Base
+
+
+class LeaderLeaseModel(Base):
+    """
+    主节点租约 ORM 模型 - t_sandbox_leader_lease
+    """
+    __tablename__ = "t_sandbox_leader_lease"
+
+    f_name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    f_holder: Mapped[str] = mapped_column(String(255), nullable=False, default="")
+    f_lease_until = Column(BigInteger, nullable=False, default=0)
+    f_updated_at = Column(BigInteger, nullable=False, default=0)
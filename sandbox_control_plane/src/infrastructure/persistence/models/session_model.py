@@ -4,7 +4,9 @@
 SQLAlchemy 模型定义，用于数据库持久化。
 按照数据表命名规范: t_{module}_{entity}, f_{field_name}
 """
+import json
 from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Optional
 
 from sqlalchemy import Column, String, Integer, BigInteger, Text, Index
 from sqlalchemy.orm import Mapped, mapped_column
@@ -65,6 +67,9 @@ class SessionModel(Base):
     f_dependency_install_started_at = Column(BigInteger, nullable=False, default=0)
     f_dependency_install_completed_at = Column(BigInteger, nullable=False, default=0)
 
+    # 执行分发队列的会话内入队序号（入队事务中递增，不映射到实体）
+    f_dispatch_seq = Column(BigInteger, nullable=False, default=0)
+
     # Audit fields
     f_created_at = Column(BigInteger, nullable=False, default=0)
     f_created_by = Column(String(40), nullable=False, default="")
@@ -75,12 +80,13 @@ class SessionModel(Base):
 
     # Indexes
     __table_args__ = (
-        Index("t_sandbox_session_idx_template_id", "f_template_id"),
-        Index("t_sandbox_session_idx_status", "f_status"),
-        Index("t_sandbox_session_idx_runtime_node", "f_runtime_node"),
-        Index("t_sandbox_session_idx_last_activity_at", "f_last_activity_at"),
+        Index("t_sandbox_session_idx_template_created_at", "f_template_id", "f_created_at", "f_id"),
+        Index("t_sandbox_session_idx_status_created_at", "f_status", "f_created_at", "f_id"),
+        Index("t_sandbox_session_idx_status_last_activity_at", "f_status", "f_last_activity_at"),
+        Index("t_sandbox_session_idx_runtime_node_status", "f_runtime_node", "f_status"),
+        Index("t_sandbox_session_idx_container_id", "f_container_id"),
         Index("t_sandbox_session_idx_dependency_install_status", "f_dependency_install_status"),
-        Index("t_sandbox_session_idx_created_at", "f_created_at"),
+        Index("t_sandbox_session_idx_created_at_id", "f_created_at", "f_id"),
         Index("t_sandbox_session_idx_deleted_at", "f_deleted_at"),
         Index("t_sandbox_session_idx_created_by", "f_created_by"),
     )
@@ -148,54 +154,11 @@ class SessionModel(Base):
     @classmethod
     def from_entity(cls, session):
         """从领域实体创建 ORM 模型"""
-        import json
-
-        # 转换 installed_dependencies 对象列表为 JSON
-        installed_dependencies_json = ""
-        if session.installed_dependencies:
-            try:
-                deps_list = [
-                    {
-                        "name": dep.name,
-                        "version": dep.version,
-                        "install_location": dep.install_location,
-                        "install_time": dep.install_time.isoformat(),
-                        "is_from_template": dep.is_from_template,
-                    }
-                    for dep in session.installed_dependencies
-                ]
-                installed_dependencies_json = json.dumps(deps_list, ensure_ascii=False)
-            except (TypeError, ValueError):
-                installed_dependencies_json = ""
-
         now_ms = int(datetime.now().timestamp() * 1000)
 
         return cls(
             f_id=session.id,
-            f_template_id=session.template_id,
-            f_status=session.status.value,
-            f_runtime_type=session.runtime_type,
-            f_runtime_node=session.runtime_node or "",
-            f_container_id=session.container_id or "",
-            f_pod_name=session.pod_name or "",
-            f_workspace_path=session.workspace_path,
-            f_resources_cpu=session.resource_limit.cpu,
-            f_resources_memory=session.resource_limit.memory,
-            f_resources_disk=session.resource_limit.disk,
-            f_env_vars=json.dumps(session.env_vars, ensure_ascii=False) if session.env_vars else "",
-            f_timeout=session.timeout,
-            f_python_package_index_url=session.python_package_index_url,
-            f_completed_at=int(session.completed_at.timestamp() * 1000) if session.completed_at else 0,
-            f_last_activity_at=int(session.last_activity_at.timestamp() * 1000) if session.last_activity_at else now_ms,
-            # 依赖安装字段
-            f_requested_dependencies=json.dumps(session.requested_dependencies, ensure_ascii=False) if session.requested_dependencies else "",
-            f_installed_dependencies=installed_dependencies_json,
-            f_dependency_install_status=session.dependency_install_status,
-            f_dependency_install_error=session.dependency_install_error or "",
-            f_dependency_install_started_at=int(session.dependency_install_started_at.timestamp() * 1000)
-            if session.dependency_install_started_at else 0,
-            f_dependency_install_completed_at=int(session.dependency_install_completed_at.timestamp() * 1000)
-            if session.dependency_install_completed_at else 0,
+            **cls.column_values(session),
             # 审计字段
             f_created_at=int(session.created_at.timestamp() * 1000) if session.created_at else now_ms,
             f_created_by="",
@@ -205,6 +168,26 @@ class SessionModel(Base):
             f_deleted_by="",
         )
 
+    @classmethod
+    def column_values(cls, session, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        将实体字段序列化为列值
+
+        Args:
+            session: 会话实体
+            fields: 需要序列化的实体字段名（None 表示全部可写字段）
+
+        Returns:
+            {列名: 值}，只包含 fields 涉及的列
+        """
+        names = _ENTITY_FIELD_COLUMNS.keys() if fields is None else fields
+        values: Dict[str, Any] = {}
+        for name in names:
+            serializer = _ENTITY_FIELD_COLUMNS.get(name)
+            if serializer:
+                values.update(serializer(session))
+        return values
+
     def _parse_json(self, value: str):
         """安全解析 JSON 字符串"""
         if not value or value.strip() == "":
@@ -223,3 +206,66 @@ class SessionModel(Base):
             return datetime.fromtimestamp(millis / 1000)
         except (ValueError, OSError):
             return None
+
+
+def _millis(value: Optional[datetime]) -> int:
+    return int(value.timestamp() * 1000) if value else 0
+
+
+def _json_or_empty(value) -> str:
+    return json.dumps(value, ensure_ascii=False) if value else ""
+
+
+def _installed_dependencies_json(session) -> str:
+    if not session.installed_dependencies:
+        return ""
+    try:
+        return json.dumps(
+            [
+                {
+                    "name": dep.name,
+                    "version": dep.version,
+                    "install_location": dep.install_location,
+                    "install_time": dep.install_time.isoformat(),
+                    "is_from_template": dep.is_from_template,
+                }
+                for dep in session.installed_dependencies
+            ],
+            ensure_ascii=False,
+        )
+    except (TypeError, ValueError):
+        return ""
+
+
+# 实体字段 -> 列值序列化器；save 时只序列化变更过的字段
+_ENTITY_FIELD_COLUMNS: Dict[str, Callable[[Any], Dict[str, Any]]] = {
+    "template_id": lambda s: {"f_template_id": s.template_id},
+    "status": lambda s: {"f_status": s.status.value},
+    "runtime_type": lambda s: {"f_runtime_type": s.runtime_type},
+    "runtime_node": lambda s: {"f_runtime_node": s.runtime_node or ""},
+    "container_id": lambda s: {"f_container_id": s.container_id or ""},
+    "pod_name": lambda s: {"f_pod_name": s.pod_name or ""},
+    "workspace_path": lambda s: {"f_workspace_path": s.workspace_path},
+    "resource_limit": lambda s: {
+        "f_resources_cpu": s.resource_limit.cpu,
+        "f_resources_memory": s.resource_limit.memory,
+        "f_resources_disk": s.resource_limit.disk,
+    },
+    "env_vars": lambda s: {"f_env_vars": _json_or_empty(s.env_vars)},
+    "timeout": lambda s: {"f_timeout": s.timeout},
+    "python_package_index_url": lambda s: {"f_python_package_index_url": s.python_package_index_url},
+    "completed_at": lambda s: {"f_completed_at": _millis(s.completed_at)},
+    "last_activity_at": lambda s: {
+        "f_last_activity_at": _millis(s.last_activity_at) or int(datetime.now().timestamp() * 1000)
+    },
+    "requested_dependencies": lambda s: {"f_requested_dependencies": _json_or_empty(s.requested_dependencies)},
+    "installed_dependencies": lambda s: {"f_installed_dependencies": _installed_dependencies_json(s)},
+    "dependency_install_status": lambda s: {"f_dependency_install_status": s.dependency_install_status},
+    "dependency_install_error": lambda s: {"f_dependency_install_error": s.dependency_install_error or ""},
+    "dependency_install_started_at": lambda s: {
+        "f_dependency_install_started_at": _millis(s.dependency_install_started_at)
+    },
+    "dependency_install_completed_at": lambda s: {
+        "f_dependency_install_completed_at": _millis(s.dependency_install_completed_at)
+    },
+}
@@ -0,0 +1,49 @@
+"""
+workspace 文件清单 ORM 模型
+
+会话 workspace 中文件的索引，文件列表、前缀过滤与计数直接查询该表，不再逐次列出对象存储。
+按照数据表命名规范: t_{module}_{entity}, f_{field_name}
+"""
+from sqlalchemy import Column, String, BigInteger, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.domain.value_objects.workspace_file import MAX_INDEXED_PATH_LENGTH
+from src.infrastructure.persistence.database import Base
+
+
+class WorkspaceManifestModel(Base):
+    """
+    workspace 文件清单状态 ORM 模型 - t_sandbox_workspace_manifest
+
+    每个已建立清单的会话一行。f_reconciled_at 为最近一次与对象存储对账时开始列表的时间，
+    0 表示清单已过期（执行器回报结果后），下次使用前重新对账。
+    """
+    __tablename__ = "t_sandbox_workspace_manifest"
+
+    f_session_id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    f_reconciled_at = Column(BigInteger, nullable=False, default=0)
+    f_updated_at = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("t_sandbox_workspace_manifest_idx_reconciled_at", "f_reconciled_at"),
+    )
+
+
+class WorkspaceFileModel(Base):
+    """
+    workspace 文件 ORM 模型 - t_sandbox_workspace_file
+
+    主键 (f_session_id, f_path) 同时服务于按前缀的范围查询和按路径排序；
+    f_path 长度受 MariaDB utf8mb4 联合主键长度上限约束。
+    f_updated_at 为记录写入时间，对账时据此保留列表开始后才写入的记录。
+    """
+    __tablename__ = "t_sandbox_workspace_file"
+
+    f_session_id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    f_path: Mapped[str] = mapped_column(String(MAX_INDEXED_PATH_LENGTH), primary_key=True)
+    f_size = Column(BigInteger, nullable=False, default=0)
+    f_etag: Mapped[str] = mapped_column(String(64), nullable=False, default="")
+
+    # 时间（毫秒时间戳）
+    f_modified_at = Column(BigInteger, nullable=False, default=0)
+    f_updated_at = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,118 @@
+"""
+读写分离路由
+
+请求级的读路由器：只读查询在满足条件时走从库，否则走主库。
+"""
+from typing import Any, Callable, Optional
+
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.infrastructure.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class ReadRouter:
+    """
+    请求级读路由器
+
+    由同一请求内的所有仓储共享。以下情况只读查询回到主库：
+    1. 请求没有分配从库会话（非 GET 请求、未配置从库或从库不可用）
+    2. 本请求内已经发生过写入（请求内读己之写）
+    3. 查询的资源在最近的粘滞窗口内被本进程写过（跨请求读己之写）
+    4. 列表与分页查询，除非配置允许列表读从库（db_read_replica_lists）
+
+    粘滞窗口只记录本进程的写入，写入落在其他 worker 或副本时无法感知，
+    因此按 ID 查找单个资源时，从库查不到就回主库重查（见 fetch_by_id），
+    避免刚创建的资源因复制延迟返回 404。列表查询无法用同样的方式发现缺失的行，
+    默认走主库，使刚创建的资源立即出现在列表中。
+    从库查询出现连接类错误时标记从库不可用并在主库上重试。
+    """
+
+    def __init__(self, manager, read_session: Optional[AsyncSession] = None):
+        """
+        初始化读路由器
+
+        Args:
+            manager: DatabaseManager，提供从库健康状态与写入记录
+            read_session: 从库会话（None 表示本请求只使用主库）
+        """
+        self._manager = manager
+        self._read_session = read_session
+        self._wrote = False
+
+    def note_write(self, *keys: str) -> None:
+        """记录写入：本请求后续读取走主库，并对相关资源开启粘滞窗口"""
+        self._wrote = True
+        self._manager.note_write(*keys)
+
+    def use_replica(self, key: Optional[str] = None, listing: bool = False) -> bool:
+        """判断本次只读查询是否可以走从库"""
+        if self._read_session is None or self._wrote:
+            return False
+        if not self._manager.replica_available:
+            return False
+        if listing and not self._manager.replica_serves_lists:
+            return False
+        return not self._manager.is_recently_written(key)
+
+    async def execute(
+        self,
+        primary: AsyncSession,
+        stmt,
+        key: Optional[str] = None,
+        listing: bool = False,
+    ) -> Any:
+        """
+        执行只读查询
+
+        Args:
+            primary: 主库会话
+            stmt: 查询语句
+            key: 查询涉及的资源 ID（用于粘滞判断，可选）
+            listing: 是否为列表 / 分页查询（默认只在主库执行）
+        """
+        result = await self._execute_on_replica(stmt, key, listing)
+        if result is not None:
+            return result
+        return await primary.execute(stmt)
+
+    async def fetch_by_id(
+        self,
+        primary: AsyncSession,
+        stmt,
+        key: str,
+        extract: Callable[[Any], Any],
+    ) -> Any:
+        """
+        按 ID 读取单个资源，从库查不到时回主库重查
+
+        写入可能发生在其他进程，本进程的粘滞窗口看不到；复制延迟内从库上
+        还没有这一行时，回主库再查一次。不存在的 ID 因此多一次主库查询。
+
+        Args:
+            primary: 主库会话
+            stmt: 查询语句
+            key: 资源 ID
+            extract: 从查询结果中取出资源（不存在时返回 None）
+        """
+        result = await self._execute_on_replica(stmt, key)
+        if result is not None:
+            value = extract(result)
+            if value is not None:
+                return value
+            logger.debug("Row not found on replica, retrying on primary", key=key)
+        return extract(await primary.execute(stmt))
+
+    async def _execute_on_replica(self, stmt, key: Optional[str], listing: bool = False) -> Any:
+        """在从库上执行查询；不应走从库或从库出错时返回 None"""
+        if not self.use_replica(key, listing):
+            return None
+        try:
+            return await self._read_session.execute(stmt)
+        except DBAPIError as e:
+            logger.warning("Replica query failed, retrying on primary", error=str(e))
+            self._manager.mark_replica_unavailable(str(e))
+            await self._read_session.rollback()
+            return None
@@ -0,0 +1,75 @@
+"""
+带缓存的模板仓储
+
+包装模板仓储：find_by_id 读穿透进程内缓存，save/delete 失效缓存并递增缓存版本号。
+"""
+from typing import Awaitable, Callable, List, Optional
+
+from src.domain.entities.template import Template
+from src.domain.repositories.template_repository import ITemplateRepository
+from src.infrastructure.persistence.template_cache import TemplateCache
+
+
+class CachedTemplateRepository(ITemplateRepository):
+    """
+    带缓存的模板仓储
+
+    这是基础设施层的 Adapter（装饰器），对调用方透明：
+    会话服务与调度器按 ID 读取模板时走缓存，模板服务的写入立即失效本实例缓存，
+    版本号随写入同一事务提交，其他副本在下一次版本检查时失效。
+    """
+
+    def __init__(
+        self,
+        inner: ITemplateRepository,
+        cache: TemplateCache,
+        version_bumper: Optional[Callable[[], Awaitable[None]]] = None,
+    ):
+        """
+        Args:
+            inner: 被包装的模板仓储
+            cache: 进程内模板缓存（单例）
+            version_bumper: 在写入事务中递增缓存版本号
+        """
+        self._inner = inner
+        self._cache = cache
+        self._version_bumper = version_bumper
+
+    async def save(self, template: Template) -> None:
+        """保存模板并失效缓存"""
+        await self._inner.save(template)
+        await self._invalidate(template.id)
+
+    async def find_by_id(self, template_id: str) -> Optional[Template]:
+        """根据 ID 查找模板（读穿透缓存）"""
+        return await self._cache.get_or_load(template_id, self._inner.find_by_id)
+
+    async def find_by_name(self, name: str) -> Optional[Template]:
+        """根据名称查找模板"""
+        return await self._inner.find_by_name(name)
+
+    async def find_all(self, offset: int = 0, limit: int = 100) -> List[Template]:
+        """查找所有模板"""
+        return await self._inner.find_all(offset=offset, limit=limit)
+
+    async def delete(self, template_id: str) -> None:
+        """删除模板并失效缓存"""
+        await self._inner.delete(template_id)
+        await self._invalidate(template_id)
+
+    async def exists(self, template_id: str) -> bool:
+        """检查模板是否存在"""
+        return await self._inner.exists(template_id)
+
+    async def exists_by_name(self, name: str) -> bool:
+        """检查模板名称是否存在"""
+        return await self._inner.exists_by_name(name)
+
+    async def count(self) -> int:
+        """统计模板总数"""
+        return await self._inner.count()
+
+    async def _invalidate(self, template_id: str) -> None:
+        self._cache.invalidate(template_id)
+        if self._version_bumper:
+            await self._version_bumper()
@@ -0,0 +1,162 @@
+"""
+执行分发队列仓储实现
+
+使用 SQLAlchemy 实现执行分发队列仓储接口。
+按照数据表命名规范使用 f_ 前缀字段名。
+"""
+import time
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import delete, exists, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from src.domain.repositories.execution_dispatch_repository import IExecutionDispatchRepository
+from src.domain.value_objects.dispatch_entry import DispatchEntry
+from src.infrastructure.persistence.models.execution_dispatch_model import ExecutionDispatchModel
+from src.infrastructure.persistence.models.session_model import SessionModel
+from src.shared.errors.domain import NotFoundError
+
+STATUS_PENDING = "pending"
+STATUS_CLAIMED = "claimed"
+
+
+class SqlExecutionDispatchRepository(IExecutionDispatchRepository):
+    """
+    执行分发队列仓储实现
+
+    这是基础设施层的 Adapter，实现领域层定义的 Port。
+
+    认领使用 SELECT ... FOR UPDATE SKIP LOCKED：多个分发者并发认领时互不阻塞，
+    认领后写入租约并由调用方立即提交，调用执行器期间不持有行锁。
+
+    入队序号由数据库分配：在入队事务中递增会话行上的计数器。
+    UPDATE 持有会话行锁直到提交，不同进程、副本对同一会话的入队因此串行，
+    序号与提交顺序一致，不依赖各进程的时钟。
+    """
+
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def enqueue(self, execution_id: str, session_id: str) -> None:
+        """将执行加入分发队列"""
+        seq = await self._next_seq(session_id)
+        now_ms = int(time.time() * 1000)
+        self._session.add(ExecutionDispatchModel(
+            f_execution_id=execution_id,
+            f_session_id=session_id,
+            f_seq=seq,
+            f_status=STATUS_PENDING,
+            f_attempts=0,
+            f_last_error="",
+            f_next_attempt_at=now_ms,
+            f_lease_until=0,
+            f_enqueued_at=now_ms,
+        ))
+        await self._session.flush()
+
+    async def _next_seq(self, session_id: str) -> int:
+        """递增并读取会话的入队计数器（随入队事务提交）"""
+        result = await self._session.execute(
+            update(SessionModel)
+            .where(SessionModel.f_id == session_id)
+            .values(f_dispatch_seq=SessionModel.f_dispatch_seq + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            raise NotFoundError(f"Session not found: {session_id}")
+
+        result = await self._session.execute(
+            select(SessionModel.f_dispatch_seq).where(SessionModel.f_id == session_id)
+        )
+        return result.scalar_one()
+
+    async def commit(self) -> None:
+        """Explicitly commit the transaction"""
+        await self._session.commit()
+
+    async def claim_due(self, limit: int, lease_seconds: int) -> List[DispatchEntry]:
+        """
+        认领到期的条目
+
+        条件：到达重试时间；未被认领或租约已过期（分发者崩溃）；
+        且同一会话没有更早入队的条目（会话内 FIFO，队首分发完成前后续条目不动）。
+        """
+        now_ms = int(time.time() * 1000)
+        dispatch = ExecutionDispatchModel
+        earlier = aliased(ExecutionDispatchModel)
+
+        stmt = (
+            select(dispatch)
+            .where(
+                dispatch.f_next_attempt_at <= now_ms,
+                or_(dispatch.f_status == STATUS_PENDING, dispatch.f_lease_until < now_ms),
+                ~exists().where(
+                    earlier.f_session_id == dispatch.f_session_id,
+                    earlier.f_seq < dispatch.f_seq,
+                ),
+            )
+            .order_by(dispatch.f_next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self._session.execute(stmt)
+        models = result.scalars().all()
+        if not models:
+            return []
+
+        lease_until = now_ms + lease_seconds * 1000
+        for model in models:
+            model.f_status = STATUS_CLAIMED
+            model.f_attempts = (model.f_attempts or 0) + 1
+            model.f_lease_until = lease_until
+        await self._session.flush()
+
+        return [
+            DispatchEntry(
+                execution_id=model.f_execution_id,
+                session_id=model.f_session_id,
+                attempts=model.f_attempts,
+                enqueued_at=datetime.fromtimestamp(model.f_enqueued_at / 1000),
+            )
+            for model in models
+        ]
+
+    async def complete(self, execution_ids: List[str]) -> None:
+        """从队列移除"""
+        if not execution_ids:
+            return
+
+        await self._session.execute(
+            delete(ExecutionDispatchModel)
+            .where(ExecutionDispatchModel.f_execution_id.in_(execution_ids))
+            .execution_options(synchronize_session=False)
+        )
+        await self._session.flush()
+
+    async def retry_later(self, execution_id: str, next_attempt_at: datetime, error: str) -> None:
+        """释放认领，在 next_attempt_at 之后重试"""
+        await self._session.execute(
+            update(ExecutionDispatchModel)
+            .where(ExecutionDispatchModel.f_execution_id == execution_id)
+            .values(
+                f_status=STATUS_PENDING,
+                f_lease_until=0,
+                f_next_attempt_at=int(next_attempt_at.timestamp() * 1000),
+                f_last_error=error[:1000],
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self._session.flush()
+
+    async def queue_stats(self) -> dict:
+        """队列长度与最早入队时间"""
+        result = await self._session.execute(
+            select(func.count(), func.min(ExecutionDispatchModel.f_enqueued_at))
+        )
+        depth, oldest_ms = result.one()
+        return {
+            "depth": depth or 0,
+            "oldest_enqueued_at": datetime.fromtimestamp(oldest_ms / 1000) if oldest_ms else None,
+        }
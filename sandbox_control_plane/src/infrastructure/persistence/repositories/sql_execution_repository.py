@@ -5,14 +5,24 @@
 按照数据表命名规范使用 f_ 前缀字段名。
 """
 import time
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
-from sqlalchemy import select, update, delete, func
+from sqlalchemy import and_, case, or_, select, update, delete, func, insert
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.domain.repositories.execution_repository import IExecutionRepository
 from src.domain.entities.execution import Execution
+from src.domain.value_objects.execution_status import ExecutionStatus
+from src.domain.value_objects.page_cursor import PageCursor
+from src.domain.value_objects.row_count import RowCount
+from src.infrastructure.persistence.models.execution_archive_model import ExecutionArchiveModel
 from src.infrastructure.persistence.models.execution_model import ExecutionModel
+from src.infrastructure.persistence.models.execution_payload_model import ExecutionPayloadModel
+from src.infrastructure.persistence.read_routing import ReadRouter
+from src.infrastructure.persistence.utils.count_estimate import estimate_row_count
 
 
 class SqlExecutionRepository(IExecutionRepository):
@@ -20,13 +30,66 @@ class SqlExecutionRepository(IExecutionRepository):
     执行仓储实现
 
     这是基础设施层的 Adapter，实现领域层定义的 Port。
+
+    执行记录按冷热拆分：t_sandbox_execution 只保存状态、时间戳等小字段，
+    代码与输出保存在 t_sandbox_execution_payload，仅在需要时关联读取。
     """
 
-    def __init__(self, session: AsyncSession):
+    # 未结束的执行状态；其余状态不再被执行器回调更新，可以归档
+    _ACTIVE_STATUSES = (
+        ExecutionStatus.PENDING.value,
+        ExecutionStatus.RUNNING.value,
+    )
+
+    # 终态（执行结果不可再被覆盖）
+    _TERMINAL_STATUSES = (
+        ExecutionStatus.COMPLETED.value,
+        ExecutionStatus.FAILED.value,
+        ExecutionStatus.TIMEOUT.value,
+    )
+
+    # 接受心跳的状态（心跳把待执行推进为运行中）
+    _HEARTBEAT_STATUSES = (
+        ExecutionStatus.PENDING.value,
+        ExecutionStatus.RUNNING.value,
+    )
+
+    # 包含载荷时的查询：热表 LEFT JOIN 载荷表
+    _WITH_PAYLOAD = (
+        select(ExecutionModel, ExecutionPayloadModel)
+        .outerjoin(
+            ExecutionPayloadModel,
+            ExecutionPayloadModel.f_execution_id == ExecutionModel.f_id,
+        )
+    )
+
+    def __init__(self, session: AsyncSession, read_router: Optional[ReadRouter] = None):
         self._session = session
+        self._read_router = read_router
+
+    def _note_write(self, *keys: str) -> None:
+        if self._read_router:
+            self._read_router.note_write(*keys)
+
+    async def _execute_read(self, stmt, key: Optional[str] = None, listing: bool = False):
+        """执行只读查询（配置了读路由时可能走从库；列表查询默认走主库）"""
+        if self._read_router:
+            return await self._read_router.execute(self._session, stmt, key, listing)
+        return await self._session.execute(stmt)
+
+    async def _fetch_by_id(self, stmt, key: str, extract):
+        """按 ID 读取单个资源（走从库时未命中会回主库重查）"""
+        if self._read_router:
+            return await self._read_router.fetch_by_id(self._session, stmt, key, extract)
+        return extract(await self._session.execute(stmt))
 
     async def save(self, execution: Execution) -> None:
-        """保存执行记录"""
+        """
+        保存执行记录
+
+        热表每次写入；载荷表仅在实体加载了载荷时写入，
+        避免窄加载的实体把空输出覆盖到已有载荷上。
+        """
         import json
         model = await self._session.get(ExecutionModel, execution.id)
         now_ms = int(time.time() * 1000)
@@ -34,13 +97,9 @@ class SqlExecutionRepository(IExecutionRepository):
         if model:
             # 更新现有记录
             model.f_session_id = execution.session_id
-            model.f_code = execution.code
             model.f_language = execution.language
             model.f_status = execution.state.status.value
-            model.f_stdout = execution.stdout
-            model.f_stderr = execution.stderr
             model.f_exit_code = execution.state.exit_code or 0
-            model.f_return_value = json.dumps(execution.return_value, ensure_ascii=False) if execution.return_value else ""
             model.f_metrics = json.dumps(execution.metrics, ensure_ascii=False) if execution.metrics else ""
             model.f_error_message = execution.state.error_message or ""
             model.f_completed_at = int(execution.completed_at.timestamp() * 1000) if execution.completed_at else 0
@@ -50,38 +109,199 @@ class SqlExecutionRepository(IExecutionRepository):
             model = ExecutionModel.from_entity(execution)
             self._session.add(model)
 
+        if execution.payload_loaded:
+            payload = await self._session.get(ExecutionPayloadModel, execution.id)
+            if payload:
+                for column, value in ExecutionPayloadModel.column_values(execution).items():
+                    setattr(payload, column, value)
+                payload.f_updated_at = now_ms
+            else:
+                self._session.add(ExecutionPayloadModel.from_entity(execution))
+
         await self._session.flush()
+        self._note_write(execution.id, execution.session_id)
 
     async def commit(self) -> None:
         """Explicitly commit the transaction"""
         await self._session.commit()
 
-    async def find_by_id(self, execution_id: str) -> Optional[Execution]:
-        """根据 ID 查找执行记录"""
+    async def find_by_id(
+        self,
+        execution_id: str,
+        include_payload: bool = True,
+    ) -> Optional[Execution]:
+        """
+        根据 ID 查找执行记录
+
+        Args:
+            execution_id: 执行 ID
+            include_payload: 为 False 时只读取热表，用于状态轮询
+        """
         # Use a fresh query to avoid stale data from session cache
         # This is important for the sync execution polling loop
-        stmt = select(ExecutionModel).where(ExecutionModel.f_id == execution_id)
+        if not include_payload:
+            stmt = select(ExecutionModel).where(ExecutionModel.f_id == execution_id)
+            model = await self._fetch_by_id(stmt, execution_id, lambda result: result.scalar_one_or_none())
+            return model.to_entity() if model else None
+
+        stmt = self._WITH_PAYLOAD.where(ExecutionModel.f_id == execution_id)
+        row = await self._fetch_by_id(stmt, execution_id, lambda result: result.first())
+        return row[0].to_entity(row[1]) if row else None
+
+    async def find_by_ids(self, execution_ids: List[str]) -> List[Execution]:
+        """根据 ID 批量查找执行记录（含载荷，单条 SELECT ... WHERE f_id IN）"""
+        if not execution_ids:
+            return []
+
+        stmt = self._WITH_PAYLOAD.where(ExecutionModel.f_id.in_(execution_ids))
         result = await self._session.execute(stmt)
-        model = result.scalar_one_or_none()
-        return model.to_entity() if model else None
+        return [model.to_entity(payload) for model, payload in result.all()]
+
+    async def save_results(self, executions: List[Execution]) -> List[str]:
+        """
+        批量写入执行结果
+
+        先按主键锁定仍未到终态的行（SELECT ... FOR UPDATE），再对热表与载荷表各发一条
+        UPDATE ... SET f_x = CASE f_id WHEN ... END WHERE f_id IN (...)。调用方读取后、
+        写入前若其他实例已写入终态，该行不在锁定结果中，保持不变。
+
+        Returns:
+            实际写入的执行 ID
+        """
+        if not executions:
+            return []
+
+        import json
+        now_ms = int(time.time() * 1000)
+        result = await self._session.execute(
+            select(ExecutionModel.f_id)
+            .where(
+                ExecutionModel.f_id.in_([execution.id for execution in executions]),
+                ExecutionModel.f_status.notin_(self._TERMINAL_STATUSES),
+            )
+            .with_for_update()
+        )
+        writable = set(result.scalars().all())
+        executions = [execution for execution in executions if execution.id in writable]
+        if not executions:
+            return []
+        execution_ids = [execution.id for execution in executions]
+
+        def by_id(column, value_of, targets):
+            return case({execution.id: value_of(execution) for execution in targets}, value=column)
+
+        with_payload = [execution for execution in executions if execution.payload_loaded]
+        if with_payload:
+            payload_id = ExecutionPayloadModel.f_execution_id
+            await self._session.execute(
+                update(ExecutionPayloadModel)
+                .where(payload_id.in_([execution.id for execution in with_payload]))
+                .values(
+                    f_stdout=by_id(payload_id, lambda e: e.stdout, with_payload),
+                    f_stderr=by_id(payload_id, lambda e: e.stderr, with_payload),
+                    f_return_value=by_id(
+                        payload_id,
+                        lambda e: json.dumps(e.return_value, ensure_ascii=False) if e.return_value else "",
+                        with_payload,
+                    ),
+                    f_updated_at=now_ms,
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+        execution_id = ExecutionModel.f_id
+        await self._session.execute(
+            update(ExecutionModel)
+            .where(
+                execution_id.in_(execution_ids),
+                ExecutionModel.f_status.notin_(self._TERMINAL_STATUSES),
+            )
+            .values(
+                f_status=by_id(execution_id, lambda e: e.state.status.value, executions),
+                f_exit_code=by_id(execution_id, lambda e: e.state.exit_code or 0, executions),
+                f_metrics=by_id(
+                    execution_id,
+                    lambda e: json.dumps(e.metrics, ensure_ascii=False) if e.metrics else "",
+                    executions,
+                ),
+                f_error_message=by_id(execution_id, lambda e: e.state.error_message or "", executions),
+                f_completed_at=by_id(
+                    execution_id,
+                    lambda e: int(e.completed_at.timestamp() * 1000) if e.completed_at else 0,
+                    executions,
+                ),
+                f_updated_at=now_ms,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self._session.flush()
+        self._note_write(*execution_ids, *{execution.session_id for execution in executions})
+        return execution_ids
 
     async def find_by_session_id(
         self,
         session_id: str,
-        limit: int = 100
+        limit: int = 100,
+        after: Optional[PageCursor] = None,
     ) -> List[Execution]:
-        """根据会话 ID 查找执行记录"""
+        """
+        根据会话 ID 查找执行记录
+
+        按 (f_created_at, f_id) 倒序，走 t_sandbox_execution_idx_session_created_at 索引。
+        """
+        stmt = self._WITH_PAYLOAD.where(ExecutionModel.f_session_id == session_id)
+        if after is not None:
+            stmt = stmt.where(
+                or_(
+                    ExecutionModel.f_created_at < after.created_at_ms,
+                    and_(
+                        ExecutionModel.f_created_at == after.created_at_ms,
+                        ExecutionModel.f_id < after.id,
+                    ),
+                )
+            )
         stmt = (
-            select(ExecutionModel)
-            .where(ExecutionModel.f_session_id == session_id)
-            .order_by(ExecutionModel.f_created_at.desc())
+            stmt
+            .order_by(ExecutionModel.f_created_at.desc(), ExecutionModel.f_id.desc())
             .limit(limit)
         )
+        result = await self._execute_read(stmt, session_id, listing=True)
+        return [model.to_entity(payload) for model, payload in result.all()]
+
+    async def count_by_session_id(self, session_id: str, exact: bool = True) -> RowCount:
+        """统计会话的执行记录数量（exact=False 时使用优化器估算）"""
+        if not exact:
+            estimate = await estimate_row_count(
+                lambda stmt: self._execute_read(stmt, session_id, listing=True),
+                select(ExecutionModel.f_id).where(ExecutionModel.f_session_id == session_id),
+                self._session.get_bind().dialect,
+            )
+            if estimate is not None:
+                return RowCount(estimate, is_estimate=True)
+
+        stmt = (
+            select(func.count())
+            .select_from(ExecutionModel)
+            .where(ExecutionModel.f_session_id == session_id)
+        )
+        result = await self._execute_read(stmt, session_id, listing=True)
+        return RowCount(result.scalar() or 0)
+
+    async def has_active_executions(self, session_id: str) -> bool:
+        """会话是否有未结束的执行（只读取热表，走 t_sandbox_execution_idx_session_created_at 索引）"""
+        stmt = (
+            select(ExecutionModel.f_id)
+            .where(
+                ExecutionModel.f_session_id == session_id,
+                ExecutionModel.f_status.in_(self._ACTIVE_STATUSES),
+            )
+            .limit(1)
+        )
         result = await self._session.execute(stmt)
-        return [model.to_entity() for model in result.scalars().all()]
+        return result.first() is not None
 
     async def find_by_status(self, status: str, limit: int = 100) -> List[Execution]:
-        """根据状态查找执行记录"""
+        """根据状态查找执行记录（只读取热表）"""
         stmt = (
             select(ExecutionModel)
             .where(ExecutionModel.f_status == status)
@@ -98,23 +318,90 @@ class SqlExecutionRepository(IExecutionRepository):
 
     async def find_heartbeat_timeouts(
         self,
-        timeout_threshold: datetime
+        timeout_threshold: datetime,
+        limit: int = 500,
     ) -> List[Execution]:
-        """查找心跳超时的执行"""
-        # 注意：last_heartbeat_at 字段不在数据库模型中
-        return []
+        """
+        查找心跳超时的执行（只读取热表）
+
+        只有收到过心跳的执行才会进入运行中状态，走 t_sandbox_execution_idx_status_last_heartbeat_at
+        的范围扫描。待执行的记录不在此检测：投递前由分发队列负责（重试与放弃），
+        投递成功时分发服务写入首次心跳并转为运行中，执行器之后不再发送心跳也会在此超时。
+        读主库：检测结果随即用于写入崩溃状态。
+        """
+        threshold_ms = int(timeout_threshold.timestamp() * 1000)
+        stmt = (
+            select(ExecutionModel)
+            .where(
+                ExecutionModel.f_status == ExecutionStatus.RUNNING.value,
+                ExecutionModel.f_last_heartbeat_at > 0,
+                ExecutionModel.f_last_heartbeat_at < threshold_ms,
+            )
+            .limit(limit)
+        )
+        result = await self._session.execute(stmt)
+        return [model.to_entity() for model in result.scalars().all()]
+
+    async def touch_heartbeats(self, heartbeats: Dict[str, datetime]) -> int:
+        """
+        批量更新执行最后心跳时间
+
+        单条 UPDATE ... SET f_last_heartbeat_at = CASE f_id WHEN ... END WHERE f_id IN (...)，
+        只更新待执行与运行中的行：结果已写入或已判定崩溃的执行不会被迟到的心跳改回运行中。
+        """
+        if not heartbeats:
+            return 0
+
+        execution_ids = list(heartbeats)
+        stmt = (
+            update(ExecutionModel)
+            .where(
+                ExecutionModel.f_id.in_(execution_ids),
+                ExecutionModel.f_status.in_(self._HEARTBEAT_STATUSES),
+            )
+            .values(
+                f_last_heartbeat_at=case(
+                    {
+                        execution_id: int(at.timestamp() * 1000)
+                        for execution_id, at in heartbeats.items()
+                    },
+                    value=ExecutionModel.f_id,
+                ),
+                f_status=ExecutionStatus.RUNNING.value,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = await self._session.execute(stmt)
+        await self._session.flush()
+        self._note_write(*execution_ids)
+        return result.rowcount
 
     async def delete(self, execution_id: str) -> None:
         """删除执行记录"""
+        await self._session.execute(
+            delete(ExecutionPayloadModel).where(ExecutionPayloadModel.f_execution_id == execution_id)
+        )
         stmt = delete(ExecutionModel).where(ExecutionModel.f_id == execution_id)
         await self._session.execute(stmt)
         await self._session.flush()
+        self._note_write(execution_id)
 
     async def delete_by_session_id(self, session_id: str) -> None:
         """删除会话的所有执行记录"""
+        await self._session.execute(
+            delete(ExecutionPayloadModel).where(
+                ExecutionPayloadModel.f_execution_id.in_(
+                    select(ExecutionModel.f_id).where(ExecutionModel.f_session_id == session_id)
+                )
+            )
+        )
         stmt = delete(ExecutionModel).where(ExecutionModel.f_session_id == session_id)
         await self._session.execute(stmt)
+        await self._session.execute(
+            delete(ExecutionArchiveModel).where(ExecutionArchiveModel.f_session_id == session_id)
+        )
         await self._session.flush()
+        self._note_write(session_id)
 
     async def count_by_status(self, status: str) -> int:
         """统计指定状态的执行数量"""
@@ -125,3 +412,99 @@ class SqlExecutionRepository(IExecutionRepository):
         )
         result = await self._session.execute(stmt)
         return result.scalar() or 0
+
+    async def find_archivable(
+        self,
+        created_before: datetime,
+        limit: int = 500,
+    ) -> List[Execution]:
+        """
+        查找可归档的执行
+
+        只返回已结束的执行，按 (f_created_at, f_id) 正序，使每批都从最旧的记录开始。
+        状态写成 NOT IN 未结束状态：过期区间内几乎都是已结束的执行，按状态过滤
+        没有选择性，这样优化器沿 t_sandbox_execution_idx_created_at_id 顺序读取，
+        取满一批即停止，不必对过期区间排序。
+        """
+        created_before_ms = int(created_before.timestamp() * 1000)
+        stmt = (
+            self._WITH_PAYLOAD
+            .where(
+                ExecutionModel.f_created_at < created_before_ms,
+                ExecutionModel.f_status.notin_(self._ACTIVE_STATUSES),
+            )
+            .order_by(ExecutionModel.f_created_at.asc(), ExecutionModel.f_id.asc())
+            .limit(limit)
+        )
+        result = await self._session.execute(stmt)
+        return [model.to_entity(payload) for model, payload in result.all()]
+
+    async def mark_archived(self, archive_path: str, executions: List[Execution]) -> None:
+        """
+        登记归档索引并删除已归档的执行
+
+        归档索引用一条多行 INSERT 写入（重复归档时覆盖归档路径），
+        热表与载荷表按主键各一条批量 DELETE，单条语句影响的行数由调用方的批大小限制。
+        """
+        if not executions:
+            return
+
+        now_ms = int(time.time() * 1000)
+        await self._upsert_archive_index([
+            {
+                "f_execution_id": execution.id,
+                "f_session_id": execution.session_id,
+                "f_archive_path": archive_path,
+                "f_created_at": int(execution.created_at.timestamp() * 1000),
+                "f_archived_at": now_ms,
+            }
+            for execution in executions
+        ])
+
+        execution_ids = [execution.id for execution in executions]
+        await self._session.execute(
+            delete(ExecutionPayloadModel).where(ExecutionPayloadModel.f_execution_id.in_(execution_ids))
+        )
+        await self._session.execute(
+            delete(ExecutionModel).where(ExecutionModel.f_id.in_(execution_ids))
+        )
+        await self._session.flush()
+        self._note_write(*execution_ids, *{execution.session_id for execution in executions})
+
+    async def _upsert_archive_index(self, rows: List[Dict]) -> None:
+        """
+        批量写入归档索引
+
+        上次归档在删除热表前中断时索引行已存在，按方言使用 ON DUPLICATE KEY UPDATE /
+        ON CONFLICT DO UPDATE 覆盖；其他方言先按主键批量删除再插入。
+        """
+        table = ExecutionArchiveModel.__table__
+        dialect = self._session.get_bind().dialect.name
+        updated_columns = ("f_session_id", "f_archive_path", "f_created_at", "f_archived_at")
+
+        if dialect == "mysql":
+            stmt = mysql_insert(table).values(rows)
+            stmt = stmt.on_duplicate_key_update({
+                column: stmt.inserted[column] for column in updated_columns
+            })
+        elif dialect in ("sqlite", "postgresql"):
+            dialect_insert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+            stmt = dialect_insert(table).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.f_execution_id],
+                set_={column: stmt.excluded[column] for column in updated_columns},
+            )
+        else:
+            await self._session.execute(
+                delete(table).where(table.c.f_execution_id.in_([row["f_execution_id"] for row in rows]))
+            )
+            stmt = insert(table).values(rows)
+
+        await self._session.execute(stmt)
+
+    async def find_archive_path(self, execution_id: str) -> Optional[str]:
+        """查找已归档执行所在的归档文件路径"""
+        stmt = select(ExecutionArchiveModel.f_archive_path).where(
+            ExecutionArchiveModel.f_execution_id == execution_id
+        )
+        return await self._fetch_by_id(stmt, execution_id, lambda result: result.scalar_one_or_none())
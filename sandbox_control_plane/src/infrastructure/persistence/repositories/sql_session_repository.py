@@ -5,14 +5,19 @@
 按照数据表命名规范使用 f_ 前缀字段名。
 """
 import time
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional
 from datetime import datetime
-from sqlalchemy import select, update, delete, func
+from sqlalchemy import and_, case, or_, select, update, delete, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.domain.repositories.session_repository import ISessionRepository
 from src.domain.entities.session import Session
+from src.domain.value_objects.page_cursor import PageCursor
+from src.domain.value_objects.row_count import RowCount
 from src.infrastructure.persistence.models.session_model import SessionModel
+from src.infrastructure.persistence.read_routing import ReadRouter
+from src.infrastructure.persistence.utils.count_estimate import estimate_row_count
+from src.shared.errors.domain import ConflictError
 
 
 class SqlSessionRepository(ISessionRepository):
@@ -22,71 +27,103 @@ class SqlSessionRepository(ISessionRepository):
     这是基础设施层的 Adapter，实现领域层定义的 Port。
     """
 
-    def __init__(self, session: AsyncSession, execution_repo=None):
+    def __init__(self, session: AsyncSession, execution_repo=None, read_router: Optional[ReadRouter] = None):
         self._session = session
         self._execution_repo = execution_repo
+        self._read_router = read_router
+
+    def _note_write(self, session_id: str) -> None:
+        if self._read_router:
+            self._read_router.note_write(session_id)
+
+    async def _execute_read(self, stmt, key: Optional[str] = None, listing: bool = False):
+        """执行只读查询（配置了读路由时可能走从库；列表查询默认走主库）"""
+        if self._read_router:
+            return await self._read_router.execute(self._session, stmt, key, listing)
+        return await self._session.execute(stmt)
 
     async def save(self, session: Session) -> None:
-        """保存会话"""
-        import json
+        """
+        保存会话
+
+        已从数据库加载的会话只写回变更过的列，并以加载时的状态做乐观并发校验：
+        UPDATE ... WHERE f_id = :id AND f_status = :persisted_status。
+        状态已被其他实例修改时抛出 ConflictError，避免后写覆盖先写。
+        """
+        if session.persisted_status is None:
+            await self._save_full(session)
+            session.mark_persisted()
+            self._note_write(session.id)
+            return
+
+        dirty_fields = session.dirty_fields
+        if not dirty_fields:
+            return
+
+        values = SessionModel.column_values(session, dirty_fields)
+        values["f_updated_at"] = int(time.time() * 1000)
+
+        stmt = (
+            update(SessionModel)
+            .where(
+                SessionModel.f_id == session.id,
+                SessionModel.f_status == session.persisted_status.value,
+            )
+            .values(**values)
+        )
+        result = await self._session.execute(stmt)
+        if result.rowcount == 0:
+            raise ConflictError(
+                f"Session {session.id} was modified concurrently "
+                f"(expected status: {session.persisted_status.value})"
+            )
+        session.mark_persisted()
+        self._note_write(session.id)
+
+    async def commit(self) -> None:
+        """Explicitly commit the transaction"""
+        await self._session.commit()
+
+    async def _save_full(self, session: Session) -> None:
+        """保存未跟踪的会话：不存在则插入，存在则整行覆盖"""
         model = await self._session.get(SessionModel, session.id)
-        now_ms = int(time.time() * 1000)
 
         if model:
-            # 更新现有记录
-            model.f_template_id = session.template_id
-            model.f_status = session.status.value if hasattr(session.status, 'value') else session.status
-            model.f_runtime_type = session.runtime_type
-            model.f_runtime_node = session.runtime_node or ""
-            model.f_container_id = session.container_id or ""
-            model.f_pod_name = session.pod_name or ""
-            model.f_workspace_path = session.workspace_path
-            model.f_resources_cpu = session.resource_limit.cpu
-            model.f_resources_memory = session.resource_limit.memory
-            model.f_resources_disk = session.resource_limit.disk
-            model.f_env_vars = json.dumps(session.env_vars, ensure_ascii=False) if session.env_vars else ""
-            model.f_timeout = session.timeout
-            model.f_python_package_index_url = session.python_package_index_url
-            model.f_last_activity_at = int(session.last_activity_at.timestamp() * 1000) if session.last_activity_at else now_ms
-            model.f_updated_at = now_ms
-            model.f_completed_at = int(session.completed_at.timestamp() * 1000) if session.completed_at else 0
-
-            # 依赖安装字段
-            model.f_requested_dependencies = json.dumps(session.requested_dependencies, ensure_ascii=False) if session.requested_dependencies else ""
-            if session.installed_dependencies:
-                deps_list = [
-                    {
-                        "name": dep.name,
-                        "version": dep.version,
-                        "install_location": dep.install_location,
-                        "install_time": dep.install_time.isoformat(),
-                        "is_from_template": dep.is_from_template,
-                    }
-                    for dep in session.installed_dependencies
-                ]
-                model.f_installed_dependencies = json.dumps(deps_list, ensure_ascii=False)
-            model.f_dependency_install_status = session.dependency_install_status
-            model.f_dependency_install_error = session.dependency_install_error or ""
-            model.f_dependency_install_started_at = int(session.dependency_install_started_at.timestamp() * 1000) if session.dependency_install_started_at else 0
-            model.f_dependency_install_completed_at = int(session.dependency_install_completed_at.timestamp() * 1000) if session.dependency_install_completed_at else 0
+            for column, value in SessionModel.column_values(session).items():
+                setattr(model, column, value)
+            model.f_updated_at = int(time.time() * 1000)
         else:
-            # 创建新记录
             model = SessionModel.from_entity(session)
             self._session.add(model)
 
         await self._session.flush()
 
+    def _to_entity(self, model: Optional[SessionModel]) -> Optional[Session]:
+        """转换为实体并标记为已持久化"""
+        if model is None:
+            return None
+        entity = model.to_entity()
+        entity.mark_persisted()
+        return entity
+
     async def find_by_id(self, session_id: str) -> Optional[Session]:
         """根据 ID 查找会话"""
+        if self._read_router and self._read_router.use_replica(session_id):
+            stmt = select(SessionModel).where(SessionModel.f_id == session_id)
+            model = await self._read_router.fetch_by_id(
+                self._session, stmt, session_id, lambda result: result.scalar_one_or_none()
+            )
+            return self._to_entity(model)
+
         model = await self._session.get(SessionModel, session_id)
-        return model.to_entity() if model else None
+        return self._to_entity(model)
 
     async def find_by_container_id(self, container_id: str) -> Optional[Session]:
         """根据容器 ID 查找会话"""
         stmt = select(SessionModel).where(SessionModel.f_container_id == container_id)
         result = await self._session.execute(stmt)
         model = result.scalar_one_or_none()
-        return model.to_entity() if model else None
+        return self._to_entity(model)
 
     async def find_by_status(self, status: str, limit: int = 100) -> List[Session]:
         """根据状态查找会话"""
@@ -96,13 +133,51 @@ class SqlSessionRepository(ISessionRepository):
             .limit(limit)
         )
         result = await self._session.execute(stmt)
-        return [model.to_entity() for model in result.scalars().all()]
+        return [self._to_entity(model) for model in result.scalars().all()]
+
+    async def iter_by_status(self, status: str, page_size: int = 500) -> AsyncIterator[List[Session]]:
+        """
+        按状态分页遍历全部会话
+
+        按 (f_created_at, f_id) 升序做键集分页，由 t_sandbox_session_idx_status_created_at 支撑，
+        每页都是一次索引范围扫描。始终读主库：后台任务需要根据最新状态做决策。
+        """
+        after = None
+        while True:
+            stmt = select(SessionModel).where(SessionModel.f_status == status)
+            if after is not None:
+                created_at_ms, session_id = after
+                stmt = stmt.where(
+                    or_(
+                        SessionModel.f_created_at > created_at_ms,
+                        and_(
+                            SessionModel.f_created_at == created_at_ms,
+                            SessionModel.f_id > session_id,
+                        ),
+                    )
+                )
+            stmt = stmt.order_by(SessionModel.f_created_at, SessionModel.f_id).limit(page_size)
+
+            result = await self._session.execute(stmt)
+            models = result.scalars().all()
+            if not models:
+                return
+
+            page = [self._to_entity(model) for model in models]
+            after = (models[-1].f_created_at, models[-1].f_id)
+            # 写回走 UPDATE 语句而不是 ORM 对象，移出标识映射，避免整轮遍历的模型常驻内存
+            for model in models:
+                self._session.expunge(model)
+
+            yield page
+            if len(models) < page_size:
+                return
 
     async def find_by_template(self, template_id: str) -> List[Session]:
         """根据模板 ID 查找会话"""
         stmt = select(SessionModel).where(SessionModel.f_template_id == template_id)
         result = await self._session.execute(stmt)
-        return [model.to_entity() for model in result.scalars().all()]
+        return [self._to_entity(model) for model in result.scalars().all()]
 
     async def find_idle_sessions(self, idle_threshold: datetime) -> List[Session]:
         """查找空闲会话"""
@@ -115,7 +190,36 @@ class SqlSessionRepository(ISessionRepository):
             )
         )
         result = await self._session.execute(stmt)
-        return [model.to_entity() for model in result.scalars().all()]
+        return [self._to_entity(model) for model in result.scalars().all()]
+
+    async def touch_last_activity(self, activity: Dict[str, datetime]) -> int:
+        """
+        批量更新会话最后活动时间
+
+        单条 UPDATE ... SET f_last_activity_at = CASE f_id WHEN ... END WHERE f_id IN (...)，
+        只写活动时间列，不参与 save() 的状态乐观校验。
+        """
+        if not activity:
+            return 0
+
+        session_ids = list(activity)
+        stmt = (
+            update(SessionModel)
+            .where(SessionModel.f_id.in_(session_ids))
+            .values(
+                f_last_activity_at=case(
+                    {
+                        session_id: int(last_activity_at.timestamp() * 1000)
+                        for session_id, last_activity_at in activity.items()
+                    },
+                    value=SessionModel.f_id,
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = await self._session.execute(stmt)
+        await self._session.flush()
+        return result.rowcount
 
     async def find_expired_sessions(self, created_before: datetime) -> List[Session]:
         """查找过期会话"""
@@ -126,7 +230,7 @@ class SqlSessionRepository(ISessionRepository):
             .where(SessionModel.f_status.in_(["creating", "running"]))
         )
         result = await self._session.execute(stmt)
-        return [model.to_entity() for model in result.scalars().all()]
+        return [self._to_entity(model) for model in result.scalars().all()]
 
     async def delete(self, session_id: str) -> None:
         """
@@ -141,6 +245,7 @@ class SqlSessionRepository(ISessionRepository):
         stmt = delete(SessionModel).where(SessionModel.f_id == session_id)
         await self._session.execute(stmt)
         await self._session.flush()
+        self._note_write(session_id)
 
     async def exists(self, session_id: str) -> bool:
         """检查会话是否存在"""
@@ -173,66 +278,92 @@ class SqlSessionRepository(ISessionRepository):
         status: Optional[str] = None,
         template_id: Optional[str] = None,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        after: Optional[PageCursor] = None,
     ) -> List[Session]:
         """
         查找会话列表（支持筛选和分页）
 
+        按 (f_created_at, f_id) 倒序，由 t_sandbox_session_idx_created_at_id /
+        t_sandbox_session_idx_status_created_at 索引支撑。
+
         Args:
             status: 会话状态筛选（可选）
             template_id: 模板 ID 筛选（可选）
-            limit: 返回数量限制（1-200，默认 50）
-            offset: 偏移量（用于分页）
+            limit: 返回数量限制（1-201，调用方多取一条判断是否有下一页）
+            offset: 偏移量（兼容旧接口，提供 after 时忽略）
+            after: 键集分页游标，返回严格位于该位置之后的记录
 
         Returns:
             会话列表
         """
         # 验证 limit 范围
-        limit = max(1, min(limit, 200))
+        limit = max(1, min(limit, 201))
         offset = max(0, offset)
 
         # 构建查询
-        stmt = select(SessionModel)
-
-        # 添加筛选条件
-        if status:
-            stmt = stmt.where(SessionModel.f_status == status)
-        if template_id:
-            stmt = stmt.where(SessionModel.f_template_id == template_id)
+        stmt = self._filter_sessions(select(SessionModel), status, template_id)
+
+        if after is not None:
+            stmt = stmt.where(
+                or_(
+                    SessionModel.f_created_at < after.created_at_ms,
+                    and_(
+                        SessionModel.f_created_at == after.created_at_ms,
+                        SessionModel.f_id < after.id,
+                    ),
+                )
+            )
 
         # 排序和分页
         stmt = (
             stmt
-            .order_by(SessionModel.f_created_at.desc())
+            .order_by(SessionModel.f_created_at.desc(), SessionModel.f_id.desc())
             .limit(limit)
-            .offset(offset)
         )
+        if after is None and offset:
+            stmt = stmt.offset(offset)
 
-        result = await self._session.execute(stmt)
-        return [model.to_entity() for model in result.scalars().all()]
+        result = await self._execute_read(stmt, listing=True)
+        return [self._to_entity(model) for model in result.scalars().all()]
 
     async def count_sessions(
         self,
         status: Optional[str] = None,
-        template_id: Optional[str] = None
-    ) -> int:
+        template_id: Optional[str] = None,
+        exact: bool = True,
+    ) -> RowCount:
         """
         统计会话数量（支持筛选）
 
         Args:
             status: 会话状态筛选（可选）
             template_id: 模板 ID 筛选（可选）
+            exact: False 时使用优化器估算行数（MariaDB），不支持估算的数据库回退到精确计数
 
         Returns:
-            会话总数
+            会话总数（is_estimate 标明是否为估算值）
         """
-        stmt = select(func.count()).select_from(SessionModel)
+        if not exact:
+            estimate = await estimate_row_count(
+                lambda stmt: self._execute_read(stmt, listing=True),
+                self._filter_sessions(select(SessionModel.f_id), status, template_id),
+                self._session.get_bind().dialect,
+            )
+            if estimate is not None:
+                return RowCount(estimate, is_estimate=True)
+
+        stmt = self._filter_sessions(
+            select(func.count()).select_from(SessionModel), status, template_id
+        )
+        result = await self._execute_read(stmt, listing=True)
+        return RowCount(result.scalar() or 0)
 
-        # 添加筛选条件
+    @staticmethod
+    def _filter_sessions(stmt, status: Optional[str], template_id: Optional[str]):
+        """添加列表筛选条件"""
         if status:
             stmt = stmt.where(SessionModel.f_status == status)
         if template_id:
             stmt = stmt.where(SessionModel.f_template_id == template_id)
-
-        result = await self._session.execute(stmt)
-        return result.scalar() or 0
+        return stmt
@@ -0,0 +1,213 @@
+"""
+workspace 文件清单仓储实现
+
+使用 SQLAlchemy 实现 workspace 文件清单仓储接口。
+按照数据表命名规范使用 f_ 前缀字段名。
+"""
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domain.repositories.workspace_manifest_repository import IWorkspaceManifestRepository
+from src.domain.value_objects.workspace_file import WorkspaceFile
+from src.infrastructure.persistence.models.workspace_manifest_model import (
+    WorkspaceFileModel,
+    WorkspaceManifestModel,
+)
+
+# 单条 INSERT / DELETE 语句携带的最大行数
+_BATCH_SIZE = 1000
+
+
+def _to_ms(value: Optional[datetime]) -> int:
+    return int(value.timestamp() * 1000) if value else 0
+
+
+def _from_ms(value: int) -> Optional[datetime]:
+    return datetime.fromtimestamp(value / 1000, tz=timezone.utc) if value else None
+
+
+class SqlWorkspaceManifestRepository(IWorkspaceManifestRepository):
+    """
+    workspace 文件清单仓储实现
+
+    这是基础设施层的 Adapter，实现领域层定义的 Port。
+    新增或覆盖记录先按主键删除再批量插入，不依赖方言特定的 upsert 语法。
+
+    清单与请求共用数据库会话，每个写方法在 SAVEPOINT 中执行：
+    写入失败（如并发写入同一主键）只回滚本次清单变更，请求的外层事务仍可提交。
+    """
+
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def commit(self) -> None:
+        """Explicitly commit the transaction"""
+        await self._session.commit()
+
+    async def get_reconciled_at(self, session_id: str) -> Optional[datetime]:
+        """最近一次对账时间"""
+        result = await self._session.execute(
+            select(WorkspaceManifestModel.f_reconciled_at)
+            .where(WorkspaceManifestModel.f_session_id == session_id)
+        )
+        return _from_ms(result.scalar_one_or_none() or 0)
+
+    async def list_files(self, session_id: str, prefix: str = "", limit: int = 1000) -> List[WorkspaceFile]:
+        """按路径顺序列出文件"""
+        stmt = (
+            select(WorkspaceFileModel)
+            .where(WorkspaceFileModel.f_session_id == session_id)
+            .order_by(WorkspaceFileModel.f_path)
+            .limit(limit)
+        )
+        if prefix:
+            stmt = stmt.where(WorkspaceFileModel.f_path.startswith(prefix, autoescape=True))
+
+        result = await self._session.execute(stmt)
+        return [
+            WorkspaceFile(
+                path=model.f_path,
+                size=model.f_size,
+                etag=model.f_etag or None,
+                modified_at=_from_ms(model.f_modified_at),
+            )
+            for model in result.scalars().all()
+        ]
+
+    async def count_files(self, session_id: str, prefix: str = "") -> int:
+        """统计文件数"""
+        stmt = select(func.count()).where(WorkspaceFileModel.f_session_id == session_id)
+        if prefix:
+            stmt = stmt.where(WorkspaceFileModel.f_path.startswith(prefix, autoescape=True))
+
+        result = await self._session.execute(stmt)
+        return result.scalar_one()
+
+    async def upsert_files(self, session_id: str, files: List[WorkspaceFile]) -> None:
+        """新增或覆盖文件记录"""
+        if not files:
+            return
+
+        async with self._session.begin_nested():
+            await self._delete_paths(session_id, [file.path for file in files])
+            await self._insert(session_id, files, int(time.time() * 1000))
+
+    async def remove_files(self, session_id: str, paths: List[str]) -> None:
+        """删除文件记录"""
+        async with self._session.begin_nested():
+            await self._delete_paths(session_id, paths)
+
+    async def replace_files(self, session_id: str, files: List[WorkspaceFile], listed_at: datetime) -> None:
+        """
+        以列表结果替换清单
+
+        只删除列表开始前写入的记录；列表开始后写入的记录（并发上传）保留，
+        列表结果中与之重复的路径不再插入。
+        先写清单行：同一会话的并发对账在清单行的行锁上排队。
+        """
+        listed_ms = _to_ms(listed_at)
+
+        async with self._session.begin_nested():
+            await self._upsert_manifest(session_id, listed_ms)
+            await self._session.execute(
+                delete(WorkspaceFileModel)
+                .where(
+                    WorkspaceFileModel.f_session_id == session_id,
+                    WorkspaceFileModel.f_updated_at < listed_ms,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            result = await self._session.execute(
+                select(WorkspaceFileModel.f_path).where(WorkspaceFileModel.f_session_id == session_id)
+            )
+            newer = set(result.scalars().all())
+            await self._insert(session_id, [file for file in files if file.path not in newer], listed_ms)
+
+    async def mark_stale(self, session_ids: List[str]) -> None:
+        """标记清单过期"""
+        if not session_ids:
+            return
+
+        async with self._session.begin_nested():
+            await self._session.execute(
+                update(WorkspaceManifestModel)
+                .where(WorkspaceManifestModel.f_session_id.in_(session_ids))
+                .values(f_reconciled_at=0, f_updated_at=int(time.time() * 1000))
+                .execution_options(synchronize_session=False)
+            )
+
+    async def find_due(self, reconciled_before: datetime, limit: int) -> List[str]:
+        """对账时间最早的清单排在前面"""
+        result = await self._session.execute(
+            select(WorkspaceManifestModel.f_session_id)
+            .where(WorkspaceManifestModel.f_reconciled_at < _to_ms(reconciled_before))
+            .order_by(WorkspaceManifestModel.f_reconciled_at)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def delete_session(self, session_id: str) -> None:
+        """删除会话的清单"""
+        async with self._session.begin_nested():
+            for model in (WorkspaceFileModel, WorkspaceManifestModel):
+                await self._session.execute(
+                    delete(model)
+                    .where(model.f_session_id == session_id)
+                    .execution_options(synchronize_session=False)
+                )
+
+    async def _upsert_manifest(self, session_id: str, reconciled_ms: int) -> None:
+        """
+        更新或插入清单行
+
+        并发首次对账时双方都可能更新 0 行；插入冲突说明另一方已插入，改为更新（等待其提交后取得行锁）。
+        """
+        stmt = (
+            update(WorkspaceManifestModel)
+            .where(WorkspaceManifestModel.f_session_id == session_id)
+            .values(f_reconciled_at=reconciled_ms, f_updated_at=int(time.time() * 1000))
+            .execution_options(synchronize_session=False)
+        )
+        if (await self._session.execute(stmt)).rowcount > 0:
+            return
+
+        try:
+            async with self._session.begin_nested():
+                await self._session.execute(insert(WorkspaceManifestModel).values(
+                    f_session_id=session_id,
+                    f_reconciled_at=reconciled_ms,
+                    f_updated_at=int(time.time() * 1000),
+                ))
+        except IntegrityError:
+            await self._session.execute(stmt)
+
+    async def _delete_paths(self, session_id: str, paths: List[str]) -> None:
+        for start in range(0, len(paths), _BATCH_SIZE):
+            await self._session.execute(
+                delete(WorkspaceFileModel)
+                .where(
+                    WorkspaceFileModel.f_session_id == session_id,
+                    WorkspaceFileModel.f_path.in_(paths[start:start + _BATCH_SIZE]),
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+    async def _insert(self, session_id: str, files: List[WorkspaceFile], updated_ms: int) -> None:
+        rows = [
+            {
+                "f_session_id": session_id,
+                "f_path": file.path,
+                "f_size": file.size,
+                "f_etag": file.etag or "",
+                "f_modified_at": _to_ms(file.modified_at),
+                "f_updated_at": updated_ms,
+            }
+            for file in files
+        ]
+        for start in range(0, len(rows), _BATCH_SIZE):
+            await self._session.execute(insert(WorkspaceFileModel), rows[start:start + _BATCH_SIZE])
@@ -0,0 +1,49 @@
+"""
+会话活动时间写缓冲
+
+执行与文件操作只在内存中记录会话的最后活动时间，由后台任务周期性地
+合并写回数据库，避免每个请求额外产生一次 UPDATE。
+"""
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional
+
+from src.infrastructure.metrics import (
+    SESSION_ACTIVITY_FLUSH_SECONDS,
+    SESSION_ACTIVITY_FLUSH_TOTAL,
+    SESSION_ACTIVITY_FLUSHED_SESSIONS_TOTAL,
+    SESSION_ACTIVITY_PENDING,
+)
+from src.infrastructure.persistence.write_behind_buffer import WriteBehindBuffer
+
+# 写回函数：接收 {session_id: last_activity_at}，返回实际更新的行数
+ActivityWriter = Callable[[Dict[str, datetime]], Awaitable[int]]
+
+
+class SessionActivityBuffer(WriteBehindBuffer):
+    """
+    会话活动时间写缓冲
+
+    按会话 ID 合并的写缓冲，每批用一条批量 UPDATE 写回 last_activity_at。
+    """
+
+    def __init__(self, writer: ActivityWriter, max_batch: int = 500):
+        """
+        Args:
+            writer: 写回函数（通常在新的数据库会话中调用仓储 touch_last_activity）
+            max_batch: 单条 UPDATE 最多包含的会话数
+        """
+        super().__init__(
+            writer,
+            max_batch=max_batch,
+            description="session activity",
+            pending_gauge=SESSION_ACTIVITY_PENDING,
+            flush_seconds=SESSION_ACTIVITY_FLUSH_SECONDS,
+        )
+
+    def touch(self, session_id: str, at: Optional[datetime] = None) -> None:
+        """记录会话活动"""
+        self.record(session_id, at)
+
+    def _on_batch_flushed(self, count: int) -> None:
+        SESSION_ACTIVITY_FLUSH_TOTAL.inc()
+        SESSION_ACTIVITY_FLUSHED_SESSIONS_TOTAL.inc(count)
@@ -0,0 +1,142 @@
+"""
+模板进程内缓存
+
+模板很少变化，却在每次创建会话时被读取（会话服务校验模板、调度器取镜像）。
+缓存按模板 ID 读穿透加载，本实例的写入立即失效对应条目；
+其他副本的写入通过 t_sandbox_cache_version 的版本号传播，由后台任务周期性比对。
+"""
+import copy
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domain.entities.template import Template
+from src.infrastructure.logging import get_logger
+from src.infrastructure.metrics import (
+    TEMPLATE_CACHE_HITS_TOTAL,
+    TEMPLATE_CACHE_INVALIDATIONS_TOTAL,
+    TEMPLATE_CACHE_MISSES_TOTAL,
+    TEMPLATE_CACHE_SIZE,
+)
+from src.infrastructure.persistence.models.cache_version_model import CacheVersionModel
+
+logger = get_logger(__name__)
+
+# t_sandbox_cache_version 中模板缓存对应的行
+TEMPLATE_CACHE_NAME = "template"
+
+TemplateLoader = Callable[[str], Awaitable[Optional[Template]]]
+
+
+@dataclass
+class _CacheEntry:
+    template: Template
+    expires_at: float
+
+
+class TemplateCache:
+    """
+    模板进程内缓存
+
+    - 条目带有效期（兜底，版本检查失效时也不会无限期陈旧）
+    - 每次失效递增代号；加载开始后发生过失效的结果不写入缓存，
+      避免慢查询把失效前读到的旧模板放回缓存
+    - 不缓存不存在的模板（其他副本刚创建的模板可立即读到）
+    - 读写都做深拷贝，调用方修改实体不会影响缓存
+    """
+
+    def __init__(self, ttl_seconds: float = 300):
+        """
+        Args:
+            ttl_seconds: 条目有效期（秒）
+        """
+        self._ttl = ttl_seconds
+        self._entries: Dict[str, _CacheEntry] = {}
+        self._generation = 0
+        self._version: Optional[int] = None
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    async def get_or_load(self, template_id: str, loader: TemplateLoader) -> Optional[Template]:
+        """读取模板，未命中时通过 loader 加载并缓存"""
+        entry = self._entries.get(template_id)
+        if entry and entry.expires_at > time.monotonic():
+            self._hits += 1
+            TEMPLATE_CACHE_HITS_TOTAL.inc()
+            return copy.deepcopy(entry.template)
+
+        self._misses += 1
+        TEMPLATE_CACHE_MISSES_TOTAL.inc()
+        generation = self._generation
+        template = await loader(template_id)
+        if template is not None and generation == self._generation:
+            self._entries[template_id] = _CacheEntry(
+                template=copy.deepcopy(template),
+                expires_at=time.monotonic() + self._ttl,
+            )
+            TEMPLATE_CACHE_SIZE.set(len(self._entries))
+        return template
+
+    def invalidate(self, template_id: Optional[str] = None, reason: str = "write") -> None:
+        """失效单个模板（template_id 为 None 时清空）"""
+        self._generation += 1
+        if template_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(template_id, None)
+        self._invalidations += 1
+        TEMPLATE_CACHE_INVALIDATIONS_TOTAL.labels(reason=reason).inc()
+        TEMPLATE_CACHE_SIZE.set(len(self._entries))
+
+    def apply_version(self, version: int) -> bool:
+        """
+        应用数据库中的缓存版本号
+
+        Returns:
+            版本号变化（有副本写入过模板）并清空了缓存时返回 True
+        """
+        previous, self._version = self._version, version
+        if previous is None or previous == version:
+            return False
+
+        self.invalidate(reason="version")
+        logger.info("Template cache invalidated by version change", previous=previous, version=version)
+        return True
+
+    def stats(self) -> dict:
+        """缓存统计"""
+        lookups = self._hits + self._misses
+        return {
+            "size": len(self._entries),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self._invalidations,
+            "version": self._version,
+        }
+
+
+async def read_cache_version(session: AsyncSession, name: str) -> int:
+    """读取缓存版本号（行不存在时为 0）"""
+    result = await session.execute(
+        select(CacheVersionModel.f_version).where(CacheVersionModel.f_name == name)
+    )
+    return result.scalar_one_or_none() or 0
+
+
+async def bump_cache_version(session: AsyncSession, name: str) -> None:
+    """在当前事务中递增缓存版本号（行不存在时创建）"""
+    now_ms = int(time.time() * 1000)
+    result = await session.execute(
+        update(CacheVersionModel)
+        .where(CacheVersionModel.f_name == name)
+        .values(f_version=CacheVersionModel.f_version + 1, f_updated_at=now_ms)
+    )
+    if result.rowcount == 0:
+        await session.execute(
+            insert(CacheVersionModel).values(f_name=name, f_version=1, f_updated_at=now_ms)
+        )
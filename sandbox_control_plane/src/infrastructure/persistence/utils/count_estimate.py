@@ -0,0 +1,51 @@
+"""
+行数估算工具
+
+列表接口默认返回估算总数，避免每次翻页都执行 COUNT(*) 全量扫描。
+"""
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy.engine import Dialect
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN 语句：由方言编译内层 SELECT，筛选值仍以绑定参数传递"""
+
+    inherit_cache = False
+
+    def __init__(self, stmt: Select):
+        self.stmt = stmt
+
+
+@compiles(Explain)
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    return "EXPLAIN " + compiler.process(element.stmt, **kw)
+
+
+async def estimate_row_count(
+    execute: Callable[[Any], Awaitable[Any]],
+    stmt: Select,
+    dialect: Dialect,
+) -> Optional[int]:
+    """
+    使用 EXPLAIN 的优化器行数估算查询结果行数
+
+    Args:
+        execute: 执行语句的协程函数（主库或从库会话的 execute）
+        stmt: 待估算的 SELECT 语句（不含 LIMIT）
+        dialect: 数据库方言
+
+    Returns:
+        估算行数；方言不支持时返回 None，调用方应回退到精确计数
+    """
+    if dialect.name != "mysql":
+        return None
+
+    result = await execute(Explain(stmt))
+    row = result.mappings().first()
+    if row is None or row.get("rows") is None:
+        return 0
+    return int(row["rows"])
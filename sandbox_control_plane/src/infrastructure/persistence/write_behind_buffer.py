@@ -0,0 +1,123 @@
+"""
+按 ID 合并的写缓冲
+
+高频的时间戳更新（会话活动、执行心跳）只在内存中记录每个 ID 的最新时间，
+由后台任务周期性地调用写回函数批量落库，避免每次更新产生一次 UPDATE。
+"""
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+
+from prometheus_client import Gauge, Histogram
+
+from src.infrastructure.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 写回函数：接收 {id: 最新时间}，返回实际更新的行数
+TimestampWriter = Callable[[Dict[str, datetime]], Awaitable[int]]
+
+
+class WriteBehindBuffer:
+    """
+    按 ID 合并的写缓冲
+
+    - record() 只更新内存字典，同一 ID 多次记录只保留最新时间
+    - flush() 每次最多取 max_batch 个 ID，交给写回函数批量写回
+    - 写回失败时把本批放回缓冲（保留较新的时间），下次重试
+    """
+
+    def __init__(
+        self,
+        writer: TimestampWriter,
+        max_batch: int = 500,
+        description: str = "buffered timestamps",
+        pending_gauge: Optional[Gauge] = None,
+        flush_seconds: Optional[Histogram] = None,
+    ):
+        """
+        Args:
+            writer: 写回函数（通常在新的数据库会话中调用仓储的批量 UPDATE）
+            max_batch: 单次写回最多包含的 ID 数
+            description: 日志中的缓冲名称
+            pending_gauge: 待写回 ID 数指标（可选）
+            flush_seconds: 单次写回耗时指标（可选）
+        """
+        self._writer = writer
+        self._max_batch = max_batch
+        self._description = description
+        self._pending_gauge = pending_gauge
+        self._flush_seconds = flush_seconds
+        self._pending: Dict[str, datetime] = {}
+
+    @property
+    def pending_count(self) -> int:
+        """待写回的 ID 数"""
+        return len(self._pending)
+
+    def record(self, key: str, at: Optional[datetime] = None) -> None:
+        """记录一次更新"""
+        at = at or datetime.now()
+        current = self._pending.get(key)
+        if current is None or at > current:
+            self._pending[key] = at
+        self._update_pending_gauge()
+
+    def discard(self, keys: Iterable[str]) -> None:
+        """丢弃尚未写回的更新"""
+        for key in keys:
+            self._pending.pop(key, None)
+        self._update_pending_gauge()
+
+    async def flush(self) -> int:
+        """
+        写回缓冲中的全部更新（按 max_batch 分批）
+
+        Returns:
+            写回的 ID 数
+        """
+        flushed = 0
+        while self._pending:
+            batch = self._take_batch()
+            start = time.perf_counter()
+            try:
+                await self._writer(batch)
+            except Exception as e:
+                self._restore(batch)
+                logger.warning(
+                    f"Failed to flush {self._description}",
+                    entries=len(batch),
+                    error=str(e),
+                )
+                break
+            finally:
+                if self._flush_seconds is not None:
+                    self._flush_seconds.observe(time.perf_counter() - start)
+                self._update_pending_gauge()
+
+            self._on_batch_flushed(len(batch))
+            flushed += len(batch)
+
+        if flushed:
+            logger.debug(f"Flushed {self._description}", entries=flushed)
+        return flushed
+
+    def _on_batch_flushed(self, count: int) -> None:
+        """一批写回成功后调用（子类用于记录指标）"""
+
+    def _take_batch(self) -> Dict[str, datetime]:
+        """取出最多 max_batch 个 ID（在 await 之前完成，期间的新更新进入缓冲）"""
+        batch = {}
+        for key in list(self._pending)[:self._max_batch]:
+            batch[key] = self._pending.pop(key)
+        return batch
+
+    def _restore(self, batch: Dict[str, datetime]) -> None:
+        for key, at in batch.items():
+            current = self._pending.get(key)
+            if current is None or at > current:
+                self._pending[key] = at
+
+    def _update_pending_gauge(self) -> None:
+        if self._pending_gauge is not None:
+            self._pending_gauge.set(len(self._pending))
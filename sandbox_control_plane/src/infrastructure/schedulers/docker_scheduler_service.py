@@ -3,6 +3,7 @@ Docker 调度服务
 
 实现调度策略，选择最优节点并创建容器。
 """
+import time
 from typing import List, Optional
 
 from src.domain.services.scheduler import (
@@ -19,6 +20,8 @@ from src.infrastructure.container_scheduler.base import (
 )
 from src.infrastructure.executors import ExecutorClient
 from src.infrastructure.logging import get_logger
+from src.infrastructure.metrics import CONTAINER_PAUSE_TOTAL, CONTAINER_UNPAUSE_SECONDS
+from src.shared.utils.dependencies import build_venv_snapshot_command
 
 logger = get_logger(__name__)
 
@@ -301,6 +304,14 @@ class DockerSchedulerService(IScheduler):
             )
             raise
 
+    async def stop_container(self, container_id: str, timeout: int = 10) -> None:
+        """停止容器（拆除流水线的停止阶段）"""
+        await self._container_scheduler.stop_container(container_id, timeout=timeout)
+
+    async def remove_container(self, container_id: str) -> None:
+        """强制删除容器（拆除流水线的删除阶段）"""
+        await self._container_scheduler.remove_container(container_id, force=True)
+
     async def destroy_container(
         self,
         container_id: str,
@@ -323,6 +334,71 @@ class DockerSchedulerService(IScheduler):
             )
             raise
 
+    async def pause_container(self, container_id: str) -> bool:
+        """
+        暂停空闲容器
+
+        仅对运行中的容器执行 docker pause，已暂停或已退出的容器直接跳过。
+        运行时不支持冻结时不做任何处理。
+        """
+        if not self._container_scheduler.supports_pause:
+            return False
+
+        container_info = await self._container_scheduler.get_container_status(container_id)
+        if container_info.status != "running":
+            return False
+
+        await self._container_scheduler.pause_container(container_id)
+        CONTAINER_PAUSE_TOTAL.inc()
+        logger.info("Paused idle container", container_id=container_id)
+        return True
+
+    async def unpause_container(self, container_id: str) -> Optional[float]:
+        """
+        恢复已暂停的容器
+
+        在分发执行或文件操作前调用，记录恢复耗时。
+        运行时不支持冻结时容器不会处于暂停状态，跳过状态查询。
+        """
+        if not self._container_scheduler.supports_pause:
+            return None
+
+        container_info = await self._container_scheduler.get_container_status(container_id)
+        if container_info.status != "paused":
+            return None
+
+        started = time.perf_counter()
+        await self._container_scheduler.unpause_container(container_id)
+        elapsed = time.perf_counter() - started
+        CONTAINER_UNPAUSE_SECONDS.observe(elapsed)
+
+        latency_ms = elapsed * 1000
+        logger.info(
+            "Unpaused container",
+            container_id=container_id,
+            unpause_latency_ms=round(latency_ms, 2),
+        )
+        return latency_ms
+
+    async def snapshot_dependencies(self, container_id: str) -> bool:
+        """
+        快照容器内 /opt/sandbox-venv 到会话 workspace（休眠前调用）
+        """
+        result = await self._container_scheduler.exec_command(
+            container_id, build_venv_snapshot_command()
+        )
+        if result.exit_code != 0:
+            logger.error(
+                "Failed to snapshot session dependencies",
+                container_id=container_id,
+                exit_code=result.exit_code,
+                stderr=result.stderr,
+            )
+            raise RuntimeError(f"Dependency snapshot failed with exit code {result.exit_code}")
+
+        logger.info("Snapshotted session dependencies", container_id=container_id)
+        return True
+
     async def get_container_info(self, container_id: str):
         """获取容器信息"""
         return await self._container_scheduler.get_container_status(container_id)
@@ -18,6 +18,7 @@ from src.infrastructure.container_scheduler.base import (
     ContainerConfig,
 )
 from src.infrastructure.executors import ExecutorClient
+from src.shared.utils.dependencies import build_venv_snapshot_command
 
 logger = logging.getLogger(__name__)
 
@@ -160,6 +161,14 @@ class K8sSchedulerService(IScheduler):
             logger.error(f"Failed to create Pod for session {session_id}: {e}")
             raise
 
+    async def stop_container(self, container_id: str, timeout: int = 10) -> None:
+        """停止Pod（拆除流水线的停止阶段）"""
+        await self._container_scheduler.stop_container(container_id, timeout=timeout)
+
+    async def remove_container(self, container_id: str) -> None:
+        """强制删除Pod（拆除流水线的删除阶段）"""
+        await self._container_scheduler.remove_container(container_id, force=True)
+
     async def destroy_container(
         self,
         container_id: str,
@@ -176,6 +185,23 @@ class K8sSchedulerService(IScheduler):
             logger.error(f"Failed to destroy Pod {container_id}: {e}")
             raise
 
+    async def snapshot_dependencies(self, container_id: str) -> bool:
+        """
+        快照容器内 /opt/sandbox-venv 到会话 workspace（休眠前调用）
+        """
+        result = await self._container_scheduler.exec_command(
+            container_id, build_venv_snapshot_command()
+        )
+        if result.exit_code != 0:
+            logger.error(
+                f"Failed to snapshot session dependencies for Pod {container_id}: "
+                f"exit_code={result.exit_code}, stderr={result.stderr}"
+            )
+            raise RuntimeError(f"Dependency snapshot failed with exit code {result.exit_code}")
+
+        logger.info(f"Snapshotted session dependencies for Pod {container_id}")
+        return True
+
     async def get_container_info(self, container_id: str):
         """获取 Pod 信息"""
         return await self._container_scheduler.get_container_status(container_id)
@@ -3,6 +3,7 @@
 
 提供 S3 兼容的对象存储实现（AWS S3、MinIO）
 """
+from .async_s3_storage import AsyncS3Storage
 from .s3_storage import S3Storage
 
-__all__ = ["S3Storage"]
+__all__ = ["AsyncS3Storage", "S3Storage"]
@@ -0,0 +1,647 @@
+"""
+异步 S3 存储实现
+
+基于 httpx 的原生异步 S3 客户端，请求签名使用 botocore 的 SigV4 实现。
+
+与 S3Storage 的区别：
+- S3Storage 的每个调用通过 asyncio.to_thread 在默认线程池中执行，网络等待期间一直占用线程，
+  并发高时与 K8s 客户端等其他 to_thread 使用方争抢线程池
+- 本实现的网络等待不占用线程，所有请求复用同一个有上限的连接池
+- 元数据请求与内容传输分别设置超时；网络错误和 5xx 响应按指数退避重试
+
+使用路径风格寻址（endpoint/bucket/key），兼容 MinIO 与 AWS S3。
+"""
+import asyncio
+import base64
+import hashlib
+import logging
+import random
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote, urlencode, urlparse
+from xml.etree import ElementTree
+
+import httpx
+from botocore.auth import S3SigV4Auth, S3SigV4QueryAuth
+from botocore.awsrequest import AWSRequest
+from botocore.credentials import Credentials
+
+from src.domain.services.storage import IStorageService
+from src.infrastructure.config.settings import get_settings
+from src.infrastructure.storage.prefix_deletion import delete_prefix_pipelined
+from src.shared.errors.domain import ConflictError, NotFoundError
+from src.shared.errors.infrastructure import StorageError
+
+logger = logging.getLogger(__name__)
+
+# 流式读取对象内容的块大小
+STREAM_CHUNK_SIZE = 256 * 1024
+
+# 可重试的响应状态码（S3 在限流时返回 503 SlowDown）
+_RETRYABLE_STATUS = {500, 502, 503, 504}
+
+
+class S3RequestError(StorageError):
+    """S3 请求返回错误响应"""
+
+    def __init__(self, operation: str, status_code: int, code: str = "", message: str = ""):
+        self.operation = operation
+        self.status_code = status_code
+        self.code = code
+        super().__init__(f"S3 {operation} failed: HTTP {status_code} {code} {message}".strip())
+
+
+class AsyncS3Storage(IStorageService):
+    """
+    原生异步的 S3 兼容存储实现
+
+    从 settings 中读取 S3 配置与连接池、超时、重试参数：
+    - s3_max_connections: 连接池上限（所有请求共享）
+    - s3_connect_timeout_seconds: 建立连接超时
+    - s3_metadata_timeout_seconds: HEAD、列表、删除、分片控制等请求的读写超时
+    - s3_transfer_timeout_seconds: 对象内容上传下载的读写超时
+    - s3_max_attempts / s3_retry_base_delay_seconds: 重试次数与退避基数
+    - s3_delete_concurrency: 前缀删除时并发的 DeleteObjects 请求数
+    """
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        初始化异步 S3 客户端
+
+        Args:
+            transport: 自定义 httpx 传输层（测试时注入 MockTransport）
+        """
+        settings = get_settings()
+
+        self._endpoint = (
+            settings.s3_endpoint_url or f"https://s3.{settings.s3_region}.amazonaws.com"
+        ).rstrip("/")
+        self._region = settings.s3_region
+        self._bucket = settings.s3_bucket
+        self._credentials = Credentials(settings.s3_access_key_id, settings.s3_secret_access_key)
+
+        self._metadata_timeout = httpx.Timeout(
+            settings.s3_metadata_timeout_seconds,
+            connect=settings.s3_connect_timeout_seconds,
+        )
+        self._transfer_timeout = httpx.Timeout(
+            settings.s3_transfer_timeout_seconds,
+            connect=settings.s3_connect_timeout_seconds,
+        )
+        self._max_attempts = max(1, settings.s3_max_attempts)
+        self._retry_base_delay = settings.s3_retry_base_delay_seconds
+        self._delete_concurrency = settings.s3_delete_concurrency
+
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.s3_max_connections,
+                max_keepalive_connections=settings.s3_max_connections,
+            ),
+            timeout=self._metadata_timeout,
+            transport=transport,
+        )
+        self._bucket_ready = False
+
+    async def initialize(self) -> None:
+        """
+        异步初始化，确保 bucket 存在
+
+        与 S3Storage 相同，失败时只记录日志，不阻止控制平面启动。
+        """
+        try:
+            await self._ensure_bucket_exists()
+            logger.info(f"Async S3 storage initialized successfully (bucket: {self._bucket})")
+        except Exception as e:
+            logger.error(f"Failed to initialize async S3 storage: {e}")
+
+    async def close(self) -> None:
+        """关闭连接池"""
+        await self._client.aclose()
+
+    # ---------- 请求基础设施 ----------
+
+    def _parse_s3_path(self, s3_path: str) -> Tuple[str, str]:
+        """解析 S3 路径（s3://bucket/key 或相对路径），返回 (bucket, key)"""
+        if s3_path.startswith("s3://"):
+            parsed = urlparse(s3_path)
+            return parsed.netloc, parsed.path.lstrip('/')
+        return self._bucket, s3_path.lstrip('/')
+
+    def _url(self, bucket: str, key: str = "", params: Optional[Dict[str, str]] = None) -> str:
+        url = f"{self._endpoint}/{bucket}"
+        if key:
+            url += "/" + quote(key, safe="/~")
+        if params:
+            url += "?" + urlencode(sorted(params.items()), quote_via=quote, safe="-_.~")
+        return url
+
+    def _sign(self, method: str, url: str, headers: Dict[str, str], content: bytes) -> Dict[str, str]:
+        """SigV4 签名，返回包含 Authorization 的请求头"""
+        request = AWSRequest(method=method, url=url, data=content, headers=headers)
+        if url.startswith("https"):
+            # TLS 已保证完整性，跳过对请求体计算 SHA256
+            request.context["payload_signing_enabled"] = False
+        S3SigV4Auth(self._credentials, "s3", self._region).add_auth(request)
+        return dict(request.headers.items())
+
+    async def _request(
+        self,
+        operation: str,
+        method: str,
+        bucket: str,
+        key: str = "",
+        params: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        content: bytes = b"",
+        timeout: Optional[httpx.Timeout] = None,
+        stream: bool = False,
+    ) -> httpx.Response:
+        """
+        发送已签名的请求
+
+        网络错误和 5xx 响应按指数退避（带抖动）重试，重试前重新签名。
+        其余响应原样返回，由调用方按状态码处理。
+        """
+        url = self._url(bucket, key, params)
+        for attempt in range(1, self._max_attempts + 1):
+            request = self._client.build_request(
+                method,
+                url,
+                headers=self._sign(method, url, dict(headers or {}), content),
+                content=content,
+                timeout=timeout or self._metadata_timeout,
+            )
+            try:
+                response = await self._client.send(request, stream=stream)
+            except httpx.TransportError as e:
+                if attempt >= self._max_attempts:
+                    raise StorageError(f"S3 {operation} failed: {type(e).__name__}: {e}", e)
+                logger.warning(f"S3 {operation} transport error, retrying... attempt={attempt}, error={e!r}")
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+
+            if response.status_code in _RETRYABLE_STATUS and attempt < self._max_attempts:
+                await response.aclose()
+                logger.warning(f"S3 {operation} returned {response.status_code}, retrying... attempt={attempt}")
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+
+            return response
+
+        # Should not reach here
+        raise StorageError(f"S3 {operation} failed: max attempts exceeded")
+
+    def _backoff(self, attempt: int) -> float:
+        return self._retry_base_delay * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+
+    async def _error(self, operation: str, response: httpx.Response) -> S3RequestError:
+        """从错误响应体解析 S3 错误码"""
+        body = await response.aread()
+        code, message = "", ""
+        if body:
+            try:
+                root = _parse_xml(body)
+                code = root.findtext("Code") or ""
+                message = root.findtext("Message") or ""
+            except ElementTree.ParseError:
+                pass
+        return S3RequestError(operation, response.status_code, code, message)
+
+    async def _ensure_bucket_exists(self) -> None:
+        """确保存储桶存在，不存在则创建（结果在进程内缓存）"""
+        if self._bucket_ready:
+            return
+
+        response = await self._request("HeadBucket", "HEAD", self._bucket)
+        if response.status_code == 404:
+            content = b""
+            if self._region != "us-east-1":
+                content = (
+                    '<CreateBucketConfiguration xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+                    f"<LocationConstraint>{self._region}</LocationConstraint>"
+                    "</CreateBucketConfiguration>"
+                ).encode()
+            response = await self._request("CreateBucket", "PUT", self._bucket, content=content)
+            if response.status_code != 200:
+                raise await self._error("CreateBucket", response)
+            logger.info(f"Created S3 bucket: {self._bucket}")
+        elif response.status_code != 200:
+            raise await self._error("HeadBucket", response)
+
+        self._bucket_ready = True
+
+    async def _remove_directory_marker(self, bucket: str, key: str) -> None:
+        """
+        清理可能存在的目录标记 (s3fs 兼容性修复)
+
+        当上传 test/test_data.csv 时，S3 可能会创建 test/ 目录标记，
+        这会导致 s3fs 将 test 显示为文件而非目录。
+        """
+        if '/' not in key:
+            return
+
+        dir_marker = key.rsplit('/', 1)[0] + '/'
+        response = await self._request("HeadObject", "HEAD", bucket, dir_marker)
+        if response.status_code == 200:
+            await self._request("DeleteObject", "DELETE", bucket, dir_marker)
+            logger.debug(f"Removed S3 directory marker for s3fs compatibility: {dir_marker}")
+
+    # ---------- 对象读写 ----------
+
+    async def upload_file(
+        self,
+        s3_path: str,
+        content: bytes,
+        content_type: str = "application/octet-stream"
+    ) -> None:
+        """
+        上传文件
+
+        Args:
+            s3_path: S3 对象路径
+            content: 文件内容
+            content_type: MIME 类型
+        """
+        await self._ensure_bucket_exists()
+
+        bucket, key = self._parse_s3_path(s3_path)
+        response = await self._request(
+            "PutObject",
+            "PUT",
+            bucket,
+            key,
+            headers={"Content-Type": content_type},
+            content=content,
+            timeout=self._transfer_timeout,
+        )
+        if response.status_code != 200:
+            raise await self._error("PutObject", response)
+
+        await self._remove_directory_marker(bucket, key)
+
+        logger.debug(f"Uploaded file to {s3_path}, size={len(content)}")
+
+    async def create_multipart_upload(
+        self,
+        s3_path: str,
+        content_type: str = "application/octet-stream"
+    ) -> str:
+        """创建分片上传，返回上传 ID"""
+        await self._ensure_bucket_exists()
+
+        bucket, key = self._parse_s3_path(s3_path)
+        response = await self._request(
+            "CreateMultipartUpload",
+            "POST",
+            bucket,
+            key,
+            params={"uploads": ""},
+            headers={"Content-Type": content_type},
+        )
+        if response.status_code != 200:
+            raise await self._error("CreateMultipartUpload", response)
+
+        upload_id = _parse_xml(response.content).findtext("UploadId")
+        logger.debug(f"Created multipart upload for {s3_path}, upload_id={upload_id}")
+
+        return upload_id
+
+    async def upload_part(
+        self,
+        s3_path: str,
+        upload_id: str,
+        part_number: int,
+        content: bytes
+    ) -> str:
+        """上传单个分片，返回分片 ETag"""
+        bucket, key = self._parse_s3_path(s3_path)
+        response = await self._request(
+            "UploadPart",
+            "PUT",
+            bucket,
+            key,
+            params={"partNumber": str(part_number), "uploadId": upload_id},
+            content=content,
+            timeout=self._transfer_timeout,
+        )
+        if response.status_code != 200:
+            raise await self._error("UploadPart", response)
+
+        return response.headers["ETag"].strip('"')
+
+    async def list_parts(self, s3_path: str, upload_id: str) -> list:
+        """列出已上传的分片，按分片号排序"""
+        bucket, key = self._parse_s3_path(s3_path)
+
+        parts = []
+        marker = "0"
+        while True:
+            response = await self._request(
+                "ListParts",
+                "GET",
+                bucket,
+                key,
+                params={"uploadId": upload_id, "part-number-marker": marker},
+            )
+            if response.status_code != 200:
+                raise await self._error("ListParts", response)
+
+            root = _parse_xml(response.content)
+            for part in root.findall("Part"):
+                parts.append({
+                    'part_number': int(part.findtext("PartNumber")),
+                    'size': int(part.findtext("Size")),
+                    'etag': part.findtext("ETag").strip('"')
+                })
+            if root.findtext("IsTruncated") != "true":
+                break
+            marker = root.findtext("NextPartNumberMarker")
+
+        return sorted(parts, key=lambda part: part['part_number'])
+
+    async def complete_multipart_upload(
+        self,
+        s3_path: str,
+        upload_id: str,
+        parts: list
+    ) -> None:
+        """完成分片上传，合并分片为最终对象"""
+        bucket, key = self._parse_s3_path(s3_path)
+
+        body = "".join(
+            f"<Part><PartNumber>{part['part_number']}</PartNumber><ETag>\"{part['etag']}\"</ETag></Part>"
+            for part in sorted(parts, key=lambda part: part['part_number'])
+        )
+        response = await self._request(
+            "CompleteMultipartUpload",
+            "POST",
+            bucket,
+            key,
+            params={"uploadId": upload_id},
+            content=f"<CompleteMultipartUpload>{body}</CompleteMultipartUpload>".encode(),
+            timeout=self._transfer_timeout,
+        )
+        if response.status_code != 200:
+            raise await self._error("CompleteMultipartUpload", response)
+
+        # 合并耗时较长时 S3 先返回 200 并发送空白保活，合并失败时响应体为 Error
+        try:
+            root = _parse_xml(response.content)
+        except ElementTree.ParseError as e:
+            raise StorageError(f"S3 CompleteMultipartUpload returned an unreadable response: {e}", e)
+        if root.tag == "Error":
+            raise S3RequestError(
+                "CompleteMultipartUpload",
+                response.status_code,
+                root.findtext("Code") or "",
+                root.findtext("Message") or "",
+            )
+
+        await self._remove_directory_marker(bucket, key)
+
+        logger.debug(f"Completed multipart upload to {s3_path}, parts={len(parts)}")
+
+    async def abort_multipart_upload(self, s3_path: str, upload_id: str) -> None:
+        """取消分片上传"""
+        bucket, key = self._parse_s3_path(s3_path)
+        response = await self._request(
+            "AbortMultipartUpload",
+            "DELETE",
+            bucket,
+            key,
+            params={"uploadId": upload_id},
+        )
+        if response.status_code not in (200, 204):
+            raise await self._error("AbortMultipartUpload", response)
+
+        logger.debug(f"Aborted multipart upload to {s3_path}, upload_id={upload_id}")
+
+    async def download_file(self, s3_path: str) -> bytes:
+        """下载文件"""
+        bucket, key = self._parse_s3_path(s3_path)
+        response = await self._request("GetObject", "GET", bucket, key, timeout=self._transfer_timeout)
+        if response.status_code == 404:
+            raise NotFoundError(f"File not found: {s3_path}")
+        if response.status_code != 200:
+            raise await self._error("GetObject", response)
+
+        logger.debug(f"Downloaded file from {s3_path}, size={len(response.content)}")
+
+        return response.content
+
+    async def open_file_stream(
+        self,
+        s3_path: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        etag: Optional[str] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        打开文件内容流
+
+        响应头返回后即返回迭代器，响应体按 STREAM_CHUNK_SIZE 逐块读取，
+        读完或调用方放弃迭代时释放连接。
+        """
+        bucket, key = self._parse_s3_path(s3_path)
+
+        headers = {}
+        if start is not None:
+            headers["Range"] = f"bytes={start}-{'' if end is None else end}"
+        if etag:
+            headers["If-Match"] = f'"{etag}"'
+
+        response = await self._request(
+            "GetObject", "GET", bucket, key, headers=headers, timeout=self._transfer_timeout, stream=True
+        )
+        if response.status_code not in (200, 206):
+            error = await self._error("GetObject", response)
+            if response.status_code == 404:
+                raise NotFoundError(f"File not found: {s3_path}")
+            if response.status_code == 412:
+                raise ConflictError(f"File changed during download: {s3_path}")
+            raise error
+
+        return self._iter_body(response)
+
+    async def _iter_body(self, response: httpx.Response) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+                yield chunk
+        finally:
+            await response.aclose()
+
+    async def file_exists(self, s3_path: str) -> bool:
+        """检查文件是否存在"""
+        bucket, key = self._parse_s3_path(s3_path)
+        response = await self._request("HeadObject", "HEAD", bucket, key)
+        if response.status_code == 200:
+            return True
+        if response.status_code == 404:
+            return False
+        raise S3RequestError("HeadObject", response.status_code)
+
+    async def get_file_info(self, s3_path: str) -> dict:
+        """获取文件信息，文件不存在时抛出 NotFoundError"""
+        bucket, key = self._parse_s3_path(s3_path)
+        response = await self._request("HeadObject", "HEAD", bucket, key)
+        if response.status_code == 404:
+            raise NotFoundError(f"File not found: {s3_path}")
+        if response.status_code != 200:
+            raise S3RequestError("HeadObject", response.status_code)
+
+        return {
+            "size": int(response.headers["Content-Length"]),
+            "content_type": response.headers.get("Content-Type", "application/octet-stream"),
+            "last_modified": parsedate_to_datetime(response.headers["Last-Modified"]),
+            "etag": response.headers["ETag"].strip('"')
+        }
+
+    async def generate_presigned_url(
+        self,
+        s3_path: str,
+        expiration_seconds: int = 3600
+    ) -> str:
+        """生成预签名 URL（本地计算，不发起网络请求）"""
+        bucket, key = self._parse_s3_path(s3_path)
+
+        request = AWSRequest(method="GET", url=self._url(bucket, key))
+        S3SigV4QueryAuth(self._credentials, "s3", self._region, expires=expiration_seconds).add_auth(request)
+
+        logger.debug(f"Generated presigned URL for {s3_path}, expires in {expiration_seconds}s")
+
+        return request.url
+
+    async def delete_file(self, s3_path: str) -> None:
+        """删除文件"""
+        bucket, key = self._parse_s3_path(s3_path)
+        response = await self._request("DeleteObject", "DELETE", bucket, key)
+        if response.status_code not in (200, 204):
+            raise await self._error("DeleteObject", response)
+
+        logger.debug(f"Deleted file {s3_path}")
+
+    # ---------- 列表与批量删除 ----------
+
+    async def _list_pages(self, bucket: str, prefix: str) -> AsyncIterator[List[Dict]]:
+        """按页列出前缀下的对象（ListObjectsV2）"""
+        params = {"list-type": "2", "prefix": prefix}
+        while True:
+            response = await self._request("ListObjectsV2", "GET", bucket, params=params)
+            if response.status_code != 200:
+                raise await self._error("ListObjectsV2", response)
+
+            root = _parse_xml(response.content)
+            yield [
+                {
+                    'key': item.findtext("Key"),
+                    'size': int(item.findtext("Size")),
+                    'last_modified': _parse_iso_datetime(item.findtext("LastModified")),
+                    'etag': (item.findtext("ETag") or "").strip('"')
+                }
+                for item in root.findall("Contents")
+            ]
+
+            token = root.findtext("NextContinuationToken")
+            if root.findtext("IsTruncated") != "true" or not token:
+                return
+            params = {"list-type": "2", "prefix": prefix, "continuation-token": token}
+
+    async def list_files(
+        self,
+        prefix: str,
+        limit: int = 1000
+    ) -> list:
+        """
+        列出文件
+
+        Returns:
+            文件列表，每个文件包含 key, size, last_modified, etag
+        """
+        bucket, prefix = self._parse_prefix(prefix)
+
+        files = []
+        try:
+            async for page in self._list_pages(bucket, prefix):
+                files.extend(page)
+                if limit and len(files) >= limit:
+                    return files[:limit]
+        except StorageError as e:
+            logger.error(f"Error listing objects with prefix {prefix}: {e}")
+
+        return files
+
+    async def delete_prefix(
+        self,
+        prefix: str,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        """删除指定前缀的所有文件（用于会话清理），列表与批量删除并行"""
+        bucket, prefix = self._parse_prefix(prefix)
+
+        async def list_keys():
+            async for page in self._list_pages(bucket, prefix):
+                yield [item['key'] for item in page]
+
+        deleted_count = await delete_prefix_pipelined(
+            list_keys(),
+            lambda keys: self._delete_objects(bucket, keys),
+            concurrency=self._delete_concurrency,
+            on_progress=on_progress,
+            description=f"{bucket}/{prefix}",
+        )
+
+        logger.info(f"Deleted {deleted_count} files with prefix {prefix} (bucket: {bucket})")
+
+        return deleted_count
+
+    async def _delete_objects(self, bucket: str, keys: Iterable[str]) -> int:
+        """DeleteObjects 批量删除（静默模式），返回删除的键数"""
+        keys = list(keys)
+        if not keys:
+            return 0
+
+        objects = "".join(f"<Object><Key>{_xml_escape(key)}</Key></Object>" for key in keys)
+        content = f"<Delete><Quiet>true</Quiet>{objects}</Delete>".encode()
+        response = await self._request(
+            "DeleteObjects",
+            "POST",
+            bucket,
+            params={"delete": ""},
+            headers={"Content-MD5": base64.b64encode(hashlib.md5(content).digest()).decode()},
+            content=content,
+        )
+        if response.status_code != 200:
+            raise await self._error("DeleteObjects", response)
+
+        errors = _parse_xml(response.content).findall("Error")
+        for error in errors:
+            logger.warning(f"Failed to delete {error.findtext('Key')}: {error.findtext('Code')}")
+
+        return len(keys) - len(errors)
+
+    def _parse_prefix(self, prefix: str) -> Tuple[str, str]:
+        """前缀可以带 s3://bucket/，否则使用默认 bucket"""
+        if prefix.startswith("s3://"):
+            parsed = urlparse(prefix)
+            return parsed.netloc, parsed.path.lstrip('/')
+        return self._bucket, prefix
+
+
+def _parse_xml(content: bytes) -> ElementTree.Element:
+    """解析 S3 XML 响应并去掉命名空间，便于按标签名查找（忽略 XML 声明前的空白保活字节）"""
+    root = ElementTree.fromstring(content.lstrip())
+    for element in root.iter():
+        if "}" in element.tag:
+            element.tag = element.tag.split("}", 1)[1]
+    return root
+
+
+def _parse_iso_datetime(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _xml_escape(value: str) -> str:
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
@@ -0,0 +1,104 @@
+"""
+前缀批量删除流水线
+
+列出与删除并行：列表分页产出的 key 按 1000 个（DeleteObjects 上限）一批放入有界队列，
+多个删除 worker 并发提交批次。队列有界，列表不会远超删除进度，内存占用与前缀大小无关。
+"""
+import asyncio
+import logging
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+
+from src.shared.errors.infrastructure import StorageError
+
+logger = logging.getLogger(__name__)
+
+# DeleteObjects 单次请求的 key 数上限
+DELETE_BATCH_SIZE = 1000
+
+
+async def delete_prefix_pipelined(
+    list_pages: AsyncIterator[List[str]],
+    delete_batch: Callable[[List[str]], Awaitable[int]],
+    concurrency: int = 8,
+    on_progress: Optional[Callable[[int], None]] = None,
+    description: str = "",
+) -> int:
+    """
+    以流水线方式删除列表产出的所有 key
+
+    单个批次失败不影响其他批次；全部批次结束后，如有对象未删除（批次失败、
+    DeleteObjects 返回逐键错误或列表中断）则抛出 StorageError。
+    调用方重试时重新列表，只会删除剩余对象。
+
+    Args:
+        list_pages: 按页产出 key 列表的异步迭代器
+        delete_batch: 删除一批 key，返回实际删除的数量（少于批次大小视为部分失败）
+        concurrency: 同时进行的删除请求数
+        on_progress: 每个批次完成后以累计删除数调用
+        description: 日志中标识本次删除（例如 bucket/prefix）
+
+    Returns:
+        删除的对象数量
+    """
+    concurrency = max(1, concurrency)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    deleted = 0
+    failed = 0
+    errors: List[str] = []
+
+    async def produce() -> None:
+        batch: List[str] = []
+        async for keys in list_pages:
+            for key in keys:
+                batch.append(key)
+                if len(batch) >= DELETE_BATCH_SIZE:
+                    await queue.put(batch)
+                    batch = []
+        if batch:
+            await queue.put(batch)
+
+    async def consume() -> None:
+        nonlocal deleted, failed
+        while True:
+            batch = await queue.get()
+            try:
+                if batch is None:
+                    return
+                try:
+                    count = await delete_batch(batch)
+                except Exception as e:
+                    failed += len(batch)
+                    errors.append(str(e))
+                    logger.warning(f"Failed to delete batch of {len(batch)} objects ({description}): {e}")
+                    continue
+                deleted += count
+                if count < len(batch):
+                    failed += len(batch) - count
+                    errors.append(f"{len(batch) - count} objects not deleted")
+                if on_progress:
+                    on_progress(deleted)
+            finally:
+                queue.task_done()
+
+    workers = [asyncio.create_task(consume()) for _ in range(concurrency)]
+    try:
+        try:
+            await produce()
+        except Exception as e:
+            # 列表失败：已入队的批次照常删除，结束后报告失败
+            errors.append(f"listing failed: {e}")
+            logger.warning(f"Failed to list objects ({description}): {e}")
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    except BaseException:
+        for worker in workers:
+            worker.cancel()
+        raise
+
+    if errors:
+        raise StorageError(
+            f"Deleted {deleted} objects ({description}), "
+            f"{failed} objects failed: {errors[0]}"
+        )
+    return deleted
@@ -6,7 +6,7 @@ S3 存储实现
 import asyncio
 import logging
 import os
-from typing import Optional
+from typing import AsyncIterator, Callable, List, Optional
 from urllib.parse import urlparse
 
 import boto3
@@ -14,9 +14,14 @@ from botocore.exceptions import ClientError
 
 from src.domain.services.storage import IStorageService
 from src.infrastructure.config.settings import get_settings
+from src.infrastructure.storage.prefix_deletion import delete_prefix_pipelined
+from src.shared.errors.domain import ConflictError, NotFoundError
 
 logger = logging.getLogger(__name__)
 
+# 流式读取对象内容的块大小
+STREAM_CHUNK_SIZE = 256 * 1024
+
 
 class S3Storage(IStorageService):
     """
@@ -38,6 +43,7 @@ class S3Storage(IStorageService):
         - s3_secret_access_key: 密钥
         - s3_region: 区域
         - s3_bucket: 存储桶名称
+        - s3_delete_concurrency: 前缀删除时并发的 DeleteObjects 请求数
         """
         settings = get_settings()
 
@@ -50,6 +56,7 @@ class S3Storage(IStorageService):
             region_name=settings.s3_region,
         )
         self._bucket = settings.s3_bucket
+        self._delete_concurrency = settings.s3_delete_concurrency
 
     async def initialize(self) -> None:
         """
@@ -192,32 +199,184 @@ class S3Storage(IStorageService):
                 ContentType=content_type
             )
 
-        # 清理可能存在的目录标记 (s3fs 兼容性修复)
-        # 当上传 test/test_data.csv 时，S3 可能会创建 test/ 目录标记
-        # 这会导致 s3fs 将 test 显示为文件而非目录
-        if '/' in key:
-            dir_marker = key.rsplit('/', 1)[0] + '/'
-            try:
-                await asyncio.to_thread(
-                    self._client.head_object,
-                    Bucket=bucket,
-                    Key=dir_marker
-                )
-                # 目录标记存在，删除它
-                await asyncio.to_thread(
-                    self._client.delete_object,
-                    Bucket=bucket,
-                    Key=dir_marker
-                )
-                logger.debug(f"Removed S3 directory marker for s3fs compatibility: {dir_marker}")
-            except ClientError as e:
-                error_code = e.response.get('Error', {}).get('Code')
-                if error_code == '404':
-                    # 目录标记不存在，无需处理
-                    pass
+        await self._remove_directory_marker(bucket, key)
 
         logger.debug(f"Uploaded file to {s3_path}, size={content_size}")
 
+    async def _remove_directory_marker(self, bucket: str, key: str) -> None:
+        """
+        清理可能存在的目录标记 (s3fs 兼容性修复)
+
+        当上传 test/test_data.csv 时，S3 可能会创建 test/ 目录标记，
+        这会导致 s3fs 将 test 显示为文件而非目录。
+        """
+        if '/' not in key:
+            return
+
+        dir_marker = key.rsplit('/', 1)[0] + '/'
+        try:
+            await asyncio.to_thread(
+                self._client.head_object,
+                Bucket=bucket,
+                Key=dir_marker
+            )
+            # 目录标记存在，删除它
+            await asyncio.to_thread(
+                self._client.delete_object,
+                Bucket=bucket,
+                Key=dir_marker
+            )
+            logger.debug(f"Removed S3 directory marker for s3fs compatibility: {dir_marker}")
+        except ClientError as e:
+            error_code = e.response.get('Error', {}).get('Code')
+            if error_code == '404':
+                # 目录标记不存在，无需处理
+                pass
+
+    async def create_multipart_upload(
+        self,
+        s3_path: str,
+        content_type: str = "application/octet-stream"
+    ) -> str:
+        """
+        创建分片上传
+
+        Args:
+            s3_path: S3 对象路径
+            content_type: MIME 类型
+
+        Returns:
+            上传 ID
+        """
+        await self._ensure_bucket_exists()
+
+        bucket, key = self._parse_s3_path(s3_path)
+
+        response = await asyncio.to_thread(
+            self._client.create_multipart_upload,
+            Bucket=bucket,
+            Key=key,
+            ContentType=content_type
+        )
+
+        logger.debug(f"Created multipart upload for {s3_path}, upload_id={response['UploadId']}")
+
+        return response['UploadId']
+
+    async def upload_part(
+        self,
+        s3_path: str,
+        upload_id: str,
+        part_number: int,
+        content: bytes
+    ) -> str:
+        """
+        上传单个分片
+
+        Args:
+            s3_path: S3 对象路径
+            upload_id: 上传 ID
+            part_number: 分片号（1-10000）
+            content: 分片内容
+
+        Returns:
+            分片 ETag
+        """
+        bucket, key = self._parse_s3_path(s3_path)
+
+        response = await asyncio.to_thread(
+            self._client.upload_part,
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=content
+        )
+
+        return response['ETag'].strip('"')
+
+    async def list_parts(self, s3_path: str, upload_id: str) -> list:
+        """
+        列出已上传的分片（用于断点续传）
+
+        Args:
+            s3_path: S3 对象路径
+            upload_id: 上传 ID
+
+        Returns:
+            按分片号排序的分片列表，每个分片包含 part_number, size, etag
+        """
+        bucket, key = self._parse_s3_path(s3_path)
+
+        def _list_all_parts():
+            """同步函数，分页列出所有分片"""
+            parts = []
+            paginator = self._client.get_paginator('list_parts')
+            for page in paginator.paginate(Bucket=bucket, Key=key, UploadId=upload_id):
+                for part in page.get('Parts', []):
+                    parts.append({
+                        'part_number': part['PartNumber'],
+                        'size': part['Size'],
+                        'etag': part['ETag'].strip('"')
+                    })
+            return parts
+
+        parts = await asyncio.to_thread(_list_all_parts)
+
+        return sorted(parts, key=lambda part: part['part_number'])
+
+    async def complete_multipart_upload(
+        self,
+        s3_path: str,
+        upload_id: str,
+        parts: list
+    ) -> None:
+        """
+        完成分片上传，合并分片为最终对象
+
+        Args:
+            s3_path: S3 对象路径
+            upload_id: 上传 ID
+            parts: 分片列表，每个分片包含 part_number, etag
+        """
+        bucket, key = self._parse_s3_path(s3_path)
+
+        await asyncio.to_thread(
+            self._client.complete_multipart_upload,
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={
+                'Parts': [
+                    {'PartNumber': part['part_number'], 'ETag': f'"{part["etag"]}"'}
+                    for part in sorted(parts, key=lambda part: part['part_number'])
+                ]
+            }
+        )
+
+        await self._remove_directory_marker(bucket, key)
+
+        logger.debug(f"Completed multipart upload to {s3_path}, parts={len(parts)}")
+
+    async def abort_multipart_upload(self, s3_path: str, upload_id: str) -> None:
+        """
+        取消分片上传，释放已上传分片占用的存储
+
+        Args:
+            s3_path: S3 对象路径
+            upload_id: 上传 ID
+        """
+        bucket, key = self._parse_s3_path(s3_path)
+
+        await asyncio.to_thread(
+            self._client.abort_multipart_upload,
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id
+        )
+
+        logger.debug(f"Aborted multipart upload to {s3_path}, upload_id={upload_id}")
+
     async def download_file(self, s3_path: str) -> bytes:
         """
         下载文件
@@ -275,15 +434,23 @@ class S3Storage(IStorageService):
             s3_path: S3 对象路径
 
         Returns:
-            文件信息字典，包含 size, content_type, last_modified 等
+            文件信息字典，包含 size, content_type, last_modified, etag
+
+        Raises:
+            NotFoundError: 文件不存在
         """
         bucket, key = self._parse_s3_path(s3_path)
 
-        response = await asyncio.to_thread(
-            self._client.head_object,
-            Bucket=bucket,
-            Key=key
-        )
+        try:
+            response = await asyncio.to_thread(
+                self._client.head_object,
+                Bucket=bucket,
+                Key=key
+            )
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey'):
+                raise NotFoundError(f"File not found: {s3_path}")
+            raise
 
         return {
             "size": response['ContentLength'],
@@ -292,6 +459,59 @@ class S3Storage(IStorageService):
             "etag": response['ETag'].strip('"')
         }
 
+    async def open_file_stream(
+        self,
+        s3_path: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        etag: Optional[str] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        打开文件内容流
+
+        GetObject 在返回前完成，响应体按 STREAM_CHUNK_SIZE 逐块读取，
+        读完或调用方放弃迭代时关闭连接。
+
+        Args:
+            s3_path: S3 对象路径
+            start: 区间起始字节（含），为空表示读取整个文件
+            end: 区间结束字节（含），为空表示读到文件末尾
+            etag: 期望的 ETag，对象已被替换时抛出 ConflictError
+
+        Returns:
+            文件内容块的异步迭代器
+        """
+        bucket, key = self._parse_s3_path(s3_path)
+
+        params = {'Bucket': bucket, 'Key': key}
+        if start is not None:
+            params['Range'] = f"bytes={start}-{'' if end is None else end}"
+        if etag:
+            params['IfMatch'] = f'"{etag}"'
+
+        try:
+            response = await asyncio.to_thread(self._client.get_object, **params)
+        except ClientError as e:
+            error_code = e.response.get('Error', {}).get('Code')
+            if error_code in ('404', 'NoSuchKey'):
+                raise NotFoundError(f"File not found: {s3_path}")
+            if error_code in ('412', 'PreconditionFailed'):
+                raise ConflictError(f"File changed during download: {s3_path}")
+            raise
+
+        return self._iter_body(response['Body'])
+
+    async def _iter_body(self, body) -> AsyncIterator[bytes]:
+        """逐块读取 botocore StreamingBody"""
+        try:
+            while True:
+                chunk = await asyncio.to_thread(body.read, STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
     async def generate_presigned_url(
         self,
         s3_path: str,
@@ -337,17 +557,27 @@ class S3Storage(IStorageService):
 
         logger.debug(f"Deleted file {s3_path}")
 
-    async def delete_prefix(self, prefix: str) -> int:
+    async def delete_prefix(
+        self,
+        prefix: str,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> int:
         """
         删除指定前缀的所有文件（用于会话清理）
 
+        列表与删除并行：列表逐页在线程池中执行，每 1000 个 key 一批，
+        由 s3_delete_concurrency 个 DeleteObjects 请求并发删除。
+
         Args:
             prefix: S3 路径前缀（例如: "sessions/sess_abc123/" 或 "s3://bucket/sessions/sess_abc123/"）
+            on_progress: 每个批次完成后以累计删除数调用
 
         Returns:
             删除的文件数量
+
+        Raises:
+            StorageError: 部分对象未删除
         """
-        deleted_count = 0
         bucket = self._bucket
 
         # 如果 prefix 包含 bucket，提取出来
@@ -356,43 +586,33 @@ class S3Storage(IStorageService):
             bucket = parsed.netloc
             prefix = parsed.path.lstrip('/')
 
-        # 使用 asyncio.to_thread 执行同步的列表和删除操作
-        def _delete_all_files():
-            """同步函数，执行批量删除"""
-            count = 0
-            paginator = self._client.get_paginator('list_objects_v2')
-            delete_chunks = []
-
-            try:
-                # 直接迭代 paginator（同步操作）
-                for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
-                    if 'Contents' in page:
-                        for obj in page['Contents']:
-                            delete_chunks.append({'Key': obj['Key']})
-
-                        # 当累积到 1000 个对象时删除
-                        if len(delete_chunks) >= 1000:
-                            self._client.delete_objects(
-                                Bucket=bucket,
-                                Delete={'Objects': delete_chunks}
-                            )
-                            count += len(delete_chunks)
-                            delete_chunks = []
-
-                # 删除剩余的对象
-                if delete_chunks:
-                    self._client.delete_objects(
-                        Bucket=bucket,
-                        Delete={'Objects': delete_chunks}
-                    )
-                    count += len(delete_chunks)
-
-            except ClientError as e:
-                logger.error(f"Error deleting files with prefix {prefix}: {e}")
-            return count
-
-        # 在线程池中执行同步操作
-        deleted_count = await asyncio.to_thread(_delete_all_files)
+        async def _list_keys():
+            """逐页列出 key，每页单独占用一次线程"""
+            pages = iter(self._client.get_paginator('list_objects_v2').paginate(Bucket=bucket, Prefix=prefix))
+            while True:
+                page = await asyncio.to_thread(next, pages, None)
+                if page is None:
+                    return
+                yield [obj['Key'] for obj in page.get('Contents', [])]
+
+        async def _delete_batch(keys: List[str]) -> int:
+            response = await asyncio.to_thread(
+                self._client.delete_objects,
+                Bucket=bucket,
+                Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True},
+            )
+            errors = response.get('Errors', [])
+            for error in errors:
+                logger.warning(f"Failed to delete {error.get('Key')}: {error.get('Code')}")
+            return len(keys) - len(errors)
+
+        deleted_count = await delete_prefix_pipelined(
+            _list_keys(),
+            _delete_batch,
+            concurrency=self._delete_concurrency,
+            on_progress=on_progress,
+            description=f"{bucket}/{prefix}",
+        )
 
         logger.info(f"Deleted {deleted_count} files with prefix {prefix} (bucket: {bucket})")
 
@@ -9,3 +9,4 @@ from src.interfaces.rest.api.v1 import templates
 from src.interfaces.rest.api.v1 import health
 from src.interfaces.rest.api.v1 import files
 from src.interfaces.rest.api.v1 import internal
+from src.interfaces.rest.api.v1 import admin
@@ -0,0 +1,85 @@
+"""
+运维管理 API 路由
+
+查看后台任务运行统计，运行时调整任务执行间隔，查看 workspace 后台删除进度。
+这些端点面向运维，应只在内部网络暴露。
+
+后台任务由每个 worker 进程各自管理，这里的端点只作用于处理本次请求的进程；
+响应中的 process 标明进程（主机名、进程号、是否为主节点）。
+"""
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+
+from src.infrastructure.dependencies import get_workspace_deletion_service
+from src.interfaces.rest.schemas.request import UpdateBackgroundTaskIntervalRequest
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+def _get_task_manager(request: Request):
+    manager = getattr(request.app.state, "background_task_manager", None)
+    if manager is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Background tasks are not running",
+        )
+    return manager
+
+
+@router.get("/background-tasks")
+async def list_background_tasks(request: Request) -> dict:
+    """
+    列出后台任务
+
+    返回每个任务的执行间隔、超时运行策略、运行次数、耗时、超时运行次数与最近错误。
+    只包含处理本次请求的进程；leader_only 任务在非主节点进程上处于 standby。
+    """
+    return _get_task_manager(request).health()
+
+
+@router.put("/background-tasks/{name}/interval")
+async def update_background_task_interval(
+    name: str,
+    body: UpdateBackgroundTaskIntervalRequest,
+    request: Request,
+) -> dict:
+    """
+    修改后台任务执行间隔
+
+    立即生效，不持久化：进程重启后恢复为配置值。
+    只修改处理本次请求的进程，其他 worker 与副本不受影响；leader_only 任务
+    只在主节点执行，响应中的 process.leader 为 False 时本次修改不会改变其实际执行频率。
+    """
+    manager = _get_task_manager(request)
+    try:
+        manager.set_interval(name, body.interval_seconds)
+    except KeyError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Background task not found: {name}",
+        )
+
+    process = manager.process_info()
+    logger.info(
+        f"Background task {name} interval set to {body.interval_seconds}s via admin API "
+        f"(pid {process['pid']}, leader {process['leader']})"
+    )
+    return {**manager.get_task(name).stats(), "process": process}
+
+
+@router.get("/workspace-deletions")
+async def list_workspace_deletions(
+    deleter=Depends(get_workspace_deletion_service),
+) -> dict:
+    """
+    列出本进程内排队与进行中的 workspace 后台删除
+
+    返回每个删除的 workspace 路径、尝试次数、已删除文件数与耗时。
+    """
+    return {
+        "enabled": deleter is not None,
+        "deletions": deleter.progress() if deleter is not None else [],
+    }
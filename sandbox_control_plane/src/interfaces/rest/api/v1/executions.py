@@ -21,6 +21,7 @@ from src.interfaces.rest.schemas.response import (
 )
 from src.infrastructure.dependencies import (
     USE_SQL_REPOSITORIES,
+    get_execution_result_ingestor,
     get_session_service_db,
     get_session_service as get_mock_session_service,
 )
@@ -126,22 +127,34 @@ async def execute_code_sync(
 
         # Get current status - use a fresh database session for each poll
         # to avoid REPEATABLE-READ transaction isolation issues
+        # 轮询只读取热表窄行，到达终态后再加载一次完整结果
         if USE_SQL_REPOSITORIES:
-            execution_dto = await _get_execution_with_fresh_session(execution_id)
+            execution_dto = await _get_execution_with_fresh_session(execution_id, include_payload=False)
         else:
             # Mock mode - use the service directly
-            query = GetExecutionQuery(execution_id=execution_id)
+            query = GetExecutionQuery(execution_id=execution_id, include_result=False)
             execution_dto = await service.get_execution(query)
 
         # Check if terminal state
         if execution_dto.status in terminal_states:
+            if USE_SQL_REPOSITORIES:
+                execution_dto = await _get_execution_with_fresh_session(execution_id)
+            else:
+                execution_dto = await service.get_execution(GetExecutionQuery(execution_id=execution_id))
             return _map_dto_to_response(execution_dto)
 
         # Wait before next poll
-        await asyncio.sleep(poll_interval)
+        # SQL 模式下本实例提交该执行的结果时立即唤醒，不必等满轮询间隔
+        if USE_SQL_REPOSITORIES:
+            await get_execution_result_ingestor().wait_for_result(execution_id, poll_interval)
+        else:
+            await asyncio.sleep(poll_interval)
 
 
-async def _get_execution_with_fresh_session(execution_id: str) -> ExecutionDTO:
+async def _get_execution_with_fresh_session(
+    execution_id: str,
+    include_payload: bool = True,
+) -> ExecutionDTO:
     """
     Get execution using a fresh database session.
 
@@ -153,7 +166,7 @@ async def _get_execution_with_fresh_session(execution_id: str) -> ExecutionDTO:
 
     async with db_manager.get_session() as session:
         repo = SqlExecutionRepository(session)
-        execution = await repo.find_by_id(execution_id)
+        execution = await repo.find_by_id(execution_id, include_payload=include_payload)
         if not execution:
             from src.shared.errors.domain import NotFoundError
             raise NotFoundError(f"Execution not found: {execution_id}")
@@ -165,8 +178,8 @@ async def get_execution_status(
     execution_id: str,
     service: SessionService = Depends(_get_session_service)
 ):
-    """获取执行状态"""
-    query = GetExecutionQuery(execution_id=execution_id)
+    """获取执行状态（不返回代码、输出与返回值，请使用 /result 获取）"""
+    query = GetExecutionQuery(execution_id=execution_id, include_result=False)
     execution_dto = await service.get_execution(query)
     return _map_dto_to_response(execution_dto)
 
@@ -187,16 +200,35 @@ async def list_executions(
     session_id: str,
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     service: SessionService = Depends(_get_session_service)
 ):
-    """列出会话的所有执行"""
-    executions = await service.list_executions(session_id=session_id, limit=limit)
+    """
+    列出会话的所有执行
+
+    - **cursor**: 上一页返回的 next_cursor（键集分页）
+    - **include_total**: 是否返回精确总数（默认返回估算值）
+    - **offset**: 已废弃，保留仅为兼容，始终回显
+    """
+    try:
+        result = await service.list_executions_page(
+            session_id=session_id,
+            limit=limit,
+            cursor=cursor,
+            include_total=include_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
     return {
-        "items": executions,
-        "total": len(executions),
-        "limit": limit,
-        "offset": offset
+        "items": result["items"],
+        "total": result["total"],
+        "total_is_estimate": result["total_is_estimate"],
+        "limit": result["limit"],
+        "offset": offset,
+        "has_more": result["has_more"],
+        "next_cursor": result["next_cursor"],
     }
 
 
@@ -3,31 +3,139 @@
 
 定义文件上传下载相关的 HTTP 端点。
 """
+import re
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from urllib.parse import quote
+
 import fastapi
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Optional, Tuple
 
 from src.application.services.file_service import FileService
+from src.interfaces.rest.multipart_stream import MultipartFileStream
 from src.interfaces.rest.schemas.response import ErrorResponse
 from src.infrastructure.dependencies import get_file_service_db
+from src.shared.errors.domain import ConflictError, NotFoundError, ResourceLimitError
 
 router = APIRouter(prefix="/sessions/{session_id}/files", tags=["files"])
 
+# 可续传上传单独挂在 file-uploads 下，避免被 GET /files/{file_path:path} 下载路由匹配
+uploads_router = APIRouter(prefix="/sessions/{session_id}/file-uploads", tags=["files"])
+
+# 目录打包下载与归档上传解压同理挂在 files-archive 下
+archive_router = APIRouter(prefix="/sessions/{session_id}/files-archive", tags=["files"])
+
+# multipart 请求体中边界、字段头等非文件内容的预留字节数
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+_MULTIPART_FILE_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
+
+_RAW_PART_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/octet-stream": {"schema": {"type": "string", "format": "binary"}}},
+    }
+}
+
+_RAW_ARCHIVE_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            media_type: {"schema": {"type": "string", "format": "binary"}}
+            for media_type in ("application/zip", "application/x-tar", "application/gzip")
+        },
+    }
+}
+
+
+def _check_content_length(request: Request, limit: int) -> None:
+    """按 Content-Length 预检请求体大小，超限时不读取请求体直接返回 413"""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > limit:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Request body exceeds limit of {limit} bytes"
+        )
+
+
+def _parse_if_none_match(value: Optional[str]) -> Optional[List[str]]:
+    """解析 If-None-Match，返回去掉引号的 ETag 列表（弱校验，忽略 W/ 前缀）"""
+    if not value:
+        return None
+    etags = []
+    for tag in value.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        if tag:
+            etags.append(tag)
+    return etags or None
+
+
+def _parse_range(value: Optional[str]) -> Optional[Tuple[Optional[int], Optional[int]]]:
+    """
+    解析 Range 请求头
+
+    只支持单个字节区间；多区间或格式无法识别时忽略 Range，返回完整内容（RFC 9110 允许）。
+    """
+    if not value:
+        return None
+    match = _RANGE_PATTERN.match(value.strip())
+    if not match or not (match.group(1) or match.group(2)):
+        return None
+    start, end = match.groups()
+    return (int(start) if start else None, int(end) if end else None)
+
+
+def _http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _upload_error(e: Exception) -> HTTPException:
+    if isinstance(e, HTTPException):
+        return e
+    if isinstance(e, ResourceLimitError):
+        return HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
 
 @router.get("")
 async def list_files(
     session_id: str,
     path: Optional[str] = Query(None, description="指定目录路径（相对于 workspace 根目录），不指定则列出所有文件"),
     limit: int = Query(1000, ge=1, le=10000, description="最大返回文件数"),
+    include_total: bool = Query(False, description="是否返回匹配 path 的文件总数（不受 limit 限制）"),
     service: FileService = Depends(get_file_service_db)
 ):
     """
     列出 session 下的文件
 
-    返回该 session workspace 中的文件列表，支持指定目录路径
+    返回该 session workspace 中的文件列表，支持指定目录路径。
+    启用 workspace 文件清单时从数据库查询，不再逐次列出对象存储。
 
     - **path**: 可选，指定目录路径（如 "src/" 或 "src/utils"），不指定则列出所有文件
     - **limit**: 最大返回文件数 (1-10000)
+    - **include_total**: 为 true 时响应包含 total（匹配的文件总数）
     """
     try:
         files = await service.list_files(
@@ -36,11 +144,14 @@ async def list_files(
             limit=limit
         )
 
-        return {
+        result = {
             "session_id": session_id,
             "files": files,
             "count": len(files)
         }
+        if include_total:
+            result["total"] = await service.count_files(session_id=session_id, path=path)
+        return result
 
     except Exception as e:
         raise HTTPException(
@@ -49,50 +160,48 @@ async def list_files(
         )
 
 
-@router.post("/upload")
+@router.post("/upload", openapi_extra=_MULTIPART_FILE_BODY)
 async def upload_file(
+    request: Request,
     session_id: str,
     path: str,
-    file: UploadFile = File(...),
     service: FileService = Depends(get_file_service_db)
 ):
     """
     上传文件到会话工作区
 
+    请求体为 multipart/form-data，边读取边以分片上传写入对象存储，不在内存中缓存整个文件。
+    超过大小上限时按 Content-Length 直接拒绝，或在读取过程中累计超限时中断。
+
     - **path**: 文件在工作区中的路径
-    - **file**: 要上传的文件（最大 100MB）
+    - **file**: 要上传的文件（默认最大 100MB）
     """
+    _check_content_length(request, service.max_upload_bytes + MULTIPART_OVERHEAD_BYTES)
+
     try:
-        # 验证文件大小
-        content = await file.read()
-        if len(content) > 100 * 1024 * 1024:  # 100MB
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail="File size exceeds 100MB limit"
-            )
-
-        file_path = await service.upload_file(
+        stream = MultipartFileStream(request, field_name="file")
+        await stream.open()
+
+        result = await service.upload_file_stream(
             session_id=session_id,
             path=path,
-            content=content,
-            content_type=file.content_type
+            chunks=stream,
+            content_type=stream.content_type
         )
 
         return {
             "session_id": session_id,
-            "file_path": file_path,
-            "size": len(content)
+            "file_path": result["path"],
+            "size": result["size"]
         }
 
     except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
+        raise _upload_error(e)
 
 
 @router.get("/{file_path:path}")
 async def download_file(
+    request: Request,
     session_id: str,
     file_path: str,
     service: FileService = Depends(get_file_service_db)
@@ -100,33 +209,291 @@ async def download_file(
     """
     从会话工作区下载文件
 
+    文件内容从对象存储按块流式转发，内存占用与文件大小无关。
+
+    - 支持 `Range: bytes=start-end` 单区间请求，返回 206
+    - 返回 `ETag`，`If-None-Match` 命中时返回 304
+    - 超过重定向阈值的文件返回 307 重定向到预签名 URL（响应体同时包含 presigned_url）
+
     - **file_path**: 文件在工作区中的路径
     """
     try:
-        file_data = await service.download_file(
+        download = await service.download_file(
             session_id=session_id,
-            path=file_path
+            path=file_path,
+            if_none_match=_parse_if_none_match(request.headers.get("if-none-match")),
+            byte_range=_parse_range(request.headers.get("range"))
+        )
+
+    except ConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
         )
 
-        if file_data.get("presigned_url"):
-            return {
+    headers = {"Accept-Ranges": "bytes"}
+    if download.etag:
+        headers["ETag"] = f'"{download.etag}"'
+    if download.last_modified:
+        headers["Last-Modified"] = _http_date(download.last_modified)
+
+    if download.not_modified:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if download.presigned_url:
+        return JSONResponse(
+            status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+            headers={"Location": download.presigned_url},
+            content={
                 "session_id": session_id,
                 "file_path": file_path,
-                "presigned_url": file_data["presigned_url"],
-                "size": file_data["size"]
+                "presigned_url": download.presigned_url,
+                "size": download.size
             }
-        else:
-            from fastapi.responses import Response
-            return Response(
-                content=file_data["content"],
-                media_type=file_data["content_type"],
-                headers={
-                    "Content-Disposition": f'attachment; filename="{file_path}"'
-                }
-            )
+        )
+
+    if download.range_not_satisfiable:
+        headers["Content-Range"] = f"bytes */{download.size}"
+        return Response(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, headers=headers)
+
+    headers["Content-Length"] = str(download.content_length)
+    headers["Content-Disposition"] = f'attachment; filename="{file_path}"'
+    status_code = status.HTTP_200_OK
+    if download.content_range:
+        start, end = download.content_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{download.size}"
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+
+    return StreamingResponse(
+        download.stream,
+        status_code=status_code,
+        media_type=download.content_type,
+        headers=headers
+    )
+
+
+@uploads_router.post("")
+async def create_upload(
+    session_id: str,
+    path: str = Query(..., description="文件在工作区中的路径"),
+    content_type: str = Query("application/octet-stream", description="文件 MIME 类型"),
+    service: FileService = Depends(get_file_service_db)
+):
+    """
+    创建可续传上传
+
+    返回 upload_id 和分片大小。客户端按 part_size 切分文件，逐个 PUT 分片后调用 complete；
+    中断后可查询已上传的分片，只补传缺失部分。
+    """
+    try:
+        result = await service.create_upload(
+            session_id=session_id,
+            path=path,
+            content_type=content_type
+        )
+
+        return {
+            "session_id": session_id,
+            "upload_id": result["upload_id"],
+            "file_path": result["path"],
+            "part_size": result["part_size"],
+            "max_size": result["max_size"]
+        }
 
     except Exception as e:
+        raise _upload_error(e)
+
+
+@uploads_router.put("/{upload_id}/parts/{part_number}", openapi_extra=_RAW_PART_BODY)
+async def upload_part(
+    request: Request,
+    session_id: str,
+    upload_id: str,
+    part_number: int = Path(..., ge=1, le=10000, description="分片号"),
+    path: str = Query(..., description="文件在工作区中的路径"),
+    service: FileService = Depends(get_file_service_db)
+):
+    """
+    上传单个分片
+
+    请求体为分片原始内容，最大为创建上传时返回的 part_size。
+    除最后一个分片外不能小于 5MB，重复上传同一分片号会覆盖之前的内容。
+    """
+    _check_content_length(request, service.part_size_bytes)
+
+    try:
+        return await service.upload_part(
+            session_id=session_id,
+            path=path,
+            upload_id=upload_id,
+            part_number=part_number,
+            chunks=request.stream()
+        )
+
+    except Exception as e:
+        raise _upload_error(e)
+
+
+@uploads_router.get("/{upload_id}")
+async def list_upload_parts(
+    session_id: str,
+    upload_id: str,
+    path: str = Query(..., description="文件在工作区中的路径"),
+    service: FileService = Depends(get_file_service_db)
+):
+    """
+    查询已上传的分片
+
+    用于断点续传：返回已上传分片的分片号、大小和 ETag。
+    """
+    try:
+        result = await service.list_upload_parts(
+            session_id=session_id,
+            path=path,
+            upload_id=upload_id
+        )
+        return {"session_id": session_id, **result}
+
+    except Exception as e:
+        raise _upload_error(e)
+
+
+@uploads_router.post("/{upload_id}/complete")
+async def complete_upload(
+    session_id: str,
+    upload_id: str,
+    path: str = Query(..., description="文件在工作区中的路径"),
+    service: FileService = Depends(get_file_service_db)
+):
+    """
+    完成可续传上传
+
+    按已上传的分片合并为最终文件，总大小超过上限时取消上传并返回 413。
+    """
+    try:
+        result = await service.complete_upload(
+            session_id=session_id,
+            path=path,
+            upload_id=upload_id
+        )
+
+        return {
+            "session_id": session_id,
+            "file_path": result["path"],
+            "size": result["size"]
+        }
+
+    except Exception as e:
+        raise _upload_error(e)
+
+
+@uploads_router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_upload(
+    session_id: str,
+    upload_id: str,
+    path: str = Query(..., description="文件在工作区中的路径"),
+    service: FileService = Depends(get_file_service_db)
+):
+    """
+    取消可续传上传
+
+    释放已上传分片占用的存储。
+    """
+    try:
+        await service.abort_upload(
+            session_id=session_id,
+            path=path,
+            upload_id=upload_id
+        )
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+    except Exception as e:
+        raise _upload_error(e)
+
+
+@archive_router.get("")
+async def download_archive(
+    session_id: str,
+    path: Optional[str] = Query(None, description="要打包的目录路径（相对于 workspace 根目录），不指定则打包整个 workspace"),
+    archive_format: str = Query("zip", alias="format", description="归档格式：zip 或 tar.gz"),
+    service: FileService = Depends(get_file_service_db)
+):
+    """
+    打包下载 workspace 目录
+
+    一次请求下载目录下的全部文件：归档边从对象存储读取文件边生成并流式返回，
+    不在控制平面磁盘或内存中暂存整个归档。归档条目保留目录本身的名称。
+
+    - **path**: 目录路径（如 "outputs/run-1"）
+    - **format**: `zip`（默认）或 `tar.gz`
+
+    文件数或总大小超过上限时返回 400；响应开始后读取失败会中断连接（归档不完整）。
+    """
+    try:
+        archive = await service.open_archive(
+            session_id=session_id,
+            path=path,
+            archive_format=archive_format
+        )
+
+    except NotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
         )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    return StreamingResponse(
+        archive.stream,
+        media_type=archive.media_type,
+        headers={
+            "Content-Disposition": (
+                f"attachment; filename=\"{quote(archive.filename)}\"; "
+                f"filename*=UTF-8''{quote(archive.filename)}"
+            ),
+            "X-Archive-File-Count": str(archive.file_count),
+        }
+    )
+
+
+@archive_router.post("", openapi_extra=_RAW_ARCHIVE_BODY)
+async def upload_archive(
+    request: Request,
+    session_id: str,
+    path: Optional[str] = Query(None, description="解压目标目录（相对于 workspace 根目录），不指定则解压到根目录"),
+    service: FileService = Depends(get_file_service_db)
+):
+    """
+    上传归档并解压到工作区
+
+    请求体为 zip、tar 或 tar.gz 归档原始内容（按内容识别格式），控制平面边接收边解压，
+    每个文件以分片上传并发写入对象存储，一次请求即可写入整个项目或数据集。
+
+    - **path**: 解压目标目录（如 "data/raw"）
+
+    请求体或解压后总大小、文件数超过上限时返回 413；条目路径为绝对路径或包含 ".." 时返回 400。
+    返回解压得到的文件清单。
+    """
+    if service.extract_max_bytes >= 0:
+        _check_content_length(request, service.extract_max_bytes)
+
+    try:
+        result = await service.extract_archive(
+            session_id=session_id,
+            chunks=request.stream(),
+            path=path
+        )
+
+        return {"session_id": session_id, **result}
+
+    except Exception as e:
+        raise _upload_error(e)
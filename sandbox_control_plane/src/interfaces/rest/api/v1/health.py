@@ -3,7 +3,7 @@
 
 定义健康检查和系统监控相关的 HTTP 端点。
 """
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from pydantic import BaseModel
 from typing import Optional
 import time
@@ -38,25 +38,24 @@ async def health_check() -> HealthResponse:
 
 
 @router.get("/detailed")
-async def detailed_health_check() -> dict:
+async def detailed_health_check(request: Request) -> dict:
     """
     详细健康检查
 
-    返回系统状态和依赖项健康状态。
+    返回系统状态与后台任务运行情况：每个任务的耗时、最近错误与超时运行次数。
+    有任务连续失败、运行落后或已停止时整体状态为 degraded。
     """
-    # TODO: 实现依赖项健康检查
-    # - 数据库连接
-    # - S3 存储
-    # - 运行时节点
+    manager = getattr(request.app.state, "background_task_manager", None)
+    if manager is None:
+        background_tasks = {"status": "unavailable", "unhealthy_tasks": [], "tasks": {}}
+    else:
+        background_tasks = manager.health()
+
     return {
-        "status": "healthy",
+        "status": "healthy" if background_tasks["status"] == "healthy" else "degraded",
         "version": "2.1.0",
         "uptime": time.time() - _start_time,
-        "dependencies": {
-            "database": "healthy",
-            "storage": "healthy",
-            "runtime_nodes": "healthy"
-        }
+        "background_tasks": background_tasks,
     }
 
 
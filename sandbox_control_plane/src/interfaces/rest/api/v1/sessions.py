@@ -4,6 +4,7 @@
 定义会话相关的 HTTP 端点。
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import status as http_status
 from typing import List, Optional
 
 from src.application.commands.install_session_dependencies import (
@@ -103,6 +104,8 @@ async def list_sessions(
     template_id: Optional[str] = None,
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     service: SessionService = Depends(get_session_service_db)
 ):
     """
@@ -113,21 +116,33 @@ async def list_sessions(
     - **status**: 会话状态筛选（可选），如 "running", "terminated"
     - **template_id**: 模板 ID 筛选（可选）
     - **limit**: 返回数量限制（1-200，默认 50）
-    - **offset**: 偏移量（用于分页，默认 0）
+    - **offset**: 偏移量（兼容旧客户端，默认 0；提供 cursor 时忽略）
+    - **cursor**: 上一页返回的 next_cursor，深度翻页成本与首页相同
+    - **include_total**: 是否返回精确总数（默认返回估算值）
     """
-    result = await service.list_sessions(
-        status=status,
-        template_id=template_id,
-        limit=limit,
-        offset=offset
-    )
+    try:
+        result = await service.list_sessions(
+            status=status,
+            template_id=template_id,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            include_total=include_total,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
     return SessionListResponse(
         items=[_map_dto_to_response(item) for item in result["items"]],
         total=result["total"],
+        total_is_estimate=result["total_is_estimate"],
         limit=result["limit"],
         offset=result["offset"],
-        has_more=result["has_more"]
+        has_more=result["has_more"],
+        next_cursor=result["next_cursor"],
     )
 
 
@@ -3,6 +3,7 @@ FastAPI 主应用
 
 沙箱控制中心的 FastAPI 应用入口。
 """
+import functools
 import time
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
@@ -34,6 +35,7 @@ from src.interfaces.rest.api.v1 import (
     health,
     files,
     internal,
+    admin,
 )
 from src.interfaces.rest.schemas.response import HealthResponse
 
@@ -111,24 +113,47 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         logger.error("Failed to perform startup state sync", error=str(e), exc_info=True)
 
     # ============= 启动后台任务管理器 =============
-    from src.infrastructure.background_tasks import BackgroundTaskManager
-    from src.infrastructure.dependencies import get_state_sync_service
+    from src.infrastructure.background_tasks import OVERRUN_QUEUE, BackgroundTaskManager
+    from src.infrastructure.dependencies import get_leader_elector, get_state_sync_service
 
-    background_task_manager = BackgroundTaskManager()
+    # 多副本、多 worker 部署时，leader_only 任务只由持有租约的一个进程执行
+    background_task_manager = BackgroundTaskManager(leader_elector=get_leader_elector())
 
-    # 注册定时健康检查任务（每 30 秒）
+    # 注册健康检查任务：自适应模式每秒推进时间轮，只检查到期的会话；否则每 30 秒全量检查
     state_sync_svc = get_state_sync_service()
-    background_task_manager.register_task(
-        name="health_check",
-        func=state_sync_svc.periodic_health_check,
-        interval_seconds=30,
-        initial_delay_seconds=30,  # 首次执行延迟 30 秒
-    )
+    if settings.health_check_adaptive_enabled:
+        background_task_manager.register_task(
+            name="health_check",
+            func=state_sync_svc.run_due_health_checks,
+            interval_seconds=1,
+            initial_delay_seconds=30,  # 首次执行延迟 30 秒
+            leader_only=True,
+            # 每秒推进一次，单次受限速影响常超过 1 秒；只有推迟超过最短复查间隔才算落后
+            behind_tolerance_seconds=settings.health_check_min_interval_seconds,
+        )
+    else:
+        background_task_manager.register_task(
+            name="health_check",
+            func=state_sync_svc.periodic_health_check,
+            interval_seconds=30,
+            initial_delay_seconds=30,  # 首次执行延迟 30 秒
+            leader_only=True,
+        )
 
     # 注册会话清理任务（每 5 分钟）
     from src.application.services.session_cleanup_service import SessionCleanupService
-    from src.infrastructure.dependencies import get_docker_scheduler_service, get_storage_service
+    from src.application.services.session_teardown_pipeline import SessionTeardownPipeline
+    from src.application.services.workspace_manifest_service import WorkspaceManifestService
+    from src.infrastructure.dependencies import (
+        USE_SQL_REPOSITORIES,
+        get_docker_scheduler_service,
+        get_storage_service,
+        get_workspace_deletion_service,
+    )
     from src.infrastructure.persistence.repositories.sql_session_repository import SqlSessionRepository
+    from src.infrastructure.persistence.repositories.sql_workspace_manifest_repository import (
+        SqlWorkspaceManifestRepository,
+    )
     from src.infrastructure.persistence.database import db_manager
 
     async def session_cleanup_task():
@@ -140,12 +165,26 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
                 template_repo=None,
             )
             storage_service = get_storage_service()
+            workspace_manifest = (
+                WorkspaceManifestService(SqlWorkspaceManifestRepository(session), storage_service)
+                if USE_SQL_REPOSITORIES and settings.workspace_manifest_enabled
+                else None
+            )
             cleanup_svc = SessionCleanupService(
                 session_repo=session_repo,
                 scheduler=scheduler,
                 idle_timeout_minutes=settings.idle_threshold_minutes,
                 max_lifetime_hours=settings.max_lifetime_hours,
                 storage_service=storage_service,
+                teardown_pipeline_factory=functools.partial(
+                    SessionTeardownPipeline,
+                    concurrency=settings.session_teardown_concurrency,
+                    storage_concurrency=settings.session_teardown_storage_concurrency,
+                    rate_per_runtime=settings.session_teardown_rate_per_runtime,
+                    max_attempts=settings.session_teardown_max_attempts,
+                ),
+                workspace_deleter=get_workspace_deletion_service(),
+                workspace_manifest=workspace_manifest,
             )
             return await cleanup_svc.cleanup_idle_sessions()
 
@@ -154,8 +193,47 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         func=session_cleanup_task,
         interval_seconds=300,  # 5 分钟
         initial_delay_seconds=60,  # 首次执行延迟 1 分钟
+        leader_only=True,
     )
 
+    # 注册残留 workspace 删除标记扫描任务（删除完成前进程退出的 workspace 重新删除）
+    workspace_deleter = get_workspace_deletion_service()
+    if workspace_deleter is not None and settings.workspace_delete_resume_interval_seconds != -1:
+        background_task_manager.register_task(
+            name="workspace_deletion_resume",
+            func=workspace_deleter.resume_pending,
+            interval_seconds=settings.workspace_delete_resume_interval_seconds,
+            initial_delay_seconds=60,
+            leader_only=True,
+        )
+
+    # 注册 workspace 文件清单对账任务（发现经 s3fs 等途径写入或删除的文件）
+    if (
+        USE_SQL_REPOSITORIES
+        and settings.workspace_manifest_enabled
+        and settings.workspace_manifest_reconcile_interval_seconds != -1
+    ):
+        async def workspace_manifest_reconcile_task():
+            """workspace 文件清单对账任务（每次执行时创建新的 repository）"""
+            async with db_manager.get_session() as session:
+                manifest_svc = WorkspaceManifestService(
+                    manifest_repo=SqlWorkspaceManifestRepository(session),
+                    storage_service=get_storage_service(),
+                    session_repo=SqlSessionRepository(session),
+                )
+                return await manifest_svc.reconcile_due(
+                    interval_seconds=settings.workspace_manifest_reconcile_interval_seconds,
+                    batch_size=settings.workspace_manifest_reconcile_batch_size,
+                )
+
+        background_task_manager.register_task(
+            name="workspace_manifest_reconcile",
+            func=workspace_manifest_reconcile_task,
+            interval_seconds=settings.workspace_manifest_reconcile_interval_seconds,
+            initial_delay_seconds=60,
+            leader_only=True,
+        )
+
     # 注册会话创建超时检测任务（每 5 分钟）
     from src.application.services.session_stuck_creating_service import SessionStuckCreatingService
 
@@ -174,8 +252,210 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         func=stuck_creating_check_task,
         interval_seconds=300,  # 5 分钟，与清理任务一致
         initial_delay_seconds=60,  # 首次执行延迟 1 分钟
+        leader_only=True,
+    )
+
+    # 注册空闲容器冻结任务（仅在配置了冻结阈值时启用）
+    if settings.idle_pause_minutes != -1:
+        from src.application.services.session_idle_pause_service import SessionIdlePauseService
+        from src.infrastructure.persistence.repositories.sql_execution_repository import SqlExecutionRepository
+
+        async def idle_pause_task():
+            """空闲容器冻结任务（每次执行时创建新的 repository）"""
+            async with db_manager.get_session() as session:
+                idle_pause_svc = SessionIdlePauseService(
+                    session_repo=SqlSessionRepository(session),
+                    scheduler=get_docker_scheduler_service(
+                        runtime_node_repo=None,
+                        template_repo=None,
+                    ),
+                    execution_repo=SqlExecutionRepository(session),
+                    idle_pause_minutes=settings.idle_pause_minutes,
+                )
+                return await idle_pause_svc.pause_idle_sessions()
+
+        background_task_manager.register_task(
+            name="idle_pause",
+            func=idle_pause_task,
+            interval_seconds=settings.idle_pause_check_interval_seconds,
+            initial_delay_seconds=60,
+            leader_only=True,
+        )
+
+    # 注册会话休眠任务（仅在配置了休眠阈值时启用）
+    if settings.hibernate_after_minutes != -1:
+        from src.application.services.session_hibernation_service import SessionHibernationService
+        from src.infrastructure.persistence.repositories.sql_execution_repository import SqlExecutionRepository
+
+        async def hibernation_task():
+            """会话休眠任务（每次执行时创建新的 repository）"""
+            async with db_manager.get_session() as session:
+                hibernation_svc = SessionHibernationService(
+                    session_repo=SqlSessionRepository(session),
+                    scheduler=get_docker_scheduler_service(
+                        runtime_node_repo=None,
+                        template_repo=None,
+                    ),
+                    execution_repo=SqlExecutionRepository(session),
+                    hibernate_after_minutes=settings.hibernate_after_minutes,
+                )
+                return await hibernation_svc.hibernate_idle_sessions()
+
+        background_task_manager.register_task(
+            name="session_hibernation",
+            func=hibernation_task,
+            interval_seconds=settings.hibernate_check_interval_seconds,
+            initial_delay_seconds=120,
+            leader_only=True,
+        )
+
+    # 注册会话活动时间写回任务（执行与文件接口只写内存缓冲）
+    from src.infrastructure.dependencies import get_session_activity_buffer
+
+    background_task_manager.register_task(
+        name="session_activity_flush",
+        func=get_session_activity_buffer().flush,
+        interval_seconds=settings.session_activity_flush_interval_seconds,
+        initial_delay_seconds=settings.session_activity_flush_interval_seconds,
+        overrun_policy=OVERRUN_QUEUE,  # 写回落后时立即补跑，避免缓冲积压
+    )
+
+    # 注册执行心跳写回任务（心跳接口只写内存）
+    from src.infrastructure.dependencies import get_execution_heartbeat_tracker
+
+    heartbeat_tracker = get_execution_heartbeat_tracker()
+    background_task_manager.register_task(
+        name="execution_heartbeat_flush",
+        func=heartbeat_tracker.flush,
+        interval_seconds=settings.heartbeat_flush_interval_seconds,
+        initial_delay_seconds=settings.heartbeat_flush_interval_seconds,
+        overrun_policy=OVERRUN_QUEUE,
     )
 
+    # 注册停滞执行检测任务（仅在配置了检测间隔时启用）
+    if settings.heartbeat_check_interval_seconds != -1:
+        from src.application.services.execution_heartbeat_service import ExecutionHeartbeatService
+        from src.infrastructure.dependencies import get_execution_result_ingestor
+        from src.infrastructure.metrics import EXECUTION_STALLED_TOTAL
+        from src.infrastructure.persistence.repositories.sql_execution_repository import SqlExecutionRepository
+
+        def on_executions_crashed(execution_ids):
+            """停止跟踪已崩溃的执行，并唤醒等待其结果的同步请求"""
+            EXECUTION_STALLED_TOTAL.inc(len(execution_ids))
+            heartbeat_tracker.forget(execution_ids)
+            get_execution_result_ingestor().notify(execution_ids)
+
+        async def execution_heartbeat_check_task():
+            """停滞执行检测任务（每次执行时创建新的 repository）"""
+            async with db_manager.get_session() as session:
+                heartbeat_svc = ExecutionHeartbeatService(
+                    execution_repo=SqlExecutionRepository(session),
+                    heartbeat_timeout_seconds=settings.heartbeat_timeout_seconds,
+                    last_seen=heartbeat_tracker.last_seen,
+                    on_crashed=on_executions_crashed,
+                )
+                return await heartbeat_svc.detect_stalled_executions()
+
+        background_task_manager.register_task(
+            name="execution_heartbeat_check",
+            func=execution_heartbeat_check_task,
+            interval_seconds=settings.heartbeat_check_interval_seconds,
+            initial_delay_seconds=settings.heartbeat_timeout_seconds,
+            leader_only=True,
+        )
+
+    # 注册模板缓存版本检查任务（其他副本写入模板后失效本地缓存）
+    from src.infrastructure.dependencies import get_template_cache
+
+    template_cache = get_template_cache()
+    if template_cache is not None:
+        from src.infrastructure.persistence.template_cache import TEMPLATE_CACHE_NAME, read_cache_version
+
+        async def template_cache_version_task():
+            """读取模板缓存版本号，变化时清空本地缓存，返回缓存统计"""
+            async with db_manager.get_session() as session:
+                version = await read_cache_version(session, TEMPLATE_CACHE_NAME)
+            template_cache.apply_version(version)
+            return template_cache.stats()
+
+        background_task_manager.register_task(
+            name="template_cache_version_check",
+            func=template_cache_version_task,
+            interval_seconds=settings.template_cache_version_check_interval_seconds,
+        )
+
+    # 注册执行记录归档任务（仅在配置了保留天数时启用）
+    if settings.execution_retention_days != -1:
+        from src.application.services.execution_archive_service import ExecutionArchiveService
+        from src.infrastructure.persistence.repositories.sql_execution_repository import SqlExecutionRepository
+
+        async def execution_archive_task():
+            """执行记录归档任务（每次执行时创建新的 repository）"""
+            async with db_manager.get_session() as session:
+                archive_svc = ExecutionArchiveService(
+                    execution_repo=SqlExecutionRepository(session),
+                    storage_service=get_storage_service(),
+                    retention_days=settings.execution_retention_days,
+                    batch_size=settings.execution_archive_batch_size,
+                )
+                return await archive_svc.archive_expired_executions()
+
+        background_task_manager.register_task(
+            name="execution_archive",
+            func=execution_archive_task,
+            interval_seconds=settings.execution_archive_interval_seconds,
+            initial_delay_seconds=300,
+            leader_only=True,
+        )
+
+    # 注册从库健康检查任务（仅在配置了从库时启用）
+    if db_manager.has_read_replica:
+        async def replica_health_task():
+            """从库连通性与复制延迟检查，不可用时读请求回退主库"""
+            return await db_manager.check_replica_health(settings.db_read_max_lag_seconds)
+
+        background_task_manager.register_task(
+            name="db_replica_health",
+            func=replica_health_task,
+            interval_seconds=settings.db_read_health_check_interval_seconds,
+        )
+
+    # 注册执行分发队列指标任务（队列长度与最早条目等待时间）
+    from src.infrastructure.dependencies import USE_SQL_REPOSITORIES
+
+    dispatch_queue_enabled = USE_SQL_REPOSITORIES and settings.execution_dispatch_queue_enabled
+    if dispatch_queue_enabled:
+        from src.infrastructure.messaging.execution_dispatcher import record_queue_stats
+        from src.infrastructure.persistence.repositories.sql_execution_dispatch_repository import (
+            SqlExecutionDispatchRepository,
+        )
+
+        async def execution_dispatch_stats_task():
+            """读取分发队列统计并写入指标"""
+            async with db_manager.get_session() as session:
+                stats = await SqlExecutionDispatchRepository(session).queue_stats()
+            record_queue_stats(stats)
+            return stats
+
+        background_task_manager.register_task(
+            name="execution_dispatch_stats",
+            func=execution_dispatch_stats_task,
+            interval_seconds=settings.execution_dispatch_stats_interval_seconds,
+        )
+
+    # 启动执行结果摄取队列（重放结果日志中尚未提交的结果）
+    from src.infrastructure.dependencies import get_execution_result_ingestor
+
+    await get_execution_result_ingestor().start()
+    logger.info("Execution result ingestor started")
+
+    # 启动执行分发者（投递上次停机时队列中未分发的执行）
+    if dispatch_queue_enabled:
+        from src.infrastructure.dependencies import get_execution_dispatcher
+
+        get_execution_dispatcher().start()
+        logger.info("Execution dispatcher started")
+
     # 启动所有后台任务
     await background_task_manager.start_all()
     logger.info(f"Background tasks started: {background_task_manager.task_count} tasks")
@@ -193,6 +473,61 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         await app.state.background_task_manager.stop_all()
         logger.info("Background tasks stopped")
 
+    # 停止执行分发者（未分发的执行留在队列中，由下次启动或其他副本分发）
+    if dispatch_queue_enabled:
+        from src.infrastructure.dependencies import get_execution_dispatcher
+
+        try:
+            await get_execution_dispatcher().stop()
+        except Exception as e:
+            logger.error(f"Failed to stop execution dispatcher on shutdown: {e}")
+
+    # 提交队列中已接收的执行结果
+    from src.infrastructure.dependencies import get_execution_result_ingestor
+
+    try:
+        await get_execution_result_ingestor().stop()
+        logger.info("Execution result ingestor drained")
+    except Exception as e:
+        logger.error(f"Failed to drain execution results on shutdown: {e}")
+
+    # 写回缓冲中尚未落库的会话活动时间
+    from src.infrastructure.dependencies import get_session_activity_buffer
+
+    try:
+        flushed = await get_session_activity_buffer().flush()
+        logger.info(f"Session activity flushed on shutdown: {flushed} sessions")
+    except Exception as e:
+        logger.error(f"Failed to flush session activity on shutdown: {e}")
+
+    # 写回内存中尚未落库的执行心跳
+    from src.infrastructure.dependencies import get_execution_heartbeat_tracker
+
+    try:
+        await get_execution_heartbeat_tracker().flush()
+    except Exception as e:
+        logger.error(f"Failed to flush execution heartbeats on shutdown: {e}")
+
+    # 取消进行中的 workspace 删除（删除标记保留，重启后由扫描任务继续）
+    from src.infrastructure.dependencies import get_workspace_deletion_service
+
+    workspace_deleter = get_workspace_deletion_service()
+    if workspace_deleter is not None:
+        try:
+            await workspace_deleter.stop()
+        except Exception as e:
+            logger.error(f"Failed to stop workspace deletions on shutdown: {e}")
+
+    # 关闭存储客户端连接池（async S3 客户端）
+    from src.infrastructure.dependencies import get_storage_service
+
+    storage_service = get_storage_service()
+    if hasattr(storage_service, "close"):
+        try:
+            await storage_service.close()
+        except Exception as e:
+            logger.error(f"Failed to close storage client on shutdown: {e}")
+
     # 清理依赖项（包括关闭数据库连接）
     from src.infrastructure.dependencies import cleanup_dependencies
     await cleanup_dependencies(app)
@@ -241,7 +576,12 @@ def create_app() -> FastAPI:
 
 def _register_exception_handlers(app: FastAPI) -> None:
     """注册异常处理器"""
-    from src.shared.errors.domain import NotFoundError, ValidationError
+    from src.shared.errors.domain import (
+        ConflictError,
+        NodeUnavailableError,
+        NotFoundError,
+        ValidationError,
+    )
 
     @app.exception_handler(NotFoundError)
     async def not_found_exception_handler(
@@ -285,6 +625,48 @@ def _register_exception_handlers(app: FastAPI) -> None:
             },
         )
 
+    @app.exception_handler(ConflictError)
+    async def conflict_exception_handler(
+        request: Request,
+        exc: ConflictError
+    ) -> JSONResponse:
+        """409 并发修改冲突处理"""
+        logger.warning(
+            "Concurrent modification conflict",
+            path=request.url.path,
+            method=request.method,
+            error=str(exc),
+        )
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={
+                "error": "Conflict",
+                "message": exc.message,
+                "detail": str(exc),
+            },
+        )
+
+    @app.exception_handler(NodeUnavailableError)
+    async def node_unavailable_exception_handler(
+        request: Request,
+        exc: NodeUnavailableError
+    ) -> JSONResponse:
+        """503 运行时节点或执行器暂不可用（如休眠恢复超时），客户端可重试"""
+        logger.warning(
+            "Node unavailable",
+            path=request.url.path,
+            method=request.method,
+            error=str(exc),
+        )
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={
+                "error": "Service Unavailable",
+                "message": exc.message,
+                "detail": str(exc),
+            },
+        )
+
     @app.exception_handler(Exception)
     async def global_exception_handler(
         request: Request,
@@ -317,7 +699,20 @@ def _register_routes(app: FastAPI) -> None:
     app.include_router(executions.router, prefix="/api/v1")
     app.include_router(templates.router, prefix="/api/v1")
     app.include_router(files.router, prefix="/api/v1")
+    app.include_router(files.uploads_router, prefix="/api/v1")
+    app.include_router(files.archive_router, prefix="/api/v1")
     app.include_router(internal.router, prefix="/api/v1")  # 内部 API
+    app.include_router(admin.router, prefix="/api/v1")  # 运维 API
+
+    # Prometheus 指标端点
+    if get_settings().metrics_enabled:
+        from fastapi import Response
+        from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+        @app.get("/metrics", tags=["monitoring"], include_in_schema=False)
+        async def metrics() -> Response:
+            """导出 Prometheus 指标"""
+            return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
     # 根端点
     @app.get("/", tags=["root"])
@@ -0,0 +1,125 @@
+"""
+multipart/form-data 请求体流式解析
+
+从请求体中逐块取出单个文件字段的内容。
+不使用 Starlette 的表单解析：表单解析会在调用路由前读完整个请求体并落盘，
+无法在读取过程中校验大小，也无法边读边写入对象存储。
+"""
+from typing import AsyncIterator, Dict, List, Optional
+
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import Request
+
+
+class MultipartFileStream:
+    """
+    multipart/form-data 文件字段流
+
+    用法：
+        stream = MultipartFileStream(request, field_name="file")
+        await stream.open()          # 读到文件字段头部为止，得到 filename、content_type
+        async for chunk in stream:   # 逐块产出文件内容
+            ...
+
+    其他字段被忽略；同名字段只取第一个。文件字段结束后不再读取剩余请求体。
+    请求体格式错误时抛出 ValueError（或 python-multipart 的解析异常）。
+    """
+
+    def __init__(self, request: Request, field_name: str = "file"):
+        content_type, options = parse_options_header(request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or not options.get(b"boundary"):
+            raise ValueError("Expected multipart/form-data request with boundary")
+
+        self._field_name = field_name
+        self._body = request.stream()
+        self._parser = MultipartParser(
+            options[b"boundary"],
+            callbacks={
+                "on_part_begin": self._on_part_begin,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+            },
+        )
+        self._chunks: List[bytes] = []
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._in_field = False
+        self._found = False
+        self._finished = False
+
+        self.filename: Optional[str] = None
+        self.content_type: str = "application/octet-stream"
+
+    async def open(self) -> None:
+        """读取请求体直到文件字段的头部解析完成"""
+        while not self._found:
+            if not await self._feed():
+                raise ValueError(f"Missing file field: {self._field_name}")
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        await self.open()
+        while True:
+            if self._chunks:
+                chunks, self._chunks = self._chunks, []
+                for chunk in chunks:
+                    yield chunk
+            if self._finished:
+                return
+            if not await self._feed():
+                raise ValueError("Unexpected end of multipart body")
+
+    async def _feed(self) -> bool:
+        """把下一块请求体交给解析器，请求体已读完时返回 False"""
+        try:
+            chunk = await self._body.__anext__()
+        except StopAsyncIteration:
+            return False
+        if chunk:
+            self._parser.write(chunk)
+        return True
+
+    # ---------- python-multipart 回调 ----------
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        if self._found:
+            return
+
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if options.get(b"name", b"").decode("latin-1") != self._field_name:
+            return
+
+        self._found = True
+        self._in_field = True
+        if b"filename" in options:
+            self.filename = options[b"filename"].decode("utf-8", errors="replace")
+        part_content_type = self._headers.get(b"content-type")
+        if part_content_type:
+            self.content_type = part_content_type.decode("latin-1")
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_field and end > start:
+            self._chunks.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        if self._in_field:
+            self._in_field = False
+            self._finished = True
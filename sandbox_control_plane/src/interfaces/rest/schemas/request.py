@@ -201,3 +201,8 @@ class UpdateTemplateRequest(BaseModel):
     default_disk_mb: Optional[int] = Field(None, ge=256, le=51200, description="默认磁盘（MB）")
     default_timeout: Optional[int] = Field(None, ge=60, le=3600, description="默认超时（秒）")
     default_env_vars: Optional[Dict[str, str]] = Field(None, description="默认环境变量")
+
+
+class UpdateBackgroundTaskIntervalRequest(BaseModel):
+    """修改后台任务执行间隔请求"""
+    interval_seconds: float = Field(..., gt=0, le=86400, description="执行间隔（秒）")
@@ -64,9 +64,11 @@ class SessionListResponse(BaseModel):
     """会话列表响应"""
     items: List[SessionResponse]
     total: int
+    total_is_estimate: bool = False
     limit: int
     offset: int
     has_more: bool
+    next_cursor: Optional[str] = None
 
 
 class ArtifactResponse(BaseModel):
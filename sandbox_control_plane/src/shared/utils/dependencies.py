@@ -185,3 +185,55 @@ else
     exit 1
 fi
 """
+
+
+# 休眠快照在会话 workspace 中的相对路径（经 s3fs 落到会话 S3 前缀下）
+VENV_SNAPSHOT_RELATIVE_PATH = ".sandbox/venv-snapshot.tar.gz"
+
+
+def build_venv_snapshot_command() -> List[str]:
+    """
+    构建依赖目录快照命令
+
+    将 /opt/sandbox-venv 打包写入 /workspace（即会话 S3 前缀），
+    先写临时文件再重命名，避免恢复时读到半截快照。
+    目录不存在或为空时不生成快照。
+    """
+    snapshot = f"/workspace/{VENV_SNAPSHOT_RELATIVE_PATH}"
+    script = (
+        'if [ -d /opt/sandbox-venv ] && [ -n "$(ls -A /opt/sandbox-venv)" ]; then '
+        f'mkdir -p "$(dirname {snapshot})" && '
+        f'tar czf {snapshot}.tmp -C /opt/sandbox-venv . && '
+        f'mv -f {snapshot}.tmp {snapshot}; '
+        'fi'
+    )
+    return ["sh", "-c", script]
+
+
+def build_venv_snapshot_restore_script(install_script: str) -> str:
+    """
+    构建从休眠快照恢复依赖的脚本片段
+
+    需在 SESSION_PATH 变量就绪后执行。存在快照时解压到 /opt/sandbox-venv 并导出
+    PYTHONPATH / SANDBOX_VENV_PATH，否则回退到 install_script（pip 安装）。
+    快照由控制平面在恢复成功后删除，容器启动失败时可重试恢复。
+
+    Args:
+        install_script: 无快照时执行的依赖安装脚本（可为空）
+
+    Returns:
+        Shell 脚本字符串
+    """
+    return f"""
+# ========== 从休眠快照恢复依赖 ==========
+SNAPSHOT_FILE="$SESSION_PATH/{VENV_SNAPSHOT_RELATIVE_PATH}"
+if [ -f "$SNAPSHOT_FILE" ] && mkdir -p /opt/sandbox-venv && tar xzf "$SNAPSHOT_FILE" -C /opt/sandbox-venv; then
+    echo "✅ Dependencies restored from hibernation snapshot"
+    chown -R sandbox:sandbox /opt/sandbox-venv 2>/dev/null || true
+    export PYTHONPATH="/opt/sandbox-venv:/app:/workspace"
+    export SANDBOX_VENV_PATH="/opt/sandbox-venv"
+else
+:
+{install_script}
+fi
+"""
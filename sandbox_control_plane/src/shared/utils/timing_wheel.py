@@ -0,0 +1,88 @@
+"""
+时间轮
+
+哈希时间轮（hashed timing wheel）：按 tick 划分槽位，定时项落在截止 tick 对应的槽中，
+推进时只访问经过的槽位，调度、取消、到期都与定时项总数无关。
+"""
+import math
+import time
+from typing import Callable, Dict, Hashable, List, Optional
+
+
+class TimingWheel:
+    """
+    哈希时间轮
+
+    每个键最多一个定时项，重复调度会替换原有定时项。
+    超过一圈的定时项按绝对截止 tick 判断，在经过的那一圈才到期。
+    """
+
+    def __init__(
+        self,
+        tick_seconds: float = 1.0,
+        slots: int = 512,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        初始化时间轮
+
+        Args:
+            tick_seconds: 每个槽位的时间跨度（秒），即到期精度
+            slots: 槽位数
+            clock: 单调时钟
+        """
+        if tick_seconds <= 0 or slots <= 0:
+            raise ValueError("tick_seconds and slots must be positive")
+
+        self._tick_seconds = tick_seconds
+        self._slots = slots
+        self._clock = clock
+        self._origin = clock()
+        self._current_tick = 0
+        self._buckets: List[Dict[Hashable, int]] = [{} for _ in range(slots)]
+        self._deadlines: Dict[Hashable, int] = {}
+
+    def schedule(self, key: Hashable, delay_seconds: float) -> None:
+        """在 delay_seconds 后到期（至少一个 tick），替换该键已有的定时项"""
+        self.cancel(key)
+        ticks = max(1, math.ceil(delay_seconds / self._tick_seconds))
+        deadline = self._current_tick + ticks
+        self._buckets[deadline % self._slots][key] = deadline
+        self._deadlines[key] = deadline
+
+    def cancel(self, key: Hashable) -> bool:
+        """取消定时项，返回是否存在"""
+        deadline = self._deadlines.pop(key, None)
+        if deadline is None:
+            return False
+        del self._buckets[deadline % self._slots][key]
+        return True
+
+    def advance(self, now: Optional[float] = None) -> List[Hashable]:
+        """
+        推进到当前时间，返回到期的键（按经过的槽位顺序）
+
+        长时间未推进时最多访问一圈槽位。
+        """
+        target = int(((self._clock() if now is None else now) - self._origin) / self._tick_seconds)
+        if target <= self._current_tick:
+            return []
+
+        due: List[Hashable] = []
+        steps = min(target - self._current_tick, self._slots)
+        for tick in range(target - steps + 1, target + 1):
+            bucket = self._buckets[tick % self._slots]
+            expired = [key for key, deadline in bucket.items() if deadline <= target]
+            for key in expired:
+                del bucket[key]
+                del self._deadlines[key]
+            due.extend(expired)
+
+        self._current_tick = target
+        return due
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._deadlines
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
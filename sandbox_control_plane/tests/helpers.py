@@ -183,3 +183,28 @@ def create_mock_scheduler(
     )
     scheduler.destroy_container = AsyncMock(return_value=destroy_container_return)
     return scheduler
+
+
+def mock_session_pages(*results) -> Mock:
+    """
+    创建模拟的 ISessionRepository.iter_by_status
+
+    Args:
+        results: 每次调用依次取一项（只剩一项时之后的调用都使用它）：
+            会话列表作为一页产出（空列表不产出），页列表的元组逐页产出，异常在遍历时抛出
+
+    Returns:
+        Mock 对象（可检查调用参数）
+    """
+    pending = list(results) or [[]]
+
+    async def iter_by_status(status, page_size=500):
+        result = pending.pop(0) if len(pending) > 1 else pending[0]
+        if isinstance(result, Exception):
+            raise result
+        pages = result if isinstance(result, tuple) else (result,)
+        for page in pages:
+            if page:
+                yield page
+
+    return Mock(side_effect=iter_by_status)
@@ -0,0 +1,144 @@
+"""
+执行归档服务单元测试
+
+测试 ExecutionArchiveService 的分批归档与按 ID 读取归档。
+"""
+import gzip
+import json
+import pytest
+from unittest.mock import Mock, AsyncMock
+from datetime import datetime, timedelta
+
+from src.application.services.execution_archive_service import (
+    ExecutionArchiveService,
+    execution_to_record,
+)
+from src.domain.entities.execution import Execution
+from src.domain.value_objects.execution_status import ExecutionState, ExecutionStatus
+
+
+def _make_execution(execution_id: str, session_id: str, age_days: int = 40) -> Execution:
+    return Execution(
+        id=execution_id,
+        session_id=session_id,
+        code="print('hello')",
+        language="python",
+        state=ExecutionState(status=ExecutionStatus.COMPLETED, exit_code=0),
+        created_at=datetime(2024, 1, 1) - timedelta(days=age_days),
+        stdout="hello\n",
+        return_value={"ok": True},
+    )
+
+
+class TestExecutionArchiveService:
+    """执行归档服务测试"""
+
+    @pytest.fixture
+    def execution_repo(self):
+        repo = Mock()
+        repo.find_archivable = AsyncMock(return_value=[])
+        repo.mark_archived = AsyncMock()
+        repo.commit = AsyncMock()
+        repo.find_archive_path = AsyncMock(return_value=None)
+        return repo
+
+    @pytest.fixture
+    def storage(self):
+        storage = Mock()
+        storage.upload_file = AsyncMock()
+        storage.download_file = AsyncMock()
+        return storage
+
+    @pytest.fixture
+    def service(self, execution_repo, storage):
+        return ExecutionArchiveService(
+            execution_repo=execution_repo,
+            storage_service=storage,
+            retention_days=30,
+            batch_size=3,
+        )
+
+    @pytest.mark.asyncio
+    async def test_disabled_does_nothing(self, execution_repo, storage):
+        """测试 retention_days=-1 时不归档"""
+        service = ExecutionArchiveService(execution_repo, storage, retention_days=-1)
+
+        stats = await service.archive_expired_executions()
+
+        assert stats["archived"] == 0
+        execution_repo.find_archivable.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_archive_groups_by_session(self, service, execution_repo, storage):
+        """测试按会话写入压缩 JSONL 后登记并删除"""
+        executions = [
+            _make_execution("exec_1", "sess_a"),
+            _make_execution("exec_2", "sess_b"),
+            _make_execution("exec_3", "sess_a"),
+        ]
+        execution_repo.find_archivable.side_effect = [executions, []]
+
+        stats = await service.archive_expired_executions()
+
+        assert stats["archived"] == 3
+        assert stats["archive_files"] == 2
+        assert stats["batches"] == 1
+        assert execution_repo.find_archivable.call_args_list[0].kwargs["limit"] == 3
+
+        path, content = storage.upload_file.call_args_list[0].args
+        assert path.startswith("executions-archive/sess_a/")
+        assert path.endswith("-exec_1.jsonl.gz")
+        records = [json.loads(line) for line in gzip.decompress(content).decode().splitlines()]
+        assert [r["id"] for r in records] == ["exec_1", "exec_3"]
+        assert records[0]["stdout"] == "hello\n"
+
+        archived_path, archived = execution_repo.mark_archived.call_args_list[0].args
+        assert archived_path == path
+        assert [e.id for e in archived] == ["exec_1", "exec_3"]
+        assert execution_repo.commit.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_partial_batch_stops(self, service, execution_repo):
+        """测试不足一批时结束本次任务"""
+        execution_repo.find_archivable.return_value = [_make_execution("exec_1", "sess_a")]
+
+        stats = await service.archive_expired_executions()
+
+        assert stats["batches"] == 1
+        execution_repo.find_archivable.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_upload_failure_keeps_rows(self, service, execution_repo, storage):
+        """测试上传失败时不删除执行记录"""
+        execution_repo.find_archivable.return_value = [_make_execution("exec_1", "sess_a")] * 3
+        storage.upload_file.side_effect = Exception("s3 unavailable")
+
+        stats = await service.archive_expired_executions()
+
+        assert stats["archived"] == 0
+        assert len(stats["errors"]) == 1
+        execution_repo.mark_archived.assert_not_called()
+        execution_repo.find_archivable.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_load_archived_execution(self, service, execution_repo, storage):
+        """测试按 ID 从归档读取执行"""
+        records = [execution_to_record(_make_execution(f"exec_{i}", "sess_a")) for i in range(2)]
+        execution_repo.find_archive_path.return_value = "executions-archive/sess_a/1-exec_0.jsonl.gz"
+        storage.download_file.return_value = gzip.compress(
+            "".join(json.dumps(r) + "\n" for r in records).encode()
+        )
+
+        execution = await service.load_archived_execution("exec_1")
+
+        storage.download_file.assert_called_once_with("executions-archive/sess_a/1-exec_0.jsonl.gz")
+        assert execution.id == "exec_1"
+        assert execution.state.status == ExecutionStatus.COMPLETED
+        assert execution.return_value == {"ok": True}
+        assert execution.created_at == datetime(2024, 1, 1) - timedelta(days=40)
+
+    @pytest.mark.asyncio
+    async def test_load_not_archived(self, service, storage):
+        """测试未归档的执行返回 None"""
+        assert await service.load_archived_execution("exec_404") is None
+        storage.download_file.assert_not_called()
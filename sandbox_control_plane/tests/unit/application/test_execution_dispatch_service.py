@@ -0,0 +1,208 @@
+"""
+执行分发服务单元测试
+
+测试 ExecutionDispatchService 的投递、重试退避、最终失败与过期条目丢弃。
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from unittest.mock import Mock, AsyncMock
+
+from src.application.services.execution_dispatch_service import ExecutionDispatchService
+from src.domain.entities.execution import Execution
+from src.domain.entities.session import Session
+from src.domain.value_objects.dispatch_entry import DispatchEntry
+from src.domain.value_objects.execution_status import ExecutionState, ExecutionStatus, SessionStatus
+from src.domain.value_objects.resource_limit import ResourceLimit
+from src.infrastructure.executors.errors import ExecutorUnavailableError, ExecutorValidationError
+
+
+def _make_execution(execution_id: str, status: ExecutionStatus = ExecutionStatus.PENDING) -> Execution:
+    return Execution(
+        id=execution_id,
+        session_id="sess_001",
+        code="print('hello')",
+        language="python",
+        timeout=60,
+        event_data={"name": "world"},
+        state=ExecutionState(status=status),
+    )
+
+
+def _make_session(session_id: str = "sess_001", status: SessionStatus = SessionStatus.RUNNING) -> Session:
+    return Session(
+        id=session_id,
+        template_id="python-basic",
+        status=status,
+        resource_limit=ResourceLimit.default(),
+        workspace_path=f"s3://bucket/{session_id}",
+        runtime_type="docker",
+        container_id="container-001",
+    )
+
+
+def _entry(execution_id: str, attempts: int = 1, session_id: str = "sess_001") -> DispatchEntry:
+    return DispatchEntry(
+        execution_id=execution_id,
+        session_id=session_id,
+        attempts=attempts,
+        enqueued_at=datetime.now() - timedelta(seconds=2),
+    )
+
+
+class TestExecutionDispatchService:
+    """执行分发服务测试"""
+
+    @pytest.fixture
+    def dispatch_repo(self):
+        repo = Mock()
+        repo.claim_due = AsyncMock(return_value=[])
+        repo.complete = AsyncMock()
+        repo.retry_later = AsyncMock()
+        repo.commit = AsyncMock()
+        return repo
+
+    @pytest.fixture
+    def execution_repo(self):
+        repo = Mock()
+        repo.find_by_ids = AsyncMock(return_value=[_make_execution("exec_1")])
+        repo.save_results = AsyncMock()
+        repo.touch_heartbeats = AsyncMock(return_value=1)
+        return repo
+
+    @pytest.fixture
+    def session_repo(self):
+        repo = Mock()
+        repo.find_by_id = AsyncMock(return_value=_make_session())
+        return repo
+
+    @pytest.fixture
+    def scheduler(self):
+        scheduler = Mock()
+        scheduler.unpause_container = AsyncMock(return_value=None)
+        scheduler.execute = AsyncMock(return_value="exec_1")
+        return scheduler
+
+    @pytest.fixture
+    def service(self, dispatch_repo, execution_repo, session_repo, scheduler):
+        return ExecutionDispatchService(
+            dispatch_repo=dispatch_repo,
+            execution_repo=execution_repo,
+            session_repo=session_repo,
+            scheduler=scheduler,
+            max_attempts=3,
+            retry_base_seconds=1.0,
+            retry_max_seconds=10.0,
+        )
+
+    @pytest.mark.asyncio
+    async def test_empty_queue(self, service, dispatch_repo, scheduler):
+        """测试队列为空时不查询执行、不调用执行器"""
+        stats = await service.dispatch_due()
+
+        assert stats["claimed"] == 0
+        dispatch_repo.commit.assert_called_once()
+        scheduler.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_delivers_and_completes(self, service, dispatch_repo, scheduler):
+        """测试认领提交后投递执行器，成功后移除条目"""
+        dispatch_repo.claim_due.return_value = [_entry("exec_1")]
+
+        stats = await service.dispatch_due(limit=10)
+
+        dispatch_repo.claim_due.assert_called_once_with(10, 120)
+        scheduler.unpause_container.assert_called_once_with("container-001")
+        request = scheduler.execute.call_args.kwargs["execution_request"]
+        assert request.execution_id == "exec_1"
+        assert request.event == {"name": "world"}
+        assert request.timeout == 60
+        dispatch_repo.complete.assert_called_once_with(["exec_1"])
+        assert dispatch_repo.commit.call_count == 2
+        assert stats["delivered"] == 1
+        assert stats["lag_seconds"][0] >= 2
+
+    @pytest.mark.asyncio
+    async def test_delivery_records_first_heartbeat(self, service, dispatch_repo, execution_repo):
+        """测试投递成功时写入首次心跳，执行器不再发送心跳也能被心跳检测发现"""
+        dispatch_repo.claim_due.return_value = [_entry("exec_1")]
+
+        before = datetime.now()
+        await service.dispatch_due()
+
+        heartbeats = execution_repo.touch_heartbeats.call_args.args[0]
+        assert list(heartbeats) == ["exec_1"]
+        assert heartbeats["exec_1"] >= before
+
+    @pytest.mark.asyncio
+    async def test_transient_failure_retries_with_backoff(self, service, dispatch_repo, scheduler):
+        """测试执行器不可用时按指数退避重新排队"""
+        dispatch_repo.claim_due.return_value = [_entry("exec_1", attempts=2)]
+        scheduler.execute.side_effect = ExecutorUnavailableError("connection refused")
+
+        before = datetime.now()
+        stats = await service.dispatch_due()
+
+        execution_id, next_attempt_at, error = dispatch_repo.retry_later.call_args.args
+        assert execution_id == "exec_1"
+        # 第 2 次失败：1s * 2^1 = 2s（±20% 抖动）
+        assert timedelta(seconds=1.5) <= next_attempt_at - before <= timedelta(seconds=2.5)
+        assert "connection refused" in error
+        dispatch_repo.complete.assert_called_once_with([])
+        assert stats["retried"] == 1
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts(self, service, dispatch_repo, execution_repo, scheduler):
+        """测试超过最大次数后执行标记为 FAILED 并移除条目"""
+        dispatch_repo.claim_due.return_value = [_entry("exec_1", attempts=3)]
+        scheduler.execute.side_effect = ExecutorUnavailableError("connection refused")
+
+        stats = await service.dispatch_due()
+
+        dispatch_repo.retry_later.assert_not_called()
+        failed = execution_repo.save_results.call_args.args[0]
+        assert failed[0].state.status == ExecutionStatus.FAILED
+        assert "Dispatch failed" in failed[0].state.error_message
+        dispatch_repo.complete.assert_called_once_with(["exec_1"])
+        assert stats["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_validation_error_fails_without_retry(self, service, dispatch_repo, execution_repo, scheduler):
+        """测试执行器拒绝请求时不重试"""
+        dispatch_repo.claim_due.return_value = [_entry("exec_1")]
+        scheduler.execute.side_effect = ExecutorValidationError("http://executor:8080", ["invalid code"])
+
+        stats = await service.dispatch_due()
+
+        dispatch_repo.retry_later.assert_not_called()
+        execution_repo.save_results.assert_called_once()
+        assert stats["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_inactive_session_fails_execution(self, service, dispatch_repo, session_repo, scheduler):
+        """测试会话已终止时执行直接失败"""
+        dispatch_repo.claim_due.return_value = [_entry("exec_1")]
+        session_repo.find_by_id.return_value = _make_session(status=SessionStatus.TERMINATED)
+
+        stats = await service.dispatch_due()
+
+        scheduler.execute.assert_not_called()
+        assert stats["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_already_started_or_deleted_executions_dropped(
+        self, service, dispatch_repo, execution_repo, scheduler
+    ):
+        """测试已开始运行（重复投递）或已删除的执行只移除条目"""
+        dispatch_repo.claim_due.return_value = [
+            _entry("exec_1"),
+            _entry("exec_gone", session_id="sess_002"),
+        ]
+        execution_repo.find_by_ids.return_value = [_make_execution("exec_1", ExecutionStatus.RUNNING)]
+
+        stats = await service.dispatch_due()
+
+        scheduler.execute.assert_not_called()
+        execution_repo.save_results.assert_not_called()
+        dispatch_repo.complete.assert_called_once_with(["exec_1", "exec_gone"])
+        assert stats["dropped"] == 2
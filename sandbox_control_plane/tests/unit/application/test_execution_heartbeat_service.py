@@ -0,0 +1,99 @@
+"""
+执行心跳检测服务单元测试
+
+测试 ExecutionHeartbeatService 的停滞检测、内存心跳校正与崩溃通知。
+"""
+import pytest
+from unittest.mock import Mock, AsyncMock
+from datetime import datetime, timedelta
+
+from src.application.services.execution_heartbeat_service import ExecutionHeartbeatService
+from src.domain.entities.execution import Execution
+from src.domain.value_objects.execution_status import ExecutionState, ExecutionStatus
+
+
+def _running_execution(execution_id: str, silent_seconds: int) -> Execution:
+    return Execution(
+        id=execution_id,
+        session_id="sess_1",
+        code="",
+        language="python",
+        state=ExecutionState(status=ExecutionStatus.RUNNING),
+        last_heartbeat_at=datetime.now() - timedelta(seconds=silent_seconds),
+        payload_loaded=False,
+    )
+
+
+class TestExecutionHeartbeatService:
+    """执行心跳检测服务测试"""
+
+    @pytest.fixture
+    def execution_repo(self):
+        """模拟执行仓储"""
+        repo = Mock()
+        repo.find_heartbeat_timeouts = AsyncMock(return_value=[])
+        repo.save_results = AsyncMock()
+        repo.commit = AsyncMock()
+        return repo
+
+    @pytest.mark.asyncio
+    async def test_marks_stalled_executions_crashed(self, execution_repo):
+        """测试心跳超时的执行批量标记为 crashed 并通知"""
+        execution_repo.find_heartbeat_timeouts.return_value = [
+            _running_execution("exec_1", 60),
+            _running_execution("exec_2", 30),
+        ]
+        on_crashed = Mock()
+        service = ExecutionHeartbeatService(execution_repo, heartbeat_timeout_seconds=15, on_crashed=on_crashed)
+
+        stats = await service.detect_stalled_executions()
+
+        assert stats["marked_crashed"] == 2
+        threshold = execution_repo.find_heartbeat_timeouts.call_args.args[0]
+        assert abs((datetime.now() - threshold).total_seconds() - 15) < 1
+        crashed = execution_repo.save_results.call_args.args[0]
+        assert [e.state.status for e in crashed] == [ExecutionStatus.CRASHED] * 2
+        assert "No heartbeat" in crashed[0].state.error_message
+        execution_repo.commit.assert_called_once()
+        on_crashed.assert_called_once_with(["exec_1", "exec_2"])
+
+    @pytest.mark.asyncio
+    async def test_newer_in_memory_heartbeat_keeps_execution_running(self, execution_repo):
+        """测试内存中有尚未写回的心跳时不标记崩溃"""
+        execution_repo.find_heartbeat_timeouts.return_value = [
+            _running_execution("exec_alive", 60),
+            _running_execution("exec_dead", 60),
+        ]
+        recent = {"exec_alive": datetime.now() - timedelta(seconds=2)}
+        service = ExecutionHeartbeatService(
+            execution_repo, heartbeat_timeout_seconds=15, last_seen=recent.get
+        )
+
+        stats = await service.detect_stalled_executions()
+
+        assert stats["still_alive"] == 1
+        assert stats["marked_crashed"] == 1
+        assert [e.id for e in execution_repo.save_results.call_args.args[0]] == ["exec_dead"]
+
+    @pytest.mark.asyncio
+    async def test_nothing_stalled_does_not_write(self, execution_repo):
+        """测试没有超时执行时不写库、不通知"""
+        on_crashed = Mock()
+        service = ExecutionHeartbeatService(execution_repo, on_crashed=on_crashed)
+
+        stats = await service.detect_stalled_executions()
+
+        assert stats["marked_crashed"] == 0
+        execution_repo.save_results.assert_not_called()
+        on_crashed.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_repository_error_recorded(self, execution_repo):
+        """测试仓储异常被记录而不是抛出"""
+        execution_repo.find_heartbeat_timeouts.side_effect = Exception("db down")
+        service = ExecutionHeartbeatService(execution_repo)
+
+        stats = await service.detect_stalled_executions()
+
+        assert stats["marked_crashed"] == 0
+        assert len(stats["errors"]) == 1
@@ -0,0 +1,147 @@
+"""
+执行结果服务单元测试
+
+测试 ExecutionResultService 的批量应用、幂等与状态检查。
+"""
+import pytest
+from unittest.mock import Mock, AsyncMock
+
+from src.application.commands.report_execution_result import ReportExecutionResultCommand
+from src.application.services.execution_result_service import (
+    ExecutionResultService,
+    ResultOutcome,
+)
+from src.domain.entities.execution import Execution
+from src.domain.value_objects.execution_status import ExecutionState, ExecutionStatus
+
+
+def _make_execution(execution_id: str, status: ExecutionStatus = ExecutionStatus.RUNNING) -> Execution:
+    return Execution(
+        id=execution_id,
+        session_id="sess_001",
+        code="print('hello')",
+        language="python",
+        state=ExecutionState(status=status),
+    )
+
+
+def _command(execution_id: str, status: str = "success", **kwargs) -> ReportExecutionResultCommand:
+    defaults = dict(exit_code=0, execution_time=0.5, stdout="hello\n")
+    defaults.update(kwargs)
+    return ReportExecutionResultCommand(execution_id=execution_id, status=status, **defaults)
+
+
+class TestExecutionResultService:
+    """执行结果服务测试"""
+
+    @pytest.fixture
+    def execution_repo(self):
+        repo = Mock()
+        repo.find_by_ids = AsyncMock(return_value=[])
+        repo.save_results = AsyncMock(side_effect=lambda executions: [e.id for e in executions])
+        repo.commit = AsyncMock()
+        return repo
+
+    @pytest.fixture
+    def service(self, execution_repo):
+        return ExecutionResultService(execution_repo)
+
+    @pytest.mark.asyncio
+    async def test_batch_uses_one_query_one_write_one_commit(self, service, execution_repo):
+        """测试一批结果只查询、写入、提交各一次"""
+        execution_repo.find_by_ids.return_value = [
+            _make_execution("exec_1"),
+            _make_execution("exec_2", ExecutionStatus.PENDING),
+        ]
+
+        outcomes = await service.record_results([
+            _command("exec_1", metrics={"duration_ms": 12.0}),
+            _command("exec_2", "failed", exit_code=1, stderr="boom"),
+        ])
+
+        assert outcomes == [ResultOutcome.RECORDED, ResultOutcome.RECORDED]
+        execution_repo.find_by_ids.assert_called_once_with(["exec_1", "exec_2"])
+        execution_repo.save_results.assert_called_once()
+        execution_repo.commit.assert_called_once()
+
+        saved = {e.id: e for e in execution_repo.save_results.call_args[0][0]}
+        assert saved["exec_1"].state.status == ExecutionStatus.COMPLETED
+        assert saved["exec_1"].metrics == {"duration_ms": 12.0}
+        assert saved["exec_2"].state.status == ExecutionStatus.FAILED
+        assert saved["exec_2"].state.error_message == "boom"
+
+    @pytest.mark.asyncio
+    async def test_terminal_and_missing_executions_are_not_written(self, service, execution_repo):
+        """测试已是终态与不存在的执行不写入、不提交"""
+        execution_repo.find_by_ids.return_value = [
+            _make_execution("exec_done", ExecutionStatus.COMPLETED),
+        ]
+
+        outcomes = await service.record_results([_command("exec_done"), _command("exec_missing")])
+
+        assert outcomes == [ResultOutcome.DUPLICATE, ResultOutcome.NOT_FOUND]
+        execution_repo.save_results.assert_not_called()
+        execution_repo.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_duplicate_within_batch(self, service, execution_repo):
+        """测试同一批内的重复上报只写入第一条"""
+        execution_repo.find_by_ids.return_value = [_make_execution("exec_1")]
+
+        outcomes = await service.record_results([
+            _command("exec_1"),
+            _command("exec_1", "failed", exit_code=1),
+        ])
+
+        assert outcomes == [ResultOutcome.RECORDED, ResultOutcome.DUPLICATE]
+        execution_repo.find_by_ids.assert_called_once_with(["exec_1"])
+        saved = execution_repo.save_results.call_args[0][0]
+        assert len(saved) == 1
+        assert saved[0].state.status == ExecutionStatus.COMPLETED
+
+    @pytest.mark.asyncio
+    async def test_execution_finished_by_another_writer_is_duplicate(self, service, execution_repo):
+        """测试读取后被其他实例写入终态（条件写入未更新该行）时返回 DUPLICATE"""
+        execution_repo.find_by_ids.return_value = [_make_execution("exec_1"), _make_execution("exec_2")]
+        execution_repo.save_results.side_effect = None
+        execution_repo.save_results.return_value = ["exec_2"]
+
+        outcomes = await service.record_results([_command("exec_1"), _command("exec_2")])
+
+        assert outcomes == [ResultOutcome.DUPLICATE, ResultOutcome.RECORDED]
+        execution_repo.commit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_invalid_transition_is_conflict(self, service, execution_repo):
+        """测试不合法的状态转换返回 CONFLICT，不影响同批其他结果"""
+        execution_repo.find_by_ids.return_value = [
+            _make_execution("exec_crashed", ExecutionStatus.CRASHED),
+            _make_execution("exec_ok"),
+        ]
+
+        outcomes = await service.record_results([_command("exec_crashed"), _command("exec_ok")])
+
+        assert outcomes == [ResultOutcome.CONFLICT, ResultOutcome.RECORDED]
+        saved = execution_repo.save_results.call_args[0][0]
+        assert [e.id for e in saved] == ["exec_ok"]
+
+    @pytest.mark.asyncio
+    async def test_marks_workspace_manifest_stale(self, execution_repo):
+        """测试记录结果时把所属会话的文件清单标记为过期（同一事务提交）"""
+        manifest_repo = Mock()
+        manifest_repo.mark_stale = AsyncMock()
+        service = ExecutionResultService(execution_repo, manifest_repo=manifest_repo)
+        execution_repo.find_by_ids.return_value = [_make_execution("exec_1"), _make_execution("exec_2")]
+
+        await service.record_results([
+            _command("exec_1", artifacts=["out/result.csv"]),
+            _command("exec_2", "failed", exit_code=1),
+        ])
+
+        manifest_repo.mark_stale.assert_called_once_with(["sess_001"])
+        execution_repo.commit.assert_called_once()
+
+    def test_command_rejects_unknown_status(self):
+        """测试命令拒绝未知状态"""
+        with pytest.raises(ValueError, match="Invalid status"):
+            _command("exec_1", "exploded")
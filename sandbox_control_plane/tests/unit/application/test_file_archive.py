@@ -0,0 +1,138 @@
+"""
+workspace 目录归档单元测试
+
+测试 zip / tar.gz 流式写出、条目顺序、并发预读上限与大文件流式读取。
+"""
+import asyncio
+import io
+import tarfile
+import zipfile
+from datetime import datetime, timezone
+
+import pytest
+
+from src.application.services import file_archive
+from src.application.services.file_archive import stream_archive
+from src.domain.value_objects.workspace_file import WorkspaceFile
+from src.shared.errors.domain import ConflictError
+
+MODIFIED = datetime(2026, 1, 2, 3, 4, 6, tzinfo=timezone.utc)
+
+
+class FakeObjects:
+    """按路径生成内容的对象存储替身，记录同时进行的读取数与已读取字节数"""
+
+    def __init__(self, files, delays=None):
+        self.contents = {f.path: (f.path.encode() * f.size)[:f.size] for f in files}
+        self.delays = delays or {}
+        self.active = 0
+        self.max_active = 0
+        self.streamed = []
+
+    async def fetch(self, file: WorkspaceFile) -> bytes:
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delays.get(file.path, 0))
+            return self.contents[file.path]
+        finally:
+            self.active -= 1
+
+    async def open_stream(self, file: WorkspaceFile):
+        self.streamed.append(file.path)
+        data = self.contents[file.path]
+
+        async def chunks():
+            for i in range(0, len(data), 1000):
+                yield data[i:i + 1000]
+        return chunks()
+
+
+def _files(*specs):
+    return [WorkspaceFile(path=path, size=size, modified_at=MODIFIED) for path, size in specs]
+
+
+async def _collect(stream) -> bytes:
+    return b"".join([chunk async for chunk in stream])
+
+
+class TestStreamArchive:
+    """目录归档测试"""
+
+    @pytest.mark.asyncio
+    async def test_zip_preserves_order_and_content(self):
+        """测试后面的文件先读取完成时，条目仍按顺序写出"""
+        files = _files(("out/results/a.csv", 10), ("out/results/b/c.txt", 0), ("out/results/日志.log", 300))
+        objects = FakeObjects(files, delays={"out/results/a.csv": 0.02})
+
+        data = await _collect(stream_archive(
+            files, "zip", objects.fetch, objects.open_stream, strip_prefix="out/",
+        ))
+
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            assert archive.namelist() == ["results/a.csv", "results/b/c.txt", "results/日志.log"]
+            for f in files:
+                assert archive.read(f.path[len("out/"):]) == objects.contents[f.path]
+            assert archive.getinfo("results/a.csv").date_time[0] == 2026
+        assert objects.max_active > 1
+
+    @pytest.mark.asyncio
+    async def test_tar_gz(self):
+        """测试 tar.gz 可读、长路径完整保留"""
+        long_path = "deep/" + "x" * 150 + "/file.bin"
+        files = _files(("a.txt", 5), (long_path, 1025))
+        objects = FakeObjects(files)
+
+        data = await _collect(stream_archive(files, "tar.gz", objects.fetch, objects.open_stream))
+
+        with tarfile.open(fileobj=io.BytesIO(data), mode="r:gz") as archive:
+            members = archive.getmembers()
+            assert [m.name for m in members] == ["a.txt", long_path]
+            assert members[1].mtime == int(MODIFIED.timestamp())
+            assert archive.extractfile(long_path).read() == objects.contents[long_path]
+
+    @pytest.mark.asyncio
+    async def test_prefetch_is_bounded(self, monkeypatch):
+        """测试预读字节数与并发数受限，大文件轮到时流式读取"""
+        monkeypatch.setattr(file_archive, "PREFETCH_MAX_FILE_BYTES", 4000)
+        files = _files(*[(f"f{i:02d}", 1000) for i in range(20)], ("big.bin", 10_000), ("z", 1))
+        objects = FakeObjects(files)
+
+        data = await _collect(stream_archive(
+            files, "zip", objects.fetch, objects.open_stream, concurrency=8, prefetch_bytes=3000,
+        ))
+
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            assert archive.read("big.bin") == objects.contents["big.bin"]
+            assert len(archive.namelist()) == 22
+        assert 1 < objects.max_active <= 3
+        assert objects.streamed == ["big.bin"]
+
+    @pytest.mark.asyncio
+    async def test_tar_rejects_changed_file(self):
+        """测试读取到的长度与列表大小不一致时中断（tar 头已写出大小）"""
+        files = _files(("a.txt", 5))
+        objects = FakeObjects(files)
+        objects.contents["a.txt"] = b"longer content"
+
+        with pytest.raises(ConflictError, match="changed while archiving"):
+            await _collect(stream_archive(files, "tar.gz", objects.fetch, objects.open_stream))
+
+    @pytest.mark.asyncio
+    async def test_fetch_error_cancels_prefetch(self):
+        """测试读取失败时抛出异常并取消其余预读"""
+        files = _files(("a", 1), ("b", 1), ("c", 1))
+        cancelled = []
+
+        async def fetch(file):
+            if file.path == "a":
+                raise RuntimeError("s3 down")
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(file.path)
+                raise
+
+        with pytest.raises(RuntimeError, match="s3 down"):
+            await _collect(stream_archive(files, "zip", fetch, None))
+        assert sorted(cancelled) == ["b", "c"]
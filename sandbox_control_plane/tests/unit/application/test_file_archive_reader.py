@@ -0,0 +1,190 @@
+"""
+归档流式解析单元测试
+
+测试 zip / tar / tar.gz 的识别与逐条解析、长文件名、非普通文件跳过、解压输出限长、
+数据损坏与截断，以及条目路径的规范化。
+"""
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from src.application.services.file_archive import stream_archive
+from src.application.services.file_archive_reader import (
+    MAX_METADATA_HEADER_BYTES,
+    READ_CHUNK_BYTES,
+    iter_archive,
+    normalize_member_path,
+)
+from src.domain.value_objects.workspace_file import WorkspaceFile
+from src.shared.errors.domain import ValidationError
+
+FILES = {
+    "a.txt": b"hello",
+    "src/main.py": b"print('hi')\n" * 1000,
+    "数据/" + "x" * 150 + ".csv": b"1,2\n",
+}
+
+
+async def _chunks(data: bytes, size: int = 1000):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def _extract(data: bytes, chunk_size: int = 1000) -> dict:
+    return {
+        member.name: b"".join([chunk async for chunk in member.chunks])
+        async for member in iter_archive(_chunks(data, chunk_size))
+    }
+
+
+def _zip(compression=zipfile.ZIP_DEFLATED) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression) as archive:
+        archive.writestr("empty/", b"")
+        for name, content in FILES.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+def _tar(mode: str = "w", tar_format=tarfile.PAX_FORMAT) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode=mode, format=tar_format) as archive:
+        directory = tarfile.TarInfo("src")
+        directory.type = tarfile.DIRTYPE
+        archive.addfile(directory)
+        link = tarfile.TarInfo("passwd")
+        link.type = tarfile.SYMTYPE
+        link.linkname = "/etc/passwd"
+        archive.addfile(link)
+        for name, content in FILES.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+class TestIterArchive:
+    """归档流式解析测试"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("data", [
+        _zip(),
+        _zip(zipfile.ZIP_STORED),
+        _tar(),
+        _tar(tar_format=tarfile.GNU_FORMAT),
+        _tar("w:gz"),
+    ], ids=["zip", "zip-stored", "tar-pax", "tar-gnu", "tar.gz"])
+    async def test_extracts_regular_files(self, data):
+        """测试按内容识别格式，只产出普通文件，目录与链接被跳过"""
+        assert await _extract(data) == FILES
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("archive_format", ["zip", "tar.gz"])
+    async def test_reads_streamed_archives(self, archive_format):
+        """测试读取流式写出的归档（zip 使用数据描述符与 Zip64）"""
+        files = [WorkspaceFile(path=name, size=len(content)) for name, content in FILES.items()]
+
+        async def fetch(file):
+            return FILES[file.path]
+
+        async def open_stream(file):
+            return _chunks(FILES[file.path])
+
+        data = b"".join([chunk async for chunk in stream_archive(files, archive_format, fetch, open_stream)])
+
+        assert await _extract(data, chunk_size=333) == FILES
+
+    @pytest.mark.asyncio
+    async def test_unread_members_are_skipped(self):
+        """测试未读取内容的条目在取下一个条目时被跳过"""
+        names = [member.name async for member in iter_archive(_chunks(_tar("w:gz")))]
+
+        assert names == list(FILES)
+
+    @pytest.mark.asyncio
+    async def test_decompressed_chunks_are_bounded(self):
+        """测试高压缩比条目按块解压，不一次性展开"""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("zeros.bin", bytes(20 * READ_CHUNK_BYTES))
+
+        sizes = [
+            len(chunk)
+            async for member in iter_archive(_chunks(buffer.getvalue(), 1 << 20))
+            async for chunk in member.chunks
+        ]
+
+        assert sum(sizes) == 20 * READ_CHUNK_BYTES
+        assert max(sizes) == READ_CHUNK_BYTES
+
+    @pytest.mark.asyncio
+    async def test_corrupted_zip_entry(self):
+        """测试 CRC 校验失败"""
+        data = bytearray(_zip(zipfile.ZIP_STORED))
+        offset = data.index(b"hello")
+        data[offset] = ord("j")
+
+        with pytest.raises(ValidationError, match="Corrupted zip entry: a.txt"):
+            await _extract(bytes(data))
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "data", [_zip(zipfile.ZIP_STORED), _tar(), _tar("w:gz")], ids=["zip", "tar", "tar.gz"]
+    )
+    async def test_truncated_archive(self, data):
+        """测试归档在条目内容中被截断"""
+        with pytest.raises(ValidationError):
+            await _extract(data[:len(data) // 2 + 7])
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("header_type", [tarfile.XHDTYPE, tarfile.GNUTYPE_LONGNAME])
+    async def test_oversized_metadata_header(self, header_type):
+        """测试元数据头声明的大小超过上限时在读取其内容前拒绝"""
+        info = tarfile.TarInfo("././@PaxHeader")
+        info.type = header_type
+        info.size = 8 * 1024 * 1024 * 1024
+        data = info.tobuf(tarfile.GNU_FORMAT) + bytes(MAX_METADATA_HEADER_BYTES)
+
+        with pytest.raises(ValidationError, match="metadata header exceeds limit"):
+            await _extract(data)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("data,message", [
+        (b"", "Empty archive"),
+        (b"not an archive" * 100, "Invalid tar archive"),
+    ])
+    async def test_invalid_archive(self, data, message):
+        """测试空请求体与无法识别的格式"""
+        with pytest.raises(ValidationError, match=message):
+            await _extract(data)
+
+
+class TestNormalizeMemberPath:
+    """条目路径规范化测试"""
+
+    @pytest.mark.parametrize("name,expected", [
+        ("a.txt", "a.txt"),
+        ("./src//main.py", "src/main.py"),
+        ("src\\lib\\util.py", "src/lib/util.py"),
+        ("dir/./file", "dir/file"),
+        ("..data/file", "..data/file"),
+    ])
+    def test_relative_paths(self, name, expected):
+        assert normalize_member_path(name) == expected
+
+    @pytest.mark.parametrize("name", [
+        "../etc/passwd",
+        "src/../../escape",
+        "/etc/passwd",
+        "\\windows\\system32",
+        "C:\\evil.exe",
+        "c:evil",
+        ".",
+        "",
+        "a\0b",
+        "bad\udcffname",
+    ])
+    def test_unsafe_paths(self, name):
+        assert normalize_member_path(name) is None
@@ -3,6 +3,11 @@
 
 测试 FileService 的用例编排逻辑。
 """
+import asyncio
+import io
+import tarfile
+from datetime import datetime, timedelta
+
 import pytest
 from unittest.mock import Mock, AsyncMock
 
@@ -10,9 +15,10 @@ from src.application.services.file_service import FileService
 from src.domain.entities.session import Session
 from src.domain.value_objects.resource_limit import ResourceLimit
 from src.domain.value_objects.execution_status import SessionStatus
+from src.domain.value_objects.workspace_file import WorkspaceFile
 from src.domain.repositories.session_repository import ISessionRepository
 from src.domain.services.storage import IStorageService
-from src.shared.errors.domain import NotFoundError, ValidationError
+from src.shared.errors.domain import NotFoundError, ResourceLimitError, ValidationError
 
 
 class TestFileService:
@@ -33,6 +39,7 @@ class TestFileService:
         service.download_file = AsyncMock()
         service.file_exists = AsyncMock()
         service.get_file_info = AsyncMock()
+        service.open_file_stream = AsyncMock(return_value="stream")
         service.generate_presigned_url = AsyncMock()
         service.list_files = AsyncMock()
         return service
@@ -73,6 +80,68 @@ class TestFileService:
         assert result == "test.txt"
         storage_service.upload_file.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_upload_file_resumes_paused_container(self, session_repo, storage_service, active_session):
+        """测试上传文件前恢复被冻结的容器"""
+        scheduler = Mock()
+        scheduler.unpause_container = AsyncMock(return_value=12.5)
+        service = FileService(
+            session_repo=session_repo,
+            storage_service=storage_service,
+            scheduler=scheduler,
+            idle_pause_minutes=10,
+        )
+        active_session.container_id = "container-123"
+        active_session.last_activity_at = datetime.now() - timedelta(minutes=30)
+        session_repo.find_by_id.return_value = active_session
+
+        await service.upload_file(session_id="sess_123", path="test.txt", content=b"x")
+
+        scheduler.unpause_container.assert_called_once_with("container-123")
+        storage_service.upload_file.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_upload_file_resumes_despite_recent_activity(
+        self, session_repo, storage_service, active_session
+    ):
+        """测试 last_activity_at 较新（缓冲刷新晚于冻结）时仍检查并恢复容器"""
+        scheduler = Mock()
+        scheduler.unpause_container = AsyncMock(return_value=12.5)
+        service = FileService(
+            session_repo=session_repo,
+            storage_service=storage_service,
+            scheduler=scheduler,
+            idle_pause_minutes=10,
+        )
+        active_session.container_id = "container-123"
+        active_session.last_activity_at = datetime.now() - timedelta(minutes=1)
+        session_repo.find_by_id.return_value = active_session
+
+        await service.upload_file(session_id="sess_123", path="test.txt", content=b"x")
+
+        scheduler.unpause_container.assert_called_once_with("container-123")
+
+    @pytest.mark.asyncio
+    async def test_upload_file_skips_resume_check_when_idle_pause_disabled(
+        self, session_repo, storage_service, active_session
+    ):
+        """测试未启用空闲冻结时不查询容器状态"""
+        scheduler = Mock()
+        scheduler.unpause_container = AsyncMock()
+        service = FileService(
+            session_repo=session_repo,
+            storage_service=storage_service,
+            scheduler=scheduler,
+            idle_pause_minutes=-1,
+        )
+        active_session.container_id = "container-123"
+        session_repo.find_by_id.return_value = active_session
+
+        await service.upload_file(session_id="sess_123", path="test.txt", content=b"x")
+
+        scheduler.unpause_container.assert_not_called()
+        storage_service.upload_file.assert_called_once()
+
     @pytest.mark.asyncio
     async def test_upload_file_session_not_found(self, service, session_repo):
         """测试上传文件到不存在的会话"""
@@ -179,29 +248,33 @@ class TestFileService:
 
     @pytest.mark.asyncio
     async def test_download_file_small_file(self, service, session_repo, storage_service, active_session):
-        """测试下载小文件（直接返回内容）"""
+        """测试下载小文件（一次 HEAD 后返回内容流）"""
         session_repo.find_by_id.return_value = active_session
-        storage_service.file_exists.return_value = True
         storage_service.get_file_info.return_value = {
             "size": 1024,
-            "content_type": "text/plain"
+            "content_type": "text/plain",
+            "etag": "abc"
         }
-        storage_service.download_file.return_value = b"file content"
 
         result = await service.download_file(
             session_id="sess_123",
             path="test.txt"
         )
 
-        assert result["content"] == b"file content"
-        assert result["content_type"] == "text/plain"
-        assert result["size"] == 1024
+        assert result.stream == "stream"
+        assert result.content_type == "text/plain"
+        assert result.size == 1024
+        assert result.content_range is None
+        storage_service.open_file_stream.assert_called_once_with(
+            "s3://sandbox-workspace/sessions/sess_123/test.txt", start=None, end=None, etag="abc"
+        )
+        storage_service.file_exists.assert_not_called()
+        storage_service.download_file.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_download_file_large_file(self, service, session_repo, storage_service, active_session):
-        """测试下载大文件（返回预签名 URL）"""
+        """测试下载大文件（返回预签名 URL，不读取内容）"""
         session_repo.find_by_id.return_value = active_session
-        storage_service.file_exists.return_value = True
         storage_service.get_file_info.return_value = {
             "size": 15 * 1024 * 1024,  # 15MB
             "content_type": "application/octet-stream"
@@ -213,9 +286,25 @@ class TestFileService:
             path="large.bin"
         )
 
-        assert "presigned_url" in result
-        assert result["size"] == 15 * 1024 * 1024
-        assert result["presigned_url"] == "https://s3.amazonaws.com/..."
+        assert result.size == 15 * 1024 * 1024
+        assert result.presigned_url == "https://s3.amazonaws.com/..."
+        storage_service.open_file_stream.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_download_file_presign_disabled(self, session_repo, storage_service, active_session):
+        """测试重定向阈值为 -1 时大文件也流式代理"""
+        service = FileService(
+            session_repo=session_repo,
+            storage_service=storage_service,
+            presign_threshold_bytes=-1,
+        )
+        session_repo.find_by_id.return_value = active_session
+        storage_service.get_file_info.return_value = {"size": 15 * 1024 * 1024}
+
+        result = await service.download_file(session_id="sess_123", path="large.bin")
+
+        assert result.presigned_url is None
+        assert result.stream == "stream"
 
     @pytest.mark.asyncio
     async def test_download_file_session_not_found(self, service, session_repo):
@@ -232,9 +321,9 @@ class TestFileService:
     async def test_download_file_not_found(self, service, session_repo, storage_service, active_session):
         """测试下载不存在的文件"""
         session_repo.find_by_id.return_value = active_session
-        storage_service.file_exists.return_value = False
+        storage_service.get_file_info.side_effect = NotFoundError("File not found: s3://...")
 
-        with pytest.raises(NotFoundError, match="File not found"):
+        with pytest.raises(NotFoundError, match="File not found: nonexistent.txt"):
             await service.download_file(
                 session_id="sess_123",
                 path="nonexistent.txt"
@@ -242,37 +331,29 @@ class TestFileService:
 
     @pytest.mark.asyncio
     async def test_download_file_10mb_boundary(self, service, session_repo, storage_service, active_session):
-        """测试 10MB 边界情况"""
+        """测试 10MB 边界情况（等于阈值时重定向）"""
         session_repo.find_by_id.return_value = active_session
-        storage_service.file_exists.return_value = True
-
-        # 正好 10MB
         storage_service.get_file_info.return_value = {
             "size": 10 * 1024 * 1024,
             "content_type": "application/octet-stream"
         }
-        storage_service.download_file.return_value = b"x" * (10 * 1024 * 1024)
+        storage_service.generate_presigned_url.return_value = "https://s3.amazonaws.com/..."
 
         result = await service.download_file(
             session_id="sess_123",
             path="boundary.bin"
         )
 
-        # 小于 10MB（等于也是小于），应返回内容
-        # 但如果 result 是 Mock，需要检查其属性
-        if hasattr(result, "__getitem__"):
-            assert "content" in result or "presigned_url" in result
+        assert result.presigned_url is not None
 
     @pytest.mark.asyncio
     async def test_download_file_s3_path_construction(self, service, session_repo, storage_service, active_session):
         """测试下载文件 S3 路径构造"""
         session_repo.find_by_id.return_value = active_session
-        storage_service.file_exists.return_value = True
         storage_service.get_file_info.return_value = {
             "size": 1024,
             "content_type": "text/plain"
         }
-        storage_service.download_file.return_value = b"content"
 
         await service.download_file(
             session_id="sess_123",
@@ -280,11 +361,10 @@ class TestFileService:
         )
 
         # 验证所有文件操作都使用正确的 S3 路径
-        file_exists_path = storage_service.file_exists.call_args[0][0]
         file_info_path = storage_service.get_file_info.call_args[0][0]
-        download_path = storage_service.download_file.call_args[0][0]
+        stream_path = storage_service.open_file_stream.call_args[0][0]
 
-        for path in [file_exists_path, file_info_path, download_path]:
+        for path in [file_info_path, stream_path]:
             assert path.startswith(active_session.workspace_path)
             assert "data/test.csv" in path
 
@@ -292,12 +372,10 @@ class TestFileService:
     async def test_download_file_with_missing_content_type(self, service, session_repo, storage_service, active_session):
         """测试缺少 content_type 的文件信息"""
         session_repo.find_by_id.return_value = active_session
-        storage_service.file_exists.return_value = True
         storage_service.get_file_info.return_value = {
             "size": 1024
             # 缺少 content_type
         }
-        storage_service.download_file.return_value = b"content"
 
         result = await service.download_file(
             session_id="sess_123",
@@ -305,7 +383,54 @@ class TestFileService:
         )
 
         # 应使用默认 content_type
-        assert result["content_type"] == "application/octet-stream"
+        assert result.content_type == "application/octet-stream"
+
+    @pytest.mark.asyncio
+    async def test_download_file_not_modified(self, service, session_repo, storage_service, active_session):
+        """测试 If-None-Match 命中时不读取内容"""
+        session_repo.find_by_id.return_value = active_session
+        storage_service.get_file_info.return_value = {"size": 1024, "etag": "abc"}
+
+        result = await service.download_file(
+            session_id="sess_123",
+            path="test.txt",
+            if_none_match=["old", "abc"]
+        )
+
+        assert result.not_modified is True
+        storage_service.open_file_stream.assert_not_called()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("byte_range, expected", [
+        ((0, 99), (0, 99)),
+        ((900, None), (900, 1023)),
+        ((1000, 5000), (1000, 1023)),
+        ((None, 24), (1000, 1023)),
+        ((None, 5000), (0, 1023)),
+    ])
+    async def test_download_file_range(self, service, session_repo, storage_service, active_session, byte_range, expected):
+        """测试区间换算后只读取该区间"""
+        session_repo.find_by_id.return_value = active_session
+        storage_service.get_file_info.return_value = {"size": 1024, "etag": "abc"}
+
+        result = await service.download_file(session_id="sess_123", path="test.txt", byte_range=byte_range)
+
+        assert result.content_range == expected
+        assert result.content_length == expected[1] - expected[0] + 1
+        call_kwargs = storage_service.open_file_stream.call_args.kwargs
+        assert (call_kwargs["start"], call_kwargs["end"]) == expected
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("byte_range", [(1024, None), (10, 5), (None, 0)])
+    async def test_download_file_range_not_satisfiable(self, service, session_repo, storage_service, active_session, byte_range):
+        """测试超出文件大小的区间"""
+        session_repo.find_by_id.return_value = active_session
+        storage_service.get_file_info.return_value = {"size": 1024}
+
+        result = await service.download_file(session_id="sess_123", path="test.txt", byte_range=byte_range)
+
+        assert result.range_not_satisfiable is True
+        storage_service.open_file_stream.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_list_files_all(self, service, session_repo, storage_service, active_session):
@@ -423,3 +548,431 @@ class TestFileService:
         # 应该过滤掉目录标记，返回空数组
         assert len(result) == 0
         assert result == []
+
+
+class TestFileServiceManifest:
+    """workspace 文件清单查询测试"""
+
+    @pytest.fixture
+    def session_repo(self):
+        repo = Mock()
+        repo.find_by_id = AsyncMock(return_value=Session(
+            id="sess_123",
+            template_id="python-basic",
+            status=SessionStatus.RUNNING,
+            resource_limit=ResourceLimit.default(),
+            workspace_path="s3://sandbox-workspace/sessions/sess_123",
+            runtime_type="docker"
+        ))
+        return repo
+
+    @pytest.fixture
+    def storage_service(self):
+        service = Mock()
+        service.upload_file = AsyncMock()
+        service.list_files = AsyncMock(return_value=[])
+        return service
+
+    @pytest.fixture
+    def manifest(self):
+        manifest = Mock()
+        manifest.ensure = AsyncMock(return_value=True)
+        manifest.list_files = AsyncMock(return_value=[
+            WorkspaceFile(path="src/main.py", size=2048, etag="def456"),
+        ])
+        manifest.count_files = AsyncMock(return_value=5000)
+        manifest.record_upload = AsyncMock()
+        return manifest
+
+    @pytest.fixture
+    def service(self, session_repo, storage_service, manifest):
+        return FileService(session_repo=session_repo, storage_service=storage_service, manifest=manifest)
+
+    @pytest.mark.asyncio
+    async def test_list_and_count_from_manifest(self, service, storage_service, manifest):
+        """测试列表与计数从清单查询，不列出对象存储"""
+        result = await service.list_files(session_id="sess_123", path="/src/", limit=10)
+
+        assert result == [{
+            "name": "src/main.py",
+            "container_path": "/workspace/src/main.py",
+            "size": 2048,
+            "modified_time": None,
+            "etag": "def456",
+        }]
+        manifest.list_files.assert_called_once_with("sess_123", "src", 10)
+        assert await service.count_files(session_id="sess_123", path="src") == 5000
+        storage_service.list_files.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_storage_when_manifest_unavailable(self, service, storage_service, manifest):
+        """测试清单不可用或出错时直接列出对象存储"""
+        storage_service.list_files.return_value = [{"key": "sessions/sess_123/a.txt", "size": 1}]
+
+        manifest.ensure.return_value = False
+        assert [f["name"] for f in await service.list_files(session_id="sess_123")] == ["a.txt"]
+
+        manifest.ensure.side_effect = RuntimeError("db down")
+        assert await service.count_files(session_id="sess_123") == 1
+        assert storage_service.list_files.call_args.args == ("sessions/sess_123/", 0)
+        manifest.list_files.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_upload_records_manifest(self, service, manifest):
+        """测试上传完成后写入清单"""
+        await service.upload_file(session_id="sess_123", path="data/in.csv", content=b"a,b\n")
+
+        manifest.record_upload.assert_called_once_with("sess_123", "data/in.csv", 4)
+
+
+async def _chunks(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+class TestFileServiceStreamingUpload:
+    """流式上传与可续传上传测试"""
+
+    PART_SIZE = 10
+
+    @pytest.fixture
+    def session_repo(self):
+        repo = Mock()
+        repo.find_by_id = AsyncMock(return_value=Session(
+            id="sess_123",
+            template_id="python-basic",
+            status=SessionStatus.RUNNING,
+            resource_limit=ResourceLimit.default(),
+            workspace_path="s3://sandbox-workspace/sessions/sess_123",
+            runtime_type="docker"
+        ))
+        return repo
+
+    @pytest.fixture
+    def storage_service(self):
+        service = Mock()
+        service.upload_file = AsyncMock()
+        service.create_multipart_upload = AsyncMock(return_value="upload-1")
+        service.upload_part = AsyncMock(side_effect=lambda path, upload_id, number, content: f"etag-{number}")
+        service.list_parts = AsyncMock(return_value=[])
+        service.complete_multipart_upload = AsyncMock()
+        service.abort_multipart_upload = AsyncMock()
+        return service
+
+    @pytest.fixture
+    def service(self, session_repo, storage_service):
+        return FileService(
+            session_repo=session_repo,
+            storage_service=storage_service,
+            max_upload_bytes=50,
+            part_size_bytes=self.PART_SIZE,
+            part_concurrency=2,
+        )
+
+    @pytest.mark.asyncio
+    async def test_small_stream_uses_single_upload(self, service, storage_service):
+        """测试不足一个分片的文件直接单次上传"""
+        result = await service.upload_file_stream("sess_123", "a.txt", _chunks(b"abc", b"def"), "text/plain")
+
+        assert result == {"path": "a.txt", "size": 6}
+        storage_service.upload_file.assert_called_once_with(
+            s3_path="s3://sandbox-workspace/sessions/sess_123/a.txt",
+            content=b"abcdef",
+            content_type="text/plain",
+        )
+        storage_service.create_multipart_upload.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_large_stream_uploads_parts(self, service, storage_service):
+        """测试大文件按分片大小切分上传并按分片号合并"""
+        result = await service.upload_file_stream("sess_123", "big.bin", _chunks(b"x" * 7, b"y" * 7, b"z" * 11))
+
+        assert result["size"] == 25
+        contents = [call.args[3] for call in storage_service.upload_part.call_args_list]
+        assert contents == [b"x" * 7 + b"yyy", b"y" * 4 + b"z" * 6, b"z" * 5]
+        parts = storage_service.complete_multipart_upload.call_args.args[2]
+        assert sorted(part["part_number"] for part in parts) == [1, 2, 3]
+        storage_service.upload_file.assert_not_called()
+        storage_service.abort_multipart_upload.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_oversize_stream_aborts(self, service, storage_service):
+        """测试累计字节数超过上限时中断并取消分片上传"""
+        with pytest.raises(ResourceLimitError):
+            await service.upload_file_stream("sess_123", "big.bin", _chunks(*[b"x" * 10] * 6))
+
+        storage_service.abort_multipart_upload.assert_called_once_with(
+            "s3://sandbox-workspace/sessions/sess_123/big.bin", "upload-1"
+        )
+        storage_service.complete_multipart_upload.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_part_failure_aborts(self, service, storage_service):
+        """测试分片上传失败时取消整个上传"""
+        storage_service.upload_part.side_effect = Exception("s3 down")
+
+        with pytest.raises(Exception, match="s3 down"):
+            await service.upload_file_stream("sess_123", "big.bin", _chunks(b"x" * 30))
+
+        storage_service.abort_multipart_upload.assert_called_once()
+        storage_service.complete_multipart_upload.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_part_concurrency_is_bounded(self, service, storage_service):
+        """测试同时进行的分片上传数不超过并发上限"""
+        in_flight = 0
+        peak = 0
+
+        async def slow_part(path, upload_id, number, content):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return f"etag-{number}"
+
+        storage_service.upload_part.side_effect = slow_part
+
+        await service.upload_file_stream("sess_123", "big.bin", _chunks(*[b"x" * 10] * 5))
+
+        assert storage_service.upload_part.call_count == 5
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_stream_validates_before_reading(self, service, session_repo):
+        """测试会话校验失败时不读取请求体"""
+        session_repo.find_by_id.return_value = None
+        consumed = []
+
+        async def body():
+            consumed.append(True)
+            yield b"x"
+
+        with pytest.raises(NotFoundError):
+            await service.upload_file_stream("sess_missing", "a.txt", body())
+
+        assert consumed == []
+
+    @pytest.mark.asyncio
+    async def test_create_upload_returns_part_size(self, service, storage_service):
+        """测试创建可续传上传"""
+        result = await service.create_upload("sess_123", "big.bin", "application/zip")
+
+        assert result == {"upload_id": "upload-1", "path": "big.bin", "part_size": 10, "max_size": 50}
+        storage_service.create_multipart_upload.assert_called_once_with(
+            "s3://sandbox-workspace/sessions/sess_123/big.bin", "application/zip"
+        )
+
+    @pytest.mark.asyncio
+    async def test_upload_part_rejects_oversize_part(self, service, storage_service):
+        """测试分片超过分片大小时拒绝"""
+        with pytest.raises(ResourceLimitError):
+            await service.upload_part("sess_123", "big.bin", "upload-1", 1, _chunks(b"x" * 8, b"x" * 8))
+
+        storage_service.upload_part.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_complete_upload_uses_stored_parts(self, service, storage_service):
+        """测试完成上传时按存储中已上传的分片合并"""
+        parts = [
+            {"part_number": 1, "size": 10, "etag": "a"},
+            {"part_number": 2, "size": 4, "etag": "b"},
+        ]
+        storage_service.list_parts.return_value = parts
+
+        result = await service.complete_upload("sess_123", "big.bin", "upload-1")
+
+        assert result == {"path": "big.bin", "size": 14}
+        storage_service.complete_multipart_upload.assert_called_once_with(
+            "s3://sandbox-workspace/sessions/sess_123/big.bin", "upload-1", parts
+        )
+
+    @pytest.mark.asyncio
+    async def test_complete_upload_oversize_aborts(self, service, storage_service):
+        """测试合并后超过大小上限时取消上传"""
+        storage_service.list_parts.return_value = [
+            {"part_number": n, "size": 10, "etag": str(n)} for n in range(1, 7)
+        ]
+
+        with pytest.raises(ResourceLimitError):
+            await service.complete_upload("sess_123", "big.bin", "upload-1")
+
+        storage_service.abort_multipart_upload.assert_called_once()
+        storage_service.complete_multipart_upload.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_complete_upload_without_parts(self, service):
+        """测试没有已上传分片时无法完成"""
+        with pytest.raises(ValidationError, match="No parts uploaded"):
+            await service.complete_upload("sess_123", "big.bin", "upload-1")
+
+
+def _tar_gz(files) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for name, content in files:
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+class TestFileServiceArchiveExtraction:
+    """归档上传解压测试"""
+
+    @pytest.fixture
+    def session_repo(self):
+        repo = Mock()
+        repo.find_by_id = AsyncMock(return_value=Session(
+            id="sess_123",
+            template_id="python-basic",
+            status=SessionStatus.RUNNING,
+            resource_limit=ResourceLimit.default(),
+            workspace_path="s3://sandbox-workspace/sessions/sess_123",
+            runtime_type="docker"
+        ))
+        return repo
+
+    @pytest.fixture
+    def storage_service(self):
+        service = Mock()
+        service.upload_file = AsyncMock()
+        service.create_multipart_upload = AsyncMock(return_value="upload-1")
+        service.upload_part = AsyncMock(side_effect=lambda path, upload_id, number, content: f"etag-{number}")
+        service.complete_multipart_upload = AsyncMock()
+        service.abort_multipart_upload = AsyncMock()
+        return service
+
+    @pytest.fixture
+    def manifest(self):
+        manifest = Mock()
+        manifest.record_uploads = AsyncMock()
+        return manifest
+
+    @pytest.fixture
+    def service(self, session_repo, storage_service, manifest):
+        return FileService(
+            session_repo=session_repo,
+            storage_service=storage_service,
+            part_size_bytes=10,
+            part_concurrency=2,
+            manifest=manifest,
+            archive_max_files=3,
+            extract_max_bytes=1000,
+            extract_concurrency=2,
+        )
+
+    @pytest.mark.asyncio
+    async def test_extracts_into_directory(self, service, storage_service, manifest):
+        """测试解压到目标目录，大文件分片上传，重复路径以最后一个条目为准，并写入清单"""
+        archive = _tar_gz([
+            ("./a.txt", b"hello"),
+            ("src/big.bin", b"x" * 25),
+            ("a.txt", b"bye"),
+        ])
+
+        result = await service.extract_archive("sess_123", _chunks(archive), path="/seed/")
+
+        assert result == {
+            "path": "seed",
+            "files": [
+                {"name": "seed/a.txt", "container_path": "/workspace/seed/a.txt", "size": 3},
+                {"name": "seed/src/big.bin", "container_path": "/workspace/seed/src/big.bin", "size": 25},
+            ],
+            "count": 2,
+            "total_size": 28,
+        }
+        uploads = [call.kwargs for call in storage_service.upload_file.call_args_list]
+        assert [(u["s3_path"], u["content"], u["content_type"]) for u in uploads] == [
+            ("s3://sandbox-workspace/sessions/sess_123/seed/a.txt", b"hello", "text/plain"),
+            ("s3://sandbox-workspace/sessions/sess_123/seed/a.txt", b"bye", "text/plain"),
+        ]
+        assert storage_service.upload_part.call_count == 3
+        storage_service.complete_multipart_upload.assert_called_once()
+
+        recorded = manifest.record_uploads.call_args.args[1]
+        assert [(f.path, f.size) for f in recorded] == [("seed/a.txt", 3), ("seed/src/big.bin", 25)]
+
+    @pytest.mark.asyncio
+    async def test_rejects_path_traversal(self, service, manifest):
+        """测试条目路径包含 .. 时拒绝整个归档，不写入清单"""
+        archive = _tar_gz([("ok.txt", b"1"), ("../../etc/cron.d/evil", b"2")])
+
+        with pytest.raises(ValidationError, match="Unsafe path in archive"):
+            await service.extract_archive("sess_123", _chunks(archive))
+
+        manifest.record_uploads.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_rejects_invalid_target_directory(self, service, session_repo):
+        """测试目标目录包含 .. 时不读取请求体"""
+        with pytest.raises(ValidationError, match="Invalid target directory"):
+            await service.extract_archive("sess_123", _chunks(b""), path="data/../..")
+
+        session_repo.find_by_id.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_extracted_size_limit_aborts(self, service, storage_service):
+        """测试解压后累计字节数超过上限时中断，并取消仍在后台进行的分片上传"""
+        archive = _tar_gz([("a.bin", b"x" * 600), ("b.bin", b"y" * 600)])
+
+        with pytest.raises(ResourceLimitError, match="Extracted size exceeds limit"):
+            await service.extract_archive("sess_123", _chunks(archive))
+
+        storage_service.abort_multipart_upload.assert_called_once_with(
+            "s3://sandbox-workspace/sessions/sess_123/a.bin", "upload-1"
+        )
+        storage_service.complete_multipart_upload.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_archive_body_limit(self, service, storage_service):
+        """测试请求体累计字节数超过上限时中断（只有目录条目，解压输出为空）"""
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w") as archive:
+            for i in range(3):
+                directory = tarfile.TarInfo(f"dir{i}")
+                directory.type = tarfile.DIRTYPE
+                archive.addfile(directory)
+
+        with pytest.raises(ResourceLimitError, match="Archive size exceeds limit"):
+            await service.extract_archive("sess_123", _chunks(buffer.getvalue()[:1536]))
+
+        storage_service.upload_file.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_file_count_limit(self, service):
+        """测试文件数超过上限"""
+        archive = _tar_gz([(f"f{i}.txt", b"1") for i in range(4)])
+
+        with pytest.raises(ResourceLimitError, match="limit of 3 files"):
+            await service.extract_archive("sess_123", _chunks(archive))
+
+    @pytest.mark.asyncio
+    async def test_upload_failure_stops_extraction(self, service, storage_service):
+        """测试后台上传失败时中断解压"""
+        storage_service.upload_file.side_effect = Exception("s3 down")
+        archive = _tar_gz([(f"f{i}.txt", b"1") for i in range(3)])
+
+        with pytest.raises(Exception, match="s3 down"):
+            await service.extract_archive("sess_123", _chunks(archive))
+
+    @pytest.mark.asyncio
+    async def test_background_uploads_are_bounded(self, service, storage_service):
+        """测试后台同时上传的文件数不超过并发上限"""
+        in_flight = 0
+        peak = 0
+
+        async def slow_upload(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+        storage_service.upload_file.side_effect = slow_upload
+        archive = _tar_gz([(f"f{i}.txt", b"1") for i in range(3)])
+
+        result = await service.extract_archive("sess_123", _chunks(archive))
+
+        assert result["count"] == 3
+        assert peak == 2
@@ -0,0 +1,179 @@
+"""
+健康检查调度器单元测试
+
+测试 HealthCheckScheduler 的会话对账、均匀错开、自适应间隔与速率上限。
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.application.services.health_check_scheduler import HealthCheckScheduler, HealthCheckTarget
+from src.domain.entities.session import Session
+from src.domain.value_objects.execution_status import SessionStatus
+from src.domain.value_objects.resource_limit import ResourceLimit
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _make_session(session_id: str, created_minutes_ago: int = 60, idle_minutes: int = 0) -> Session:
+    now = datetime.now()
+    return Session(
+        id=session_id,
+        template_id="python-basic",
+        status=SessionStatus.RUNNING,
+        resource_limit=ResourceLimit.default(),
+        workspace_path=f"s3://sandbox-workspace/sessions/{session_id}",
+        runtime_type="docker",
+        container_id=f"container-{session_id}",
+        created_at=now - timedelta(minutes=created_minutes_ago),
+        last_activity_at=now - timedelta(minutes=idle_minutes),
+    )
+
+
+def _target(created_minutes_ago: int = 60, idle_seconds: float = 0, failures: int = 0) -> HealthCheckTarget:
+    now = datetime.now()
+    return HealthCheckTarget(
+        session_id="sess_1",
+        container_id="container-1",
+        container_since=now - timedelta(minutes=created_minutes_ago),
+        last_activity_at=now - timedelta(seconds=idle_seconds),
+        consecutive_failures=failures,
+    )
+
+
+class TestHealthCheckScheduler:
+    """健康检查调度器测试"""
+
+    @pytest.fixture
+    def clock(self):
+        return _Clock()
+
+    def _scheduler(self, clock, **kwargs) -> HealthCheckScheduler:
+        kwargs.setdefault("jitter_ratio", 0)
+        return HealthCheckScheduler(clock=clock, **kwargs)
+
+    def _rescan(self, scheduler, sessions):
+        scheduler.begin_rescan()
+        for session in sessions:
+            scheduler.track(session)
+        return scheduler.finish_rescan()
+
+    def test_first_checks_spread_over_base_interval(self, clock):
+        """测试新纳入的会话在一个基础间隔内均匀错开首次检查"""
+        scheduler = self._scheduler(clock, base_interval_seconds=30)
+        self._rescan(scheduler, [_make_session(f"sess_{i}") for i in range(300)])
+
+        per_second = []
+        for _ in range(31):
+            clock.now += 1
+            per_second.append(len(scheduler.due()))
+
+        assert sum(per_second) == 300
+        # 均匀分布：每秒约 10 个，不会集中在同一时刻
+        assert max(per_second) < 30
+
+    def test_rescan_removes_sessions_no_longer_running(self, clock):
+        """测试对账时移除不再运行的会话"""
+        scheduler = self._scheduler(clock)
+        self._rescan(scheduler, [_make_session("sess_a"), _make_session("sess_b")])
+
+        removed = self._rescan(scheduler, [_make_session("sess_a")])
+
+        assert removed == 1
+        assert scheduler.tracked == 1
+        clock.now += 60
+        assert [t.session_id for t in scheduler.due()] == ["sess_a"]
+
+    def test_needs_rescan(self, clock):
+        """测试按间隔对账"""
+        scheduler = self._scheduler(clock, rescan_interval_seconds=60)
+        assert scheduler.needs_rescan()
+
+        self._rescan(scheduler, [])
+        assert not scheduler.needs_rescan()
+        clock.now += 60
+        assert scheduler.needs_rescan()
+
+    def test_rate_cap_defers_excess(self, clock):
+        """测试超过速率上限的到期检查顺延到后续 tick"""
+        scheduler = self._scheduler(clock, base_interval_seconds=1, max_checks_per_second=10)
+        self._rescan(scheduler, [_make_session(f"sess_{i}") for i in range(25)])
+
+        clock.now += 2
+        assert len(scheduler.due()) == 10
+        assert scheduler.backlog == 15
+
+        clock.now += 1
+        assert len(scheduler.due()) == 10
+        clock.now += 1
+        assert len(scheduler.due()) == 5
+        assert scheduler.backlog == 0
+
+    def test_suspect_sessions_rechecked_faster(self, clock):
+        """测试检查失败后按最短间隔指数退避复查，恢复健康后回到正常间隔"""
+        scheduler = self._scheduler(clock, base_interval_seconds=30, min_interval_seconds=5)
+        self._rescan(scheduler, [_make_session("sess_1", idle_minutes=30)])
+        clock.now += 31
+        target = scheduler.due()[0]
+
+        assert scheduler.record_result(target, healthy=False) == 5
+        assert scheduler.record_result(target, healthy=False) == 10
+        assert scheduler.record_result(target, healthy=False) == 20
+        assert scheduler.record_result(target, healthy=False) == 30
+        assert scheduler.record_result(target, healthy=True) > 30
+
+    def test_interval_adapts_to_activity_and_age(self):
+        """测试检查间隔随最近活动与容器存活时长变化"""
+        scheduler = HealthCheckScheduler(
+            base_interval_seconds=30, min_interval_seconds=5, max_interval_seconds=300, jitter_ratio=0
+        )
+
+        # 刚启动的容器：基础间隔的一半
+        assert scheduler.next_interval(_target(created_minutes_ago=1)) == 15
+        # 刚执行过：执行证明容器存活，放宽检查
+        assert scheduler.next_interval(_target(idle_seconds=1)) == 120
+        # 空闲 10 分钟：2 倍基础间隔
+        assert scheduler.next_interval(_target(idle_seconds=600)) == pytest.approx(60)
+        # 长期无活动：不超过最长间隔
+        assert scheduler.next_interval(_target(idle_seconds=86400)) == 300
+
+    def test_jitter_bounds(self):
+        """测试抖动在比例范围内"""
+        low = HealthCheckScheduler(base_interval_seconds=30, jitter_ratio=0.1, rng=lambda: 0.0)
+        high = HealthCheckScheduler(base_interval_seconds=30, jitter_ratio=0.1, rng=lambda: 0.999999)
+
+        assert low.next_interval(_target(idle_seconds=1)) == pytest.approx(108)
+        assert high.next_interval(_target(idle_seconds=1)) == pytest.approx(132, rel=1e-3)
+
+    def test_container_change_resets_failures(self, clock):
+        """测试对账发现容器已更换时重置失败计数"""
+        scheduler = self._scheduler(clock)
+        session = _make_session("sess_1")
+        self._rescan(scheduler, [session])
+        clock.now += 31
+        target = scheduler.due()[0]
+        scheduler.record_result(target, healthy=False)
+
+        session.container_id = "container-new"
+        self._rescan(scheduler, [session])
+
+        assert target.container_id == "container-new"
+        assert target.consecutive_failures == 0
+
+    def test_forgotten_session_not_checked(self, clock):
+        """测试移除的会话即使已到期也不再检查"""
+        scheduler = self._scheduler(clock, base_interval_seconds=1, max_checks_per_second=1)
+        self._rescan(scheduler, [_make_session("sess_a"), _make_session("sess_b")])
+        clock.now += 2
+        first = scheduler.due()
+
+        remaining = {"sess_a", "sess_b"} - {first[0].session_id}
+        scheduler.forget(remaining.pop())
+        clock.now += 1
+        assert scheduler.due() == []
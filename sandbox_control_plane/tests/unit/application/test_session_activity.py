@@ -0,0 +1,59 @@
+"""
+会话活动时间单元测试
+
+测试空闲冻结与休眠共用的 get_last_activity。
+"""
+import pytest
+from unittest.mock import Mock, AsyncMock
+from datetime import datetime, timedelta
+
+from src.application.services.session_activity import get_last_activity
+from src.domain.entities.session import Session
+from src.domain.value_objects.execution_status import SessionStatus
+from src.domain.value_objects.resource_limit import ResourceLimit
+
+
+def _make_session(idle_minutes: int) -> Session:
+    return Session(
+        id="sess_a",
+        template_id="python-basic",
+        status=SessionStatus.RUNNING,
+        resource_limit=ResourceLimit.default(),
+        workspace_path="s3://sandbox-workspace/sessions/sess_a",
+        runtime_type="docker",
+        container_id="container-a",
+        last_activity_at=datetime.now() - timedelta(minutes=idle_minutes),
+    )
+
+
+def _execution_repo(active: bool = False, executions=None) -> Mock:
+    repo = Mock()
+    repo.has_active_executions = AsyncMock(return_value=active)
+    repo.find_by_session_id = AsyncMock(return_value=executions or [])
+    return repo
+
+
+@pytest.mark.asyncio
+async def test_without_execution_repo_uses_last_activity():
+    """测试未配置执行仓储时取 last_activity_at"""
+    session = _make_session(idle_minutes=30)
+
+    assert await get_last_activity(session) == session.last_activity_at
+
+
+@pytest.mark.asyncio
+async def test_active_execution_counts_as_active():
+    """测试有未结束执行时返回 None"""
+    session = _make_session(idle_minutes=120)
+
+    assert await get_last_activity(session, _execution_repo(active=True)) is None
+
+
+@pytest.mark.asyncio
+async def test_latest_execution_newer_than_last_activity():
+    """测试取最近一次执行的完成 / 心跳 / 创建时间与 last_activity_at 的较大者"""
+    session = _make_session(idle_minutes=120)
+    heartbeat = datetime.now() - timedelta(minutes=5)
+    execution = Mock(completed_at=None, last_heartbeat_at=heartbeat, created_at=datetime.now() - timedelta(hours=3))
+
+    assert await get_last_activity(session, _execution_repo(executions=[execution])) == heartbeat
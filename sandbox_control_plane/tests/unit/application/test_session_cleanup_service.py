@@ -3,16 +3,28 @@
 
 测试 SessionCleanupService 的清理逻辑。
 """
+import functools
+
 import pytest
 from unittest.mock import Mock, AsyncMock, patch
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
 from src.application.services.session_cleanup_service import SessionCleanupService
+from src.application.services.session_teardown_pipeline import SessionTeardownPipeline
+from src.application.services.workspace_manifest_service import WorkspaceManifestService
 from src.domain.entities.session import Session
 from src.domain.value_objects.resource_limit import ResourceLimit
 from src.domain.value_objects.execution_status import SessionStatus
 from src.domain.repositories.session_repository import ISessionRepository
 from src.domain.services.scheduler import IScheduler
+from src.domain.value_objects.workspace_file import WorkspaceFile
+from src.infrastructure.persistence.database import Base
+from src.infrastructure.persistence.repositories.sql_workspace_manifest_repository import (
+    SqlWorkspaceManifestRepository,
+)
+from tests.helpers import mock_session_pages
 
 
 class TestSessionCleanupService:
@@ -24,14 +36,15 @@ class TestSessionCleanupService:
         repo = Mock()
         repo.save = AsyncMock()
         repo.find_by_id = AsyncMock()
-        repo.find_by_status = AsyncMock()
+        repo.iter_by_status = mock_session_pages()
         return repo
 
     @pytest.fixture
     def scheduler(self):
         """模拟调度器"""
         sched = Mock()
-        sched.destroy_container = AsyncMock()
+        sched.stop_container = AsyncMock()
+        sched.remove_container = AsyncMock()
         return sched
 
     @pytest.fixture
@@ -49,7 +62,8 @@ class TestSessionCleanupService:
             scheduler=scheduler,
             idle_timeout_minutes=30,
             max_lifetime_hours=6,
-            storage_service=storage_service
+            storage_service=storage_service,
+            teardown_pipeline_factory=functools.partial(SessionTeardownPipeline, retry_base_seconds=0),
         )
 
     @pytest.fixture
@@ -100,35 +114,129 @@ class TestSessionCleanupService:
     @pytest.mark.asyncio
     async def test_cleanup_idle_sessions(self, service, session_repo, scheduler, storage_service, idle_session):
         """测试清理空闲会话"""
-        session_repo.find_by_status.return_value = [idle_session]
+        session_repo.iter_by_status = mock_session_pages([idle_session], [])
         storage_service.delete_prefix.return_value = 5
 
         result = await service.cleanup_idle_sessions()
 
         assert result["idle_cleaned"] == 1
         assert idle_session.status == SessionStatus.TERMINATED
-        # destroy_container 可能使用 container_id 参数名
-        assert scheduler.destroy_container.called
+        scheduler.stop_container.assert_called_once_with("container-idle", timeout=10)
+        scheduler.remove_container.assert_called_once_with("container-idle")
         storage_service.delete_prefix.assert_called_once()
         session_repo.save.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_cleanup_idle_sessions_forgets_manifest(
+        self, session_repo, scheduler, storage_service, idle_session, active_session
+    ):
+        """测试清理后的会话不残留 workspace 文件清单，workspace 交给后台删除服务"""
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with async_sessionmaker(engine)() as db_session:
+            manifest_repo = SqlWorkspaceManifestRepository(db_session)
+            listed_at = datetime.now(timezone.utc)
+            for session in (idle_session, active_session):
+                await manifest_repo.replace_files(session.id, [WorkspaceFile(path="a.txt", size=1)], listed_at)
+            await manifest_repo.commit()
+
+            deleter = Mock()
+            deleter.schedule = AsyncMock()
+            session_repo.iter_by_status = mock_session_pages([idle_session, active_session], [])
+            service = SessionCleanupService(
+                session_repo=session_repo,
+                scheduler=scheduler,
+                storage_service=storage_service,
+                teardown_pipeline_factory=functools.partial(SessionTeardownPipeline, retry_base_seconds=0),
+                workspace_deleter=deleter,
+                workspace_manifest=WorkspaceManifestService(manifest_repo, storage_service),
+            )
+
+            result = await service.cleanup_idle_sessions()
+
+            assert result["idle_cleaned"] == 1
+            deleter.schedule.assert_called_once_with(idle_session.workspace_path)
+            storage_service.delete_prefix.assert_not_called()
+            assert await manifest_repo.count_files(idle_session.id) == 0
+            assert await manifest_repo.get_reconciled_at(idle_session.id) is None
+            assert await manifest_repo.count_files(active_session.id) == 1
+        await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_cleanup_idle_sessions_across_pages(self, service, session_repo, scheduler):
+        """测试逐页清理全部活跃会话，统计跨页累加"""
+        pages = tuple(
+            [
+                Session(
+                    id=f"sess_{page}_{i}",
+                    template_id="python-basic",
+                    status=SessionStatus.RUNNING,
+                    resource_limit=ResourceLimit.default(),
+                    workspace_path=f"s3://sandbox-workspace/sessions/sess_{page}_{i}",
+                    runtime_type="docker",
+                    container_id=f"container-{page}-{i}",
+                    last_activity_at=datetime.now() - timedelta(minutes=35 if i else 1),
+                )
+                for i in range(3)
+            ]
+            for page in range(3)
+        )
+        session_repo.iter_by_status = mock_session_pages(pages, [])
+
+        result = await service.cleanup_idle_sessions()
+
+        assert [c.args[0] for c in session_repo.iter_by_status.call_args_list] == ["running", "hibernated"]
+        assert result["total_checked"] == 9
+        assert result["idle_cleaned"] == 6
+        assert scheduler.remove_container.call_count == 6
+        assert result["teardown"]["total"] == 6
+        assert result["teardown"]["torn_down"] == 6
+
     @pytest.mark.asyncio
     async def test_cleanup_expired_sessions(self, service, session_repo, scheduler, storage_service, expired_session):
         """测试清理过期会话"""
-        session_repo.find_by_status.return_value = [expired_session]
+        session_repo.iter_by_status = mock_session_pages([expired_session], [])
         storage_service.delete_prefix.return_value = 3
 
         result = await service.cleanup_idle_sessions()
 
         assert result["expired_cleaned"] == 1
         assert expired_session.status == SessionStatus.TERMINATED
-        # destroy_container 可能使用 container_id 参数名
-        assert scheduler.destroy_container.called
+        scheduler.remove_container.assert_called_once_with("container-expired")
+
+    @pytest.mark.asyncio
+    async def test_cleanup_expired_hibernated_session(self, service, session_repo, scheduler, storage_service):
+        """测试超过最大生命周期的休眠会话被终止：跳过容器阶段，仍删除 workspace（含依赖快照）"""
+        hibernated_session = Session(
+            id="sess_hibernated",
+            template_id="python-basic",
+            status=SessionStatus.HIBERNATED,
+            resource_limit=ResourceLimit.default(),
+            workspace_path="s3://sandbox-workspace/sessions/sess_hibernated",
+            runtime_type="docker",
+            created_at=datetime.now() - timedelta(hours=7),
+            last_activity_at=datetime.now(),
+        )
+        session_repo.iter_by_status = mock_session_pages([], [hibernated_session])
+        storage_service.delete_prefix.return_value = 4
+
+        result = await service.cleanup_idle_sessions()
+
+        assert result["total_checked"] == 1
+        assert result["expired_cleaned"] == 1
+        assert hibernated_session.status == SessionStatus.TERMINATED
+        scheduler.stop_container.assert_not_called()
+        scheduler.remove_container.assert_not_called()
+        storage_service.delete_prefix.assert_called_once_with(
+            "s3://sandbox-workspace/sessions/sess_hibernated/"
+        )
+        session_repo.save.assert_called_once_with(hibernated_session)
 
     @pytest.mark.asyncio
     async def test_no_cleanup_for_active_sessions(self, service, session_repo, active_session):
         """测试不清理活跃会话"""
-        session_repo.find_by_status.return_value = [active_session]
+        session_repo.iter_by_status = mock_session_pages([active_session], [])
 
         result = await service.cleanup_idle_sessions()
 
@@ -139,7 +247,7 @@ class TestSessionCleanupService:
     @pytest.mark.asyncio
     async def test_cleanup_mixed_sessions(self, service, session_repo, scheduler, storage_service):
         """测试清理混合状态的会话"""
-        session_repo.find_by_status.return_value = [
+        session_repo.iter_by_status = mock_session_pages([
             Session(
                 id="sess_1",
                 template_id="python-basic",
@@ -160,7 +268,7 @@ class TestSessionCleanupService:
                 container_id="container-2",
                 last_activity_at=datetime.now() - timedelta(minutes=40)  # 空闲
             ),
-        ]
+        ], [])
         storage_service.delete_prefix.return_value = 2
 
         result = await service.cleanup_idle_sessions()
@@ -189,7 +297,7 @@ class TestSessionCleanupService:
             container_id="container-idle",
             last_activity_at=datetime.now() - timedelta(hours=10)  # 超过空闲阈值
         )
-        session_repo.find_by_status.return_value = [idle_session]
+        session_repo.iter_by_status = mock_session_pages([idle_session], [])
 
         result = await service.cleanup_idle_sessions()
 
@@ -219,7 +327,7 @@ class TestSessionCleanupService:
             created_at=datetime.now() - timedelta(days=1),  # 超过生命周期
             last_activity_at=datetime.now()
         )
-        session_repo.find_by_status.return_value = [expired_session]
+        session_repo.iter_by_status = mock_session_pages([expired_session], [])
 
         result = await service.cleanup_idle_sessions()
 
@@ -239,11 +347,11 @@ class TestSessionCleanupService:
             runtime_type="docker",
             container_id="container-failed"
         )
-        # 使用 side_effect 区分不同参数的返回值
-        session_repo.find_by_status.side_effect = [
+        # 按调用顺序区分不同状态的查询结果
+        session_repo.iter_by_status = mock_session_pages(
             [failed_session],  # failed 状态查询
             []  # timeout 状态查询
-        ]
+        )
 
         result = await service.cleanup_orphaned_sessions()
 
@@ -262,11 +370,11 @@ class TestSessionCleanupService:
             runtime_type="docker",
             container_id="container-timeout"
         )
-        # 使用 side_effect 区分不同参数的返回值
-        session_repo.find_by_status.side_effect = [
+        # 按调用顺序区分不同状态的查询结果
+        session_repo.iter_by_status = mock_session_pages(
             [],  # failed 状态查询
             [timeout_session]  # timeout 状态查询
-        ]
+        )
 
         result = await service.cleanup_orphaned_sessions()
 
@@ -284,7 +392,7 @@ class TestSessionCleanupService:
             runtime_type="docker",
             container_id=None  # 没有容器
         )
-        session_repo.find_by_status.return_value = [failed_session]
+        session_repo.iter_by_status = mock_session_pages([failed_session])
 
         result = await service.cleanup_orphaned_sessions()
 
@@ -307,7 +415,7 @@ class TestSessionCleanupService:
 
         assert deleted_count == 7
         storage_service.delete_prefix.assert_called_once_with(
-            "s3://sandbox-workspace/sessions/sess_123"
+            "s3://sandbox-workspace/sessions/sess_123/"
         )
 
     @pytest.mark.asyncio
@@ -374,10 +482,10 @@ class TestSessionCleanupService:
             container_id="container-idle",
             last_activity_at=datetime.now() - timedelta(minutes=35)
         )
-        session_repo.find_by_status.return_value = [idle_session]
+        session_repo.iter_by_status = mock_session_pages([idle_session], [])
 
-        # 模拟容器销毁失败
-        scheduler.destroy_container.side_effect = Exception("Docker error")
+        # 模拟容器停止失败（删除为强制删除，仍可完成）
+        scheduler.stop_container.side_effect = Exception("Docker error")
         storage_service.delete_prefix.return_value = 2
 
         result = await service.cleanup_idle_sessions()
@@ -386,11 +494,37 @@ class TestSessionCleanupService:
         assert result["idle_cleaned"] == 1
         assert idle_session.status == SessionStatus.TERMINATED
         storage_service.delete_prefix.assert_called_once()
+        scheduler.remove_container.assert_called_once_with("container-idle")
+
+    @pytest.mark.asyncio
+    async def test_cleanup_container_removal_dead_lettered(self, service, session_repo, scheduler, storage_service):
+        """测试容器删除重试耗尽时会话保持原状态，留待下一轮清理"""
+        idle_session = Session(
+            id="sess_idle",
+            template_id="python-basic",
+            status=SessionStatus.RUNNING,
+            resource_limit=ResourceLimit.default(),
+            workspace_path="s3://sandbox-workspace/sessions/sess_idle",
+            runtime_type="docker",
+            container_id="container-idle",
+            last_activity_at=datetime.now() - timedelta(minutes=35)
+        )
+        session_repo.iter_by_status = mock_session_pages([idle_session], [])
+        scheduler.remove_container.side_effect = Exception("Docker error")
+
+        result = await service.cleanup_idle_sessions()
+
+        assert result["idle_cleaned"] == 0
+        assert idle_session.status == SessionStatus.RUNNING
+        assert scheduler.remove_container.call_count == 3
+        storage_service.delete_prefix.assert_not_called()
+        session_repo.save.assert_not_called()
+        assert result["teardown"]["dead_lettered"][0]["stage"] == "remove"
 
     @pytest.mark.asyncio
     async def test_cleanup_error_handling(self, service, session_repo):
         """测试清理过程中的错误处理"""
-        session_repo.find_by_status.side_effect = Exception("Database error")
+        session_repo.iter_by_status = mock_session_pages(Exception("Database error"))
 
         result = await service.cleanup_idle_sessions()
 
@@ -0,0 +1,206 @@
+"""
+会话休眠服务单元测试
+
+测试 SessionHibernationService 的快照、释放容器与状态流转。
+"""
+import pytest
+from unittest.mock import Mock, AsyncMock
+from datetime import datetime, timedelta
+
+from src.application.services.session_hibernation_service import SessionHibernationService
+from src.domain.entities.session import Session
+from src.domain.value_objects.resource_limit import ResourceLimit
+from src.domain.value_objects.execution_status import SessionStatus
+from src.shared.errors.domain import ConflictError
+from tests.helpers import mock_session_pages
+
+
+def _make_session(session_id: str, idle_minutes: int, dependencies=None) -> Session:
+    last_activity = datetime.now() - timedelta(minutes=idle_minutes)
+    return Session(
+        id=session_id,
+        template_id="python-basic",
+        status=SessionStatus.RUNNING,
+        resource_limit=ResourceLimit.default(),
+        workspace_path=f"s3://sandbox-workspace/sessions/{session_id}",
+        runtime_type="docker",
+        runtime_node="node-1",
+        container_id=f"container-{session_id}",
+        created_at=last_activity,
+        last_activity_at=last_activity,
+        requested_dependencies=dependencies or [],
+    )
+
+
+class TestSessionHibernationService:
+    """会话休眠服务测试"""
+
+    @pytest.fixture
+    def session_repo(self):
+        repo = Mock()
+        repo.save = AsyncMock()
+        repo.commit = AsyncMock()
+        repo.iter_by_status = mock_session_pages()
+        return repo
+
+    @pytest.fixture
+    def scheduler(self):
+        scheduler = Mock()
+        scheduler.unpause_container = AsyncMock(return_value=None)
+        scheduler.snapshot_dependencies = AsyncMock(return_value=True)
+        scheduler.destroy_container = AsyncMock()
+        return scheduler
+
+    @pytest.fixture
+    def service(self, session_repo, scheduler):
+        return SessionHibernationService(
+            session_repo=session_repo,
+            scheduler=scheduler,
+            hibernate_after_minutes=60,
+        )
+
+    @pytest.mark.asyncio
+    async def test_hibernate_idle_session_with_dependencies(self, service, session_repo, scheduler):
+        """测试空闲会话先快照依赖再释放容器"""
+        session = _make_session("sess_a", idle_minutes=120, dependencies=["requests==2.31.0"])
+        session_repo.iter_by_status = mock_session_pages([], [session])
+
+        stats = await service.hibernate_idle_sessions()
+
+        assert stats["hibernated"] == 1
+        scheduler.snapshot_dependencies.assert_called_once_with("container-sess_a")
+        scheduler.destroy_container.assert_called_once_with("container-sess_a")
+        assert session.status == SessionStatus.HIBERNATED
+        assert session.container_id is None
+        assert session_repo.save.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_skip_snapshot_without_dependencies(self, service, session_repo, scheduler):
+        """测试无依赖的会话不生成快照"""
+        session_repo.iter_by_status = mock_session_pages([], [_make_session("sess_b", idle_minutes=120)])
+
+        await service.hibernate_idle_sessions()
+
+        scheduler.snapshot_dependencies.assert_not_called()
+        scheduler.destroy_container.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_active_session_not_hibernated(self, service, session_repo, scheduler):
+        """测试未超过阈值的会话保持运行"""
+        session = _make_session("sess_c", idle_minutes=5)
+        session_repo.iter_by_status = mock_session_pages([], [session])
+
+        stats = await service.hibernate_idle_sessions()
+
+        assert stats["hibernated"] == 0
+        assert session.status == SessionStatus.RUNNING
+        scheduler.destroy_container.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_session_with_running_execution_not_hibernated(self, session_repo, scheduler):
+        """测试有未结束执行的会话不休眠，即使最近一次执行创建于阈值之前"""
+        execution_repo = Mock()
+        execution_repo.has_active_executions = AsyncMock(return_value=True)
+        execution_repo.find_by_session_id = AsyncMock(return_value=[])
+        service = SessionHibernationService(
+            session_repo=session_repo,
+            scheduler=scheduler,
+            execution_repo=execution_repo,
+            hibernate_after_minutes=60,
+        )
+        session = _make_session("sess_busy", idle_minutes=120)
+        session_repo.iter_by_status = mock_session_pages([], [session])
+
+        stats = await service.hibernate_idle_sessions()
+
+        assert stats["hibernated"] == 0
+        assert session.status == SessionStatus.RUNNING
+        scheduler.destroy_container.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_snapshot_failure_keeps_container(self, service, session_repo, scheduler):
+        """测试快照失败时不销毁容器"""
+        session = _make_session("sess_d", idle_minutes=120, dependencies=["pandas"])
+        session_repo.iter_by_status = mock_session_pages([], [session])
+        scheduler.snapshot_dependencies.side_effect = RuntimeError("tar failed")
+
+        stats = await service.hibernate_idle_sessions()
+
+        assert stats["hibernated"] == 0
+        assert len(stats["errors"]) == 1
+        scheduler.destroy_container.assert_not_called()
+        assert session.status == SessionStatus.RUNNING
+        assert session.container_id == "container-sess_d"
+        # 认领与回滚各提交一次
+        assert session_repo.commit.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_claim_committed_before_container_destroyed(self, service, session_repo, scheduler):
+        """测试先以 running -> hibernating 认领并提交，之后才销毁容器"""
+        session = _make_session("sess_e", idle_minutes=120)
+        session_repo.iter_by_status = mock_session_pages([], [session])
+        events = []
+        session_repo.save.side_effect = lambda s: events.append(("save", s.status))
+        session_repo.commit.side_effect = lambda: events.append(("commit", None))
+        scheduler.destroy_container.side_effect = lambda container_id: events.append(("destroy", container_id))
+
+        await service.hibernate_idle_sessions()
+
+        assert events == [
+            ("save", SessionStatus.HIBERNATING),
+            ("commit", None),
+            ("destroy", "container-sess_e"),
+            ("save", SessionStatus.HIBERNATED),
+            ("commit", None),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_claim_conflict_keeps_container(self, service, session_repo, scheduler):
+        """测试认领冲突（状态已被其他请求修改）时不触碰容器"""
+        session = _make_session("sess_f", idle_minutes=120)
+        session_repo.iter_by_status = mock_session_pages([], [session])
+        session_repo.save.side_effect = ConflictError("modified concurrently")
+
+        stats = await service.hibernate_idle_sessions()
+
+        assert stats["hibernated"] == 0
+        assert len(stats["errors"]) == 1
+        session_repo.commit.assert_not_called()
+        scheduler.unpause_container.assert_not_called()
+        scheduler.destroy_container.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_execution_created_after_claim_rolls_back(self, session_repo, scheduler):
+        """测试认领后发现新建的执行时回滚认领，容器保留"""
+        execution_repo = Mock()
+        execution_repo.has_active_executions = AsyncMock(side_effect=[False, True])
+        execution_repo.find_by_session_id = AsyncMock(return_value=[])
+        service = SessionHibernationService(
+            session_repo=session_repo,
+            scheduler=scheduler,
+            execution_repo=execution_repo,
+            hibernate_after_minutes=60,
+        )
+        session = _make_session("sess_g", idle_minutes=120)
+        session_repo.iter_by_status = mock_session_pages([], [session])
+
+        stats = await service.hibernate_idle_sessions()
+
+        assert stats["hibernated"] == 0
+        assert stats["errors"] == []
+        assert session.status == SessionStatus.RUNNING
+        scheduler.destroy_container.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_resume_interrupted_hibernation(self, service, session_repo, scheduler):
+        """测试停留在 hibernating 超过阈值的会话被续做休眠"""
+        session = _make_session("sess_h", idle_minutes=120)
+        session.mark_as_hibernating()
+        session.updated_at = datetime.now() - timedelta(minutes=90)
+        session_repo.iter_by_status = mock_session_pages([session], [])
+
+        stats = await service.hibernate_idle_sessions()
+
+        assert stats["hibernated"] == 1
+        scheduler.destroy_container.assert_called_once_with("container-sess_h")
+        assert session.status == SessionStatus.HIBERNATED
@@ -0,0 +1,152 @@
+"""
+会话空闲冻结服务单元测试
+
+测试 SessionIdlePauseService 的空闲判断与暂停逻辑。
+"""
+import pytest
+from unittest.mock import Mock, AsyncMock
+from datetime import datetime, timedelta
+
+from src.application.services.session_idle_pause_service import SessionIdlePauseService
+from src.domain.entities.execution import Execution
+from src.domain.entities.session import Session
+from src.domain.value_objects.resource_limit import ResourceLimit
+from src.domain.value_objects.execution_status import SessionStatus
+from tests.helpers import mock_session_pages
+
+
+def _make_session(session_id: str, last_activity: datetime, container_id: str = "container-1") -> Session:
+    return Session(
+        id=session_id,
+        template_id="python-basic",
+        status=SessionStatus.RUNNING,
+        resource_limit=ResourceLimit.default(),
+        workspace_path=f"s3://sandbox-workspace/sessions/{session_id}",
+        runtime_type="docker",
+        container_id=container_id,
+        created_at=last_activity,
+        last_activity_at=last_activity,
+    )
+
+
+class TestSessionIdlePauseService:
+    """会话空闲冻结服务测试"""
+
+    @pytest.fixture
+    def session_repo(self):
+        repo = Mock()
+        repo.iter_by_status = mock_session_pages()
+        return repo
+
+    @pytest.fixture
+    def execution_repo(self):
+        repo = Mock()
+        repo.find_by_session_id = AsyncMock(return_value=[])
+        repo.has_active_executions = AsyncMock(return_value=False)
+        return repo
+
+    @pytest.fixture
+    def scheduler(self):
+        scheduler = Mock()
+        scheduler.pause_container = AsyncMock(return_value=True)
+        return scheduler
+
+    @pytest.fixture
+    def service(self, session_repo, scheduler, execution_repo):
+        return SessionIdlePauseService(
+            session_repo=session_repo,
+            scheduler=scheduler,
+            execution_repo=execution_repo,
+            idle_pause_minutes=10,
+        )
+
+    @pytest.mark.asyncio
+    async def test_pause_idle_session(self, service, session_repo, scheduler):
+        """测试暂停空闲超过阈值的会话容器"""
+        session_repo.iter_by_status = mock_session_pages([
+            _make_session("sess_idle", datetime.now() - timedelta(minutes=30)),
+        ])
+
+        stats = await service.pause_idle_sessions()
+
+        assert stats["total_checked"] == 1
+        assert stats["paused"] == 1
+        scheduler.pause_container.assert_called_once_with("container-1")
+
+    @pytest.mark.asyncio
+    async def test_recent_execution_keeps_session_awake(
+        self, service, session_repo, execution_repo, scheduler
+    ):
+        """测试最近有执行的会话不会被暂停"""
+        session_repo.iter_by_status = mock_session_pages([
+            _make_session("sess_busy", datetime.now() - timedelta(minutes=30)),
+        ])
+        execution = Mock(spec=Execution)
+        execution.created_at = datetime.now() - timedelta(minutes=1)
+        execution.completed_at = None
+        execution.last_heartbeat_at = None
+        execution_repo.find_by_session_id.return_value = [execution]
+
+        stats = await service.pause_idle_sessions()
+
+        assert stats["paused"] == 0
+        scheduler.pause_container.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_active_execution_keeps_session_awake(
+        self, service, session_repo, execution_repo, scheduler
+    ):
+        """测试有未结束执行的会话不会被暂停（长时间执行不因创建时间久远被冻结）"""
+        session_repo.iter_by_status = mock_session_pages([
+            _make_session("sess_running", datetime.now() - timedelta(minutes=30)),
+        ])
+        execution_repo.has_active_executions.return_value = True
+
+        stats = await service.pause_idle_sessions()
+
+        assert stats["paused"] == 0
+        execution_repo.has_active_executions.assert_called_once_with("sess_running")
+        scheduler.pause_container.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_recently_completed_execution_keeps_session_awake(
+        self, service, session_repo, execution_repo, scheduler
+    ):
+        """测试以执行完成时间而非创建时间计算空闲"""
+        session_repo.iter_by_status = mock_session_pages([
+            _make_session("sess_long", datetime.now() - timedelta(minutes=60)),
+        ])
+        execution = Mock(spec=Execution)
+        execution.created_at = datetime.now() - timedelta(minutes=50)
+        execution.completed_at = datetime.now() - timedelta(minutes=2)
+        execution.last_heartbeat_at = datetime.now() - timedelta(minutes=2)
+        execution_repo.find_by_session_id.return_value = [execution]
+
+        stats = await service.pause_idle_sessions()
+
+        assert stats["paused"] == 0
+        scheduler.pause_container.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self, session_repo, scheduler):
+        """测试 idle_pause_minutes=-1 时不做任何处理"""
+        service = SessionIdlePauseService(session_repo=session_repo, scheduler=scheduler)
+
+        stats = await service.pause_idle_sessions()
+
+        assert stats["total_checked"] == 0
+        session_repo.iter_by_status.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_pause_error_is_collected(self, service, session_repo, scheduler):
+        """测试暂停失败时记录错误并继续"""
+        session_repo.iter_by_status = mock_session_pages([
+            _make_session("sess_a", datetime.now() - timedelta(minutes=30), "container-a"),
+            _make_session("sess_b", datetime.now() - timedelta(minutes=30), "container-b"),
+        ])
+        scheduler.pause_container.side_effect = [RuntimeError("docker down"), True]
+
+        stats = await service.pause_idle_sessions()
+
+        assert stats["paused"] == 1
+        assert len(stats["errors"]) == 1
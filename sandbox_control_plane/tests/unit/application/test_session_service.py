@@ -4,7 +4,7 @@
 测试 SessionService 的用例编排逻辑。
 """
 import pytest
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from unittest.mock import Mock, AsyncMock
 
 from src.application.services.session_service import SessionService
@@ -15,13 +15,15 @@ from src.application.commands.install_session_dependencies import (
 from src.domain.entities.session import Session
 from src.domain.entities.template import Template
 from src.domain.value_objects.resource_limit import ResourceLimit
+from src.domain.value_objects.row_count import RowCount
 from src.domain.value_objects.execution_status import ExecutionStatus, SessionStatus
 from src.domain.services.scheduler import RuntimeNode
+from src.infrastructure.config.settings import get_settings
 from src.infrastructure.executors.dto import (
     ExecutorInstalledDependency,
     ExecutorSyncSessionConfigResponse,
 )
-from src.shared.errors.domain import ConflictError, NotFoundError
+from src.shared.errors.domain import ConflictError, NodeUnavailableError, NotFoundError
 
 
 class TestSessionService:
@@ -32,6 +34,7 @@ class TestSessionService:
         """模拟会话仓储"""
         repo = Mock()
         repo.save = AsyncMock()
+        repo.commit = AsyncMock()
         repo.find_by_id = AsyncMock()
         return repo
 
@@ -71,6 +74,10 @@ class TestSessionService:
     def initial_dependency_sync_scheduler(self):
         return Mock()
 
+    @pytest.fixture
+    def activity_recorder(self):
+        return Mock()
+
     @pytest.fixture
     def service(
         self,
@@ -80,6 +87,7 @@ class TestSessionService:
         execution_repo,
         executor_client,
         initial_dependency_sync_scheduler,
+        activity_recorder,
     ):
         """创建会话服务"""
         return SessionService(
@@ -89,6 +97,7 @@ class TestSessionService:
             scheduler=scheduler,
             executor_client=executor_client,
             initial_dependency_sync_scheduler=initial_dependency_sync_scheduler,
+            activity_recorder=activity_recorder,
         )
 
     @pytest.mark.asyncio
@@ -237,6 +246,36 @@ class TestSessionService:
         # Verify session_repo.delete was called
         session_repo.delete.assert_called_once_with("sess_20240115_abc123")
 
+    @pytest.mark.asyncio
+    async def test_delete_session_removes_execution_archives(
+        self, session_repo, execution_repo, template_repo, scheduler, executor_client
+    ):
+        """测试硬删除会话时一并删除 S3 上的执行归档文件"""
+        storage_service = Mock()
+        storage_service.delete_prefix = AsyncMock(return_value=2)
+        service = SessionService(
+            session_repo=session_repo,
+            execution_repo=execution_repo,
+            template_repo=template_repo,
+            scheduler=scheduler,
+            storage_service=storage_service,
+            executor_client=executor_client,
+        )
+        session_repo.find_by_id.return_value = Session(
+            id="sess_123",
+            template_id="python-basic",
+            status=SessionStatus.TERMINATED,
+            resource_limit=ResourceLimit.default(),
+            workspace_path="s3://sandbox-workspace/sessions/sess_123",
+            runtime_type="docker",
+        )
+        session_repo.delete = AsyncMock()
+
+        await service.delete_session("sess_123")
+
+        storage_service.delete_prefix.assert_any_call("executions-archive/sess_123/")
+        session_repo.delete.assert_called_once_with("sess_123")
+
     @pytest.mark.asyncio
     async def test_delete_session_not_found(self, service, session_repo):
         """测试删除不存在的会话"""
@@ -379,6 +418,97 @@ class TestSessionService:
         with pytest.raises(ConflictError, match="already exists"):
             await service.create_session(command)
 
+    @pytest.mark.asyncio
+    async def test_create_session_rejects_id_while_workspace_deleting(
+        self, session_repo, execution_repo, template_repo, scheduler
+    ):
+        """测试同 ID 会话的 workspace 仍在后台删除时拒绝创建"""
+        template_repo.find_by_id.return_value = Template(
+            id="python-test",
+            name="Python Test",
+            image="python:3.11",
+            base_image="python:3.11-slim"
+        )
+        session_repo.find_by_id.return_value = None
+        workspace_deleter = Mock()
+        workspace_deleter.is_pending = AsyncMock(return_value=True)
+        service = SessionService(
+            session_repo=session_repo,
+            execution_repo=execution_repo,
+            template_repo=template_repo,
+            scheduler=scheduler,
+            workspace_deleter=workspace_deleter,
+        )
+
+        command = CreateSessionCommand(id="reused-id", template_id="python-test", timeout=300)
+
+        with pytest.raises(ConflictError, match="still being deleted"):
+            await service.create_session(command)
+        assert workspace_deleter.is_pending.call_args.args[0].endswith("/sessions/reused-id")
+        scheduler.schedule.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_terminate_session_schedules_workspace_deletion(
+        self, session_repo, execution_repo, template_repo, scheduler
+    ):
+        """测试终止会话时调度后台删除 workspace，不等待删除完成"""
+        session_repo.find_by_id.return_value = Session(
+            id="sess_bg",
+            template_id="python-test",
+            status=SessionStatus.RUNNING,
+            resource_limit=ResourceLimit.default(),
+            workspace_path="s3://sandbox-workspace/sessions/sess_bg",
+            runtime_type="docker"
+        )
+        storage_service = Mock()
+        storage_service.delete_prefix = AsyncMock()
+        workspace_deleter = Mock()
+        workspace_deleter.schedule = AsyncMock()
+        service = SessionService(
+            session_repo=session_repo,
+            execution_repo=execution_repo,
+            template_repo=template_repo,
+            scheduler=scheduler,
+            storage_service=storage_service,
+            workspace_deleter=workspace_deleter,
+        )
+
+        result = await service.terminate_session("sess_bg")
+
+        assert result.status == SessionStatus.TERMINATED.value
+        workspace_deleter.schedule.assert_called_once_with("s3://sandbox-workspace/sessions/sess_bg")
+        storage_service.delete_prefix.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_terminate_session_deletes_inline_when_scheduling_fails(
+        self, session_repo, execution_repo, template_repo, scheduler
+    ):
+        """测试删除标记写入失败时同步删除 workspace"""
+        session_repo.find_by_id.return_value = Session(
+            id="sess_bg",
+            template_id="python-test",
+            status=SessionStatus.RUNNING,
+            resource_limit=ResourceLimit.default(),
+            workspace_path="s3://sandbox-workspace/sessions/sess_bg",
+            runtime_type="docker"
+        )
+        storage_service = Mock()
+        storage_service.delete_prefix = AsyncMock(return_value=3)
+        workspace_deleter = Mock()
+        workspace_deleter.schedule = AsyncMock(side_effect=Exception("S3 unavailable"))
+        service = SessionService(
+            session_repo=session_repo,
+            execution_repo=execution_repo,
+            template_repo=template_repo,
+            scheduler=scheduler,
+            storage_service=storage_service,
+            workspace_deleter=workspace_deleter,
+        )
+
+        await service.terminate_session("sess_bg")
+
+        storage_service.delete_prefix.assert_called_once_with("s3://sandbox-workspace/sessions/sess_bg/")
+
     @pytest.mark.asyncio
     async def test_create_session_with_dependencies(
         self,
@@ -446,7 +576,7 @@ class TestSessionService:
             )
         ]
         session_repo.find_sessions = AsyncMock(return_value=sessions)
-        session_repo.count_sessions = AsyncMock(return_value=2)
+        session_repo.count_sessions = AsyncMock(return_value=RowCount(2))
 
         result = await service.list_sessions()
 
@@ -467,13 +597,65 @@ class TestSessionService:
             )
         ]
         session_repo.find_sessions = AsyncMock(return_value=sessions)
-        session_repo.count_sessions = AsyncMock(return_value=1)
+        session_repo.count_sessions = AsyncMock(return_value=RowCount(1))
 
         result = await service.list_sessions(status=SessionStatus.RUNNING)
 
         assert "items" in result
         session_repo.find_sessions.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_list_sessions_keyset_pagination(self, service, session_repo):
+        """测试游标分页：多取一条判断下一页，并以最后一条生成游标"""
+        from src.domain.value_objects.page_cursor import PageCursor
+
+        sessions = [
+            Session(
+                id=f"sess_{i}",
+                template_id="python-test",
+                status=SessionStatus.RUNNING,
+                resource_limit=ResourceLimit.default(),
+                workspace_path=f"s3://bucket/sessions/sess_{i}",
+                runtime_type="docker",
+                created_at=datetime(2024, 1, 1, 0, 0, i),
+            )
+            for i in range(3)
+        ]
+        session_repo.find_sessions = AsyncMock(return_value=sessions)
+        session_repo.count_sessions = AsyncMock(return_value=RowCount(100, is_estimate=True))
+        cursor = PageCursor(created_at_ms=1704067200000, id="sess_prev").encode()
+
+        result = await service.list_sessions(limit=2, offset=10, cursor=cursor)
+
+        call = session_repo.find_sessions.call_args.kwargs
+        assert call["limit"] == 3
+        assert call["after"] == PageCursor(created_at_ms=1704067200000, id="sess_prev")
+        assert result["offset"] == 0
+        assert len(result["items"]) == 2
+        assert result["has_more"] is True
+        assert PageCursor.decode(result["next_cursor"]).id == "sess_1"
+        assert result["total_is_estimate"] is True
+        assert session_repo.count_sessions.call_args.kwargs["exact"] is False
+
+    @pytest.mark.asyncio
+    async def test_list_sessions_last_page_has_no_cursor(self, service, session_repo):
+        """测试最后一页不返回游标，精确总数按需返回"""
+        session_repo.find_sessions = AsyncMock(return_value=[])
+        session_repo.count_sessions = AsyncMock(return_value=RowCount(0))
+
+        result = await service.list_sessions(include_total=True)
+
+        assert result["has_more"] is False
+        assert result["next_cursor"] is None
+        assert result["total_is_estimate"] is False
+        assert session_repo.count_sessions.call_args.kwargs["exact"] is True
+
+    @pytest.mark.asyncio
+    async def test_list_sessions_invalid_cursor(self, service, session_repo):
+        """测试无效游标"""
+        with pytest.raises(ValueError, match="invalid cursor"):
+            await service.list_sessions(cursor="not-a-cursor")
+
     @pytest.mark.asyncio
     async def test_terminate_session_not_found(self, service, session_repo):
         """测试终止不存在的会话"""
@@ -534,6 +716,73 @@ class TestSessionService:
         assert len(result) == 1
         execution_repo.find_by_session_id.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_list_executions_page(self, service, execution_repo):
+        """测试执行记录游标分页"""
+        from src.domain.entities.execution import Execution
+        from src.domain.value_objects.execution_status import ExecutionState
+
+        executions = [
+            Execution(
+                id=f"exec_{i}",
+                session_id="sess_123",
+                state=ExecutionState(status=ExecutionStatus.COMPLETED),
+                code="print('hello')",
+                language="python",
+            )
+            for i in range(2)
+        ]
+        execution_repo.find_by_session_id.return_value = executions
+        execution_repo.count_by_session_id = AsyncMock(return_value=RowCount(7, is_estimate=True))
+
+        result = await service.list_executions_page("sess_123", limit=1)
+
+        assert execution_repo.find_by_session_id.call_args.kwargs["limit"] == 2
+        assert len(result["items"]) == 1
+        assert result["has_more"] is True
+        assert result["next_cursor"] is not None
+        assert result["total"] == 7
+        assert result["total_is_estimate"] is True
+        execution_repo.count_by_session_id.assert_called_once_with("sess_123", exact=False)
+
+    @pytest.mark.asyncio
+    async def test_list_sessions_estimate_fallback_is_exact(self, service, session_repo):
+        """测试数据库不支持估算时回退到精确计数，total_is_estimate 为 False"""
+        session_repo.find_sessions = AsyncMock(return_value=[])
+        session_repo.count_sessions = AsyncMock(return_value=RowCount(3))
+
+        result = await service.list_sessions()
+
+        assert session_repo.count_sessions.call_args.kwargs["exact"] is False
+        assert result["total"] == 3
+        assert result["total_is_estimate"] is False
+
+    @pytest.mark.asyncio
+    async def test_get_execution_status_only(self, service, execution_repo):
+        """测试状态查询不加载代码与输出"""
+        from src.application.queries.get_execution import GetExecutionQuery
+        from src.domain.entities.execution import Execution
+        from src.domain.value_objects.execution_status import ExecutionState
+
+        execution_repo.find_by_id.return_value = Execution(
+            id="exec_1",
+            session_id="sess_123",
+            state=ExecutionState(status=ExecutionStatus.RUNNING),
+            code="",
+            language="python",
+            payload_loaded=False,
+        )
+
+        result = await service.get_execution(
+            GetExecutionQuery(execution_id="exec_1", include_result=False)
+        )
+
+        execution_repo.find_by_id.assert_called_once_with("exec_1", include_payload=False)
+        assert result.status == "running"
+        assert result.result_loaded is False
+        assert result.code is None
+        assert result.stdout is None
+
     @pytest.mark.asyncio
     async def test_get_session_executions_session_not_found(self, service, session_repo, execution_repo):
         """测试获取不存在会话的执行记录"""
@@ -544,3 +793,390 @@ class TestSessionService:
 
         # 应该返回空列表
         assert result == []
+
+    @pytest.mark.asyncio
+    async def test_execute_code_resumes_paused_container(
+        self, service, session_repo, scheduler, execution_repo, monkeypatch
+    ):
+        """测试执行前恢复被空闲冻结的容器"""
+        from src.application.commands.execute_code import ExecuteCodeCommand
+
+        monkeypatch.setattr(get_settings(), "idle_pause_minutes", 10)
+        session = Session(
+            id="sess_123",
+            template_id="python-basic",
+            status=SessionStatus.RUNNING,
+            resource_limit=ResourceLimit.default(),
+            workspace_path="s3://bucket/sess_123",
+            runtime_type="docker",
+            container_id="container-123",
+            last_activity_at=datetime.now() - timedelta(minutes=30),
+        )
+        session_repo.find_by_id.return_value = session
+        execution_repo.commit = AsyncMock()
+
+        call_order = []
+        scheduler.unpause_container = AsyncMock(
+            side_effect=lambda *a, **k: call_order.append("unpause") or 35.0
+        )
+        scheduler.execute = AsyncMock(
+            side_effect=lambda *a, **k: call_order.append("execute") or "exec-1"
+        )
+
+        await service.execute_code(
+            ExecuteCodeCommand(session_id="sess_123", code="print(1)", language="python")
+        )
+
+        assert call_order == ["unpause", "execute"]
+        scheduler.unpause_container.assert_called_once_with("container-123")
+
+    @pytest.mark.asyncio
+    async def test_execute_code_resumes_despite_recent_activity(
+        self, service, session_repo, scheduler, execution_repo, monkeypatch
+    ):
+        """测试 last_activity_at 较新（缓冲刷新晚于冻结）时仍在分发前检查并恢复容器"""
+        from src.application.commands.execute_code import ExecuteCodeCommand
+
+        monkeypatch.setattr(get_settings(), "idle_pause_minutes", 10)
+        session_repo.find_by_id.return_value = Session(
+            id="sess_123",
+            template_id="python-basic",
+            status=SessionStatus.RUNNING,
+            resource_limit=ResourceLimit.default(),
+            workspace_path="s3://bucket/sess_123",
+            runtime_type="docker",
+            container_id="container-123",
+            last_activity_at=datetime.now() - timedelta(minutes=1),
+        )
+        execution_repo.commit = AsyncMock()
+        scheduler.unpause_container = AsyncMock(return_value=20.0)
+        scheduler.execute = AsyncMock(return_value="exec-1")
+
+        await service.execute_code(
+            ExecuteCodeCommand(session_id="sess_123", code="print(1)", language="python")
+        )
+
+        scheduler.unpause_container.assert_called_once_with("container-123")
+        scheduler.execute.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_execute_code_skips_resume_when_idle_pause_disabled(
+        self, service, session_repo, scheduler, execution_repo, monkeypatch
+    ):
+        """测试未启用空闲冻结时不查询容器状态"""
+        from src.application.commands.execute_code import ExecuteCodeCommand
+
+        monkeypatch.setattr(get_settings(), "idle_pause_minutes", -1)
+        session_repo.find_by_id.return_value = Session(
+            id="sess_123",
+            template_id="python-basic",
+            status=SessionStatus.RUNNING,
+            resource_limit=ResourceLimit.default(),
+            workspace_path="s3://bucket/sess_123",
+            runtime_type="docker",
+            container_id="container-123",
+            last_activity_at=datetime.now() - timedelta(minutes=1),
+        )
+        execution_repo.commit = AsyncMock()
+        scheduler.unpause_container = AsyncMock()
+        scheduler.execute = AsyncMock(return_value="exec-1")
+
+        await service.execute_code(
+            ExecuteCodeCommand(session_id="sess_123", code="print(1)", language="python")
+        )
+
+        scheduler.unpause_container.assert_not_called()
+        scheduler.execute.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_execute_code_records_activity(
+        self, service, session_repo, scheduler, execution_repo, activity_recorder
+    ):
+        """测试执行提交后记录会话活动（写缓冲，不同步写会话表）"""
+        from src.application.commands.execute_code import ExecuteCodeCommand
+
+        session_repo.find_by_id.return_value = Session(
+            id="sess_123",
+            template_id="python-basic",
+            status=SessionStatus.RUNNING,
+            resource_limit=ResourceLimit.default(),
+            workspace_path="s3://bucket/sess_123",
+            runtime_type="docker",
+            container_id="container-123",
+        )
+        execution_repo.commit = AsyncMock()
+        scheduler.unpause_container = AsyncMock(return_value=None)
+        scheduler.execute = AsyncMock(return_value="exec-1")
+
+        await service.execute_code(
+            ExecuteCodeCommand(session_id="sess_123", code="print(1)", language="python")
+        )
+
+        activity_recorder.assert_called_once_with("sess_123")
+        session_repo.save.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_execute_code_enqueues_for_dispatch(
+        self, session_repo, execution_repo, template_repo, scheduler, executor_client
+    ):
+        """测试配置分发队列时执行与分发条目同一事务提交，不直接调用执行器"""
+        from src.application.commands.execute_code import ExecuteCodeCommand
+
+        session_repo.find_by_id.return_value = Session(
+            id="sess_123",
+            template_id="python-basic",
+            status=SessionStatus.RUNNING,
+            resource_limit=ResourceLimit.default(),
+            workspace_path="s3://bucket/sess_123",
+            runtime_type="docker",
+            container_id="container-123",
+        )
+        call_order = []
+        execution_repo.save = AsyncMock(side_effect=lambda *a: call_order.append("save"))
+        execution_repo.commit = AsyncMock(side_effect=lambda: call_order.append("commit"))
+        dispatch_repo = Mock()
+        dispatch_repo.enqueue = AsyncMock(side_effect=lambda *a: call_order.append("enqueue"))
+        notifier = Mock(side_effect=lambda: call_order.append("notify"))
+        scheduler.execute = AsyncMock()
+        scheduler.unpause_container = AsyncMock()
+
+        service = SessionService(
+            session_repo=session_repo,
+            execution_repo=execution_repo,
+            template_repo=template_repo,
+            scheduler=scheduler,
+            executor_client=executor_client,
+            dispatch_repo=dispatch_repo,
+            dispatch_notifier=notifier,
+        )
+        result = await service.execute_code(
+            ExecuteCodeCommand(session_id="sess_123", code="print(1)", language="python")
+        )
+
+        assert call_order == ["save", "enqueue", "commit", "notify"]
+        dispatch_repo.enqueue.assert_called_once_with(result.id, "sess_123")
+        assert result.status == "pending"
+        scheduler.execute.assert_not_called()
+        scheduler.unpause_container.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_execute_code_restores_hibernated_session(
+        self, service, session_repo, template_repo, scheduler, execution_repo, executor_client
+    ):
+        """测试执行休眠会话时先在新节点恢复容器"""
+        from src.application.commands.execute_code import ExecuteCodeCommand
+
+        session = Session(
+            id="sess_123",
+            template_id="python-basic",
+            status=SessionStatus.HIBERNATED,
+            resource_limit=ResourceLimit.default(),
+            workspace_path="s3://bucket/sess_123",
+            runtime_type="docker",
+        )
+        session_repo.find_by_id.return_value = session
+        template_repo.find_by_id.return_value = Template(
+            id="python-basic",
+            name="Python Basic",
+            image="python:3.11-slim",
+            base_image="python:3.11-slim",
+        )
+        scheduler.schedule.return_value = Mock(id="node-2")
+        scheduler.create_container_for_session.return_value = "container-new"
+        scheduler.unpause_container = AsyncMock(return_value=None)
+        scheduler.execute = AsyncMock(return_value="exec-1")
+        executor_client.health_check = AsyncMock(return_value=Mock(status="healthy"))
+        execution_repo.commit = AsyncMock()
+
+        await service.execute_code(
+            ExecuteCodeCommand(session_id="sess_123", code="print(1)", language="python")
+        )
+
+        assert session.status == SessionStatus.RUNNING
+        assert session.container_id == "container-new"
+        assert session.runtime_node == "node-2"
+        scheduler.execute.assert_called_once()
+        assert scheduler.execute.call_args.kwargs["container_id"] == "container-new"
+
+    @pytest.mark.asyncio
+    async def test_execute_code_rejects_hibernating_session(self, service, session_repo, scheduler):
+        """测试休眠进行中的会话拒绝执行（容器即将销毁），不触发恢复"""
+        from src.application.commands.execute_code import ExecuteCodeCommand
+
+        session = Session(
+            id="sess_123",
+            template_id="python-basic",
+            status=SessionStatus.HIBERNATING,
+            resource_limit=ResourceLimit.default(),
+            workspace_path="s3://bucket/sess_123",
+            runtime_type="docker",
+            container_id="container-old",
+        )
+        session_repo.find_by_id.return_value = session
+        scheduler.execute = AsyncMock()
+
+        with pytest.raises(ConflictError):
+            await service.execute_code(
+                ExecuteCodeCommand(session_id="sess_123", code="print(1)", language="python")
+            )
+
+        scheduler.execute.assert_not_called()
+        scheduler.schedule.assert_not_called()
+
+    @staticmethod
+    def _hibernated_session() -> Session:
+        return Session(
+            id="sess_123",
+            template_id="python-basic",
+            status=SessionStatus.HIBERNATED,
+            resource_limit=ResourceLimit.default(),
+            workspace_path="s3://bucket/sess_123",
+            runtime_type="docker",
+        )
+
+    @pytest.mark.asyncio
+    async def test_restore_claims_session_before_creating_container(
+        self, service, session_repo, template_repo, scheduler, execution_repo
+    ):
+        """测试并发恢复时认领失败的请求返回冲突，不创建容器"""
+        from src.application.commands.execute_code import ExecuteCodeCommand
+
+        session_repo.find_by_id.return_value = self._hibernated_session()
+        template_repo.find_by_id.return_value = Template(
+            id="python-basic", name="Python Basic", image="python:3.11-slim", base_image="python:3.11-slim",
+        )
+        scheduler.schedule.return_value = Mock(id="node-2")
+        session_repo.save.side_effect = ConflictError("modified concurrently")
+        execution_repo.commit = AsyncMock()
+
+        with pytest.raises(ConflictError, match="being restored") as exc_info:
+            await service.execute_code(
+                ExecuteCodeCommand(session_id="sess_123", code="print(1)", language="python")
+            )
+
+        assert str(exc_info.value.__cause__) == "modified concurrently"
+        scheduler.create_container_for_session.assert_not_called()
+        session_repo.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_restore_failure_returns_session_to_hibernated(
+        self, service, session_repo, template_repo, scheduler, execution_repo
+    ):
+        """测试恢复失败时销毁新容器并回到 hibernated，下一次执行可重试"""
+        from src.application.commands.execute_code import ExecuteCodeCommand
+
+        session = self._hibernated_session()
+        session_repo.find_by_id.return_value = session
+        template_repo.find_by_id.return_value = Template(
+            id="python-basic", name="Python Basic", image="python:3.11-slim", base_image="python:3.11-slim",
+        )
+        scheduler.schedule.return_value = Mock(id="node-2")
+        scheduler.create_container_for_session.return_value = "container-new"
+        scheduler.get_executor_url.side_effect = RuntimeError("pod not found")
+        execution_repo.commit = AsyncMock()
+
+        with pytest.raises(RuntimeError, match="pod not found"):
+            await service.execute_code(
+                ExecuteCodeCommand(session_id="sess_123", code="print(1)", language="python")
+            )
+
+        scheduler.destroy_container.assert_called_once_with(container_id="container-new")
+        assert session.status == SessionStatus.HIBERNATED
+        assert session.container_id is None
+        # 认领、绑定容器、回滚各提交一次，均通过会话仓储
+        assert session_repo.commit.call_count == 3
+        execution_repo.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_restore_commits_container_before_waiting_for_executor(
+        self, service, session_repo, template_repo, scheduler, execution_repo
+    ):
+        """测试新容器 ID 在等待执行器就绪前已提交，等待期间退出不会留下无人引用的容器"""
+        from src.application.commands.execute_code import ExecuteCodeCommand
+
+        session = self._hibernated_session()
+        session_repo.find_by_id.return_value = session
+        template_repo.find_by_id.return_value = Template(
+            id="python-basic", name="Python Basic", image="python:3.11-slim", base_image="python:3.11-slim",
+        )
+        scheduler.schedule.return_value = Mock(id="node-2")
+        scheduler.create_container_for_session.return_value = "container-new"
+        events = []
+        session_repo.commit.side_effect = lambda: events.append(("commit", session.container_id))
+
+        def get_executor_url(container_id):
+            events.append(("wait", container_id))
+            raise RuntimeError("pod not found")
+
+        scheduler.get_executor_url.side_effect = get_executor_url
+        execution_repo.commit = AsyncMock()
+
+        with pytest.raises(RuntimeError):
+            await service.execute_code(
+                ExecuteCodeCommand(session_id="sess_123", code="print(1)", language="python")
+            )
+
+        assert events[:3] == [
+            ("commit", None),
+            ("commit", "container-new"),
+            ("wait", "container-new"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_restore_timeout_is_unavailable_error(
+        self, service, session_repo, template_repo, scheduler, execution_repo, monkeypatch
+    ):
+        """测试执行器就绪超时视为服务端不可用（503），而非客户端错误"""
+        from src.application.commands.execute_code import ExecuteCodeCommand
+
+        monkeypatch.setattr(get_settings(), "hibernate_restore_timeout_seconds", 0)
+        session = self._hibernated_session()
+        session_repo.find_by_id.return_value = session
+        template_repo.find_by_id.return_value = Template(
+            id="python-basic", name="Python Basic", image="python:3.11-slim", base_image="python:3.11-slim",
+        )
+        scheduler.schedule.return_value = Mock(id="node-2")
+        scheduler.create_container_for_session.return_value = "container-new"
+        execution_repo.commit = AsyncMock()
+
+        with pytest.raises(NodeUnavailableError, match="timed out"):
+            await service.execute_code(
+                ExecuteCodeCommand(session_id="sess_123", code="print(1)", language="python")
+            )
+
+        assert session.status == SessionStatus.HIBERNATED
+
+    @pytest.mark.asyncio
+    async def test_restore_deletes_snapshot_after_success(
+        self, session_repo, template_repo, scheduler, execution_repo, executor_client
+    ):
+        """测试依赖快照在执行器就绪后才删除"""
+        from src.application.commands.execute_code import ExecuteCodeCommand
+
+        storage_service = Mock()
+        storage_service.file_exists = AsyncMock(return_value=True)
+        storage_service.delete_file = AsyncMock()
+        service = SessionService(
+            session_repo=session_repo,
+            execution_repo=execution_repo,
+            template_repo=template_repo,
+            scheduler=scheduler,
+            storage_service=storage_service,
+            executor_client=executor_client,
+        )
+        session_repo.find_by_id.return_value = self._hibernated_session()
+        template_repo.find_by_id.return_value = Template(
+            id="python-basic", name="Python Basic", image="python:3.11-slim", base_image="python:3.11-slim",
+        )
+        scheduler.schedule.return_value = Mock(id="node-2")
+        scheduler.execute = AsyncMock(return_value="exec-1")
+        executor_client.health_check = AsyncMock(return_value=Mock(status="healthy"))
+        execution_repo.commit = AsyncMock()
+
+        await service.execute_code(
+            ExecuteCodeCommand(session_id="sess_123", code="print(1)", language="python")
+        )
+
+        storage_service.delete_file.assert_called_once_with(
+            "s3://bucket/sess_123/.sandbox/venv-snapshot.tar.gz"
+        )
@@ -12,6 +12,7 @@ from src.domain.entities.session import Session
 from src.domain.value_objects.resource_limit import ResourceLimit
 from src.domain.value_objects.execution_status import SessionStatus
 from src.domain.repositories.session_repository import ISessionRepository
+from tests.helpers import mock_session_pages
 
 
 class TestSessionStuckCreatingService:
@@ -23,7 +24,7 @@ class TestSessionStuckCreatingService:
         repo = Mock()
         repo.save = AsyncMock()
         repo.find_by_id = AsyncMock()
-        repo.find_by_status = AsyncMock()
+        repo.iter_by_status = mock_session_pages()
         return repo
 
     @pytest.fixture
@@ -65,7 +66,7 @@ class TestSessionStuckCreatingService:
     @pytest.mark.asyncio
     async def test_mark_stuck_session_as_failed(self, service, session_repo, creating_session_stuck):
         """测试标记超时的 creating 会话为 failed"""
-        session_repo.find_by_status.return_value = [creating_session_stuck]
+        session_repo.iter_by_status = mock_session_pages([creating_session_stuck])
 
         result = await service.check_and_mark_stuck_sessions()
 
@@ -77,7 +78,7 @@ class TestSessionStuckCreatingService:
     @pytest.mark.asyncio
     async def test_keep_recent_creating_session(self, service, session_repo, creating_session_recent):
         """测试不标记未超时的 creating 会话"""
-        session_repo.find_by_status.return_value = [creating_session_recent]
+        session_repo.iter_by_status = mock_session_pages([creating_session_recent])
 
         result = await service.check_and_mark_stuck_sessions()
 
@@ -92,7 +93,7 @@ class TestSessionStuckCreatingService:
         stuck_time = datetime.now() - timedelta(minutes=6)
         recent_time = datetime.now() - timedelta(minutes=2)
 
-        session_repo.find_by_status.return_value = [
+        session_repo.iter_by_status = mock_session_pages([
             Session(
                 id="sess_1",
                 template_id="python-basic",
@@ -111,7 +112,7 @@ class TestSessionStuckCreatingService:
                 runtime_type="docker",
                 created_at=recent_time,  # 未超时
             ),
-        ]
+        ])
 
         result = await service.check_and_mark_stuck_sessions()
 
@@ -121,7 +122,7 @@ class TestSessionStuckCreatingService:
     @pytest.mark.asyncio
     async def test_no_creating_sessions(self, service, session_repo):
         """测试没有 creating 会话时的情况"""
-        session_repo.find_by_status.return_value = []
+        session_repo.iter_by_status = mock_session_pages([])
 
         result = await service.check_and_mark_stuck_sessions()
 
@@ -147,7 +148,7 @@ class TestSessionStuckCreatingService:
             runtime_type="docker",
             created_at=old_time,
         )
-        session_repo.find_by_status.return_value = [stuck_session]
+        session_repo.iter_by_status = mock_session_pages([stuck_session])
 
         result = await service.check_and_mark_stuck_sessions()
 
@@ -157,7 +158,7 @@ class TestSessionStuckCreatingService:
     @pytest.mark.asyncio
     async def test_error_handling(self, service, session_repo):
         """测试错误处理"""
-        session_repo.find_by_status.side_effect = Exception("Database error")
+        session_repo.iter_by_status = mock_session_pages(Exception("Database error"))
 
         result = await service.check_and_mark_stuck_sessions()
 
@@ -177,7 +178,7 @@ class TestSessionStuckCreatingService:
             runtime_type="docker",
             created_at=None,  # 没有 created_at
         )
-        session_repo.find_by_status.return_value = [session]
+        session_repo.iter_by_status = mock_session_pages([session])
 
         result = await service.check_and_mark_stuck_sessions()
 
@@ -199,7 +200,7 @@ class TestSessionStuckCreatingService:
             runtime_type="docker",
             created_at=exact_threshold_time,
         )
-        session_repo.find_by_status.return_value = [session]
+        session_repo.iter_by_status = mock_session_pages([session])
 
         result = await service.check_and_mark_stuck_sessions()
 
@@ -0,0 +1,252 @@
+"""
+会话拆除流水线单元测试
+
+测试 SessionTeardownPipeline 的并发上限、阶段重试、死信与按运行时节点限速。
+"""
+import asyncio
+import time
+
+import pytest
+from unittest.mock import ANY, Mock, AsyncMock
+
+from src.application.services.session_teardown_pipeline import (
+    SessionTeardownPipeline,
+    TeardownRequest,
+    STAGE_REMOVE,
+    STAGE_WORKSPACE,
+)
+from src.application.services.workspace_deletion_service import WorkspaceDeletionService, tombstone_path
+from src.domain.entities.session import Session
+from src.domain.value_objects.execution_status import SessionStatus
+from src.domain.value_objects.resource_limit import ResourceLimit
+
+
+def _make_session(index: int, runtime_node: str = "node-1") -> Session:
+    return Session(
+        id=f"sess_{index}",
+        template_id="python-basic",
+        status=SessionStatus.RUNNING,
+        resource_limit=ResourceLimit.default(),
+        workspace_path=f"s3://sandbox-workspace/sessions/sess_{index}",
+        runtime_type="docker",
+        runtime_node=runtime_node,
+        container_id=f"container-{index}",
+    )
+
+
+def _requests(count: int, runtime_node: str = "node-1"):
+    return [TeardownRequest(_make_session(i, runtime_node), reason="idle_timeout") for i in range(count)]
+
+
+class TestSessionTeardownPipeline:
+    """会话拆除流水线测试"""
+
+    @pytest.fixture
+    def scheduler(self):
+        scheduler = Mock()
+        scheduler.stop_container = AsyncMock()
+        scheduler.remove_container = AsyncMock()
+        return scheduler
+
+    @pytest.fixture
+    def storage_service(self):
+        storage = Mock()
+        storage.delete_prefix = AsyncMock(return_value=2)
+        return storage
+
+    @pytest.mark.asyncio
+    async def test_tears_down_all_sessions(self, scheduler, storage_service):
+        """测试每个会话依次停止、删除容器并删除 workspace，完成后回调"""
+        torn_down = []
+
+        async def on_torn_down(result):
+            torn_down.append(result.request.session.id)
+
+        pipeline = SessionTeardownPipeline(scheduler, storage_service, on_torn_down=on_torn_down)
+        stats = await pipeline.run(_requests(3))
+
+        assert stats["total"] == 3
+        assert stats["torn_down"] == 3
+        assert stats["files_deleted"] == 6
+        assert stats["dead_lettered"] == []
+        assert sorted(torn_down) == ["sess_0", "sess_1", "sess_2"]
+        scheduler.remove_container.assert_any_call("container-1")
+        storage_service.delete_prefix.assert_any_call("s3://sandbox-workspace/sessions/sess_1/")
+
+    @pytest.mark.asyncio
+    async def test_container_stages_run_concurrently_within_limit(self, scheduler):
+        """测试容器操作并发执行且不超过并发上限"""
+        in_flight, peak = 0, 0
+
+        async def slow_remove(container_id):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.02)
+            in_flight -= 1
+
+        scheduler.remove_container.side_effect = slow_remove
+        pipeline = SessionTeardownPipeline(scheduler, concurrency=4)
+
+        started = time.monotonic()
+        stats = await pipeline.run(_requests(12))
+
+        assert peak == 4
+        # 串行需要 0.24s，并发 4 约 0.06s
+        assert time.monotonic() - started < 0.2
+        assert stats["throughput_per_second"] > 0
+
+    @pytest.mark.asyncio
+    async def test_workspace_routed_through_deletion_service(self, scheduler, storage_service):
+        """测试配置后台删除服务时写入删除标记并在后台删除，不在流水线内按前缀删除"""
+        storage_service.upload_file = AsyncMock()
+        storage_service.delete_file = AsyncMock()
+        deleter = WorkspaceDeletionService(storage_service, bucket="sandbox-workspace")
+        pipeline = SessionTeardownPipeline(scheduler, storage_service, workspace_deleter=deleter)
+
+        stats = await pipeline.run(_requests(2))
+        while deleter.progress():
+            await asyncio.sleep(0)
+
+        assert stats["torn_down"] == 2
+        assert stats["files_deleted"] == 0
+        storage_service.upload_file.assert_any_call(
+            tombstone_path("s3://sandbox-workspace/sessions/sess_1"), ANY, content_type="application/json"
+        )
+        storage_service.delete_prefix.assert_any_call("s3://sandbox-workspace/sessions/sess_1/", on_progress=ANY)
+        storage_service.delete_file.assert_any_call(tombstone_path("s3://sandbox-workspace/sessions/sess_1"))
+
+    @pytest.mark.asyncio
+    async def test_workspace_deleted_inline_when_tombstone_write_fails(self, scheduler, storage_service):
+        """测试删除标记写入失败时回退为同步按前缀删除"""
+        deleter = Mock()
+        deleter.schedule = AsyncMock(side_effect=Exception("s3 unavailable"))
+        pipeline = SessionTeardownPipeline(scheduler, storage_service, workspace_deleter=deleter)
+
+        stats = await pipeline.run(_requests(1))
+
+        assert stats["files_deleted"] == 2
+        storage_service.delete_prefix.assert_called_once_with("s3://sandbox-workspace/sessions/sess_0/")
+
+    @pytest.mark.asyncio
+    async def test_hibernated_session_skips_container_stages(self, scheduler, storage_service):
+        """测试休眠会话跳过停止与删除容器，只删除 workspace 并回调"""
+        session = _make_session(0)
+        session.mark_as_hibernating()
+        session.mark_as_hibernated()
+        torn_down = []
+
+        async def on_torn_down(result):
+            torn_down.append(result)
+
+        pipeline = SessionTeardownPipeline(scheduler, storage_service, on_torn_down=on_torn_down)
+        stats = await pipeline.run([TeardownRequest(session, reason="max_lifetime_exceeded")])
+
+        scheduler.stop_container.assert_not_called()
+        scheduler.remove_container.assert_not_called()
+        storage_service.delete_prefix.assert_called_once_with("s3://sandbox-workspace/sessions/sess_0/")
+        assert stats["torn_down"] == 1
+        assert torn_down[0].container_removed
+
+    @pytest.mark.asyncio
+    async def test_stop_failure_still_removes(self, scheduler, storage_service):
+        """测试停止失败时仍强制删除容器"""
+        scheduler.stop_container.side_effect = Exception("timeout")
+        pipeline = SessionTeardownPipeline(scheduler, storage_service, max_attempts=2, retry_base_seconds=0)
+
+        stats = await pipeline.run(_requests(1))
+
+        assert scheduler.stop_container.call_count == 2
+        scheduler.remove_container.assert_called_once_with("container-0")
+        assert stats["torn_down"] == 1
+
+    @pytest.mark.asyncio
+    async def test_transient_remove_failure_retried(self, scheduler, storage_service):
+        """测试删除容器的瞬时失败重试后成功"""
+        scheduler.remove_container.side_effect = [Exception("daemon busy"), None]
+        pipeline = SessionTeardownPipeline(scheduler, storage_service, retry_base_seconds=0)
+
+        stats = await pipeline.run(_requests(1))
+
+        assert scheduler.remove_container.call_count == 2
+        assert stats["torn_down"] == 1
+        assert stats["dead_lettered"] == []
+
+    @pytest.mark.asyncio
+    async def test_remove_dead_letter_skips_workspace(self, scheduler, storage_service):
+        """测试容器删除重试耗尽后进入死信，且不删除 workspace"""
+        scheduler.remove_container.side_effect = Exception("daemon unreachable")
+        results = []
+
+        async def on_torn_down(result):
+            results.append(result)
+
+        pipeline = SessionTeardownPipeline(
+            scheduler, storage_service, max_attempts=3, retry_base_seconds=0, on_torn_down=on_torn_down
+        )
+        stats = await pipeline.run(_requests(1))
+
+        assert scheduler.remove_container.call_count == 3
+        storage_service.delete_prefix.assert_not_called()
+        assert stats["torn_down"] == 0
+        assert stats["dead_lettered"] == [
+            {"session_id": "sess_0", "stage": STAGE_REMOVE, "error": "daemon unreachable"}
+        ]
+        assert not results[0].container_removed
+
+    @pytest.mark.asyncio
+    async def test_workspace_dead_letter_keeps_container_removed(self, scheduler, storage_service):
+        """测试 workspace 删除失败进入死信，但容器已删除"""
+        storage_service.delete_prefix.side_effect = Exception("S3 unavailable")
+        pipeline = SessionTeardownPipeline(scheduler, storage_service, max_attempts=2, retry_base_seconds=0)
+
+        stats = await pipeline.run(_requests(1))
+
+        assert stats["torn_down"] == 1
+        assert stats["dead_lettered"][0]["stage"] == STAGE_WORKSPACE
+
+    @pytest.mark.asyncio
+    async def test_callback_failure_does_not_abort_batch(self, scheduler):
+        """测试单个会话的回调异常不影响其他会话"""
+        recorded = []
+
+        async def on_torn_down(result):
+            if result.request.session.id == "sess_0":
+                raise RuntimeError("database error")
+            recorded.append(result.request.session.id)
+
+        pipeline = SessionTeardownPipeline(scheduler, on_torn_down=on_torn_down)
+        stats = await pipeline.run(_requests(3))
+
+        assert sorted(recorded) == ["sess_1", "sess_2"]
+        assert stats["torn_down"] == 3
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_per_runtime_node(self, scheduler):
+        """测试同一运行时节点的容器操作按速率限制，不同节点互不影响"""
+        calls = []
+
+        async def record(container_id, **kwargs):
+            calls.append(time.monotonic())
+
+        scheduler.stop_container.side_effect = record
+        pipeline = SessionTeardownPipeline(scheduler, rate_per_runtime=50)
+
+        started = time.monotonic()
+        await pipeline.run(_requests(3, runtime_node="node-1"))
+        # 3 次停止 + 3 次删除，每次间隔 20ms
+        assert time.monotonic() - started >= 0.09
+
+        started = time.monotonic()
+        await pipeline.run(
+            [TeardownRequest(_make_session(i, runtime_node=f"node-{i}"), reason="idle_timeout") for i in range(3)]
+        )
+        assert time.monotonic() - started < 0.09
+
+    @pytest.mark.asyncio
+    async def test_empty_batch(self, scheduler):
+        """测试空批次"""
+        stats = await SessionTeardownPipeline(scheduler).run([])
+
+        assert stats["total"] == 0
+        assert stats["throughput_per_second"] >= 0
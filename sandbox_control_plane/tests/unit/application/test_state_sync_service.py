@@ -5,14 +5,16 @@
 """
 import pytest
 from unittest.mock import Mock, AsyncMock
-from datetime import datetime
+from datetime import datetime, timedelta
 
+from src.application.services.health_check_scheduler import HealthCheckScheduler
 from src.application.services.state_sync_service import StateSyncService
 from src.domain.entities.session import Session
 from src.domain.value_objects.resource_limit import ResourceLimit
 from src.domain.value_objects.execution_status import SessionStatus
 from src.domain.repositories.session_repository import ISessionRepository
 from src.infrastructure.container_scheduler.base import IContainerScheduler
+from tests.helpers import mock_session_pages
 
 
 class TestStateSyncService:
@@ -24,7 +26,7 @@ class TestStateSyncService:
         repo = Mock()
         repo.save = AsyncMock()
         repo.find_by_id = AsyncMock()
-        repo.find_by_status = AsyncMock()
+        repo.iter_by_status = mock_session_pages()
         return repo
 
     @pytest.fixture
@@ -94,11 +96,11 @@ class TestStateSyncService:
             container_id="container-2"
         )
 
-        # 使用 side_effect 区分不同参数的返回值
-        session_repo.find_by_status.side_effect = [
+        # 按调用顺序区分不同状态的查询结果
+        session_repo.iter_by_status = mock_session_pages(
             [session1],  # running 状态查询
             [session2]   # creating 状态查询
-        ]
+        )
         container_scheduler.is_container_running.return_value = True
 
         result = await service.sync_on_startup()
@@ -132,18 +134,45 @@ class TestStateSyncService:
             env_vars={"SESSION_ID": "sess_2"}
         )
 
-        session_repo.find_by_status.return_value = [session1, session2]
+        session_repo.iter_by_status = mock_session_pages([session1, session2])
 
         # 第一个健康，第二个不健康
         container_scheduler.is_container_running.side_effect = [True, False]
 
         result = await service.sync_on_startup()
 
-        # find_by_status 可能被调用多次（running 和 creating）
+        # iter_by_status 可能被调用多次（running 和 creating）
         assert result["total"] >= 2
         assert result["healthy"] >= 1
         assert result["unhealthy"] >= 1
 
+    @pytest.mark.asyncio
+    async def test_periodic_health_check_all_pages(self, service, session_repo, container_scheduler):
+        """测试健康检查遍历全部页，不受单次查询数量限制"""
+        pages = tuple(
+            [
+                Session(
+                    id=f"sess_{page}_{i}",
+                    template_id="python-basic",
+                    status=SessionStatus.RUNNING,
+                    resource_limit=ResourceLimit.default(),
+                    workspace_path=f"s3://sandbox-workspace/sessions/sess_{page}_{i}",
+                    runtime_type="docker",
+                    container_id=f"container-{page}-{i}",
+                )
+                for i in range(100)
+            ]
+            for page in range(3)
+        )
+        session_repo.iter_by_status = mock_session_pages(pages)
+        container_scheduler.is_container_running.return_value = True
+
+        result = await service.periodic_health_check()
+
+        assert result["checked"] == 300
+        assert result["healthy"] == 300
+        assert container_scheduler.is_container_running.call_count == 300
+
     @pytest.mark.asyncio
     async def test_sync_on_startup_skip_no_container(self, service, session_repo):
         """测试跳过没有 container_id 的会话"""
@@ -157,11 +186,11 @@ class TestStateSyncService:
             container_id=None  # 没有容器
         )
 
-        # 使用 side_effect 区分不同参数的返回值
-        session_repo.find_by_status.side_effect = [
+        # 按调用顺序区分不同状态的查询结果
+        session_repo.iter_by_status = mock_session_pages(
             [session],  # running 状态查询
             []         # creating 状态查询
-        ]
+        )
 
         result = await service.sync_on_startup()
 
@@ -192,7 +221,7 @@ class TestStateSyncService:
             env_vars={"SESSION_ID": "sess_2"}
         )
 
-        session_repo.find_by_status.return_value = [session1, session2]
+        session_repo.iter_by_status = mock_session_pages([session1, session2])
         container_scheduler.is_container_running.return_value = True
 
         result = await service.periodic_health_check()
@@ -214,8 +243,8 @@ class TestStateSyncService:
             container_id="container-creating"
         )
 
-        # 只调用 find_by_status("running")，不调用 "creating"
-        session_repo.find_by_status.return_value = []
+        # 只调用 iter_by_status("running")，不调用 "creating"
+        session_repo.iter_by_status = mock_session_pages([])
 
         result = await service.periodic_health_check()
 
@@ -344,7 +373,7 @@ class TestStateSyncService:
     @pytest.mark.asyncio
     async def test_sync_error_handling(self, service, session_repo):
         """测试同步过程中的错误处理"""
-        session_repo.find_by_status.side_effect = Exception("Database error")
+        session_repo.iter_by_status = mock_session_pages(Exception("Database error"))
 
         result = await service.sync_on_startup()
 
@@ -355,10 +384,130 @@ class TestStateSyncService:
     @pytest.mark.asyncio
     async def test_sync_empty_sessions(self, service, session_repo):
         """测试没有会话需要同步"""
-        session_repo.find_by_status.return_value = []
+        session_repo.iter_by_status = mock_session_pages([])
 
         result = await service.sync_on_startup()
 
         assert result["total"] == 0
         assert result["healthy"] == 0
         assert result["unhealthy"] == 0
+
+
+class TestStateSyncServiceHealthWheel:
+    """按时间轮调度的健康检查测试"""
+
+    class _Clock:
+        def __init__(self):
+            self.now = 0.0
+
+        def __call__(self):
+            return self.now
+
+    @pytest.fixture
+    def clock(self):
+        return self._Clock()
+
+    @pytest.fixture
+    def session_repo(self):
+        repo = Mock()
+        repo.save = AsyncMock()
+        repo.find_by_id = AsyncMock()
+        repo.iter_by_status = mock_session_pages()
+        return repo
+
+    @pytest.fixture
+    def container_scheduler(self):
+        scheduler = Mock()
+        scheduler.is_container_running = AsyncMock(return_value=True)
+        scheduler.create_container = AsyncMock(return_value="container-new")
+        scheduler.start_container = AsyncMock()
+        return scheduler
+
+    @pytest.fixture
+    def service(self, session_repo, container_scheduler, clock):
+        return StateSyncService(
+            session_repo=session_repo,
+            container_scheduler=container_scheduler,
+            health_check_scheduler=HealthCheckScheduler(
+                base_interval_seconds=30, min_interval_seconds=5, jitter_ratio=0, clock=clock
+            ),
+        )
+
+    @staticmethod
+    def _session(session_id: str) -> Session:
+        return Session(
+            id=session_id,
+            template_id="python-basic",
+            status=SessionStatus.RUNNING,
+            resource_limit=ResourceLimit.default(),
+            workspace_path=f"s3://sandbox-workspace/sessions/{session_id}",
+            runtime_type="docker",
+            container_id=f"container-{session_id}",
+            created_at=datetime.now() - timedelta(hours=1),
+        )
+
+    @pytest.mark.asyncio
+    async def test_checks_only_due_sessions(self, service, session_repo, container_scheduler, clock):
+        """测试每个 tick 只检查到期会话，一个基础间隔内每个会话检查一次"""
+        session_repo.iter_by_status = mock_session_pages([self._session(f"sess_{i}") for i in range(60)])
+
+        checked = []
+        for _ in range(31):
+            stats = await service.run_due_health_checks()
+            checked.append(stats["checked"])
+            clock.now += 1
+
+        assert sum(checked) == 60
+        assert max(checked) < 60
+        # 对账只在首个 tick 进行
+        session_repo.iter_by_status.assert_called_once_with("running")
+
+    @pytest.mark.asyncio
+    async def test_unhealthy_session_recovered_and_rechecked_soon(
+        self, service, session_repo, container_scheduler, clock
+    ):
+        """测试不健康会话恢复后按最短间隔复查"""
+        session = self._session("sess_1")
+        session_repo.iter_by_status = mock_session_pages([session])
+        session_repo.find_by_id.return_value = session
+        container_scheduler.is_container_running.return_value = False
+
+        await service.run_due_health_checks()
+        clock.now += 31
+        stats = await service.run_due_health_checks()
+
+        assert stats["unhealthy"] == 1
+        assert stats["recovered"] == 1
+        assert session.container_id == "container-new"
+
+        container_scheduler.is_container_running.return_value = True
+        clock.now += 5
+        stats = await service.run_due_health_checks()
+        assert stats["healthy"] == 1
+        container_scheduler.is_container_running.assert_called_with("container-new")
+
+    @pytest.mark.asyncio
+    async def test_check_error_keeps_session_scheduled(self, service, session_repo, container_scheduler, clock):
+        """测试检查出错时会话留在时间轮中并尽快复查"""
+        session_repo.iter_by_status = mock_session_pages([self._session("sess_1")])
+        container_scheduler.is_container_running.side_effect = Exception("docker timeout")
+
+        await service.run_due_health_checks()
+        clock.now += 31
+        stats = await service.run_due_health_checks()
+        assert len(stats["errors"]) == 1
+
+        container_scheduler.is_container_running.side_effect = None
+        clock.now += 5
+        stats = await service.run_due_health_checks()
+        assert stats["healthy"] == 1
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_full_scan_without_wheel(self, session_repo, container_scheduler):
+        """测试未配置调度器时退化为全量检查"""
+        service = StateSyncService(session_repo=session_repo, container_scheduler=container_scheduler)
+        session_repo.iter_by_status = mock_session_pages([self._session("sess_1")])
+
+        stats = await service.run_due_health_checks()
+
+        assert stats["checked"] == 1
@@ -0,0 +1,147 @@
+"""
+workspace 后台删除服务单元测试
+
+测试删除标记、后台删除、进度、重试与残留标记的重新删除。
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.application.services.workspace_deletion_service import (
+    WorkspaceDeletionService,
+    tombstone_path,
+)
+from src.shared.errors.infrastructure import StorageError
+
+WORKSPACE = "s3://sandbox-workspace/sessions/sess_1"
+TOMBSTONE = "s3://sandbox-workspace/.workspace-tombstones/sessions/sess_1"
+
+
+@pytest.fixture
+def storage_service():
+    storage = Mock()
+    storage.upload_file = AsyncMock()
+    storage.delete_file = AsyncMock()
+    storage.file_exists = AsyncMock(return_value=False)
+    storage.list_files = AsyncMock(return_value=[])
+    storage.delete_prefix = AsyncMock(return_value=3)
+    return storage
+
+
+@pytest.fixture
+def service(storage_service):
+    return WorkspaceDeletionService(
+        storage_service=storage_service,
+        bucket="sandbox-workspace",
+        max_concurrent=2,
+        retry_base_seconds=0,
+    )
+
+
+async def _drain(service: WorkspaceDeletionService) -> None:
+    while service._tasks:
+        await asyncio.gather(*service._tasks.values(), return_exceptions=True)
+
+
+class TestWorkspaceDeletionService:
+    """workspace 后台删除服务测试"""
+
+    def test_tombstone_path(self):
+        """测试删除标记不在 workspace 前缀下"""
+        assert tombstone_path(WORKSPACE) == TOMBSTONE
+        assert tombstone_path(WORKSPACE + "/") == TOMBSTONE
+
+    @pytest.mark.asyncio
+    async def test_schedule_deletes_in_background(self, service, storage_service):
+        """测试写入标记后立即返回，后台删除完成后移除标记"""
+        release = asyncio.Event()
+
+        async def slow_delete(prefix, on_progress=None):
+            on_progress(1000)
+            await release.wait()
+            return 1000
+
+        storage_service.delete_prefix.side_effect = slow_delete
+
+        await service.schedule(WORKSPACE)
+
+        assert storage_service.upload_file.call_args.args[0] == TOMBSTONE
+        assert await service.is_pending(WORKSPACE) is True
+        await asyncio.sleep(0)
+        assert service.progress()[0]["deleted"] == 1000
+        storage_service.delete_file.assert_not_called()
+
+        release.set()
+        await _drain(service)
+
+        storage_service.delete_prefix.assert_called_once()
+        assert storage_service.delete_prefix.call_args.args[0] == WORKSPACE + "/"
+        storage_service.delete_file.assert_called_once_with(TOMBSTONE)
+        assert service.progress() == []
+
+    @pytest.mark.asyncio
+    async def test_is_pending_checks_tombstone(self, service, storage_service):
+        """测试其他副本写入的删除标记同样生效"""
+        storage_service.file_exists.return_value = True
+
+        assert await service.is_pending(WORKSPACE) is True
+        storage_service.file_exists.assert_called_once_with(TOMBSTONE)
+
+    @pytest.mark.asyncio
+    async def test_retries_then_keeps_tombstone(self, service, storage_service):
+        """测试重试耗尽后保留删除标记"""
+        storage_service.delete_prefix.side_effect = StorageError("1 objects failed")
+
+        await service.schedule(WORKSPACE)
+        await _drain(service)
+
+        assert storage_service.delete_prefix.call_count == 3
+        storage_service.delete_file.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_retry_succeeds(self, service, storage_service):
+        """测试部分失败后重试删除剩余对象"""
+        storage_service.delete_prefix.side_effect = [StorageError("partial"), 2]
+
+        await service.schedule(WORKSPACE)
+        await _drain(service)
+
+        assert storage_service.delete_prefix.call_count == 2
+        storage_service.delete_file.assert_called_once_with(TOMBSTONE)
+
+    @pytest.mark.asyncio
+    async def test_resume_pending(self, service, storage_service):
+        """测试重新删除写入时间较早的残留标记，跳过刚写入的标记"""
+        old = datetime.now(timezone.utc) - timedelta(hours=1)
+        storage_service.list_files.return_value = [
+            {"key": ".workspace-tombstones/sessions/sess_1", "last_modified": old},
+            {"key": ".workspace-tombstones/sessions/sess_2", "last_modified": datetime.now(timezone.utc)},
+        ]
+
+        resumed = await service.resume_pending()
+        await _drain(service)
+
+        assert resumed == 1
+        storage_service.list_files.assert_called_once_with(
+            "s3://sandbox-workspace/.workspace-tombstones/", limit=0
+        )
+        storage_service.delete_prefix.assert_called_once()
+        assert storage_service.delete_prefix.call_args.args[0] == WORKSPACE + "/"
+        storage_service.delete_file.assert_called_once_with(TOMBSTONE)
+
+    @pytest.mark.asyncio
+    async def test_stop_cancels_and_keeps_tombstone(self, service, storage_service):
+        """测试停止时取消进行中的删除，标记保留"""
+        async def hang(prefix, on_progress=None):
+            await asyncio.sleep(10)
+
+        storage_service.delete_prefix.side_effect = hang
+
+        await service.schedule(WORKSPACE)
+        await asyncio.sleep(0)
+        await service.stop()
+
+        assert service.progress() == []
+        storage_service.delete_file.assert_not_called()
@@ -0,0 +1,145 @@
+"""
+workspace 文件清单服务单元测试
+
+测试清单的按需对账、超长路径回退、上传记录与定期对账。
+"""
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.application.services.workspace_manifest_service import WorkspaceManifestService
+from src.domain.entities.session import Session
+from src.domain.value_objects.execution_status import SessionStatus
+from src.domain.value_objects.resource_limit import ResourceLimit
+
+
+def _session(session_id="sess_1", status=SessionStatus.RUNNING, **kwargs) -> Session:
+    return Session(
+        id=session_id,
+        template_id="python-basic",
+        status=status,
+        resource_limit=ResourceLimit.default(),
+        workspace_path=f"s3://sandbox-workspace/sessions/{session_id}",
+        runtime_type="docker",
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def manifest_repo():
+    repo = Mock()
+    repo.get_reconciled_at = AsyncMock(return_value=None)
+    repo.list_files = AsyncMock(return_value=[])
+    repo.count_files = AsyncMock(return_value=0)
+    repo.upsert_files = AsyncMock()
+    repo.replace_files = AsyncMock()
+    repo.delete_session = AsyncMock()
+    repo.mark_stale = AsyncMock()
+    repo.find_due = AsyncMock(return_value=[])
+    repo.commit = AsyncMock()
+    return repo
+
+
+@pytest.fixture
+def storage_service():
+    storage = Mock()
+    storage.list_files = AsyncMock(return_value=[])
+    return storage
+
+
+@pytest.fixture
+def session_repo():
+    repo = Mock()
+    repo.find_by_id = AsyncMock()
+    return repo
+
+
+@pytest.fixture
+def service(manifest_repo, storage_service, session_repo):
+    return WorkspaceManifestService(manifest_repo, storage_service, session_repo)
+
+
+class TestWorkspaceManifestService:
+    """workspace 文件清单服务测试"""
+
+    @pytest.mark.asyncio
+    async def test_ensure_uses_reconciled_manifest(self, service, manifest_repo, storage_service):
+        """测试清单已对账时不列出对象存储"""
+        manifest_repo.get_reconciled_at.return_value = datetime.now(timezone.utc)
+
+        assert await service.ensure(_session(created_at=datetime.now() - timedelta(hours=1))) is True
+        storage_service.list_files.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_ensure_reconciles_missing_manifest(self, service, manifest_repo, storage_service):
+        """测试清单不存在时列出 workspace 前缀建立清单，过滤目录标记"""
+        modified = datetime(2026, 1, 2, tzinfo=timezone.utc)
+        storage_service.list_files.return_value = [
+            {"key": "sessions/sess_1/", "size": 0},
+            {"key": "sessions/sess_1/out/", "size": 0},
+            {"key": "sessions/sess_1/out/result.csv", "size": 42, "etag": "abc", "last_modified": modified},
+        ]
+
+        assert await service.ensure(_session()) is True
+
+        storage_service.list_files.assert_called_once_with("sessions/sess_1/", limit=0)
+        session_id, files, _ = manifest_repo.replace_files.call_args.args
+        assert session_id == "sess_1"
+        assert [(f.path, f.size, f.etag, f.modified_at) for f in files] == [("out/result.csv", 42, "abc", modified)]
+        manifest_repo.commit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_ensure_reconciles_manifest_older_than_session(self, service, manifest_repo, storage_service):
+        """测试同 ID 旧会话留下的清单重新对账"""
+        manifest_repo.get_reconciled_at.return_value = datetime.now(timezone.utc) - timedelta(hours=1)
+
+        assert await service.ensure(_session()) is True
+        manifest_repo.replace_files.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_ensure_skips_sessions_without_workspace(self, service, manifest_repo):
+        """测试 workspace 已删除的会话不使用清单"""
+        assert await service.ensure(_session(status=SessionStatus.TERMINATED)) is False
+        manifest_repo.get_reconciled_at.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_long_paths_disable_manifest(self, service, manifest_repo, storage_service):
+        """测试存在超长路径时删除清单并回退"""
+        storage_service.list_files.return_value = [{"key": "sessions/sess_1/" + "a" * 600, "size": 1}]
+
+        assert await service.ensure(_session()) is False
+        manifest_repo.replace_files.assert_not_called()
+        manifest_repo.delete_session.assert_called_once_with("sess_1")
+
+    @pytest.mark.asyncio
+    async def test_record_upload(self, service, manifest_repo):
+        """测试上传写入清单，写入失败不抛出并标记清单过期"""
+        await service.record_upload("sess_1", "data/in.csv", 10)
+
+        (session_id, files), _ = manifest_repo.upsert_files.call_args
+        assert session_id == "sess_1"
+        assert (files[0].path, files[0].size) == ("data/in.csv", 10)
+        manifest_repo.commit.assert_called_once()
+
+        manifest_repo.upsert_files.side_effect = RuntimeError("db down")
+        await service.record_upload("sess_1", "data/in.csv", 10)
+        manifest_repo.mark_stale.assert_called_once_with(["sess_1"])
+
+    @pytest.mark.asyncio
+    async def test_reconcile_due(self, service, manifest_repo, session_repo, storage_service):
+        """测试定期对账：运行中的会话重新对账，已终止或不存在的会话删除清单"""
+        manifest_repo.find_due.return_value = ["sess_1", "sess_2", "sess_3", "sess_4"]
+        sessions = {
+            "sess_1": _session("sess_1"),
+            "sess_2": _session("sess_2", status=SessionStatus.TERMINATED),
+            "sess_4": _session("sess_4", status=SessionStatus.HIBERNATED),
+        }
+        session_repo.find_by_id.side_effect = lambda session_id: sessions.get(session_id)
+        storage_service.list_files.side_effect = [[], RuntimeError("s3 down")]
+
+        stats = await service.reconcile_due(interval_seconds=300, batch_size=50)
+
+        assert stats == {"reconciled": 1, "forgotten": 2, "failed": 1}
+        assert manifest_repo.find_due.call_args.args[1] == 50
+        assert [c.args[0] for c in manifest_repo.delete_session.call_args_list] == ["sess_2", "sess_3"]
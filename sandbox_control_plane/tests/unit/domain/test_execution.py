@@ -29,6 +29,27 @@ class TestExecution:
         assert execution.state.status == ExecutionStatus.PENDING
         assert execution.is_running() is False
 
+    def test_create_execution_without_payload(self):
+        """测试状态查询加载的实体允许代码为空"""
+        execution = Execution(
+            id="exec_20240115_abc123",
+            session_id="sess_20240115_xyz789",
+            code="",
+            language="python",
+            state=ExecutionState(status=ExecutionStatus.RUNNING),
+            payload_loaded=False,
+        )
+
+        assert execution.payload_loaded is False
+        with pytest.raises(ValueError):
+            Execution(
+                id="exec_20240115_abc123",
+                session_id="sess_20240115_xyz789",
+                code="",
+                language="python",
+                state=ExecutionState(status=ExecutionStatus.RUNNING),
+            )
+
     def test_mark_running(self):
         """测试标记为运行中"""
         execution = Execution(
@@ -0,0 +1,39 @@
+"""
+分页游标值对象单元测试
+
+测试 PageCursor 值对象的编码与解码。
+"""
+import pytest
+
+from src.domain.value_objects.page_cursor import PageCursor
+
+
+class TestPageCursor:
+    """分页游标值对象测试"""
+
+    def test_encode_decode_roundtrip(self):
+        """测试编码后可以还原"""
+        cursor = PageCursor(created_at_ms=1700000000123, id="sess_abc:123")
+
+        assert PageCursor.decode(cursor.encode()) == cursor
+
+    def test_encoded_is_url_safe(self):
+        """测试编码结果可直接放入 URL"""
+        encoded = PageCursor(created_at_ms=1700000000123, id="sess/??").encode()
+
+        assert "=" not in encoded
+        assert "/" not in encoded
+        assert "+" not in encoded
+
+    @pytest.mark.parametrize("value", ["", "not-base64!", "Zm9v", "YWJjOmRlZg"])
+    def test_decode_invalid(self, value):
+        """测试无效游标"""
+        with pytest.raises(ValueError, match="invalid cursor"):
+            PageCursor.decode(value)
+
+    def test_invalid_fields(self):
+        """测试字段校验"""
+        with pytest.raises(ValueError):
+            PageCursor(created_at_ms=-1, id="sess_1")
+        with pytest.raises(ValueError):
+            PageCursor(created_at_ms=0, id="")
@@ -380,6 +380,120 @@ class TestSession:
         assert len(running) == 1
         assert running[0].id == "exec_1"
 
+    def test_hibernate_and_restore(self):
+        """测试休眠释放容器并从休眠恢复"""
+        session = Session(
+            id="sess_20240115_abc123",
+            template_id="python-datascience",
+            status=SessionStatus.RUNNING,
+            resource_limit=ResourceLimit.default(),
+            workspace_path="s3://sandbox-workspace/sessions/sess_20240115_abc123",
+            runtime_type="docker",
+            runtime_node="node-1",
+            container_id="container-old",
+        )
+
+        session.mark_as_hibernating()
+
+        assert session.is_hibernating() is True
+        assert session.is_active() is False
+        assert session.container_id == "container-old"
+
+        session.mark_as_hibernated()
+
+        assert session.is_hibernated() is True
+        assert session.is_active() is False
+        assert session.container_id is None
+
+        session.mark_as_restoring("node-2", "container-new")
+
+        assert session.status == SessionStatus.CREATING
+        assert session.container_id == "container-new"
+        assert session.runtime_node == "node-2"
+
+    def test_abort_restore(self):
+        """测试恢复失败时回到休眠状态"""
+        session = Session(
+            id="sess_20240115_abc123",
+            template_id="python-datascience",
+            status=SessionStatus.HIBERNATED,
+            resource_limit=ResourceLimit.default(),
+            workspace_path="s3://sandbox-workspace/sessions/sess_20240115_abc123",
+            runtime_type="docker",
+        )
+        session.mark_as_restoring("node-2")
+        session.container_id = "container-new"
+
+        session.abort_restore()
+
+        assert session.is_hibernated() is True
+        assert session.container_id is None
+        assert session.runtime_node is None
+        with pytest.raises(ValueError):
+            session.abort_restore()
+
+    def test_hibernate_requires_running(self):
+        """测试只有运行中的会话可以休眠"""
+        session = Session(
+            id="sess_20240115_abc123",
+            template_id="python-datascience",
+            status=SessionStatus.CREATING,
+            resource_limit=ResourceLimit.default(),
+            workspace_path="s3://sandbox-workspace/sessions/sess_20240115_abc123",
+            runtime_type="docker",
+        )
+
+        with pytest.raises(ValueError):
+            session.mark_as_hibernating()
+        with pytest.raises(ValueError):
+            session.mark_as_hibernated()
+
+    def test_abort_hibernation(self):
+        """测试休眠失败时回到运行中并保留容器"""
+        session = Session(
+            id="sess_20240115_abc123",
+            template_id="python-datascience",
+            status=SessionStatus.RUNNING,
+            resource_limit=ResourceLimit.default(),
+            workspace_path="s3://sandbox-workspace/sessions/sess_20240115_abc123",
+            runtime_type="docker",
+            runtime_node="node-1",
+            container_id="container-old",
+        )
+        session.mark_as_hibernating()
+
+        session.abort_hibernation()
+
+        assert session.status == SessionStatus.RUNNING
+        assert session.container_id == "container-old"
+        with pytest.raises(ValueError):
+            session.abort_hibernation()
+
+    def test_dirty_fields_tracking(self):
+        """测试字段变更跟踪"""
+        session = Session(
+            id="sess_20240115_abc123",
+            template_id="python-datascience",
+            status=SessionStatus.CREATING,
+            resource_limit=ResourceLimit.default(),
+            workspace_path="s3://sandbox-workspace/sessions/sess_20240115_abc123",
+            runtime_type="docker",
+        )
+
+        assert session.dirty_fields == set()
+        assert session.persisted_status is None
+
+        session.mark_persisted()
+        session.mark_as_running("node-1", "container-1")
+
+        assert {"status", "runtime_node", "container_id", "updated_at"} <= session.dirty_fields
+        assert session.persisted_status == SessionStatus.CREATING
+
+        session.mark_persisted()
+
+        assert session.dirty_fields == set()
+        assert session.persisted_status == SessionStatus.RUNNING
+
 
 class TestInstalledDependency:
     """已安装依赖测试"""
@@ -8,6 +8,8 @@ import asyncio
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
 from datetime import datetime
 
+from aiodocker.exceptions import DockerError
+
 from src.infrastructure.container_scheduler.docker_scheduler import DockerScheduler
 from src.infrastructure.container_scheduler.base import ContainerConfig, ContainerInfo
 
@@ -181,6 +183,38 @@ class TestDockerScheduler:
 
         mock_container.delete.assert_called_once_with(force=True)
 
+    @pytest.mark.asyncio
+    async def test_remove_container_errors(self, scheduler, mock_docker):
+        """测试容器不存在视为已删除，其他错误抛出供调用方重试"""
+        mock_container = Mock()
+        containers_mock = Mock()
+        containers_mock.container = Mock(return_value=mock_container)
+        mock_docker.containers = containers_mock
+
+        mock_container.delete = AsyncMock(side_effect=DockerError(404, {"message": "No such container"}))
+        await scheduler.remove_container("container-123")
+
+        mock_container.delete = AsyncMock(side_effect=DockerError(500, {"message": "device busy"}))
+        with pytest.raises(DockerError):
+            await scheduler.remove_container("container-123")
+
+    @pytest.mark.asyncio
+    async def test_pause_and_unpause_container(self, scheduler, mock_docker):
+        """测试暂停与恢复容器"""
+        mock_container = Mock()
+        mock_container.pause = AsyncMock()
+        mock_container.unpause = AsyncMock()
+
+        containers_mock = Mock()
+        containers_mock.container = Mock(return_value=mock_container)
+        mock_docker.containers = containers_mock
+
+        await scheduler.pause_container("container-123")
+        await scheduler.unpause_container("container-123")
+
+        mock_container.pause.assert_called_once()
+        mock_container.unpause.assert_called_once()
+
     @pytest.mark.asyncio
     async def test_get_container_status_running(self, scheduler, mock_docker):
         """测试获取运行中容器状态"""
@@ -633,3 +667,44 @@ class TestDockerScheduler:
         container_config = call_args[0][0]
         assert "DEBUG=true" in container_config["Env"]
         assert "API_KEY=secret" in container_config["Env"]
+
+    @staticmethod
+    def _mock_exec(mock_docker, inspect_results):
+        """模拟 docker exec：输出流立即结束，inspect 依次返回 inspect_results"""
+        stream = MagicMock()
+        stream.read_out = AsyncMock(return_value=None)
+        stream.__aenter__ = AsyncMock(return_value=stream)
+        stream.__aexit__ = AsyncMock(return_value=False)
+        exec_instance = Mock()
+        exec_instance.start.return_value = stream
+        exec_instance.inspect = AsyncMock(side_effect=inspect_results)
+        container = Mock()
+        container.exec = AsyncMock(return_value=exec_instance)
+        mock_docker.containers.container.return_value = container
+        return exec_instance
+
+    @pytest.mark.asyncio
+    async def test_exec_command_waits_for_exit_code(self, scheduler, mock_docker):
+        """测试输出流结束时 exec 仍在运行，轮询到退出后再取退出码"""
+        exec_instance = self._mock_exec(mock_docker, [
+            {"Running": True, "ExitCode": None},
+            {"Running": False, "ExitCode": 2},
+        ])
+
+        with patch("src.infrastructure.container_scheduler.docker_scheduler.EXEC_EXIT_POLL_INTERVAL_SECONDS", 0):
+            result = await scheduler.exec_command("container-1", ["tar", "czf", "-", "/opt/sandbox-venv"])
+
+        assert result.exit_code == 2
+        assert result.status == "failed"
+        assert exec_instance.inspect.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_exec_command_missing_exit_code_is_failure(self, scheduler, mock_docker):
+        """测试取不到退出码时视为失败，而不是成功"""
+        self._mock_exec(mock_docker, [{"Running": False, "ExitCode": None}])
+
+        result = await scheduler.exec_command("container-1", ["true"])
+
+        assert result.status == "failed"
+        assert result.exit_code != 0
+
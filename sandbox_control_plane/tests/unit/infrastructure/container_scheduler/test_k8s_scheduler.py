@@ -8,6 +8,8 @@ import asyncio
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
 from datetime import datetime, timezone
 
+from kubernetes.client.rest import ApiException
+
 from src.infrastructure.container_scheduler.k8s_scheduler import K8sScheduler
 from src.infrastructure.container_scheduler.base import ContainerConfig
 
@@ -210,6 +212,16 @@ class TestK8sScheduler:
         call_args = mock_core_v1.delete_namespaced_pod.call_args
         assert call_args[1]["grace_period_seconds"] == 0
 
+    @pytest.mark.asyncio
+    async def test_remove_container_errors(self, scheduler, mock_core_v1):
+        """测试 Pod 不存在视为已删除，其他错误抛出供调用方重试"""
+        mock_core_v1.delete_namespaced_pod.side_effect = ApiException(status=404)
+        await scheduler.remove_container("test-pod")
+
+        mock_core_v1.delete_namespaced_pod.side_effect = ApiException(status=500)
+        with pytest.raises(ApiException):
+            await scheduler.remove_container("test-pod")
+
     @pytest.mark.asyncio
     async def test_get_container_status_running(self, scheduler, mock_core_v1):
         """测试获取运行中 Pod 状态"""
@@ -0,0 +1,91 @@
+"""
+执行分发者单元测试
+
+测试 ExecutionDispatcher 的唤醒、排空与异常隔离。
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.infrastructure.messaging.execution_dispatcher import ExecutionDispatcher, record_queue_stats
+from src.infrastructure.metrics import (
+    EXECUTION_DISPATCH_OLDEST_AGE_SECONDS,
+    EXECUTION_DISPATCH_QUEUE_DEPTH,
+)
+
+
+def _queue_pass(queue: list, calls: list):
+    """每轮认领队列中的一个条目"""
+    async def run_pass():
+        calls.append(len(queue))
+        if not queue:
+            return {"claimed": 0}
+        queue.pop(0)
+        return {"claimed": 1, "delivered": 1, "lag_seconds": [0.01]}
+    return run_pass
+
+
+class TestExecutionDispatcher:
+    """执行分发者测试"""
+
+    @pytest.mark.asyncio
+    async def test_drains_queue_without_waiting(self):
+        """测试认领到条目时立即进入下一轮"""
+        queue, calls = ["exec_1", "exec_2", "exec_3"], []
+        dispatcher = ExecutionDispatcher(_queue_pass(queue, calls), workers=1, poll_interval_ms=10_000)
+
+        dispatcher.start()
+        await asyncio.sleep(0.05)
+        await dispatcher.stop()
+
+        assert queue == []
+        assert calls == [3, 2, 1, 0]
+
+    @pytest.mark.asyncio
+    async def test_notify_wakes_idle_worker(self):
+        """测试 notify() 唤醒空闲的分发循环，无需等待轮询间隔"""
+        queue, calls = [], []
+        dispatcher = ExecutionDispatcher(_queue_pass(queue, calls), workers=1, poll_interval_ms=10_000)
+
+        dispatcher.start()
+        await asyncio.sleep(0.01)
+        queue.append("exec_1")
+        dispatcher.notify()
+        await asyncio.sleep(0.05)
+        await dispatcher.stop()
+
+        assert queue == []
+
+    @pytest.mark.asyncio
+    async def test_failed_pass_does_not_stop_worker(self):
+        """测试单轮异常后分发循环继续"""
+        attempts = []
+
+        async def run_pass():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("database unavailable")
+            return {"claimed": 0}
+
+        dispatcher = ExecutionDispatcher(run_pass, workers=1, poll_interval_ms=10)
+        dispatcher.start()
+        await asyncio.sleep(0.05)
+        await dispatcher.stop()
+
+        assert len(attempts) >= 2
+        assert not dispatcher.running
+
+    def test_record_queue_stats(self):
+        """测试队列统计写入指标"""
+        now = datetime.now()
+        record_queue_stats(
+            {"depth": 7, "oldest_enqueued_at": now - timedelta(seconds=30)},
+            now=now.timestamp(),
+        )
+
+        assert EXECUTION_DISPATCH_QUEUE_DEPTH._value.get() == 7
+        assert EXECUTION_DISPATCH_OLDEST_AGE_SECONDS._value.get() == pytest.approx(30)
+
+        record_queue_stats({"depth": 0, "oldest_enqueued_at": None})
+        assert EXECUTION_DISPATCH_OLDEST_AGE_SECONDS._value.get() == 0
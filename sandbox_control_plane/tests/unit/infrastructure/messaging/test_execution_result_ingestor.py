@@ -0,0 +1,254 @@
+"""
+执行结果摄取队列单元测试
+
+测试 ExecutionResultIngestor 的合并写入、结果日志、失败重试与等待者唤醒。
+"""
+import asyncio
+import json
+
+import pytest
+from unittest.mock import AsyncMock
+
+from src.application.commands.report_execution_result import ReportExecutionResultCommand
+from src.application.services.execution_result_service import ResultOutcome
+from src.infrastructure.messaging.execution_result_ingestor import ExecutionResultIngestor
+from src.infrastructure.messaging.result_journal import ResultJournal
+
+
+def _command(execution_id: str) -> ReportExecutionResultCommand:
+    return ReportExecutionResultCommand(
+        execution_id=execution_id,
+        status="success",
+        exit_code=0,
+        execution_time=0.1,
+        stdout="ok\n",
+    )
+
+
+def _recording_processor(outcome=ResultOutcome.RECORDED):
+    return AsyncMock(side_effect=lambda commands: [outcome] * len(commands))
+
+
+class TestExecutionResultIngestor:
+    """执行结果摄取队列测试"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_results_share_one_batch(self):
+        """测试同时到达的结果合并为一批，回调得到各自的处理结果"""
+        processor = _recording_processor()
+        ingestor = ExecutionResultIngestor(processor=processor, linger_ms=5)
+        await ingestor.start()
+
+        outcomes = await asyncio.gather(*(ingestor.submit(_command(f"exec_{i}")) for i in range(10)))
+        await ingestor.stop()
+
+        assert outcomes == [ResultOutcome.RECORDED] * 10
+        processor.assert_called_once()
+        assert len(processor.call_args[0][0]) == 10
+
+    @pytest.mark.asyncio
+    async def test_submit_after_stop_is_processed_inline(self):
+        """测试停止后到达的结果直接处理，不会等待已退出的批处理循环"""
+        processor = _recording_processor()
+        ingestor = ExecutionResultIngestor(processor=processor, linger_ms=5)
+        await ingestor.start()
+        await ingestor.stop()
+
+        outcome = await asyncio.wait_for(ingestor.submit(_command("exec_late")), timeout=1)
+
+        assert outcome == ResultOutcome.RECORDED
+        processor.assert_called_once()
+        assert processor.call_args[0][0][0].execution_id == "exec_late"
+
+    @pytest.mark.asyncio
+    async def test_submit_after_stop_with_journal_is_processed_inline(self, tmp_path):
+        """测试配置结果日志时，停止（日志已关闭）后到达的结果同样直接处理"""
+        processor = _recording_processor()
+        journal = ResultJournal(str(tmp_path / "results.jsonl"))
+        ingestor = ExecutionResultIngestor(processor=processor, journal=journal)
+        await ingestor.start()
+        await ingestor.stop()
+
+        outcome = await asyncio.wait_for(ingestor.submit(_command("exec_late")), timeout=1)
+
+        assert outcome == ResultOutcome.RECORDED
+        processor.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_batches_are_bounded(self):
+        """测试单批不超过 max_batch"""
+        processor = _recording_processor()
+        ingestor = ExecutionResultIngestor(processor=processor, linger_ms=5, max_batch=4)
+        await ingestor.start()
+
+        await asyncio.gather(*(ingestor.submit(_command(f"exec_{i}")) for i in range(10)))
+        await ingestor.stop()
+
+        assert [len(call.args[0]) for call in processor.call_args_list] == [4, 4, 2]
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_falls_back_to_single_results(self):
+        """测试整批失败时逐条重试，只有出错的结果失败"""
+
+        async def processor(commands):
+            if any(c.execution_id == "exec_bad" for c in commands):
+                raise RuntimeError("db error")
+            return [ResultOutcome.RECORDED] * len(commands)
+
+        ingestor = ExecutionResultIngestor(processor=processor, linger_ms=5)
+        await ingestor.start()
+
+        results = await asyncio.gather(
+            ingestor.submit(_command("exec_good")),
+            ingestor.submit(_command("exec_bad")),
+            return_exceptions=True,
+        )
+        await ingestor.stop()
+
+        assert results[0] == ResultOutcome.RECORDED
+        assert isinstance(results[1], RuntimeError)
+
+    @pytest.mark.asyncio
+    async def test_waiters_woken_after_commit(self):
+        """测试提交后唤醒等待该执行的请求"""
+        committed = asyncio.Event()
+
+        async def processor(commands):
+            committed.set()
+            return [ResultOutcome.RECORDED] * len(commands)
+
+        ingestor = ExecutionResultIngestor(processor=processor, linger_ms=1)
+        await ingestor.start()
+
+        waiter = asyncio.create_task(ingestor.wait_for_result("exec_1", timeout=5))
+        await asyncio.sleep(0)
+        await ingestor.submit(_command("exec_1"))
+
+        assert await waiter is True
+        assert committed.is_set()
+        assert await ingestor.wait_for_result("exec_1", timeout=0.01) is False
+        assert ingestor._waiters == {}
+        await ingestor.stop()
+
+    @pytest.mark.asyncio
+    async def test_journaled_result_is_accepted_before_commit(self, tmp_path):
+        """测试配置结果日志时落盘即返回，提交后日志清空"""
+        release = asyncio.Event()
+
+        async def processor(commands):
+            await release.wait()
+            return [ResultOutcome.RECORDED] * len(commands)
+
+        journal = ResultJournal(str(tmp_path / "results.jsonl"))
+        ingestor = ExecutionResultIngestor(processor=processor, journal=journal, linger_ms=1)
+        await ingestor.start()
+
+        assert await ingestor.submit(_command("exec_1")) is None
+        assert [r["execution_id"] for r in journal.replay()] == ["exec_1"]
+
+        release.set()
+        await ingestor.stop()
+        assert journal.size() == 0
+
+    @pytest.mark.asyncio
+    async def test_journal_replayed_on_start(self, tmp_path):
+        """测试启动时重放上次未提交的结果"""
+        journal = ResultJournal(str(tmp_path / "results.jsonl"))
+        await journal.append(_command("exec_1").to_dict())
+        await journal.append(_command("exec_2").to_dict())
+        with open(journal.path, "ab") as f:
+            f.write(b'{"execution_id": "exec_3", "sta')
+
+        processor = _recording_processor()
+        ingestor = ExecutionResultIngestor(processor=processor, journal=journal, linger_ms=1)
+        await ingestor.start()
+        await ingestor.stop()
+
+        assert [c.execution_id for c in processor.call_args[0][0]] == ["exec_1", "exec_2"]
+        assert journal.size() == 0
+
+    @pytest.mark.asyncio
+    async def test_journaled_result_retried_until_committed(self, tmp_path):
+        """测试已落盘结果提交失败后重试，期间保留在日志中"""
+        processor = AsyncMock(side_effect=[RuntimeError("db down"), [ResultOutcome.RECORDED]])
+        journal = ResultJournal(str(tmp_path / "results.jsonl"))
+        ingestor = ExecutionResultIngestor(
+            processor=processor,
+            journal=journal,
+            linger_ms=1,
+            retry_delay_seconds=0.01,
+        )
+        await ingestor.start()
+
+        await ingestor.submit(_command("exec_1"))
+        waited = await ingestor.wait_for_result("exec_1", timeout=5)
+        await ingestor.stop()
+
+        assert waited is True
+        assert processor.call_count == 2
+        assert journal.size() == 0
+
+    @pytest.mark.asyncio
+    async def test_dropped_result_is_dead_lettered(self, tmp_path):
+        """测试超过最大尝试次数的结果写入死信文件并从日志移除"""
+        processor = AsyncMock(side_effect=RuntimeError("db down"))
+        journal = ResultJournal(str(tmp_path / "results.jsonl"))
+        ingestor = ExecutionResultIngestor(
+            processor=processor,
+            journal=journal,
+            linger_ms=1,
+            retry_delay_seconds=0.01,
+            max_attempts=2,
+        )
+        await ingestor.start()
+
+        await ingestor.submit(_command("exec_1"))
+        dead_letter_path = tmp_path / "results.jsonl.dead"
+        for _ in range(100):
+            if dead_letter_path.exists():
+                break
+            await asyncio.sleep(0.01)
+        await ingestor.stop()
+
+        entries = [json.loads(line) for line in dead_letter_path.read_text().splitlines()]
+        assert processor.call_count == 2
+        assert [(e["record"]["execution_id"], e["attempts"], e["error"]) for e in entries] == [
+            ("exec_1", 2, "db down")
+        ]
+        assert ingestor._journaled == {}
+
+
+class TestResultJournal:
+    """结果日志槽位测试"""
+
+    @pytest.mark.asyncio
+    async def test_processes_sharing_a_path_use_separate_slots(self, tmp_path):
+        """测试共用同一路径的日志各自占用槽位，重写互不覆盖"""
+        first = ResultJournal(str(tmp_path / "results.jsonl"))
+        second = ResultJournal(str(tmp_path / "results.jsonl"))
+
+        await first.append({"execution_id": "exec_1"})
+        await second.append({"execution_id": "exec_2"})
+        await first.rewrite([])
+
+        assert first.path == tmp_path / "results.jsonl"
+        assert second.path == tmp_path / "results.jsonl.1"
+        assert [r["execution_id"] for r in second.replay()] == ["exec_2"]
+        first.close()
+        second.close()
+
+    @pytest.mark.asyncio
+    async def test_orphaned_slots_are_adopted(self, tmp_path):
+        """测试无人占用的槽位在其他进程占用槽位时并入其日志"""
+        first = ResultJournal(str(tmp_path / "results.jsonl"))
+        second = ResultJournal(str(tmp_path / "results.jsonl"))
+        await first.append({"execution_id": "exec_1"})
+        await second.append({"execution_id": "exec_2"})
+        first.close()
+        second.close()
+
+        restarted = ResultJournal(str(tmp_path / "results.jsonl"))
+
+        assert [r["execution_id"] for r in restarted.replay()] == ["exec_1", "exec_2"]
+        assert not (tmp_path / "results.jsonl.1").exists()
+        restarted.close()
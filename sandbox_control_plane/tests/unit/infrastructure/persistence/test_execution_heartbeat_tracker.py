@@ -0,0 +1,80 @@
+"""
+执行心跳跟踪器单元测试
+
+测试 ExecutionHeartbeatTracker 的合并、分批写回、失败重试与过期清理。
+"""
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+
+from src.infrastructure.persistence.execution_heartbeat_tracker import ExecutionHeartbeatTracker
+
+
+class TestExecutionHeartbeatTracker:
+    """执行心跳跟踪器测试"""
+
+    def test_beat_keeps_latest(self):
+        """测试同一执行只保留最新心跳，且不写库"""
+        writer = AsyncMock()
+        tracker = ExecutionHeartbeatTracker(writer=writer)
+        now = datetime.now()
+
+        tracker.beat("exec_1", now)
+        tracker.beat("exec_1", now - timedelta(seconds=5))
+        tracker.beat("exec_2", now)
+
+        assert tracker.pending_count == 2
+        assert tracker.last_seen("exec_1") == now
+        assert tracker.last_seen("exec_3") is None
+        writer.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_flush_in_bounded_batches(self):
+        """测试按 max_batch 分批写回，写回后仍保留最后心跳供检测使用"""
+        writer = AsyncMock(side_effect=lambda batch: len(batch))
+        tracker = ExecutionHeartbeatTracker(writer=writer, max_batch=2)
+        for i in range(5):
+            tracker.beat(f"exec_{i}")
+
+        flushed = await tracker.flush()
+
+        assert flushed == 5
+        assert [len(call.args[0]) for call in writer.call_args_list] == [2, 2, 1]
+        assert tracker.pending_count == 0
+        assert tracker.last_seen("exec_0") is not None
+
+    @pytest.mark.asyncio
+    async def test_flush_failure_restores_batch(self):
+        """测试写回失败时保留心跳等待下次写回，且不覆盖更新的心跳"""
+        now = datetime.now()
+        tracker = ExecutionHeartbeatTracker(writer=AsyncMock(side_effect=Exception("db down")))
+        tracker.beat("exec_1", now - timedelta(seconds=10))
+
+        assert await tracker.flush() == 0
+        assert tracker._pending == {"exec_1": now - timedelta(seconds=10)}
+
+        tracker.beat("exec_1", now)
+        tracker._restore({"exec_1": now - timedelta(seconds=10)})
+        assert tracker._pending["exec_1"] == now
+
+    @pytest.mark.asyncio
+    async def test_flush_prunes_old_heartbeats(self):
+        """测试写回时清理超过保留时长的最后心跳"""
+        tracker = ExecutionHeartbeatTracker(writer=AsyncMock(), retention_seconds=60)
+        tracker.beat("exec_old", datetime.now() - timedelta(seconds=120))
+        tracker.beat("exec_new")
+
+        await tracker.flush()
+
+        assert tracker.last_seen("exec_old") is None
+        assert tracker.last_seen("exec_new") is not None
+
+    def test_forget(self):
+        """测试停止跟踪已崩溃的执行"""
+        tracker = ExecutionHeartbeatTracker(writer=AsyncMock())
+        tracker.beat("exec_1")
+
+        tracker.forget(["exec_1"])
+
+        assert tracker.pending_count == 0
+        assert tracker.last_seen("exec_1") is None
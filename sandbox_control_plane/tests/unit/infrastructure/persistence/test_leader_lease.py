@@ -0,0 +1,63 @@
+"""
+主节点租约单元测试
+
+在 SQLite 上测试租约的获取、续约、过期接管与释放。
+"""
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from src.infrastructure.persistence.database import Base
+from src.infrastructure.persistence.leader_lease import (
+    BACKGROUND_TASKS_LEASE,
+    release_lease,
+    try_acquire_lease,
+)
+from src.infrastructure.persistence.models.leader_lease_model import LeaderLeaseModel
+
+
+class TestLeaderLease:
+    """主节点租约测试"""
+
+    @pytest.fixture
+    async def session_factory(self):
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        yield async_sessionmaker(engine)
+        await engine.dispose()
+
+    async def _acquire(self, session_factory, holder: str) -> bool:
+        async with session_factory() as session:
+            acquired = await try_acquire_lease(session, BACKGROUND_TASKS_LEASE, holder, 30)
+            await session.commit()
+            return acquired
+
+    @pytest.mark.asyncio
+    async def test_single_holder_until_expiry(self, session_factory):
+        """测试租约有效期内只有持有者能续约，过期后其他进程接管"""
+        assert await self._acquire(session_factory, "pod-a") is True
+        assert await self._acquire(session_factory, "pod-b") is False
+        assert await self._acquire(session_factory, "pod-a") is True
+
+        async with session_factory() as session:
+            await session.execute(update(LeaderLeaseModel).values(f_lease_until=1))
+            await session.commit()
+
+        assert await self._acquire(session_factory, "pod-b") is True
+        assert await self._acquire(session_factory, "pod-a") is False
+
+    @pytest.mark.asyncio
+    async def test_release_allows_immediate_takeover(self, session_factory):
+        """测试释放后其他进程立即接管，非持有者的释放不生效"""
+        await self._acquire(session_factory, "pod-a")
+
+        async with session_factory() as session:
+            await release_lease(session, BACKGROUND_TASKS_LEASE, "pod-b")
+            await session.commit()
+        assert await self._acquire(session_factory, "pod-b") is False
+
+        async with session_factory() as session:
+            await release_lease(session, BACKGROUND_TASKS_LEASE, "pod-a")
+            await session.commit()
+        assert await self._acquire(session_factory, "pod-b") is True
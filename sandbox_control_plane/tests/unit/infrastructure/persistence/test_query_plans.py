@@ -0,0 +1,205 @@
+"""
+查询计划回归测试
+
+对每个仓储查询执行真实 SQL 并 EXPLAIN，确认热点表上的查询都能命中索引，
+不会随着数据量增长退化为全表扫描。另外校验 ORM 声明的索引在 MariaDB 与
+DM8 迁移脚本中都存在，保证线上库与测试用的 schema 一致。
+"""
+import re
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from src.domain.entities.execution import Execution
+from src.domain.entities.session import Session
+from src.domain.value_objects.execution_status import ExecutionState, ExecutionStatus, SessionStatus
+from src.domain.value_objects.page_cursor import PageCursor
+from src.domain.value_objects.resource_limit import ResourceLimit
+from src.infrastructure.persistence.database import Base
+from src.infrastructure.persistence.repositories.sql_execution_repository import SqlExecutionRepository
+from src.infrastructure.persistence.repositories.sql_runtime_node_repository import SqlRuntimeNodeRepository
+from src.infrastructure.persistence.repositories.sql_session_repository import SqlSessionRepository
+from src.infrastructure.persistence.repositories.sql_template_repository import SqlTemplateRepository
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[5] / "migrations"
+LATEST_MIGRATION = "0.4.0"
+
+# 随数据量增长的表，禁止全表扫描与额外排序
+HOT_TABLES = {
+    "t_sandbox_session",
+    "t_sandbox_execution",
+    "t_sandbox_execution_payload",
+    "t_sandbox_execution_archive",
+}
+
+CURSOR = PageCursor(created_at_ms=1700000000000, id="sess_cursor")
+RESULT = Execution(
+    id="exec_1",
+    session_id="sess_1",
+    code="print(1)",
+    language="python",
+    state=ExecutionState(status=ExecutionStatus.COMPLETED, exit_code=0),
+    stdout="1\n",
+)
+
+async def _first_page(pages):
+    async for page in pages:
+        return page
+
+
+async def _iter_past_first_page(r):
+    """写入一个会话后按单条分页遍历，使第二次查询带上键集条件"""
+    await r.sessions.save(Session(
+        id="sess_1",
+        template_id="tpl_1",
+        status=SessionStatus.RUNNING,
+        resource_limit=ResourceLimit.default(),
+        workspace_path="s3://bucket/sessions/sess_1",
+        runtime_type="docker",
+    ))
+    async for _ in r.sessions.iter_by_status("running", page_size=1):
+        pass
+
+
+# (名称, 查询调用, 期望命中的索引或索引名前缀；None 表示只要求不全表扫描)
+QUERY_CASES = [
+    ("session.find_by_id", lambda r: r.sessions.find_by_id("sess_1"), None),
+    ("session.find_by_container_id", lambda r: r.sessions.find_by_container_id("c1"),
+     "t_sandbox_session_idx_container_id"),
+    ("session.find_by_status", lambda r: r.sessions.find_by_status("running"),
+     "t_sandbox_session_idx_status_"),
+    ("session.iter_by_status", lambda r: _first_page(r.sessions.iter_by_status("running")),
+     "t_sandbox_session_idx_status_created_at"),
+    ("session.iter_by_status(after)", _iter_past_first_page,
+     "t_sandbox_session_idx_status_created_at"),
+    ("session.find_by_template", lambda r: r.sessions.find_by_template("tpl_1"),
+     "t_sandbox_session_idx_template_created_at"),
+    ("session.find_idle_sessions", lambda r: r.sessions.find_idle_sessions(datetime(2024, 1, 1)),
+     "t_sandbox_session_idx_status_last_activity_at"),
+    ("session.find_expired_sessions", lambda r: r.sessions.find_expired_sessions(datetime(2024, 1, 1)),
+     "t_sandbox_session_idx_status_created_at"),
+    ("session.count_by_status", lambda r: r.sessions.count_by_status("running"),
+     "t_sandbox_session_idx_status_"),
+    ("session.count_by_node", lambda r: r.sessions.count_by_node("node-1"),
+     "t_sandbox_session_idx_runtime_node_status"),
+    ("session.find_sessions", lambda r: r.sessions.find_sessions(limit=50),
+     "t_sandbox_session_idx_created_at_id"),
+    ("session.find_sessions(after)", lambda r: r.sessions.find_sessions(limit=50, after=CURSOR),
+     "t_sandbox_session_idx_created_at_id"),
+    ("session.find_sessions(status)", lambda r: r.sessions.find_sessions(status="running", after=CURSOR),
+     "t_sandbox_session_idx_status_created_at"),
+    ("session.find_sessions(template)", lambda r: r.sessions.find_sessions(template_id="tpl_1", after=CURSOR),
+     "t_sandbox_session_idx_template_created_at"),
+    ("session.count_sessions(status)", lambda r: r.sessions.count_sessions(status="running"),
+     "t_sandbox_session_idx_status_"),
+    ("session.exists", lambda r: r.sessions.exists("sess_1"), None),
+    ("execution.find_by_id", lambda r: r.executions.find_by_id("exec_1"), None),
+    ("execution.find_by_id(status)", lambda r: r.executions.find_by_id("exec_1", include_payload=False), None),
+    ("execution.find_by_ids", lambda r: r.executions.find_by_ids(["exec_1", "exec_2"]), None),
+    ("execution.save_results", lambda r: r.executions.save_results([RESULT]), None),
+    ("execution.find_by_session_id", lambda r: r.executions.find_by_session_id("sess_1", after=CURSOR),
+     "t_sandbox_execution_idx_session_created_at"),
+    ("execution.count_by_session_id", lambda r: r.executions.count_by_session_id("sess_1"),
+     "t_sandbox_execution_idx_session_created_at"),
+    ("execution.find_by_status", lambda r: r.executions.find_by_status("running"),
+     "t_sandbox_execution_idx_status_"),
+    ("execution.count_by_status", lambda r: r.executions.count_by_status("running"),
+     "t_sandbox_execution_idx_status_"),
+    ("execution.find_heartbeat_timeouts", lambda r: r.executions.find_heartbeat_timeouts(datetime(2024, 1, 1)),
+     "t_sandbox_execution_idx_status_last_heartbeat_at"),
+    ("execution.touch_heartbeats", lambda r: r.executions.touch_heartbeats({"exec_1": datetime(2024, 1, 1)}), None),
+    ("execution.find_archivable", lambda r: r.executions.find_archivable(datetime(2024, 1, 1)),
+     "t_sandbox_execution_idx_created_at_id"),
+    ("execution.find_archive_path", lambda r: r.executions.find_archive_path("exec_1"), None),
+    ("execution.delete_by_session_id", lambda r: r.executions.delete_by_session_id("sess_1"), None),
+    ("template.find_by_name", lambda r: r.templates.find_by_name("python-basic"),
+     "t_sandbox_template_uk_name_deleted_at"),
+    ("template.exists_by_name", lambda r: r.templates.exists_by_name("python-basic"),
+     "t_sandbox_template_uk_name_deleted_at"),
+    ("runtime_node.find_by_hostname", lambda r: r.runtime_nodes.find_by_hostname("node-1"), None),
+    ("runtime_node.find_by_status", lambda r: r.runtime_nodes.find_by_status("online"),
+     "t_sandbox_runtime_node_idx_status"),
+]
+
+
+class _Repositories:
+    def __init__(self, session):
+        self.executions = SqlExecutionRepository(session)
+        self.sessions = SqlSessionRepository(session, execution_repo=self.executions)
+        self.templates = SqlTemplateRepository(session)
+        self.runtime_nodes = SqlRuntimeNodeRepository(session)
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'plans.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+async def _explain(engine, query) -> list:
+    """执行仓储查询，返回其发出的每条语句及 EXPLAIN QUERY PLAN 明细"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with async_sessionmaker(engine)() as session:
+            await query(_Repositories(session))
+            await session.rollback()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    plans = []
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plans.append((statement, [row[-1] for row in result.fetchall()]))
+    return plans
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name,query,expected_index", QUERY_CASES, ids=[c[0] for c in QUERY_CASES])
+async def test_query_uses_index(engine, name, query, expected_index):
+    """测试仓储查询命中索引、热点表上没有全表扫描或临时排序"""
+    plans = await _explain(engine, query)
+    assert plans, f"{name} issued no statements"
+
+    for statement, details in plans:
+        for detail in details:
+            full_scan = re.fullmatch(r"SCAN (\w+)", detail)
+            assert not (full_scan and full_scan.group(1) in HOT_TABLES), (
+                f"{name} falls back to a full scan: {detail}\n{statement}"
+            )
+            assert "USE TEMP B-TREE" not in detail or not any(t in statement for t in HOT_TABLES), (
+                f"{name} needs an extra sort: {detail}\n{statement}"
+            )
+
+    if expected_index:
+        used = " | ".join(detail for _, details in plans for detail in details)
+        assert expected_index in used, f"{name} does not use {expected_index}: {used}"
+
+
+def _orm_indexes() -> set:
+    return {
+        index.name
+        for table in Base.metadata.tables.values()
+        for index in table.indexes
+    }
+
+
+@pytest.mark.parametrize("dialect", ["mariadb", "dm8"])
+def test_migration_declares_orm_indexes(dialect):
+    """测试最新迁移脚本包含 ORM 声明的全部索引"""
+    sql = (MIGRATIONS_DIR / dialect / LATEST_MIGRATION / "pre" / "init.sql").read_text(encoding="utf-8")
+    missing = sorted(name for name in _orm_indexes() if name not in sql)
+
+    assert not missing, f"{dialect} {LATEST_MIGRATION} migration is missing indexes: {missing}"
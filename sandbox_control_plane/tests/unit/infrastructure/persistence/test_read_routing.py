@@ -0,0 +1,280 @@
+"""
+读写分离路由单元测试
+
+测试 ReadRouter 的路由规则与 DatabaseManager 的读己之写窗口。
+"""
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+from src.domain.entities.session import Session
+from src.domain.value_objects.execution_status import SessionStatus
+from src.domain.value_objects.resource_limit import ResourceLimit
+from src.infrastructure.persistence.database import DatabaseManager
+from src.infrastructure.persistence.models.session_model import SessionModel
+from src.infrastructure.persistence.read_routing import ReadRouter
+from src.infrastructure.persistence.repositories.sql_session_repository import SqlSessionRepository
+
+
+class TestReadRouter:
+    """读路由器测试"""
+
+    @pytest.fixture
+    def manager(self):
+        """模拟可用从库的 DatabaseManager"""
+        manager = Mock()
+        manager.replica_available = True
+        manager.replica_serves_lists = False
+        manager.is_recently_written = Mock(return_value=False)
+        manager.note_write = Mock()
+        manager.mark_replica_unavailable = Mock()
+        return manager
+
+    @pytest.fixture
+    def primary(self):
+        primary = Mock()
+        primary.execute = AsyncMock(return_value="primary-result")
+        return primary
+
+    @pytest.fixture
+    def replica(self):
+        replica = Mock()
+        replica.execute = AsyncMock(return_value="replica-result")
+        replica.rollback = AsyncMock()
+        return replica
+
+    @pytest.mark.asyncio
+    async def test_read_goes_to_replica(self, manager, primary, replica):
+        """测试只读查询走从库"""
+        router = ReadRouter(manager, replica)
+
+        result = await router.execute(primary, select(SessionModel), "sess_001")
+
+        assert result == "replica-result"
+        primary.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_listing_uses_primary_by_default(self, manager, primary, replica):
+        """测试列表查询默认走主库（列表无法发现复制延迟内缺失的行）"""
+        router = ReadRouter(manager, replica)
+
+        result = await router.execute(primary, select(SessionModel), listing=True)
+
+        assert result == "primary-result"
+        replica.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_listing_on_replica_when_enabled(self, manager, primary, replica):
+        """测试开启 db_read_replica_lists 后列表查询走从库"""
+        manager.replica_serves_lists = True
+        router = ReadRouter(manager, replica)
+
+        result = await router.execute(primary, select(SessionModel), listing=True)
+
+        assert result == "replica-result"
+        primary.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_without_read_session_uses_primary(self, manager, primary):
+        """测试未分配从库会话（写请求）时走主库"""
+        router = ReadRouter(manager)
+
+        result = await router.execute(primary, select(SessionModel))
+
+        assert result == "primary-result"
+
+    @pytest.mark.asyncio
+    async def test_write_in_request_sticks_to_primary(self, manager, primary, replica):
+        """测试请求内写入后的读取走主库"""
+        router = ReadRouter(manager, replica)
+
+        router.note_write("sess_001")
+        result = await router.execute(primary, select(SessionModel), "sess_other")
+
+        assert result == "primary-result"
+        manager.note_write.assert_called_once_with("sess_001")
+        replica.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_recently_written_key_uses_primary(self, manager, primary, replica):
+        """测试最近写过的资源走主库"""
+        manager.is_recently_written.return_value = True
+        router = ReadRouter(manager, replica)
+
+        result = await router.execute(primary, select(SessionModel), "sess_001")
+
+        assert result == "primary-result"
+        manager.is_recently_written.assert_called_once_with("sess_001")
+
+    @pytest.mark.asyncio
+    async def test_unavailable_replica_uses_primary(self, manager, primary, replica):
+        """测试从库不可用（延迟过大或宕机）时走主库"""
+        manager.replica_available = False
+        router = ReadRouter(manager, replica)
+
+        result = await router.execute(primary, select(SessionModel))
+
+        assert result == "primary-result"
+        replica.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_replica_error_falls_back_to_primary(self, manager, primary, replica):
+        """测试从库查询失败时标记不可用并在主库重试"""
+        replica.execute.side_effect = OperationalError("SELECT 1", {}, Exception("gone away"))
+        router = ReadRouter(manager, replica)
+
+        result = await router.execute(primary, select(SessionModel))
+
+        assert result == "primary-result"
+        manager.mark_replica_unavailable.assert_called_once()
+        replica.rollback.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_fetch_by_id_hit_on_replica(self, manager, primary, replica):
+        """测试按 ID 查找在从库命中时不访问主库"""
+        router = ReadRouter(manager, replica)
+
+        value = await router.fetch_by_id(primary, select(SessionModel), "sess_001", lambda result: result)
+
+        assert value == "replica-result"
+        primary.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_fetch_by_id_miss_on_replica_retries_primary(self, manager, primary, replica):
+        """测试按 ID 查找在从库未命中（复制延迟）时回主库重查"""
+        replica.execute.return_value = None
+        router = ReadRouter(manager, replica)
+
+        value = await router.fetch_by_id(primary, select(SessionModel), "sess_001", lambda result: result)
+
+        assert value == "primary-result"
+        replica.execute.assert_called_once()
+        primary.execute.assert_called_once()
+
+
+class TestCrossProcessReadYourWrites:
+    """写入与读取落在不同进程（不同 DatabaseManager）时的读己之写"""
+
+    @staticmethod
+    def _manager() -> DatabaseManager:
+        manager = DatabaseManager()
+        manager._read_session_factory = Mock()
+        manager._replica_healthy = True
+        manager._read_sticky_seconds = 5.0
+        return manager
+
+    @pytest.mark.asyncio
+    async def test_create_then_get_on_another_process(self):
+        """测试在进程 A 创建的会话，进程 B 的从库尚未复制时仍能查到"""
+        session = Session(
+            id="sess_rw_001",
+            template_id="python-basic",
+            status=SessionStatus.CREATING,
+            resource_limit=ResourceLimit.default(),
+            workspace_path="s3://sandbox-bucket/sessions/sess_rw_001",
+            runtime_type="docker",
+        )
+
+        # 进程 A：写请求走主库并记录写入
+        writer = self._manager()
+        writer_primary = Mock()
+        writer_primary.get = AsyncMock(return_value=None)
+        writer_primary.add = Mock()
+        writer_primary.flush = AsyncMock()
+        await SqlSessionRepository(writer_primary, read_router=ReadRouter(writer)).save(session)
+        assert writer.is_recently_written("sess_rw_001") is True
+
+        # 进程 B：没有该写入记录，从库因复制延迟还没有这一行
+        reader = self._manager()
+        assert reader.is_recently_written("sess_rw_001") is False
+        replica = Mock()
+        replica.execute = AsyncMock(return_value=Mock(scalar_one_or_none=Mock(return_value=None)))
+        reader_primary = Mock()
+        reader_primary.execute = AsyncMock(
+            return_value=Mock(scalar_one_or_none=Mock(return_value=SessionModel.from_entity(session)))
+        )
+        repo = SqlSessionRepository(reader_primary, read_router=ReadRouter(reader, replica))
+
+        found = await repo.find_by_id("sess_rw_001")
+
+        assert found is not None
+        assert found.id == "sess_rw_001"
+        replica.execute.assert_called_once()
+        reader_primary.execute.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_create_then_list_on_another_process(self):
+        """测试在进程 A 创建后立即在进程 B 列出，列表查询走主库"""
+        reader = self._manager()
+        replica = Mock()
+        replica.execute = AsyncMock()
+        reader_primary = Mock()
+        reader_primary.execute = AsyncMock(
+            return_value=Mock(scalars=Mock(return_value=Mock(all=Mock(return_value=[]))))
+        )
+        repo = SqlSessionRepository(reader_primary, read_router=ReadRouter(reader, replica))
+
+        await repo.find_sessions(limit=20)
+
+        reader_primary.execute.assert_called_once()
+        replica.execute.assert_not_called()
+
+
+class TestDatabaseManagerReadReplica:
+    """DatabaseManager 读写分离测试"""
+
+    @pytest.fixture
+    def db_manager(self):
+        """模拟已配置从库的 DatabaseManager"""
+        manager = DatabaseManager()
+        manager._read_session_factory = Mock()
+        manager._replica_healthy = True
+        manager._read_sticky_seconds = 5.0
+        return manager
+
+    def test_no_replica_by_default(self):
+        """测试未配置从库时不可用"""
+        manager = DatabaseManager()
+
+        assert manager.has_read_replica is False
+        assert manager.replica_available is False
+        assert manager.replica_serves_lists is False
+
+    def test_recently_written_window(self, db_manager):
+        """测试写入后在窗口内视为最近写过"""
+        db_manager.note_write("sess_001")
+
+        assert db_manager.is_recently_written("sess_001") is True
+        assert db_manager.is_recently_written("sess_002") is False
+        assert db_manager.is_recently_written(None) is False
+
+    def test_recently_written_expires(self, db_manager):
+        """测试窗口过期后回到从库"""
+        db_manager._read_sticky_seconds = 0.0
+        db_manager.note_write("sess_001")
+
+        assert db_manager.is_recently_written("sess_001") is False
+
+    def test_mark_replica_unavailable(self, db_manager):
+        """测试标记从库不可用"""
+        db_manager.mark_replica_unavailable("lag")
+
+        assert db_manager.has_read_replica is True
+        assert db_manager.replica_available is False
+
+    @pytest.mark.asyncio
+    async def test_get_read_session_unavailable_yields_none(self, db_manager):
+        """测试从库不可用时返回 None"""
+        db_manager.mark_replica_unavailable("down")
+
+        async with db_manager.get_read_session() as read_session:
+            assert read_session is None
+
+    @pytest.mark.asyncio
+    async def test_check_replica_health_without_replica(self):
+        """测试未配置从库时健康检查返回 False"""
+        manager = DatabaseManager()
+
+        assert await manager.check_replica_health(max_lag_seconds=10) is False
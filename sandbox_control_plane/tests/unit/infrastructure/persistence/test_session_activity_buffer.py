@@ -0,0 +1,64 @@
+"""
+会话活动时间写缓冲单元测试
+
+测试 SessionActivityBuffer 的合并、分批写回与失败重试。
+"""
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+
+from src.infrastructure.persistence.session_activity_buffer import SessionActivityBuffer
+
+
+class TestSessionActivityBuffer:
+    """会话活动时间写缓冲测试"""
+
+    def test_touch_keeps_latest(self):
+        """测试同一会话只保留最新活动时间"""
+        buffer = SessionActivityBuffer(writer=AsyncMock())
+        now = datetime.now()
+
+        buffer.touch("sess_1", now)
+        buffer.touch("sess_1", now - timedelta(seconds=5))
+        buffer.touch("sess_2", now)
+
+        assert buffer.pending_count == 2
+        assert buffer._pending["sess_1"] == now
+
+    @pytest.mark.asyncio
+    async def test_flush_in_bounded_batches(self):
+        """测试按 max_batch 分批写回"""
+        writer = AsyncMock(side_effect=lambda batch: len(batch))
+        buffer = SessionActivityBuffer(writer=writer, max_batch=2)
+        for i in range(5):
+            buffer.touch(f"sess_{i}")
+
+        flushed = await buffer.flush()
+
+        assert flushed == 5
+        assert [len(call.args[0]) for call in writer.call_args_list] == [2, 2, 1]
+        assert buffer.pending_count == 0
+
+    @pytest.mark.asyncio
+    async def test_flush_empty_does_not_write(self):
+        """测试无活动时不写库"""
+        writer = AsyncMock()
+        buffer = SessionActivityBuffer(writer=writer)
+
+        assert await buffer.flush() == 0
+        writer.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_flush_failure_restores_batch(self):
+        """测试写回失败时保留活动时间等待下次写回"""
+        now = datetime.now()
+        buffer = SessionActivityBuffer(writer=AsyncMock(side_effect=Exception("db down")))
+        buffer.touch("sess_1", now - timedelta(seconds=10))
+
+        assert await buffer.flush() == 0
+        assert buffer._pending == {"sess_1": now - timedelta(seconds=10)}
+
+        # 失败期间的更新活动不会被旧值覆盖
+        buffer.touch("sess_1", now)
+        buffer._restore({"sess_1": now - timedelta(seconds=10)})
+        assert buffer._pending["sess_1"] == now
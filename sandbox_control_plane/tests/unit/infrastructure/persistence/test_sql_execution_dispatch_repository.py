@@ -0,0 +1,165 @@
+"""
+执行分发队列仓储单元测试
+
+在 SQLite 上测试 SqlExecutionDispatchRepository 的会话内 FIFO 认领、租约与重试。
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+from sqlalchemy import select
+from sqlalchemy.dialects import mysql
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from src.infrastructure.persistence.database import Base
+from src.infrastructure.persistence.models.execution_dispatch_model import ExecutionDispatchModel
+from src.infrastructure.persistence.models.session_model import SessionModel
+from src.infrastructure.persistence.repositories.sql_execution_dispatch_repository import (
+    SqlExecutionDispatchRepository,
+)
+from src.shared.errors.domain import NotFoundError
+
+
+class TestSqlExecutionDispatchRepository:
+    """执行分发队列仓储测试"""
+
+    @pytest.fixture
+    async def session_factory(self):
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(engine)
+        async with factory() as session:
+            for session_id in ("sess_a", "sess_b"):
+                session.add(SessionModel(
+                    f_id=session_id,
+                    f_template_id="python-basic",
+                    f_runtime_type="python3.11",
+                    f_resources_cpu="1",
+                    f_resources_memory="512Mi",
+                    f_resources_disk="1Gi",
+                ))
+            await session.commit()
+        yield factory
+        await engine.dispose()
+
+    async def _enqueue(self, session_factory, *items):
+        async with session_factory() as session:
+            repo = SqlExecutionDispatchRepository(session)
+            for execution_id, session_id in items:
+                await repo.enqueue(execution_id, session_id)
+            await repo.commit()
+
+    async def _claim(self, session_factory, limit=10, lease_seconds=60):
+        async with session_factory() as session:
+            repo = SqlExecutionDispatchRepository(session)
+            entries = await repo.claim_due(limit, lease_seconds)
+            await repo.commit()
+            return entries
+
+    @pytest.mark.asyncio
+    async def test_claims_only_head_of_each_session(self, session_factory):
+        """测试每个会话只认领最早入队的条目，完成后才认领下一条"""
+        await self._enqueue(
+            session_factory,
+            ("exec_a1", "sess_a"),
+            ("exec_b1", "sess_b"),
+            ("exec_a2", "sess_a"),
+        )
+
+        entries = await self._claim(session_factory)
+        assert sorted(e.execution_id for e in entries) == ["exec_a1", "exec_b1"]
+        assert all(e.attempts == 1 for e in entries)
+
+        # 队首已认领（租约未到期），同一会话的后续条目不可认领
+        assert await self._claim(session_factory) == []
+
+        async with session_factory() as session:
+            repo = SqlExecutionDispatchRepository(session)
+            await repo.complete(["exec_a1"])
+            await repo.commit()
+
+        entries = await self._claim(session_factory)
+        assert [e.execution_id for e in entries] == ["exec_a2"]
+
+    @pytest.mark.asyncio
+    async def test_seq_assigned_by_database_per_session(self, session_factory):
+        """测试入队序号取自会话行计数器：不同连接（进程）先后入队，序号按提交顺序递增"""
+        await self._enqueue(session_factory, ("exec_a1", "sess_a"))
+        await self._enqueue(session_factory, ("exec_b1", "sess_b"), ("exec_a2", "sess_a"))
+        await self._enqueue(session_factory, ("exec_a3", "sess_a"))
+
+        async with session_factory() as session:
+            result = await session.execute(
+                select(ExecutionDispatchModel.f_execution_id, ExecutionDispatchModel.f_seq)
+                .order_by(ExecutionDispatchModel.f_execution_id)
+            )
+            seqs = dict(result.all())
+            counters = dict((await session.execute(
+                select(SessionModel.f_id, SessionModel.f_dispatch_seq)
+            )).all())
+
+        assert seqs == {"exec_a1": 1, "exec_a2": 2, "exec_a3": 3, "exec_b1": 1}
+        assert counters == {"sess_a": 3, "sess_b": 1}
+
+    @pytest.mark.asyncio
+    async def test_enqueue_unknown_session_raises(self, session_factory):
+        """测试会话不存在时不入队"""
+        with pytest.raises(NotFoundError):
+            await self._enqueue(session_factory, ("exec_x", "sess_missing"))
+
+    @pytest.mark.asyncio
+    async def test_retry_later_defers_claim(self, session_factory):
+        """测试重试条目在到期前不可认领，且仍阻塞同一会话的后续条目"""
+        await self._enqueue(session_factory, ("exec_1", "sess_a"), ("exec_2", "sess_a"))
+        await self._claim(session_factory)
+
+        async with session_factory() as session:
+            repo = SqlExecutionDispatchRepository(session)
+            await repo.retry_later("exec_1", datetime.now() + timedelta(minutes=5), "unavailable")
+            await repo.commit()
+
+        assert await self._claim(session_factory) == []
+
+        async with session_factory() as session:
+            repo = SqlExecutionDispatchRepository(session)
+            await repo.retry_later("exec_1", datetime.now() - timedelta(seconds=1), "unavailable")
+            await repo.commit()
+
+        entries = await self._claim(session_factory)
+        assert [(e.execution_id, e.attempts) for e in entries] == [("exec_1", 2)]
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_is_reclaimed(self, session_factory):
+        """测试分发者崩溃后租约到期的条目被重新认领"""
+        await self._enqueue(session_factory, ("exec_1", "sess_a"))
+        await self._claim(session_factory, lease_seconds=-1)
+
+        entries = await self._claim(session_factory)
+        assert [(e.execution_id, e.attempts) for e in entries] == [("exec_1", 2)]
+
+    @pytest.mark.asyncio
+    async def test_queue_stats(self, session_factory):
+        """测试队列长度与最早入队时间"""
+        async with session_factory() as session:
+            stats = await SqlExecutionDispatchRepository(session).queue_stats()
+        assert stats == {"depth": 0, "oldest_enqueued_at": None}
+
+        await self._enqueue(session_factory, ("exec_1", "sess_a"), ("exec_2", "sess_b"))
+        async with session_factory() as session:
+            stats = await SqlExecutionDispatchRepository(session).queue_stats()
+        assert stats["depth"] == 2
+        assert datetime.now() - stats["oldest_enqueued_at"] < timedelta(seconds=5)
+
+    @pytest.mark.asyncio
+    async def test_claim_skips_locked_rows(self):
+        """测试认领语句使用 FOR UPDATE SKIP LOCKED"""
+        db_session = Mock()
+        db_session.execute = AsyncMock(
+            return_value=Mock(scalars=Mock(return_value=Mock(all=Mock(return_value=[]))))
+        )
+
+        await SqlExecutionDispatchRepository(db_session).claim_due(10, 60)
+
+        sql = str(db_session.execute.call_args[0][0].compile(dialect=mysql.dialect()))
+        assert "FOR UPDATE SKIP LOCKED" in sql
@@ -0,0 +1,297 @@
+"""
+执行仓储单元测试
+
+测试 SqlExecutionRepository 的冷热表拆分读写与心跳批量更新。
+"""
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, Mock
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.domain.entities.execution import Execution
+from src.domain.value_objects.execution_status import ExecutionStatus, ExecutionState
+from src.infrastructure.persistence.database import Base
+from src.infrastructure.persistence.models.execution_archive_model import ExecutionArchiveModel
+from src.infrastructure.persistence.models.execution_model import ExecutionModel
+from src.infrastructure.persistence.models.execution_payload_model import ExecutionPayloadModel
+from src.infrastructure.persistence.repositories.sql_execution_repository import SqlExecutionRepository
+
+
+def _make_execution(**kwargs) -> Execution:
+    defaults = dict(
+        id="exec_repo_001",
+        session_id="sess_repo_001",
+        code="print('hello')",
+        language="python",
+        state=ExecutionState(status=ExecutionStatus.COMPLETED, exit_code=0),
+        stdout="hello\n",
+        return_value={"ok": True},
+    )
+    defaults.update(kwargs)
+    return Execution(**defaults)
+
+
+class TestSqlExecutionRepository:
+    """执行仓储测试"""
+
+    @pytest.fixture
+    def db_session(self):
+        """模拟 AsyncSession"""
+        db_session = Mock()
+        db_session.get = AsyncMock(return_value=None)
+        db_session.execute = AsyncMock()
+        db_session.flush = AsyncMock()
+        db_session.add = Mock()
+        return db_session
+
+    @pytest.fixture
+    def repo(self, db_session):
+        return SqlExecutionRepository(db_session)
+
+    @staticmethod
+    def _sql(stmt) -> str:
+        return str(stmt.compile(compile_kwargs={"literal_binds": True}))
+
+    @pytest.mark.asyncio
+    async def test_find_by_id_without_payload_reads_hot_table_only(self, repo, db_session):
+        """测试状态查询只读取热表窄行"""
+        model = ExecutionModel.from_entity(_make_execution())
+        db_session.execute.return_value = Mock(scalar_one_or_none=Mock(return_value=model))
+
+        execution = await repo.find_by_id("exec_repo_001", include_payload=False)
+
+        sql = self._sql(db_session.execute.call_args[0][0])
+        assert "t_sandbox_execution_payload" not in sql
+        assert "f_stdout" not in sql
+        assert execution.payload_loaded is False
+        assert execution.state.status == ExecutionStatus.COMPLETED
+        assert execution.stdout == ""
+
+    @pytest.mark.asyncio
+    async def test_find_by_id_with_payload_joins_payload_table(self, repo, db_session):
+        """测试结果查询关联载荷表"""
+        source = _make_execution()
+        row = (ExecutionModel.from_entity(source), ExecutionPayloadModel.from_entity(source))
+        db_session.execute.return_value = Mock(first=Mock(return_value=row))
+
+        execution = await repo.find_by_id("exec_repo_001")
+
+        sql = self._sql(db_session.execute.call_args[0][0])
+        assert "LEFT OUTER JOIN t_sandbox_execution_payload" in sql
+        assert execution.payload_loaded is True
+        assert execution.code == "print('hello')"
+        assert execution.stdout == "hello\n"
+        assert execution.return_value == {"ok": True}
+
+    @pytest.mark.asyncio
+    async def test_save_new_execution_writes_both_tables(self, repo, db_session):
+        """测试新执行同时写入热表与载荷表"""
+        await repo.save(_make_execution())
+
+        added = [call.args[0] for call in db_session.add.call_args_list]
+        assert [type(model) for model in added] == [ExecutionModel, ExecutionPayloadModel]
+        assert added[1].f_stdout == "hello\n"
+
+    @pytest.mark.asyncio
+    async def test_save_narrow_execution_skips_payload(self, repo, db_session):
+        """测试窄加载的实体不会覆盖已有载荷"""
+        hot = ExecutionModel.from_entity(_make_execution())
+        db_session.get.return_value = hot
+        execution = hot.to_entity()
+        execution.state = ExecutionState(status=ExecutionStatus.FAILED, exit_code=1)
+
+        await repo.save(execution)
+
+        db_session.get.assert_called_once_with(ExecutionModel, "exec_repo_001")
+        db_session.add.assert_not_called()
+        assert hot.f_status == "failed"
+
+    @pytest.mark.asyncio
+    async def test_delete_by_session_id_removes_payload(self, repo, db_session):
+        """测试删除会话执行记录时一并删除载荷"""
+        await repo.delete_by_session_id("sess_repo_001")
+
+        statements = [self._sql(call.args[0]) for call in db_session.execute.call_args_list]
+        assert statements[0].startswith("DELETE FROM t_sandbox_execution_payload")
+        assert "t_sandbox_execution.f_session_id = 'sess_repo_001'" in statements[0]
+        assert statements[1].startswith("DELETE FROM t_sandbox_execution ")
+
+    @pytest.mark.asyncio
+    async def test_find_by_ids_uses_single_query(self, repo, db_session):
+        """测试批量查找只发出一条 IN 查询"""
+        source = _make_execution()
+        row = (ExecutionModel.from_entity(source), ExecutionPayloadModel.from_entity(source))
+        db_session.execute.return_value = Mock(all=Mock(return_value=[row]))
+
+        executions = await repo.find_by_ids(["exec_repo_001", "exec_repo_002"])
+
+        db_session.execute.assert_called_once()
+        sql = self._sql(db_session.execute.call_args[0][0])
+        assert "t_sandbox_execution.f_id IN ('exec_repo_001', 'exec_repo_002')" in sql
+        assert [execution.id for execution in executions] == ["exec_repo_001"]
+
+    @pytest.mark.asyncio
+    async def test_save_results_issues_guarded_multi_row_updates(self, repo, db_session):
+        """测试批量写入结果为每张表各一条 CASE UPDATE，且跳过已是终态的行"""
+        first = _make_execution(id="exec_a", stdout="a\n")
+        second = _make_execution(
+            id="exec_b",
+            state=ExecutionState(status=ExecutionStatus.FAILED, exit_code=1, error_message="boom"),
+            stdout="b\n",
+        )
+
+        db_session.execute.return_value = Mock(scalars=Mock(return_value=Mock(all=Mock(return_value=["exec_a", "exec_b"]))))
+
+        written = await repo.save_results([first, second])
+
+        statements = [self._sql(call.args[0]) for call in db_session.execute.call_args_list]
+        assert len(statements) == 3
+        lock_sql, payload_sql, hot_sql = statements
+        assert "NOT IN ('completed', 'failed', 'timeout')" in lock_sql
+        assert payload_sql.startswith("UPDATE t_sandbox_execution_payload")
+        assert "WHEN 'exec_a' THEN 'a\n'" in payload_sql
+        assert hot_sql.startswith("UPDATE t_sandbox_execution ")
+        assert "WHEN 'exec_b' THEN 'failed'" in hot_sql
+        assert "WHEN 'exec_b' THEN 'boom'" in hot_sql
+        assert "t_sandbox_execution.f_status NOT IN ('completed', 'failed', 'timeout')" in hot_sql
+        assert written == ["exec_a", "exec_b"]
+        db_session.add.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_save_results_skips_payload_for_narrow_executions(self, repo, db_session):
+        """测试未加载载荷的实体只写热表"""
+        execution = ExecutionModel.from_entity(_make_execution()).to_entity()
+
+        db_session.execute.return_value = Mock(scalars=Mock(return_value=Mock(all=Mock(return_value=[execution.id]))))
+
+        await repo.save_results([execution])
+
+        statements = [self._sql(call.args[0]) for call in db_session.execute.call_args_list]
+        assert len(statements) == 2
+        assert statements[1].startswith("UPDATE t_sandbox_execution ")
+
+
+class TestSqlExecutionRepositoryHeartbeats:
+    """执行心跳写回、超时查询与归档测试（SQLite）"""
+
+    @pytest.fixture
+    async def db_session(self):
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with async_sessionmaker(engine)() as session:
+            yield session
+        await engine.dispose()
+
+    @pytest.fixture
+    async def repo(self, db_session):
+        repo = SqlExecutionRepository(db_session)
+        for execution_id, status in [
+            ("exec_pending", ExecutionStatus.PENDING),
+            ("exec_running", ExecutionStatus.RUNNING),
+            ("exec_done", ExecutionStatus.COMPLETED),
+            ("exec_crashed", ExecutionStatus.CRASHED),
+        ]:
+            await repo.save(_make_execution(id=execution_id, state=ExecutionState(status=status)))
+        await db_session.commit()
+        return repo
+
+    @pytest.mark.asyncio
+    async def test_touch_heartbeats_promotes_pending_and_skips_finished(self, repo):
+        """测试心跳把待执行推进为运行中，已结束或已崩溃的执行不受影响"""
+        now = datetime.now().replace(microsecond=0)
+
+        updated = await repo.touch_heartbeats({
+            "exec_pending": now,
+            "exec_running": now,
+            "exec_done": now,
+            "exec_crashed": now,
+            "exec_missing": now,
+        })
+
+        assert updated == 2
+        pending = await repo.find_by_id("exec_pending", include_payload=False)
+        assert pending.state.status == ExecutionStatus.RUNNING
+        assert pending.last_heartbeat_at == now
+        done = await repo.find_by_id("exec_done", include_payload=False)
+        assert done.state.status == ExecutionStatus.COMPLETED
+        assert done.last_heartbeat_at is None
+        crashed = await repo.find_by_id("exec_crashed", include_payload=False)
+        assert crashed.state.status == ExecutionStatus.CRASHED
+
+    @pytest.mark.asyncio
+    async def test_touch_heartbeats_empty(self, repo):
+        """测试空心跳不写库"""
+        assert await repo.touch_heartbeats({}) == 0
+
+    @pytest.mark.asyncio
+    async def test_find_heartbeat_timeouts_returns_stale_running_only(self, repo):
+        """测试只返回心跳早于阈值的运行中执行，未收到心跳的执行不参与判断"""
+        now = datetime.now()
+        await repo.touch_heartbeats({
+            "exec_pending": now - timedelta(seconds=60),
+            "exec_running": now,
+        })
+
+        stalled = await repo.find_heartbeat_timeouts(now - timedelta(seconds=15))
+
+        assert [execution.id for execution in stalled] == ["exec_pending"]
+        assert stalled[0].payload_loaded is False
+
+    @pytest.mark.asyncio
+    async def test_has_active_executions(self, repo, db_session):
+        """测试只有 pending / running 的执行视为未结束"""
+        await repo.save(_make_execution(id="exec_other", session_id="sess_repo_002"))
+        await db_session.commit()
+
+        assert await repo.has_active_executions("sess_repo_001") is True
+        assert await repo.has_active_executions("sess_repo_002") is False
+        assert await repo.has_active_executions("sess_missing") is False
+
+    @pytest.mark.asyncio
+    async def test_mark_archived_indexes_and_deletes(self, repo, db_session):
+        """测试归档登记索引并删除热表与载荷表中的执行"""
+        done = await repo.find_by_id("exec_done", include_payload=False)
+        crashed = await repo.find_by_id("exec_crashed", include_payload=False)
+
+        await repo.mark_archived("archive/part-1.jsonl.gz", [done, crashed])
+        await db_session.commit()
+
+        assert await repo.find_by_id("exec_done") is None
+        assert await db_session.get(ExecutionPayloadModel, "exec_done") is None
+        assert await repo.find_archive_path("exec_done") == "archive/part-1.jsonl.gz"
+        assert await repo.find_archive_path("exec_crashed") == "archive/part-1.jsonl.gz"
+
+    @pytest.mark.asyncio
+    async def test_mark_archived_overwrites_existing_index(self, repo, db_session):
+        """测试上次归档中断留下的索引行被新的归档路径覆盖"""
+        done = await repo.find_by_id("exec_done", include_payload=False)
+        db_session.add(ExecutionArchiveModel(
+            f_execution_id="exec_done",
+            f_session_id=done.session_id,
+            f_archive_path="archive/part-0.jsonl.gz",
+        ))
+        await db_session.commit()
+
+        await repo.mark_archived("archive/part-1.jsonl.gz", [done])
+        await db_session.commit()
+
+        result = await db_session.execute(select(ExecutionArchiveModel.f_archive_path))
+        assert result.scalars().all() == ["archive/part-1.jsonl.gz"]
+
+    @pytest.mark.asyncio
+    async def test_save_results_skips_finished_rows(self, repo):
+        """测试已是终态的执行不被覆盖，返回值只包含实际写入的执行"""
+        pending = await repo.find_by_id("exec_pending")
+        done = await repo.find_by_id("exec_done")
+        pending.mark_running()
+        pending.mark_completed(stdout="late\n", stderr="", exit_code=0, execution_time=0.1)
+        done.state = ExecutionState(status=ExecutionStatus.FAILED, error_message="late")
+
+        written = await repo.save_results([pending, done])
+
+        assert written == ["exec_pending"]
+        assert (await repo.find_by_id("exec_pending")).state.status == ExecutionStatus.COMPLETED
+        assert (await repo.find_by_id("exec_done")).state.status == ExecutionStatus.COMPLETED
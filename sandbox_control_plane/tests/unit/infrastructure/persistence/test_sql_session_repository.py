@@ -0,0 +1,286 @@
+"""
+会话仓储单元测试
+
+测试 SqlSessionRepository 的变更跟踪写回、乐观并发校验与按状态分页遍历。
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.domain.entities.session import Session
+from src.domain.value_objects.execution_status import SessionStatus
+from src.domain.value_objects.resource_limit import ResourceLimit
+from src.domain.value_objects.row_count import RowCount
+from src.infrastructure.persistence.database import Base
+from src.infrastructure.persistence.models.session_model import SessionModel
+from src.infrastructure.persistence.repositories.sql_session_repository import SqlSessionRepository
+from src.shared.errors.domain import ConflictError
+
+
+def _make_session(status: SessionStatus = SessionStatus.CREATING) -> Session:
+    return Session(
+        id="sess_repo_001",
+        template_id="python-basic",
+        status=status,
+        resource_limit=ResourceLimit.default(),
+        workspace_path="s3://sandbox-bucket/sessions/sess_repo_001",
+        runtime_type="docker",
+    )
+
+
+class TestSqlSessionRepository:
+    """会话仓储测试"""
+
+    @pytest.fixture
+    def db_session(self):
+        """模拟 AsyncSession"""
+        db_session = Mock()
+        db_session.get = AsyncMock(return_value=None)
+        db_session.execute = AsyncMock(return_value=Mock(rowcount=1))
+        db_session.flush = AsyncMock()
+        db_session.add = Mock()
+        return db_session
+
+    @pytest.fixture
+    def repo(self, db_session):
+        return SqlSessionRepository(db_session)
+
+    @staticmethod
+    def _compiled(stmt):
+        return stmt.compile(compile_kwargs={"literal_binds": True})
+
+    @pytest.mark.asyncio
+    async def test_save_new_session_inserts_and_marks_persisted(self, repo, db_session):
+        """测试未跟踪的新会话走插入路径"""
+        session = _make_session()
+
+        await repo.save(session)
+
+        db_session.add.assert_called_once()
+        assert isinstance(db_session.add.call_args[0][0], SessionModel)
+        db_session.execute.assert_not_called()
+        assert session.persisted_status == SessionStatus.CREATING
+        assert session.dirty_fields == set()
+
+    @pytest.mark.asyncio
+    async def test_save_tracked_session_updates_only_dirty_columns(self, repo, db_session):
+        """测试已加载会话只写回变更列，并以加载时状态做条件"""
+        session = _make_session()
+        session.mark_persisted()
+
+        session.mark_as_running("node-1", "container-1")
+        await repo.save(session)
+
+        db_session.get.assert_not_called()
+        stmt = db_session.execute.call_args[0][0]
+        sql = str(self._compiled(stmt))
+        assert "f_status='running'" in sql
+        assert "f_container_id='container-1'" in sql
+        assert "f_runtime_node='node-1'" in sql
+        assert "f_updated_at=" in sql
+        assert "f_env_vars" not in sql
+        assert "f_requested_dependencies" not in sql
+        assert "t_sandbox_session.f_status = 'creating'" in sql
+        assert session.persisted_status == SessionStatus.RUNNING
+        assert session.dirty_fields == set()
+
+    @pytest.mark.asyncio
+    async def test_save_without_changes_is_noop(self, repo, db_session):
+        """测试无变更时不发出 SQL"""
+        session = _make_session(SessionStatus.RUNNING)
+        session.mark_persisted()
+
+        await repo.save(session)
+
+        db_session.execute.assert_not_called()
+        db_session.get.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_save_raises_conflict_when_status_changed_concurrently(self, repo, db_session):
+        """测试状态已被其他实例修改时抛出冲突"""
+        db_session.execute.return_value = Mock(rowcount=0)
+        session = _make_session(SessionStatus.RUNNING)
+        session.mark_persisted()
+
+        session.mark_as_terminated()
+        with pytest.raises(ConflictError):
+            await repo.save(session)
+
+        # 冲突后保留变更集，调用方可重新加载后重试
+        assert "status" in session.dirty_fields
+        assert session.persisted_status == SessionStatus.RUNNING
+
+    @pytest.mark.asyncio
+    async def test_find_by_id_returns_tracked_entity(self, repo, db_session):
+        """测试加载的实体从干净状态开始跟踪"""
+        model = SessionModel.from_entity(_make_session(SessionStatus.RUNNING))
+        db_session.get.return_value = model
+
+        session = await repo.find_by_id("sess_repo_001")
+
+        assert session.persisted_status == SessionStatus.RUNNING
+        assert session.dirty_fields == set()
+
+    @pytest.mark.asyncio
+    async def test_find_sessions_keyset(self, repo, db_session):
+        """测试游标分页使用 (created_at, id) 键集条件且不使用 OFFSET"""
+        from src.domain.value_objects.page_cursor import PageCursor
+
+        db_session.execute.return_value = Mock(scalars=Mock(return_value=Mock(all=Mock(return_value=[]))))
+
+        await repo.find_sessions(
+            status="running", limit=51, offset=100,
+            after=PageCursor(created_at_ms=1700000000000, id="sess_9"),
+        )
+
+        sql = str(self._compiled(db_session.execute.call_args[0][0]))
+        assert "t_sandbox_session.f_created_at < 1700000000000" in sql
+        assert "t_sandbox_session.f_id < 'sess_9'" in sql
+        assert "ORDER BY t_sandbox_session.f_created_at DESC, t_sandbox_session.f_id DESC" in sql
+        assert "OFFSET" not in sql
+        assert "LIMIT 51" in sql
+
+    @pytest.mark.asyncio
+    async def test_count_sessions_estimate_falls_back_to_exact(self, repo, db_session):
+        """测试不支持估算的数据库回退到精确计数"""
+        db_session.get_bind = Mock(return_value=Mock(dialect=Mock()))
+        db_session.execute.return_value = Mock(scalar=Mock(return_value=42))
+
+        assert await repo.count_sessions(status="running", exact=False) == RowCount(42)
+        sql = str(self._compiled(db_session.execute.call_args[0][0]))
+        assert "count(*)" in sql
+
+    @pytest.mark.asyncio
+    async def test_count_sessions_estimate_uses_explain_on_mysql(self, repo, db_session):
+        """测试 MariaDB 上使用 EXPLAIN 估算行数"""
+        from sqlalchemy.dialects import mysql
+
+        db_session.get_bind = Mock(return_value=Mock(dialect=mysql.dialect()))
+        db_session.execute.return_value = Mock(
+            mappings=Mock(return_value=Mock(first=Mock(return_value={"rows": 1234})))
+        )
+
+        assert await repo.count_sessions(status="running", exact=False) == RowCount(1234, is_estimate=True)
+        compiled = db_session.execute.call_args[0][0].compile(dialect=mysql.dialect())
+        assert str(compiled).startswith("EXPLAIN SELECT")
+        assert "f_status = %s" in str(compiled)
+        assert "'running'" not in str(compiled)
+        assert list(compiled.params.values()) == ["running"]
+
+    @pytest.mark.asyncio
+    async def test_touch_last_activity_single_bulk_update(self, repo, db_session):
+        """测试批量活动时间写回为一条 UPDATE ... CASE"""
+        from datetime import datetime
+
+        db_session.execute.return_value = Mock(rowcount=2)
+
+        updated = await repo.touch_last_activity({
+            "sess_a": datetime.fromtimestamp(1700000000),
+            "sess_b": datetime.fromtimestamp(1700000005),
+        })
+
+        assert updated == 2
+        db_session.execute.assert_called_once()
+        sql = str(self._compiled(db_session.execute.call_args[0][0]))
+        assert sql.startswith("UPDATE t_sandbox_session SET f_last_activity_at=CASE t_sandbox_session.f_id")
+        assert "WHEN 'sess_a' THEN 1700000000000" in sql
+        assert "WHEN 'sess_b' THEN 1700000005000" in sql
+        assert "f_status" not in sql
+        assert "IN ('sess_a', 'sess_b')" in sql
+
+    @pytest.mark.asyncio
+    async def test_touch_last_activity_empty(self, repo, db_session):
+        """测试无活动时不发出 SQL"""
+        assert await repo.touch_last_activity({}) == 0
+        db_session.execute.assert_not_called()
+
+
+class TestSessionModelColumnValues:
+    """SessionModel 列值序列化测试"""
+
+    def test_column_values_subset(self):
+        """测试只序列化指定字段"""
+        session = _make_session()
+        session.env_vars = {"A": "1"}
+
+        values = SessionModel.column_values(session, {"env_vars", "resource_limit"})
+
+        assert values == {
+            "f_env_vars": '{"A": "1"}',
+            "f_resources_cpu": session.resource_limit.cpu,
+            "f_resources_memory": session.resource_limit.memory,
+            "f_resources_disk": session.resource_limit.disk,
+        }
+
+    def test_column_values_ignores_untracked_fields(self):
+        """测试审计字段等非列字段被忽略"""
+        session = _make_session()
+
+        assert SessionModel.column_values(session, {"updated_at", "created_at"}) == {}
+
+
+class TestSqlSessionRepositoryIterByStatus:
+    """按状态分页遍历测试（SQLite）"""
+
+    @pytest.fixture
+    async def db_session(self):
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with async_sessionmaker(engine)() as session:
+            yield session
+        await engine.dispose()
+
+    @staticmethod
+    async def _seed(repo, count: int, status: SessionStatus = SessionStatus.RUNNING):
+        base = datetime(2024, 1, 1)
+        for i in range(count):
+            await repo.save(Session(
+                id=f"sess_{i:03d}",
+                template_id="python-basic",
+                status=status,
+                resource_limit=ResourceLimit.default(),
+                workspace_path=f"s3://sandbox-bucket/sessions/sess_{i:03d}",
+                runtime_type="docker",
+                # 每两个会话创建时间相同，验证 id 作为次排序键
+                created_at=base + timedelta(seconds=i // 2),
+            ))
+
+    @pytest.mark.asyncio
+    async def test_iterates_all_pages(self, db_session):
+        """测试超过单页数量时遍历全部会话，且不包含其他状态"""
+        repo = SqlSessionRepository(db_session)
+        await self._seed(repo, 7)
+        await repo.save(Session(
+            id="sess_failed",
+            template_id="python-basic",
+            status=SessionStatus.FAILED,
+            resource_limit=ResourceLimit.default(),
+            workspace_path="s3://sandbox-bucket/sessions/sess_failed",
+            runtime_type="docker",
+        ))
+
+        pages = [page async for page in repo.iter_by_status("running", page_size=3)]
+
+        assert [len(page) for page in pages] == [3, 3, 1]
+        assert [s.id for page in pages for s in page] == [f"sess_{i:03d}" for i in range(7)]
+        # 已产出的模型不留在标识映射中
+        assert not any(isinstance(obj, SessionModel) and obj.f_status == "running" for obj in db_session)
+
+    @pytest.mark.asyncio
+    async def test_status_changes_during_iteration(self, db_session):
+        """测试处理当前页时修改会话状态，后续页既不遗漏也不重复"""
+        repo = SqlSessionRepository(db_session)
+        await self._seed(repo, 5)
+
+        seen = []
+        async for page in repo.iter_by_status("running", page_size=2):
+            for session in page:
+                seen.append(session.id)
+                session.mark_as_terminated()
+                await repo.save(session)
+
+        assert seen == [f"sess_{i:03d}" for i in range(5)]
+        assert await repo.count_by_status("running") == 0
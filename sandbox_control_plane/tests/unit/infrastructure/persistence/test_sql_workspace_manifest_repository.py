@@ -0,0 +1,148 @@
+"""
+workspace 文件清单仓储单元测试
+
+在 SQLite 上测试 SqlWorkspaceManifestRepository 的前缀查询、增量维护、对账替换与过期标记。
+"""
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from src.domain.value_objects.workspace_file import WorkspaceFile
+from src.infrastructure.persistence.database import Base
+from src.infrastructure.persistence.repositories.sql_workspace_manifest_repository import (
+    SqlWorkspaceManifestRepository,
+)
+
+
+def _files(*paths: str):
+    return [WorkspaceFile(path=path, size=len(path), etag=f"etag-{path}") for path in paths]
+
+
+class TestSqlWorkspaceManifestRepository:
+    """workspace 文件清单仓储测试"""
+
+    @pytest.fixture
+    async def repo(self):
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with async_sessionmaker(engine)() as session:
+            yield SqlWorkspaceManifestRepository(session)
+        await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_replace_and_list_by_prefix(self, repo):
+        """测试对账后按前缀、按路径顺序列出与计数"""
+        listed_at = datetime.now(timezone.utc)
+        await repo.replace_files("sess_1", _files("src/b.py", "src/a.py", "README.md", "src_old/x"), listed_at)
+        await repo.replace_files("sess_2", _files("src/other.py"), listed_at)
+        await repo.commit()
+
+        files = await repo.list_files("sess_1", prefix="src/")
+        assert [f.path for f in files] == ["src/a.py", "src/b.py"]
+        assert files[0].etag == "etag-src/a.py"
+        assert await repo.count_files("sess_1") == 4
+        assert await repo.count_files("sess_1", prefix="src") == 3
+        assert len(await repo.list_files("sess_1", limit=2)) == 2
+        assert abs((await repo.get_reconciled_at("sess_1")) - listed_at) < timedelta(milliseconds=1)
+
+    @pytest.mark.asyncio
+    async def test_prefix_wildcards_are_literal(self, repo):
+        """测试前缀中的 % 与 _ 按字面匹配"""
+        await repo.replace_files("sess_1", _files("a_b/x", "axb/y", "100%/z"), datetime.now(timezone.utc))
+
+        assert [f.path for f in await repo.list_files("sess_1", prefix="a_b")] == ["a_b/x"]
+        assert await repo.count_files("sess_1", prefix="100%") == 1
+
+    @pytest.mark.asyncio
+    async def test_upsert_and_remove(self, repo):
+        """测试上传覆盖已有记录、删除记录"""
+        await repo.upsert_files("sess_1", _files("a.txt", "b.txt"))
+        await repo.upsert_files("sess_1", [WorkspaceFile(path="a.txt", size=99)])
+        await repo.remove_files("sess_1", ["b.txt"])
+
+        files = await repo.list_files("sess_1")
+        assert files == [WorkspaceFile(path="a.txt", size=99, etag=None, modified_at=None)]
+
+    @pytest.mark.asyncio
+    async def test_replace_keeps_files_written_after_listing(self, repo):
+        """测试对账保留列表开始后上传的文件，删除列表中已不存在的旧记录"""
+        listed_at = datetime.now(timezone.utc)
+        await repo.replace_files("sess_1", _files("old.txt", "kept.txt"), listed_at - timedelta(minutes=5))
+        await repo.upsert_files("sess_1", [WorkspaceFile(path="uploaded.txt", size=7)])
+
+        await repo.replace_files("sess_1", _files("kept.txt", "new.txt", "uploaded.txt"), listed_at)
+
+        files = {f.path: f for f in await repo.list_files("sess_1")}
+        assert sorted(files) == ["kept.txt", "new.txt", "uploaded.txt"]
+        # 上传记录比列表结果新，不被覆盖
+        assert files["uploaded.txt"].size == 7
+
+    @pytest.mark.asyncio
+    async def test_mark_stale_and_find_due(self, repo):
+        """测试过期标记与到期查询"""
+        now = datetime.now(timezone.utc)
+        await repo.replace_files("sess_old", [], now - timedelta(hours=1))
+        await repo.replace_files("sess_new", [], now)
+        await repo.replace_files("sess_stale", [], now)
+        await repo.mark_stale(["sess_stale"])
+
+        assert await repo.get_reconciled_at("sess_stale") is None
+        assert await repo.get_reconciled_at("sess_missing") is None
+        assert await repo.find_due(now - timedelta(minutes=5), limit=10) == ["sess_stale", "sess_old"]
+
+    @pytest.mark.asyncio
+    async def test_delete_session(self, repo):
+        """测试删除会话清单"""
+        await repo.replace_files("sess_1", _files("a.txt"), datetime.now(timezone.utc))
+        await repo.replace_files("sess_2", _files("b.txt"), datetime.now(timezone.utc))
+
+        await repo.delete_session("sess_1")
+
+        assert await repo.count_files("sess_1") == 0
+        assert await repo.get_reconciled_at("sess_1") is None
+        assert await repo.count_files("sess_2") == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_write_keeps_transaction_usable(self, repo):
+        """测试清单写入失败只回滚本次变更，外层事务仍可继续并提交"""
+        await repo.upsert_files("sess_1", _files("a.txt"))
+
+        with pytest.raises(IntegrityError):
+            await repo.upsert_files("sess_2", _files("dup.txt", "dup.txt"))
+
+        await repo.upsert_files("sess_2", _files("b.txt"))
+        await repo.commit()
+        assert await repo.count_files("sess_1") == 1
+        assert [f.path for f in await repo.list_files("sess_2")] == ["b.txt"]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_first_reconcile_is_idempotent(self, repo, monkeypatch):
+        """测试并发首次对账都未更新到清单行时，插入冲突改为更新"""
+        earlier = datetime.now(timezone.utc) - timedelta(minutes=1)
+        await repo.replace_files("sess_1", [], earlier)
+        await repo.commit()
+
+        session = repo._session
+        execute = session.execute
+        raced = []
+
+        async def racing_execute(stmt, *args, **kwargs):
+            result = await execute(stmt, *args, **kwargs)
+            if not raced and getattr(stmt, "is_update", False):
+                # 模拟另一请求在本次 UPDATE 之后才插入清单行
+                raced.append(stmt)
+                return Mock(rowcount=0)
+            return result
+
+        monkeypatch.setattr(session, "execute", racing_execute)
+        listed_at = datetime.now(timezone.utc)
+        await repo.replace_files("sess_1", _files("a.txt"), listed_at)
+        await repo.commit()
+
+        assert raced
+        assert abs((await repo.get_reconciled_at("sess_1")) - listed_at) < timedelta(milliseconds=1)
+        assert await repo.count_files("sess_1") == 1
@@ -0,0 +1,184 @@
+"""
+模板缓存单元测试
+
+测试 TemplateCache 的读穿透、失效与版本号传播，以及 CachedTemplateRepository 的写入失效。
+"""
+import asyncio
+from datetime import datetime
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from src.domain.entities.template import Template
+from src.domain.value_objects.resource_limit import ResourceLimit
+from src.infrastructure.persistence.database import Base
+from src.infrastructure.persistence.repositories.cached_template_repository import CachedTemplateRepository
+from src.infrastructure.persistence.template_cache import (
+    TEMPLATE_CACHE_NAME,
+    TemplateCache,
+    bump_cache_version,
+    read_cache_version,
+)
+
+
+def _make_template(template_id: str = "python-basic", image: str = "python:3.11-slim") -> Template:
+    return Template(
+        id=template_id,
+        name=template_id,
+        image=image,
+        base_image=image,
+        pre_installed_packages=[],
+        default_resources=ResourceLimit.default(),
+        created_at=datetime(2024, 1, 1),
+        updated_at=datetime(2024, 1, 1),
+    )
+
+
+class TestTemplateCache:
+    """模板缓存测试"""
+
+    @pytest.mark.asyncio
+    async def test_read_through_then_hit(self):
+        """测试首次读取加载，之后命中缓存"""
+        cache = TemplateCache()
+        loader = AsyncMock(return_value=_make_template())
+
+        first = await cache.get_or_load("python-basic", loader)
+        second = await cache.get_or_load("python-basic", loader)
+
+        loader.assert_called_once_with("python-basic")
+        assert first.image == second.image == "python:3.11-slim"
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+        assert cache.stats()["hit_ratio"] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_callers_cannot_mutate_cached_entry(self):
+        """测试调用方修改返回的实体不影响缓存"""
+        cache = TemplateCache()
+        loader = AsyncMock(return_value=_make_template())
+
+        template = await cache.get_or_load("python-basic", loader)
+        template.update_image("python:3.12-slim")
+
+        cached = await cache.get_or_load("python-basic", loader)
+        assert cached.image == "python:3.11-slim"
+
+    @pytest.mark.asyncio
+    async def test_missing_template_not_cached(self):
+        """测试不存在的模板不缓存"""
+        cache = TemplateCache()
+        loader = AsyncMock(return_value=None)
+
+        await cache.get_or_load("missing", loader)
+        await cache.get_or_load("missing", loader)
+
+        assert loader.call_count == 2
+        assert cache.stats()["size"] == 0
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_reloaded(self):
+        """测试过期条目重新加载"""
+        cache = TemplateCache(ttl_seconds=0)
+        loader = AsyncMock(return_value=_make_template())
+
+        await cache.get_or_load("python-basic", loader)
+        await cache.get_or_load("python-basic", loader)
+
+        assert loader.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_load_racing_invalidation_is_not_cached(self):
+        """测试加载期间发生失效时，加载到的旧模板不写入缓存"""
+        cache = TemplateCache()
+        loading = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow_loader(template_id):
+            loading.set()
+            await release.wait()
+            return _make_template(image="stale:1")
+
+        load = asyncio.create_task(cache.get_or_load("python-basic", slow_loader))
+        await loading.wait()
+        cache.invalidate("python-basic")
+        release.set()
+
+        assert (await load).image == "stale:1"
+        assert cache.stats()["size"] == 0
+
+    def test_apply_version_clears_on_change_only(self):
+        """测试版本号变化时清空缓存，首次与相同版本号不清空"""
+        cache = TemplateCache()
+        cache._entries["python-basic"] = Mock()
+
+        assert cache.apply_version(3) is False
+        assert cache.apply_version(3) is False
+        assert cache.stats()["size"] == 1
+
+        assert cache.apply_version(4) is True
+        assert cache.stats()["size"] == 0
+        assert cache.stats()["version"] == 4
+
+
+class TestCachedTemplateRepository:
+    """带缓存的模板仓储测试"""
+
+    @pytest.fixture
+    def inner(self):
+        inner = Mock()
+        inner.find_by_id = AsyncMock(return_value=_make_template())
+        inner.save = AsyncMock()
+        inner.delete = AsyncMock()
+        return inner
+
+    @pytest.mark.asyncio
+    async def test_find_by_id_served_from_cache(self, inner):
+        """测试按 ID 读取走缓存"""
+        repo = CachedTemplateRepository(inner, cache=TemplateCache())
+
+        await repo.find_by_id("python-basic")
+        await repo.find_by_id("python-basic")
+
+        inner.find_by_id.assert_called_once_with("python-basic")
+
+    @pytest.mark.asyncio
+    async def test_writes_invalidate_and_bump_version(self, inner):
+        """测试保存与删除立即失效缓存并递增版本号"""
+        cache = TemplateCache()
+        bumper = AsyncMock()
+        repo = CachedTemplateRepository(inner, cache=cache, version_bumper=bumper)
+
+        await repo.find_by_id("python-basic")
+        await repo.save(_make_template(image="python:3.12-slim"))
+        await repo.find_by_id("python-basic")
+        await repo.delete("python-basic")
+
+        assert inner.find_by_id.call_count == 2
+        assert bumper.call_count == 2
+        assert cache.stats()["size"] == 0
+
+
+class TestCacheVersionRow:
+    """缓存版本号读写测试"""
+
+    @pytest.fixture
+    async def session_factory(self):
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        yield async_sessionmaker(engine)
+        await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_bump_creates_then_increments(self, session_factory):
+        """测试版本号行不存在时创建，之后递增"""
+        async with session_factory() as session:
+            assert await read_cache_version(session, TEMPLATE_CACHE_NAME) == 0
+            await bump_cache_version(session, TEMPLATE_CACHE_NAME)
+            await bump_cache_version(session, TEMPLATE_CACHE_NAME)
+            await session.commit()
+
+        async with session_factory() as session:
+            assert await read_cache_version(session, TEMPLATE_CACHE_NAME) == 2
@@ -0,0 +1,43 @@
+"""
+按 ID 合并的写缓冲单元测试
+
+测试 WriteBehindBuffer 的丢弃、指标与写回钩子；合并与重试由各子类测试覆盖。
+"""
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from src.infrastructure.persistence.write_behind_buffer import WriteBehindBuffer
+
+
+class TestWriteBehindBuffer:
+    """按 ID 合并的写缓冲测试"""
+
+    def test_discard_drops_pending(self):
+        """测试丢弃未写回的更新"""
+        buffer = WriteBehindBuffer(writer=AsyncMock())
+        buffer.record("a")
+        buffer.record("b")
+
+        buffer.discard(["a", "missing"])
+
+        assert list(buffer._pending) == ["b"]
+
+    @pytest.mark.asyncio
+    async def test_flush_reports_metrics_and_hook(self):
+        """测试写回后更新待写回数与耗时指标，并按批调用钩子"""
+        gauge = Mock()
+        histogram = Mock()
+        buffer = WriteBehindBuffer(
+            writer=AsyncMock(return_value=2),
+            max_batch=2,
+            pending_gauge=gauge,
+            flush_seconds=histogram,
+        )
+        buffer._on_batch_flushed = Mock()
+        for key in ("a", "b", "c"):
+            buffer.record(key)
+
+        assert await buffer.flush() == 3
+        assert [call.args[0] for call in buffer._on_batch_flushed.call_args_list] == [2, 1]
+        assert histogram.observe.call_count == 2
+        gauge.set.assert_called_with(0)
@@ -33,6 +33,7 @@ class TestDockerSchedulerService:
         scheduler.stop_container = AsyncMock()
         scheduler.remove_container = AsyncMock()
         scheduler.get_container_status = AsyncMock()
+        scheduler.supports_pause = True
         return scheduler
 
     @pytest.fixture
@@ -267,6 +268,57 @@ class TestDockerSchedulerService:
         with pytest.raises(RuntimeError):
             await service.destroy_container("container-123")
 
+    @pytest.mark.asyncio
+    async def test_pause_container_running(self, service, container_scheduler):
+        """测试暂停运行中的容器"""
+        container_scheduler.get_container_status.return_value = Mock(status="running")
+        container_scheduler.pause_container = AsyncMock()
+
+        assert await service.pause_container("container-123") is True
+        container_scheduler.pause_container.assert_called_once_with("container-123")
+
+    @pytest.mark.asyncio
+    async def test_pause_container_skips_already_paused(self, service, container_scheduler):
+        """测试已暂停的容器不重复暂停"""
+        container_scheduler.get_container_status.return_value = Mock(status="paused")
+        container_scheduler.pause_container = AsyncMock()
+
+        assert await service.pause_container("container-123") is False
+        container_scheduler.pause_container.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_unpause_container_records_latency(self, service, container_scheduler):
+        """测试恢复暂停容器并返回耗时"""
+        container_scheduler.get_container_status.return_value = Mock(status="paused")
+        container_scheduler.unpause_container = AsyncMock()
+
+        latency_ms = await service.unpause_container("container-123")
+
+        assert latency_ms is not None and latency_ms >= 0
+        container_scheduler.unpause_container.assert_called_once_with("container-123")
+
+    @pytest.mark.asyncio
+    async def test_unpause_container_noop_when_running(self, service, container_scheduler):
+        """测试运行中的容器无需恢复"""
+        container_scheduler.get_container_status.return_value = Mock(status="running")
+        container_scheduler.unpause_container = AsyncMock()
+
+        assert await service.unpause_container("container-123") is None
+        container_scheduler.unpause_container.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_pause_unsupported_by_runtime(self, service, container_scheduler):
+        """测试运行时不支持冻结时不查询状态也不调用 pause / unpause"""
+        container_scheduler.supports_pause = False
+        container_scheduler.pause_container = AsyncMock()
+        container_scheduler.unpause_container = AsyncMock()
+
+        assert await service.pause_container("pod-123") is False
+        assert await service.unpause_container("pod-123") is None
+        container_scheduler.get_container_status.assert_not_called()
+        container_scheduler.pause_container.assert_not_called()
+        container_scheduler.unpause_container.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_get_container_info(self, service, container_scheduler):
         """测试获取容器信息"""
@@ -0,0 +1,345 @@
+"""
+异步 S3 存储单元测试
+
+通过 httpx.MockTransport 模拟 S3，测试 AsyncS3Storage 的签名、对象读写、
+分片上传、分页列表、批量删除、超时与重试。
+"""
+import re
+from unittest.mock import Mock, patch
+from urllib.parse import unquote
+
+import httpx
+import pytest
+
+from src.infrastructure.storage.async_s3_storage import AsyncS3Storage, S3RequestError
+from src.shared.errors.domain import ConflictError, NotFoundError
+from src.shared.errors.infrastructure import StorageError
+
+
+class FakeS3:
+    """最小化的内存 S3，按路径风格解析 bucket/key"""
+
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}
+        self.requests = []
+        self.fail_next = []
+        self.page_size = 1000
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.fail_next:
+            failure = self.fail_next.pop(0)
+            if isinstance(failure, Exception):
+                raise failure
+            return httpx.Response(failure)
+
+        _, bucket, *rest = request.url.path.split("/", 2)
+        key = unquote(rest[0]) if rest else ""
+        params = request.url.params
+        method = request.method
+
+        if not key:
+            if "list-type" in params:
+                return self._list(params)
+            if "delete" in params:
+                return self._delete_objects(request)
+            return httpx.Response(200)
+
+        if "uploads" in params:
+            upload_id = f"upload-{len(self.uploads) + 1}"
+            self.uploads[upload_id] = {}
+            return httpx.Response(200, content=f"<InitiateMultipartUploadResult><UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>".encode())
+        if "uploadId" in params:
+            return self._multipart(request, key, params)
+
+        if method == "PUT":
+            self.objects[key] = (request.content, request.headers.get("content-type", "binary/octet-stream"))
+            return httpx.Response(200, headers={"ETag": '"etag"'})
+        if method == "DELETE":
+            self.objects.pop(key, None)
+            return httpx.Response(204)
+        if key not in self.objects:
+            return httpx.Response(404, content=b"<Error><Code>NoSuchKey</Code></Error>" if method == "GET" else b"")
+
+        content, content_type = self.objects[key]
+        headers = {
+            "ETag": '"etag"',
+            "Content-Type": content_type,
+            "Last-Modified": "Fri, 02 Jan 2026 03:04:05 GMT",
+        }
+        if request.headers.get("if-match") not in (None, '"etag"'):
+            return httpx.Response(412, content=b"<Error><Code>PreconditionFailed</Code></Error>")
+        if method == "HEAD":
+            return httpx.Response(200, headers={**headers, "Content-Length": str(len(content))})
+        match = re.match(r"bytes=(\d+)-(\d*)", request.headers.get("range", ""))
+        if match:
+            start, end = int(match.group(1)), int(match.group(2) or len(content) - 1)
+            return httpx.Response(206, headers=headers, content=content[start:end + 1])
+        return httpx.Response(200, headers=headers, content=content)
+
+    def _list(self, params) -> httpx.Response:
+        keys = sorted(k for k in self.objects if k.startswith(params.get("prefix", "")))
+        # 与真实 S3 一致：续传标记指向最后返回的 key，而不是偏移量
+        after = params.get("continuation-token", "")
+        keys = [k for k in keys if k > after]
+        page = keys[:self.page_size]
+        truncated = self.page_size < len(keys)
+        contents = "".join(
+            f"<Contents><Key>{k}</Key><Size>{len(self.objects[k][0])}</Size>"
+            f"<LastModified>2026-01-02T03:04:05.000Z</LastModified><ETag>\"etag\"</ETag></Contents>"
+            for k in page
+        )
+        token = f"<NextContinuationToken>{page[-1]}</NextContinuationToken>" if truncated else ""
+        body = (
+            '<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+            f"<IsTruncated>{'true' if truncated else 'false'}</IsTruncated>{token}{contents}</ListBucketResult>"
+        )
+        return httpx.Response(200, content=body.encode())
+
+    def _delete_objects(self, request) -> httpx.Response:
+        keys = re.findall(r"<Key>(.*?)</Key>", request.content.decode())
+        for key in keys:
+            self.objects.pop(key, None)
+        return httpx.Response(200, content=b"<DeleteResult></DeleteResult>")
+
+    def _multipart(self, request, key, params) -> httpx.Response:
+        parts = self.uploads[params["uploadId"]]
+        if request.method == "PUT":
+            number = int(params["partNumber"])
+            parts[number] = request.content
+            return httpx.Response(200, headers={"ETag": f'"part-{number}"'})
+        if request.method == "GET":
+            body = "".join(
+                f"<Part><PartNumber>{n}</PartNumber><Size>{len(c)}</Size><ETag>\"part-{n}\"</ETag></Part>"
+                for n, c in sorted(parts.items())
+            )
+            return httpx.Response(200, content=f"<ListPartsResult><IsTruncated>false</IsTruncated>{body}</ListPartsResult>".encode())
+        if request.method == "POST":
+            numbers = [int(n) for n in re.findall(r"<PartNumber>(\d+)</PartNumber>", request.content.decode())]
+            self.objects[key] = (b"".join(parts[n] for n in numbers), "binary/octet-stream")
+            return httpx.Response(200, content=b"<CompleteMultipartUploadResult></CompleteMultipartUploadResult>")
+        del self.uploads[params["uploadId"]]
+        return httpx.Response(204)
+
+
+class TestAsyncS3Storage:
+    """异步 S3 存储测试"""
+
+    @pytest.fixture
+    def fake_s3(self):
+        return FakeS3()
+
+    @pytest.fixture
+    def mock_settings(self):
+        settings = Mock()
+        settings.s3_endpoint_url = "http://minio:9000"
+        settings.s3_access_key_id = "minioadmin"
+        settings.s3_secret_access_key = "minioadmin"
+        settings.s3_region = "us-east-1"
+        settings.s3_bucket = "sandbox-workspace"
+        settings.s3_max_connections = 8
+        settings.s3_connect_timeout_seconds = 1.0
+        settings.s3_metadata_timeout_seconds = 2.0
+        settings.s3_transfer_timeout_seconds = 30.0
+        settings.s3_max_attempts = 3
+        settings.s3_retry_base_delay_seconds = 0
+        settings.s3_delete_concurrency = 4
+        return settings
+
+    @pytest.fixture
+    def storage(self, fake_s3, mock_settings):
+        with patch("src.infrastructure.storage.async_s3_storage.get_settings", return_value=mock_settings):
+            return AsyncS3Storage(transport=httpx.MockTransport(fake_s3))
+
+    @pytest.mark.asyncio
+    async def test_upload_and_download_roundtrip(self, storage, fake_s3):
+        """测试上传、查询信息与下载，请求经过 SigV4 签名"""
+        await storage.upload_file("s3://sandbox-workspace/sessions/s1/a b.txt", b"hello", "text/plain")
+
+        assert fake_s3.objects["sessions/s1/a b.txt"] == (b"hello", "text/plain")
+        put = next(r for r in fake_s3.requests if r.method == "PUT")
+        assert put.url.raw_path == b"/sandbox-workspace/sessions/s1/a%20b.txt"
+        assert put.headers["authorization"].startswith("AWS4-HMAC-SHA256 Credential=minioadmin/")
+
+        info = await storage.get_file_info("sessions/s1/a b.txt")
+        assert info["size"] == 5
+        assert info["content_type"] == "text/plain"
+        assert info["etag"] == "etag"
+        assert info["last_modified"].year == 2026
+        assert await storage.download_file("sessions/s1/a b.txt") == b"hello"
+
+    @pytest.mark.asyncio
+    async def test_bucket_checked_once(self, storage, fake_s3):
+        """测试 bucket 存在性只检查一次"""
+        await storage.upload_file("a.txt", b"1")
+        await storage.upload_file("b.txt", b"2")
+
+        head_bucket = [r for r in fake_s3.requests if r.method == "HEAD" and r.url.path == "/sandbox-workspace"]
+        assert len(head_bucket) == 1
+
+    @pytest.mark.asyncio
+    async def test_upload_removes_directory_marker(self, storage, fake_s3):
+        """测试上传后删除 s3fs 目录标记"""
+        fake_s3.objects["dir/"] = (b"", "application/x-directory")
+
+        await storage.upload_file("dir/file.txt", b"content")
+
+        assert "dir/" not in fake_s3.objects
+
+    @pytest.mark.asyncio
+    async def test_missing_file(self, storage):
+        """测试文件不存在"""
+        assert await storage.file_exists("missing.txt") is False
+        with pytest.raises(NotFoundError):
+            await storage.get_file_info("missing.txt")
+        with pytest.raises(NotFoundError):
+            await storage.open_file_stream("missing.txt")
+
+    @pytest.mark.asyncio
+    async def test_open_file_stream_range(self, storage, fake_s3):
+        """测试按区间流式读取"""
+        fake_s3.objects["big.bin"] = (b"0123456789", "application/octet-stream")
+
+        stream = await storage.open_file_stream("big.bin", start=2, end=5, etag="etag")
+
+        assert b"".join([chunk async for chunk in stream]) == b"2345"
+        request = fake_s3.requests[-1]
+        assert request.headers["range"] == "bytes=2-5"
+        assert request.headers["if-match"] == '"etag"'
+
+    @pytest.mark.asyncio
+    async def test_open_file_stream_etag_changed(self, storage, fake_s3):
+        """测试对象已被替换时抛出 ConflictError"""
+        fake_s3.objects["big.bin"] = (b"0123456789", "application/octet-stream")
+
+        with pytest.raises(ConflictError):
+            await storage.open_file_stream("big.bin", etag="old")
+
+    @pytest.mark.asyncio
+    async def test_multipart_upload(self, storage, fake_s3):
+        """测试分片上传、列出分片与合并"""
+        upload_id = await storage.create_multipart_upload("big.bin")
+        assert await storage.upload_part("big.bin", upload_id, 2, b"world") == "part-2"
+        await storage.upload_part("big.bin", upload_id, 1, b"hello ")
+
+        parts = await storage.list_parts("big.bin", upload_id)
+        assert [p["part_number"] for p in parts] == [1, 2]
+
+        await storage.complete_multipart_upload("big.bin", upload_id, parts)
+        assert fake_s3.objects["big.bin"][0] == b"hello world"
+
+    @pytest.mark.asyncio
+    async def test_complete_multipart_error_in_200_body(self, storage, fake_s3):
+        """测试 S3 以 200 返回合并错误时抛出异常"""
+        fake_s3.uploads["upload-x"] = {}
+        storage._client._transport = httpx.MockTransport(
+            lambda request: httpx.Response(200, content=b"<Error><Code>InternalError</Code></Error>")
+        )
+
+        with pytest.raises(S3RequestError, match="InternalError"):
+            await storage.complete_multipart_upload("big.bin", "upload-x", [{"part_number": 1, "etag": "a"}])
+
+    @pytest.mark.asyncio
+    async def test_complete_multipart_keepalive_whitespace(self, storage, fake_s3):
+        """测试 XML 声明前的空白保活字节不影响解析"""
+        storage._client._transport = httpx.MockTransport(
+            lambda request: httpx.Response(
+                200,
+                content=b"\n \n \n<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n"
+                b"<CompleteMultipartUploadResult><ETag>\"etag\"</ETag></CompleteMultipartUploadResult>",
+            )
+        )
+
+        await storage.complete_multipart_upload("big.bin", "upload-x", [{"part_number": 1, "etag": "a"}])
+
+    @pytest.mark.asyncio
+    async def test_complete_multipart_error_after_keepalive_whitespace(self, storage, fake_s3):
+        """测试空白保活之后返回的 Error 响应体抛出 StorageError"""
+        storage._client._transport = httpx.MockTransport(
+            lambda request: httpx.Response(
+                200,
+                content=b"   \n<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n"
+                b"<Error><Code>InternalError</Code><Message>We encountered an internal error.</Message></Error>",
+            )
+        )
+
+        with pytest.raises(StorageError, match="InternalError"):
+            await storage.complete_multipart_upload("big.bin", "upload-x", [{"part_number": 1, "etag": "a"}])
+
+    @pytest.mark.asyncio
+    async def test_list_files_paginates(self, storage, fake_s3):
+        """测试分页列出并遵守 limit"""
+        fake_s3.page_size = 2
+        for i in range(5):
+            fake_s3.objects[f"sessions/s1/f{i}.txt"] = (b"x" * i, "text/plain")
+
+        files = await storage.list_files("s3://sandbox-workspace/sessions/s1/")
+        assert [f["key"] for f in files] == [f"sessions/s1/f{i}.txt" for i in range(5)]
+        assert files[3]["size"] == 3
+
+        assert len(await storage.list_files("sessions/s1/", limit=3)) == 3
+
+    @pytest.mark.asyncio
+    async def test_delete_prefix(self, storage, fake_s3):
+        """测试批量删除前缀下的对象"""
+        fake_s3.page_size = 2
+        for i in range(3):
+            fake_s3.objects[f"sessions/s1/f{i}.txt"] = (b"x", "text/plain")
+        fake_s3.objects["sessions/s2/keep.txt"] = (b"x", "text/plain")
+
+        deleted = await storage.delete_prefix("sessions/s1/")
+
+        assert deleted == 3
+        assert list(fake_s3.objects) == ["sessions/s2/keep.txt"]
+        delete_request = next(r for r in fake_s3.requests if "delete" in r.url.params)
+        assert "content-md5" in delete_request.headers
+
+    @pytest.mark.asyncio
+    async def test_presigned_url(self, storage, fake_s3):
+        """测试本地生成预签名 URL"""
+        url = await storage.generate_presigned_url("sessions/s1/a.txt", expiration_seconds=60)
+
+        assert url.startswith("http://minio:9000/sandbox-workspace/sessions/s1/a.txt?")
+        assert "X-Amz-Expires=60" in url
+        assert "X-Amz-Signature=" in url
+        assert fake_s3.requests == []
+
+    @pytest.mark.asyncio
+    async def test_per_operation_timeouts(self, storage, fake_s3):
+        """测试元数据请求与内容传输使用不同超时"""
+        await storage.upload_file("a.txt", b"1")
+        await storage.file_exists("a.txt")
+
+        put = next(r for r in fake_s3.requests if r.method == "PUT")
+        head = fake_s3.requests[-1]
+        assert put.extensions["timeout"]["read"] == 30.0
+        assert head.extensions["timeout"]["read"] == 2.0
+        assert head.extensions["timeout"]["connect"] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_retries_server_errors(self, storage, fake_s3):
+        """测试 5xx 与网络错误按次数重试"""
+        fake_s3.objects["a.txt"] = (b"1", "text/plain")
+        fake_s3.fail_next = [503, httpx.ConnectError("refused")]
+
+        assert await storage.file_exists("a.txt") is True
+        assert len(fake_s3.requests) == 3
+
+    @pytest.mark.asyncio
+    async def test_retries_exhausted(self, storage, fake_s3):
+        """测试超过最大尝试次数后抛出存储错误"""
+        fake_s3.fail_next = [httpx.ConnectError("refused")] * 3
+
+        with pytest.raises(StorageError):
+            await storage.file_exists("a.txt")
+        assert len(fake_s3.requests) == 3
+
+    @pytest.mark.asyncio
+    async def test_last_server_error_returned(self, storage, fake_s3):
+        """测试最后一次仍为 5xx 时返回错误而不是继续重试"""
+        fake_s3.fail_next = [503, 503, 503]
+
+        with pytest.raises(S3RequestError):
+            await storage.get_file_info("a.txt")
+        assert len(fake_s3.requests) == 3
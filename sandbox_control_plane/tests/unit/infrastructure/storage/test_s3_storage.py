@@ -29,6 +29,7 @@ class TestS3Storage:
         settings.s3_secret_access_key = "minioadmin"
         settings.s3_region = "us-east-1"
         settings.s3_bucket = "sandbox-workspace"
+        settings.s3_delete_concurrency = 4
         return settings
 
     @pytest.fixture
@@ -158,6 +159,19 @@ class TestS3Storage:
         assert "last_modified" in info
         assert info["etag"] == "abc123"
 
+    @pytest.mark.asyncio
+    async def test_get_file_info_not_found(self, storage, mock_boto_client):
+        """测试获取不存在文件的信息抛出 NotFoundError"""
+        from botocore.exceptions import ClientError
+        from src.shared.errors.domain import NotFoundError
+
+        mock_boto_client.head_object.side_effect = ClientError(
+            {'Error': {'Code': '404'}}, 'HeadObject'
+        )
+
+        with pytest.raises(NotFoundError):
+            await storage.get_file_info("s3://test-bucket/missing.txt")
+
     @pytest.mark.asyncio
     async def test_get_file_info_default_content_type(self, storage, mock_boto_client):
         """测试获取文件信息（缺少 content_type）"""
@@ -413,8 +427,9 @@ class TestS3Storage:
 
     @pytest.mark.asyncio
     async def test_delete_prefix_error(self, storage, mock_boto_client):
-        """测试删除前缀时出错"""
+        """测试删除前缀时列表出错，抛出 StorageError 以便调用方重试"""
         from botocore.exceptions import ClientError
+        from src.shared.errors.infrastructure import StorageError
 
         mock_paginator = Mock()
         mock_paginator.paginate.side_effect = ClientError(
@@ -422,9 +437,47 @@ class TestS3Storage:
         )
         mock_boto_client.get_paginator.return_value = mock_paginator
 
-        deleted_count = await storage.delete_prefix("sessions/test/")
+        with pytest.raises(StorageError, match="listing failed"):
+            await storage.delete_prefix("sessions/test/")
 
-        assert deleted_count == 0
+    @pytest.mark.asyncio
+    async def test_delete_prefix_pipelines_batches(self, storage, mock_boto_client):
+        """测试按 1000 个一批并发删除，并报告累计进度"""
+        mock_paginator = Mock()
+        mock_paginator.paginate.return_value = [
+            {'Contents': [{'Key': f'sessions/big/f{i}'} for i in range(page * 1000, page * 1000 + 1000)]}
+            for page in range(2)
+        ] + [{'Contents': [{'Key': 'sessions/big/last'}]}]
+        mock_boto_client.get_paginator.return_value = mock_paginator
+        mock_boto_client.delete_objects.return_value = {}
+        progress = []
+
+        deleted_count = await storage.delete_prefix("sessions/big/", on_progress=progress.append)
+
+        assert deleted_count == 2001
+        batch_sizes = sorted(
+            len(call.kwargs['Delete']['Objects']) for call in mock_boto_client.delete_objects.call_args_list
+        )
+        assert batch_sizes == [1, 1000, 1000]
+        assert mock_boto_client.delete_objects.call_args.kwargs['Delete']['Quiet'] is True
+        assert progress[-1] == 2001
+
+    @pytest.mark.asyncio
+    async def test_delete_prefix_partial_failure(self, storage, mock_boto_client):
+        """测试 DeleteObjects 返回逐键错误时抛出 StorageError"""
+        from src.shared.errors.infrastructure import StorageError
+
+        mock_paginator = Mock()
+        mock_paginator.paginate.return_value = [
+            {'Contents': [{'Key': 'sessions/test/a'}, {'Key': 'sessions/test/b'}]}
+        ]
+        mock_boto_client.get_paginator.return_value = mock_paginator
+        mock_boto_client.delete_objects.return_value = {
+            'Errors': [{'Key': 'sessions/test/b', 'Code': 'AccessDenied'}]
+        }
+
+        with pytest.raises(StorageError, match="1 objects failed"):
+            await storage.delete_prefix("sessions/test/")
 
     @pytest.mark.asyncio
     async def test_list_files_empty(self, storage, mock_boto_client):
@@ -482,3 +535,112 @@ class TestS3Storage:
         files = await storage.list_files("sessions/sess_123/")
 
         assert len(files) == 1
+
+    @pytest.mark.asyncio
+    async def test_create_multipart_upload(self, storage, mock_boto_client):
+        """测试创建分片上传"""
+        mock_boto_client.head_bucket.return_value = {}
+        mock_boto_client.create_multipart_upload.return_value = {'UploadId': 'upload-1'}
+
+        upload_id = await storage.create_multipart_upload("s3://test-bucket/dir/big.bin", "application/zip")
+
+        assert upload_id == "upload-1"
+        mock_boto_client.create_multipart_upload.assert_called_once_with(
+            Bucket="test-bucket", Key="dir/big.bin", ContentType="application/zip"
+        )
+
+    @pytest.mark.asyncio
+    async def test_upload_part_returns_unquoted_etag(self, storage, mock_boto_client):
+        """测试上传分片返回去掉引号的 ETag"""
+        mock_boto_client.upload_part.return_value = {'ETag': '"abc"'}
+
+        etag = await storage.upload_part("s3://test-bucket/big.bin", "upload-1", 2, b"data")
+
+        assert etag == "abc"
+        mock_boto_client.upload_part.assert_called_once_with(
+            Bucket="test-bucket", Key="big.bin", UploadId="upload-1", PartNumber=2, Body=b"data"
+        )
+
+    @pytest.mark.asyncio
+    async def test_list_parts_paginates_and_sorts(self, storage, mock_boto_client):
+        """测试分页列出分片并按分片号排序"""
+        mock_paginator = Mock()
+        mock_paginator.paginate.return_value = [
+            {'Parts': [{'PartNumber': 2, 'Size': 4, 'ETag': '"b"'}]},
+            {'Parts': [{'PartNumber': 1, 'Size': 10, 'ETag': '"a"'}]},
+        ]
+        mock_boto_client.get_paginator.return_value = mock_paginator
+
+        parts = await storage.list_parts("s3://test-bucket/big.bin", "upload-1")
+
+        assert parts == [
+            {'part_number': 1, 'size': 10, 'etag': 'a'},
+            {'part_number': 2, 'size': 4, 'etag': 'b'},
+        ]
+        mock_boto_client.get_paginator.assert_called_once_with('list_parts')
+
+    @pytest.mark.asyncio
+    async def test_complete_multipart_upload(self, storage, mock_boto_client):
+        """测试完成分片上传时按分片号排序并清理目录标记"""
+        mock_boto_client.head_object.return_value = {}
+
+        await storage.complete_multipart_upload(
+            "s3://test-bucket/dir/big.bin",
+            "upload-1",
+            [{'part_number': 2, 'etag': 'b'}, {'part_number': 1, 'etag': 'a'}],
+        )
+
+        call_kwargs = mock_boto_client.complete_multipart_upload.call_args.kwargs
+        assert call_kwargs['MultipartUpload'] == {
+            'Parts': [{'PartNumber': 1, 'ETag': '"a"'}, {'PartNumber': 2, 'ETag': '"b"'}]
+        }
+        mock_boto_client.delete_object.assert_called_once_with(Bucket="test-bucket", Key="dir/")
+
+    @pytest.mark.asyncio
+    async def test_abort_multipart_upload(self, storage, mock_boto_client):
+        """测试取消分片上传"""
+        await storage.abort_multipart_upload("s3://test-bucket/big.bin", "upload-1")
+
+        mock_boto_client.abort_multipart_upload.assert_called_once_with(
+            Bucket="test-bucket", Key="big.bin", UploadId="upload-1"
+        )
+
+    @pytest.mark.asyncio
+    async def test_open_file_stream_reads_in_chunks(self, storage, mock_boto_client):
+        """测试按区间和 ETag 发起 GetObject 并逐块读取"""
+        body = Mock()
+        body.read.side_effect = [b"abc", b"de", b""]
+        mock_boto_client.get_object.return_value = {'Body': body}
+
+        stream = await storage.open_file_stream("s3://test-bucket/big.bin", start=10, end=14, etag="abc")
+        chunks = [chunk async for chunk in stream]
+
+        assert chunks == [b"abc", b"de"]
+        mock_boto_client.get_object.assert_called_once_with(
+            Bucket="test-bucket", Key="big.bin", Range="bytes=10-14", IfMatch='"abc"'
+        )
+        body.close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_open_file_stream_open_ended_range(self, storage, mock_boto_client):
+        """测试只有起始字节的区间"""
+        body = Mock()
+        body.read.return_value = b""
+        mock_boto_client.get_object.return_value = {'Body': body}
+
+        await storage.open_file_stream("s3://test-bucket/big.bin", start=100)
+
+        assert mock_boto_client.get_object.call_args.kwargs["Range"] == "bytes=100-"
+
+    @pytest.mark.asyncio
+    async def test_open_file_stream_etag_changed(self, storage, mock_boto_client):
+        """测试对象在 HEAD 之后被替换时抛出 ConflictError"""
+        from botocore.exceptions import ClientError
+        from src.shared.errors.domain import ConflictError
+
+        mock_boto_client.get_object.side_effect = ClientError(
+            {'Error': {'Code': 'PreconditionFailed'}}, 'GetObject'
+        )
+
+        with pytest.raises(ConflictError):
+            await storage.open_file_stream("s3://test-bucket/big.bin", etag="old")
@@ -0,0 +1,55 @@
+"""
+主节点选举单元测试
+
+测试 LeaderElector 的获取、续约失败容忍、让出与释放。
+"""
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from src.infrastructure.background_tasks.leader_election import LeaderElector
+
+
+class TestLeaderElector:
+    """主节点选举测试"""
+
+    @pytest.mark.asyncio
+    async def test_acquire_and_lose(self):
+        """测试获取租约后成为主节点，租约被其他进程持有时立即让出"""
+        acquire = AsyncMock(return_value=True)
+        elector = LeaderElector(acquire=acquire, release=AsyncMock(), lease_seconds=30, holder_id="pod-a")
+
+        assert elector.is_leader is False
+        assert await elector.renew() is True
+        assert elector.renew_interval_seconds == 10
+
+        acquire.return_value = False
+        assert await elector.renew() is False
+
+    @pytest.mark.asyncio
+    async def test_renew_error_keeps_leadership_until_local_expiry(self):
+        """测试续约异常时在本地有效期（租约的一半）内保持主节点，之后让出"""
+        acquire = AsyncMock(return_value=True)
+        elector = LeaderElector(acquire=acquire, release=AsyncMock(), lease_seconds=30)
+
+        with patch("src.infrastructure.background_tasks.leader_election.time.monotonic", return_value=100.0):
+            await elector.renew()
+
+        acquire.side_effect = ConnectionError("database unavailable")
+        with patch("src.infrastructure.background_tasks.leader_election.time.monotonic", return_value=110.0):
+            assert await elector.renew() is True
+        with patch("src.infrastructure.background_tasks.leader_election.time.monotonic", return_value=116.0):
+            assert await elector.renew() is False
+
+    @pytest.mark.asyncio
+    async def test_release_only_when_held(self):
+        """测试只有持有过租约时才释放"""
+        release = AsyncMock()
+        elector = LeaderElector(acquire=AsyncMock(return_value=True), release=release)
+
+        await elector.release()
+        release.assert_not_called()
+
+        await elector.renew()
+        await elector.release()
+        release.assert_called_once()
+        assert elector.is_leader is False
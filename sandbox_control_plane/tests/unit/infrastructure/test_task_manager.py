@@ -3,11 +3,13 @@
 
 测试 BackgroundTask 和 BackgroundTaskManager 的功能。
 """
+import os
 import pytest
 import asyncio
 from unittest.mock import Mock, AsyncMock, patch
 
 from src.infrastructure.background_tasks.task_manager import (
+    OVERRUN_QUEUE,
     BackgroundTask,
     BackgroundTaskManager,
 )
@@ -161,6 +163,102 @@ class TestBackgroundTask:
         assert task.is_running is False
 
 
+class TestBackgroundTaskInstrumentation:
+    """后台任务运行统计与超时运行测试"""
+
+    @pytest.mark.asyncio
+    async def test_records_duration_and_last_error(self):
+        """测试记录运行次数、耗时与最近错误，成功后连续失败清零"""
+        func = AsyncMock(side_effect=[RuntimeError("db down"), None, None])
+        task = BackgroundTask(name="stats_task", func=func, interval_seconds=0.03)
+
+        await task.start()
+        await asyncio.sleep(0.08)
+        await task.stop()
+
+        stats = task.stats()
+        assert stats["runs"] >= 2
+        assert stats["failures"] == 1
+        assert stats["consecutive_failures"] == 0
+        assert stats["last_error"] == "RuntimeError: db down"
+        assert stats["last_duration_seconds"] is not None
+        assert stats["max_duration_seconds"] >= stats["last_duration_seconds"]
+
+    @pytest.mark.asyncio
+    async def test_overrun_skip_policy_drops_missed_runs(self):
+        """测试 skip 策略：超时运行后跳过错过的执行点"""
+        calls = []
+
+        async def slow():
+            calls.append(asyncio.get_running_loop().time())
+            await asyncio.sleep(0.07)
+
+        task = BackgroundTask(name="slow_skip", func=slow, interval_seconds=0.03)
+        await task.start()
+        await asyncio.sleep(0.15)
+        await task.stop()
+
+        assert task.overruns >= 1
+        assert task.skipped_runs >= 2
+        # 下一次运行在未来的执行点，而不是紧接着上一次结束
+        assert calls[1] - calls[0] >= 0.09
+
+    @pytest.mark.asyncio
+    async def test_overrun_queue_policy_runs_immediately(self):
+        """测试 queue 策略：超时运行结束后立即补跑，不丢弃执行点"""
+        calls = []
+
+        async def slow():
+            calls.append(asyncio.get_running_loop().time())
+            await asyncio.sleep(0.07)
+
+        task = BackgroundTask(name="slow_queue", func=slow, interval_seconds=0.03, overrun_policy=OVERRUN_QUEUE)
+        await task.start()
+        await asyncio.sleep(0.16)
+        await task.stop()
+
+        assert task.overruns >= 1
+        assert task.skipped_runs == 0
+        assert calls[1] - calls[0] < 0.09
+
+    def test_behind_tolerance(self):
+        """测试耗时与延迟在容差内不视为 behind"""
+        task = BackgroundTask(name="tick", func=AsyncMock(), interval_seconds=1, behind_tolerance_seconds=5)
+        task._running = True
+        task._task = Mock(done=Mock(return_value=False))
+
+        task.last_duration_seconds = 3.0
+        task.last_lag_seconds = 2.0
+        assert task.state == "ok"
+
+        task.last_duration_seconds = 6.5
+        assert task.state == "behind"
+        assert task.stats()["behind_tolerance_seconds"] == 5
+
+    def test_invalid_overrun_policy(self):
+        """测试无效的超时运行策略"""
+        with pytest.raises(ValueError):
+            BackgroundTask(name="t", func=AsyncMock(), interval_seconds=1, overrun_policy="drop")
+
+    @pytest.mark.asyncio
+    async def test_set_interval_wakes_waiting_task(self):
+        """测试等待中修改间隔立即按新间隔执行"""
+        func = AsyncMock()
+        task = BackgroundTask(name="slow_interval", func=func, interval_seconds=10)
+
+        await task.start()
+        await asyncio.sleep(0.02)
+        assert func.call_count == 1
+
+        task.set_interval(0.02)
+        await asyncio.sleep(0.07)
+        await task.stop()
+
+        assert func.call_count >= 3
+        with pytest.raises(ValueError):
+            task.set_interval(0)
+
+
 class TestBackgroundTaskManager:
     """后台任务管理器测试"""
 
@@ -337,3 +435,59 @@ class TestBackgroundTaskManager:
         # task1 should have been called more times than task2
         # due to shorter interval
         assert call_counts["task1"] > call_counts["task2"]
+
+    @pytest.mark.asyncio
+    async def test_leader_only_tasks_skip_on_followers(self):
+        """测试未持有租约时跳过 leader_only 任务，普通任务照常执行"""
+        elector = Mock()
+        elector.is_leader = False
+        elector.renew = AsyncMock()
+        elector.renew_interval_seconds = 10
+        elector.release = AsyncMock()
+        manager = BackgroundTaskManager(leader_elector=elector)
+
+        leader_func, local_func = AsyncMock(), AsyncMock()
+        manager.register_task("cleanup", leader_func, 0.02, leader_only=True)
+        manager.register_task("flush", local_func, 0.02)
+
+        await manager.start_all()
+        await asyncio.sleep(0.05)
+        leader_func.assert_not_called()
+        assert local_func.call_count >= 1
+
+        elector.is_leader = True
+        await asyncio.sleep(0.05)
+        await manager.stop_all()
+
+        assert leader_func.call_count >= 1
+        elector.renew.assert_called()
+        elector.release.assert_called_once()
+        assert "leader_election" in manager.get_task_status()
+
+    @pytest.mark.asyncio
+    async def test_set_interval_unknown_task(self, manager, task_func):
+        """测试修改不存在任务的间隔"""
+        manager.register_task("task1", task_func, 5)
+
+        manager.set_interval("task1", 2)
+        assert manager.get_task("task1").interval_seconds == 2
+        with pytest.raises(KeyError):
+            manager.set_interval("missing", 2)
+
+    @pytest.mark.asyncio
+    async def test_health_reports_failing_tasks(self, manager):
+        """测试连续失败的任务使整体状态为 degraded"""
+        manager.register_task("broken", AsyncMock(side_effect=RuntimeError("boom")), 0.01)
+        manager.register_task("fine", AsyncMock(), 0.01)
+
+        await manager.start_all()
+        await asyncio.sleep(0.06)
+        health = manager.health()
+        await manager.stop_all()
+
+        assert health["status"] == "degraded"
+        assert health["unhealthy_tasks"] == ["broken"]
+        assert health["tasks"]["broken"]["state"] == "failing"
+        assert health["tasks"]["fine"]["state"] == "ok"
+        assert health["process"]["pid"] == os.getpid()
+        assert health["process"]["leader"] is None
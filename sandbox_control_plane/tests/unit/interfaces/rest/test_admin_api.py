@@ -0,0 +1,107 @@
+"""
+运维管理 API 单元测试
+
+测试后台任务列表、运行时修改间隔、workspace 删除进度与详细健康检查。
+"""
+import os
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.infrastructure.background_tasks import BackgroundTaskManager
+from src.infrastructure.dependencies import get_workspace_deletion_service
+from src.interfaces.rest.api.v1 import admin, health
+
+
+@pytest.fixture
+def manager():
+    manager = BackgroundTaskManager()
+    manager.register_task("session_cleanup", AsyncMock(), 300)
+    return manager
+
+
+@pytest.fixture
+def client(manager):
+    app = FastAPI()
+    app.include_router(admin.router, prefix="/api/v1")
+    app.include_router(health.router, prefix="/api/v1")
+    app.state.background_task_manager = manager
+    return TestClient(app)
+
+
+class TestAdminAPI:
+    """运维管理 API 测试"""
+
+    def test_list_background_tasks(self, client):
+        """测试列出后台任务统计"""
+        response = client.get("/api/v1/admin/background-tasks")
+
+        assert response.status_code == 200
+        task = response.json()["tasks"]["session_cleanup"]
+        assert task["interval_seconds"] == 300
+        assert task["overrun_policy"] == "skip"
+        assert task["runs"] == 0
+
+    def test_update_interval(self, client, manager):
+        """测试运行时修改任务间隔"""
+        response = client.put(
+            "/api/v1/admin/background-tasks/session_cleanup/interval",
+            json={"interval_seconds": 60},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["interval_seconds"] == 60
+        assert response.json()["process"]["pid"] == os.getpid()
+        assert manager.get_task("session_cleanup").interval_seconds == 60
+
+    def test_update_interval_unknown_task(self, client):
+        """测试修改不存在任务的间隔返回 404"""
+        response = client.put(
+            "/api/v1/admin/background-tasks/missing/interval",
+            json={"interval_seconds": 60},
+        )
+
+        assert response.status_code == 404
+
+    def test_update_interval_rejects_non_positive(self, client):
+        """测试间隔必须为正数"""
+        response = client.put(
+            "/api/v1/admin/background-tasks/session_cleanup/interval",
+            json={"interval_seconds": 0},
+        )
+
+        assert response.status_code == 422
+
+    def test_list_workspace_deletions(self, client):
+        """测试列出进行中的 workspace 后台删除"""
+        deleter = Mock()
+        deleter.progress.return_value = [
+            {"workspace_path": "s3://b/sessions/s1", "attempt": 1, "deleted": 5000, "elapsed_seconds": 1.5}
+        ]
+        client.app.dependency_overrides[get_workspace_deletion_service] = lambda: deleter
+
+        response = client.get("/api/v1/admin/workspace-deletions")
+
+        assert response.status_code == 200
+        assert response.json()["enabled"] is True
+        assert response.json()["deletions"][0]["deleted"] == 5000
+
+    def test_list_workspace_deletions_disabled(self, client):
+        """测试未启用后台删除"""
+        client.app.dependency_overrides[get_workspace_deletion_service] = lambda: None
+
+        response = client.get("/api/v1/admin/workspace-deletions")
+
+        assert response.json() == {"enabled": False, "deletions": []}
+
+    def test_detailed_health_uses_task_data(self, client):
+        """测试详细健康检查来自真实任务状态（管理器未启动时任务为 stopped）"""
+        response = client.get("/api/v1/health/detailed")
+
+        body = response.json()
+        assert body["status"] == "degraded"
+        assert body["background_tasks"]["unhealthy_tasks"] == ["session_cleanup"]
+        assert body["background_tasks"]["tasks"]["session_cleanup"]["state"] == "stopped"
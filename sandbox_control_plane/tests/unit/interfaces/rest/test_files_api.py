@@ -0,0 +1,432 @@
+"""
+文件 API 单元测试
+
+测试流式 multipart 上传、请求体大小限制、可续传上传端点、流式下载与目录打包下载。
+"""
+import io
+import tarfile
+import zipfile
+from datetime import datetime, timezone
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.application.services.file_service import FileService
+from src.domain.entities.session import Session
+from src.domain.value_objects.execution_status import SessionStatus
+from src.domain.value_objects.resource_limit import ResourceLimit
+from src.infrastructure.dependencies import get_file_service_db
+from src.interfaces.rest.api.v1 import files
+
+
+CONTENT = b"0123456789"
+
+
+async def _open_stream(s3_path, start=None, end=None, etag=None):
+    async def chunks():
+        data = CONTENT[start or 0:(end + 1) if end is not None else None]
+        for i in range(0, len(data), 4):
+            yield data[i:i + 4]
+    return chunks()
+
+
+@pytest.fixture
+def storage_service():
+    service = Mock()
+    service.upload_file = AsyncMock()
+    service.create_multipart_upload = AsyncMock(return_value="upload-1")
+    service.upload_part = AsyncMock(side_effect=lambda path, upload_id, number, content: f"etag-{number}")
+    service.list_parts = AsyncMock(return_value=[])
+    service.complete_multipart_upload = AsyncMock()
+    service.abort_multipart_upload = AsyncMock()
+    service.get_file_info = AsyncMock(return_value={
+        "size": 10,
+        "content_type": "text/plain",
+        "etag": "abc",
+        "last_modified": datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+    })
+    service.generate_presigned_url = AsyncMock(return_value="https://s3.example.com/big.bin?sig=1")
+    service.open_file_stream = AsyncMock(side_effect=_open_stream)
+    service.list_files = AsyncMock(return_value=[])
+    service.download_file = AsyncMock(return_value=CONTENT)
+    return service
+
+
+@pytest.fixture
+def client(storage_service):
+    session_repo = Mock()
+    session_repo.find_by_id = AsyncMock(return_value=Session(
+        id="sess_123",
+        template_id="python-basic",
+        status=SessionStatus.RUNNING,
+        resource_limit=ResourceLimit.default(),
+        workspace_path="s3://sandbox-workspace/sessions/sess_123",
+        runtime_type="docker"
+    ))
+    service = FileService(
+        session_repo=session_repo,
+        storage_service=storage_service,
+        max_upload_bytes=100,
+        part_size_bytes=40,
+        part_concurrency=2,
+        presign_threshold_bytes=1000,
+    )
+
+    app = FastAPI()
+    app.include_router(files.router, prefix="/api/v1")
+    app.include_router(files.uploads_router, prefix="/api/v1")
+    app.include_router(files.archive_router, prefix="/api/v1")
+    app.dependency_overrides[get_file_service_db] = lambda: service
+    return TestClient(app)
+
+
+class TestUploadFileAPI:
+    """流式上传 API 测试"""
+
+    def test_upload_streams_file_field(self, client, storage_service):
+        """测试 multipart 上传只取 file 字段内容并按分片写入"""
+        response = client.post(
+            "/api/v1/sessions/sess_123/files/upload",
+            params={"path": "data/big.csv"},
+            data={"note": "ignored"},
+            files={"file": ("big.csv", b"a" * 90, "text/csv")},
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"session_id": "sess_123", "file_path": "data/big.csv", "size": 90}
+        storage_service.create_multipart_upload.assert_called_once_with(
+            "s3://sandbox-workspace/sessions/sess_123/data/big.csv", "text/csv"
+        )
+        contents = [call.args[3] for call in storage_service.upload_part.call_args_list]
+        assert b"".join(contents) == b"a" * 90
+        storage_service.complete_multipart_upload.assert_called_once()
+
+    def test_upload_small_file(self, client, storage_service):
+        """测试小文件单次上传"""
+        response = client.post(
+            "/api/v1/sessions/sess_123/files/upload",
+            params={"path": "a.txt"},
+            files={"file": ("a.txt", b"hello", "text/plain")},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["size"] == 5
+        assert storage_service.upload_file.call_args.kwargs["content"] == b"hello"
+
+    def test_upload_rejects_content_length_early(self, client, storage_service):
+        """测试 Content-Length 超限时直接返回 413"""
+        response = client.post(
+            "/api/v1/sessions/sess_123/files/upload",
+            params={"path": "a.txt"},
+            content=b"x",
+            headers={
+                "Content-Type": "multipart/form-data; boundary=xyz",
+                "Content-Length": str(100 + files.MULTIPART_OVERHEAD_BYTES + 1),
+            },
+        )
+
+        assert response.status_code == 413
+        storage_service.upload_file.assert_not_called()
+
+    def test_upload_rejects_oversize_body_while_reading(self, client, storage_service):
+        """测试读取过程中累计超限时返回 413，不写入存储"""
+        response = client.post(
+            "/api/v1/sessions/sess_123/files/upload",
+            params={"path": "a.bin"},
+            files={"file": ("a.bin", b"x" * 101)},
+        )
+
+        assert response.status_code == 413
+        storage_service.upload_file.assert_not_called()
+        storage_service.complete_multipart_upload.assert_not_called()
+
+    def test_upload_missing_file_field(self, client):
+        """测试缺少 file 字段返回 400"""
+        response = client.post(
+            "/api/v1/sessions/sess_123/files/upload",
+            params={"path": "a.txt"},
+            files={"other": ("a.txt", b"hello")},
+        )
+
+        assert response.status_code == 400
+        assert "Missing file field" in response.json()["detail"]
+
+
+class TestResumableUploadAPI:
+    """可续传上传 API 测试"""
+
+    def test_resumable_upload_flow(self, client, storage_service):
+        """测试创建、上传分片、查询分片与完成上传"""
+        response = client.post(
+            "/api/v1/sessions/sess_123/file-uploads",
+            params={"path": "big.bin"},
+        )
+        assert response.status_code == 200
+        assert response.json()["upload_id"] == "upload-1"
+        assert response.json()["part_size"] == 40
+
+        response = client.put(
+            "/api/v1/sessions/sess_123/file-uploads/upload-1/parts/1",
+            params={"path": "big.bin"},
+            content=b"x" * 40,
+        )
+        assert response.status_code == 200
+        assert response.json() == {"part_number": 1, "etag": "etag-1", "size": 40}
+
+        storage_service.list_parts.return_value = [{"part_number": 1, "size": 40, "etag": "etag-1"}]
+        response = client.get(
+            "/api/v1/sessions/sess_123/file-uploads/upload-1",
+            params={"path": "big.bin"},
+        )
+        assert response.status_code == 200
+        assert response.json()["size"] == 40
+
+        response = client.post(
+            "/api/v1/sessions/sess_123/file-uploads/upload-1/complete",
+            params={"path": "big.bin"},
+        )
+        assert response.status_code == 200
+        assert response.json() == {"session_id": "sess_123", "file_path": "big.bin", "size": 40}
+
+    def test_upload_part_rejects_oversize_part(self, client, storage_service):
+        """测试分片超过 part_size 时返回 413"""
+        response = client.put(
+            "/api/v1/sessions/sess_123/file-uploads/upload-1/parts/1",
+            params={"path": "big.bin"},
+            content=b"x" * 41,
+        )
+
+        assert response.status_code == 413
+        storage_service.upload_part.assert_not_called()
+
+    def test_upload_part_number_range(self, client):
+        """测试分片号必须在 1-10000 之间"""
+        response = client.put(
+            "/api/v1/sessions/sess_123/file-uploads/upload-1/parts/0",
+            params={"path": "big.bin"},
+            content=b"x",
+        )
+
+        assert response.status_code == 422
+
+    def test_abort_upload(self, client, storage_service):
+        """测试取消上传"""
+        response = client.delete(
+            "/api/v1/sessions/sess_123/file-uploads/upload-1",
+            params={"path": "big.bin"},
+        )
+
+        assert response.status_code == 204
+        storage_service.abort_multipart_upload.assert_called_once_with(
+            "s3://sandbox-workspace/sessions/sess_123/big.bin", "upload-1"
+        )
+
+
+class TestDownloadFileAPI:
+    """流式下载 API 测试"""
+
+    def test_download_streams_content(self, client, storage_service):
+        """测试流式返回完整内容及缓存相关响应头"""
+        response = client.get("/api/v1/sessions/sess_123/files/data/a.txt")
+
+        assert response.status_code == 200
+        assert response.content == CONTENT
+        assert response.headers["etag"] == '"abc"'
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["content-length"] == "10"
+        assert response.headers["last-modified"] == "Fri, 02 Jan 2026 03:04:05 GMT"
+        storage_service.get_file_info.assert_called_once()
+
+    def test_download_range(self, client):
+        """测试 Range 请求返回 206"""
+        response = client.get(
+            "/api/v1/sessions/sess_123/files/a.txt",
+            headers={"Range": "bytes=2-5"},
+        )
+
+        assert response.status_code == 206
+        assert response.content == b"2345"
+        assert response.headers["content-range"] == "bytes 2-5/10"
+        assert response.headers["content-length"] == "4"
+
+    def test_download_suffix_range(self, client):
+        """测试后缀区间"""
+        response = client.get(
+            "/api/v1/sessions/sess_123/files/a.txt",
+            headers={"Range": "bytes=-3"},
+        )
+
+        assert response.status_code == 206
+        assert response.content == b"789"
+
+    def test_download_multi_range_ignored(self, client):
+        """测试多区间请求忽略 Range 返回完整内容"""
+        response = client.get(
+            "/api/v1/sessions/sess_123/files/a.txt",
+            headers={"Range": "bytes=0-1,4-5"},
+        )
+
+        assert response.status_code == 200
+        assert response.content == CONTENT
+
+    def test_download_range_not_satisfiable(self, client, storage_service):
+        """测试区间超出文件大小返回 416"""
+        response = client.get(
+            "/api/v1/sessions/sess_123/files/a.txt",
+            headers={"Range": "bytes=20-"},
+        )
+
+        assert response.status_code == 416
+        assert response.headers["content-range"] == "bytes */10"
+        storage_service.open_file_stream.assert_not_called()
+
+    def test_download_not_modified(self, client, storage_service):
+        """测试 If-None-Match 命中返回 304"""
+        response = client.get(
+            "/api/v1/sessions/sess_123/files/a.txt",
+            headers={"If-None-Match": 'W/"abc"'},
+        )
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == '"abc"'
+        storage_service.open_file_stream.assert_not_called()
+
+    def test_download_large_file_redirects(self, client, storage_service):
+        """测试超过阈值的文件重定向到预签名 URL"""
+        storage_service.get_file_info.return_value = {"size": 5000, "etag": "abc"}
+
+        response = client.get("/api/v1/sessions/sess_123/files/big.bin", follow_redirects=False)
+
+        assert response.status_code == 307
+        assert response.headers["location"] == "https://s3.example.com/big.bin?sig=1"
+        assert response.json()["presigned_url"] == "https://s3.example.com/big.bin?sig=1"
+        storage_service.open_file_stream.assert_not_called()
+
+    def test_download_not_found(self, client, storage_service):
+        """测试文件不存在返回 404"""
+        from src.shared.errors.domain import NotFoundError
+
+        storage_service.get_file_info.side_effect = NotFoundError("missing")
+
+        response = client.get("/api/v1/sessions/sess_123/files/missing.txt")
+
+        assert response.status_code == 404
+
+
+class TestDownloadArchiveAPI:
+    """目录打包下载测试"""
+
+    @pytest.fixture(autouse=True)
+    def workspace(self, storage_service):
+        storage_service.list_files.return_value = [
+            {"key": "sessions/sess_123/out/run-1/a.txt", "size": 10},
+            {"key": "sessions/sess_123/out/run-1/sub/b.txt", "size": 10},
+        ]
+
+    def test_download_zip(self, client, storage_service):
+        """测试目录打包为 zip，条目保留目录名"""
+        response = client.get("/api/v1/sessions/sess_123/files-archive", params={"path": "out/run-1/"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/zip"
+        assert 'filename="run-1.zip"' in response.headers["content-disposition"]
+        assert response.headers["x-archive-file-count"] == "2"
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            assert archive.namelist() == ["run-1/a.txt", "run-1/sub/b.txt"]
+            assert archive.read("run-1/a.txt") == CONTENT
+        assert storage_service.list_files.call_args.args[0] == "sessions/sess_123/out/run-1/"
+        storage_service.download_file.assert_any_call("s3://sandbox-workspace/sessions/sess_123/out/run-1/a.txt")
+
+    def test_download_tar_gz(self, client):
+        """测试 tar.gz 格式"""
+        response = client.get(
+            "/api/v1/sessions/sess_123/files-archive", params={"path": "out/run-1", "format": "tar.gz"}
+        )
+
+        assert response.status_code == 200
+        with tarfile.open(fileobj=io.BytesIO(response.content), mode="r:gz") as archive:
+            assert archive.getnames() == ["run-1/a.txt", "run-1/sub/b.txt"]
+
+    def test_unsupported_format(self, client):
+        response = client.get("/api/v1/sessions/sess_123/files-archive", params={"format": "rar"})
+        assert response.status_code == 400
+
+    def test_empty_directory(self, client, storage_service):
+        storage_service.list_files.return_value = []
+        response = client.get("/api/v1/sessions/sess_123/files-archive", params={"path": "missing"})
+        assert response.status_code == 404
+
+    def test_too_many_files(self, client, storage_service):
+        """测试超过文件数上限时在响应开始前拒绝"""
+        storage_service.list_files.return_value = [
+            {"key": f"sessions/sess_123/f{i}", "size": 1} for i in range(10001)
+        ]
+        response = client.get("/api/v1/sessions/sess_123/files-archive")
+        assert response.status_code == 400
+        assert "10000 files" in response.json()["detail"]
+        storage_service.download_file.assert_not_called()
+
+
+class TestUploadArchiveAPI:
+    """归档上传解压测试"""
+
+    @staticmethod
+    def _zip(files) -> bytes:
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            for name, content in files:
+                archive.writestr(name, content)
+        return buffer.getvalue()
+
+    def test_upload_zip(self, client, storage_service):
+        """测试解压到目标目录并返回文件清单"""
+        body = self._zip([("src/main.py", b"print(1)\n"), ("README.md", b"# demo\n")])
+
+        response = client.post(
+            "/api/v1/sessions/sess_123/files-archive",
+            params={"path": "project"},
+            content=body,
+            headers={"Content-Type": "application/zip"},
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "session_id": "sess_123",
+            "path": "project",
+            "files": [
+                {"name": "project/src/main.py", "container_path": "/workspace/project/src/main.py", "size": 9},
+                {"name": "project/README.md", "container_path": "/workspace/project/README.md", "size": 7},
+            ],
+            "count": 2,
+            "total_size": 16,
+        }
+        storage_service.upload_file.assert_any_call(
+            s3_path="s3://sandbox-workspace/sessions/sess_123/project/src/main.py",
+            content=b"print(1)\n",
+            content_type="text/x-python",
+        )
+
+    def test_path_traversal(self, client):
+        """测试条目路径穿越时返回 400"""
+        response = client.post(
+            "/api/v1/sessions/sess_123/files-archive", content=self._zip([("../escape.sh", b"x")])
+        )
+
+        assert response.status_code == 400
+        assert "Unsafe path" in response.json()["detail"]
+
+    def test_invalid_archive(self, client):
+        response = client.post("/api/v1/sessions/sess_123/files-archive", content=b"plain text")
+        assert response.status_code == 400
+
+    def test_body_too_large(self, client, storage_service):
+        """测试请求体超过上限时返回 413"""
+        client.app.dependency_overrides[get_file_service_db]()._extract_max_bytes = 100
+
+        response = client.post("/api/v1/sessions/sess_123/files-archive", content=b"\0" * 1000)
+
+        assert response.status_code == 413
+        storage_service.upload_file.assert_not_called()
@@ -15,7 +15,7 @@ from src.interfaces.rest.main import (
     _register_routes,
     _register_middleware,
 )
-from src.shared.errors.domain import NotFoundError, ValidationError
+from src.shared.errors.domain import NodeUnavailableError, NotFoundError, ValidationError
 
 
 class TestCreateApp:
@@ -141,6 +141,25 @@ class TestRegisterExceptionHandlers:
         assert isinstance(response, JSONResponse)
         assert response.status_code == 409
 
+    @pytest.mark.asyncio
+    async def test_node_unavailable_error_handler(self, app):
+        """测试 NodeUnavailableError（如休眠恢复超时）返回 503"""
+        _register_exception_handlers(app)
+
+        handler = app.exception_handlers[NodeUnavailableError]
+        request = MagicMock(spec=Request)
+        request.url = MagicMock()
+        request.url.path = "/test"
+        request.method = "POST"
+
+        exc = NodeUnavailableError("Session restore timed out")
+
+        with patch('src.interfaces.rest.main.logger'):
+            response = await handler(request, exc)
+
+        assert isinstance(response, JSONResponse)
+        assert response.status_code == 503
+
     @pytest.mark.asyncio
     async def test_global_exception_handler(self, app):
         """测试全局异常处理"""
@@ -10,6 +10,9 @@ from src.shared.utils.dependencies import (
     format_dependencies_for_script,
     build_dependency_install_script,
     format_dependency_install_script_for_shell,
+    build_venv_snapshot_command,
+    build_venv_snapshot_restore_script,
+    VENV_SNAPSHOT_RELATIVE_PATH,
 )
 
 
@@ -166,3 +169,37 @@ class TestFormatDependencyInstallScriptForShell:
 
         assert "✅" in result
         assert "❌" in result
+
+
+class TestVenvSnapshotScripts:
+    """休眠依赖快照脚本测试"""
+
+    def test_snapshot_command_writes_into_workspace(self):
+        """测试快照命令写入 workspace 并原子重命名"""
+        command = build_venv_snapshot_command()
+
+        assert command[:2] == ["sh", "-c"]
+        assert f"/workspace/{VENV_SNAPSHOT_RELATIVE_PATH}.tmp" in command[2]
+        assert "-C /opt/sandbox-venv" in command[2]
+
+    def test_restore_script_falls_back_to_install(self):
+        """测试无快照时回退到 pip 安装脚本"""
+        script = build_venv_snapshot_restore_script('pip3 install "requests"')
+
+        assert f'SNAPSHOT_FILE="$SESSION_PATH/{VENV_SNAPSHOT_RELATIVE_PATH}"' in script
+        assert script.index("else") < script.index('pip3 install "requests"')
+
+    def test_restore_script_exports_venv_and_keeps_snapshot(self):
+        """测试从快照恢复时导出依赖路径，快照留给控制平面在恢复成功后删除"""
+        script = build_venv_snapshot_restore_script("")
+        restored = script[:script.index("else")]
+
+        assert 'export PYTHONPATH="/opt/sandbox-venv:/app:/workspace"' in restored
+        assert 'export SANDBOX_VENV_PATH="/opt/sandbox-venv"' in restored
+        assert "rm -f" not in script
+
+    def test_restore_script_with_empty_install(self):
+        """测试安装脚本为空时 else 分支仍然合法"""
+        script = build_venv_snapshot_restore_script("")
+
+        assert "else\n:\n" in script
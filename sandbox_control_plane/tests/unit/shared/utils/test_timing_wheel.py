@@ -0,0 +1,87 @@
+"""
+时间轮单元测试
+
+测试 TimingWheel 的到期、替换、取消与跨圈定时项。
+"""
+import pytest
+
+from src.shared.utils.timing_wheel import TimingWheel
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTimingWheel:
+    """时间轮测试"""
+
+    @pytest.fixture
+    def clock(self):
+        return _Clock()
+
+    def test_expires_in_deadline_order(self, clock):
+        """测试定时项在截止 tick 到期，并按截止时间先后返回"""
+        wheel = TimingWheel(tick_seconds=1.0, slots=16, clock=clock)
+        wheel.schedule("b", 3)
+        wheel.schedule("a", 1)
+        wheel.schedule("c", 5)
+
+        clock.now += 2
+        assert wheel.advance() == ["a"]
+
+        clock.now += 3
+        assert wheel.advance() == ["b", "c"]
+        assert len(wheel) == 0
+
+    def test_schedule_replaces_existing(self, clock):
+        """测试重复调度替换原有定时项"""
+        wheel = TimingWheel(tick_seconds=1.0, slots=16, clock=clock)
+        wheel.schedule("a", 1)
+        wheel.schedule("a", 10)
+
+        clock.now += 5
+        assert wheel.advance() == []
+        assert "a" in wheel
+
+        clock.now += 5
+        assert wheel.advance() == ["a"]
+
+    def test_cancel(self, clock):
+        """测试取消定时项"""
+        wheel = TimingWheel(tick_seconds=1.0, slots=16, clock=clock)
+        wheel.schedule("a", 1)
+
+        assert wheel.cancel("a") is True
+        assert wheel.cancel("a") is False
+        clock.now += 2
+        assert wheel.advance() == []
+
+    def test_multi_lap_deadline(self, clock):
+        """测试超过一圈的定时项在经过对应圈数后才到期"""
+        wheel = TimingWheel(tick_seconds=1.0, slots=4, clock=clock)
+        wheel.schedule("far", 10)
+
+        for _ in range(9):
+            clock.now += 1
+            assert wheel.advance() == []
+
+        clock.now += 1
+        assert wheel.advance() == ["far"]
+
+    def test_long_pause_visits_one_lap(self, clock):
+        """测试长时间未推进时一次返回所有过期项"""
+        wheel = TimingWheel(tick_seconds=1.0, slots=4, clock=clock)
+        for i in range(8):
+            wheel.schedule(f"k{i}", i + 1)
+
+        clock.now += 100
+        assert sorted(wheel.advance()) == [f"k{i}" for i in range(8)]
+
+    def test_invalid_arguments(self):
+        """测试无效参数"""
+        with pytest.raises(ValueError):
+            TimingWheel(tick_seconds=0)